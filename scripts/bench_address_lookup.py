@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark address lookups: UPPER()/REPLACE() variant matching vs address_key.
+
+Seeds a scratch DuckDB with a permits table whose street names are stored
+the ways DBI stores them ("MARKET" + "ST", "Market St", "ROBIN HOOD" vs
+"ROBINHOOD"), then times the legacy OR-of-variants query that
+_lookup_by_address used to run against the canonical
+``street_number = ? AND address_key = ?`` lookup for a sample of addresses.
+The key lookup must find every permit the legacy query found.
+
+With --database-url the same two queries are timed against a Postgres
+permits table that already has the address_key migration applied (nothing
+is written).
+
+Usage:
+    python -m scripts.bench_address_lookup                  # 500K seeded rows
+    python -m scripts.bench_address_lookup --rows 2000000 --lookups 500 --json
+    python -m scripts.bench_address_lookup --database-url "$DATABASE_URL"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# (street_name, street_suffix) storage variants of the same streets
+STREETS = [
+    ("MARKET", "ST"), ("Market St", None), ("MISSION", "ST"), ("VAN NESS", "AV"),
+    ("Van Ness Ave", None), ("ROBIN HOOD", "DR"), ("ROBINHOOD", "DR"),
+    ("16TH", "AV"), ("16th Ave", None), ("GEARY", "BL"), ("ST FRANCIS", "BL"),
+]
+
+LEGACY_SQL = """
+    SELECT permit_number FROM permits
+    WHERE street_number = {ph}
+      AND (
+        UPPER(street_name) = UPPER({ph})
+        OR UPPER(street_name) = UPPER({ph})
+        OR UPPER(COALESCE(street_name, '') || ' ' || COALESCE(street_suffix, '')) = UPPER({ph})
+        OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER({ph})
+      )
+"""
+
+KEY_SQL = """
+    SELECT permit_number FROM permits
+    WHERE street_number = {ph} AND address_key = {ph}
+"""
+
+
+def _seed_db(path: str, rows: int) -> None:
+    import src.db as db_mod
+
+    conn = db_mod.get_connection(path)
+    try:
+        db_mod.init_schema(conn)
+        names = [n for n, _ in STREETS]
+        suffixes = [s or "" for _, s in STREETS]
+        conn.execute(
+            "INSERT INTO permits (permit_number, status, street_number, street_name, "
+            "street_suffix, block, lot) "
+            "SELECT 'P' || LPAD(CAST(i AS VARCHAR), 9, '0'), 'filed', "
+            "CAST(i % 2000 AS VARCHAR), "
+            f"list_element({names!r}, CAST(i % {len(STREETS)} AS INTEGER) + 1), "
+            f"NULLIF(list_element({suffixes!r}, CAST(i % {len(STREETS)} AS INTEGER) + 1), ''), "
+            "LPAD(CAST(i % 9000 AS VARCHAR), 4, '0'), '001' "
+            f"FROM range({rows}) t(i)"
+        )
+        db_mod._create_indexes(conn)
+    finally:
+        conn.close()
+
+
+def _sample(n: int, seed: int) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    typed = ["Market St", "market", "Van Ness Avenue", "Robinhood Dr",
+             "robin hood", "16th Ave", "Geary Blvd", "Mission Street"]
+    return [(str(rng.randrange(2000)), rng.choice(typed)) for _ in range(n)]
+
+
+def _legacy_params(number: str, name: str) -> list:
+    from src.tools.permit_lookup import _strip_suffix
+
+    base, _ = _strip_suffix(name)
+    return [number, base, name, name, base.replace(" ", "")]
+
+
+def _time(conn, sql: str, param_rows: list[list], postgres: bool) -> tuple[dict, list]:
+    timings, results = [], []
+    for params in param_rows:
+        t0 = time.perf_counter()
+        if postgres:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        else:
+            rows = conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - t0) * 1000)
+        results.append(sorted(r[0] for r in rows))
+    timings.sort()
+    stats = {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "total_s": round(sum(timings) / 1000, 3),
+    }
+    return stats, results
+
+
+def run(args) -> dict:
+    import src.db as db_mod
+    from src.address_key import address_key
+
+    postgres = bool(args.database_url)
+    workdir = None
+    if postgres:
+        import psycopg2
+        conn = psycopg2.connect(args.database_url)
+        ph = "%s"
+    else:
+        os.environ.pop("DATABASE_URL", None)
+        db_mod.BACKEND = "duckdb"
+        workdir = tempfile.mkdtemp(prefix="bench_address_")
+        path = os.path.join(workdir, "permits.duckdb")
+        print(f"Seeding {args.rows:,} permits into {path} ...")
+        _seed_db(path, args.rows)
+        conn = db_mod.get_connection(path)
+        ph = "?"
+
+    lookups = _sample(args.lookups, args.seed)
+    try:
+        legacy, legacy_rows = _time(
+            conn, LEGACY_SQL.format(ph=ph),
+            [_legacy_params(n, s) for n, s in lookups], postgres)
+        keyed, keyed_rows = _time(
+            conn, KEY_SQL.format(ph=ph),
+            [[n, address_key(n, s)] for n, s in lookups], postgres)
+    finally:
+        conn.close()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # address_key also folds the suffix, so it may match a superset
+    missed = sum(1 for a, b in zip(legacy_rows, keyed_rows) if not set(a) <= set(b))
+    result = {
+        "backend": "postgres" if postgres else "duckdb",
+        "rows": None if postgres else args.rows,
+        "lookups": len(lookups),
+        "legacy": legacy,
+        "address_key": keyed,
+        "speedup_p50": round(legacy["p50_ms"] / max(keyed["p50_ms"], 1e-9), 1),
+        "legacy_matches_missed": missed,
+    }
+    print(f"  legacy variants: p50 {legacy['p50_ms']:>8.2f} ms  p95 {legacy['p95_ms']:>8.2f} ms")
+    print(f"  address_key:     p50 {keyed['p50_ms']:>8.2f} ms  p95 {keyed['p95_ms']:>8.2f} ms")
+    print(f"  {result['speedup_p50']:,.1f}x faster at p50")
+    if missed:
+        print(f"WARNING: address_key missed legacy matches for {missed} lookups")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Address lookup benchmark")
+    parser.add_argument("--rows", type=int, default=500_000, help="Seeded permits rows")
+    parser.add_argument("--lookups", type=int, default=200, help="Addresses looked up")
+    parser.add_argument("--database-url", help="Time against this Postgres instead (read-only)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark src.db.query() overhead on the DuckDB backend.
+
+Seeds a scratch DuckDB with a permits table, then times the same small
+indexed lookups two ways:
+
+  - per_call_connect: what query() used to do — duckdb.connect(path),
+    execute, close — so every statement re-attaches the file, re-reads the
+    catalog and starts with a cold buffer cache
+  - shared: query() on the process-wide instance (per-thread cursor)
+
+--read-only times the shared path with SF_PERMITS_DB_READ_ONLY semantics
+(file attached READ_ONLY); --threads N runs the shared lookups from N
+threads at once.
+
+Usage:
+    python -m scripts.bench_duckdb_query                      # 200K rows, 2000 queries
+    python -m scripts.bench_duckdb_query --queries 5000 --threads 8 --json
+    python -m scripts.bench_duckdb_query --read-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+LOOKUP_SQL = "SELECT permit_number, status, filed_date FROM permits WHERE permit_number = %s"
+
+
+def _seed_db(path: str, rows: int) -> None:
+    import src.db as db_mod
+
+    conn = db_mod.get_connection(path)
+    try:
+        db_mod.init_schema(conn)
+        conn.execute(
+            "INSERT INTO permits (permit_number, status, filed_date, block, lot) "
+            "SELECT 'P' || LPAD(CAST(i AS VARCHAR), 9, '0'), 'filed', "
+            "CAST(DATE '2020-01-01' + CAST(i % 2000 AS INTEGER) AS VARCHAR), "
+            "LPAD(CAST(i % 9000 AS VARCHAR), 4, '0'), '001' "
+            f"FROM range({rows}) t(i)"
+        )
+        db_mod._create_indexes(conn)
+    finally:
+        conn.close()
+
+
+def _stats(timings: list[float]) -> dict:
+    timings = sorted(timings)
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "total_s": round(sum(timings) / 1000, 3),
+    }
+
+
+def _per_call_connect(path: str, keys: list[str]) -> dict:
+    import duckdb
+
+    sql = LOOKUP_SQL.replace("%s", "?")
+    timings = []
+    for key in keys:
+        t0 = time.perf_counter()
+        conn = duckdb.connect(path)
+        try:
+            conn.execute(sql, [key]).fetchall()
+        finally:
+            conn.close()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return _stats(timings)
+
+
+def _shared(keys: list[str], threads: int) -> dict:
+    import src.db as db_mod
+
+    timings: list[float] = []
+    lock = threading.Lock()
+
+    def worker(chunk):
+        local = []
+        for key in chunk:
+            t0 = time.perf_counter()
+            db_mod.query(LOOKUP_SQL, (key,))
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            timings.extend(local)
+
+    if threads <= 1:
+        worker(keys)
+    else:
+        pool = [threading.Thread(target=worker, args=(keys[i::threads],)) for i in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    return _stats(timings)
+
+
+def run(args) -> dict:
+    import src.db as db_mod
+
+    os.environ.pop("DATABASE_URL", None)
+    db_mod.BACKEND = "duckdb"
+    workdir = tempfile.mkdtemp(prefix="bench_duckdb_query_")
+    path = os.path.join(workdir, "permits.duckdb")
+    try:
+        print(f"Seeding {args.rows:,} permits into {path} ...")
+        _seed_db(path, args.rows)
+        rng = random.Random(args.seed)
+        keys = [f"P{rng.randrange(args.rows):09d}" for _ in range(args.queries)]
+
+        # Before the shared instance exists, so duckdb.connect() really reopens
+        legacy = _per_call_connect(path, keys)
+
+        db_mod._DUCKDB_PATH = path
+        db_mod.DUCKDB_READ_ONLY = args.read_only
+        db_mod.query("SELECT 1")  # open the instance outside the timings
+        shared = _shared(keys, args.threads)
+        db_mod.close_duckdb()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "rows": args.rows,
+        "queries": len(keys),
+        "threads": args.threads,
+        "read_only": args.read_only,
+        "per_call_connect": legacy,
+        "shared": shared,
+        "speedup_p50": round(legacy["p50_ms"] / max(shared["p50_ms"], 1e-9), 1),
+    }
+    print(f"  per-call connect: p50 {legacy['p50_ms']:>8.3f} ms  p95 {legacy['p95_ms']:>8.3f} ms")
+    print(f"  shared instance:  p50 {shared['p50_ms']:>8.3f} ms  p95 {shared['p95_ms']:>8.3f} ms")
+    print(f"  {result['speedup_p50']:,.1f}x faster at p50")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DuckDB query() overhead benchmark")
+    parser.add_argument("--rows", type=int, default=200_000, help="Seeded permits rows")
+    parser.add_argument("--queries", type=int, default=2000, help="Lookups timed per variant")
+    parser.add_argument("--threads", type=int, default=1, help="Threads for the shared variant")
+    parser.add_argument("--read-only", action="store_true", help="Attach the file READ_ONLY")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Profile MCP server cold-start import time against a budget.
+
+Runs ``python -X importtime -c "import <target>"`` in fresh interpreters
+(--runs times) and reports the median total import time, the slowest
+top-level imports, and whether any module that should load lazily (tool
+modules, pypdf, PIL, anthropic, httpx, duckdb, ...) was imported.
+
+Exits 1 when the median exceeds --budget-ms (default IMPORT_BUDGET_MS) or a
+lazy module was imported, so it can gate CI and deploys.
+
+Usage:
+    python -m scripts.bench_import_time                         # import src.server
+    python -m scripts.bench_import_time --target src.mcp_http --json
+    python -m scripts.bench_import_time --profile /tmp/importtime.txt
+    python -m scripts.bench_import_time --target src.tools.estimate_fees,src.tools.validate_plans --budget-ms 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Cold-start budget for `import src.server` as measured under -X importtime
+# (which inflates wall time).  The mcp SDK (pydantic, starlette, anyio)
+# accounts for most of it; importing the tool modules eagerly adds ~400 ms.
+IMPORT_BUDGET_MS = 2000
+
+# Modules the server must not import until a tool is called
+LAZY_MODULES = ("src.tools.", "pypdf", "pdf2image", "PIL", "anthropic", "openai",
+                "httpx", "duckdb", "psycopg2", "src.db")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _profile(target: str) -> str:
+    imports = "; ".join(f"import {m}" for m in target.split(","))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", imports],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    return proc.stderr
+
+
+def _parse(raw: str) -> list[tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) per -X importtime line.
+
+    Interpreter startup (everything up to ``site``) is dropped.
+    """
+    rows = []
+    for line in raw.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    startup = max((i for i, r in enumerate(rows) if r[0] == "site" and r[3] == 0), default=-1)
+    return rows[startup + 1:]
+
+
+def _is_lazy(module: str) -> bool:
+    return any(module.startswith(p) if p.endswith(".") else module == p or module.startswith(p + ".")
+               for p in LAZY_MODULES)
+
+
+def run(args) -> dict:
+    runs = []
+    for _ in range(args.runs):
+        raw = _profile(args.target)
+        rows = _parse(raw)
+        total_us = sum(cum for _, _, cum, depth in rows if depth == 0)
+        runs.append((total_us, raw, rows))
+    runs.sort(key=lambda r: r[0])
+    total_us, raw, rows = runs[len(runs) // 2]
+
+    if args.profile:
+        Path(args.profile).write_text(raw)
+    top = sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:args.top]
+    loaded = {r[0] for r in rows}
+    eager = sorted(m for m in loaded if _is_lazy(m))
+    result = {
+        "target": args.target,
+        "runs": args.runs,
+        "median_ms": round(total_us / 1000, 1),
+        "all_runs_ms": [round(r[0] / 1000, 1) for r in runs],
+        "modules_imported": len(loaded),
+        "budget_ms": args.budget_ms,
+        "over_budget": bool(args.budget_ms) and total_us / 1000 > args.budget_ms,
+        "eager_heavy_modules": eager,
+        "top": [{"module": m, "cumulative_ms": round(cum / 1000, 1)} for m, _, cum, _ in top],
+    }
+
+    print(f"import {args.target}: median {result['median_ms']:.1f} ms over {args.runs} runs "
+          f"({result['modules_imported']} modules)")
+    for t in result["top"]:
+        print(f"  {t['cumulative_ms']:>8.1f} ms  {t['module']}")
+    if args.budget_ms:
+        verdict = "OVER" if result["over_budget"] else "within"
+        print(f"  {verdict} budget of {args.budget_ms} ms")
+    if eager:
+        print(f"  imported eagerly: {', '.join(eager[:10])}{' ...' if len(eager) > 10 else ''}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server import-time profile")
+    parser.add_argument("--target", default="src.server",
+                        help="Module(s) to import, comma-separated")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Fail when the median exceeds this (0 = no budget)")
+    parser.add_argument("--profile", help="Write the median run's raw -X importtime output here")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    if result["over_budget"] or (args.budget_ms and result["eager_heavy_modules"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
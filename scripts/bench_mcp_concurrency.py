@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark mixed MCP tool calls from N simultaneous clients.
+
+Seeds a scratch DuckDB with permits and addenda routing, then runs --clients
+concurrent coroutines on one event loop (as FastMCP does), each issuing
+--calls tool calls drawn round-robin from permit_lookup,
+predict_next_stations, diagnose_stuck_permit, estimate_timeline and
+similar_projects.  Two modes:
+
+  - inline: the tool bodies called directly inside the coroutine (how the
+    tools ran before src.db_async — every query blocks the loop)
+  - offloaded: the tools as registered, running on the DB executor
+
+Reports calls/s, per-call latency and the worst event-loop stall measured
+by a 10 ms heartbeat task.
+
+Usage:
+    python -m scripts.bench_mcp_concurrency                  # 8 clients x 10 calls
+    python -m scripts.bench_mcp_concurrency --clients 32 --calls 20 --json
+    python -m scripts.bench_mcp_concurrency --permits 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+STATIONS = ["INTAKE", "BLDG", "SFFD", "CP-ZOC", "DPW-BSM", "PERMIT-CTR"]
+NEIGHBORHOODS = ["Mission", "SoMa", "Sunset/Parkside", "Noe Valley"]
+
+
+def _seed_db(path: str, permits: int) -> None:
+    import src.db as db_mod
+
+    conn = db_mod.get_connection(path)
+    try:
+        db_mod.init_schema(conn)
+        conn.execute(
+            "INSERT INTO permits (permit_number, permit_type, permit_type_definition, status, "
+            "filed_date, issued_date, estimated_cost, neighborhood, street_number, street_name, "
+            "description, block, lot) "
+            "SELECT 'P' || LPAD(CAST(i AS VARCHAR), 9, '0'), '8', "
+            "'additions alterations or repairs', "
+            "CASE WHEN i % 3 = 0 THEN 'issued' ELSE 'filed' END, "
+            "CAST(DATE '2023-01-01' + CAST(i % 900 AS INTEGER) AS VARCHAR), "
+            "CASE WHEN i % 3 = 0 THEN CAST(DATE '2023-03-01' + CAST(i % 900 AS INTEGER) AS VARCHAR) END, "
+            "10000 + (i % 500) * 1000, "
+            f"list_element({NEIGHBORHOODS!r}, CAST(i % {len(NEIGHBORHOODS)} AS INTEGER) + 1), "
+            "CAST(i % 2000 AS VARCHAR), 'MARKET', 'kitchen and bath remodel', "
+            "LPAD(CAST(i % 9000 AS VARCHAR), 4, '0'), '001' "
+            f"FROM range({permits}) t(i)"
+        )
+        conn.execute(
+            "INSERT INTO addenda (id, application_number, addenda_number, step, station, "
+            "arrive, finish_date, review_results) "
+            f"SELECT i * {len(STATIONS)} + s, 'P' || LPAD(CAST(i AS VARCHAR), 9, '0'), 0, s + 1, "
+            f"list_element({STATIONS!r}, s + 1), "
+            "CAST(DATE '2023-01-05' + CAST(i % 900 + s * 15 AS INTEGER) AS VARCHAR), "
+            "CASE WHEN s < 3 + i % 3 THEN CAST(DATE '2023-01-05' + CAST(i % 900 + s * 15 + 10 AS INTEGER) "
+            "AS VARCHAR) END, CASE WHEN s < 3 + i % 3 THEN 'Approved' END "
+            f"FROM range({permits}) t(i), range({len(STATIONS)}) u(s)"
+        )
+        db_mod._create_indexes(conn)
+    finally:
+        conn.close()
+
+
+def _calls(permits: int) -> list:
+    from src.tools.estimate_timeline import estimate_timeline
+    from src.tools.permit_lookup import permit_lookup
+    from src.tools.predict_next_stations import predict_next_stations
+    from src.tools.similar_projects import similar_projects
+    from src.tools.stuck_permit import diagnose_stuck_permit
+
+    def pn(i):
+        return f"P{(i * 7919) % permits:09d}"
+
+    return [
+        lambda i: (permit_lookup, {"permit_number": pn(i)}),
+        lambda i: (predict_next_stations, {"permit_number": pn(i)}),
+        lambda i: (diagnose_stuck_permit, {"permit_number": pn(i)}),
+        lambda i: (estimate_timeline, {"permit_type": "alterations",
+                                       "neighborhood": NEIGHBORHOODS[i % len(NEIGHBORHOODS)]}),
+        lambda i: (similar_projects, {"permit_type": "alterations", "estimated_cost": 50000}),
+    ]
+
+
+async def _run_mode(mode: str, clients: int, calls: int, permits: int) -> dict:
+    makers = _calls(permits)
+    latencies: list[float] = []
+    worst_stall = 0.0
+
+    async def heartbeat():
+        nonlocal worst_stall
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst_stall = max(worst_stall, time.perf_counter() - t0 - 0.01)
+
+    async def client(c: int):
+        for k in range(calls):
+            tool, kwargs = makers[(c + k) % len(makers)](c * calls + k)
+            t0 = time.perf_counter()
+            if mode == "inline":
+                tool.__wrapped__(**kwargs)
+            else:
+                await tool(**kwargs)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            await asyncio.sleep(0)
+
+    hb = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - t0
+    hb.cancel()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "calls_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "max_loop_stall_ms": round(worst_stall * 1000, 1),
+    }
+
+
+def run(args) -> dict:
+    import src.db as db_mod
+
+    os.environ.pop("DATABASE_URL", None)
+    db_mod.BACKEND = "duckdb"
+    workdir = tempfile.mkdtemp(prefix="bench_mcp_concurrency_")
+    path = os.path.join(workdir, "permits.duckdb")
+    try:
+        print(f"Seeding {args.permits:,} permits into {path} ...")
+        _seed_db(path, args.permits)
+        db_mod._DUCKDB_PATH = path
+        # warm caches (timeline_stats, transition lookups) outside the timings
+        asyncio.run(_run_mode("offloaded", 1, len(_calls(args.permits)), args.permits))
+        inline = asyncio.run(_run_mode("inline", args.clients, args.calls, args.permits))
+        offloaded = asyncio.run(_run_mode("offloaded", args.clients, args.calls, args.permits))
+        db_mod.close_duckdb()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "permits": args.permits,
+        "clients": args.clients,
+        "calls_per_client": args.calls,
+        "inline": inline,
+        "offloaded": offloaded,
+        "throughput_ratio": round(offloaded["calls_per_s"] / max(inline["calls_per_s"], 1e-9), 2),
+    }
+    for name, r in (("inline", inline), ("offloaded", offloaded)):
+        print(f"  {name:<10} {r['calls_per_s']:>8.1f} calls/s  p50 {r['p50_ms']:>8.2f} ms  "
+              f"p95 {r['p95_ms']:>8.2f} ms  worst loop stall {r['max_loop_stall_ms']:>8.1f} ms")
+    print(f"  {result['throughput_ratio']:.2f}x throughput offloaded")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent MCP tool call benchmark")
+    parser.add_argument("--permits", type=int, default=100_000, help="Seeded permits rows")
+    parser.add_argument("--clients", type=int, default=8, help="Simultaneous clients")
+    parser.add_argument("--calls", type=int, default=10, help="Tool calls per client")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark nightly permit change detection: per-record vs set-based.
+
+Seeds a scratch DuckDB with a permits table, builds a synthetic SODA delta
+(changed / unchanged / new permits), and times detect_changes() against
+detect_changes_set_based() on identical copies of the database. Both modes
+must produce the same number of changes.
+
+The per-record path opens a connection per lookup and per write (on DuckDB
+that is a file open each time), so for deltas above --row-limit it is timed
+on the first --row-limit records and extrapolated linearly.
+
+Usage:
+    python -m scripts.bench_nightly_detect                       # 10K and 100K deltas
+    python -m scripts.bench_nightly_detect --sizes 10000 --row-limit 10000  # full per-record run
+    python -m scripts.bench_nightly_detect --base 500000 --json
+
+Only ever touches the scratch database under --workdir (default: a temp dir).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+STATUSES = ["filed", "plancheck", "approved", "issued", "complete", "expired"]
+
+
+def _seed_db(path: str, base: int) -> None:
+    import src.db as db_mod
+
+    conn = db_mod.get_connection(path)
+    try:
+        db_mod.init_schema(conn)
+        db_mod.init_user_schema(conn)
+        conn.execute(
+            "INSERT INTO permits (permit_number, permit_type_definition, status, status_date, "
+            "street_number, street_name, neighborhood, block, lot) "
+            "SELECT 'P' || LPAD(CAST(i AS VARCHAR), 9, '0'), 'otc alterations permit', "
+            f"list_element({STATUSES!r}, CAST(i % {len(STATUSES)} AS INTEGER) + 1), "
+            "'2026-01-01', CAST(i % 999 AS VARCHAR), 'MARKET', 'SoMa', "
+            "LPAD(CAST(i % 9000 AS VARCHAR), 4, '0'), '001' "
+            f"FROM range({base}) t(i)"
+        )
+    finally:
+        conn.close()
+
+
+def _make_delta(size: int, base: int, seed: int) -> list[dict]:
+    """60% status changes, 20% unchanged, 20% new permits."""
+    rng = random.Random(seed)
+    delta = []
+    existing = rng.sample(range(base), min(base, int(size * 0.8)))
+    for n, i in enumerate(existing):
+        current = STATUSES[i % len(STATUSES)]
+        if n % 4 == 3:
+            status, status_date = current, "2026-01-01"
+        else:
+            status, status_date = STATUSES[(i + 1) % len(STATUSES)], "2026-03-01"
+        delta.append({"permit_number": f"P{i:09d}", "status": status, "status_date": status_date})
+    for j in range(size - len(existing)):
+        delta.append({
+            "permit_number": f"N{j:09d}", "status": "filed", "status_date": "2026-03-02",
+            "permit_type_definition": "sign - erect", "street_number": str(j % 999),
+            "street_name": "FOLSOM", "analysis_neighborhood": "SoMa",
+            "block": f"{j % 9000:04d}", "lot": "002", "estimated_cost": "15000",
+        })
+    rng.shuffle(delta)
+    return delta
+
+
+def _time_mode(mode: str, template: str, workdir: str, delta: list[dict],
+               limit: int | None = None) -> dict:
+    import src.db as db_mod
+    import scripts.nightly_changes as nc
+
+    path = os.path.join(workdir, f"run_{mode}_{len(delta)}.duckdb")
+    shutil.copyfile(template, path)
+    db_mod._DUCKDB_PATH = path
+    fn = nc.detect_changes_set_based if mode == "set" else nc.detect_changes
+    sample = delta[:limit] if limit else delta
+    t0 = time.perf_counter()
+    changes = fn(sample, source="bench")
+    elapsed = time.perf_counter() - t0
+    os.unlink(path)
+    result = {
+        "mode": mode,
+        "delta_rows": len(delta),
+        "changes": changes,
+        "seconds": round(elapsed * len(delta) / len(sample), 3),
+        "rows_per_sec": round(len(sample) / elapsed) if elapsed > 0 else 0,
+    }
+    if len(sample) < len(delta):
+        result["extrapolated_from"] = len(sample)
+    return result
+
+
+def run(args) -> list[dict]:
+    import src.db as db_mod
+    import scripts.nightly_changes as nc
+
+    os.environ.pop("DATABASE_URL", None)
+    db_mod.BACKEND = nc.BACKEND = "duckdb"
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_nightly_")
+    os.makedirs(workdir, exist_ok=True)
+    template = os.path.join(workdir, "template.duckdb")
+    print(f"Seeding {args.base:,} permits into {template} ...")
+    _seed_db(template, args.base)
+
+    results = []
+    for size in args.sizes:
+        delta = _make_delta(size, args.base, args.seed + size)
+        for mode in ("set", "row"):
+            limit = args.row_limit if mode == "row" and size > args.row_limit else None
+            res = _time_mode(mode, template, workdir, delta, limit)
+            results.append(res)
+            note = (f", extrapolated from {res['extrapolated_from']:,}"
+                    if "extrapolated_from" in res else f", {res['changes']:,} changes")
+            print(f"  {mode:>3} {size:>8,} rows: {res['seconds']:>9.2f}s "
+                  f"({res['rows_per_sec']:,} rows/s{note})")
+
+    by_size: dict[int, dict] = {}
+    for r in results:
+        by_size.setdefault(r["delta_rows"], {})[r["mode"]] = r
+    for size, modes in by_size.items():
+        if "row" in modes and "set" in modes:
+            if ("extrapolated_from" not in modes["row"]
+                    and modes["row"]["changes"] != modes["set"]["changes"]):
+                print(f"WARNING: change counts differ at {size:,} rows")
+            speedup = modes["row"]["seconds"] / max(modes["set"]["seconds"], 1e-9)
+            modes["set"]["speedup_vs_row"] = round(speedup, 1)
+            print(f"  {size:,} rows: set-based is {speedup:,.1f}x faster")
+
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly change detection benchmark")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[10_000, 100_000], help="Delta sizes, comma-separated")
+    parser.add_argument("--base", type=int, default=200_000, help="Seeded permits rows")
+    parser.add_argument("--row-limit", type=int, default=200,
+                        help="Records timed through the per-record path before extrapolating")
+    parser.add_argument("--workdir", help="Keep scratch databases here")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
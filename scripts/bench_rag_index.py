@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Recall/latency benchmark for RAG vector search backends.
+
+Compares, against exact brute-force ground truth:
+    local-exact   NumPy matrix-vector search (src/rag/local_index.py)
+    local-hnsw    hnswlib graph over the same vectors (if hnswlib is installed)
+    pgvector      IVFFlat index on knowledge_chunks (with --from-db)
+
+Queries are perturbed copies of corpus vectors, so no embedding API calls
+are needed and results are reproducible with --seed.
+
+Usage:
+    python -m scripts.bench_rag_index --synthetic 20000
+    python -m scripts.bench_rag_index --synthetic 50000 --dims 1536 --queries 200 --k 20
+    python -m scripts.bench_rag_index --from-db --probes 1,5,10     # needs DATABASE_URL
+    python -m scripts.bench_rag_index --synthetic 20000 --json
+
+Dependencies:
+    - numpy (required), hnswlib (optional), psycopg2 + pgvector (for --from-db)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _synthetic_corpus(n: int, dims: int, seed: int):
+    """Clustered unit vectors — closer to real embeddings than uniform noise."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(8, n // 200), dims)).astype(np.float32)
+    assign = rng.integers(0, centers.shape[0], size=n)
+    vecs = centers[assign] + 0.35 * rng.standard_normal((n, dims)).astype(np.float32)
+    tiers = ["official"] * n
+    for i in range(0, n, 10):
+        tiers[i] = "amy"
+    records = [
+        {"content": f"chunk {i}", "source_file": f"file-{i % 97}.json",
+         "source_section": f"s{i}", "source_tier": tiers[i], "trust_weight": 1.0,
+         "metadata": {}}
+        for i in range(n)
+    ]
+    return records, vecs, None
+
+
+def _db_corpus():
+    import numpy as np
+    from src.rag.local_index import iter_db_chunks
+    from src.rag.store import TABLE, _get_conn
+
+    records, vecs = [], []
+    for rec, emb in iter_db_chunks():
+        records.append(rec)
+        vecs.append(emb)
+    conn = _get_conn()
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SELECT id FROM {TABLE} WHERE embedding IS NOT NULL ORDER BY id")
+        row_ids = [r[0] for r in cur.fetchall()]
+    finally:
+        conn.close()
+    return records, np.asarray(vecs, dtype=np.float32), row_ids
+
+
+def _queries(vectors, count: int, seed: int):
+    import numpy as np
+
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.choice(vectors.shape[0], size=min(count, vectors.shape[0]), replace=False)
+    q = vectors[picks] + 0.1 * rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32)
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def _time_backend(name: str, fn, queries, truth: list[set], k: int) -> dict:
+    latencies, recalls = [], []
+    for q, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        got = fn(q)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        recalls.append(len(set(got[:k]) & expected) / max(1, len(expected)))
+    return {
+        "backend": name,
+        "queries": len(latencies),
+        "recall_at_k": round(statistics.mean(recalls), 4) if recalls else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "mean_ms": round(statistics.mean(latencies), 3) if latencies else 0.0,
+    }
+
+
+def run(args) -> list[dict]:
+    import numpy as np
+    from src.rag.local_index import LocalVectorIndex
+
+    if args.from_db:
+        records, vectors, row_ids = _db_corpus()
+    else:
+        records, vectors, row_ids = _synthetic_corpus(args.synthetic, args.dims, args.seed)
+    if not len(records):
+        print("No vectors to benchmark.")
+        return []
+
+    print(f"Corpus: {len(records)} vectors x {vectors.shape[1]} dims "
+          f"({'knowledge_chunks' if args.from_db else 'synthetic'})")
+
+    t0 = time.perf_counter()
+    exact = LocalVectorIndex.build(records, vectors)
+    print(f"Built exact index in {time.perf_counter() - t0:.2f}s")
+
+    queries = _queries(exact.vectors, args.queries, args.seed)
+    k = args.k
+
+    # Ground truth: full brute force, no argpartition shortcuts
+    sims = queries @ np.asarray(exact.vectors).T
+    truth = [set(np.argsort(-row, kind="stable")[:k].tolist()) for row in sims]
+    # Search results carry no row id; map back through (unique) content
+    content_rows = {r["content"]: i for i, r in enumerate(exact.records)}
+
+    def _rows(hits):
+        return [content_rows[h["content"]] for h in hits]
+
+    results = [_time_backend(
+        "local-exact", lambda q: _rows(exact.search(q, top_k=k, exact=True)), queries, truth, k,
+    )]
+
+    try:
+        import hnswlib  # noqa: F401
+        t0 = time.perf_counter()
+        approx = LocalVectorIndex.build(records, vectors, with_hnsw=True)
+        build_s = time.perf_counter() - t0
+        for ef in args.ef:
+            approx._hnsw.set_ef(max(ef, k))
+            res = _time_backend(f"local-hnsw ef={ef}",
+                                lambda q: _rows(approx.search(q, top_k=k)), queries, truth, k)
+            res["build_s"] = round(build_s, 2)
+            results.append(res)
+    except ImportError:
+        print("hnswlib not installed — skipping HNSW")
+
+    if args.from_db:
+        from src.rag.store import TABLE, _get_conn
+
+        id_to_row = {rid: i for i, rid in enumerate(row_ids)}
+        conn = _get_conn()
+        try:
+            cur = conn.cursor()
+            for probes in args.probes:
+                cur.execute(f"SET ivfflat.probes = {int(probes)}")
+
+                def _pg(q):
+                    cur.execute(
+                        f"SELECT id FROM {TABLE} ORDER BY embedding <=> %s LIMIT %s",
+                        (str(q.tolist()), k),
+                    )
+                    return [id_to_row[r[0]] for r in cur.fetchall() if r[0] in id_to_row]
+
+                results.append(_time_backend(f"pgvector ivfflat probes={probes}", _pg, queries, truth, k))
+        finally:
+            conn.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG vector index recall/latency benchmark")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--synthetic", type=int, default=20000, help="Synthetic corpus size")
+    src.add_argument("--from-db", action="store_true", help="Use knowledge_chunks (pgvector)")
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--ef", type=lambda s: [int(x) for x in s.split(",")], default=[32, 64, 128],
+                        help="HNSW ef values, comma-separated")
+    parser.add_argument("--probes", type=lambda s: [int(x) for x in s.split(",")], default=[1, 10],
+                        help="IVFFlat probes values, comma-separated")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n{'backend':<28} {'recall@' + str(args.k):>10} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    print("-" * 69)
+    for r in results:
+        print(f"{r['backend']:<28} {r['recall_at_k']:>10.3f} {r['p50_ms']:>9.2f} "
+              f"{r['p95_ms']:>9.2f} {r['mean_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
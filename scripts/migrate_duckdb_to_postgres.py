@@ -13,12 +13,25 @@ Or with explicit paths:
 
 Date-filtered (fits in 500MB Railway volume):
     python scripts/migrate_duckdb_to_postgres.py --since 2018-01-01
+
+Streaming mode (needs pyarrow: pip install .[migrate]):
+    python scripts/migrate_duckdb_to_postgres.py --stream --workers 4
+
+--stream reads each table from DuckDB in Arrow record batches and pipes them
+into Postgres COPY FROM STDIN, so no table is ever fully in memory.  Tables
+load in parallel worker processes (one fresh process per table), secondary
+indexes are dropped before the load and rebuilt at the end, and each table
+reports rows/sec and the worker's peak RSS.
 """
 
 import argparse
+import io
 import os
+import re
+import resource
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 import duckdb
@@ -28,6 +41,13 @@ from psycopg2.extras import execute_values
 # Default paths
 DEFAULT_DUCKDB = str(Path(__file__).parent.parent / "data" / "sf_permits.duckdb")
 BATCH_SIZE = 10_000
+STREAM_BATCH_ROWS = 50_000
+STREAM_WORKERS = 4
+
+_CREATE_INDEX_RE = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(\w+)",
+    re.IGNORECASE,
+)
 
 
 def get_pg_conn(database_url: str):
@@ -47,6 +67,50 @@ def create_schema(pg_conn):
     print("✅ Schema created")
 
 
+def split_schema(sql: str) -> tuple[list[str], dict[str, list[tuple[str, str]]]]:
+    """Split schema SQL into (other statements, {table: [(index, CREATE INDEX sql)]}).
+
+    The schema file has no function bodies, so splitting on ';' is safe.
+    """
+    statements, indexes = [], {}
+    for stmt in sql.split(";"):
+        lines = [l for l in stmt.strip().splitlines() if not l.strip().startswith("--")]
+        stmt = "\n".join(lines).strip()
+        if not stmt:
+            continue
+        m = _CREATE_INDEX_RE.match(stmt)
+        if m:
+            indexes.setdefault(m.group(2), []).append((m.group(1), stmt))
+        else:
+            statements.append(stmt)
+    return statements, indexes
+
+
+def create_schema_deferred(pg_conn, tables: list[str]) -> dict[str, list[tuple[str, str]]]:
+    """Create the schema without the secondary indexes on the tables being loaded.
+
+    Indexes on those tables are dropped (re-runs) and returned so
+    build_indexes() can create them after the data is in.  Primary keys
+    stay, so duplicate rows still fail the load.
+    """
+    schema_file = Path(__file__).parent / "postgres_schema.sql"
+    statements, indexes = split_schema(schema_file.read_text())
+    deferred = {t: indexes.get(t, []) for t in tables}
+    with pg_conn.cursor() as cur:
+        for stmt in statements:
+            cur.execute(stmt)
+        for table, table_indexes in indexes.items():
+            for name, stmt in table_indexes:
+                if table in deferred:
+                    cur.execute(f"DROP INDEX IF EXISTS {name}")
+                else:
+                    cur.execute(stmt)
+    pg_conn.commit()
+    n = sum(len(v) for v in deferred.values())
+    print(f"✅ Schema created ({n} indexes deferred until after the load)")
+    return deferred
+
+
 def migrate_table(duck_conn, pg_conn, table_name: str, select_sql: str,
                   insert_sql: str, columns: list[str]):
     """Migrate a single table from DuckDB to Postgres."""
@@ -85,6 +149,160 @@ def migrate_table(duck_conn, pg_conn, table_name: str, select_sql: str,
     return total
 
 
+class ArrowCsvStream(io.RawIOBase):
+    """Read-only file over an Arrow RecordBatchReader, rendered as CSV.
+
+    psycopg2's copy_expert() pulls from read(); each refill renders one more
+    record batch, so memory holds one batch and its CSV text at a time.
+    NULLs come out as unquoted empty fields and strings are always quoted,
+    which is how COPY ... (FORMAT csv) tells NULL from ''.
+    """
+
+    def __init__(self, reader):
+        import pyarrow.csv as pacsv
+
+        self._reader = reader
+        self._write_csv = pacsv.write_csv
+        self._options = pacsv.WriteOptions(include_header=False)
+        self._buf = b""
+        self._pos = 0
+        self.rows = 0
+        self.batches = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _refill(self) -> bool:
+        import pyarrow as pa
+
+        try:
+            batch = self._reader.read_next_batch()
+        except StopIteration:
+            return False
+        sink = pa.BufferOutputStream()
+        self._write_csv(batch, sink, write_options=self._options)
+        self._buf = self._buf[self._pos:] + sink.getvalue().to_pybytes()
+        self._pos = 0
+        self.rows += batch.num_rows
+        self.batches += 1
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            while self._refill():
+                pass
+            size = len(self._buf) - self._pos
+        while len(self._buf) - self._pos < size and self._refill():
+            pass
+        chunk = self._buf[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+
+def copy_table(duckdb_path: str, database_url: str, table_name: str, select_sql: str,
+               columns: list[str], batch_rows: int = STREAM_BATCH_ROWS) -> dict:
+    """Stream one table from DuckDB into Postgres with COPY FROM STDIN.
+
+    Runs in its own worker process with its own connections; the table must
+    already be empty.  Returns rows, seconds, rows/sec and the process's
+    peak RSS (MB) — the worker only ever loads this one table.
+    """
+    start = time.time()
+    duck_conn = duckdb.connect(duckdb_path, read_only=True)
+    pg_conn = get_pg_conn(database_url)
+    try:
+        reader = duck_conn.execute(select_sql).fetch_record_batch(batch_rows)
+        stream = ArrowCsvStream(reader)
+        with pg_conn.cursor() as cur:
+            cur.copy_expert(
+                f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                stream,
+                size=1 << 20,
+            )
+        pg_conn.commit()
+    finally:
+        pg_conn.close()
+        duck_conn.close()
+
+    elapsed = time.time() - start
+    return {
+        "table": table_name,
+        "rows": stream.rows,
+        "seconds": round(elapsed, 1),
+        "rows_per_sec": round(stream.rows / elapsed) if elapsed > 0 else 0,
+        # ru_maxrss is KB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def build_indexes(database_url: str, table_name: str, indexes: list[tuple[str, str]]) -> dict:
+    """Create a table's deferred indexes, then ANALYZE it."""
+    start = time.time()
+    pg_conn = get_pg_conn(database_url)
+    try:
+        with pg_conn.cursor() as cur:
+            for _, stmt in indexes:
+                cur.execute(stmt)
+            cur.execute(f"ANALYZE {table_name}")
+        pg_conn.commit()
+    finally:
+        pg_conn.close()
+    return {"table": table_name, "indexes": len(indexes), "seconds": round(time.time() - start, 1)}
+
+
+def migrate_streaming(duckdb_path: str, database_url: str, pg_conn,
+                      specs: list[tuple[str, str, list[str]]],
+                      workers: int = STREAM_WORKERS,
+                      batch_rows: int = STREAM_BATCH_ROWS) -> list[dict]:
+    """Migrate specs with streaming COPY, tables in parallel, indexes last.
+
+    Returns copy_table()'s stats per table, in specs order.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("❌ --stream needs pyarrow: pip install .[migrate]")
+        sys.exit(1)
+
+    tables = [t for t, _, _ in specs]
+    deferred = create_schema_deferred(pg_conn, tables)
+
+    # Truncate up front: a per-worker TRUNCATE ... CASCADE could empty a
+    # table another worker is loading.
+    with pg_conn.cursor() as cur:
+        cur.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+    pg_conn.commit()
+
+    print(f"\n📦 Streaming {len(specs)} tables with COPY ({workers} workers, "
+          f"{batch_rows:,}-row batches)...")
+    stats = {}
+    # One fresh process per table keeps each table's peak RSS separate
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(copy_table, duckdb_path, database_url, table, sql, columns, batch_rows): table
+            for table, sql, columns in specs
+        }
+        for future in as_completed(futures):
+            s = future.result()
+            stats[s["table"]] = s
+            print(f"  ✅ {s['table']}: {s['rows']:,} rows in {s['seconds']:.1f}s "
+                  f"({s['rows_per_sec']:,} rows/s, peak {s['peak_rss_mb']:,.0f} MB)")
+
+    print("\n🗂️ Building deferred indexes...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_indexes, database_url, t, deferred[t]) for t in tables]
+        for future in as_completed(futures):
+            s = future.result()
+            print(f"  ✅ {s['table']}: {s['indexes']} indexes + ANALYZE in {s['seconds']:.1f}s")
+
+    results = [stats[t] for t in tables]
+    print(f"\n  {'table':<16} {'rows':>12} {'seconds':>9} {'rows/s':>10} {'peak MB':>9}")
+    for s in results:
+        print(f"  {s['table']:<16} {s['rows']:>12,} {s['seconds']:>9.1f} "
+              f"{s['rows_per_sec']:>10,} {s['peak_rss_mb']:>9,.0f}")
+    return results
+
+
 def verify_counts(duck_conn, pg_conn, tables: list[str]):
     """Verify row counts match between DuckDB and Postgres."""
     print("\n📊 Verification:")
@@ -111,49 +329,13 @@ def verify_pg_counts(pg_conn, tables: list[str]):
         print(f"  {table}: {count:,}")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Migrate DuckDB to PostgreSQL")
-    parser.add_argument("--duckdb", default=DEFAULT_DUCKDB, help="Path to DuckDB file")
-    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
-                        help="PostgreSQL connection URL")
-    parser.add_argument("--schema-only", action="store_true",
-                        help="Only create schema, don't migrate data")
-    parser.add_argument("--since", default=None,
-                        help="Only migrate data from this date forward (YYYY-MM-DD). "
-                             "Useful for fitting in smaller volumes (e.g., --since 2018-01-01 for 500MB).")
-    args = parser.parse_args()
-
-    if not args.database_url:
-        print("❌ Set DATABASE_URL or pass --database-url")
-        sys.exit(1)
-
-    if not Path(args.duckdb).exists():
-        print(f"❌ DuckDB file not found: {args.duckdb}")
-        sys.exit(1)
-
-    print(f"DuckDB: {args.duckdb}")
-    print(f"Postgres: {args.database_url.split('@')[1] if '@' in args.database_url else '(local)'}")
-    if args.since:
-        print(f"Date filter: >= {args.since}")
-    print()
-
-    duck_conn = duckdb.connect(args.duckdb, read_only=True)
-    pg_conn = get_pg_conn(args.database_url)
-
-    # Step 1: Create schema
-    create_schema(pg_conn)
+def table_specs(since: str | None = None) -> list[tuple[str, str, list[str]]]:
+    """(table, select_sql, columns) for each migrated table, in migration order.
 
-    if args.schema_only:
-        print("\n🏗️ Schema-only mode — skipping data migration")
-        duck_conn.close()
-        pg_conn.close()
-        return
-
-    # Build date filter clauses
-    since = args.since  # e.g. "2018-01-01"
-
-    # Step 2: Migrate each table
-    print("\n📦 Migrating data...")
+    since (YYYY-MM-DD) limits permit-linked tables to permits filed on or
+    after that date.
+    """
+    specs = []
 
     # --- permits ---
     PERMITS_COLS = [
@@ -167,12 +349,11 @@ def main():
     permits_where = ""
     if since:
         permits_where = f" WHERE filed_date IS NOT NULL AND filed_date::DATE >= '{since}'"
-    migrate_table(
-        duck_conn, pg_conn, "permits",
+    specs.append((
+        "permits",
         f"SELECT {', '.join(PERMITS_COLS)} FROM permits{permits_where}",
-        None,  # handled inline
         PERMITS_COLS,
-    )
+    ))
 
     # --- contacts (join to filtered permits if --since) ---
     CONTACTS_COLS = [
@@ -192,12 +373,11 @@ def main():
         """
     else:
         contacts_sql = f"SELECT {', '.join(CONTACTS_COLS)} FROM contacts"
-    migrate_table(
-        duck_conn, pg_conn, "contacts",
+    specs.append((
+        "contacts",
         contacts_sql,
-        None,
         CONTACTS_COLS,
-    )
+    ))
 
     # --- entities (all entities referenced by filtered contacts, or all) ---
     ENTITIES_COLS = [
@@ -221,12 +401,11 @@ def main():
         """
     else:
         entities_sql = f"SELECT {', '.join(ENTITIES_COLS)} FROM entities"
-    migrate_table(
-        duck_conn, pg_conn, "entities",
+    specs.append((
+        "entities",
         entities_sql,
-        None,
         ENTITIES_COLS,
-    )
+    ))
 
     # --- relationships (between filtered entities, or all) ---
     REL_COLS = [
@@ -250,12 +429,11 @@ def main():
         """
     else:
         rel_sql = f"SELECT {', '.join(REL_COLS)} FROM relationships"
-    migrate_table(
-        duck_conn, pg_conn, "relationships",
+    specs.append((
+        "relationships",
         rel_sql,
-        None,
         REL_COLS,
-    )
+    ))
 
     # --- inspections ---
     INSPECTIONS_COLS = [
@@ -267,24 +445,22 @@ def main():
     insp_where = ""
     if since:
         insp_where = f" WHERE scheduled_date IS NOT NULL AND scheduled_date::DATE >= '{since}'"
-    migrate_table(
-        duck_conn, pg_conn, "inspections",
+    specs.append((
+        "inspections",
         f"SELECT {', '.join(INSPECTIONS_COLS)} FROM inspections{insp_where}",
-        None,
         INSPECTIONS_COLS,
-    )
+    ))
 
     # --- ingest_log (always all) ---
     INGEST_COLS = [
         "dataset_id", "dataset_name", "last_fetched",
         "records_fetched", "last_record_count",
     ]
-    migrate_table(
-        duck_conn, pg_conn, "ingest_log",
+    specs.append((
+        "ingest_log",
         f"SELECT {', '.join(INGEST_COLS)} FROM ingest_log",
-        None,
         INGEST_COLS,
-    )
+    ))
 
     # --- timeline_stats ---
     TS_COLS = [
@@ -296,18 +472,76 @@ def main():
     ts_where = ""
     if since:
         ts_where = f" WHERE filed >= '{since}'"
-    migrate_table(
-        duck_conn, pg_conn, "timeline_stats",
+    specs.append((
+        "timeline_stats",
         f"SELECT {', '.join(TS_COLS)} FROM timeline_stats{ts_where}",
-        None,
         TS_COLS,
-    )
+    ))
+
+    return specs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate DuckDB to PostgreSQL")
+    parser.add_argument("--duckdb", default=DEFAULT_DUCKDB, help="Path to DuckDB file")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="PostgreSQL connection URL")
+    parser.add_argument("--schema-only", action="store_true",
+                        help="Only create schema, don't migrate data")
+    parser.add_argument("--since", default=None,
+                        help="Only migrate data from this date forward (YYYY-MM-DD). "
+                             "Useful for fitting in smaller volumes (e.g., --since 2018-01-01 for 500MB).")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream Arrow batches into COPY FROM STDIN, tables in parallel, "
+                             "indexes built after the load (needs pyarrow)")
+    parser.add_argument("--workers", type=int, default=STREAM_WORKERS,
+                        help="Tables loaded in parallel with --stream")
+    parser.add_argument("--batch-rows", type=int, default=STREAM_BATCH_ROWS,
+                        help="Rows per Arrow record batch with --stream")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("❌ Set DATABASE_URL or pass --database-url")
+        sys.exit(1)
+
+    if not Path(args.duckdb).exists():
+        print(f"❌ DuckDB file not found: {args.duckdb}")
+        sys.exit(1)
+
+    print(f"DuckDB: {args.duckdb}")
+    print(f"Postgres: {args.database_url.split('@')[1] if '@' in args.database_url else '(local)'}")
+    if args.since:
+        print(f"Date filter: >= {args.since}")
+    print()
+
+    duck_conn = duckdb.connect(args.duckdb, read_only=True)
+    pg_conn = get_pg_conn(args.database_url)
+
+    specs = table_specs(args.since)
+
+    # Step 1: Create schema (--stream creates it itself, minus the indexes)
+    if args.schema_only or not args.stream:
+        create_schema(pg_conn)
+
+    if args.schema_only:
+        print("\n🏗️ Schema-only mode — skipping data migration")
+        duck_conn.close()
+        pg_conn.close()
+        return
+
+    # Step 2: Migrate each table
+    if args.stream:
+        migrate_streaming(args.duckdb, args.database_url, pg_conn, specs,
+                          workers=args.workers, batch_rows=args.batch_rows)
+    else:
+        print("\n📦 Migrating data...")
+        for table_name, select_sql, columns in specs:
+            migrate_table(duck_conn, pg_conn, table_name, select_sql, None, columns)
 
     # Step 3: Verify
-    tables = ["permits", "contacts", "entities", "relationships",
-              "inspections", "ingest_log", "timeline_stats"]
+    tables = [table_name for table_name, _, _ in specs]
 
-    if since:
+    if args.since:
         # Can't compare exact counts with date filter, just show what we loaded
         verify_pg_counts(pg_conn, tables)
         # Check DB size
@@ -315,7 +549,7 @@ def main():
             cur.execute("SELECT pg_size_pretty(pg_database_size('railway'))")
             db_size = cur.fetchone()[0]
         print(f"\n📦 Total Postgres DB size: {db_size}")
-        print(f"\n🎉 Migration complete! (filtered: >= {since})")
+        print(f"\n🎉 Migration complete! (filtered: >= {args.since})")
     else:
         all_ok = verify_counts(duck_conn, pg_conn, tables)
         if all_ok:
@@ -13,15 +13,22 @@ Usage:
     python -m scripts.nightly_changes                  # Normal run
     python -m scripts.nightly_changes --lookback 3     # Check last 3 days
     python -m scripts.nightly_changes --dry-run        # Preview only
+
+Change detection is set-based by default (delta staged into a temp table,
+one join per source, one transaction); NIGHTLY_DETECT_MODE=row restores the
+per-record path.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import csv
 import logging
 import os
 import sys
+import tempfile
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -782,7 +789,7 @@ import time as _time
 
 MAX_FETCH_RETRIES = 3
 RETRY_BASE_DELAY_S = 2.0  # seconds — doubles on each retry (exponential backoff)
-STEP_TIMEOUT_S = 300       # 5-minute timeout per pipeline step (informational)
+STEP_TIMEOUT_S = 300       # 5-minute timeout per source fetch (enforced in run_nightly)
 PIPELINE_TIMEOUT_S = 480   # 8-minute hard timeout on all SODA fetches combined
 
 
@@ -863,6 +870,67 @@ async def fetch_with_retry(
     }
 
 
+# ── Concurrent fetch stage helpers ────────────────────────────────
+# run_nightly runs each SODA source as its own fetch → detect pipeline.
+# Every step entry in step_results carries started_s / finished_s offsets
+# from the start of the run, so the result doubles as a timeline.
+
+DEFAULT_SODA_CONCURRENCY = 4   # in-flight SODA requests across all sources
+DETECT_CONCURRENCY = 3         # parallel DB detect steps on Postgres (DuckDB: 1)
+
+
+def _soda_concurrency() -> int:
+    """Global SODA request limit for the nightly run (NIGHTLY_SODA_CONCURRENCY)."""
+    try:
+        return max(1, int(os.environ.get("NIGHTLY_SODA_CONCURRENCY", DEFAULT_SODA_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_SODA_CONCURRENCY
+
+
+def _stamp(info: dict, origin: float, started: float) -> dict:
+    """Add timeline offsets (seconds since run start) to a step_results entry."""
+    info["started_s"] = round(started - origin, 2)
+    info["finished_s"] = round(_time.monotonic() - origin, 2)
+    return info
+
+
+async def _fetch_source(name: str, fetch, origin: float,
+                        timeout: float | None = None) -> tuple[list[dict], dict]:
+    """fetch_with_retry under a hard per-source timeout. Never raises."""
+    timeout = STEP_TIMEOUT_S if timeout is None else timeout
+    started = _time.monotonic()
+    try:
+        records, info = await asyncio.wait_for(
+            fetch_with_retry(fetch, step_name=name), timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("%s fetch timed out after %ds (non-fatal)", name, timeout)
+        records, info = [], {
+            "step": name, "ok": False, "timed_out": True,
+            "elapsed_s": round(_time.monotonic() - started, 2),
+            "error": f"timed out after {timeout}s",
+        }
+    except Exception as e:
+        logger.warning("%s fetch step failed (non-fatal): %s", name, e)
+        records, info = [], {"step": name, "ok": False, "error": str(e)}
+    return records, _stamp(info, origin, started)
+
+
+async def _process_source(name: str, fn, records: list[dict], origin: float,
+                          gate: asyncio.Semaphore) -> tuple[int, dict]:
+    """Run a sync detect/upsert step in a worker thread. Never raises."""
+    async with gate:
+        started = _time.monotonic()
+        try:
+            count = await asyncio.to_thread(fn, records)
+            info = {"step": name, "ok": True, "count": count}
+        except Exception as e:
+            logger.warning("%s failed (non-fatal): %s", name, e)
+            count, info = 0, {"step": name, "ok": False, "error": str(e)}
+        info["elapsed_s"] = round(_time.monotonic() - started, 2)
+    return count, _stamp(info, origin, started)
+
+
 def sweep_stuck_cron_jobs(stuck_threshold_minutes: int = 15) -> int:
     """Mark cron jobs stuck in 'running' state as 'failed'.
 
@@ -1366,6 +1434,551 @@ def detect_development_pipeline_changes(soda_records: list[dict], dry_run: bool
     return inserted
 
 
+# ── Set-based change detection ───────────────────────────────────
+# The detect_* functions above are row-at-a-time: one lookup plus one or
+# two writes per SODA record, each on its own pool checkout. The set-based
+# path below bulk-loads the delta into a temp staging table, finds new and
+# changed rows with a single join, and writes the change rows plus the
+# local table updates in one transaction. run_nightly uses it unless
+# NIGHTLY_DETECT_MODE=row.
+
+_STAGE_TABLE = "nightly_stage"
+_STAGE_PAGE_SIZE = 5000   # rows per execute_values page (Postgres)
+_CSV_NULL = "\\N"
+_DRY_RUN_LOG_LIMIT = 50
+
+
+def use_set_based_detection() -> bool:
+    """True unless NIGHTLY_DETECT_MODE=row (the legacy per-record path)."""
+    return os.environ.get("NIGHTLY_DETECT_MODE", "set").strip().lower() != "row"
+
+
+class _BulkSession:
+    """One connection and one transaction for a set-based detection pass."""
+
+    def __init__(self):
+        self.conn = get_connection()
+        self.pg = BACKEND == "postgres"
+        self._cur = self.conn.cursor() if self.pg else self.conn
+        if not self.pg:
+            self.conn.execute("BEGIN TRANSACTION")
+
+    def execute(self, sql: str, params=None):
+        if not self.pg:
+            sql = sql.replace("%s", "?")
+        if params is None:
+            self._cur.execute(sql)
+        else:
+            self._cur.execute(sql, params)
+
+    def fetchall(self, sql: str, params=None) -> list:
+        self.execute(sql, params)
+        return self._cur.fetchall()
+
+    def scalar(self, sql: str, params=None):
+        rows = self.fetchall(sql, params)
+        return rows[0][0] if rows else None
+
+    def stage(self, columns: list[tuple[str, str]], rows: list[tuple]) -> None:
+        """Create the temp staging table and bulk-load ``rows`` into it.
+
+        ``columns`` are (name, type) pairs with type TEXT, INTEGER or DOUBLE.
+        """
+        def _sql_type(t):
+            return "DOUBLE PRECISION" if (self.pg and t == "DOUBLE") else t
+
+        col_defs = ", ".join(f"{name} {_sql_type(t)}" for name, t in columns)
+        names = ", ".join(name for name, _ in columns)
+        self.execute(f"DROP TABLE IF EXISTS {_STAGE_TABLE}")
+        self.execute(f"CREATE TEMP TABLE {_STAGE_TABLE} ({col_defs})")
+        if not rows:
+            return
+        if self.pg:
+            from psycopg2.extras import execute_values
+            execute_values(
+                self._cur, f"INSERT INTO {_STAGE_TABLE} ({names}) VALUES %s",
+                rows, page_size=_STAGE_PAGE_SIZE,
+            )
+            return
+        # DuckDB executemany is row-at-a-time; a CSV scan of the same rows
+        # loads 100K records in well under a second.
+        fd, path = tempfile.mkstemp(prefix="nightly_stage_", suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                writer = csv.writer(f)
+                for row in rows:
+                    writer.writerow([_CSV_NULL if v is None else v for v in row])
+            types = ", ".join(f"'{name}': '{t}'" for name, t in columns)
+            self.conn.execute(
+                f"INSERT INTO {_STAGE_TABLE} SELECT * FROM read_csv(?, header=false, "
+                f"nullstr='\\N', quote='\"', escape='\"', columns={{{types}}})",
+                [path],
+            )
+        finally:
+            os.unlink(path)
+
+    def next_id(self, table: str, column: str) -> int:
+        """Base for manual ids (DuckDB tables have no sequences)."""
+        return self.scalar(f"SELECT COALESCE(MAX({column}), 0) FROM {table}") or 0
+
+
+@contextmanager
+def _bulk_session():
+    """Yield a _BulkSession; commit on success, roll back on error."""
+    session = _BulkSession()
+    try:
+        yield session
+        session.execute(f"DROP TABLE IF EXISTS {_STAGE_TABLE}")
+        session.conn.commit()
+    except Exception:
+        try:
+            session.conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        session.conn.close()
+
+
+def _first_per_key(rows: list[tuple], key_index: int = 1) -> list[tuple]:
+    """Keep the first staged row per key.
+
+    SODA returns deltas newest-first, so the first occurrence is the current
+    state; later duplicates would otherwise flip the status back.
+    """
+    seen: set = set()
+    out = []
+    for row in rows:
+        key = row[key_index]
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(row)
+    return out
+
+
+def _log_dry_run(label: str, rows: list[tuple]) -> None:
+    for key, old, new, extra in rows[:_DRY_RUN_LOG_LIMIT]:
+        action = "NEW" if old is None else f"{old} -> {new}"
+        logger.info("  %s%s: %s (%s)", label, key, action, extra)
+    if len(rows) > _DRY_RUN_LOG_LIMIT:
+        logger.info("  ... and %d more", len(rows) - _DRY_RUN_LOG_LIMIT)
+
+
+_PERMIT_STAGE_COLUMNS = [
+    ("seq", "INTEGER"), ("permit_number", "TEXT"),
+    ("permit_type", "TEXT"), ("permit_type_definition", "TEXT"),
+    ("status", "TEXT"), ("status_date", "TEXT"), ("description", "TEXT"),
+    ("filed_date", "TEXT"), ("issued_date", "TEXT"), ("approved_date", "TEXT"),
+    ("completed_date", "TEXT"), ("estimated_cost", "DOUBLE"), ("revised_cost", "DOUBLE"),
+    ("existing_use", "TEXT"), ("proposed_use", "TEXT"),
+    ("existing_units", "INTEGER"), ("proposed_units", "INTEGER"),
+    ("street_number", "TEXT"), ("street_name", "TEXT"), ("street_suffix", "TEXT"),
+    ("zipcode", "TEXT"), ("neighborhood", "TEXT"), ("supervisor_district", "TEXT"),
+    ("block", "TEXT"), ("lot", "TEXT"), ("adu", "TEXT"), ("data_as_of", "TEXT"),
+    ("change_street_name", "TEXT"),
+]
+
+
+def _stage_permit_row(seq: int, record: dict) -> tuple:
+    return (
+        seq,
+        record.get("permit_number"),
+        record.get("permit_type"),
+        record.get("permit_type_definition"),
+        record.get("status", ""),
+        record.get("status_date", ""),
+        record.get("description"),
+        record.get("filed_date"),
+        record.get("issued_date"),
+        record.get("approved_date"),
+        record.get("completed_date"),
+        _parse_float(record.get("estimated_cost")),
+        _parse_float(record.get("revised_cost")),
+        record.get("existing_use"),
+        record.get("proposed_use"),
+        _parse_int(record.get("existing_units")),
+        _parse_int(record.get("proposed_units")),
+        record.get("street_number"),
+        record.get("street_name"),
+        record.get("street_suffix"),
+        record.get("zipcode"),
+        (record.get("analysis_neighborhood")
+         or record.get("neighborhoods_analysis_boundaries")
+         or record.get("neighborhood", "")),
+        record.get("supervisor_district"),
+        record.get("block"),
+        record.get("lot"),
+        record.get("adu"),
+        record.get("data_as_of"),
+        record.get("avs_street_name") or record.get("street_name", ""),
+    )
+
+
+def detect_changes_set_based(soda_records: list[dict], dry_run: bool = False,
+                             source: str = "nightly") -> int:
+    """Set-based detect_changes(): stage, join, and write in one transaction.
+
+    Same permit_changes rows and permits updates as detect_changes(), but
+    one staging load and four statements regardless of delta size.
+    """
+    if BACKEND == "duckdb":
+        init_user_schema()
+
+    rows = _first_per_key([
+        _stage_permit_row(seq, r) for seq, r in enumerate(soda_records)
+        if r.get("permit_number")
+    ])
+    if not rows:
+        return 0
+
+    # New permits take their denormalized fields from SODA, existing ones
+    # from our row — same as the per-record path.
+    diff_from = (
+        f"FROM {_STAGE_TABLE} s LEFT JOIN permits p ON p.permit_number = s.permit_number "
+        "WHERE p.permit_number IS NULL "
+        "OR p.status IS DISTINCT FROM s.status "
+        "OR p.status_date IS DISTINCT FROM s.status_date"
+    )
+    diff_select = (
+        "s.permit_number, %s, p.status, s.status, p.status_date, s.status_date, "
+        "CASE WHEN p.permit_number IS NULL THEN 'new_permit' ELSE 'status_change' END, "
+        "p.permit_number IS NULL, %s, "
+        "CASE WHEN p.permit_number IS NULL THEN COALESCE(s.permit_type_definition, '') "
+        "     ELSE p.permit_type_definition END, "
+        "CASE WHEN p.permit_number IS NULL THEN COALESCE(s.street_number, '') "
+        "     ELSE p.street_number END, "
+        "CASE WHEN p.permit_number IS NULL THEN s.change_street_name ELSE p.street_name END, "
+        "CASE WHEN p.permit_number IS NULL THEN s.neighborhood ELSE p.neighborhood END, "
+        "CASE WHEN p.permit_number IS NULL THEN COALESCE(s.block, '') ELSE p.block END, "
+        "CASE WHEN p.permit_number IS NULL THEN COALESCE(s.lot, '') ELSE p.lot END"
+    )
+    change_cols = (
+        "permit_number, change_date, old_status, new_status, "
+        "old_status_date, new_status_date, change_type, is_new_permit, "
+        "source, permit_type, street_number, street_name, neighborhood, block, lot"
+    )
+    permit_cols = [name for name, _ in _PERMIT_STAGE_COLUMNS[1:-1]]
+    today = date.today()
+
+    with _bulk_session() as db:
+        db.stage(_PERMIT_STAGE_COLUMNS, rows)
+
+        if dry_run:
+            preview = db.fetchall(
+                f"SELECT s.permit_number, p.status, s.status, s.status_date {diff_from} "
+                "ORDER BY s.seq"
+            )
+            _log_dry_run("", preview)
+            return len(preview)
+
+        changed = db.scalar(f"SELECT COUNT(*) {diff_from}") or 0
+        if not changed:
+            return 0
+
+        if db.pg:
+            db.execute(
+                f"INSERT INTO permit_changes ({change_cols}) "
+                f"SELECT {diff_select} {diff_from}",
+                (today, source),
+            )
+        else:
+            base = db.next_id("permit_changes", "change_id")
+            db.execute(
+                f"INSERT INTO permit_changes (change_id, {change_cols}) "
+                f"SELECT {base} + ROW_NUMBER() OVER (ORDER BY s.seq), {diff_select} {diff_from}",
+                (today, source),
+            )
+
+        db.execute(
+            f"UPDATE permits SET status = s.status, status_date = s.status_date "
+            f"FROM {_STAGE_TABLE} s "
+            "WHERE permits.permit_number = s.permit_number "
+            "AND (permits.status IS DISTINCT FROM s.status "
+            "     OR permits.status_date IS DISTINCT FROM s.status_date)"
+        )
+        db.execute(
+            f"INSERT INTO permits ({', '.join(permit_cols)}) "
+            f"SELECT {', '.join('s.' + c for c in permit_cols)} "
+            f"FROM {_STAGE_TABLE} s "
+            "WHERE NOT EXISTS (SELECT 1 FROM permits p WHERE p.permit_number = s.permit_number)"
+        )
+
+    logger.info("Set-based permit detection: %d changes from %d staged records",
+                changed, len(rows))
+    return changed
+
+
+_ADDENDA_STAGE_COLUMNS = [
+    ("seq", "INTEGER"), ("primary_key", "TEXT"), ("application_number", "TEXT"),
+    ("addenda_number", "INTEGER"), ("step", "INTEGER"), ("station", "TEXT"),
+    ("arrive", "TEXT"), ("assign_date", "TEXT"), ("start_date", "TEXT"),
+    ("finish_date", "TEXT"), ("approved_date", "TEXT"), ("plan_checked_by", "TEXT"),
+    ("review_results", "TEXT"), ("hold_description", "TEXT"), ("addenda_status", "TEXT"),
+    ("department", "TEXT"), ("title", "TEXT"), ("data_as_of", "TEXT"),
+]
+
+
+def detect_addenda_changes_set_based(soda_records: list[dict], dry_run: bool = False,
+                                     source: str = "nightly") -> int:
+    """Set-based detect_addenda_changes(): one join against addenda + permits.
+
+    New addenda rows get explicit ids (MAX(id) + n) on both backends, since
+    the addenda table has no id default.
+    """
+    from src.ingest import _normalize_addenda
+
+    staged = []
+    for seq, record in enumerate(soda_records):
+        if not record.get("application_number") or not record.get("primary_key"):
+            continue
+        staged.append((seq,) + _normalize_addenda(record, 0)[1:])
+    rows = _first_per_key(staged)
+    if not rows:
+        return 0
+
+    diff_from = (
+        f"FROM {_STAGE_TABLE} s "
+        "LEFT JOIN (SELECT primary_key, MAX(review_results) AS review_results, "
+        "                  MAX(finish_date) AS finish_date "
+        f"           FROM addenda WHERE primary_key IN (SELECT primary_key FROM {_STAGE_TABLE}) "
+        "           GROUP BY primary_key) a ON a.primary_key = s.primary_key "
+        "LEFT JOIN permits p ON p.permit_number = s.application_number "
+        "WHERE a.primary_key IS NULL "
+        "OR a.review_results IS DISTINCT FROM s.review_results "
+        "OR a.finish_date IS DISTINCT FROM s.finish_date"
+    )
+    change_type = (
+        "CASE WHEN a.primary_key IS NULL THEN 'new_routing' "
+        "     WHEN s.review_results IS NOT NULL AND COALESCE(a.review_results, '') = '' "
+        "          THEN 'review_completed' "
+        "     WHEN s.review_results IS DISTINCT FROM a.review_results THEN 'review_updated' "
+        "     ELSE 'routing_updated' END"
+    )
+    diff_select = (
+        "s.application_number, %s, s.station, s.addenda_number, s.step, "
+        "s.plan_checked_by, a.review_results, s.review_results, s.hold_description, "
+        f"s.finish_date, {change_type}, %s, s.department, "
+        "p.permit_type_definition, p.street_number, p.street_name, p.neighborhood, p.block, p.lot"
+    )
+    change_cols = (
+        "application_number, change_date, station, addenda_number, step, "
+        "plan_checked_by, old_review_results, new_review_results, "
+        "hold_description, finish_date, change_type, source, department, "
+        "permit_type, street_number, street_name, neighborhood, block, lot"
+    )
+    addenda_cols = [name for name, _ in _ADDENDA_STAGE_COLUMNS[1:]]
+
+    with _bulk_session() as db:
+        db.stage(_ADDENDA_STAGE_COLUMNS, rows)
+
+        if dry_run:
+            preview = db.fetchall(
+                f"SELECT s.application_number, {change_type}, s.station, s.review_results "
+                f"{diff_from} ORDER BY s.seq"
+            )
+            for app_num, ctype, station, results in preview[:_DRY_RUN_LOG_LIMIT]:
+                logger.info("  %s: %s at %s (%s)", app_num, ctype, station, results)
+            if len(preview) > _DRY_RUN_LOG_LIMIT:
+                logger.info("  ... and %d more", len(preview) - _DRY_RUN_LOG_LIMIT)
+            return len(preview)
+
+        changed = db.scalar(f"SELECT COUNT(*) {diff_from}") or 0
+        if not changed:
+            return 0
+
+        if db.pg:
+            db.execute(
+                f"INSERT INTO addenda_changes ({change_cols}) SELECT {diff_select} {diff_from}",
+                (date.today(), source),
+            )
+        else:
+            base = db.next_id("addenda_changes", "change_id")
+            db.execute(
+                f"INSERT INTO addenda_changes (change_id, {change_cols}) "
+                f"SELECT {base} + ROW_NUMBER() OVER (ORDER BY s.seq), {diff_select} {diff_from}",
+                (date.today(), source),
+            )
+
+        db.execute(
+            "UPDATE addenda SET review_results = s.review_results, "
+            "finish_date = s.finish_date, plan_checked_by = s.plan_checked_by, "
+            "hold_description = s.hold_description, addenda_status = s.addenda_status, "
+            f"data_as_of = s.data_as_of FROM {_STAGE_TABLE} s "
+            "WHERE addenda.primary_key = s.primary_key "
+            "AND (addenda.review_results IS DISTINCT FROM s.review_results "
+            "     OR addenda.finish_date IS DISTINCT FROM s.finish_date)"
+        )
+        base = db.next_id("addenda", "id")
+        db.execute(
+            f"INSERT INTO addenda (id, {', '.join(addenda_cols)}) "
+            f"SELECT {base} + ROW_NUMBER() OVER (ORDER BY s.seq), "
+            f"{', '.join('s.' + c for c in addenda_cols)} FROM {_STAGE_TABLE} s "
+            "WHERE NOT EXISTS (SELECT 1 FROM addenda a WHERE a.primary_key = s.primary_key)"
+        )
+
+    logger.info("Set-based addenda detection: %d changes from %d staged records",
+                changed, len(rows))
+    return changed
+
+
+_STATUS_STAGE_COLUMNS = [
+    ("seq", "INTEGER"), ("record_key", "TEXT"), ("new_status", "TEXT"),
+    ("new_status_date", "TEXT"), ("permit_type", "TEXT"), ("street_name", "TEXT"),
+    ("neighborhood", "TEXT"), ("block", "TEXT"), ("lot", "TEXT"),
+]
+
+
+def _detect_status_changes_set_based(rows: list[tuple], *, table: str, key_column: str,
+                                     status_column: str, change_type: str, label: str,
+                                     dry_run: bool, source: str) -> int:
+    """Shared set-based path for sources that only append to permit_changes.
+
+    ``rows`` match _STATUS_STAGE_COLUMNS. If ``table`` is missing every
+    record counts as new, like the per-record lookups that swallow errors.
+    """
+    rows = _first_per_key(rows)
+    if not rows:
+        return 0
+
+    try:
+        query(f"SELECT 1 FROM {table} LIMIT 1")
+        current = (
+            f"(SELECT {key_column} AS record_key, MAX({status_column}) AS status "
+            f" FROM {table} WHERE {key_column} IN (SELECT record_key FROM {_STAGE_TABLE}) "
+            f" GROUP BY {key_column})"
+        )
+    except Exception:
+        current = "(SELECT CAST(NULL AS TEXT) AS record_key, CAST(NULL AS TEXT) AS status WHERE 1 = 0)"
+
+    diff_from = (
+        f"FROM {_STAGE_TABLE} s LEFT JOIN {current} t ON t.record_key = s.record_key "
+        "WHERE t.record_key IS NULL OR t.status IS DISTINCT FROM s.new_status"
+    )
+    diff_select = (
+        "s.record_key, %s, t.status, s.new_status, NULL, s.new_status_date, "
+        "%s, t.record_key IS NULL, %s, s.permit_type, s.street_name, s.neighborhood, "
+        "s.block, s.lot"
+    )
+    change_cols = (
+        "permit_number, change_date, old_status, new_status, "
+        "old_status_date, new_status_date, change_type, is_new_permit, "
+        "source, permit_type, street_name, neighborhood, block, lot"
+    )
+
+    with _bulk_session() as db:
+        db.stage(_STATUS_STAGE_COLUMNS, rows)
+
+        if dry_run:
+            preview = db.fetchall(
+                f"SELECT s.record_key, t.status, s.new_status, s.permit_type {diff_from} "
+                "ORDER BY s.seq"
+            )
+            _log_dry_run(f"{label} ", preview)
+            return len(preview)
+
+        changed = db.scalar(f"SELECT COUNT(*) {diff_from}") or 0
+        if not changed:
+            return 0
+        if db.pg:
+            db.execute(
+                f"INSERT INTO permit_changes ({change_cols}) SELECT {diff_select} {diff_from}",
+                (date.today(), change_type, source),
+            )
+        else:
+            base = db.next_id("permit_changes", "change_id")
+            db.execute(
+                f"INSERT INTO permit_changes (change_id, {change_cols}) "
+                f"SELECT {base} + ROW_NUMBER() OVER (ORDER BY s.seq), {diff_select} {diff_from}",
+                (date.today(), change_type, source),
+            )
+
+    logger.info("Set-based %s detection: %d changes from %d staged records",
+                label.lower(), changed, len(rows))
+    return changed
+
+
+def _strip_or_none(value) -> str | None:
+    return (value or "").strip() or None
+
+
+def detect_planning_changes_set_based(soda_records: list[dict], dry_run: bool = False,
+                                      source: str = "nightly") -> int:
+    """Set-based detect_planning_changes()."""
+    rows = []
+    for seq, r in enumerate(soda_records):
+        record_id = r.get("record_id") or r.get("case_no")
+        if not record_id:
+            continue
+        rows.append((seq, record_id, (r.get("status") or "").strip(), r.get("open_date"),
+                     _strip_or_none(r.get("record_type")), None, None,
+                     _strip_or_none(r.get("block")), _strip_or_none(r.get("lot"))))
+    return _detect_status_changes_set_based(
+        rows, table="planning_records", key_column="record_id", status_column="status",
+        change_type="planning_status_change", label="Planning", dry_run=dry_run, source=source,
+    )
+
+
+def detect_boiler_changes_set_based(soda_records: list[dict], dry_run: bool = False,
+                                    source: str = "nightly") -> int:
+    """Set-based detect_boiler_changes()."""
+    rows = []
+    for seq, r in enumerate(soda_records):
+        permit_number = r.get("permit_number") or r.get("boiler_permit_number")
+        if not permit_number:
+            continue
+        rows.append((seq, permit_number, (r.get("status") or "").strip(), r.get("issue_date"),
+                     _strip_or_none(r.get("boiler_type")), None, None,
+                     _strip_or_none(r.get("block")), _strip_or_none(r.get("lot"))))
+    return _detect_status_changes_set_based(
+        rows, table="boiler_permits", key_column="permit_number", status_column="status",
+        change_type="boiler_change", label="Boiler", dry_run=dry_run, source=source,
+    )
+
+
+def detect_street_use_changes_set_based(soda_records: list[dict], dry_run: bool = False,
+                                        source: str = "nightly") -> int:
+    """Set-based detect_street_use_changes()."""
+    rows = []
+    for seq, r in enumerate(soda_records):
+        if not r.get("permit_number"):
+            continue
+        rows.append((seq, r["permit_number"], (r.get("status") or "").strip(),
+                     r.get("approved_date"), _strip_or_none(r.get("permit_purpose")),
+                     _strip_or_none(r.get("street_name")), _strip_or_none(r.get("neighborhood")),
+                     None, None))
+    return _detect_status_changes_set_based(
+        rows, table="street_use_permits", key_column="permit_number", status_column="status",
+        change_type="street_use_change", label="Street-use", dry_run=dry_run, source=source,
+    )
+
+
+def detect_development_pipeline_changes_set_based(soda_records: list[dict],
+                                                  dry_run: bool = False,
+                                                  source: str = "nightly") -> int:
+    """Set-based detect_development_pipeline_changes()."""
+    rows = []
+    for seq, r in enumerate(soda_records):
+        if not r.get("record_id"):
+            continue
+        block_lot = _strip_or_none(r.get("block_lot"))
+        block_val = lot_val = None
+        if block_lot and "/" in block_lot:
+            block_part, lot_part = block_lot.split("/", 1)
+            block_val = block_part.strip() or None
+            lot_val = lot_part.strip() or None
+        description = ((r.get("description_planning") or
+                        r.get("description_dbi") or "")[:200]).strip() or None
+        rows.append((seq, r["record_id"], (r.get("current_status") or "").strip(),
+                     r.get("approved_date_planning"), description, None,
+                     _strip_or_none(r.get("neighborhood")), block_val, lot_val))
+    return _detect_status_changes_set_based(
+        rows, table="development_pipeline", key_column="record_id",
+        status_column="current_status", change_type="dev_pipeline_change",
+        label="Dev pipeline", dry_run=dry_run, source=source,
+    )
+
+
 # ── Main entry point ─────────────────────────────────────────────
 
 async def run_nightly(lookback_days: int = 1, dry_run: bool = False) -> dict:
@@ -1377,6 +1990,10 @@ async def run_nightly(lookback_days: int = 1, dry_run: bool = False) -> dict:
       - Step isolation: permit/inspection/addenda failures are independent
       - Tracks per-step timing and timeout detection in result dict
 
+    Source fetches run concurrently (NIGHTLY_SODA_CONCURRENCY requests in
+    flight, STEP_TIMEOUT_S hard limit per source) and each source's
+    detect/upsert step starts as soon as its own fetch completes.
+
     Auto-detects gaps since last successful run and extends lookback
     to cover missed days (up to MAX_LOOKBACK_DAYS).
     """
@@ -1420,9 +2037,11 @@ async def run_nightly(lookback_days: int = 1, dry_run: bool = False) -> dict:
     )
 
     step_results: dict[str, dict] = {}
+    origin = _time.monotonic()
 
     try:
-        client = SODAClient()
+        soda_concurrency = _soda_concurrency()
+        client = SODAClient(max_concurrency=soda_concurrency)
 
         # ── Step 0: Incremental permit ingest (QS5-B) ────────────────
         # Run BEFORE change detection so newly-filed permits are in the
@@ -1438,194 +2057,188 @@ async def run_nightly(lookback_days: int = 1, dry_run: bool = False) -> dict:
             except Exception:
                 pass
             _inc_conn.close()
-            step_results["incremental_ingest"] = {"ok": True, "upserted": inc_count}
+            step_results["incremental_ingest"] = _stamp(
+                {"ok": True, "upserted": inc_count}, origin, origin)
             logger.info("Incremental ingest: %d permits upserted", inc_count)
         except Exception as exc:
-            step_results["incremental_ingest"] = {"ok": False, "error": str(exc)}
+            step_results["incremental_ingest"] = _stamp(
+                {"ok": False, "error": str(exc)}, origin, origin)
             logger.warning("Incremental ingest failed (non-fatal): %s", exc)
 
-        retry_extended = False
-        permit_records: list[dict] = []
-        inspection_records: list[dict] = []
-        addenda_records: list[dict] = []
-        planning_records: list[dict] = []
-        boiler_records: list[dict] = []
-        street_use_records: list[dict] = []
-        dev_pipeline_records: list[dict] = []
+        if dry_run:
+            logger.info("DRY RUN — previewing changes:")
 
-        try:
-            # ── Step 1: Fetch permits (with retry) ────────────────────────
-            permit_records, step_results["permits"] = await fetch_with_retry(
-                lambda: fetch_recent_permits(client, since_str),
-                step_name="permits",
-            )
-            logger.info("SODA returned %d permit records", len(permit_records))
+        # Set-based detection (staging table + one join per source) unless
+        # NIGHTLY_DETECT_MODE=row asks for the per-record path.
+        set_based = use_set_based_detection()
 
-            # Auto-retry: if permits=0 and lookback was short (1-2 days),
-            # extend to 3 days to distinguish "quiet day" from "SODA lag"
-            if len(permit_records) == 0 and actual_lookback <= 2 and step_results["permits"]["ok"]:
-                retry_since = (date.today() - timedelta(days=3)).isoformat()
-                logger.info(
-                    "Zero permits with %d-day lookback — retrying with 3-day "
-                    "window (since=%s) to check for SODA data lag",
-                    actual_lookback, retry_since,
-                )
-                retry_records, retry_info = await fetch_with_retry(
-                    lambda: fetch_recent_permits(client, retry_since),
-                    step_name="permits_retry",
-                )
-                step_results["permits_retry"] = retry_info
-                logger.info(
-                    "Retry with 3-day lookback returned %d permit records",
-                    len(retry_records),
-                )
-                if len(retry_records) > 0:
-                    permit_records = retry_records
-                    retry_extended = True
-                    # Update since_str so change detection uses the wider window
-                    since_str = retry_since
-                    actual_lookback = 3
-
-            # ── Step 2: Fetch inspections (isolated — failure doesn't kill run) ──
-            try:
-                inspection_records, step_results["inspections"] = await fetch_with_retry(
-                    lambda: fetch_recent_inspections(client, since_str),
-                    step_name="inspections",
+        retry_extended = False
+        retry_since = None
+
+        # Every source runs fetch → detect/upsert as its own pipeline, so one
+        # slow or failing source never delays the others. SODA requests share
+        # the client's concurrency limit; DB stages go through detect_gate.
+        # Addenda detection waits for permit detection (it denormalizes
+        # permit fields, and new permits land in detect_changes).
+        detect_gate = asyncio.Semaphore(1 if BACKEND == "duckdb" else DETECT_CONCURRENCY)
+        permits_detected = asyncio.Event()
+
+        async def _source_pipeline(name, fetch, step_name, process, after=None):
+            records, step_results[name] = await _fetch_source(name, fetch, origin)
+            logger.info("SODA returned %d %s records", len(records), name)
+            count = 0
+            if process is not None:
+                if after is not None:
+                    await after.wait()
+                count, step_results[step_name] = await _process_source(
+                    step_name, process, records, origin, detect_gate,
                 )
-                logger.info("SODA returned %d inspection records", len(inspection_records))
-            except Exception as e:
-                logger.warning("Inspections step failed (non-fatal): %s", e)
-                step_results["inspections"] = {"step": "inspections", "ok": False, "error": str(e)}
+            return records, count
 
-            # ── Step 3: Fetch addenda (isolated — failure doesn't kill run) ─────
+        async def _permits_pipeline():
+            nonlocal retry_extended, retry_since, actual_lookback
             try:
-                addenda_records, step_results["addenda"] = await fetch_with_retry(
-                    lambda: fetch_recent_addenda(client, since_str),
-                    step_name="addenda",
+                # ── Step 1: Fetch permits (with retry) ────────────────────────
+                records, step_results["permits"] = await _fetch_source(
+                    "permits", lambda: fetch_recent_permits(client, since_str), origin,
                 )
-                logger.info("SODA returned %d addenda records", len(addenda_records))
-            except Exception as e:
-                logger.warning("Addenda fetch step failed (non-fatal): %s", e)
-                step_results["addenda"] = {"step": "addenda", "ok": False, "error": str(e)}
+                logger.info("SODA returned %d permit records", len(records))
 
-            # ── Step 4a: Fetch planning records (isolated) ────────────────────
-            try:
-                planning_records, step_results["planning"] = await fetch_with_retry(
-                    lambda: fetch_recent_planning(client, since_str),
-                    step_name="planning",
+                # Auto-retry: if permits=0 and lookback was short (1-2 days),
+                # extend to 3 days to distinguish "quiet day" from "SODA lag"
+                if len(records) == 0 and actual_lookback <= 2 and step_results["permits"]["ok"]:
+                    wider = (date.today() - timedelta(days=3)).isoformat()
+                    logger.info(
+                        "Zero permits with %d-day lookback — retrying with 3-day "
+                        "window (since=%s) to check for SODA data lag",
+                        actual_lookback, wider,
+                    )
+                    retry_records, step_results["permits_retry"] = await _fetch_source(
+                        "permits_retry", lambda: fetch_recent_permits(client, wider), origin,
+                    )
+                    logger.info(
+                        "Retry with 3-day lookback returned %d permit records",
+                        len(retry_records),
+                    )
+                    if len(retry_records) > 0:
+                        records = retry_records
+                        retry_extended = True
+                        retry_since = wider
+                        actual_lookback = 3
+
+                # ── Step 4: Detect and record permit changes ──────────────────
+                detect = detect_changes_set_based if set_based else detect_changes
+                count, step_results["detect_changes"] = await _process_source(
+                    "detect_changes",
+                    lambda recs: detect(recs, dry_run=dry_run, source=source),
+                    records, origin, detect_gate,
                 )
-                logger.info("SODA returned %d planning records", len(planning_records))
-            except Exception as e:
-                logger.warning("Planning fetch step failed (non-fatal): %s", e)
-                step_results["planning"] = {"step": "planning", "ok": False, "error": str(e)}
+                return records, count
+            finally:
+                permits_detected.set()
 
-            # ── Step 4b: Fetch boiler permits (isolated) ──────────────────────
-            try:
-                boiler_records, step_results["boiler"] = await fetch_with_retry(
-                    lambda: fetch_recent_boiler_permits(client, since_str),
-                    step_name="boiler",
-                )
-                logger.info("SODA returned %d boiler permit records", len(boiler_records))
-            except Exception as e:
-                logger.warning("Boiler permits fetch step failed (non-fatal): %s", e)
-                step_results["boiler"] = {"step": "boiler", "ok": False, "error": str(e)}
+        def _detector(row_fn, set_fn):
+            fn = set_fn if set_based else row_fn
+            return lambda recs: fn(recs, dry_run=dry_run, source=source)
 
-            # ── Step 4c: Fetch street-use permits (isolated) ───────────────────
+        try:
+            (
+                (permit_records, changes_inserted),
+                # ── Step 2 / 5: Inspections → upsert (skipped on dry run) ──────
+                (inspection_records, inspections_updated),
+                # ── Step 3 / 6: Addenda → routing change detection ────────────
+                (addenda_records, addenda_inserted),
+                # ── Steps 4a-d / 7-10: Planning, boiler, street-use, pipeline ─
+                (planning_records, planning_changes_inserted),
+                (boiler_records, boiler_changes_inserted),
+                (street_use_records, street_use_changes_inserted),
+                (dev_pipeline_records, dev_pipeline_changes_inserted),
+            ) = await asyncio.gather(
+                _permits_pipeline(),
+                _source_pipeline(
+                    "inspections", lambda: fetch_recent_inspections(client, since_str),
+                    "upsert_inspections", None if dry_run else upsert_inspections,
+                ),
+                _source_pipeline(
+                    "addenda", lambda: fetch_recent_addenda(client, since_str),
+                    "detect_addenda",
+                    _detector(detect_addenda_changes, detect_addenda_changes_set_based),
+                    after=permits_detected,
+                ),
+                _source_pipeline(
+                    "planning", lambda: fetch_recent_planning(client, since_str),
+                    "detect_planning",
+                    _detector(detect_planning_changes, detect_planning_changes_set_based),
+                ),
+                _source_pipeline(
+                    "boiler", lambda: fetch_recent_boiler_permits(client, since_str),
+                    "detect_boiler",
+                    _detector(detect_boiler_changes, detect_boiler_changes_set_based),
+                ),
+                _source_pipeline(
+                    "street_use", lambda: fetch_recent_street_use(client, since_str),
+                    "detect_street_use",
+                    _detector(detect_street_use_changes, detect_street_use_changes_set_based),
+                ),
+                _source_pipeline(
+                    "dev_pipeline", lambda: fetch_recent_development_pipeline(client, since_str),
+                    "detect_dev_pipeline",
+                    _detector(detect_development_pipeline_changes,
+                              detect_development_pipeline_changes_set_based),
+                ),
+            )
+        finally:
+            await client.close()
+
+        if retry_since:
+            since_str = retry_since
+        stage_elapsed = round(_time.monotonic() - origin, 2)
+        logger.info("Fetch + detect stage finished in %.1fs (SODA concurrency %d)",
+                    stage_elapsed, soda_concurrency)
+
+        # New permits at watched addresses/parcels join watch_permit_index
+        if not dry_run and permit_records:
+            started = _time.monotonic()
             try:
-                street_use_records, step_results["street_use"] = await fetch_with_retry(
-                    lambda: fetch_recent_street_use(client, since_str),
-                    step_name="street_use",
-                )
-                logger.info("SODA returned %d street-use permit records", len(street_use_records))
+                from web.watch_index import index_permits
+                index_permits(r.get("permit_number") for r in permit_records)
+                step_results["watch_index"] = _stamp({"ok": True}, origin, started)
             except Exception as e:
-                logger.warning("Street-use permits fetch step failed (non-fatal): %s", e)
-                step_results["street_use"] = {"step": "street_use", "ok": False, "error": str(e)}
+                logger.warning("watch_permit_index refresh failed (non-fatal): %s", e)
+                step_results["watch_index"] = _stamp(
+                    {"ok": False, "error": str(e)}, origin, started,
+                )
 
-            # ── Step 4d: Fetch development pipeline (isolated) ────────────────
+        # Permits whose routing changed get their routing summary rebuilt
+        if not dry_run and addenda_records:
+            started = _time.monotonic()
             try:
-                dev_pipeline_records, step_results["dev_pipeline"] = await fetch_with_retry(
-                    lambda: fetch_recent_development_pipeline(client, since_str),
-                    step_name="dev_pipeline",
+                from src.routing_summary import refresh_routing_summary
+                summary_stats = refresh_routing_summary(permit_numbers=(
+                    r.get("application_number") for r in addenda_records
+                ))
+                step_results["routing_summary"] = _stamp(
+                    {"ok": True, **summary_stats}, origin, started,
                 )
-                logger.info("SODA returned %d development pipeline records", len(dev_pipeline_records))
             except Exception as e:
-                logger.warning("Development pipeline fetch step failed (non-fatal): %s", e)
-                step_results["dev_pipeline"] = {"step": "dev_pipeline", "ok": False, "error": str(e)}
-
-        finally:
-            await client.close()
-
-        if dry_run:
-            logger.info("DRY RUN — previewing changes:")
-
-        # ── Step 4: Detect and record permit changes ──────────────────────
-        changes_inserted = 0
-        try:
-            changes_inserted = detect_changes(
-                permit_records, dry_run=dry_run, source=source,
-            )
-        except Exception as e:
-            logger.error("detect_changes failed (non-fatal): %s", e)
-            step_results["detect_changes"] = {"ok": False, "error": str(e)}
+                logger.warning("permit_routing_summary refresh failed (non-fatal): %s", e)
+                step_results["routing_summary"] = _stamp(
+                    {"ok": False, "error": str(e)}, origin, started,
+                )
 
-        # ── Step 5: Upsert inspections ───────────────────────────────────
-        inspections_updated = 0
+        # Cached MCP tool results were computed from the old data
         if not dry_run:
+            started = _time.monotonic()
             try:
-                inspections_updated = upsert_inspections(inspection_records)
+                from src.tool_cache import bump_data_version
+                step_results["tool_cache"] = _stamp(
+                    {"ok": True, "data_version": bump_data_version()}, origin, started,
+                )
             except Exception as e:
-                logger.warning("upsert_inspections failed (non-fatal): %s", e)
-                step_results["upsert_inspections"] = {"ok": False, "error": str(e)}
-
-        # ── Step 6: Detect and record addenda routing changes ────────────
-        addenda_inserted = 0
-        try:
-            addenda_inserted = detect_addenda_changes(
-                addenda_records, dry_run=dry_run, source=source,
-            )
-        except Exception as e:
-            logger.warning("Addenda change detection failed (non-fatal): %s", e)
-            step_results["detect_addenda"] = {"ok": False, "error": str(e)}
-
-        # ── Step 7: Detect planning status changes ────────────────────
-        planning_changes_inserted = 0
-        try:
-            planning_changes_inserted = detect_planning_changes(
-                planning_records, dry_run=dry_run, source=source,
-            )
-        except Exception as e:
-            logger.warning("Planning change detection failed (non-fatal): %s", e)
-            step_results["detect_planning"] = {"ok": False, "error": str(e)}
-
-        # ── Step 8: Detect boiler permit changes ──────────────────────
-        boiler_changes_inserted = 0
-        try:
-            boiler_changes_inserted = detect_boiler_changes(
-                boiler_records, dry_run=dry_run, source=source,
-            )
-        except Exception as e:
-            logger.warning("Boiler change detection failed (non-fatal): %s", e)
-            step_results["detect_boiler"] = {"ok": False, "error": str(e)}
-
-        # ── Step 9: Detect street-use permit changes ───────────────────
-        street_use_changes_inserted = 0
-        try:
-            street_use_changes_inserted = detect_street_use_changes(
-                street_use_records, dry_run=dry_run, source=source,
-            )
-        except Exception as e:
-            logger.warning("Street-use change detection failed (non-fatal): %s", e)
-            step_results["detect_street_use"] = {"ok": False, "error": str(e)}
-
-        # ── Step 10: Detect development pipeline changes ──────────────
-        dev_pipeline_changes_inserted = 0
-        try:
-            dev_pipeline_changes_inserted = detect_development_pipeline_changes(
-                dev_pipeline_records, dry_run=dry_run, source=source,
-            )
-        except Exception as e:
-            logger.warning("Dev pipeline change detection failed (non-fatal): %s", e)
-            step_results["detect_dev_pipeline"] = {"ok": False, "error": str(e)}
+                logger.warning("tool cache invalidation failed (non-fatal): %s", e)
+                step_results["tool_cache"] = _stamp(
+                    {"ok": False, "error": str(e)}, origin, started,
+                )
 
         total_soda = (
             len(permit_records) + len(inspection_records) + len(addenda_records)
@@ -1802,6 +2415,9 @@ async def run_nightly(lookback_days: int = 1, dry_run: bool = False) -> dict:
             "street_use_changes_inserted": street_use_changes_inserted,
             "dev_pipeline_changes_inserted": dev_pipeline_changes_inserted,
             "dry_run": dry_run,
+            "detect_mode": "set" if set_based else "row",
+            "soda_concurrency": soda_concurrency,
+            "stage_elapsed_s": stage_elapsed,
             "staleness_warnings": staleness_warnings,
             "step_results": step_results,
             "swept_stuck_jobs": swept,
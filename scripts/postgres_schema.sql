@@ -46,6 +46,9 @@ CREATE INDEX IF NOT EXISTS idx_permits_filed ON permits(filed_date);
 CREATE INDEX IF NOT EXISTS idx_permits_cost ON permits(estimated_cost);
 CREATE INDEX IF NOT EXISTS idx_permits_block_lot ON permits(block, lot);
 CREATE INDEX IF NOT EXISTS idx_permits_street ON permits(street_number, street_name);
+-- NOTE: the generated address_key column and idx_permits_address_key are added
+-- by the address_key migration (run_prod_migrations.py), which renders the
+-- expression from src/address_key.py so the SQL and Python forms can't drift.
 
 -- Contacts (1.8M records)
 CREATE TABLE IF NOT EXISTS contacts (
@@ -8,9 +8,13 @@ Usage:
     python -m scripts.rag_ingest --tier tier3     # Ingest only tier3
     python -m scripts.rag_ingest --dry-run        # Preview chunks without embedding
     python -m scripts.rag_ingest --stats          # Show current DB stats
+    python -m scripts.rag_ingest --backend local  # Build the local NumPy index instead
+    python -m scripts.rag_ingest --backend local --hnsw   # ...with an HNSW graph
+    python -m scripts.rag_ingest --export-local   # Local index from knowledge_chunks
 
 Requires:
-    DATABASE_URL  — PostgreSQL connection string (Railway)
+    DATABASE_URL  — PostgreSQL connection string (Railway); not needed for
+                    --backend local
     OPENAI_API_KEY — OpenAI API key for embeddings
 """
 
@@ -209,8 +213,13 @@ def ingest_tier4(dry_run: bool = False) -> int:
     return _embed_and_store(all_chunks, "official", TIER_TRUST["tier4"])
 
 
+# Set by main() for --backend local: chunks accumulate here and are written
+# as a local index (src/rag/local_index.py) instead of going to pgvector.
+_local_writer = None
+
+
 def _embed_and_store(chunks: list[dict], source_tier: str, trust_weight: float) -> int:
-    """Embed chunks and insert into pgvector store."""
+    """Embed chunks and insert into pgvector store (or the local index writer)."""
     from src.rag.embeddings import embed_texts
     from src.rag.store import insert_chunks
 
@@ -221,10 +230,16 @@ def _embed_and_store(chunks: list[dict], source_tier: str, trust_weight: float)
 
     logger.info("Embedding %d chunks...", len(texts))
     start = time.time()
-    embeddings = embed_texts(texts)
+    stats: dict = {}
+    embeddings = embed_texts(texts, stats=stats)
     elapsed = time.time() - start
-    logger.info("Embedded %d chunks in %.1fs (%.0f chunks/s)",
-                len(texts), elapsed, len(texts) / elapsed if elapsed > 0 else 0)
+    logger.info("Embedded %d chunks in %.1fs (%.0f chunks/s; %d cached, %d new)",
+                len(texts), elapsed, len(texts) / elapsed if elapsed > 0 else 0,
+                stats.get("cached", 0), stats.get("embedded", 0))
+
+    if _local_writer is not None:
+        _local_writer.insert_chunks(chunks, embeddings, source_tier=source_tier, trust_weight=trust_weight)
+        return len(chunks)
 
     logger.info("Inserting into pgvector store...")
     insert_chunks(chunks, embeddings, source_tier=source_tier, trust_weight=trust_weight)
@@ -274,14 +289,34 @@ def main():
                         help="Clear existing chunks before ingesting")
     parser.add_argument("--rebuild-index", action="store_true",
                         help="Rebuild IVFFlat index after ingestion")
+    parser.add_argument("--backend", choices=["pgvector", "local"], default="pgvector",
+                        help="Where to store embeddings (default: pgvector)")
+    parser.add_argument("--hnsw", action="store_true",
+                        help="Also build an HNSW graph for the local index (needs hnswlib)")
+    parser.add_argument("--export-local", action="store_true",
+                        help="Build the local index from the knowledge_chunks table and exit")
     args = parser.parse_args()
 
     if args.stats:
         show_stats()
         return
 
+    if args.export_local:
+        from src.rag.local_index import build_index_from_db
+        index = build_index_from_db(with_hnsw=args.hnsw)
+        print(f"\nLocal index built from knowledge_chunks: {len(index)} chunks "
+              f"(hnsw={index.has_hnsw})")
+        return
+
+    global _local_writer
+    if args.backend == "local" and not args.dry_run:
+        from src.rag.local_index import LocalIndexWriter
+        _local_writer = LocalIndexWriter()
+        # The local index is rebuilt from scratch on every run
+        args.clear = False
+
     # Ensure table exists
-    if not args.dry_run:
+    if not args.dry_run and _local_writer is None:
         from src.rag.store import ensure_table
         ensure_table()
 
@@ -311,6 +346,10 @@ def main():
 
     if args.dry_run:
         print(f"\nDry run complete: {total} chunks would be created")
+    elif _local_writer is not None:
+        index = _local_writer.save(with_hnsw=args.hnsw)
+        logger.info("Local index complete: %d chunks in %.1fs (hnsw=%s)",
+                    len(index), elapsed, index.has_hnsw)
     else:
         logger.info("Ingestion complete: %d chunks in %.1fs", total, elapsed)
 
@@ -300,6 +300,7 @@ def run_release_migrations():
     # Vision usage tracking
     cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS vision_usage_json TEXT")
     cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS gallery_duration_ms INTEGER")
+    cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS render_stats_json TEXT")
 
     # Billing tier plumbing
     cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_tier TEXT DEFAULT 'free'")
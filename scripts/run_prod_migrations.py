@@ -131,6 +131,40 @@ def _run_cron_log_columns() -> dict[str, Any]:
         conn.close()
 
 
+def _run_address_key() -> dict[str, Any]:
+    """Add the generated permits.address_key column and its index.
+
+    The column is GENERATED ... STORED, so every writer (full ingest, nightly
+    upserts, backfills) gets it for free.  Adding it rewrites the permits
+    table once; re-runs are no-ops.  DuckDB declares it (VIRTUAL) in
+    init_schema and can't add generated columns to an existing table.
+    """
+    from src.address_key import address_key_sql  # type: ignore
+    from src.db import get_connection, BACKEND  # type: ignore
+
+    if BACKEND != "postgres":
+        return {"ok": True, "skipped": True, "reason": "DuckDB mode — declared in init_schema"}
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "ALTER TABLE permits ADD COLUMN IF NOT EXISTS address_key TEXT "
+                f"GENERATED ALWAYS AS ({address_key_sql()}) STORED"
+            )
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_permits_address_key ON permits (address_key)"
+            )
+        conn.commit()
+        return {"ok": True, "column": "permits.address_key", "index": "idx_permits_address_key"}
+    except Exception as exc:
+        conn.rollback()
+        logger.error("address_key migration failed: %s", exc)
+        return {"ok": False, "error": str(exc)}
+    finally:
+        conn.close()
+
+
 def _run_reference_tables() -> dict[str, Any]:
     """Create reference tables for predict_permits and seed with initial data."""
     from src.db import get_connection, BACKEND  # type: ignore
@@ -548,6 +582,11 @@ MIGRATIONS: list[Migration] = [
         description="Sprint 61D: notify_permit_changes + notify_email columns on users",
         run=_run_sprint61d_notify_columns,
     ),
+    Migration(
+        name="address_key",
+        description="Generated permits.address_key column + index for address lookups",
+        run=_run_address_key,
+    ),
 ]
 
 MIGRATION_BY_NAME: dict[str, Migration] = {m.name: m for m in MIGRATIONS}
@@ -0,0 +1,67 @@
+"""Canonical address key for permit lookups.
+
+SF permit data stores the same address several ways — ``street_name="Market"``
+with ``street_suffix="St"``, ``street_name="Market St"`` with no suffix,
+``"ROBIN HOOD"`` vs ``"ROBINHOOD"`` — so address lookups used to OR together
+``UPPER()``, ``REPLACE()`` and ``LIKE`` variants that no index can serve.
+
+``permits.address_key`` is a generated column holding one canonical form:
+
+    street number + " " + street name, upper-cased, with spaces and periods
+    removed and a trailing street-type word ("St", "Avenue", "Wy", ...) dropped
+
+    "100", "Market St"      → "100 MARKET"
+    "75",  "Robin Hood Dr"  → "75 ROBINHOOD"
+    "1",   "Van Ness"       → "1 VANNESS"
+
+The suffix is deliberately left out of the key: lookups have always matched
+"Main", "Main St" and "Main Street" alike, and users rarely type the suffix
+the way DBI stores it.
+
+``address_key()`` computes the key in Python (for query parameters) and
+``address_key_sql()`` renders the identical expression in SQL (for the
+column definition and for keys derived from other tables, e.g. watch_items).
+The two must stay in step — tests/test_address_key.py checks parity.
+"""
+
+from __future__ import annotations
+
+import re
+
+# Street-type words stripped from the end of a street name: DBI's own
+# abbreviations (AV, BL, WY, TR, CR, HY, ...) plus the common long/USPS forms.
+STREET_SUFFIXES = (
+    "ST", "STREET", "AV", "AVE", "AVENUE", "BL", "BLVD", "BOULEVARD",
+    "DR", "DRIVE", "WY", "WAY", "TR", "TER", "TERRACE", "CT", "COURT",
+    "PL", "PLACE", "LN", "LANE", "RD", "ROAD", "CR", "CIR", "CIRCLE",
+    "AL", "ALY", "ALLEY", "HY", "HWY", "HIGHWAY", "SQ", "SQUARE",
+    "PZ", "PLZ", "PLAZA", "WK", "WALK",
+)
+
+# Shared by the Python and SQL forms; RE2 (DuckDB), Postgres ARE and Python
+# all read it the same way.
+_SUFFIX_PATTERN = r" +(" + "|".join(STREET_SUFFIXES) + r")\.?$"
+_SUFFIX_RE = re.compile(_SUFFIX_PATTERN)
+
+
+def address_key(street_number, street_name) -> str | None:
+    """Canonical key for a street address, or None if either part is missing."""
+    if street_number is None or street_name is None:
+        return None
+    number = str(street_number).strip(" ").upper()
+    name = _SUFFIX_RE.sub("", str(street_name).strip(" ").upper(), count=1)
+    return f"{number} {name.replace(' ', '').replace('.', '')}"
+
+
+def address_key_sql(number_col: str = "street_number",
+                    name_col: str = "street_name") -> str:
+    """SQL expression computing ``address_key()`` from two columns.
+
+    Uses only immutable functions, so Postgres accepts it in a
+    ``GENERATED ALWAYS AS (...) STORED`` column.
+    """
+    return (
+        f"UPPER(TRIM({number_col})) || ' ' || "
+        f"REPLACE(REPLACE(REGEXP_REPLACE(UPPER(TRIM({name_col})), "
+        f"'{_SUFFIX_PATTERN}', ''), ' ', ''), '.', '')"
+    )
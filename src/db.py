@@ -9,10 +9,17 @@ standard enough to work on both (with minor syntax helpers below).
 """
 
 import atexit
+import hashlib
 import logging
 import os
+import re
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
 
+from src.address_key import address_key_sql
+
 logger = logging.getLogger(__name__)
 
 # ── Backend detection ─────────────────────────────────────────────
@@ -34,6 +41,11 @@ BACKEND = "postgres" if DATABASE_URL else "duckdb"
 _pool = None
 
 
+def pool_max_size() -> int:
+    """Configured maximum size of the PostgreSQL connection pool (DB_POOL_MAX)."""
+    return int(os.environ.get("DB_POOL_MAX", "50"))
+
+
 def _get_pool():
     """Get or create the PostgreSQL connection pool (lazy singleton).
 
@@ -50,7 +62,7 @@ def _get_pool():
         _minconn = int(os.environ.get("DB_POOL_MIN", "5"))
         # Default max=50 handles ~50 simultaneous DB-bound requests (gunicorn workers
         # share the pool). At very high traffic, raise further and enable PgBouncer.
-        _maxconn = int(os.environ.get("DB_POOL_MAX", "50"))
+        _maxconn = pool_max_size()
         _connect_timeout = int(os.environ.get("DB_CONNECT_TIMEOUT", "10"))
         _pool = psycopg2.pool.ThreadedConnectionPool(
             minconn=_minconn,
@@ -131,6 +143,7 @@ def get_pool_stats() -> dict:
         "pool_size": len(_pool._pool) if hasattr(_pool, '_pool') else -1,
         "used_count": len(_pool._used) if hasattr(_pool, '_used') else -1,
         "health": get_pool_health(),
+        **_pool_metrics.snapshot(),
     }
 
 
@@ -149,24 +162,154 @@ def _close_pool():
 atexit.register(_close_pool)
 
 
+# ── Pool instrumentation and per-connection session state ─────────
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is open
+_CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+
+class _PoolMetrics:
+    """Checkout wait times and round trips per query() call, for /health."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.wait_buckets = [0] * (len(_CHECKOUT_WAIT_BUCKETS_MS) + 1)
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.calls = 0
+            self.round_trips = 0
+            self.round_trip_counts: dict[int, int] = {}
+            self.session_sets = 0
+            self.prepares = 0
+            self.prepared_executes = 0
+            self.prepare_failures = 0
+
+    def record_checkout(self, wait_secs: float) -> None:
+        wait_ms = wait_secs * 1000
+        bucket = next((i for i, bound in enumerate(_CHECKOUT_WAIT_BUCKETS_MS) if wait_ms < bound),
+                      len(_CHECKOUT_WAIT_BUCKETS_MS))
+        with self._lock:
+            self.checkouts += 1
+            self.wait_buckets[bucket] += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def record_call(self, round_trips: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.round_trips += round_trips
+            self.round_trip_counts[round_trips] = self.round_trip_counts.get(round_trips, 0) + 1
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<{b}ms" for b in _CHECKOUT_WAIT_BUCKETS_MS]
+            labels.append(f">={_CHECKOUT_WAIT_BUCKETS_MS[-1]}ms")
+            return {
+                "checkout": {
+                    "count": self.checkouts,
+                    "wait_ms_histogram": dict(zip(labels, self.wait_buckets)),
+                    "wait_ms_avg": round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                    "wait_ms_max": round(self.wait_max_ms, 3),
+                    "session_sets": self.session_sets,
+                },
+                "round_trips": {
+                    "calls": self.calls,
+                    "total": self.round_trips,
+                    "per_call_avg": round(self.round_trips / self.calls, 2) if self.calls else 0.0,
+                    "per_call_histogram": {str(k): v for k, v in sorted(self.round_trip_counts.items())},
+                },
+                "prepared": {
+                    "prepares": self.prepares,
+                    "executes": self.prepared_executes,
+                    "failures": self.prepare_failures,
+                },
+            }
+
+
+_pool_metrics = _PoolMetrics()
+
+# query() statements run this many times in the process are PREPAREd on
+# each connection that runs them (0 disables server-side prepared statements,
+# e.g. behind a transaction-pooling PgBouncer)
+DB_PREPARE_THRESHOLD = int(os.environ.get("DB_PREPARE_THRESHOLD", "3"))
+# Prepared statements kept per connection (least recently used are DEALLOCATEd)
+DB_PREPARED_CACHE_SIZE = int(os.environ.get("DB_PREPARED_CACHE_SIZE", "64"))
+
+
+class _SessionState:
+    """What has been applied to one physical Postgres connection."""
+
+    __slots__ = ("conn", "statement_timeout", "prepared")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.statement_timeout = None
+        self.prepared: dict[str, str] = {}  # sql -> statement name, in LRU order
+
+
+_sessions: dict[int, _SessionState] = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_state(raw_conn) -> _SessionState:
+    """Session state for a pooled connection (new connections start empty)."""
+    key = id(raw_conn)
+    with _sessions_lock:
+        state = _sessions.get(key)
+        if state is None or state.conn is not raw_conn:
+            # Drop connections the pool has closed (their ids may be reused)
+            for k in [k for k, st in _sessions.items() if st.conn.closed]:
+                del _sessions[k]
+            state = _sessions[key] = _SessionState(raw_conn)
+        return state
+
+
 class _PooledConnection:
     """Wrapper around a psycopg2 connection that returns it to the pool on close.
 
     Instead of destroying the connection, .close() rolls back any uncommitted
     transaction and returns the connection to the pool via putconn().
+    ``round_trips`` counts the server round trips made on the caller's
+    behalf (session setup, prepared statements, rollback) for _PoolMetrics.
     """
 
     def __init__(self, conn, pool):
         self._conn = conn
         self._pool = pool
+        self.round_trips = 0
+        self._autocommit_set = False
 
     def close(self):
         """Roll back uncommitted work and return connection to pool."""
         if self._conn is not None:
+            if self._autocommit_set:
+                # Session SETs made in autocommit mode persist — re-apply
+                # the statement_timeout on the next checkout
+                try:
+                    self._conn.autocommit = False
+                except Exception:
+                    pass
+                _session_state(self._conn).statement_timeout = None
+            # An idle connection has nothing to roll back — skip the round trip
             try:
-                self._conn.rollback()
+                idle = self._conn.get_transaction_status() == 0  # TRANSACTION_STATUS_IDLE
             except Exception:
-                pass
+                idle = False
+            if not idle:
+                try:
+                    self._conn.rollback()
+                    self.round_trips += 1
+                except Exception:
+                    pass
             try:
                 self._pool.putconn(self._conn)
             except Exception:
@@ -185,9 +328,11 @@ class _PooledConnection:
 
     def __setattr__(self, name, value):
         # Allow our own internal attributes to be set normally
-        if name in ("_conn", "_pool"):
+        if name in ("_conn", "_pool", "round_trips", "_autocommit_set"):
             super().__setattr__(name, value)
         else:
+            if name == "autocommit" and value:
+                super().__setattr__("_autocommit_set", True)
             # Delegate to the underlying psycopg2 connection (e.g., autocommit)
             setattr(self._conn, name, value)
 
@@ -204,22 +349,35 @@ def get_connection(db_path: str | None = None):
 
     For Postgres (no db_path override): returns a _PooledConnection from the
     connection pool. Sets statement_timeout (DB_STATEMENT_TIMEOUT, default 30s)
-    unless CRON_WORKER=true. Logs a WARNING with pool stats on PoolError.
+    unless CRON_WORKER=true — once per physical connection, again only when
+    the value changes. Logs a WARNING with pool stats on PoolError.
+
+    For DuckDB (no db_path override): returns a new cursor on the shared
+    process-wide instance (see _shared_duckdb) — closing it leaves the
+    database open.  An explicit db_path gets its own duckdb.connect().
     """
     if BACKEND == "postgres" and not db_path:
         import psycopg2.pool
         try:
             pool = _get_pool()
+            t0 = _time.monotonic()
             raw_conn = pool.getconn()
+            _pool_metrics.record_checkout(_time.monotonic() - t0)
             # Warn if pool utilization is high (after acquiring, so count includes this conn)
             _check_pool_exhaustion_warning(pool)
+            conn = _PooledConnection(raw_conn, pool)
             # Set statement_timeout for web requests; skip for cron workers
             if not os.environ.get("CRON_WORKER", "").lower() == "true":
                 _stmt_timeout = os.environ.get("DB_STATEMENT_TIMEOUT", "30s")
-                with raw_conn.cursor() as cur:
-                    cur.execute("SET statement_timeout = %s", (_stmt_timeout,))
-                raw_conn.commit()
-            return _PooledConnection(raw_conn, pool)
+                state = _session_state(raw_conn)
+                if state.statement_timeout != _stmt_timeout:
+                    with raw_conn.cursor() as cur:
+                        cur.execute("SET statement_timeout = %s", (_stmt_timeout,))
+                    raw_conn.commit()
+                    state.statement_timeout = _stmt_timeout
+                    conn.round_trips += 3  # BEGIN, SET, COMMIT
+                    _pool_metrics.count("session_sets")
+            return conn
         except psycopg2.pool.PoolError as e:
             stats = get_pool_stats()
             logger.warning(
@@ -231,14 +389,289 @@ def get_connection(db_path: str | None = None):
         except Exception as e:
             logger.error("Postgres pool connection failed: %s", e)
             raise
+    elif not db_path:
+        return _duckdb_cursor()
     else:
         import duckdb
-        path = db_path or _DUCKDB_PATH
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        conn = duckdb.connect(path)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # duckdb.connect() on a file another thread is opening or closing
+        # races in DuckDB's instance cache ("Unique file handle conflict")
+        with _duckdb_connect_lock:
+            conn = duckdb.connect(db_path)
         return conn
 
 
+_duckdb_connect_lock = threading.Lock()
+
+
+# ── DuckDB shared instance ────────────────────────────────────────
+
+# Read-only mode for web/MCP readers: SF_PERMITS_DB is attached READ_ONLY and
+# re-attached when the file is swapped (see publish_duckdb), so ingest can
+# build the next database in a separate file without holding the reader's lock.
+DUCKDB_READ_ONLY = os.environ.get("SF_PERMITS_DB_READ_ONLY", "").lower() in ("1", "true", "yes")
+
+# How often (seconds) read-only readers stat SF_PERMITS_DB for a swap
+DUCKDB_SWAP_CHECK_SECS = float(os.environ.get("SF_PERMITS_DB_SWAP_CHECK_SECS", "1"))
+
+
+def _file_identity(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns)
+
+
+class _DuckDBInstanceClosed(Exception):
+    """The instance was released between lookup and use — look it up again."""
+
+
+class _DuckDBInstance:
+    """One DuckDB database shared by the process, with per-thread cursors.
+
+    DuckDB connections are not thread-safe, but cursors on one instance are
+    cheap and share its catalog and buffer cache.  get_connection() hands out
+    a fresh cursor per call; query()/query_one()/execute_write() reuse one
+    cursor per thread.
+
+    Closing the instance closes every cursor on it, so it is only closed
+    once idle: no statement running on a thread cursor and no handed-out
+    cursor still referenced.  A read-write instance holds DuckDB's file lock,
+    so it is released after DUCKDB_IDLE_RELEASE_SECS without use (other
+    writers — src.ingest, scripts/nightly_changes.py — can then open the
+    file) and reopened on next use.
+    """
+
+    def __init__(self, path: str, read_only: bool):
+        import duckdb
+
+        self.path = path
+        self.read_only = read_only
+        self.pid = os.getpid()
+        self.identity = _file_identity(path) if read_only else None
+        self.checked_at = _time.monotonic() if read_only else 0.0
+        self.last_used = _time.monotonic()
+        self.closed = False
+        self.retired = False
+        self._busy = 0
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with _duckdb_connect_lock:
+            if read_only:
+                # A private in-memory instance with the file attached — unlike
+                # duckdb.connect(path), it bypasses DuckDB's per-path instance
+                # cache, so a swapped-in file is really re-read.
+                self.conn = duckdb.connect(":memory:")
+                escaped = path.replace("'", "''")
+                self.conn.execute(f"ATTACH '{escaped}' AS live (READ_ONLY)")
+            else:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self.conn = duckdb.connect(path)
+
+    def _new_cursor(self):
+        cur = self.conn.cursor()
+        if self.read_only:
+            cur.execute("USE live")
+        return cur
+
+    def cursor(self):
+        """A new cursor (own transaction context) on the shared database."""
+        with self._lock:
+            if self.closed:
+                raise _DuckDBInstanceClosed
+            cur = self._new_cursor()
+            self._outstanding += 1
+            self.last_used = _time.monotonic()
+        weakref.finalize(cur, self._release)
+        return cur
+
+    def _release(self):
+        with self._lock:
+            self._outstanding -= 1
+            self.last_used = _time.monotonic()
+            if self.retired:
+                self._close_if_idle()
+
+    def thread_cursor(self):
+        """The calling thread's long-lived cursor."""
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            cur = self._local.cursor = self._new_cursor()
+        return cur
+
+    def checkout(self):
+        """thread_cursor(), marked busy until checkin() so it isn't closed under it."""
+        with self._lock:
+            if self.closed:
+                raise _DuckDBInstanceClosed
+            self._busy += 1
+        try:
+            return self.thread_cursor()
+        except BaseException:
+            self.checkin()
+            raise
+
+    def checkin(self):
+        with self._lock:
+            self._busy -= 1
+            self.last_used = _time.monotonic()
+            if self.retired:
+                self._close_if_idle()
+
+    def is_current(self, path: str, read_only: bool) -> bool:
+        """Still the right instance for (path, read_only) in this process?"""
+        if self.closed or self.path != path or self.read_only != read_only \
+                or self.pid != os.getpid():
+            return False
+        if read_only:
+            now = _time.monotonic()
+            if now - self.checked_at >= DUCKDB_SWAP_CHECK_SECS:
+                self.checked_at = now
+                return _file_identity(path) == self.identity
+        return True
+
+    def _close_if_idle(self, idle_secs: float = 0.0) -> bool:
+        # Caller holds self._lock
+        if self.closed:
+            return True
+        if self._busy or self._outstanding:
+            return False
+        if _time.monotonic() - self.last_used < idle_secs:
+            return False
+        self.closed = True
+        self.close()
+        return True
+
+    def retire(self) -> None:
+        """Replaced: close now if idle, else when the last cursor is released."""
+        if self.pid != os.getpid():
+            return  # inherited across fork — the parent owns it
+        with self._lock:
+            self.retired = True
+            self._close_if_idle()
+
+    def release_if_idle(self, idle_secs: float) -> bool:
+        """Close if unused for idle_secs; True when closed."""
+        with self._lock:
+            return self._close_if_idle(idle_secs)
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            logger.debug("Error closing shared DuckDB instance", exc_info=True)
+
+
+# Release a read-write instance's file lock after this long unused (0 = never)
+DUCKDB_IDLE_RELEASE_SECS = float(os.environ.get("SF_PERMITS_DB_IDLE_RELEASE_SECS", "30"))
+
+_duckdb_instance: _DuckDBInstance | None = None
+_duckdb_instance_lock = threading.Lock()
+
+
+def _release_when_idle(inst: _DuckDBInstance) -> None:
+    """Reaper thread: drop a read-write instance once it sits idle."""
+    global _duckdb_instance
+    while True:
+        _time.sleep(max(0.05, DUCKDB_IDLE_RELEASE_SECS / 4))
+        with _duckdb_instance_lock:
+            if _duckdb_instance is not inst or inst.closed:
+                return  # replaced (and retired) or closed elsewhere
+            if inst.release_if_idle(DUCKDB_IDLE_RELEASE_SECS):
+                _duckdb_instance = None
+                logger.info("DuckDB released after %.0fs idle: %s",
+                            DUCKDB_IDLE_RELEASE_SECS, inst.path)
+                return
+
+
+def _shared_duckdb() -> _DuckDBInstance:
+    """Get (or open) the process-wide DuckDB instance for _DUCKDB_PATH.
+
+    Reopens when the configured path or mode changes, after a fork, after
+    an idle release, and — in read-only mode — when the file has been
+    swapped.  The replaced instance is retired: connections still in use
+    keep working and it is closed once the last one is released.
+    """
+    global _duckdb_instance
+    inst = _duckdb_instance
+    path, read_only = _DUCKDB_PATH, DUCKDB_READ_ONLY
+    if inst is not None and inst.is_current(path, read_only):
+        return inst
+    with _duckdb_instance_lock:
+        if _duckdb_instance is not inst and _duckdb_instance is not None:
+            return _duckdb_instance  # another thread just reopened it
+        if inst is not None:
+            inst.retire()
+        _duckdb_instance = new = _DuckDBInstance(path, read_only)
+        if read_only:
+            logger.info("DuckDB attached read-only: %s", path)
+        elif DUCKDB_IDLE_RELEASE_SECS > 0:
+            threading.Thread(target=_release_when_idle, args=(new,),
+                             name="duckdb-idle-release", daemon=True).start()
+        return new
+
+
+def _duckdb_cursor():
+    """A handed-out cursor on the shared instance (see get_connection)."""
+    try:
+        return _shared_duckdb().cursor()
+    except _DuckDBInstanceClosed:
+        return _shared_duckdb().cursor()
+
+
+@contextmanager
+def _duckdb_thread_cursor():
+    """The calling thread's cursor on the shared instance, for one statement."""
+    inst = _shared_duckdb()
+    try:
+        cur = inst.checkout()
+    except _DuckDBInstanceClosed:
+        inst = _shared_duckdb()
+        cur = inst.checkout()
+    try:
+        yield cur
+    finally:
+        inst.checkin()
+
+
+def close_duckdb() -> None:
+    """Close the shared DuckDB instance (it reopens on next use)."""
+    global _duckdb_instance
+    with _duckdb_instance_lock:
+        if _duckdb_instance is not None and _duckdb_instance.pid == os.getpid():
+            _duckdb_instance.closed = True
+            _duckdb_instance.close()
+        _duckdb_instance = None
+
+
+atexit.register(close_duckdb)
+
+
+def publish_duckdb(staged_path: str, path: str | None = None) -> None:
+    """Atomically swap a freshly built DuckDB file in as SF_PERMITS_DB.
+
+    Ingest writes to ``staged_path`` (e.g. ``run_ingestion(db_path=...)``);
+    this checkpoints it and renames it over the live file.  Read-only
+    readers pick the new file up within DUCKDB_SWAP_CHECK_SECS.
+    """
+    import duckdb
+
+    path = path or _DUCKDB_PATH
+    with _duckdb_connect_lock:
+        conn = duckdb.connect(staged_path)
+    try:
+        conn.execute("CHECKPOINT")
+    finally:
+        conn.close()
+    os.replace(staged_path, path)
+    wal = staged_path + ".wal"
+    if os.path.exists(wal):
+        os.remove(wal)
+    logger.info("Published DuckDB %s -> %s", staged_path, path)
+
+
 SLOW_QUERY_THRESHOLD_SECS = 5.0
 
 
@@ -260,6 +693,110 @@ def _log_slow_query(conn, sql: str, duration: float):
             logger.debug("Could not run EXPLAIN ANALYZE for slow query", exc_info=True)
 
 
+_sql_counts: dict[str, int] = {}
+_unpreparable: set[str] = set()
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+
+
+def _prepared_form(sql: str, nparams: int) -> str | None:
+    """``sql`` with %s placeholders numbered $1..$n, or None if not preparable."""
+    if "$" in sql or "%(" in sql:
+        return None
+    count = 0
+
+    def number(m):
+        nonlocal count
+        if m.group(0) == "%%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    converted = _PLACEHOLDER_RE.sub(number, sql)
+    return converted if count == nparams else None
+
+
+def _hot_sql(sql: str, params) -> bool:
+    """Count a parameterized query() statement; True once it is worth preparing."""
+    if DB_PREPARE_THRESHOLD <= 0 or not params or sql in _unpreparable:
+        return False
+    if any(isinstance(p, (tuple, dict)) for p in params):
+        return False  # psycopg2 expands these in place (IN %s) — no $n equivalent
+    seen = _sql_counts.get(sql, 0) + 1
+    if len(_sql_counts) > 10_000:
+        _sql_counts.clear()
+    _sql_counts[sql] = seen
+    return seen >= DB_PREPARE_THRESHOLD
+
+
+def _pg_fetchall(conn, sql: str, params) -> list:
+    """Run a SELECT on a pooled Postgres connection, via PREPARE/EXECUTE when hot.
+
+    Prepared statements live per connection (_SessionState.prepared).  If the
+    server rejects the PREPARE (a statement it can't type) the SQL is run
+    unprepared and not prepared again.  Errors from EXECUTE are the query's
+    own (timeout, bad data, ...) and propagate — except a cached plan whose
+    result type changed after a migration, which is dropped and re-run
+    unprepared.
+    """
+    with conn.cursor() as cur:
+        if _hot_sql(sql, params):
+            import psycopg2
+
+            state = _session_state(getattr(conn, "_conn", conn))
+            name = state.prepared.pop(sql, None)
+            if name is None:
+                name = _pg_prepare(conn, cur, state, sql, len(params))
+            if name is not None:
+                state.prepared[sql] = name
+                conn.round_trips += 1
+                try:
+                    cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+                except psycopg2.errors.FeatureNotSupported as e:
+                    # "cached plan must not change result type"
+                    logger.debug("Dropping stale prepared plan for %s: %s", sql[:80], e)
+                    _unpreparable.add(sql)
+                    _pool_metrics.count("prepare_failures")
+                    state.prepared.pop(sql, None)
+                    try:
+                        cur.execute(f"DEALLOCATE {name}")
+                    except psycopg2.Error:
+                        pass
+                else:
+                    _pool_metrics.count("prepared_executes")
+                    return cur.fetchall()
+        conn.round_trips += 1
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+
+def _pg_prepare(conn, cur, state, sql: str, nparams: int) -> str | None:
+    """PREPARE sql on this connection; its statement name, or None if it can't be."""
+    import psycopg2
+
+    prepared = _prepared_form(sql, nparams)
+    if prepared is None:
+        _unpreparable.add(sql)
+        _pool_metrics.count("prepare_failures")
+        return None
+    name = "sfp_" + hashlib.md5(sql.encode()).hexdigest()[:16]
+    try:
+        conn.round_trips += 1
+        cur.execute(f"PREPARE {name} AS {prepared}")
+    except psycopg2.errors.QueryCanceled:
+        raise
+    except psycopg2.Error as e:
+        logger.debug("Not preparing %s: %s", sql[:80], e)
+        _unpreparable.add(sql)
+        _pool_metrics.count("prepare_failures")
+        return None
+    _pool_metrics.count("prepares")
+    if len(state.prepared) >= DB_PREPARED_CACHE_SIZE:
+        evicted = state.prepared.pop(next(iter(state.prepared)))
+        conn.round_trips += 1
+        cur.execute(f"DEALLOCATE {evicted}")
+    return name
+
+
 def query(sql: str, params=None) -> list:
     """Execute a SELECT and return all rows as a list of tuples.
 
@@ -269,29 +806,38 @@ def query(sql: str, params=None) -> list:
 
     Callers should use %s style — this function auto-converts for DuckDB.
     """
-    import time
-    conn = get_connection()
-    try:
-        if BACKEND == "duckdb" and params:
-            # Convert %s → ? for DuckDB
-            sql = sql.replace("%s", "?")
-        t0 = time.monotonic()
-        if BACKEND == "postgres":
-            import psycopg2.extras
-            with conn.cursor() as cur:
-                cur.execute(sql, params)
-                result = cur.fetchall()
-        else:
+    if BACKEND == "duckdb":
+        # Per-thread cursor on the shared instance — nothing to open or close
+        with _duckdb_thread_cursor() as cur:
+            t0 = _time.monotonic()
             if params:
-                result = conn.execute(sql, params).fetchall()
+                # Convert %s → ? for DuckDB
+                result = cur.execute(sql.replace("%s", "?"), params).fetchall()
             else:
-                result = conn.execute(sql).fetchall()
-        elapsed = time.monotonic() - t0
+                result = cur.execute(sql).fetchall()
+            elapsed = _time.monotonic() - t0
+            if elapsed >= SLOW_QUERY_THRESHOLD_SECS:
+                _log_slow_query(cur, sql, elapsed)
+        return result
+
+    conn = get_connection()
+    try:
+        # A lone SELECT needs no transaction: autocommit saves the BEGIN and
+        # the ROLLBACK round trips around it
+        raw = getattr(conn, "_conn", conn)
+        raw.autocommit = True
+        try:
+            t0 = _time.monotonic()
+            result = _pg_fetchall(conn, sql, params)
+            elapsed = _time.monotonic() - t0
+        finally:
+            raw.autocommit = False
         if elapsed >= SLOW_QUERY_THRESHOLD_SECS:
             _log_slow_query(conn, sql, elapsed)
         return result
     finally:
         conn.close()
+        _pool_metrics.record_call(getattr(conn, "round_trips", 0))
 
 
 def query_one(sql: str, params=None):
@@ -386,42 +932,52 @@ def execute_write(sql: str, params=None, return_id: bool = False):
     Uses RETURNING for both Postgres and DuckDB (DuckDB >=0.9 supports it).
     Callers should use %s placeholders — auto-converted for DuckDB.
     """
-    conn = get_connection()
-    try:
-        if BACKEND == "duckdb" and params:
-            sql = sql.replace("%s", "?")
-        if BACKEND == "postgres":
-            with conn.cursor() as cur:
-                cur.execute(sql, params)
-                result = cur.fetchone() if return_id else None
-                conn.commit()
-                return result[0] if result else None
-        else:
+    if BACKEND == "duckdb":
+        with _duckdb_thread_cursor() as cur:
             if params:
-                result = conn.execute(sql, params)
+                result = cur.execute(sql.replace("%s", "?"), params)
             else:
-                result = conn.execute(sql)
+                result = cur.execute(sql)
             if return_id:
                 row = result.fetchone()
                 return row[0] if row else None
-            return None
+        return None
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            result = cur.fetchone() if return_id else None
+            conn.commit()
+            return result[0] if result else None
     finally:
         conn.close()
 
 
 # ── User schema (DuckDB dev mode) ────────────────────────────────
 
+_user_schema_lock = threading.Lock()
+
+
 def init_user_schema(conn=None) -> None:
     """Create user/auth/watch tables in DuckDB (dev mode).
 
     Called lazily on first auth/watch operation. Idempotent.
     If no conn provided, creates one internally.
+
+    Calls are serialized: the lazy callers can run on several threads at
+    once (parallel brief sections), and concurrent ALTER TABLE migrations
+    fail in DuckDB with catalog write-write conflicts.
     """
     close = False
     if conn is None:
         conn = get_connection()
         close = True
+    _user_schema_lock.acquire()
     try:
+        # The web app only runs this on a local DuckDB file — bring an older
+        # file's permits table up to date before address_key lookups hit it
+        _migrate_permits_address_key(conn)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 user_id INTEGER PRIMARY KEY,
@@ -475,6 +1031,16 @@ def init_user_schema(conn=None) -> None:
                 tags TEXT DEFAULT ''
             )
         """)
+        # Materialized watch → permit resolution (web.watch_index)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS watch_permit_index (
+                user_id INTEGER NOT NULL,
+                watch_id INTEGER NOT NULL,
+                watch_type TEXT NOT NULL,
+                permit_number TEXT NOT NULL,
+                PRIMARY KEY (watch_id, permit_number)
+            )
+        """)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS permit_changes (
                 change_id INTEGER PRIMARY KEY,
@@ -553,6 +1119,8 @@ def init_user_schema(conn=None) -> None:
             "CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)",
             "CREATE INDEX IF NOT EXISTS idx_watch_user ON watch_items (user_id)",
             "CREATE INDEX IF NOT EXISTS idx_watch_permit ON watch_items (permit_number)",
+            "CREATE INDEX IF NOT EXISTS idx_wpi_user ON watch_permit_index (user_id, watch_type)",
+            "CREATE INDEX IF NOT EXISTS idx_wpi_permit ON watch_permit_index (permit_number)",
             "CREATE INDEX IF NOT EXISTS idx_auth_token ON auth_tokens (token)",
             "CREATE INDEX IF NOT EXISTS idx_pc_date ON permit_changes (change_date)",
             "CREATE INDEX IF NOT EXISTS idx_pc_permit ON permit_changes (permit_number)",
@@ -708,6 +1276,7 @@ def init_user_schema(conn=None) -> None:
             "ALTER TABLE plan_analysis_jobs ADD COLUMN progress_detail TEXT",
             "ALTER TABLE plan_analysis_jobs ADD COLUMN vision_usage_json TEXT",
             "ALTER TABLE plan_analysis_jobs ADD COLUMN gallery_duration_ms INTEGER",
+            "ALTER TABLE plan_analysis_jobs ADD COLUMN render_stats_json TEXT",
             "ALTER TABLE plan_analysis_jobs ADD COLUMN analysis_mode TEXT DEFAULT 'sample'",
             "ALTER TABLE plan_analysis_jobs ADD COLUMN pages_analyzed INTEGER",
             "ALTER TABLE plan_analysis_jobs ADD COLUMN submission_stage TEXT",
@@ -974,6 +1543,43 @@ def init_user_schema(conn=None) -> None:
         except Exception:
             pass
 
+        # Vision result cache (content-addressed Claude Vision responses — DuckDB version)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS vision_result_cache (
+                cache_key TEXT PRIMARY KEY,
+                page_hash TEXT NOT NULL,
+                dpi INTEGER DEFAULT 0,
+                prompt_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response_text TEXT NOT NULL,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                last_hit_at TIMESTAMP
+            )
+        """)
+        try:
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_vision_cache_page "
+                "ON vision_result_cache (page_hash)"
+            )
+        except Exception:
+            pass
+
+        # Embedding cache (RAG vectors keyed by model + normalized text — DuckDB version)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP
+            )
+        """)
+
         # QS13-T2A: OAuth 2.1 tables — MCP server authentication
         conn.execute("""
             CREATE TABLE IF NOT EXISTS mcp_oauth_clients (
@@ -1019,6 +1625,7 @@ def init_user_schema(conn=None) -> None:
                 pass
 
     finally:
+        _user_schema_lock.release()
         if close:
             conn.close()
 
@@ -1080,6 +1687,68 @@ def init_oauth_schema(conn) -> None:
 
 # ── Legacy DuckDB-only functions (for ingestion scripts) ──────────
 
+# address_key: canonical "NUMBER NAME" (src.address_key).  DuckDB only
+# supports VIRTUAL generated columns; Postgres stores and indexes it.
+_PERMITS_COLUMNS_DDL = f"""
+            permit_number TEXT PRIMARY KEY,
+            permit_type TEXT,
+            permit_type_definition TEXT,
+            status TEXT,
+            status_date TEXT,
+            description TEXT,
+            filed_date TEXT,
+            issued_date TEXT,
+            approved_date TEXT,
+            completed_date TEXT,
+            estimated_cost DOUBLE,
+            revised_cost DOUBLE,
+            existing_use TEXT,
+            proposed_use TEXT,
+            existing_units INTEGER,
+            proposed_units INTEGER,
+            street_number TEXT,
+            street_name TEXT,
+            street_suffix TEXT,
+            zipcode TEXT,
+            neighborhood TEXT,
+            supervisor_district TEXT,
+            block TEXT,
+            lot TEXT,
+            adu TEXT,
+            data_as_of TEXT,
+            address_key TEXT GENERATED ALWAYS AS ({address_key_sql()}) VIRTUAL
+"""
+
+
+def _migrate_permits_address_key(conn) -> None:
+    """Add permits.address_key to a DuckDB file created before it existed.
+
+    DuckDB can't ALTER TABLE ... ADD a generated column, and ingest clears
+    permits with DELETE rather than dropping it, so the table is rebuilt
+    once under the current DDL and its indexes recreated.
+    """
+    rows = conn.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = 'permits' AND table_schema = current_schema()"
+    ).fetchall()
+    columns = [r[0] for r in rows]
+    if not columns or "address_key" in columns:
+        return
+    logger.info("Rebuilding permits to add the address_key column")
+    names = ", ".join(columns)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(f"CREATE TABLE permits_address_key_new ({_PERMITS_COLUMNS_DDL})")
+        conn.execute(f"INSERT INTO permits_address_key_new ({names}) SELECT {names} FROM permits")
+        conn.execute("DROP TABLE permits")
+        conn.execute("ALTER TABLE permits_address_key_new RENAME TO permits")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    _create_indexes(conn)
+
+
 def init_schema(conn) -> None:
     """Create all DuckDB tables if they don't exist (ingestion only)."""
     conn.execute("""
@@ -1139,36 +1808,8 @@ def init_schema(conn) -> None:
         )
     """)
 
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS permits (
-            permit_number TEXT PRIMARY KEY,
-            permit_type TEXT,
-            permit_type_definition TEXT,
-            status TEXT,
-            status_date TEXT,
-            description TEXT,
-            filed_date TEXT,
-            issued_date TEXT,
-            approved_date TEXT,
-            completed_date TEXT,
-            estimated_cost DOUBLE,
-            revised_cost DOUBLE,
-            existing_use TEXT,
-            proposed_use TEXT,
-            existing_units INTEGER,
-            proposed_units INTEGER,
-            street_number TEXT,
-            street_name TEXT,
-            street_suffix TEXT,
-            zipcode TEXT,
-            neighborhood TEXT,
-            supervisor_district TEXT,
-            block TEXT,
-            lot TEXT,
-            adu TEXT,
-            data_as_of TEXT
-        )
-    """)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS permits ({_PERMITS_COLUMNS_DDL})")
+    _migrate_permits_address_key(conn)
 
     conn.execute("""
         CREATE TABLE IF NOT EXISTS inspections (
@@ -1689,6 +2330,7 @@ def _create_indexes(conn) -> None:
         ("idx_permits_neighborhood", "permits", "neighborhood"),
         ("idx_permits_block_lot", "permits", "block, lot"),
         ("idx_permits_street", "permits", "street_number, street_name"),
+        ("idx_permits_address_key", "permits", "address_key"),
         ("idx_relationships_a", "relationships", "entity_id_a"),
         ("idx_relationships_b", "relationships", "entity_id_b"),
         ("idx_entities_name", "entities", "canonical_name"),
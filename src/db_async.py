@@ -0,0 +1,86 @@
+"""Async database access for the MCP tools.
+
+Every MCP tool is ``async def``, but the tools' database code is
+synchronous (get_connection() + cursors).  Run inline in the coroutine, a
+slow query blocks FastMCP's event loop and stalls every other MCP session.
+
+offload(fn) / run_sync(fn, ...) run a synchronous DB-bound function on the
+DB executor instead — a dedicated thread pool of DB_ASYNC_WORKERS threads
+(default 16), so at most that many tool bodies hold a connection at once.
+Tools keep their sync helpers unchanged; DuckDB work runs on the shared
+instance's per-thread cursors, Postgres work on the psycopg2 pool.
+
+That pool is shared with web request threads in the same process (web
+routes call the tools too), so on Postgres the executor is capped at half
+of DB_POOL_MAX: tool bodies can never check out the connections web
+traffic needs.  With the defaults (16 workers, DB_POOL_MAX=50) the cap does
+not bind and at least 34 connections stay free for requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DB_ASYNC_WORKERS = int(os.environ.get("DB_ASYNC_WORKERS", "16"))
+# Largest share of the Postgres pool the executor's threads may hold
+_POOL_SHARE = 0.5
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _worker_count() -> int:
+    """DB_ASYNC_WORKERS, capped to leave the Postgres pool room for web traffic."""
+    from src import db as db_mod
+
+    workers = max(1, DB_ASYNC_WORKERS)
+    if db_mod.BACKEND == "postgres":
+        cap = max(1, int(db_mod.pool_max_size() * _POOL_SHARE))
+        if workers > cap:
+            logger.warning(
+                "DB_ASYNC_WORKERS=%d exceeds half of DB_POOL_MAX=%d; using %d workers",
+                workers, db_mod.pool_max_size(), cap,
+            )
+            workers = cap
+    return workers
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_worker_count(), thread_name_prefix="db-async",
+                )
+    return _executor
+
+
+async def run_sync(fn, *args, **kwargs):
+    """Run a synchronous (DB-bound) callable on the DB executor and await it."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(_get_executor(), call)
+
+
+def offload(fn):
+    """Turn a synchronous tool body into an async tool that runs off the loop.
+
+    The wrapper keeps fn's name, signature and docstring, so FastMCP
+    registers it like a hand-written ``async def`` tool.  The sync function
+    stays reachable as ``tool.__wrapped__``.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_sync(fn, *args, **kwargs)
+
+    return wrapper
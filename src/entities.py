@@ -1180,6 +1180,10 @@ def main():
     args = parser.parse_args()
 
     resolve_entities(db_path=args.db)
+    if not args.db:
+        # Entity watches resolve through contacts.entity_id, which was reassigned
+        from web.watch_index import rebuild_watch_index
+        print(f"Watch index rebuilt: {rebuild_watch_index():,} rows", flush=True)
 
 
 if __name__ == "__main__":
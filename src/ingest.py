@@ -8,6 +8,7 @@ Usage:
 """
 
 import asyncio
+import logging
 import time
 import sys
 import os
@@ -16,6 +17,8 @@ from datetime import datetime, timezone
 from src.soda_client import SODAClient
 from src.db import get_connection, init_schema
 
+logger = logging.getLogger(__name__)
+
 # Dataset configs
 DATASETS = {
     "building_contacts": {
@@ -2323,6 +2326,12 @@ async def run_ingestion(
         # Ingest new datasets first so contact extraction can read them
         if addenda:
             results["addenda"] = await ingest_addenda(conn, client)
+            from src.routing_summary import refresh_routing_summary
+            try:
+                refresh_routing_summary(conn)
+            except Exception as e:
+                # Lookups fall back to addenda; don't abort the remaining datasets
+                logger.warning("Routing summary rebuild failed (non-fatal): %s", e)
         if violations:
             results["violations"] = await ingest_violations(conn, client)
         if complaints:
@@ -2376,6 +2385,8 @@ async def run_ingestion(
     print(f"{'=' * 60}")
 
     conn.close()
+    from src.tool_cache import bump_data_version
+    bump_data_version()
     return results
 
 
@@ -2403,7 +2414,12 @@ def main():
     parser.add_argument("--housing-production", action="store_true", help="Only ingest housing production")
     parser.add_argument("--dwelling-completions", action="store_true", help="Only ingest dwelling unit completions")
     parser.add_argument("--db", type=str, help="Custom database path")
+    parser.add_argument("--publish", action="store_true",
+                        help="Swap the --db file in as SF_PERMITS_DB when done "
+                             "(for read-only readers, SF_PERMITS_DB_READ_ONLY=1)")
     args = parser.parse_args()
+    if args.publish and not args.db:
+        parser.error("--publish requires --db (a staging file to build into)")
 
     # If no specific flag, ingest everything
     do_all = not (args.contacts or args.permits or args.inspections
@@ -2438,6 +2454,16 @@ def main():
             db_path=args.db,
         )
     )
+    if args.publish:
+        from src.db import publish_duckdb
+        publish_duckdb(args.db)
+        # Results cached while the staged build ran still read the old file
+        from src.tool_cache import bump_data_version
+        bump_data_version()
+    if (do_all or args.contacts or args.permits) and (args.publish or not args.db):
+        # Address, parcel and entity watches resolve through the reloaded tables
+        from web.watch_index import rebuild_watch_index
+        print(f"Watch index rebuilt: {rebuild_watch_index():,} rows")
 
 
 async def ingest_recent_permits(conn, client: SODAClient, days: int = 30) -> int:
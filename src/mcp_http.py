@@ -35,49 +35,7 @@ from mcp.server.fastmcp import FastMCP
 
 logger = logging.getLogger(__name__)
 
-# Import safe, public-data tool functions only
-from src.tools.search_permits import search_permits
-from src.tools.get_permit_details import get_permit_details
-from src.tools.permit_stats import permit_stats
-from src.tools.search_businesses import search_businesses
-from src.tools.property_lookup import property_lookup
-from src.tools.search_complaints import search_complaints
-from src.tools.search_violations import search_violations
-from src.tools.search_inspections import search_inspections
-from src.tools.search_entity import search_entity
-from src.tools.entity_network import entity_network
-from src.tools.network_anomalies import network_anomalies
-from src.tools.predict_permits import predict_permits
-from src.tools.estimate_timeline import estimate_timeline
-from src.tools.estimate_fees import estimate_fees
-from src.tools.required_documents import required_documents
-from src.tools.revision_risk import revision_risk
-from src.tools.validate_plans import validate_plans
-from src.tools.analyze_plans import analyze_plans
-from src.tools.recommend_consultants import recommend_consultants
-from src.tools.permit_lookup import permit_lookup
-from src.tools.search_addenda import search_addenda
-
-# Phase 5.5 / 6 tools (severity, health — safe, read-only public data)
-from src.tools.permit_severity import permit_severity
-from src.tools.property_health import property_health
-
-# EXCLUDED from HTTP endpoint (security risk on public-facing server):
-# - run_query: arbitrary SQL against DB (exposes user tables, auth_tokens)
-# - read_source: reads source code files (exposes secrets, architecture)
-# - search_source: searches codebase (finds API keys, passwords)
-# - schema_info: exposes full DB schema (reconnaissance)
-# - list_tests: test file inventory (minor info leak)
-# - list_feedback: user feedback data (has emails, page URLs)
-
-# Phase 8 tools (similar projects)
-from src.tools.similar_projects import similar_projects
-
-# Phase 9 tools (station prediction, stuck permits, simulation, delay cost)
-from src.tools.predict_next_stations import predict_next_stations
-from src.tools.stuck_permit import diagnose_stuck_permit
-from src.tools.what_if_simulator import simulate_what_if
-from src.tools.cost_of_delay import calculate_delay_cost
+from src.tool_registry import register_tools, start_warm_up
 
 # ── Create MCP server with HTTP transport config ─────────────────
 port = int(os.environ.get("PORT", 8001))
@@ -101,41 +59,16 @@ mcp = FastMCP(
     #   auth=AuthSettings(issuer_url="...", ...),
 )
 
-# Register 28 public-data tools (no project intelligence / internal tools)
-mcp.tool()(search_permits)
-mcp.tool()(get_permit_details)
-mcp.tool()(permit_stats)
-mcp.tool()(search_businesses)
-mcp.tool()(property_lookup)
-mcp.tool()(search_complaints)
-mcp.tool()(search_violations)
-mcp.tool()(search_inspections)
-mcp.tool()(search_entity)
-mcp.tool()(entity_network)
-mcp.tool()(network_anomalies)
-mcp.tool()(predict_permits)
-mcp.tool()(estimate_timeline)
-mcp.tool()(estimate_fees)
-mcp.tool()(required_documents)
-mcp.tool()(revision_risk)
-mcp.tool()(validate_plans)
-mcp.tool()(analyze_plans)
-mcp.tool()(recommend_consultants)
-mcp.tool()(permit_lookup)
-mcp.tool()(search_addenda)
-
-# Phase 5.5 / 6 tools (severity, health — safe public data)
-mcp.tool()(permit_severity)
-mcp.tool()(property_health)
-
-# Phase 8 tools (similar projects)
-mcp.tool()(similar_projects)
-
-# Phase 9 tools (station prediction, stuck permits, simulation, delay cost)
-mcp.tool()(predict_next_stations)
-mcp.tool()(diagnose_stuck_permit)
-mcp.tool()(simulate_what_if)
-mcp.tool()(calculate_delay_cost)
+# Register the public-data tools (no project intelligence / internal tools).
+# Each imports its module on first call — see src/tool_registry.py.
+# EXCLUDED from HTTP endpoint (security risk on public-facing server):
+# - run_query: arbitrary SQL against DB (exposes user tables, auth_tokens)
+# - read_source: reads source code files (exposes secrets, architecture)
+# - search_source: searches codebase (finds API keys, passwords)
+# - schema_info: exposes full DB schema (reconnaissance)
+# - list_tests: test file inventory (minor info leak)
+# - list_feedback: user feedback data (has emails, page URLs)
+register_tools(mcp, public_only=True)
 
 
 # ── Rate limiting middleware ───────────────────────────────────────
@@ -366,6 +299,7 @@ if __name__ == "__main__":
     async def main():
         # Initialize access log table at startup
         _ensure_access_log_table()
+        start_warm_up()
 
         # OAuth schema init (disabled — re-enable with OAuth)
         # from src.db import get_connection, init_oauth_schema, BACKEND
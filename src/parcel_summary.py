@@ -0,0 +1,375 @@
+"""Parcel summary refresh — one row per (block, lot), built set-based.
+
+parcel_summary backs the property report and the address lookup with one
+row per parcel: the canonical address, dominant neighborhood / supervisor
+district, permit counts, complaint / violation / boiler permit / inspection
+counts, the latest tax roll and the property_health tier.
+
+It used to be rebuilt with a correlated subquery per permit group for every
+count and for the address.  Here each source table is aggregated by
+(block, lot) once and the aggregates are joined:
+
+  - permits: permit_count, open_permit_count and last_permit_date over all
+    of the parcel's permits; neighborhood / supervisor_district from the
+    most common combination among them; the address from the most recently
+    filed permit that has one (falling back to the tax roll's location)
+  - complaints, violations, boiler_permits, inspections: COUNT(*) per parcel
+  - tax_rolls: the latest tax_year per parcel
+  - property_health: joined on block_lot
+
+Two modes (refresh_parcel_summary):
+
+  - full: builds parcel_summary_shadow and swaps it in with renames in one
+    transaction, so readers see either the old table or the new one, never
+    a half-empty one.  Run after full ingests of the count sources.
+  - incremental: recomputes only the parcels in permit_changes detected
+    since the last refresh (the nightly delta) — delete + insert in one
+    transaction — and re-syncs health_tier from property_health for every
+    parcel with one UPDATE.  Falls back to full while the table is empty.
+
+The nightly delta only names parcels with permit changes, so complaint,
+violation and inspection counts of every other parcel drift.  Incremental
+runs therefore turn into a full refresh once the oldest row is more than
+FULL_REFRESH_DAYS old (every row is rewritten by a full refresh, so the
+oldest refreshed_at is when the last one ran).
+
+Optional source tables (absent in fresh or test DuckDB files) count as 0 /
+NULL.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date, datetime
+
+from src.db import BACKEND, get_connection
+
+logger = logging.getLogger(__name__)
+
+TABLE = "parcel_summary"
+SHADOW = "parcel_summary_shadow"
+
+# Incremental refreshes become full once the last full one is this old (0 = never)
+FULL_REFRESH_DAYS = float(os.environ.get("PARCEL_SUMMARY_FULL_REFRESH_DAYS", "7"))
+
+# Permit statuses counted as open
+OPEN_STATUSES = ("filed", "issued", "approved", "reinstated")
+
+# Count sources: (table, parcel_summary column)
+_COUNT_SOURCES = (
+    ("complaints", "complaint_count"),
+    ("violations", "violation_count"),
+    ("boiler_permits", "boiler_permit_count"),
+    ("inspections", "inspection_count"),
+)
+
+_COLUMNS = (
+    "block", "lot", "canonical_address", "neighborhood", "supervisor_district",
+    "permit_count", "open_permit_count", "complaint_count", "violation_count",
+    "boiler_permit_count", "inspection_count",
+    "tax_value", "zoning_code", "use_definition", "number_of_units",
+    "health_tier", "last_permit_date", "refreshed_at",
+)
+
+
+def _ph() -> str:
+    return "%s" if BACKEND == "postgres" else "?"
+
+
+def _run(conn, sql: str, params=None) -> list[tuple]:
+    if BACKEND == "postgres":
+        with conn.cursor() as cur:
+            cur.execute(sql, params or None)
+            return cur.fetchall() if cur.description else []
+    return conn.execute(sql, params or []).fetchall()
+
+
+def _table_ddl(name: str) -> str:
+    """parcel_summary's DDL (as in src/db.py and web/app.py) under *name*."""
+    if BACKEND == "postgres":
+        double, refreshed = "DOUBLE PRECISION", "TIMESTAMPTZ DEFAULT NOW()"
+    else:
+        double, refreshed = "DOUBLE", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"
+    return f"""
+        CREATE TABLE IF NOT EXISTS {name} (
+            block TEXT NOT NULL, lot TEXT NOT NULL,
+            canonical_address TEXT, neighborhood TEXT, supervisor_district TEXT,
+            permit_count INTEGER DEFAULT 0, open_permit_count INTEGER DEFAULT 0,
+            complaint_count INTEGER DEFAULT 0, violation_count INTEGER DEFAULT 0,
+            boiler_permit_count INTEGER DEFAULT 0, inspection_count INTEGER DEFAULT 0,
+            tax_value {double}, zoning_code TEXT, use_definition TEXT,
+            number_of_units INTEGER, health_tier TEXT, last_permit_date TEXT,
+            refreshed_at {refreshed},
+            PRIMARY KEY (block, lot)
+        )
+    """
+
+
+def _existing_tables(conn) -> set[str]:
+    names = [t for t, _ in _COUNT_SOURCES] + ["tax_rolls", "property_health", "permit_changes"]
+    ph = _ph()
+    rows = _run(
+        conn,
+        "SELECT table_name FROM information_schema.tables "
+        f"WHERE table_schema = current_schema() AND table_name IN ({', '.join([ph] * len(names))})",
+        names,
+    )
+    return {r[0] for r in rows}
+
+
+def _has_supervisor_district(conn) -> bool:
+    return bool(_run(
+        conn,
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'permits' "
+        "AND column_name = 'supervisor_district'",
+    ))
+
+
+def _summary_select(existing: set[str], has_district: bool, scoped: bool) -> str:
+    """SELECT producing parcel_summary rows (in _COLUMNS order).
+
+    With ``scoped``, the statement starts with a ``scope`` CTE of the
+    parcels in permit_changes detected at or after one bound parameter,
+    and every source is restricted to those parcels.
+    """
+    def parcels(alias: str) -> str:
+        cond = f"{alias}.block IS NOT NULL AND {alias}.lot IS NOT NULL"
+        if scoped:
+            cond += (f" AND EXISTS (SELECT 1 FROM scope s "
+                     f"WHERE s.block = {alias}.block AND s.lot = {alias}.lot)")
+        return cond
+
+    district = "p.supervisor_district" if has_district else "CAST(NULL AS TEXT)"
+    open_list = ", ".join(f"'{s}'" for s in OPEN_STATUSES)
+    ctes = []
+    if scoped:
+        ctes.append(f"""scope AS (
+            SELECT DISTINCT block, lot FROM permit_changes
+            WHERE detected_at >= {_ph()} AND block IS NOT NULL AND lot IS NOT NULL
+        )""")
+    ctes.append(f"""parcel_permits AS (
+            SELECT p.block, p.lot, p.neighborhood, {district} AS supervisor_district,
+                   p.status, p.filed_date, p.street_number, p.street_name
+            FROM permits p
+            WHERE {parcels('p')}
+        )""")
+    ctes.append(f"""permit_agg AS (
+            SELECT block, lot, COUNT(*) AS permit_count,
+                   COUNT(*) FILTER (WHERE status IN ({open_list})) AS open_permit_count,
+                   MAX(filed_date) AS last_permit_date
+            FROM parcel_permits GROUP BY block, lot
+        )""")
+    ctes.append("""district AS (
+            SELECT block, lot, neighborhood, supervisor_district,
+                   ROW_NUMBER() OVER (PARTITION BY block, lot
+                                      ORDER BY COUNT(*) DESC, neighborhood, supervisor_district) AS rn
+            FROM parcel_permits GROUP BY block, lot, neighborhood, supervisor_district
+        )""")
+    ctes.append("""address AS (
+            SELECT block, lot, street_number || ' ' || street_name AS address,
+                   ROW_NUMBER() OVER (PARTITION BY block, lot
+                                      ORDER BY filed_date DESC NULLS LAST) AS rn
+            FROM parcel_permits WHERE street_number IS NOT NULL AND street_name IS NOT NULL
+        )""")
+
+    joins = [
+        "JOIN district d ON d.block = pa.block AND d.lot = pa.lot AND d.rn = 1",
+        "LEFT JOIN address a ON a.block = pa.block AND a.lot = pa.lot AND a.rn = 1",
+    ]
+    counts = []
+    for table, column in _COUNT_SOURCES:
+        if table in existing:
+            ctes.append(f"""{table}_agg AS (
+            SELECT t.block, t.lot, COUNT(*) AS n FROM {table} t
+            WHERE {parcels('t')} GROUP BY t.block, t.lot
+        )""")
+            joins.append(f"LEFT JOIN {table}_agg ON {table}_agg.block = pa.block "
+                         f"AND {table}_agg.lot = pa.lot")
+            counts.append(f"COALESCE({table}_agg.n, 0) AS {column}")
+        else:
+            counts.append("0")
+
+    if "tax_rolls" in existing:
+        ctes.append(f"""tax AS (
+            SELECT t.block, t.lot, t.zoning_code, t.use_definition, t.number_of_units,
+                   t.property_location,
+                   COALESCE(t.assessed_land_value, 0) + COALESCE(t.assessed_improvement_value, 0) AS tax_value,
+                   ROW_NUMBER() OVER (PARTITION BY t.block, t.lot ORDER BY t.tax_year DESC) AS rn
+            FROM tax_rolls t
+            WHERE {parcels('t')}
+        )""")
+        joins.append("LEFT JOIN tax ON tax.block = pa.block AND tax.lot = pa.lot AND tax.rn = 1")
+        address = "UPPER(COALESCE(a.address, tax.property_location))"
+        tax_cols = "tax.tax_value, tax.zoning_code, tax.use_definition, tax.number_of_units"
+    else:
+        address = "UPPER(a.address)"
+        tax_cols = "NULL, NULL, NULL, NULL"
+
+    if "property_health" in existing:
+        joins.append("LEFT JOIN property_health ph ON ph.block_lot = pa.block || '/' || pa.lot")
+        health = "ph.tier"
+    else:
+        health = "NULL"
+
+    sep = ",\n        "
+    return f"""
+        WITH {sep.join(ctes)}
+        SELECT pa.block, pa.lot, {address}, d.neighborhood, d.supervisor_district,
+               pa.permit_count, pa.open_permit_count, {', '.join(counts)},
+               {tax_cols}, {health}, pa.last_permit_date, CURRENT_TIMESTAMP
+        FROM permit_agg pa
+        {' '.join(joins)}
+    """
+
+
+def _begin(conn) -> None:
+    if BACKEND != "postgres":
+        conn.execute("BEGIN TRANSACTION")
+
+
+def _commit(conn) -> None:
+    if BACKEND == "postgres":
+        conn.commit()
+    else:
+        conn.execute("COMMIT")
+
+
+def _rollback(conn) -> None:
+    try:
+        if BACKEND == "postgres":
+            conn.rollback()
+        else:
+            conn.execute("ROLLBACK")
+    except Exception:
+        pass  # no transaction open
+
+
+def _refresh_full(conn, existing: set[str], has_district: bool) -> int:
+    """Build the shadow table, then swap it in atomically."""
+    cols = ", ".join(_COLUMNS)
+    _run(conn, f"DROP TABLE IF EXISTS {SHADOW}")
+    _run(conn, _table_ddl(SHADOW))
+    _run(conn, f"INSERT INTO {SHADOW} ({cols}) "
+               + _summary_select(existing, has_district, scoped=False))
+    if BACKEND == "postgres":
+        _run(conn, f"CREATE INDEX IF NOT EXISTS idx_{SHADOW}_neighborhood ON {SHADOW} (neighborhood)")
+        conn.commit()
+    count = _run(conn, f"SELECT COUNT(*) FROM {SHADOW}")[0][0]
+
+    # The swap: readers block on the renames for an instant and then see
+    # the new table
+    _begin(conn)
+    _run(conn, f"DROP TABLE IF EXISTS {TABLE}_old")
+    _run(conn, f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old")
+    _run(conn, f"ALTER TABLE {SHADOW} RENAME TO {TABLE}")
+    _run(conn, f"DROP TABLE {TABLE}_old")
+    if BACKEND == "postgres":
+        # Give the constraint and index their usual names back, freeing the
+        # shadow names for the next refresh
+        _run(conn, f"ALTER TABLE {TABLE} RENAME CONSTRAINT {SHADOW}_pkey TO {TABLE}_pkey")
+        _run(conn, f"ALTER INDEX idx_{SHADOW}_neighborhood RENAME TO idx_{TABLE}_neighborhood")
+    _commit(conn)
+    return count
+
+
+def _full_refresh_due(conn) -> bool:
+    """True when the oldest row predates the FULL_REFRESH_DAYS window."""
+    if FULL_REFRESH_DAYS <= 0:
+        return False
+    row = _run(
+        conn,
+        f"SELECT MIN(refreshed_at) < CURRENT_TIMESTAMP - INTERVAL '1 day' * {_ph()} FROM {TABLE}",
+        [FULL_REFRESH_DAYS],
+    )
+    return bool(row and row[0][0])
+
+
+def _refresh_incremental(conn, existing: set[str], has_district: bool, since) -> int:
+    """Recompute the parcels touched since *since*; re-sync health tiers."""
+    ph = _ph()
+    touched = _run(
+        conn,
+        "SELECT COUNT(*) FROM (SELECT DISTINCT block, lot FROM permit_changes "
+        f"WHERE detected_at >= {ph} AND block IS NOT NULL AND lot IS NOT NULL) s",
+        [since],
+    )[0][0]
+
+    _begin(conn)
+    if touched:
+        _run(
+            conn,
+            f"DELETE FROM {TABLE} WHERE EXISTS (SELECT 1 FROM permit_changes pc "
+            f"WHERE pc.detected_at >= {ph} AND pc.block = {TABLE}.block AND pc.lot = {TABLE}.lot)",
+            [since],
+        )
+        _run(conn, f"INSERT INTO {TABLE} ({', '.join(_COLUMNS)}) "
+                   + _summary_select(existing, has_district, scoped=True), [since])
+    if "property_health" in existing:
+        # Signals recompute every parcel's tier nightly, not just the delta's
+        _run(conn, f"""
+            UPDATE {TABLE} SET health_tier = ph.tier
+            FROM property_health ph
+            WHERE ph.block_lot = {TABLE}.block || '/' || {TABLE}.lot
+              AND {TABLE}.health_tier IS DISTINCT FROM ph.tier
+        """)
+        _run(conn, f"""
+            UPDATE {TABLE} SET health_tier = NULL
+            WHERE health_tier IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM property_health ph
+                WHERE ph.block_lot = {TABLE}.block || '/' || {TABLE}.lot)
+        """)
+    _commit(conn)
+    return touched
+
+
+def refresh_parcel_summary(conn=None, incremental: bool = False, since=None) -> dict:
+    """Refresh parcel_summary; see the module docstring for the two modes.
+
+    ``since`` (datetime, date or ISO string) overrides the incremental
+    cutoff, which defaults to the last refresh (MAX(refreshed_at)).
+    Returns stats dict for logging: mode, parcels (rows written or
+    recomputed) and, for incremental runs, since.
+    """
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    try:
+        _run(conn, _table_ddl(TABLE))
+        if BACKEND == "postgres":
+            conn.commit()
+        existing = _existing_tables(conn)
+        has_district = _has_supervisor_district(conn)
+
+        if incremental:
+            if since is None:
+                since = _run(conn, f"SELECT MAX(refreshed_at) FROM {TABLE}")[0][0]
+            elif isinstance(since, str):
+                since = datetime.fromisoformat(since)
+            elif isinstance(since, date) and not isinstance(since, datetime):
+                since = datetime.combine(since, datetime.min.time())
+            if since is None or "permit_changes" not in existing:
+                logger.info("parcel summary: no baseline for an incremental refresh — rebuilding")
+                incremental = False
+            elif _full_refresh_due(conn):
+                logger.info("parcel summary: last full refresh over %g days ago — rebuilding",
+                            FULL_REFRESH_DAYS)
+                incremental = False
+
+        if incremental:
+            parcels = _refresh_incremental(conn, existing, has_district, since)
+            logger.info("parcel summary: %d parcels recomputed (changes since %s)", parcels, since)
+            return {"mode": "incremental", "parcels": parcels, "since": str(since)}
+
+        parcels = _refresh_full(conn, existing, has_district)
+        logger.info("parcel summary rebuilt: %d parcels", parcels)
+        return {"mode": "full", "parcels": parcels}
+    except Exception:
+        _rollback(conn)
+        raise
+    finally:
+        if close:
+            conn.close()
@@ -1,14 +1,39 @@
-"""OpenAI embedding client with batching.
+"""Embedding client with batching and a persistent embedding cache.
 
-Uses text-embedding-3-small (1536 dimensions, $0.02/1M tokens).
-Batches requests to stay within API limits.
+Default embedder is OpenAI text-embedding-3-small (1536 dimensions,
+$0.02/1M tokens). Batches requests to stay within API limits.
+
+Every text is looked up in ``embedding_cache`` first, keyed by
+(embedder model, hash of the normalized text). The cache is shared by
+query embedding (``retrieve``) and ingestion (``rag_ingest`` /
+``/cron/rag-ingest``), so repeated questions skip the API and unchanged
+chunks are never re-embedded. A small in-process LRU sits in front of the
+table for hot queries. Cache reads/writes are best-effort.
+
+The embedder is pluggable (``set_embedder`` / RAG_EMBEDDER) so tests and
+offline dev can use the deterministic ``HashEmbedder`` stand-in.
+
+Environment variables:
+    OPENAI_API_KEY: Required for the OpenAI embedder.
+    RAG_EMBEDDER: 'openai' (default) or 'hash'.
+    EMBEDDING_CACHE_ENABLED: "0" bypasses the persistent cache.
+    EMBED_CONCURRENCY: Parallel API batches for large embeds (default 4).
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import math
 import os
+import re
+import threading
 import time
+import unicodedata
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -17,50 +42,69 @@ _MODEL = "text-embedding-3-small"
 _DIMENSIONS = 1536
 _BATCH_SIZE = 100  # OpenAI allows up to 2048, but 100 keeps memory reasonable
 _MAX_RETRIES = 3
+_LOOKUP_BATCH = 500
+_LRU_SIZE = 512          # query vectors, stored packed (~6 KB each)
+_LRU_MAX_CALL_TEXTS = 16  # bulk ingest calls bypass the LRU
 
 
 def get_embedding_dimensions() -> int:
     """Return the embedding vector dimensionality."""
-    return _DIMENSIONS
+    return get_embedder().dimensions
 
 
-def embed_texts(texts: list[str], model: str = _MODEL) -> list[list[float]]:
-    """Embed a list of texts using OpenAI API.
-
-    Args:
-        texts: List of text strings to embed.
-        model: OpenAI model name.
+# ---------------------------------------------------------------------------
+# Embedders
+# ---------------------------------------------------------------------------
 
-    Returns:
-        List of embedding vectors (each a list of floats).
+class Embedder(ABC):
+    """Interface: turn a batch of texts into vectors.
 
-    Raises:
-        RuntimeError: If OPENAI_API_KEY is not set.
-        Exception: On API failure after retries.
+    ``name`` identifies the model in cache keys — two embedders that can
+    produce different vectors for the same text must use different names.
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY environment variable not set")
 
-    try:
-        from openai import OpenAI
-    except ImportError:
-        raise RuntimeError("openai package not installed. Run: pip install openai")
+    name: str = ""
+    dimensions: int = _DIMENSIONS
+    batch_size: int = _BATCH_SIZE
 
-    client = OpenAI(api_key=api_key)
-    all_embeddings: list[list[float]] = []
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        ...
 
-    for i in range(0, len(texts), _BATCH_SIZE):
-        batch = texts[i : i + _BATCH_SIZE]
-        # Truncate very long texts (OpenAI limit is 8191 tokens ≈ 30K chars)
-        batch = [t[:30000] if len(t) > 30000 else t for t in batch]
 
+class OpenAIEmbedder(Embedder):
+    """OpenAI embeddings API with retries and a reused client."""
+
+    def __init__(self, model: str = _MODEL, dimensions: int = _DIMENSIONS):
+        self.model = model
+        self.name = model
+        self.dimensions = dimensions
+        self._client = None
+        self._client_key = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY environment variable not set")
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise RuntimeError("openai package not installed. Run: pip install openai")
+        with self._lock:
+            if self._client is None or self._client_key != api_key:
+                self._client = OpenAI(api_key=api_key)
+                self._client_key = api_key
+            return self._client
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        client = self._get_client()
+        # Truncate very long texts (OpenAI limit is 8191 tokens ≈ 30K chars)
+        batch = [t[:30000] if len(t) > 30000 else t for t in texts]
         for attempt in range(_MAX_RETRIES):
             try:
-                response = client.embeddings.create(input=batch, model=model)
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
-                break
+                response = client.embeddings.create(input=batch, model=self.model)
+                return [item.embedding for item in response.data]
             except Exception as e:
                 if attempt < _MAX_RETRIES - 1:
                     wait = 2 ** attempt
@@ -70,10 +114,267 @@ def embed_texts(texts: list[str], model: str = _MODEL) -> list[list[float]]:
                 else:
                     raise
 
-        if i + _BATCH_SIZE < len(texts):
-            logger.info("Embedded %d/%d texts...", min(i + _BATCH_SIZE, len(texts)), len(texts))
 
-    return all_embeddings
+class HashEmbedder(Embedder):
+    """Deterministic, offline stand-in: hashed bag of words and bigrams.
+
+    Texts sharing words get similar vectors, which is enough for tests and
+    for exercising retrieval without an API key. Not for production.
+    """
+
+    def __init__(self, dimensions: int = _DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hash-{dimensions}"
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        out = []
+        for text in texts:
+            vec = [0.0] * self.dimensions
+            words = re.findall(r"\w+", text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                idx = int.from_bytes(digest[:4], "little") % self.dimensions
+                vec[idx] += 1.0 if digest[4] & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+            out.append([v / norm for v in vec])
+        return out
+
+
+_embedder: Optional[Embedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """Return the configured embedder (RAG_EMBEDDER, default OpenAI)."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                choice = os.environ.get("RAG_EMBEDDER", "openai").strip().lower()
+                _embedder = HashEmbedder() if choice == "hash" else OpenAIEmbedder()
+    return _embedder
+
+
+def set_embedder(embedder: Optional[Embedder]) -> None:
+    """Install an embedder (None restores the default on next use)."""
+    global _embedder
+    with _embedder_lock:
+        _embedder = embedder
+    _lru.clear()
+
+
+# ---------------------------------------------------------------------------
+# Cache keys and storage
+# ---------------------------------------------------------------------------
+
+def normalize_text(text: str) -> str:
+    """Normalize for cache keys: NFC, case-folded, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """Cache key for (model, normalized text)."""
+    h = hashlib.sha256()
+    h.update(model.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.hexdigest()
+
+
+def is_cache_enabled() -> bool:
+    return os.environ.get("EMBEDDING_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _pack(vec: list[float]) -> bytes:
+    return array("f", vec).tobytes()
+
+
+def _unpack(blob) -> list[float]:
+    arr = array("f")
+    arr.frombytes(bytes(blob))
+    return arr.tolist()
+
+
+class _LRU:
+    def __init__(self, size: int):
+        self.size = size
+        self._data: OrderedDict[str, array] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[list[float]]:
+        with self._lock:
+            packed = self._data.get(key)
+            if packed is None:
+                return None
+            self._data.move_to_end(key)
+        return packed.tolist()
+
+    def put(self, key: str, vec: list[float]) -> None:
+        packed = array("f", vec)
+        with self._lock:
+            self._data[key] = packed
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU(_LRU_SIZE)
+
+
+def _cache_lookup(keys: list[str]) -> dict[str, list[float]]:
+    """Fetch cached vectors for ``keys`` in batches. Best-effort."""
+    from src.db import query
+
+    found: dict[str, list[float]] = {}
+    for i in range(0, len(keys), _LOOKUP_BATCH):
+        batch = keys[i:i + _LOOKUP_BATCH]
+        placeholders = ", ".join(["%s"] * len(batch))
+        try:
+            rows = query(
+                f"SELECT cache_key, embedding FROM embedding_cache "
+                f"WHERE cache_key IN ({placeholders})",
+                tuple(batch),
+            )
+        except Exception:
+            logger.debug("Embedding cache read failed", exc_info=True)
+            return found
+        for key, blob in rows:
+            if blob is not None:
+                found[key] = _unpack(blob)
+    return found
+
+
+def _cache_store(model: str, entries: list[tuple[str, list[float]]]) -> None:
+    """Insert new vectors in one transaction. Best-effort."""
+    from src.db import BACKEND, get_connection
+
+    if not entries:
+        return
+    sql = (
+        "INSERT INTO embedding_cache (cache_key, model, dims, embedding) "
+        "VALUES (%s, %s, %s, %s) ON CONFLICT (cache_key) DO NOTHING"
+    )
+    rows = [(key, model, len(vec), _pack(vec)) for key, vec in entries]
+    try:
+        conn = get_connection()
+        try:
+            if BACKEND == "postgres":
+                import psycopg2
+                with conn.cursor() as cur:
+                    cur.executemany(sql, [(k, m, d, psycopg2.Binary(b)) for k, m, d, b in rows])
+                conn.commit()
+            else:
+                conn.executemany(sql.replace("%s", "?"), rows)
+        finally:
+            conn.close()
+    except Exception:
+        logger.debug("Embedding cache write failed", exc_info=True)
+
+
+def _touch(keys: list[str]) -> None:
+    """Record hits so pruning can keep hot entries. Best-effort."""
+    from src.db import execute_write
+
+    for i in range(0, len(keys), _LOOKUP_BATCH):
+        batch = keys[i:i + _LOOKUP_BATCH]
+        placeholders = ", ".join(["%s"] * len(batch))
+        try:
+            execute_write(
+                f"UPDATE embedding_cache SET hit_count = hit_count + 1, "
+                f"last_used_at = CURRENT_TIMESTAMP WHERE cache_key IN ({placeholders})",
+                tuple(batch),
+            )
+        except Exception:
+            logger.debug("Embedding cache hit update failed", exc_info=True)
+            return
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def _embed_batches(embedder: Embedder, texts: list[str]) -> list[list[float]]:
+    """Embed ``texts`` in API-sized batches, several batches in flight."""
+    size = max(1, embedder.batch_size)
+    batches = [texts[i:i + size] for i in range(0, len(texts), size)]
+    try:
+        workers = max(1, int(os.environ.get("EMBED_CONCURRENCY", "4")))
+    except ValueError:
+        workers = 4
+    if len(batches) <= 1 or workers == 1:
+        out: list[list[float]] = []
+        for n, batch in enumerate(batches, 1):
+            out.extend(embedder.embed(batch))
+            if n < len(batches):
+                logger.info("Embedded %d/%d texts...", min(n * size, len(texts)), len(texts))
+        return out
+    with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        results = list(pool.map(embedder.embed, batches))
+    return [vec for batch in results for vec in batch]
+
+
+def embed_texts(texts: list[str], model: str = _MODEL,
+                stats: Optional[dict] = None) -> list[list[float]]:
+    """Embed a list of texts, serving repeats from the embedding cache.
+
+    Args:
+        texts: List of text strings to embed.
+        model: OpenAI model name (used when the default embedder is active).
+        stats: Optional dict, filled with ``cached`` / ``embedded`` counts.
+
+    Returns:
+        List of embedding vectors (each a list of floats), in input order.
+
+    Raises:
+        RuntimeError: If OPENAI_API_KEY is not set and any text is uncached.
+        Exception: On API failure after retries.
+    """
+    embedder = get_embedder()
+    if isinstance(embedder, OpenAIEmbedder) and model != embedder.model:
+        embedder = OpenAIEmbedder(model=model)
+    name = embedder.name
+
+    keys = [embedding_cache_key(name, t) for t in texts]
+    vectors: dict[str, list[float]] = {}
+    use_cache = is_cache_enabled()
+    use_lru = use_cache and len(texts) <= _LRU_MAX_CALL_TEXTS
+    if use_lru:
+        for key in keys:
+            hit = _lru.get(key)
+            if hit is not None:
+                vectors[key] = hit
+
+    pending = list(dict.fromkeys(k for k in keys if k not in vectors))
+    if use_cache and pending:
+        from_db = _cache_lookup(pending)
+        if from_db:
+            vectors.update(from_db)
+            _touch(list(from_db))
+
+    # Embed each distinct uncached text once
+    miss_keys = list(dict.fromkeys(k for k in keys if k not in vectors))
+    if miss_keys:
+        first_text = {}
+        for key, text in zip(keys, texts):
+            first_text.setdefault(key, text)
+        fresh = _embed_batches(embedder, [first_text[k] for k in miss_keys])
+        new_entries = list(zip(miss_keys, fresh))
+        vectors.update(new_entries)
+        if use_cache:
+            _cache_store(name, new_entries)
+
+    if use_lru:
+        for key in set(keys):
+            _lru.put(key, vectors[key])
+
+    if stats is not None:
+        stats["cached"] = stats.get("cached", 0) + len(set(keys)) - len(miss_keys)
+        stats["embedded"] = stats.get("embedded", 0) + len(miss_keys)
+    return [vectors[k] for k in keys]
 
 
 def embed_query(text: str, model: str = _MODEL) -> list[float]:
@@ -83,3 +384,20 @@ def embed_query(text: str, model: str = _MODEL) -> list[float]:
     """
     results = embed_texts([text], model=model)
     return results[0]
+
+
+def prune_embedding_cache(max_age_days: int = 180) -> int:
+    """Delete cache entries unused for ``max_age_days``. Returns rows deleted."""
+    from src.db import BACKEND, execute_write, query_one
+
+    max_age_days = int(max_age_days)
+    if BACKEND == "postgres":
+        age_expr = f"NOW() - INTERVAL '{max_age_days} days'"
+    else:
+        age_expr = f"CURRENT_TIMESTAMP - INTERVAL '{max_age_days} days'"
+    before = query_one("SELECT COUNT(*) FROM embedding_cache")
+    execute_write(
+        f"DELETE FROM embedding_cache WHERE COALESCE(last_used_at, created_at) < {age_expr}"
+    )
+    after = query_one("SELECT COUNT(*) FROM embedding_cache")
+    return (before[0] if before else 0) - (after[0] if after else 0)
@@ -0,0 +1,455 @@
+"""Local in-process vector index for knowledge chunks.
+
+Serves the same search contract as the pgvector store (see store.search)
+from a NumPy float32 matrix on local disk, so DuckDB/dev deployments get
+vector retrieval and production can skip the database round-trip.
+
+An index directory holds:
+
+    manifest.json  — dims, count, model, source, built_at, hnsw flag
+    vectors.f32    — row-major float32 matrix (count x dims), L2-normalized,
+                     memory-mapped on load
+    chunks.jsonl   — one record per row (content, source_file, source_section,
+                     source_tier, trust_weight, metadata)
+    hnsw.bin       — optional hnswlib graph (cosine space)
+
+Search is exact (one matrix-vector product) unless an HNSW graph was built
+and ``hnswlib`` is installed. Tier filters use precomputed row sets.
+
+Indexes are built from the ``knowledge_chunks`` table
+(``build_index_from_db``) or directly from chunker output plus embeddings
+(``LocalIndexWriter``); see ``scripts/rag_ingest.py --backend local``.
+
+Requires ``numpy``; ``hnswlib`` is optional.
+
+Environment variables:
+    RAG_LOCAL_INDEX_DIR: Index directory (default: data/rag_index).
+    RAG_HNSW_EF: HNSW query-time ef (default 64).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "rag_index"
+DEFAULT_HNSW_M = 16
+DEFAULT_HNSW_EF_CONSTRUCTION = 200
+DEFAULT_HNSW_EF = 64
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+RECORDS_FILE = "chunks.jsonl"
+HNSW_FILE = "hnsw.bin"
+
+_RECORD_FIELDS = ("content", "source_file", "source_section", "source_tier",
+                  "trust_weight", "metadata")
+
+
+def _np():
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("numpy package not installed. Run: pip install numpy")
+    return np
+
+
+def _hnswlib():
+    try:
+        import hnswlib
+        return hnswlib
+    except ImportError:
+        return None
+
+
+def get_index_dir() -> Path:
+    """Return the configured local index directory."""
+    return Path(os.environ.get("RAG_LOCAL_INDEX_DIR") or DEFAULT_INDEX_DIR)
+
+
+def local_index_available(path: Optional[Path] = None) -> bool:
+    """True if a local index has been built at ``path`` (or the default dir)."""
+    return ((path or get_index_dir()) / MANIFEST_FILE).exists()
+
+
+class LocalVectorIndex:
+    """Cosine-similarity index over unit-normalized float32 rows.
+
+    Args:
+        vectors: (count, dims) float32 array or memmap, rows L2-normalized.
+        records: Chunk records aligned with ``vectors`` rows.
+        hnsw: Optional loaded ``hnswlib.Index``.
+        manifest: Build metadata.
+    """
+
+    def __init__(self, vectors, records: list[dict], hnsw=None,
+                 manifest: Optional[dict] = None):
+        np = _np()
+        if len(records) != vectors.shape[0]:
+            raise ValueError(f"Record count ({len(records)}) != vector count ({vectors.shape[0]})")
+        self.vectors = vectors
+        self.records = records
+        self.manifest = manifest or {}
+        self._hnsw = hnsw
+        tiers: dict[str, list[int]] = {}
+        for i, rec in enumerate(records):
+            tiers.setdefault(rec.get("source_tier") or "official", []).append(i)
+        self._tier_rows = {t: np.asarray(rows, dtype=np.int64) for t, rows in tiers.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def dims(self) -> int:
+        return int(self.vectors.shape[1]) if len(self.vectors.shape) == 2 else 0
+
+    @property
+    def has_hnsw(self) -> bool:
+        return self._hnsw is not None
+
+    # ── Build / persist ──
+
+    @classmethod
+    def build(cls, records: list[dict], embeddings, with_hnsw: bool = False,
+              hnsw_m: int = DEFAULT_HNSW_M,
+              ef_construction: int = DEFAULT_HNSW_EF_CONSTRUCTION,
+              manifest: Optional[dict] = None) -> "LocalVectorIndex":
+        """Build an in-memory index from records and their embeddings."""
+        np = _np()
+        if len(records) != len(embeddings):
+            raise ValueError(f"Chunk count ({len(records)}) != embedding count ({len(embeddings)})")
+        mat = np.asarray(embeddings, dtype=np.float32)
+        if mat.ndim != 2:
+            mat = mat.reshape(len(records), -1)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        mat = mat / norms
+
+        hnsw = None
+        if with_hnsw and len(records):
+            hnswlib = _hnswlib()
+            if hnswlib is None:
+                logger.warning("hnswlib not installed — building exact-search index only")
+            else:
+                hnsw = hnswlib.Index(space="cosine", dim=mat.shape[1])
+                hnsw.init_index(max_elements=len(records), ef_construction=ef_construction, M=hnsw_m)
+                hnsw.add_items(mat, np.arange(len(records)))
+                hnsw.set_ef(_hnsw_ef())
+
+        meta = dict(manifest or {})
+        meta.update({
+            "dims": int(mat.shape[1]) if len(records) else 0,
+            "count": len(records),
+            "hnsw": hnsw is not None,
+            "built_at": datetime.now(timezone.utc).isoformat(),
+        })
+        return cls(mat, [_clean_record(r) for r in records], hnsw=hnsw, manifest=meta)
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Write the index to ``path``, replacing any existing index atomically."""
+        np = _np()
+        path = Path(path or get_index_dir())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        np.ascontiguousarray(self.vectors, dtype="<f4").tofile(tmp / VECTORS_FILE)
+        with open(tmp / RECORDS_FILE, "w", encoding="utf-8") as f:
+            for rec in self.records:
+                f.write(json.dumps(rec, default=str) + "\n")
+        if self._hnsw is not None:
+            self._hnsw.save_index(str(tmp / HNSW_FILE))
+        with open(tmp / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+
+        old = path.with_name(f"{path.name}.old-{os.getpid()}")
+        if path.exists():
+            path.rename(old)
+        tmp.rename(path)
+        shutil.rmtree(old, ignore_errors=True)
+        logger.info("Saved local vector index: %d rows, dims=%d, hnsw=%s → %s",
+                    len(self), self.dims, self.has_hnsw, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None, mmap: bool = True) -> "LocalVectorIndex":
+        """Load an index directory. Vectors are memory-mapped by default."""
+        np = _np()
+        path = Path(path or get_index_dir())
+        with open(path / MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+        count, dims = int(manifest["count"]), int(manifest["dims"])
+
+        if count == 0:
+            vectors = np.zeros((0, dims), dtype=np.float32)
+        elif mmap:
+            vectors = np.memmap(path / VECTORS_FILE, dtype="<f4", mode="r", shape=(count, dims))
+        else:
+            vectors = np.fromfile(path / VECTORS_FILE, dtype="<f4").reshape(count, dims)
+
+        with open(path / RECORDS_FILE, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+        hnsw = None
+        if manifest.get("hnsw") and (path / HNSW_FILE).exists():
+            hnswlib = _hnswlib()
+            if hnswlib is None:
+                logger.info("hnswlib not installed — local index will use exact search")
+            else:
+                hnsw = hnswlib.Index(space="cosine", dim=dims)
+                hnsw.load_index(str(path / HNSW_FILE), max_elements=count)
+                hnsw.set_ef(_hnsw_ef())
+        return cls(vectors, records, hnsw=hnsw, manifest=manifest)
+
+    # ── Search ──
+
+    def search(self, query_embedding: list[float], top_k: int = 20,
+               source_tier: Optional[str] = None, exact: bool = False) -> list[dict]:
+        """Cosine similarity search (same result shape as store.search).
+
+        Args:
+            query_embedding: Query vector (must match index dims).
+            top_k: Number of results to return.
+            source_tier: Optional filter by tier.
+            exact: Force brute-force search even if an HNSW graph is loaded.
+        """
+        np = _np()
+        if not len(self) or top_k <= 0:
+            return []
+        q = np.asarray(query_embedding, dtype=np.float32)
+        if q.shape[0] != self.dims:
+            raise ValueError(f"Query dims ({q.shape[0]}) != index dims ({self.dims})")
+        norm = float(np.linalg.norm(q))
+        if norm:
+            q = q / norm
+
+        rows = None
+        if source_tier:
+            rows = self._tier_rows.get(source_tier)
+            if rows is None:
+                return []
+
+        if self._hnsw is not None and not exact:
+            hits = self._search_hnsw(q, top_k, source_tier, rows)
+            if hits is not None:
+                return hits
+
+        sims = self.vectors @ q
+        if rows is not None:
+            cand_sims = sims[rows]
+            cand_ids = rows
+        else:
+            cand_sims = sims
+            cand_ids = None
+        k = min(top_k, cand_sims.shape[0])
+        top = np.argpartition(-cand_sims, k - 1)[:k]
+        top = top[np.argsort(-cand_sims[top], kind="stable")]
+        ids = cand_ids[top] if cand_ids is not None else top
+        return [self._result(int(i), float(cand_sims[t])) for i, t in zip(ids, top)]
+
+    def _search_hnsw(self, q, top_k: int, source_tier: Optional[str], rows):
+        """Approximate search. Returns None if the caller should fall back to exact."""
+        if rows is not None and len(rows) < len(self) // 2:
+            return None  # small tier subset — exact over it is cheaper and exact
+        fetch = top_k if rows is None else min(len(self), top_k * 3)
+        labels, distances = self._hnsw.knn_query(q, k=min(fetch, len(self)))
+        hits = []
+        for label, dist in zip(labels[0], distances[0]):
+            rec = self.records[int(label)]
+            if source_tier and (rec.get("source_tier") or "official") != source_tier:
+                continue
+            hits.append(self._result(int(label), 1.0 - float(dist)))
+            if len(hits) == top_k:
+                break
+        if len(hits) < min(top_k, len(rows) if rows is not None else len(self)):
+            return None
+        return hits
+
+    def _result(self, row: int, similarity: float) -> dict:
+        rec = self.records[row]
+        return {
+            "content": rec.get("content", ""),
+            "source_file": rec.get("source_file"),
+            "source_section": rec.get("source_section"),
+            "source_tier": rec.get("source_tier"),
+            "trust_weight": rec.get("trust_weight", 1.0),
+            "similarity": similarity,
+            "metadata": rec.get("metadata") or {},
+        }
+
+    def get_stats(self) -> dict:
+        """Chunk counts in the same shape as store.get_stats."""
+        by_file: dict[str, int] = {}
+        for rec in self.records:
+            by_file[rec.get("source_file")] = by_file.get(rec.get("source_file"), 0) + 1
+        top_files = dict(sorted(by_file.items(), key=lambda kv: kv[1], reverse=True)[:20])
+        return {
+            "total_chunks": len(self),
+            "by_tier": {t: int(len(r)) for t, r in self._tier_rows.items()},
+            "top_files": top_files,
+            "backend": "local",
+            "hnsw": self.has_hnsw,
+        }
+
+
+def _hnsw_ef() -> int:
+    try:
+        return int(os.environ.get("RAG_HNSW_EF", DEFAULT_HNSW_EF))
+    except ValueError:
+        return DEFAULT_HNSW_EF
+
+
+def _clean_record(rec: dict) -> dict:
+    out = {k: rec.get(k) for k in _RECORD_FIELDS}
+    out["content"] = (out["content"] or "").replace("\x00", "").replace("�", "")
+    out["source_tier"] = out["source_tier"] or "official"
+    out["trust_weight"] = out["trust_weight"] if out["trust_weight"] is not None else 1.0
+    meta = out["metadata"]
+    if isinstance(meta, str):
+        try:
+            meta = json.loads(meta)
+        except json.JSONDecodeError:
+            meta = {}
+    out["metadata"] = meta or {}
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Builders
+# ---------------------------------------------------------------------------
+
+class LocalIndexWriter:
+    """Accumulate chunker output + embeddings tier by tier, then save.
+
+    Mirrors ``store.insert_chunks`` so the ingestion script can target
+    either backend with the same calls.
+    """
+
+    def __init__(self):
+        self.records: list[dict] = []
+        self.embeddings: list[list[float]] = []
+
+    def insert_chunks(self, chunks: list[dict], embeddings: list[list[float]],
+                      source_tier: str = "official", trust_weight: float = 1.0):
+        if len(chunks) != len(embeddings):
+            raise ValueError(f"Chunk count ({len(chunks)}) != embedding count ({len(embeddings)})")
+        for chunk in chunks:
+            self.records.append({
+                "content": chunk["content"],
+                "source_file": chunk.get("source_file"),
+                "source_section": chunk.get("source_section"),
+                "source_tier": source_tier,
+                "trust_weight": trust_weight,
+                "metadata": chunk.get("metadata", {}),
+            })
+        self.embeddings.extend(embeddings)
+
+    def save(self, path: Optional[Path] = None, with_hnsw: bool = False) -> LocalVectorIndex:
+        from src.rag.embeddings import _MODEL
+
+        index = LocalVectorIndex.build(
+            self.records, self.embeddings, with_hnsw=with_hnsw,
+            manifest={"source": "chunker", "model": _MODEL},
+        )
+        index.save(path)
+        _reset_cache()
+        return index
+
+
+def iter_db_chunks(batch_size: int = 2000):
+    """Yield (record, embedding) pairs from the pgvector ``knowledge_chunks`` table."""
+    from src.rag.store import TABLE, _get_conn
+
+    conn = _get_conn()
+    try:
+        # Named cursor → server-side, streams instead of loading 1536-d text rows at once
+        cur = conn.cursor(name="rag_local_export")
+        cur.itersize = batch_size
+        cur.execute(
+            f"SELECT embedding::text, content, source_file, source_section, "
+            f"source_tier, trust_weight, metadata FROM {TABLE} "
+            f"WHERE embedding IS NOT NULL ORDER BY id"
+        )
+        for row in cur:
+            yield {
+                "content": row[1],
+                "source_file": row[2],
+                "source_section": row[3],
+                "source_tier": row[4],
+                "trust_weight": row[5],
+                "metadata": row[6],
+            }, json.loads(row[0])
+    finally:
+        conn.close()
+
+
+def build_index_from_db(path: Optional[Path] = None, with_hnsw: bool = False) -> LocalVectorIndex:
+    """Export ``knowledge_chunks`` (pgvector) into a local index directory."""
+    from src.rag.embeddings import _MODEL
+
+    t0 = time.perf_counter()
+    records, embeddings = [], []
+    for rec, emb in iter_db_chunks():
+        records.append(rec)
+        embeddings.append(emb)
+    index = LocalVectorIndex.build(
+        records, embeddings, with_hnsw=with_hnsw,
+        manifest={"source": "knowledge_chunks", "model": _MODEL},
+    )
+    index.save(path)
+    _reset_cache()
+    logger.info("Built local index from knowledge_chunks: %d rows in %.1fs",
+                len(index), time.perf_counter() - t0)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Process-wide cached index
+# ---------------------------------------------------------------------------
+
+_cached: Optional[LocalVectorIndex] = None
+_cached_key: Optional[tuple] = None
+_cache_lock = threading.Lock()
+
+
+def _reset_cache() -> None:
+    global _cached, _cached_key
+    with _cache_lock:
+        _cached = None
+        _cached_key = None
+
+
+def get_local_index() -> Optional[LocalVectorIndex]:
+    """Return the loaded local index, reloading if it was rebuilt on disk.
+
+    Returns None if no index exists or numpy is unavailable.
+    """
+    global _cached, _cached_key
+    path = get_index_dir()
+    try:
+        mtime = (path / MANIFEST_FILE).stat().st_mtime
+    except OSError:
+        return None
+    key = (str(path), mtime)
+    if _cached is not None and _cached_key == key:
+        return _cached
+    with _cache_lock:
+        if _cached is None or _cached_key != key:
+            try:
+                _cached = LocalVectorIndex.load(path)
+                _cached_key = key
+                logger.info("Loaded local vector index: %d rows, hnsw=%s", len(_cached), _cached.has_hnsw)
+            except Exception as e:
+                logger.error("Failed to load local vector index from %s: %s", path, e)
+                return None
+        return _cached
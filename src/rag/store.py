@@ -2,6 +2,14 @@
 
 Handles table creation, upsert, and vector similarity search
 against the existing Railway PostgreSQL database.
+
+``search`` can also be served by the local NumPy index in local_index.py
+(for DuckDB/dev deployments, or to skip the database in production).
+
+Environment variables:
+    RAG_VECTOR_BACKEND: 'pgvector', 'local', or 'auto' (default). Auto uses
+        pgvector when DATABASE_URL is set, else the local index if one
+        has been built.
 """
 
 from __future__ import annotations
@@ -58,6 +66,32 @@ def _get_conn():
     return psycopg2.connect(url, connect_timeout=10)
 
 
+def _get_read_conn():
+    """Connection for read-only queries — pooled when the app pool is up.
+
+    ``search`` runs on every /ask; reusing a pooled connection avoids a TCP +
+    auth handshake per query. Writes keep using ``_get_conn`` (no pool
+    statement_timeout on index rebuilds).
+    """
+    from src.db import BACKEND
+
+    if BACKEND == "postgres":
+        from src.db import get_connection
+        return get_connection()
+    return _get_conn()
+
+
+def get_vector_backend() -> str:
+    """Resolve RAG_VECTOR_BACKEND to 'pgvector' or 'local'."""
+    choice = os.environ.get("RAG_VECTOR_BACKEND", "auto").strip().lower()
+    if choice in ("pgvector", "local"):
+        return choice
+    if os.environ.get("DATABASE_URL"):
+        return "pgvector"
+    from src.rag.local_index import local_index_available
+    return "local" if local_index_available() else "pgvector"
+
+
 def ensure_table():
     """Create the knowledge_chunks table and indexes if they don't exist."""
     conn = _get_conn()
@@ -153,10 +187,18 @@ def search(query_embedding: list[float], top_k: int = 20,
         List of dicts with: content, source_file, source_section, source_tier,
         trust_weight, similarity, metadata.
     """
-    conn = _get_conn()
+    if get_vector_backend() == "local":
+        from src.rag.local_index import get_local_index
+
+        index = get_local_index()
+        if index is None:
+            logger.warning("RAG local index not available — run rag_ingest --backend local")
+            return []
+        return index.search(query_embedding, top_k=top_k, source_tier=source_tier)
+
+    conn = _get_read_conn()
     try:
         cur = conn.cursor()
-        tier_clause = "AND source_tier = %s" if source_tier else ""
         params = [str(query_embedding), top_k]
         if source_tier:
             params = [str(query_embedding), source_tier, top_k]
@@ -207,6 +249,14 @@ def search(query_embedding: list[float], top_k: int = 20,
 
 def get_stats() -> dict:
     """Get chunk count statistics."""
+    if get_vector_backend() == "local":
+        from src.rag.local_index import get_local_index
+
+        index = get_local_index()
+        if index is None:
+            return {"total_chunks": 0, "by_tier": {}, "top_files": {}, "backend": "local"}
+        return index.get_stats()
+
     conn = _get_conn()
     try:
         cur = conn.cursor()
@@ -0,0 +1,399 @@
+"""Per-permit routing summary — batched routing progress from addenda.
+
+Routing progress used to be fetched one permit at a time: the search intel
+panel ran a ``SELECT ... FROM addenda WHERE application_number = ?`` per
+active permit, similar_projects ran one per candidate, and
+get_routing_progress_batch OR-chained (permit, revision) pairs.
+permit_routing_summary holds one compact row per permit instead:
+
+  - latest_addenda: the latest revision (MAX(addenda_number))
+  - counters over that revision's routing steps: total / completed /
+    approved / comments_issued / pending, plus current_station (first
+    pending step) and latest_finish
+  - steps: the latest revision's steps in step order (JSON), enough to
+    rebuild web.routing.RoutingProgress
+  - stations_visited: distinct stations across every revision (JSON, sorted)
+
+get_routing_batch() answers N permits with one indexed lookup and, while
+the summary has not been built yet, one batched addenda query summarized
+the same way.  Maintenance: refresh_routing_summary(conn) rebuilds from
+scratch in one ordered scan of addenda (after a full addenda ingest);
+refresh_routing_summary(conn, permit_numbers) re-summarizes the permits
+touched by the nightly addenda delta.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+
+from src.db import BACKEND, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Permits per IN-list (batch lookups, delta refresh) and per full-rebuild write
+PERMIT_CHUNK = 1000
+# Addenda rows fetched per round trip during a full rebuild
+SCAN_ROWS = 20000
+
+_STEP_COLUMNS = (
+    "addenda_number, step, station, department, plan_checked_by, review_results, "
+    "finish_date, arrive, hold_description"
+)
+
+_SUMMARY_COLUMNS = (
+    "latest_addenda", "total_stations", "completed_stations", "approved_stations",
+    "comments_issued", "pending_stations", "current_station", "latest_finish",
+    "stations_visited", "steps",
+)
+
+
+def _ph() -> str:
+    return "%s" if BACKEND == "postgres" else "?"
+
+
+def _run(conn, sql: str, params=None) -> list[tuple]:
+    if BACKEND == "postgres":
+        with conn.cursor() as cur:
+            cur.execute(sql, params or None)
+            return cur.fetchall() if cur.description else []
+    return conn.execute(sql, params or []).fetchall()
+
+
+def _chunks(items: list, size: int = PERMIT_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def ensure_routing_summary_table(conn=None) -> None:
+    """Create permit_routing_summary if it doesn't exist."""
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    ddl = """
+        CREATE TABLE IF NOT EXISTS permit_routing_summary (
+            application_number TEXT PRIMARY KEY,
+            latest_addenda INTEGER NOT NULL,
+            total_stations INTEGER NOT NULL,
+            completed_stations INTEGER NOT NULL,
+            approved_stations INTEGER NOT NULL,
+            comments_issued INTEGER NOT NULL,
+            pending_stations INTEGER NOT NULL,
+            current_station TEXT,
+            latest_finish TEXT,
+            stations_visited TEXT,
+            steps TEXT,
+            refreshed_at TIMESTAMP
+        )
+    """
+    try:
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(ddl)
+            conn.commit()
+        else:
+            conn.execute(ddl)
+    finally:
+        if close:
+            conn.close()
+
+
+# ── Summarizing ─────────────────────────────────────────────────────
+
+
+def _text(v) -> str | None:
+    return str(v) if v else None
+
+
+def _summarize(rows) -> dict | None:
+    """Summarize one permit's addenda rows (ordered by addenda_number, step).
+
+    Counters follow web.routing.RoutingProgress: a step is complete when it
+    has a finish_date, approved / commented by its review result.  None when
+    the permit has no numbered revision.
+    """
+    revs = [r[0] for r in rows if r[0] is not None]
+    if not revs:
+        return None
+    latest = max(revs)
+
+    steps = []
+    completed = approved = comments = 0
+    current = latest_finish = None
+    for r in rows:
+        if r[0] != latest:
+            continue
+        result = _text(r[5])
+        finish = str(r[6])[:10] if r[6] else None
+        steps.append([
+            str(r[2] or ""), _text(r[3]), _text(r[4]), result, finish,
+            str(r[7])[:10] if r[7] else None, _text(r[8]), r[0], r[1],
+        ])
+        if finish:
+            completed += 1
+            lowered = (result or "").lower()
+            approved += "approv" in lowered
+            comments += "comment" in lowered
+            if latest_finish is None or finish > latest_finish:
+                latest_finish = finish
+        elif current is None:
+            current = str(r[2] or "")
+
+    visited = sorted({r[2] for r in rows if r[2]})
+    return {
+        "latest_addenda": latest,
+        "total_stations": len(steps),
+        "completed_stations": completed,
+        "approved_stations": approved,
+        "comments_issued": comments,
+        "pending_stations": len(steps) - completed,
+        "current_station": current,
+        "latest_finish": latest_finish,
+        "stations_visited": visited,
+        "steps": steps,
+    }
+
+
+def _summarize_addenda(conn, where: str, params: list) -> dict[str, dict]:
+    """Fetch addenda rows matching ``where`` and summarize them per permit."""
+    rows = _run(
+        conn,
+        f"SELECT application_number, {_STEP_COLUMNS} FROM addenda WHERE {where} "
+        "ORDER BY application_number, addenda_number, step",
+        params,
+    )
+    grouped: dict[str, list] = {}
+    for r in rows:
+        grouped.setdefault(str(r[0]), []).append(r[1:])
+    out = {}
+    for pnum, permit_rows in grouped.items():
+        summary = _summarize(permit_rows)
+        if summary:
+            out[pnum] = summary
+    return out
+
+
+def _scan_addenda(conn):
+    """Yield ``(application_number, rows)`` for every permit in one ordered scan."""
+    sql = (
+        f"SELECT application_number, {_STEP_COLUMNS} FROM addenda "
+        "WHERE application_number > '' "
+        "ORDER BY application_number, addenda_number, step"
+    )
+    if BACKEND == "postgres":
+        # Named cursor: rows stay on the server until fetched
+        cur = conn.cursor(name="routing_summary_rebuild")
+        cur.itersize = SCAN_ROWS
+    else:
+        cur = conn.cursor()
+    try:
+        cur.execute(sql)
+        current, group = None, []
+        while rows := cur.fetchmany(SCAN_ROWS):
+            for r in rows:
+                pnum = str(r[0])
+                if pnum != current:
+                    if group:
+                        yield current, group
+                    current, group = pnum, []
+                group.append(r[1:])
+        if group:
+            yield current, group
+    finally:
+        cur.close()
+
+
+# DuckDB types for the bulk-load file read in _write
+_SUMMARY_TYPES = {
+    "application_number": "VARCHAR", "latest_addenda": "INTEGER",
+    "total_stations": "INTEGER", "completed_stations": "INTEGER",
+    "approved_stations": "INTEGER", "comments_issued": "INTEGER",
+    "pending_stations": "INTEGER", "current_station": "VARCHAR",
+    "latest_finish": "VARCHAR", "stations_visited": "VARCHAR", "steps": "VARCHAR",
+}
+
+
+def _write(conn, summaries: dict[str, dict]) -> None:
+    """Bulk-insert summaries (execute_values on Postgres, a JSON file on DuckDB).
+
+    Row-at-a-time executemany dominated full rebuilds, DuckDB's especially.
+    """
+    if not summaries:
+        return
+    columns = ("application_number", *_SUMMARY_COLUMNS)
+    rows = []
+    for pnum, s in summaries.items():
+        values = [s[c] for c in _SUMMARY_COLUMNS]
+        values[-2:] = [json.dumps(s["stations_visited"]), json.dumps(s["steps"])]
+        rows.append((pnum, *values))
+    if BACKEND == "postgres":
+        from psycopg2.extras import execute_values
+
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                f"INSERT INTO permit_routing_summary ({', '.join(columns)}, refreshed_at) "
+                "VALUES %s",
+                rows,
+                template=f"({', '.join(['%s'] * len(columns))}, CURRENT_TIMESTAMP)",
+                page_size=PERMIT_CHUNK,
+            )
+        return
+    # JSON lines keep NULL and '' apart, which CSV does not
+    fd, path = tempfile.mkstemp(prefix="routing_summary_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row))) + "\n")
+        types = ", ".join(f"'{c}': '{_SUMMARY_TYPES[c]}'" for c in columns)
+        conn.execute(
+            f"INSERT INTO permit_routing_summary ({', '.join(columns)}, refreshed_at) "
+            f"SELECT {', '.join(columns)}, CURRENT_TIMESTAMP "
+            f"FROM read_json(?, format='newline_delimited', columns={{{types}}})",
+            [path],
+        )
+    finally:
+        os.unlink(path)
+
+
+def _replace(conn, permit_numbers: list[str]) -> int:
+    """Re-summarize a chunk of permits (delete + insert)."""
+    ph = _ph()
+    in_list = ", ".join([ph] * len(permit_numbers))
+    summaries = _summarize_addenda(conn, f"application_number IN ({in_list})", permit_numbers)
+    _run(conn, f"DELETE FROM permit_routing_summary WHERE application_number IN ({in_list})",
+         permit_numbers)
+    _write(conn, summaries)
+    return len(summaries)
+
+
+def refresh_routing_summary(conn=None, permit_numbers=None) -> dict:
+    """Rebuild permit_routing_summary, or just the given permits.
+
+    With ``permit_numbers`` (the nightly addenda delta) only those permits
+    are re-summarized; otherwise — or while the table is still empty — it is
+    rebuilt from one ordered scan of addenda, grouped per permit as it
+    streams.  Returns stats dict for logging.
+    """
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    summarized = 0
+    in_transaction = False
+    try:
+        ensure_routing_summary_table(conn)
+        if permit_numbers is not None and not is_ready(conn):
+            # A partial summary would hide every other permit from lookups
+            permit_numbers = None
+        if permit_numbers is not None:
+            permits = sorted({str(p) for p in permit_numbers if p})
+            for chunk in _chunks(permits):
+                summarized += _replace(conn, chunk)
+                if BACKEND == "postgres":
+                    conn.commit()
+            logger.info("routing summary: %d of %d permits re-summarized",
+                        summarized, len(permits))
+            return {"permits": len(permits), "summarized": summarized}
+
+        if BACKEND != "postgres":
+            conn.execute("BEGIN TRANSACTION")
+            in_transaction = True
+        _run(conn, "DELETE FROM permit_routing_summary")
+        summaries: dict[str, dict] = {}
+        for pnum, permit_rows in _scan_addenda(conn):
+            summary = _summarize(permit_rows)
+            if summary:
+                summaries[pnum] = summary
+            if len(summaries) >= PERMIT_CHUNK:
+                _write(conn, summaries)
+                summarized += len(summaries)
+                summaries = {}
+        _write(conn, summaries)
+        summarized += len(summaries)
+        if BACKEND == "postgres":
+            conn.commit()
+        else:
+            conn.execute("COMMIT")
+        logger.info("routing summary rebuilt: %d permits", summarized)
+        return {"summarized": summarized}
+    except Exception:
+        if BACKEND == "postgres":
+            conn.rollback()
+        elif in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        if close:
+            conn.close()
+
+
+# ── Lookups ─────────────────────────────────────────────────────────
+
+
+def is_ready(conn) -> bool:
+    """True when permit_routing_summary exists and has been populated."""
+    try:
+        return bool(_run(conn, "SELECT 1 FROM permit_routing_summary LIMIT 1"))
+    except Exception:
+        if BACKEND == "postgres":
+            conn.rollback()
+        return False
+
+
+def get_routing_batch(permit_numbers, conn=None) -> dict[str, dict]:
+    """Routing summaries for many permits: {permit_number: summary}.
+
+    Each summary has latest_addenda, the progress counters, current_station,
+    latest_finish, stations_visited and the latest revision's ordered
+    ``steps`` ([station, department, reviewer, result, finish_date, arrive,
+    hold_description, addenda_number, step]).  Permits without routing data
+    are omitted.  Reads permit_routing_summary; until it has been built,
+    summarizes addenda directly (one query per PERMIT_CHUNK permits).
+    """
+    permits = list(dict.fromkeys(str(p) for p in permit_numbers if p))
+    if not permits:
+        return {}
+
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    ph = _ph()
+    out: dict[str, dict] = {}
+    try:
+        try:
+            for chunk in _chunks(permits):
+                rows = _run(
+                    conn,
+                    f"SELECT application_number, {', '.join(_SUMMARY_COLUMNS)} "
+                    "FROM permit_routing_summary "
+                    f"WHERE application_number IN ({', '.join([ph] * len(chunk))})",
+                    chunk,
+                )
+                for r in rows:
+                    s = dict(zip(_SUMMARY_COLUMNS, r[1:]))
+                    s["stations_visited"] = json.loads(s["stations_visited"] or "[]")
+                    s["steps"] = json.loads(s["steps"] or "[]")
+                    out[str(r[0])] = s
+            if len(out) == len(permits) or is_ready(conn):
+                return out
+        except Exception:
+            logger.debug("permit_routing_summary unavailable", exc_info=True)
+            if BACKEND == "postgres":
+                conn.rollback()
+
+        for chunk in _chunks(permits):
+            out.update(_summarize_addenda(
+                conn, f"application_number IN ({', '.join([ph] * len(chunk))})", chunk,
+            ))
+        return out
+    finally:
+        if close:
+            conn.close()
@@ -8,64 +8,7 @@ Phase 2.75: Permit decision tools — prediction, timelines, fees, documents, re
 
 from mcp.server.fastmcp import FastMCP
 
-from src.tools.search_permits import search_permits
-from src.tools.get_permit_details import get_permit_details
-from src.tools.permit_stats import permit_stats
-from src.tools.search_businesses import search_businesses
-from src.tools.property_lookup import property_lookup
-
-# Phase 1.5 tools (DBI enforcement — live SODA API)
-from src.tools.search_complaints import search_complaints
-from src.tools.search_violations import search_violations
-from src.tools.search_inspections import search_inspections
-
-# Phase 2 tools (local DuckDB)
-from src.tools.search_entity import search_entity
-from src.tools.entity_network import entity_network
-from src.tools.network_anomalies import network_anomalies
-
-# Phase 2.75 tools (knowledge base + DuckDB)
-from src.tools.predict_permits import predict_permits
-from src.tools.estimate_timeline import estimate_timeline
-from src.tools.estimate_fees import estimate_fees
-from src.tools.required_documents import required_documents
-from src.tools.revision_risk import revision_risk
-
-# Phase 3 tools (document analysis)
-from src.tools.validate_plans import validate_plans
-
-# Phase 4 tools (AI vision analysis)
-from src.tools.analyze_plans import analyze_plans
-
-# Phase 2 tools (consultant recommender)
-from src.tools.recommend_consultants import recommend_consultants
-
-# Phase 4 tools (lookup / status)
-from src.tools.permit_lookup import permit_lookup
-
-# Phase 5 tools (addenda routing)
-from src.tools.search_addenda import search_addenda
-
-# Phase 5.5 tools (severity scoring)
-from src.tools.permit_severity import permit_severity
-
-# Phase 5.5 tools (signal-based property health)
-from src.tools.property_health import property_health
-
-# Phase 6 tools (operational intelligence)
-from src.tools.list_feedback import list_feedback
-
-# Phase 7 tools (project intelligence)
-from src.tools.project_intel import run_query, read_source, search_source, schema_info, list_tests
-
-# Phase 8 tools (permit intelligence)
-from src.tools.similar_projects import similar_projects
-
-# Phase 9 tools (permit intelligence — station prediction, stuck permits, simulation, delay cost)
-from src.tools.predict_next_stations import predict_next_stations
-from src.tools.stuck_permit import diagnose_stuck_permit
-from src.tools.what_if_simulator import simulate_what_if
-from src.tools.cost_of_delay import calculate_delay_cost
+from src.tool_registry import register_tools, start_warm_up
 
 # Create MCP server
 mcp = FastMCP(
@@ -93,70 +36,11 @@ mcp = FastMCP(
     ),
 )
 
-# Phase 1 tools (live SODA API)
-mcp.tool()(search_permits)
-mcp.tool()(get_permit_details)
-mcp.tool()(permit_stats)
-mcp.tool()(search_businesses)
-mcp.tool()(property_lookup)
-
-# Phase 1.5 tools (DBI enforcement — live SODA API)
-mcp.tool()(search_complaints)
-mcp.tool()(search_violations)
-mcp.tool()(search_inspections)
-
-# Phase 2 tools (local DuckDB network analysis)
-mcp.tool()(search_entity)
-mcp.tool()(entity_network)
-mcp.tool()(network_anomalies)
-
-# Phase 2.75 tools (permit decision tools)
-mcp.tool()(predict_permits)
-mcp.tool()(estimate_timeline)
-mcp.tool()(estimate_fees)
-mcp.tool()(required_documents)
-mcp.tool()(revision_risk)
-
-# Phase 3 tools (document analysis)
-mcp.tool()(validate_plans)
-
-# Phase 4 tools (AI vision analysis)
-mcp.tool()(analyze_plans)
-
-# Phase 2 tools (consultant recommender)
-mcp.tool()(recommend_consultants)
-
-# Phase 4 tools (lookup / status)
-mcp.tool()(permit_lookup)
-
-# Phase 5 tools (addenda routing)
-mcp.tool()(search_addenda)
-
-# Phase 5.5 tools (severity scoring)
-mcp.tool()(permit_severity)
-
-# Phase 5.5 tools (signal-based property health)
-mcp.tool()(property_health)
-
-# Phase 6 tools (operational intelligence)
-mcp.tool()(list_feedback)
-
-# Phase 7 tools (project intelligence)
-mcp.tool()(run_query)
-mcp.tool()(read_source)
-mcp.tool()(search_source)
-mcp.tool()(schema_info)
-mcp.tool()(list_tests)
-
-# Phase 8 tools (permit intelligence)
-mcp.tool()(similar_projects)
-
-# Phase 9 tools (permit intelligence — station prediction, stuck permits, simulation, delay cost)
-mcp.tool()(predict_next_stations)
-mcp.tool()(diagnose_stuck_permit)
-mcp.tool()(simulate_what_if)
-mcp.tool()(calculate_delay_cost)
+# Tools are registered from src/tool_manifest.json and import their modules
+# on first call — see src/tool_registry.py for the tool list.
+register_tools(mcp)
 
 
 if __name__ == "__main__":
+    start_warm_up()
     mcp.run()
@@ -0,0 +1,368 @@
+"""Severity cache refresh — score every active permit into severity_cache.
+
+severity_cache holds one row per permit (score, tier, per-dimension drivers)
+so search results and the property report can show a severity badge without
+scoring on the request path.  /cron/refresh-severity-cache used to score the
+newest 500 active permits and upsert them one statement at a time; this
+covers all of them:
+
+  - stream: active permits (status filed / issued / approved) are read in
+    permit_number order — through a server-side (named) cursor on Postgres,
+    fetchmany on DuckDB — with inspection counts joined in, chunk_size rows
+    at a time
+  - score: chunks are scored on a spawn process pool (SEVERITY_WORKERS,
+    default CPU count; 1 scores inline) while the next chunk is read
+  - upsert: each scored chunk is bulk-loaded into a temp staging table
+    (COPY FROM STDIN on Postgres, a CSV scan on DuckDB) and merged into
+    severity_cache with one statement
+
+Each merged chunk commits together with a checkpoint (the last permit_number
+written) in severity_refresh_state.  A run that hits its time budget returns
+done=False and the next call resumes after the checkpoint, so the cron can
+keep every request under the gunicorn timeout and call again until done.
+When a pass completes, cache rows it did not refresh (permits no longer
+active) are pruned and the checkpoint is cleared.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.db import BACKEND, get_connection
+
+logger = logging.getLogger(__name__)
+
+TABLE = "severity_cache"
+STATE_TABLE = "severity_refresh_state"
+STAGE_TABLE = "severity_cache_stage"
+
+# Permit statuses scored into the cache
+ACTIVE_STATUSES = ("filed", "issued", "approved")
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Stop reading new chunks after this many seconds (gunicorn times out at 600)
+DEFAULT_TIME_BUDGET_S = 240.0
+
+_SELECT_ACTIVE = """
+    SELECT p.permit_number, p.status, p.permit_type_definition, p.description,
+           p.filed_date, p.issued_date, p.completed_date, p.status_date,
+           p.estimated_cost, p.revised_cost, COALESCE(i.n, 0)
+    FROM permits p
+    LEFT JOIN (
+        SELECT reference_number, COUNT(*) AS n FROM inspections GROUP BY reference_number
+    ) i ON i.reference_number = p.permit_number
+    WHERE LOWER(p.status) IN ({statuses})
+      AND p.permit_number > {ph}
+    ORDER BY p.permit_number
+"""
+
+
+def _ph() -> str:
+    return "%s" if BACKEND == "postgres" else "?"
+
+
+def _run(conn, sql: str, params=None) -> list[tuple]:
+    if BACKEND == "postgres":
+        with conn.cursor() as cur:
+            cur.execute(sql, params or None)
+            return cur.fetchall() if cur.description else []
+    return conn.execute(sql, params or []).fetchall()
+
+
+def _worker_count() -> int:
+    try:
+        return max(1, int(os.environ.get("SEVERITY_WORKERS", "") or (os.cpu_count() or 1)))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+# ---------------------------------------------------------------------------
+# Scoring (runs in pool workers)
+# ---------------------------------------------------------------------------
+
+def _score_chunk(rows: list[tuple]) -> tuple[list[tuple], int]:
+    """Score one chunk of _SELECT_ACTIVE rows.
+
+    Returns ([(permit_number, score, tier, drivers_json), ...], errors).
+    """
+    from src.severity import PermitInput, score_permit
+
+    scored, errors = [], 0
+    for row in rows:
+        pnum = row[0]
+        if not pnum:
+            continue
+        try:
+            result = score_permit(PermitInput.from_dict(
+                {
+                    "permit_number": pnum,
+                    "status": row[1] or "",
+                    "permit_type_definition": row[2] or "",
+                    "description": row[3] or "",
+                    "filed_date": row[4],
+                    "issued_date": row[5],
+                    "completed_date": row[6],
+                    "status_date": row[7],
+                    "estimated_cost": row[8],
+                    "revised_cost": row[9],
+                },
+                inspection_count=row[10] or 0,
+            ))
+        except Exception as e:
+            logger.debug("severity score failed for %s: %s", pnum, e)
+            errors += 1
+            continue
+        drivers = json.dumps({dim: vals["score"] for dim, vals in result.dimensions.items()})
+        scored.append((pnum, result.score, result.tier, drivers))
+    return scored, errors
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------
+
+def _ensure_state_table(conn) -> None:
+    ts = "TIMESTAMPTZ" if BACKEND == "postgres" else "TIMESTAMP"
+    _run(conn, f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            id INTEGER PRIMARY KEY,
+            last_permit TEXT NOT NULL,
+            run_started_at {ts} NOT NULL,
+            permits_scored INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _load_checkpoint(conn) -> tuple[str, object, int] | None:
+    rows = _run(conn, f"SELECT last_permit, run_started_at, permits_scored FROM {STATE_TABLE} "
+                      f"WHERE id = 1")
+    return rows[0] if rows else None
+
+
+def _save_checkpoint(conn, last_permit: str, run_started_at, permits_scored: int) -> None:
+    ph = _ph()
+    _run(conn, f"DELETE FROM {STATE_TABLE} WHERE id = 1")
+    _run(conn, f"INSERT INTO {STATE_TABLE} (id, last_permit, run_started_at, permits_scored, "
+               f"updated_at) VALUES (1, {ph}, {ph}, {ph}, CURRENT_TIMESTAMP)",
+         (last_permit, run_started_at, permits_scored))
+
+
+def _now(conn):
+    # As stored in computed_at (TIMESTAMP on DuckDB, TIMESTAMPTZ on Postgres)
+    if BACKEND == "postgres":
+        return _run(conn, "SELECT NOW()")[0][0]
+    return _run(conn, "SELECT CAST(CURRENT_TIMESTAMP AS TIMESTAMP)")[0][0]
+
+
+# ---------------------------------------------------------------------------
+# Stream → stage → merge
+# ---------------------------------------------------------------------------
+
+def _stream(read_conn, after: str, chunk_size: int):
+    """Yield chunks of active permits with permit_number > *after*, in order."""
+    sql = _SELECT_ACTIVE.format(
+        statuses=", ".join(f"'{s}'" for s in ACTIVE_STATUSES), ph=_ph())
+    if BACKEND == "postgres":
+        # Named cursor: rows stay on the server until fetched
+        cur = read_conn.cursor(name="severity_refresh")
+        cur.itersize = chunk_size
+    else:
+        cur = read_conn.cursor()
+    try:
+        cur.execute(sql, (after,) if BACKEND == "postgres" else [after])
+        while rows := cur.fetchmany(chunk_size):
+            yield rows
+    finally:
+        cur.close()
+
+
+def _stage(conn, scored: list[tuple]) -> None:
+    """Bulk-load scored rows into the temp staging table (emptied first)."""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(scored)
+    if BACKEND == "postgres":
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ("
+                        f"permit_number TEXT, score INTEGER, tier TEXT, drivers TEXT) "
+                        f"ON COMMIT DELETE ROWS")
+            buf.seek(0)
+            cur.copy_expert(f"COPY {STAGE_TABLE} FROM STDIN WITH (FORMAT csv)", buf)
+        return
+    # No COPY FROM STDIN in DuckDB — scan the same CSV from a temp file
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} ("
+                 f"permit_number VARCHAR, score INTEGER, tier VARCHAR, drivers VARCHAR)")
+    conn.execute(f"DELETE FROM {STAGE_TABLE}")
+    fd, path = tempfile.mkstemp(prefix="severity_stage_", suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(buf.getvalue())
+        conn.execute(
+            f"INSERT INTO {STAGE_TABLE} SELECT * FROM read_csv(?, header=false, "
+            f"quote='\"', escape='\"', columns={{'permit_number': 'VARCHAR', "
+            f"'score': 'INTEGER', 'tier': 'VARCHAR', 'drivers': 'VARCHAR'}})",
+            [path],
+        )
+    finally:
+        os.unlink(path)
+
+
+def _merge(conn) -> None:
+    """Upsert the staged chunk into severity_cache with one statement."""
+    if BACKEND == "postgres":
+        _run(conn, f"""
+            INSERT INTO {TABLE} (permit_number, score, tier, drivers, computed_at)
+            SELECT permit_number, score, tier, drivers::jsonb, NOW() FROM {STAGE_TABLE}
+            ON CONFLICT (permit_number) DO UPDATE
+            SET score = EXCLUDED.score, tier = EXCLUDED.tier,
+                drivers = EXCLUDED.drivers, computed_at = EXCLUDED.computed_at
+        """)
+        return
+    # DuckDB can't update an indexed column (tier) in place: delete + insert
+    conn.execute(f"DELETE FROM {TABLE} WHERE permit_number IN "
+                 f"(SELECT permit_number FROM {STAGE_TABLE})")
+    conn.execute(f"INSERT INTO {TABLE} (permit_number, score, tier, drivers, computed_at) "
+                 f"SELECT permit_number, score, tier, drivers, CURRENT_TIMESTAMP "
+                 f"FROM {STAGE_TABLE}")
+
+
+def _write_chunk(conn, scored: list[tuple], last_permit: str, run_started_at,
+                 permits_scored: int) -> None:
+    """Stage + merge one chunk and advance the checkpoint in one transaction."""
+    if BACKEND != "postgres":
+        conn.execute("BEGIN TRANSACTION")
+    try:
+        if scored:
+            _stage(conn, scored)
+            _merge(conn)
+        _save_checkpoint(conn, last_permit, run_started_at, permits_scored)
+        conn.commit() if BACKEND == "postgres" else conn.execute("COMMIT")
+    except Exception:
+        conn.rollback() if BACKEND == "postgres" else conn.execute("ROLLBACK")
+        raise
+
+
+def _finish(conn, run_started_at) -> int:
+    """Prune rows the completed pass did not refresh; clear the checkpoint."""
+    if BACKEND != "postgres":
+        conn.execute("BEGIN TRANSACTION")
+    try:
+        pruned = _run(conn, f"SELECT COUNT(*) FROM {TABLE} WHERE computed_at < {_ph()}",
+                      (run_started_at,))[0][0]
+        _run(conn, f"DELETE FROM {TABLE} WHERE computed_at < {_ph()}", (run_started_at,))
+        _run(conn, f"DELETE FROM {STATE_TABLE} WHERE id = 1")
+        conn.commit() if BACKEND == "postgres" else conn.execute("COMMIT")
+    except Exception:
+        conn.rollback() if BACKEND == "postgres" else conn.execute("ROLLBACK")
+        raise
+    return pruned
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def refresh_severity_cache(
+    conn=None,
+    restart: bool = False,
+    time_budget_s: float | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int | None = None,
+) -> dict:
+    """Score active permits into severity_cache, resuming from the checkpoint.
+
+    Args:
+        conn: Optional connection (closed by the caller).  A second
+            connection is opened for the read stream on Postgres.
+        restart: Discard any checkpoint and start a new pass.
+        time_budget_s: Stop reading new chunks after this many seconds
+            (default DEFAULT_TIME_BUDGET_S); the next call resumes.
+        chunk_size: Permits per chunk (fetch, score, stage, merge, commit).
+        workers: Scoring processes (default SEVERITY_WORKERS or CPU count).
+
+    Returns:
+        {"permits_scored", "errors", "chunks", "done", "checkpoint",
+         "run_permits_scored", "pruned"} — permits_scored / errors for this
+        call, run_permits_scored across the whole (resumed) pass.
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_connection()
+    budget = DEFAULT_TIME_BUDGET_S if time_budget_s is None else time_budget_s
+    workers = _worker_count() if workers is None else max(1, workers)
+    start = time.monotonic()
+    read_conn = None
+    pool = None
+    try:
+        _ensure_state_table(conn)
+        state = None if restart else _load_checkpoint(conn)
+        if state:
+            after, run_started_at, run_scored = state
+        else:
+            after, run_started_at, run_scored = "", _now(conn), 0
+        if BACKEND == "postgres":
+            conn.commit()
+
+        stats = {"permits_scored": 0, "errors": 0, "chunks": 0}
+        if workers > 1:
+            import multiprocessing
+            # spawn, not fork: the web worker has live threads and DB sockets
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        read_conn = get_connection() if BACKEND == "postgres" else conn
+
+        # Score up to `workers` chunks ahead of the one being written
+        pending: deque = deque()
+        done = True
+
+        def _drain_one():
+            nonlocal after, run_scored
+            rows, future = pending.popleft()
+            try:
+                scored, errors = future.result() if future is not None else _score_chunk(rows)
+            except Exception as e:
+                # BrokenProcessPool / pickling failure — score this chunk inline
+                logger.warning("severity chunk failed in pool: %s", e)
+                scored, errors = _score_chunk(rows)
+            after = rows[-1][0]
+            run_scored += len(scored)
+            _write_chunk(conn, scored, after, run_started_at, run_scored)
+            stats["permits_scored"] += len(scored)
+            stats["errors"] += errors
+            stats["chunks"] += 1
+
+        chunks = _stream(read_conn, after, chunk_size)
+        for rows in chunks:
+            pending.append((rows, pool.submit(_score_chunk, rows) if pool else None))
+            if len(pending) > workers:
+                _drain_one()
+            # A short chunk was the last one
+            if len(rows) == chunk_size and time.monotonic() - start > budget:
+                done = False
+                break
+        chunks.close()
+        while pending:
+            _drain_one()
+
+        stats["run_permits_scored"] = run_scored
+        stats["done"] = done
+        stats["checkpoint"] = None if done else after
+        stats["pruned"] = _finish(conn, run_started_at) if done else 0
+        logger.info("severity cache refresh: %s", stats)
+        return stats
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if read_conn is not None and read_conn is not conn:
+            read_conn.close()
+        if owns_conn:
+            conn.close()
@@ -1,5 +1,6 @@
 """Client for Socrata Open Data API (SODA) 2.1 — data.sfgov.org"""
 
+import asyncio
 import httpx
 import logging
 import os
@@ -104,17 +105,22 @@ class SODAClient:
     when the SODA API is unavailable.  Thresholds are controlled by:
         SODA_CB_THRESHOLD  — failures before opening (default 5)
         SODA_CB_TIMEOUT    — seconds before attempting recovery (default 60)
+
+    ``max_concurrency`` caps in-flight requests across every coroutine that
+    shares this client (None = unlimited).
     """
 
     BASE_URL = "https://data.sfgov.org/resource"
 
-    def __init__(self):
+    def __init__(self, max_concurrency: int | None = None):
         self.app_token = os.environ.get("SODA_APP_TOKEN")
         self.client = httpx.AsyncClient(timeout=30.0)
         self.circuit_breaker = CircuitBreaker(
             failure_threshold=int(os.environ.get("SODA_CB_THRESHOLD", "5")),
             recovery_timeout=int(os.environ.get("SODA_CB_TIMEOUT", "60")),
         )
+        self.max_concurrency = max_concurrency
+        self._limiter = asyncio.Semaphore(max_concurrency) if max_concurrency else None
 
     async def query(
         self,
@@ -176,7 +182,11 @@ class SODAClient:
             headers["X-App-Token"] = self.app_token
 
         try:
-            response = await self.client.get(url, params=params, headers=headers)
+            if self._limiter is not None:
+                async with self._limiter:
+                    response = await self.client.get(url, params=params, headers=headers)
+            else:
+                response = await self.client.get(url, params=params, headers=headers)
             response.raise_for_status()
             result = response.json()
             self.circuit_breaker.record_success()
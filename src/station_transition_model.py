@@ -0,0 +1,420 @@
+"""Station transition model — precomputed routing Markov chain per permit cohort.
+
+predict_next_stations used to rebuild its transition matrix on every call:
+pull up to 5000 similar permits, ship their numbers back into an addenda
+window query, and count consecutive station pairs in Python.
+station_transition_model holds those counts precomputed, refreshed nightly
+next to station_velocity_v2 (refresh_transition_model, called from
+/cron/nightly and /cron/velocity-refresh), one row per edge:
+
+    (permit_type_definition, neighborhood, from_station, to_station)
+
+  - neighborhood = ALL_NEIGHBORHOODS ('*') is the type-wide rollup that
+    predict_next_stations falls back to when a neighborhood is too sparse.
+  - Sequences follow the live algorithm: permits filed within LOOKBACK_DAYS,
+    addenda deduped per (permit, station, addenda_number) keeping the latest
+    finish_date, "Not Applicable" / "Administrative" pass-throughs dropped,
+    ordered by arrive, consecutive repeats of a station collapsed.
+  - Each edge carries the dwell distribution at from_station before the
+    hand-off (days from arrive at from_station to arrive at to_station,
+    0–365): p25/p50/p75/p90 plus a stats_cube sketch, so a station's dwell
+    for a cohort is the merge of its outbound edges.
+
+The same model feeds predict_next_stations (matrix lookup),
+estimate_sequence_timeline (predicted remaining stations) and
+diagnose_stuck_permit (cohort dwell baselines, likely next station).
+Readers return None when the model is missing or empty so callers can fall
+back to their live queries.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date, timedelta
+
+from src.db import BACKEND, get_connection
+from src.stats_cube import (
+    SKETCH_LEVELS,
+    days_expr,
+    encode_sketch,
+    merge_quantiles,
+    sketch_exprs,
+)
+
+logger = logging.getLogger(__name__)
+
+# Neighborhood value of the type-wide rollup rows
+ALL_NEIGHBORHOODS = "*"
+
+# Data lookback window for the transition sequences (days)
+LOOKBACK_DAYS = 3 * 365
+
+# Review results excluded from sequences (pass-through routing)
+EXCLUDED_RESULTS = ("Not Applicable", "Administrative")
+
+# Minimum outbound dwell samples for a cohort dwell baseline
+MIN_DWELL_SAMPLES = 10
+
+# Index of each reported percentile in the sketch grid
+_P_INDEX = {q: SKETCH_LEVELS.index(q) for q in (0.25, 0.5, 0.75, 0.9)}
+
+
+def _ph() -> str:
+    return "%s" if BACKEND == "postgres" else "?"
+
+
+def ensure_transition_model_table(conn=None) -> None:
+    """Create station_transition_model if it doesn't exist."""
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    ddl = """
+        CREATE TABLE IF NOT EXISTS station_transition_model (
+            permit_type_definition TEXT NOT NULL,
+            neighborhood TEXT NOT NULL,
+            from_station VARCHAR(30) NOT NULL,
+            to_station VARCHAR(30) NOT NULL,
+            transition_count INTEGER NOT NULL,
+            sample_permits INTEGER NOT NULL,
+            dwell_n INTEGER NOT NULL,
+            dwell_p25 DOUBLE PRECISION,
+            dwell_p50 DOUBLE PRECISION,
+            dwell_p75 DOUBLE PRECISION,
+            dwell_p90 DOUBLE PRECISION,
+            dwell_sketch TEXT,
+            refreshed_at TIMESTAMP
+        )
+    """
+    index = (
+        "CREATE INDEX IF NOT EXISTS idx_stm_cohort ON station_transition_model "
+        "(permit_type_definition, neighborhood, from_station)"
+    )
+    try:
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(ddl)
+                cur.execute(index)
+            conn.commit()
+        else:
+            conn.execute(ddl)
+            conn.execute(index)
+    finally:
+        if close:
+            conn.close()
+
+
+def _model_select_sql() -> str:
+    """Aggregate addenda routing sequences into model edges."""
+    ph = _ph()
+    dwell = days_expr("arrive", "to_arrive")
+    excluded = ", ".join(f"'{r}'" for r in EXCLUDED_RESULTS)
+    return f"""
+        WITH cohort_permits AS (
+            SELECT permit_number, permit_type_definition,
+                   COALESCE(neighborhood, '') AS neighborhood
+            FROM permits
+            WHERE permit_type_definition IS NOT NULL
+              AND filed_date::DATE >= {ph}
+        ),
+        ranked AS (
+            SELECT a.application_number, a.station, a.arrive, a.addenda_number,
+                   s.permit_type_definition, s.neighborhood,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY a.application_number, a.station, a.addenda_number
+                       ORDER BY a.finish_date DESC NULLS LAST
+                   ) AS rn
+            FROM addenda a
+            JOIN cohort_permits s ON s.permit_number = a.application_number
+            WHERE a.station IS NOT NULL
+              AND a.arrive IS NOT NULL
+              AND (a.review_results IS NULL OR a.review_results NOT IN ({excluded}))
+        ),
+        seq AS (
+            SELECT ranked.*,
+                   LAG(station) OVER (
+                       PARTITION BY application_number
+                       ORDER BY arrive, addenda_number, station
+                   ) AS prev_station
+            FROM ranked
+            WHERE rn = 1
+        ),
+        hops AS (
+            SELECT application_number, permit_type_definition, neighborhood,
+                   station AS from_station, arrive,
+                   LEAD(station) OVER w AS to_station,
+                   LEAD(arrive) OVER w AS to_arrive
+            FROM seq
+            WHERE prev_station IS NULL OR prev_station <> station
+            WINDOW w AS (PARTITION BY application_number
+                         ORDER BY arrive, addenda_number, station)
+        ),
+        edges AS (
+            SELECT application_number, permit_type_definition, neighborhood,
+                   from_station, to_station,
+                   CASE WHEN {dwell} BETWEEN 0 AND 365 THEN {dwell} END AS dwell_v
+            FROM hops
+            WHERE to_station IS NOT NULL
+        ),
+        cohorts AS (
+            SELECT application_number, permit_type_definition, neighborhood,
+                   from_station, to_station, dwell_v
+            FROM edges
+            WHERE neighborhood <> ''
+            UNION ALL
+            SELECT application_number, permit_type_definition, '{ALL_NEIGHBORHOODS}',
+                   from_station, to_station, dwell_v
+            FROM edges
+        ),
+        counted AS (
+            SELECT cohorts.*,
+                   COUNT(dwell_v) OVER (
+                       PARTITION BY permit_type_definition, neighborhood,
+                                    from_station, to_station
+                   ) AS n_dwell_v
+            FROM cohorts
+        )
+        SELECT
+            permit_type_definition, neighborhood, from_station, to_station,
+            COUNT(*),
+            COUNT(DISTINCT application_number),
+            COUNT(dwell_v),
+            {sketch_exprs("dwell_v")}
+        FROM counted
+        GROUP BY permit_type_definition, neighborhood, from_station, to_station
+    """
+
+
+def _model_rows(agg_rows) -> list[tuple]:
+    """Turn aggregate rows into INSERT tuples (dwell grid → percentiles + sketch)."""
+    k = len(SKETCH_LEVELS)
+    out = []
+    for r in agg_rows:
+        dims, counts = r[:4], r[4:7]
+        grid, raw = r[7:7 + k], r[7 + k]
+        dwell_n = counts[2]
+        pcts = [
+            round(float(grid[i]), 1) if dwell_n and grid[i] is not None else None
+            for i in _P_INDEX.values()
+        ]
+        out.append((*dims, *counts, *pcts, encode_sketch(dwell_n, grid, raw)))
+    return out
+
+
+def refresh_transition_model(conn=None) -> dict:
+    """Rebuild station_transition_model from addenda in one transaction.
+
+    Returns stats dict for logging.
+    """
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    try:
+        ensure_transition_model_table(conn)
+        ph = _ph()
+        cutoff = (date.today() - timedelta(days=LOOKBACK_DAYS)).isoformat()
+        insert = (
+            "INSERT INTO station_transition_model (permit_type_definition, neighborhood, "
+            "from_station, to_station, transition_count, sample_permits, dwell_n, "
+            "dwell_p25, dwell_p50, dwell_p75, dwell_p90, dwell_sketch, refreshed_at) "
+            f"VALUES ({', '.join([ph] * 12)}, CURRENT_TIMESTAMP)"
+        )
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(_model_select_sql(), [cutoff])
+                rows = _model_rows(cur.fetchall())
+                cur.execute("DELETE FROM station_transition_model")
+                cur.executemany(insert, rows)
+            conn.commit()
+        else:
+            rows = _model_rows(conn.execute(_model_select_sql(), [cutoff]).fetchall())
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.execute("DELETE FROM station_transition_model")
+                if rows:
+                    conn.executemany(insert, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        cohorts = len({(r[0], r[1]) for r in rows})
+        transitions = sum(r[4] for r in rows if r[1] == ALL_NEIGHBORHOODS)
+        logger.info(
+            "transition model refresh: %d edges, %d cohorts, %d transitions",
+            len(rows), cohorts, transitions,
+        )
+        return {"edges": len(rows), "cohorts": cohorts, "transitions": transitions}
+    except Exception:
+        if BACKEND == "postgres":
+            conn.rollback()
+        raise
+    finally:
+        if close:
+            conn.close()
+
+
+# ── Query helpers ───────────────────────────────────────────────────
+
+
+def _fetch(conn, sql: str, params: list) -> list[tuple] | None:
+    """Run a model query; None if the table is missing."""
+    try:
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return list(cur.fetchall())
+        return list(conn.execute(sql, params).fetchall())
+    except Exception:
+        logger.debug("station_transition_model unavailable", exc_info=True)
+        if BACKEND == "postgres":
+            conn.rollback()
+        return None
+
+
+def is_ready(conn) -> bool:
+    """True when station_transition_model exists and has been populated."""
+    return bool(_fetch(conn, "SELECT 1 FROM station_transition_model LIMIT 1", []))
+
+
+def _edges(conn, permit_type: str, neighborhood: str | None,
+           from_station: str | None = None) -> list[dict] | None:
+    """Model edges for one cohort (optionally one station's outbound edges).
+
+    None when the model is unavailable; [] when it has no such edges.
+    """
+    ph = _ph()
+    where = [f"permit_type_definition = {ph}", f"neighborhood = {ph}"]
+    params = [permit_type, neighborhood or ALL_NEIGHBORHOODS]
+    if from_station is not None:
+        where.append(f"from_station = {ph}")
+        params.append(from_station)
+    rows = _fetch(
+        conn,
+        "SELECT from_station, to_station, transition_count, sample_permits, dwell_n, "
+        "dwell_p25, dwell_p50, dwell_p75, dwell_p90, dwell_sketch "
+        f"FROM station_transition_model WHERE {' AND '.join(where)}",
+        params,
+    )
+    if rows is None or (not rows and not is_ready(conn)):
+        return None
+    keys = ("from_station", "to_station", "transition_count", "sample_permits", "dwell_n",
+            "p25_days", "p50_days", "p75_days", "p90_days", "dwell_sketch")
+    return [dict(zip(keys, r)) for r in rows]
+
+
+def load_transitions(conn, permit_type: str,
+                     neighborhood: str | None = None) -> dict[str, dict[str, int]] | None:
+    """Transition counts for a cohort as {from_station: {to_station: count}}.
+
+    Same shape as predict_next_stations._build_transition_matrix; None when
+    the model is unavailable.
+    """
+    edges = _edges(conn, permit_type, neighborhood)
+    if edges is None:
+        return None
+    transitions: dict[str, dict[str, int]] = {}
+    for e in edges:
+        transitions.setdefault(e["from_station"], {})[e["to_station"]] = int(e["transition_count"])
+    return transitions
+
+
+def next_stations(conn, permit_type: str, neighborhood: str | None, station: str,
+                  min_count: int = 1) -> list[dict]:
+    """Outbound edges of ``station`` with probabilities, most likely first.
+
+    Tries the neighborhood cohort, then the type-wide rollup.  Each dict has
+    station, probability, transition_count and the from_station dwell
+    percentiles before that hand-off.
+    """
+    for nbhd in ([neighborhood] if neighborhood else []) + [None]:
+        edges = [e for e in _edges(conn, permit_type, nbhd, station) or []
+                 if e["transition_count"] >= min_count]
+        if not edges:
+            continue
+        total = sum(e["transition_count"] for e in edges)
+        out = [
+            {
+                "station": e["to_station"],
+                "probability": e["transition_count"] / total,
+                "transition_count": int(e["transition_count"]),
+                "total_outbound": total,
+                "p50_days": e["p50_days"],
+                "p75_days": e["p75_days"],
+                "scope": nbhd or ALL_NEIGHBORHOODS,
+            }
+            for e in edges
+        ]
+        return sorted(out, key=lambda p: (-p["transition_count"], p["station"]))
+    return []
+
+
+def station_dwell(conn, permit_type: str | None, neighborhood: str | None,
+                  station: str, min_samples: int = MIN_DWELL_SAMPLES) -> dict | None:
+    """Cohort dwell distribution at ``station`` (merge of its outbound edges).
+
+    Tries the neighborhood cohort, then the type-wide rollup; None when
+    neither has ``min_samples`` dwell observations.  Returned keys match
+    station_velocity_v2 lookups (p25_days … p90_days, sample_count, period)
+    with period = "cohort".
+    """
+    if not permit_type:
+        return None
+    for nbhd in ([neighborhood] if neighborhood else []) + [None]:
+        edges = _edges(conn, permit_type, nbhd, station) or []
+        n = sum(e["dwell_n"] for e in edges)
+        if n < min_samples:
+            continue
+        if len(edges) == 1:
+            e = edges[0]
+            quantiles = [e["p25_days"], e["p50_days"], e["p75_days"], e["p90_days"]]
+        else:
+            cells = [(e["dwell_n"], json.loads(e["dwell_sketch"]))
+                     for e in edges if e["dwell_sketch"]]
+            quantiles = merge_quantiles(cells, tuple(_P_INDEX))
+        p25, p50, p75, p90 = (round(float(q), 1) if q is not None else None for q in quantiles)
+        return {
+            "p25_days": p25,
+            "p50_days": p50,
+            "p75_days": p75,
+            "p90_days": p90,
+            "sample_count": n,
+            "period": "cohort",
+            "scope": nbhd or ALL_NEIGHBORHOODS,
+        }
+    return None
+
+
+def likely_path(conn, permit_type: str, neighborhood: str | None, station: str,
+                exclude=(), max_steps: int = 8, min_probability: float = 0.2,
+                min_count: int = 5) -> list[dict]:
+    """Most-probable remaining routing path after ``station``.
+
+    Greedy walk over the cohort's edges, skipping stations already visited
+    (``exclude``); stops when the best hop falls below ``min_probability``.
+    Each step carries the hop probability and the cohort dwell at the
+    predicted station.
+    """
+    visited = set(exclude) | {station}
+    path: list[dict] = []
+    current = station
+    for _ in range(max_steps):
+        options = [o for o in next_stations(conn, permit_type, neighborhood, current, min_count)
+                   if o["station"] not in visited]
+        if not options or options[0]["probability"] < min_probability:
+            break
+        hop = options[0]
+        dwell = station_dwell(conn, permit_type, neighborhood, hop["station"])
+        path.append({
+            "station": hop["station"],
+            "probability": round(hop["probability"], 3),
+            "p50_days": dwell["p50_days"] if dwell else None,
+            "p75_days": dwell["p75_days"] if dwell else None,
+        })
+        visited.add(hop["station"])
+        current = hop["station"]
+    return path
@@ -0,0 +1,621 @@
+"""Permit statistics cube — precomputed aggregates behind the estimate tools.
+
+estimate_fees, revision_risk and estimate_timeline used to answer every call
+with PERCENTILE_CONT scans over the full permits table (filtered by
+``permit_type_definition ILIKE '%...%'``), and estimate_timeline built
+timeline_stats lazily on first use.  permit_stats_cube holds the same
+numbers pre-aggregated, refreshed nightly (refresh_stats_cube, called from
+/cron/nightly), one row per cell:
+
+    (permit_type_definition, neighborhood, review_path, cost_bin, recent)
+
+  - cost_bin indexes COST_BIN_EDGES; the edges include the timeline cost
+    brackets (50K / 150K / 500K), so a bracket is an exact union of bins.
+  - recent = issued within the year before the refresh (the timeline
+    model's recency window).
+
+Each cell stores counts and sums (exact when cells are combined) plus a
+sketch per distribution, as a JSON list: the raw sorted values for small
+cells (<= RAW_MAX), otherwise the 0th, 5th, ..., 100th percentiles.  Merging
+counts raw values exactly and reads each percentile grid as a
+piecewise-linear CDF weighted by its sample count.  Queries that only touch
+small cells reproduce PERCENTILE_CONT exactly; large cells are exact at the
+5% grid points, and merged or partial cost bins (fee ranges are 0.5x–2x
+the project cost) are close approximations.
+
+The query helpers return None when the cube is missing or empty so callers
+can fall back to their raw-scan queries.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+
+from src.db import BACKEND, get_connection
+
+logger = logging.getLogger(__name__)
+
+# Lower edges of the cost bins; the last bin is open-ended.
+COST_BIN_EDGES = [
+    0, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 150_000,
+    250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000,
+]
+
+# Timeline cost brackets (estimate_timeline._cost_bracket) → (lo, hi) cost range
+COST_BRACKETS = {
+    "under_50k": (0, 50_000),
+    "50k_150k": (50_000, 150_000),
+    "150k_500k": (150_000, 500_000),
+    "over_500k": (500_000, None),
+}
+
+# Quantile levels stored in every sketch (0.00, 0.05, ..., 1.00)
+SKETCH_STEPS = 20
+SKETCH_LEVELS = [i / SKETCH_STEPS for i in range(SKETCH_STEPS + 1)]
+
+# Cells with at most this many values store the values themselves
+RAW_MAX = 2 * SKETCH_STEPS
+
+# Trade permits excluded from the timeline model (mirrors timeline_stats)
+TRADE_PATTERNS = ("%electrical%", "%plumbing%", "%mechanical%")
+
+_COLUMNS = (
+    "n_filed", "cost_sum", "cost_sketch",
+    "n_issued", "n_cost_increase", "increase_pct_sum",
+    "n_no_change", "days_no_change_sum", "days_change_sum", "days_sketch",
+    "n_completed", "completion_sketch",
+    "n_trend_recent", "trend_recent_days_sum", "n_trend_prior", "trend_prior_days_sum",
+)
+
+
+def _ph() -> str:
+    return "%s" if BACKEND == "postgres" else "?"
+
+
+def _bin_bounds(cost_bin: int) -> tuple[float, float | None]:
+    lo = COST_BIN_EDGES[cost_bin]
+    hi = COST_BIN_EDGES[cost_bin + 1] if cost_bin + 1 < len(COST_BIN_EDGES) else None
+    return lo, hi
+
+
+# ── Persistence ─────────────────────────────────────────────────────
+
+
+def ensure_stats_cube_table(conn=None) -> None:
+    """Create permit_stats_cube if it doesn't exist."""
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    ddl = """
+        CREATE TABLE IF NOT EXISTS permit_stats_cube (
+            permit_type_definition TEXT,
+            neighborhood TEXT,
+            review_path VARCHAR(20),
+            cost_bin INTEGER NOT NULL,
+            recent BOOLEAN NOT NULL,
+            n_filed INTEGER NOT NULL,
+            cost_sum DOUBLE PRECISION,
+            cost_sketch TEXT,
+            n_issued INTEGER NOT NULL,
+            n_cost_increase INTEGER NOT NULL,
+            increase_pct_sum DOUBLE PRECISION,
+            n_no_change INTEGER NOT NULL,
+            days_no_change_sum DOUBLE PRECISION,
+            days_change_sum DOUBLE PRECISION,
+            days_sketch TEXT,
+            n_completed INTEGER NOT NULL,
+            completion_sketch TEXT,
+            n_trend_recent INTEGER NOT NULL,
+            trend_recent_days_sum DOUBLE PRECISION,
+            n_trend_prior INTEGER NOT NULL,
+            trend_prior_days_sum DOUBLE PRECISION,
+            refreshed_at TIMESTAMP
+        )
+    """
+    indexes = [
+        "CREATE INDEX IF NOT EXISTS idx_psc_neighborhood ON permit_stats_cube (neighborhood)",
+        "CREATE INDEX IF NOT EXISTS idx_psc_type ON permit_stats_cube (permit_type_definition)",
+    ]
+    try:
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(ddl)
+                for sql in indexes:
+                    cur.execute(sql)
+            conn.commit()
+        else:
+            conn.execute(ddl)
+            for sql in indexes:
+                conn.execute(sql)
+    finally:
+        if close:
+            conn.close()
+
+
+def days_expr(start: str, end: str) -> str:
+    """SQL for the whole days from ``start`` to ``end`` on the active backend."""
+    if BACKEND == "postgres":
+        return f"({end}::date - {start}::date)"
+    return f"DATE_DIFF('day', {start}::DATE, {end}::DATE)"
+
+
+def sketch_exprs(col: str) -> str:
+    """Quantile grid plus the raw values (kept only for small cells)."""
+    quantiles = ",\n            ".join(
+        f"PERCENTILE_CONT({q}) WITHIN GROUP (ORDER BY {col})" for q in SKETCH_LEVELS
+    )
+    return (
+        f"{quantiles},\n            "
+        f"ARRAY_AGG({col} ORDER BY {col}) "
+        f"FILTER (WHERE {col} IS NOT NULL AND n_{col} <= {RAW_MAX})"
+    )
+
+
+def _cube_select_sql() -> str:
+    """Aggregate permits into cube cells (one output row per cell)."""
+    days = days_expr("filed_date", "issued_date")
+    completion_days = days_expr("issued_date", "completed_date")
+    # Same population as timeline_stats / the revision_risk scan
+    valid = (
+        "filed_date IS NOT NULL AND issued_date IS NOT NULL AND estimated_cost > 0 "
+        f"AND {days} BETWEEN 1 AND 1000"
+    )
+    bin_case = "CASE " + " ".join(
+        f"WHEN estimated_cost < {hi} THEN {i}"
+        for i, hi in enumerate(COST_BIN_EDGES[1:])
+    ) + f" ELSE {len(COST_BIN_EDGES) - 1} END"
+    increase = "days_v IS NOT NULL AND revised_cost > estimated_cost"
+    no_change = "days_v IS NOT NULL AND (revised_cost IS NULL OR revised_cost = estimated_cost)"
+    return f"""
+        WITH base AS (
+            SELECT
+                permit_type_definition,
+                neighborhood,
+                CASE WHEN permit_type_definition ILIKE '%otc%'
+                    THEN 'otc' ELSE 'in_house' END AS review_path,
+                {bin_case} AS cost_bin,
+                CASE WHEN {valid}
+                    AND issued_date::DATE >= CURRENT_DATE - INTERVAL '1 year'
+                    THEN TRUE ELSE FALSE END AS recent,
+                estimated_cost,
+                revised_cost,
+                CASE WHEN filed_date IS NOT NULL THEN estimated_cost END AS cost_v,
+                CASE WHEN {valid} THEN {days} END AS days_v,
+                CASE WHEN {valid} AND {completion_days} BETWEEN 1 AND 1000
+                    THEN {completion_days} END AS completion_v,
+                CASE
+                    WHEN NOT ({valid}) THEN NULL
+                    WHEN filed_date::DATE > CURRENT_DATE - INTERVAL '6 months' THEN 'recent'
+                    WHEN filed_date::DATE >= CURRENT_DATE - INTERVAL '18 months' THEN 'prior'
+                END AS trend_window
+            FROM permits
+            WHERE estimated_cost IS NOT NULL AND estimated_cost >= 0
+        ),
+        counted AS (
+            SELECT base.*,
+                COUNT(cost_v) OVER cell AS n_cost_v,
+                COUNT(days_v) OVER cell AS n_days_v,
+                COUNT(completion_v) OVER cell AS n_completion_v
+            FROM base
+            WINDOW cell AS (PARTITION BY permit_type_definition, neighborhood,
+                                         review_path, cost_bin, recent)
+        )
+        SELECT
+            permit_type_definition, neighborhood, review_path, cost_bin, recent,
+            COUNT(cost_v),
+            SUM(cost_v),
+            {sketch_exprs("cost_v")},
+            COUNT(days_v),
+            COUNT(CASE WHEN {increase} THEN 1 END),
+            SUM(CASE WHEN {increase}
+                THEN (revised_cost - estimated_cost) / estimated_cost * 100 END),
+            COUNT(CASE WHEN {no_change} THEN 1 END),
+            SUM(CASE WHEN {no_change} THEN days_v END),
+            SUM(CASE WHEN {increase} THEN days_v END),
+            {sketch_exprs("days_v")},
+            COUNT(completion_v),
+            {sketch_exprs("completion_v")},
+            COUNT(CASE WHEN trend_window = 'recent' THEN 1 END),
+            SUM(CASE WHEN trend_window = 'recent' THEN days_v END),
+            COUNT(CASE WHEN trend_window = 'prior' THEN 1 END),
+            SUM(CASE WHEN trend_window = 'prior' THEN days_v END)
+        FROM counted
+        GROUP BY permit_type_definition, neighborhood, review_path, cost_bin, recent
+    """
+
+
+def encode_sketch(n: int, quantiles: list, raw: list | None) -> str | None:
+    """Raw sorted values for small cells, the quantile grid otherwise."""
+    if not n:
+        return None
+    values = raw if n <= RAW_MAX else quantiles
+    return json.dumps([round(float(v), 2) for v in values])
+
+
+def _cube_rows(agg_rows) -> list[tuple]:
+    """Turn aggregate rows into INSERT tuples (sketch columns → JSON)."""
+    k = len(SKETCH_LEVELS)
+    out = []
+    for r in agg_rows:
+        r = list(r)
+        dims, r = r[:5], r[5:]
+        n_filed, cost_sum, cost_q, cost_raw, r = r[0], r[1], r[2:2 + k], r[2 + k], r[3 + k:]
+        revision, r = r[:6], r[6:]
+        days_q, days_raw, r = r[:k], r[k], r[k + 1:]
+        n_completed, completion_q, completion_raw, trend = r[0], r[1:1 + k], r[1 + k], r[2 + k:]
+        out.append((
+            *dims, n_filed, cost_sum, encode_sketch(n_filed, cost_q, cost_raw),
+            *revision, encode_sketch(revision[0], days_q, days_raw),
+            n_completed, encode_sketch(n_completed, completion_q, completion_raw),
+            *trend,
+        ))
+    return out
+
+
+def refresh_stats_cube(conn=None) -> dict:
+    """Rebuild permit_stats_cube from permits in one transaction.
+
+    Returns stats dict for logging.
+    """
+    close = False
+    if conn is None:
+        conn = get_connection()
+        close = True
+
+    try:
+        ensure_stats_cube_table(conn)
+        ph = _ph()
+        insert = (
+            "INSERT INTO permit_stats_cube (permit_type_definition, neighborhood, "
+            f"review_path, cost_bin, recent, {', '.join(_COLUMNS)}, refreshed_at) "
+            f"VALUES ({', '.join([ph] * (5 + len(_COLUMNS)))}, CURRENT_TIMESTAMP)"
+        )
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(_cube_select_sql())
+                rows = _cube_rows(cur.fetchall())
+                cur.execute("DELETE FROM permit_stats_cube")
+                cur.executemany(insert, rows)
+            conn.commit()
+        else:
+            rows = _cube_rows(conn.execute(_cube_select_sql()).fetchall())
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.execute("DELETE FROM permit_stats_cube")
+                if rows:
+                    conn.executemany(insert, rows)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        permits = sum(r[5] for r in rows)
+        logger.info("stats cube refresh: %d cells from %d permits", len(rows), permits)
+        return {"cells": len(rows), "permits": permits}
+    except Exception:
+        if BACKEND == "postgres":
+            conn.rollback()
+        raise
+    finally:
+        if close:
+            conn.close()
+
+
+# ── Sketch arithmetic ───────────────────────────────────────────────
+#
+# A cell's sketch is either its raw sorted values (n <= RAW_MAX) or its
+# quantile grid.  Raw values are counted exactly; a grid is read as a
+# piecewise-linear CDF through (q_i, i / SKETCH_STEPS).
+
+
+def _cdf(sketch: list[float], x: float) -> float:
+    """Fraction of a gridded cell's values <= x."""
+    if x < sketch[0]:
+        return 0.0
+    if x >= sketch[-1]:
+        return 1.0
+    i = bisect.bisect_right(sketch, x) - 1
+    lo, hi = sketch[i], sketch[i + 1]
+    return (i + (x - lo) / (hi - lo)) / SKETCH_STEPS
+
+
+def _mass_at(sketch: list[float], x: float) -> float:
+    """Point mass at x (runs of equal quantiles), so a clip at lo keeps it."""
+    i = bisect.bisect_left(sketch, x)
+    j = bisect.bisect_right(sketch, x)
+    return max(j - i - 1, 0) / SKETCH_STEPS
+
+
+def _mass_and_sum(sketch: list[float], lo: float, hi: float) -> tuple[float, float]:
+    """(fraction of values, sum of values / cell size) within [lo, hi] for a grid."""
+    mass = total = 0.0
+    seg = 1.0 / SKETCH_STEPS
+    for a, b in zip(sketch, sketch[1:]):
+        if b == a:
+            if lo <= a <= hi:
+                mass += seg
+                total += seg * a
+            continue
+        ov_lo, ov_hi = max(a, lo), min(b, hi)
+        if ov_hi < ov_lo:
+            continue
+        frac = seg * (ov_hi - ov_lo) / (b - a)
+        mass += frac
+        total += frac * (ov_lo + ov_hi) / 2
+    return mass, total
+
+
+def _percentile_cont(values: list[float], q: float) -> float:
+    pos = q * (len(values) - 1)
+    i = int(pos)
+    if i + 1 >= len(values):
+        return values[-1]
+    return values[i] + (values[i + 1] - values[i]) * (pos - i)
+
+
+def merge_quantiles(cells: list[tuple[int, list[float]]], levels,
+                    lo: float | None = None, hi: float | None = None) -> list[float | None]:
+    """Quantiles of the union of sketched cells, optionally clipped to [lo, hi].
+
+    ``cells`` is a list of (sample count, sketch).  When every cell carries
+    raw values the result is exactly PERCENTILE_CONT over their union.
+    """
+    values: list[float] = []
+    grids = []
+    for n, s in cells:
+        if not n or not s:
+            continue
+        if n <= RAW_MAX:
+            values.extend(v for v in s
+                          if (lo is None or v >= lo) and (hi is None or v <= hi))
+        else:
+            grids.append((n, s))
+    values.sort()
+    if not grids:
+        return [_percentile_cont(values, q) if values else None for q in levels]
+
+    x_min = min([s[0] for _, s in grids] + values[:1])
+    x_max = max([s[-1] for _, s in grids] + values[-1:])
+    lo = x_min if lo is None else max(lo, x_min)
+    hi = x_max if hi is None else min(hi, x_max)
+    if hi < lo:
+        return [None for _ in levels]
+
+    def mix(x):
+        return bisect.bisect_right(values, x) + sum(n * _cdf(s, x) for n, s in grids)
+
+    base = sum(n * (_cdf(s, lo) - _mass_at(s, lo)) for n, s in grids)
+    total = mix(hi) - base
+    if total <= 0:
+        return [None for _ in levels]
+
+    out = []
+    for q in levels:
+        target = base + q * total
+        a, b = lo, hi
+        for _ in range(60):
+            mid = (a + b) / 2
+            if mix(mid) >= target:
+                b = mid
+            else:
+                a = mid
+        out.append(b)
+    return out
+
+
+# ── Query helpers ───────────────────────────────────────────────────
+
+
+def _fetch(conn, sql: str, params: list | None = None) -> list[tuple] | None:
+    """Run a cube query; None if the table is missing."""
+    try:
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(sql, params or None)
+                return cur.fetchall()
+        return conn.execute(sql, params or []).fetchall()
+    except Exception:
+        logger.debug("permit_stats_cube unavailable", exc_info=True)
+        if BACKEND == "postgres":
+            conn.rollback()
+        return None
+
+
+def is_ready(conn) -> bool:
+    """True when permit_stats_cube exists and has been populated."""
+    return bool(_fetch(conn, "SELECT 1 FROM permit_stats_cube LIMIT 1"))
+
+
+def _cells(conn, where: list[str], params: list) -> list[dict] | None:
+    """Cube rows matching ``where``, or None when the cube is unavailable."""
+    sql = (
+        f"SELECT cost_bin, {', '.join(_COLUMNS)} FROM permit_stats_cube "
+        f"WHERE {' AND '.join(where) or '1=1'}"
+    )
+    rows = _fetch(conn, sql, params)
+    if rows is None or (not rows and not is_ready(conn)):
+        return None
+
+    cells = []
+    for r in rows:
+        cell = dict(zip(("cost_bin",) + _COLUMNS, r))
+        for col in ("cost_sketch", "days_sketch", "completion_sketch"):
+            cell[col] = json.loads(cell[col]) if cell[col] else None
+        cells.append(cell)
+    return cells
+
+
+def _type_filter(permit_type: str | None, where: list[str], params: list) -> None:
+    if permit_type:
+        where.append(f"permit_type_definition ILIKE {_ph()}")
+        params.append(f"%{permit_type}%")
+
+
+def _round(v, ndigits=None):
+    return round(float(v), ndigits) if v else None
+
+
+def fee_stats(conn, permit_type: str | None, neighborhood: str | None,
+              cost_min: float, cost_max: float) -> dict | None:
+    """Cost distribution of filed permits with estimated_cost in [cost_min, cost_max].
+
+    Same keys as estimate_fees._query_fee_stats.
+    """
+    ph = _ph()
+    where, params = [], []
+    _type_filter(permit_type, where, params)
+    if neighborhood:
+        where.append(f"neighborhood = {ph}")
+        params.append(neighborhood)
+    cells = _cells(conn, where, params)
+    if cells is None:
+        return None
+
+    n = cost_sum = 0.0
+    in_range = []
+    for c in cells:
+        lo, hi = _bin_bounds(c["cost_bin"])
+        size, sketch = c["n_filed"], c["cost_sketch"]
+        if hi is not None and hi <= cost_min or lo > cost_max or not size:
+            continue
+        in_range.append((size, sketch))
+        if lo >= cost_min and hi is not None and hi <= cost_max:
+            n += size
+            cost_sum += c["cost_sum"] or 0
+        elif size <= RAW_MAX:
+            kept = [v for v in sketch if cost_min <= v <= cost_max]
+            n += len(kept)
+            cost_sum += sum(kept)
+        else:
+            mass, total = _mass_and_sum(sketch, cost_min, cost_max)
+            n += size * mass
+            cost_sum += size * total
+
+    p25, p50, p75 = merge_quantiles(in_range, (0.25, 0.5, 0.75), cost_min, cost_max)
+    return {
+        "sample_size": round(n),
+        "p25_cost": _round(p25, 2),
+        "p50_cost": _round(p50, 2),
+        "p75_cost": _round(p75, 2),
+        "avg_cost": _round(cost_sum / n, 2) if n else None,
+    }
+
+
+def revision_stats(conn, permit_type: str | None, neighborhood: str | None,
+                   review_path: str | None) -> dict | None:
+    """Revision-proxy stats (revised_cost > estimated_cost) for issued permits.
+
+    Same keys as revision_risk._query_revision_stats.
+    """
+    ph = _ph()
+    where, params = [], []
+    _type_filter(permit_type, where, params)
+    if neighborhood:
+        where.append(f"neighborhood = {ph}")
+        params.append(neighborhood)
+    if review_path:
+        where.append(f"review_path = {ph}")
+        params.append("otc" if review_path == "otc" else "in_house")
+    cells = _cells(conn, where, params)
+    if cells is None:
+        return None
+
+    total = sum(c["n_issued"] for c in cells)
+    increased = sum(c["n_cost_increase"] for c in cells)
+    no_change = sum(c["n_no_change"] for c in cells)
+    pct_sum = sum(c["increase_pct_sum"] or 0 for c in cells)
+    days_nc = sum(c["days_no_change_sum"] or 0 for c in cells)
+    days_ch = sum(c["days_change_sum"] or 0 for c in cells)
+    (p90,) = merge_quantiles([(c["n_issued"], c["days_sketch"]) for c in cells], (0.9,))
+    return {
+        "total_permits": total,
+        "permits_with_cost_increase": increased,
+        "revision_proxy_rate": round(increased / total, 3) if increased else None,
+        "avg_cost_increase_pct": round(pct_sum / increased, 1) if increased else None,
+        "avg_days_no_change": round(days_nc / no_change) if no_change else None,
+        "avg_days_with_change": round(days_ch / increased) if increased else None,
+        "p90_days": round(p90) if p90 else None,
+    }
+
+
+def _timeline_where(review_path: str | None, neighborhood: str | None,
+                    permit_type: str | None) -> tuple[list[str], list]:
+    ph = _ph()
+    where = [
+        f"permit_type_definition NOT ILIKE {ph}" for _ in TRADE_PATTERNS
+    ]
+    params: list = list(TRADE_PATTERNS)
+    if review_path:
+        where.append(f"review_path = {ph}")
+        params.append(review_path)
+    if neighborhood:
+        where.append(f"neighborhood = {ph}")
+        params.append(neighborhood)
+    _type_filter(permit_type, where, params)
+    return where, params
+
+
+def timeline_stats(conn, review_path: str | None, neighborhood: str | None,
+                   cost_bracket: str | None, permit_type: str | None) -> dict | None:
+    """Days-to-issuance percentiles for recently issued building permits.
+
+    Same keys as estimate_timeline._query_timeline.
+    """
+    where, params = _timeline_where(review_path, neighborhood, permit_type)
+    where.append("recent = TRUE")
+    if cost_bracket in COST_BRACKETS:
+        lo, hi = COST_BRACKETS[cost_bracket]
+        where.append(f"cost_bin >= {COST_BIN_EDGES.index(lo)}")
+        if hi is not None:
+            where.append(f"cost_bin < {COST_BIN_EDGES.index(hi)}")
+    cells = _cells(conn, where, params)
+    if cells is None:
+        return None
+
+    p25, p50, p75, p90 = merge_quantiles(
+        [(c["n_issued"], c["days_sketch"]) for c in cells], (0.25, 0.5, 0.75, 0.9))
+    return {
+        "sample_size": sum(c["n_issued"] for c in cells),
+        "p25_days": round(p25) if p25 else None,
+        "p50_days": round(p50) if p50 else None,
+        "p75_days": round(p75) if p75 else None,
+        "p90_days": round(p90) if p90 else None,
+    }
+
+
+def completion_stats(conn, review_path: str | None) -> dict | None:
+    """Issued → completed percentiles, or None when the cube is unavailable."""
+    where, params = _timeline_where(review_path, None, None)
+    cells = _cells(conn, where, params)
+    if cells is None:
+        return None
+    p50, p75 = merge_quantiles(
+        [(c["n_completed"], c["completion_sketch"]) for c in cells], (0.5, 0.75))
+    return {
+        "sample": sum(c["n_completed"] for c in cells),
+        "p50_days": round(p50) if p50 else None,
+        "p75_days": round(p75) if p75 else None,
+    }
+
+
+def trend_stats(conn, neighborhood: str | None, review_path: str | None) -> dict | None:
+    """Average days to issuance for permits filed in the last 6 months vs the 12 before.
+
+    Returns {"recent": (avg, n), "prior": (avg, n)}, or None when the cube is
+    unavailable.
+    """
+    where, params = _timeline_where(review_path, neighborhood, None)
+    cells = _cells(conn, where, params)
+    if cells is None:
+        return None
+    out = {}
+    for key, n_col, sum_col in (("recent", "n_trend_recent", "trend_recent_days_sum"),
+                                ("prior", "n_trend_prior", "trend_prior_days_sum")):
+        n = sum(c[n_col] for c in cells)
+        s = sum(c[sum_col] or 0 for c in cells)
+        out[key] = (s / n if n else None, n)
+    return out
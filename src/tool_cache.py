@@ -0,0 +1,280 @@
+"""Result cache for deterministic MCP tool calls.
+
+estimate_fees, revision_risk, required_documents, predict_permits and
+estimate_timeline are pure functions of their arguments plus data that only
+changes when ingest runs.  cached_tool() memoizes such a tool:
+
+  - key: tool name + the data version + the call's arguments, bound to the
+    signature (defaults applied) and normalized (string whitespace
+    collapsed), so ``estimate_fees("alterations", 50000)`` and
+    ``estimate_fees(permit_type=" alterations ", estimated_cost=50000)``
+    share an entry
+  - storage: a bounded in-process LRU (TOOL_CACHE_SIZE entries, default
+    512) and, when REDIS_URL is reachable, Redis shared by every worker.
+    Only JSON-native results (plus the top-level structured tuple) go to
+    Redis, so a Redis hit returns the same types as a local one; anything
+    else is cached in-process only.  Hits from either tier are copies.
+  - invalidation: bump_data_version() — called at the end of
+    run_ingestion() and run_nightly() — changes the version every key
+    embeds.  The version lives in Redis when
+    available (other processes see a bump within DATA_VERSION_CHECK_SECS);
+    without Redis, entries also expire after TOOL_CACHE_TTL seconds
+    (default 1h), which bounds staleness in processes that missed the bump.
+
+cache_stats() reports per-tool hits, misses and hit rate (exported on
+/health).  TOOL_CACHE_SIZE=0 disables caching.
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+TOOL_CACHE_SIZE = int(os.environ.get("TOOL_CACHE_SIZE", "512"))
+TOOL_CACHE_TTL = int(os.environ.get("TOOL_CACHE_TTL", "3600"))
+DATA_VERSION_CHECK_SECS = float(os.environ.get("DATA_VERSION_CHECK_SECS", "30"))
+
+_REDIS_VERSION_KEY = "toolcache:data_version"
+_REDIS_KEY_PREFIX = "toolcache:"
+
+_lock = threading.Lock()
+_entries: OrderedDict[str, tuple[float, object]] = OrderedDict()  # key -> (expires_at, value)
+_stats: dict[str, dict[str, int]] = {}
+
+_local_version = uuid.uuid4().hex[:12]
+_version = {"value": _local_version, "checked_at": 0.0}
+
+# Cached Redis client — None means "not available, in-process only"
+_redis_client = None
+_redis_checked = False
+
+
+def _get_redis_client():
+    """Return a connected Redis client, or None (checked once per process)."""
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    _redis_checked = True
+    redis_url = os.environ.get("REDIS_URL")
+    if not redis_url:
+        return None
+    try:
+        import redis as _redis_lib
+        client = _redis_lib.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+        client.ping()
+        _redis_client = client
+    except Exception:
+        logger.debug("Redis unavailable for tool cache", exc_info=True)
+        _redis_client = None
+    return _redis_client
+
+
+# ── Data version ────────────────────────────────────────────────────
+
+
+def data_version() -> str:
+    """The current data-version token (shared through Redis when available)."""
+    now = time.monotonic()
+    if now - _version["checked_at"] < DATA_VERSION_CHECK_SECS:
+        return _version["value"]
+    _version["checked_at"] = now
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            shared = client.get(_REDIS_VERSION_KEY)
+            if shared is None:
+                client.set(_REDIS_VERSION_KEY, _version["value"], nx=True)
+                shared = client.get(_REDIS_VERSION_KEY)
+            if shared is not None:
+                _version["value"] = shared.decode() if isinstance(shared, bytes) else str(shared)
+        except Exception:
+            logger.debug("Could not read tool cache data version", exc_info=True)
+    return _version["value"]
+
+
+def bump_data_version() -> str:
+    """Invalidate every cached tool result (call after a data refresh)."""
+    token = uuid.uuid4().hex[:12]
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            client.set(_REDIS_VERSION_KEY, token)
+        except Exception:
+            logger.warning("Could not publish tool cache data version", exc_info=True)
+    with _lock:
+        _entries.clear()
+    _version.update(value=token, checked_at=time.monotonic())
+    logger.info("tool cache data version bumped to %s", token)
+    return token
+
+
+# ── Keys and values ─────────────────────────────────────────────────
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+def _cache_key(name: str, sig: inspect.Signature, args, kwargs) -> str:
+    bound = sig.bind(*args, **kwargs)
+    bound.apply_defaults()
+    payload = json.dumps(
+        {k: _normalize(v) for k, v in bound.arguments.items()},
+        sort_keys=True, default=str,
+    )
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    return f"{name}:{data_version()}:{digest}"
+
+
+def _json_native(value) -> bool:
+    """True when a JSON round trip gives ``value`` back unchanged."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, list):
+        return all(_json_native(v) for v in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _json_native(v) for k, v in value.items())
+    return False
+
+
+def _shareable(value) -> bool:
+    # Tools return markdown, or (markdown, methodology) with return_structured
+    if isinstance(value, tuple):
+        return all(_json_native(v) for v in value)
+    return _json_native(value)
+
+
+def _encode(value) -> str:
+    if isinstance(value, tuple):
+        return json.dumps({"tuple": list(value)})
+    return json.dumps({"value": value})
+
+
+def _decode(raw):
+    data = json.loads(raw)
+    return tuple(data["tuple"]) if "tuple" in data else data["value"]
+
+
+def _copy(value):
+    # Callers may annotate the methodology dict of a structured result
+    return value if isinstance(value, str) else copy.deepcopy(value)
+
+
+def _count(name: str, field: str) -> None:
+    with _lock:
+        _stats.setdefault(name, {"hits": 0, "misses": 0})[field] += 1
+
+
+def _get(key: str, name: str):
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _entries.move_to_end(key)
+                _stats.setdefault(name, {"hits": 0, "misses": 0})["hits"] += 1
+                return True, _copy(entry[1])
+            del _entries[key]
+    client = _get_redis_client()
+    if client is not None:
+        try:
+            raw = client.get(_REDIS_KEY_PREFIX + key)
+            if raw is not None:
+                value = _decode(raw)
+                _put_local(key, value)
+                _count(name, "hits")
+                return True, _copy(value)
+        except Exception:
+            logger.debug("tool cache Redis read failed", exc_info=True)
+    _count(name, "misses")
+    return False, None
+
+
+def _put_local(key: str, value) -> None:
+    with _lock:
+        _entries[key] = (time.monotonic() + TOOL_CACHE_TTL, value)
+        _entries.move_to_end(key)
+        while len(_entries) > TOOL_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def _put(key: str, value) -> None:
+    _put_local(key, _copy(value))
+    client = _get_redis_client() if _shareable(value) else None
+    if client is not None:
+        try:
+            client.set(_REDIS_KEY_PREFIX + key, _encode(value), ex=TOOL_CACHE_TTL)
+        except Exception:
+            logger.debug("tool cache Redis write failed", exc_info=True)
+
+
+# ── Decorator ───────────────────────────────────────────────────────
+
+
+def cached_tool(fn):
+    """Memoize an async tool on its normalized arguments and the data version.
+
+    Only successful results are cached.  The wrapper keeps fn's signature and
+    docstring for FastMCP registration.
+    """
+    name = fn.__name__
+    sig = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if TOOL_CACHE_SIZE <= 0:
+            return await fn(*args, **kwargs)
+        try:
+            key = _cache_key(name, sig, args, kwargs)
+        except TypeError:
+            return await fn(*args, **kwargs)  # let the tool report bad arguments
+        hit, value = _get(key, name)
+        if hit:
+            return value
+        value = await fn(*args, **kwargs)
+        _put(key, value)
+        return value
+
+    return wrapper
+
+
+def cache_stats() -> dict:
+    """Per-tool hits, misses and hit rate, plus cache size and data version."""
+    with _lock:
+        tools = {
+            name: {**s, "hit_rate": round(s["hits"] / (s["hits"] + s["misses"]), 3)
+                   if s["hits"] + s["misses"] else 0.0}
+            for name, s in sorted(_stats.items())
+        }
+        size = len(_entries)
+    return {
+        "entries": size,
+        "max_entries": TOOL_CACHE_SIZE,
+        "data_version": _version["value"],
+        "shared": _get_redis_client() is not None,
+        "tools": tools,
+    }
+
+
+def clear() -> None:
+    """Drop the in-process entries and counters (tests, admin)."""
+    with _lock:
+        _entries.clear()
+        _stats.clear()
@@ -0,0 +1,253 @@
+"""Lazy MCP tool registration from a lightweight manifest.
+
+Importing every tool module up front pulls in pypdf, httpx, duckdb, PIL,
+anthropic and the DB layer before the server can answer anything — about
+half a second that every scale-to-zero cold start and short-lived stdio
+session pays.  Instead, server.py and mcp_http.py register tools from
+src/tool_manifest.json (name, docstring and signature of each tool, read
+from the tool sources with ``ast``).  Each registered tool is a stub with
+the real tool's signature; the first call imports the tool module and
+every call after that goes straight to the real function.
+
+TOOLS below is the source of truth for which tools exist and which are safe
+for the public HTTP endpoint.  After adding a tool or changing a tool's
+signature or docstring, regenerate the manifest:
+
+    python -m src.tool_registry
+
+(tests/test_tool_registry.py fails while the manifest is stale).
+MCP_LAZY_TOOLS=0 imports every tool module at registration instead.
+
+start_warm_up() loads the knowledge base on a daemon thread so the first
+Phase 2.75 call doesn't pay for it (MCP_WARM_UP=0 disables).
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import threading
+import typing
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = Path(__file__).resolve().parent / "tool_manifest.json"
+
+# (module, function, public) in registration order.  public=False tools are
+# stdio-only — they expose the DB, source code or user data.
+TOOLS: list[tuple[str, str, bool]] = [
+    # Phase 1 tools (live SODA API)
+    ("src.tools.search_permits", "search_permits", True),
+    ("src.tools.get_permit_details", "get_permit_details", True),
+    ("src.tools.permit_stats", "permit_stats", True),
+    ("src.tools.search_businesses", "search_businesses", True),
+    ("src.tools.property_lookup", "property_lookup", True),
+    # Phase 1.5 tools (DBI enforcement — live SODA API)
+    ("src.tools.search_complaints", "search_complaints", True),
+    ("src.tools.search_violations", "search_violations", True),
+    ("src.tools.search_inspections", "search_inspections", True),
+    # Phase 2 tools (local DuckDB network analysis)
+    ("src.tools.search_entity", "search_entity", True),
+    ("src.tools.entity_network", "entity_network", True),
+    ("src.tools.network_anomalies", "network_anomalies", True),
+    # Phase 2.75 tools (permit decision tools)
+    ("src.tools.predict_permits", "predict_permits", True),
+    ("src.tools.estimate_timeline", "estimate_timeline", True),
+    ("src.tools.estimate_fees", "estimate_fees", True),
+    ("src.tools.required_documents", "required_documents", True),
+    ("src.tools.revision_risk", "revision_risk", True),
+    # Phase 3 tools (document analysis)
+    ("src.tools.validate_plans", "validate_plans", True),
+    # Phase 4 tools (AI vision analysis)
+    ("src.tools.analyze_plans", "analyze_plans", True),
+    # Phase 2 tools (consultant recommender)
+    ("src.tools.recommend_consultants", "recommend_consultants", True),
+    # Phase 4 tools (lookup / status)
+    ("src.tools.permit_lookup", "permit_lookup", True),
+    # Phase 5 tools (addenda routing)
+    ("src.tools.search_addenda", "search_addenda", True),
+    # Phase 5.5 tools (severity scoring, signal-based property health)
+    ("src.tools.permit_severity", "permit_severity", True),
+    ("src.tools.property_health", "property_health", True),
+    # Phase 6 tools (operational intelligence) — user feedback data
+    ("src.tools.list_feedback", "list_feedback", False),
+    # Phase 7 tools (project intelligence) — arbitrary SQL, source code, schema
+    ("src.tools.project_intel", "run_query", False),
+    ("src.tools.project_intel", "read_source", False),
+    ("src.tools.project_intel", "search_source", False),
+    ("src.tools.project_intel", "schema_info", False),
+    ("src.tools.project_intel", "list_tests", False),
+    # Phase 8 tools (permit intelligence)
+    ("src.tools.similar_projects", "similar_projects", True),
+    # Phase 9 tools (station prediction, stuck permits, simulation, delay cost)
+    ("src.tools.predict_next_stations", "predict_next_stations", True),
+    ("src.tools.stuck_permit", "diagnose_stuck_permit", True),
+    ("src.tools.what_if_simulator", "simulate_what_if", True),
+    ("src.tools.cost_of_delay", "calculate_delay_cost", True),
+]
+
+# Names tool annotations may use besides builtins
+_ANNOTATION_NAMES = {"Optional": typing.Optional, "Any": typing.Any, "Literal": typing.Literal}
+
+
+# ── Manifest ──────────────────────────────────────────────────────
+
+
+def _describe(module: str, name: str, public: bool) -> dict:
+    """Manifest entry for one tool, read from its source without importing it."""
+    path = PROJECT_ROOT / Path(*module.split(".")).with_suffix(".py")
+    tree = ast.parse(path.read_text())
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == name:
+            break
+    else:
+        raise LookupError(f"{module}.{name} not found")
+
+    args = node.args
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    params = []
+    for arg, default, kind in (
+        [(a, d, "POSITIONAL_OR_KEYWORD") for a, d in zip(positional, defaults)]
+        + [(a, d, "KEYWORD_ONLY") for a, d in zip(args.kwonlyargs, args.kw_defaults)]
+    ):
+        param = {"name": arg.arg, "kind": kind}
+        if arg.annotation is not None:
+            param["annotation"] = ast.unparse(arg.annotation)
+        if default is not None:
+            param["default"] = ast.unparse(default)
+        params.append(param)
+    if args.vararg or args.kwarg:
+        raise ValueError(f"{module}.{name}: *args/**kwargs tools can't be described")
+
+    entry = {
+        "name": name,
+        "module": module,
+        "public": public,
+        "doc": ast.get_docstring(node, clean=False),
+        "params": params,
+    }
+    if node.returns is not None:
+        returns = node.returns
+        if isinstance(returns, ast.Constant) and isinstance(returns.value, str):
+            entry["returns"] = returns.value
+        else:
+            entry["returns"] = ast.unparse(returns)
+    return entry
+
+
+def build_manifest() -> list[dict]:
+    """Describe every tool in TOOLS from its source file."""
+    return [_describe(module, name, public) for module, name, public in TOOLS]
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> list[dict]:
+    manifest = build_manifest()
+    path.write_text(json.dumps(manifest, indent=1) + "\n")
+    return manifest
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> list[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+# ── Lazy stubs ────────────────────────────────────────────────────
+
+
+def _annotation(source: str):
+    # A string annotation FastMCP can't resolve becomes an untyped argument
+    try:
+        return eval(source, {"__builtins__": __builtins__, **_ANNOTATION_NAMES})  # noqa: S307
+    except Exception:
+        logger.warning("Unresolvable tool annotation %r", source)
+        return inspect.Parameter.empty
+
+
+def _signature(entry: dict) -> inspect.Signature:
+    params = []
+    for p in entry["params"]:
+        params.append(inspect.Parameter(
+            p["name"],
+            getattr(inspect.Parameter, p["kind"]),
+            default=ast.literal_eval(p["default"]) if "default" in p else inspect.Parameter.empty,
+            annotation=_annotation(p["annotation"]) if "annotation" in p else inspect.Parameter.empty,
+        ))
+    returns = _annotation(entry["returns"]) if "returns" in entry else inspect.Signature.empty
+    return inspect.Signature(params, return_annotation=returns)
+
+
+def _resolve(entry: dict):
+    return getattr(importlib.import_module(entry["module"]), entry["name"])
+
+
+def lazy_tool(entry: dict):
+    """An async stub for a manifest entry; imports the real tool on first call."""
+    real = None
+
+    async def tool(*args, **kwargs):
+        nonlocal real
+        if real is None:
+            # Off the loop: a heavy import (pypdf, PIL) would stall it.  Two
+            # racing first calls both resolve; the import system dedupes.
+            real = await asyncio.to_thread(_resolve, entry)
+            tool.__wrapped__ = real
+            logger.debug("Loaded MCP tool %s", entry["name"])
+        result = real(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    tool.__name__ = tool.__qualname__ = entry["name"]
+    tool.__module__ = entry["module"]
+    tool.__doc__ = entry["doc"]
+    tool.__signature__ = _signature(entry)
+    return tool
+
+
+def register_tools(mcp, public_only: bool = False) -> list[str]:
+    """Register the manifest's tools on a FastMCP server; returns their names.
+
+    public_only skips the stdio-only tools (for the HTTP endpoint).
+    """
+    lazy = os.environ.get("MCP_LAZY_TOOLS", "1") != "0"
+    names = []
+    for entry in load_manifest():
+        if public_only and not entry["public"]:
+            continue
+        mcp.tool()(lazy_tool(entry) if lazy else _resolve(entry))
+        names.append(entry["name"])
+    return names
+
+
+# ── Warm-up ───────────────────────────────────────────────────────
+
+
+def warm_up() -> None:
+    """Load the knowledge base JSON files that the Phase 2.75 tools share."""
+    try:
+        from src.tools.knowledge_base import get_knowledge_base
+        get_knowledge_base()
+    except Exception:
+        logger.warning("Knowledge base warm-up failed", exc_info=True)
+
+
+def start_warm_up() -> threading.Thread | None:
+    """Run warm_up() on a daemon thread unless MCP_WARM_UP=0."""
+    if os.environ.get("MCP_WARM_UP", "1") == "0":
+        return None
+    thread = threading.Thread(target=warm_up, name="mcp-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    tools = write_manifest()
+    print(f"Wrote {len(tools)} tools to {MANIFEST_PATH.relative_to(PROJECT_ROOT)}")
@@ -3,7 +3,10 @@
 import math
 import re
 from src.tools.knowledge_base import get_knowledge_base, format_sources
+from src import stats_cube
 from src.db import get_connection, BACKEND
+from src.db_async import offload
+from src.tool_cache import cached_tool
 
 
 def _calculate_building_fee(valuation: float, category: str, fee_tables: dict) -> dict:
@@ -428,7 +431,15 @@ def _calculate_plumbing_fee(project_type: str | None, fee_tables: dict) -> dict
 
 def _query_fee_stats(conn, permit_type: str, neighborhood: str | None,
                      cost_min: float, cost_max: float) -> dict | None:
-    """Query historical permits for statistical fee data."""
+    """Query historical permits for statistical fee data.
+
+    Answers from the nightly permit_stats_cube (src.stats_cube); scans
+    permits only when the cube hasn't been built.
+    """
+    cube = stats_cube.fee_stats(conn, permit_type, neighborhood, cost_min, cost_max)
+    if cube is not None:
+        return cube if cube["sample_size"] >= 5 else None
+
     ph = "%s" if BACKEND == "postgres" else "?"
     conditions = [
         f"estimated_cost BETWEEN {ph} AND {ph}",
@@ -491,30 +502,25 @@ def _get_cost_revision_bracket(cost: float) -> dict | None:
     return COST_REVISION_BRACKETS[-1]  # Over $500K
 
 
-async def estimate_fees(
+@offload
+def estimate_fees_result(
     permit_type: str,
     estimated_construction_cost: float,
     square_footage: float | None = None,
     neighborhood: str | None = None,
     project_type: str | None = None,
-    return_structured: bool = False,
-) -> str | tuple[str, dict]:
-    """Estimate permit fees using the DBI fee schedule + historical data.
-
-    Combines formula-based fee calculation from Table 1A-A through 1A-S
-    with statistical comparison against actual permit costs in DuckDB.
+) -> dict:
+    """Compute the fee estimate as a structured result.
 
-    Args:
-        permit_type: 'alterations', 'new_construction', or 'no_plans'
-        estimated_construction_cost: Project valuation in dollars
-        square_footage: Optional project area for per-sqft analysis
-        neighborhood: Optional SF neighborhood for statistical comparison
-        project_type: Optional specific type (e.g., 'restaurant', 'adu') for additional fees
-        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+    This is the data behind estimate_fees(); render_fees() turns it into the
+    tool's markdown.  Callers that only need the numbers (total_dbi, the
+    per-table breakdowns) use this directly.
 
     Returns:
-        Formatted fee estimate with formula breakdown and statistical context.
-        If return_structured=True, returns (str, dict) tuple.
+        Dict with the inputs plus category, building_fee, surcharges,
+        sffd_fees, plumbing_fees, electrical_fees, additional_fees,
+        ada_analysis, stat_data, total_dbi, revision_bracket, confidence and
+        coverage_gaps.  Optional sections are None when they don't apply.
     """
     kb = get_knowledge_base()
     fee_tables = kb.fee_tables
@@ -600,10 +606,51 @@ async def estimate_fees(
     if electrical_fees and electrical_fees.get("fee"):
         total_dbi += electrical_fees["fee"]
 
-    # Format output
+    confidence = "high" if "error" not in building_fee else "low"
+
+    # Coverage disclaimer
+    coverage_gaps = ["Planning fees not included", "Electrical fees estimated from Table 1A-E"]
+    if not sffd_fees:
+        coverage_gaps.append("SFFD fees not calculated (project type may not trigger fire review)")
+
+    return {
+        "permit_type": permit_type,
+        "estimated_construction_cost": estimated_construction_cost,
+        "square_footage": square_footage,
+        "neighborhood": neighborhood,
+        "project_type": project_type,
+        "category": category,
+        "building_fee": building_fee,
+        "surcharges": surcharges,
+        "sffd_fees": sffd_fees,
+        "plumbing_fees": plumbing_fees,
+        "electrical_fees": electrical_fees,
+        "additional_fees": additional_fees,
+        "ada_analysis": ada_analysis,
+        "stat_data": stat_data,
+        "total_dbi": total_dbi,
+        "revision_bracket": _get_cost_revision_bracket(estimated_construction_cost),
+        "confidence": confidence,
+        "coverage_gaps": coverage_gaps,
+    }
+
+
+def render_fees(result: dict) -> str:
+    """Markdown for an estimate_fees_result() dict."""
+    estimated_construction_cost = result["estimated_construction_cost"]
+    square_footage = result["square_footage"]
+    building_fee = result["building_fee"]
+    surcharges = result["surcharges"]
+    sffd_fees = result["sffd_fees"]
+    plumbing_fees = result["plumbing_fees"]
+    electrical_fees = result["electrical_fees"]
+    ada_analysis = result["ada_analysis"]
+    stat_data = result["stat_data"]
+    total_dbi = result["total_dbi"]
+
     lines = ["# Fee Estimate\n"]
     lines.append(f"**Construction Valuation:** ${estimated_construction_cost:,.0f}")
-    lines.append(f"**Permit Category:** {category}")
+    lines.append(f"**Permit Category:** {result['category']}")
     if square_footage:
         lines.append(f"**Square Footage:** {square_footage:,.0f}")
 
@@ -654,9 +701,9 @@ async def estimate_fees(
         else:
             lines.append(f"| **Plumbing Permit Total** | **{plumbing_fees['estimate']}** |")
 
-    if additional_fees:
+    if result["additional_fees"]:
         lines.append(f"\n## Additional Fees (estimated)\n")
-        for af in additional_fees:
+        for af in result["additional_fees"]:
             lines.append(f"- {af['fee']}: {af['estimate']}")
 
     if stat_data:
@@ -665,8 +712,8 @@ async def estimate_fees(
         lines.append(f"- 25th percentile cost: ${stat_data['p25_cost']:,.0f}")
         lines.append(f"- Median cost: ${stat_data['p50_cost']:,.0f}")
         lines.append(f"- 75th percentile cost: ${stat_data['p75_cost']:,.0f}")
-        if neighborhood:
-            lines.append(f"- Filtered to: {neighborhood}")
+        if result["neighborhood"]:
+            lines.append(f"- Filtered to: {result['neighborhood']}")
 
     if ada_analysis:
         lines.append(f"\n## ADA/Accessibility Cost Impact\n")
@@ -680,7 +727,7 @@ async def estimate_fees(
         lines.append("- Submit DA-02 Disabled Access Compliance Checklist with permit application")
 
     # Cost Revision Risk section
-    revision_bracket = _get_cost_revision_bracket(estimated_construction_cost)
+    revision_bracket = result["revision_bracket"]
     if revision_bracket:
         budget_ceiling = estimated_construction_cost * (1 + revision_bracket["rate"])
         lines.append(f"\n## Cost Revision Risk\n")
@@ -694,15 +741,10 @@ async def estimate_fees(
     lines.append("- Additional agency fees (Planning, SFFD, DPH, DPW) not included in DBI total")
     lines.append("- Fees subject to periodic update — verify against current DBI schedule")
 
-    confidence = "high" if "error" not in building_fee else "low"
-    lines.append(f"\n**Confidence:** {confidence}")
+    lines.append(f"\n**Confidence:** {result['confidence']}")
 
-    # Coverage disclaimer
-    coverage_gaps = ["Planning fees not included", "Electrical fees estimated from Table 1A-E"]
-    if not sffd_fees:
-        coverage_gaps.append("SFFD fees not calculated (project type may not trigger fire review)")
     lines.append(f"\n## Data Coverage\n")
-    for gap in coverage_gaps:
+    for gap in result["coverage_gaps"]:
         lines.append(f"- {gap}")
 
     # Build source citations
@@ -717,12 +759,22 @@ async def estimate_fees(
         sources.append("fee_tables")  # Table 1A-E is in fee_tables
     lines.append(format_sources(sources))
 
-    md_output = "\n".join(lines)
+    return "\n".join(lines)
 
-    # === Sprint 58A: Full methodology dict on ALL returns ===
+
+def _fees_meta(result: dict) -> dict:
+    """Sprint 58A methodology dict (legacy structured return) for a result."""
     from datetime import date as _date
     today_iso = _date.today().isoformat()
 
+    estimated_construction_cost = result["estimated_construction_cost"]
+    building_fee = result["building_fee"]
+    surcharges = result["surcharges"]
+    sffd_fees = result["sffd_fees"]
+    electrical_fees = result["electrical_fees"]
+    stat_data = result["stat_data"]
+    total_dbi = result["total_dbi"]
+
     # Build formula steps
     formula_steps: list[str] = []
     if "error" not in building_fee:
@@ -741,13 +793,13 @@ async def estimate_fees(
         data_sources_list.append("SFFD Table 107-B/107-C fire review fees")
     if electrical_fees:
         data_sources_list.append("DBI Table 1A-E electrical permit fees")
-    if plumbing_fees:
+    if result["plumbing_fees"]:
         data_sources_list.append("DBI Table 1A-C plumbing permit fees")
     if stat_data:
         data_sources_list.append(f"1.1M permit records (statistical comparison)")
 
     # Revision context — budget ceiling calculation (Sprint 58A requirement)
-    revision_bracket = _get_cost_revision_bracket(estimated_construction_cost)
+    revision_bracket = result["revision_bracket"]
     if revision_bracket:
         revised_cost_ceiling = estimated_construction_cost * (1 + revision_bracket["rate"])
         budget_ceiling = revised_cost_ceiling + total_dbi
@@ -768,42 +820,69 @@ async def estimate_fees(
     else:
         revision_context = {}
 
-    methodology_dict: dict = {
-        "methodology": {
-            "model": "DBI fee schedule formula + statistical comparison",
-            "formula": (
-                f"Table 1A-A base fee + surcharges"
-                + (f" + SFFD Table 107-B/C" if sffd_fees else "")
-                + (f" + electrical Table 1A-E" if electrical_fees else "")
-                + f" = ${total_dbi:,.2f} total DBI"
-            ),
-            "data_source": "DBI Table 1A-A through 1A-S (Ord. 126-25)",
-            "recency": "Fee schedule effective 9/1/2025",
-            "sample_size": stat_data["sample_size"] if stat_data else 0,
-            "data_freshness": today_iso,
-            "confidence": confidence,
-            "coverage_gaps": coverage_gaps,
-        },
-        # Tool-specific keys
+    methodology = {
+        "model": "DBI fee schedule formula + statistical comparison",
+        "formula": (
+            f"Table 1A-A base fee + surcharges"
+            + (f" + SFFD Table 107-B/C" if sffd_fees else "")
+            + (f" + electrical Table 1A-E" if electrical_fees else "")
+            + f" = ${total_dbi:,.2f} total DBI"
+        ),
+        "data_source": "DBI Table 1A-A through 1A-S (Ord. 126-25)",
+        "recency": "Fee schedule effective 9/1/2025",
+        "sample_size": stat_data["sample_size"] if stat_data else 0,
+        "data_freshness": today_iso,
+        "confidence": result["confidence"],
+        "coverage_gaps": result["coverage_gaps"],
+    }
+
+    # Legacy structured return (backward compat with web/app.py Sprint 57D)
+    return {
+        "tool": "estimate_fees",
+        "headline": f"${total_dbi:,.0f}" if total_dbi > 0 else "See breakdown",
         "formula_steps": formula_steps,
+        "data_sources": data_sources_list,
+        "sample_size": stat_data["sample_size"] if stat_data else 0,
+        "data_freshness": today_iso,
+        "confidence": result["confidence"],
+        "coverage_gaps": result["coverage_gaps"],
+        # Sprint 58A: include full methodology + revision_context
+        "methodology": methodology,
         "revision_context": revision_context,
+        "result": result,
     }
 
-    if return_structured:
-        # Legacy structured return (backward compat with web/app.py Sprint 57D)
-        legacy_meta = {
-            "tool": "estimate_fees",
-            "headline": f"${total_dbi:,.0f}" if total_dbi > 0 else "See breakdown",
-            "formula_steps": formula_steps,
-            "data_sources": data_sources_list,
-            "sample_size": stat_data["sample_size"] if stat_data else 0,
-            "data_freshness": today_iso,
-            "confidence": confidence,
-            "coverage_gaps": coverage_gaps,
-            # Sprint 58A: include full methodology + revision_context
-            "methodology": methodology_dict["methodology"],
-            "revision_context": revision_context,
-        }
-        return md_output, legacy_meta
 
+@cached_tool
+async def estimate_fees(
+    permit_type: str,
+    estimated_construction_cost: float,
+    square_footage: float | None = None,
+    neighborhood: str | None = None,
+    project_type: str | None = None,
+    return_structured: bool = False,
+) -> str | tuple[str, dict]:
+    """Estimate permit fees using the DBI fee schedule + historical data.
+
+    Combines formula-based fee calculation from Table 1A-A through 1A-S
+    with statistical comparison against actual permit costs in DuckDB.
+
+    Args:
+        permit_type: 'alterations', 'new_construction', or 'no_plans'
+        estimated_construction_cost: Project valuation in dollars
+        square_footage: Optional project area for per-sqft analysis
+        neighborhood: Optional SF neighborhood for statistical comparison
+        project_type: Optional specific type (e.g., 'restaurant', 'adu') for additional fees
+        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+
+    Returns:
+        Formatted fee estimate with formula breakdown and statistical context.
+        If return_structured=True, returns (str, dict) tuple.
+    """
+    result = await estimate_fees_result(
+        permit_type, estimated_construction_cost, square_footage, neighborhood, project_type,
+    )
+    md_output = render_fees(result)
+    if return_structured:
+        return md_output, _fees_meta(result)
     return md_output
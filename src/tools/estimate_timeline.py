@@ -12,7 +12,10 @@ used as fallback only when no station_velocity_v2 data matches.
 import logging
 from datetime import date as _date
 
+from src import stats_cube, station_transition_model
 from src.db import get_connection, BACKEND
+from src.db_async import offload
+from src.tool_cache import cached_tool
 from src.tools.knowledge_base import format_sources
 
 logger = logging.getLogger(__name__)
@@ -115,7 +118,14 @@ def _query_timeline(conn, review_path: str | None, neighborhood: str | None,
     A4: Excludes electrical and plumbing trade permits from in-house timeline
     estimates. These 857K+ trade permits would otherwise skew the distribution
     toward much shorter timelines that don't reflect building permit reality.
+
+    Answers from the nightly permit_stats_cube (src.stats_cube) when it has
+    been built; otherwise scans timeline_stats.
     """
+    cube = stats_cube.timeline_stats(conn, review_path, neighborhood, cost_bracket, permit_type)
+    if cube is not None:
+        return cube if cube["sample_size"] >= 10 else None
+
     conditions = ["1=1"]
     params = []
     # Use %s for Postgres, ? for DuckDB
@@ -183,6 +193,28 @@ def _query_timeline(conn, review_path: str | None, neighborhood: str | None,
 
 def _query_trend(conn, neighborhood: str | None, review_path: str | None) -> dict | None:
     """Compare recent 6 months vs prior 12 months."""
+    cube = stats_cube.trend_stats(conn, neighborhood, review_path)
+    if cube is not None:
+        recent, prior = cube["recent"], cube["prior"]
+    else:
+        recent, prior = _query_trend_raw(conn, neighborhood, review_path)
+
+    if recent and prior and recent[0] and prior[0] and recent[1] >= 10 and prior[1] >= 10:
+        change_pct = ((float(recent[0]) - float(prior[0])) / float(prior[0])) * 100
+        direction = "faster" if change_pct < -5 else "slower" if change_pct > 5 else "stable"
+        return {
+            "recent_avg_days": round(float(recent[0])),
+            "prior_avg_days": round(float(prior[0])),
+            "change_pct": round(change_pct, 1),
+            "direction": direction,
+            "recent_sample": recent[1],
+            "prior_sample": prior[1],
+        }
+    return None
+
+
+def _query_trend_raw(conn, neighborhood: str | None, review_path: str | None) -> tuple:
+    """(avg days, count) for the recent and prior windows from timeline_stats."""
     ph = "%s" if BACKEND == "postgres" else "?"
     conditions_recent = ["filed > CURRENT_DATE - INTERVAL '6 months'"]
     conditions_prior = [
@@ -220,18 +252,33 @@ def _query_trend(conn, neighborhood: str | None, review_path: str | None) -> dic
     else:
         recent = conn.execute(sql_recent, params_recent).fetchone()
         prior = conn.execute(sql_prior, params_prior).fetchone()
+    return recent, prior
 
-    if recent and prior and recent[0] and prior[0] and recent[1] >= 10 and prior[1] >= 10:
-        change_pct = ((float(recent[0]) - float(prior[0])) / float(prior[0])) * 100
-        direction = "faster" if change_pct < -5 else "slower" if change_pct > 5 else "stable"
-        return {
-            "recent_avg_days": round(float(recent[0])),
-            "prior_avg_days": round(float(prior[0])),
-            "change_pct": round(change_pct, 1),
-            "direction": direction,
-            "recent_sample": recent[1],
-            "prior_sample": prior[1],
-        }
+
+def _query_completion(conn, review_path: str | None) -> dict | None:
+    """Issued → completed percentiles (cube first, timeline_stats fallback)."""
+    cube = stats_cube.completion_stats(conn, review_path)
+    if cube is not None:
+        return cube if cube["sample"] >= 10 else None
+
+    ph = "%s" if BACKEND == "postgres" else "?"
+    comp_sql = f"""
+        SELECT
+            COUNT(*) as n,
+            PERCENTILE_CONT(0.50) WITHIN GROUP (ORDER BY days_to_completion) as p50,
+            PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY days_to_completion) as p75
+        FROM timeline_stats
+        WHERE days_to_completion BETWEEN 1 AND 1000
+            AND review_path = COALESCE({ph}, review_path)
+    """
+    if BACKEND == "postgres":
+        with conn.cursor() as cur:
+            cur.execute(comp_sql, [review_path])
+            comp = cur.fetchone()
+    else:
+        comp = conn.execute(comp_sql, [review_path]).fetchone()
+    if comp and comp[0] >= 10:
+        return {"p50_days": round(comp[1]), "p75_days": round(comp[2]), "sample": comp[0]}
     return None
 
 
@@ -719,6 +766,48 @@ def _query_dbi_metrics(conn, permit_type: str | None = None,
     return "\n".join(lines)
 
 
+def _predict_remaining_stations(conn, permit_number: str, station_list: list[dict]) -> list[dict]:
+    """Predict the stations an in-flight permit has yet to visit.
+
+    Walks the most probable path in station_transition_model from the
+    permit's latest in-flight station, for its (type, neighborhood) cohort,
+    skipping stations it has already visited.  Empty when nothing is in
+    flight or the model has no data for the cohort.
+    """
+    in_flight = [s for s in station_list if s["status"] == "stalled"]
+    if not in_flight:
+        return []
+
+    ph = "%s" if BACKEND == "postgres" else "?"
+    sql = f"SELECT permit_type_definition, neighborhood FROM permits WHERE permit_number = {ph}"
+    try:
+        if BACKEND == "postgres":
+            with conn.cursor() as cur:
+                cur.execute(sql, [permit_number])
+                row = cur.fetchone()
+        else:
+            row = conn.execute(sql, [permit_number]).fetchone()
+    except Exception:
+        logger.warning("estimate_sequence_timeline: permit query failed for %s", permit_number, exc_info=True)
+        return []
+    if not row or not row[0]:
+        return []
+
+    path = station_transition_model.likely_path(
+        conn, row[0], row[1], in_flight[-1]["station"],
+        exclude={s["station"] for s in station_list},
+    )
+    return [
+        {
+            "station": step["station"],
+            "p50_days": step["p50_days"],
+            "probability": step["probability"],
+            "status": "predicted",
+        }
+        for step in path
+    ]
+
+
 def estimate_sequence_timeline(permit_number: str, conn=None) -> dict | None:
     """Estimate timeline for a specific permit using its actual station routing sequence.
 
@@ -735,6 +824,8 @@ def estimate_sequence_timeline(permit_number: str, conn=None) -> dict | None:
     Returns:
         Dict with keys:
           permit_number, stations, total_estimate_days, confidence
+          (plus predicted_stations / predicted_remaining_days for in-flight
+          permits when station_transition_model covers the permit's cohort)
         or None if no addenda found for the permit.
 
     Station status values:
@@ -960,6 +1051,14 @@ def estimate_sequence_timeline(permit_number: str, conn=None) -> dict | None:
             result["skipped_stations"] = skipped_stations
             result["note"] = f"{len(skipped_stations)} station(s) skipped — no velocity data: {', '.join(skipped_stations)}"
 
+        # Step 6: Stations still ahead of an in-flight permit
+        predicted = _predict_remaining_stations(conn, permit_number, station_list)
+        if predicted:
+            result["predicted_stations"] = predicted
+            result["predicted_remaining_days"] = round(
+                sum(s["p50_days"] for s in predicted if s["p50_days"] is not None), 1
+            )
+
         return result
 
     finally:
@@ -967,36 +1066,28 @@ def estimate_sequence_timeline(permit_number: str, conn=None) -> dict | None:
             conn.close()
 
 
-async def estimate_timeline(
+@offload
+def estimate_timeline_result(
     permit_type: str,
     neighborhood: str | None = None,
     review_path: str | None = None,
     estimated_cost: float | None = None,
     triggers: list[str] | None = None,
-    return_structured: bool = False,
     monthly_carrying_cost: float | None = None,
-) -> str | tuple[str, dict]:
-    """Estimate permit processing timeline using historical data + station velocity.
-
-    Sprint 58A: Station-sum model is PRIMARY. Queries station_velocity_v2 for
-    all relevant stations in a single query, sums p50 values for sequential
-    review estimate, and computes trend arrows (±15% vs baseline = flagged).
-    Falls back to aggregate timeline_stats (1-year recency, excluding trade
-    permits) when no station data matches.
+) -> dict:
+    """Compute the timeline estimate as a structured result.
 
-    Args:
-        permit_type: Type of permit (e.g., 'alterations', 'new_construction', 'demolition', 'otc')
-        neighborhood: SF neighborhood name (e.g., 'Mission', 'Noe Valley')
-        review_path: 'otc' or 'in_house' — if not provided, will estimate both
-        estimated_cost: Construction cost for cost bracket matching
-        triggers: Additional delay factors to include (e.g., ['change_of_use', 'historic'])
-        return_structured: If True, returns (markdown_str, methodology_dict) tuple
-        monthly_carrying_cost: Optional monthly carrying cost (rent, mortgage, storage)
-            to compute financial impact of permit delay
+    This is the data behind estimate_timeline(); render_timeline() turns it
+    into the tool's markdown.  Callers that only need the numbers use this
+    directly — primary_result holds the p25/p50/p75/p90_days of whichever
+    model answered (station-sum, else aggregate), or None when neither did.
 
     Returns:
-        Formatted timeline estimate with percentiles, station velocity, trend, and delay factors.
-        If return_structured=True, returns (str, dict) tuple.
+        Dict with the inputs plus bracket, primary_result, using_station_sum,
+        aggregate_result, station_velocity, baseline_map, completion, trend,
+        delay_factors, cost_impact, dbi_metrics_md, widened, db_available,
+        v2_available, neighborhood_specific, fallback_note, sample_size,
+        confidence and coverage_gaps.
     """
     bracket = _cost_bracket(estimated_cost)
 
@@ -1027,7 +1118,10 @@ async def estimate_timeline(
     try:
         conn = get_connection()
         try:
-            _ensure_timeline_stats(conn)
+            # timeline_stats backs the fallback queries; skip building it
+            # when the nightly stats cube can answer them.
+            if not stats_cube.is_ready(conn):
+                _ensure_timeline_stats(conn)
             db_available = True
 
             # === Sprint 58A: PRIMARY MODEL — Station Sum ===
@@ -1061,24 +1155,7 @@ async def estimate_timeline(
 
             # Completion timeline (always query, independent of primary model)
             if station_sum_result or aggregate_result:
-                ph = "%s" if BACKEND == "postgres" else "?"
-                comp_sql = f"""
-                    SELECT
-                        COUNT(*) as n,
-                        PERCENTILE_CONT(0.50) WITHIN GROUP (ORDER BY days_to_completion) as p50,
-                        PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY days_to_completion) as p75
-                    FROM timeline_stats
-                    WHERE days_to_completion BETWEEN 1 AND 1000
-                        AND review_path = COALESCE({ph}, review_path)
-                """
-                if BACKEND == "postgres":
-                    with conn.cursor() as cur:
-                        cur.execute(comp_sql, [review_path])
-                        comp = cur.fetchone()
-                else:
-                    comp = conn.execute(comp_sql, [review_path]).fetchone()
-                if comp and comp[0] >= 10:
-                    completion = {"p50_days": round(comp[1]), "p75_days": round(comp[2]), "sample": comp[0]}
+                completion = _query_completion(conn, review_path)
 
             # Trend
             trend = _query_trend(conn, neighborhood, review_path)
@@ -1102,24 +1179,125 @@ async def estimate_timeline(
             if t in DELAY_FACTORS:
                 delay_factors.append({"trigger": t, "impact": DELAY_FACTORS[t]})
 
-    # --- Format output ---
-    lines = ["# Timeline Estimate\n"]
-    lines.append(f"**Permit Type:** {permit_type}")
-    if neighborhood:
-        lines.append(f"**Neighborhood:** {neighborhood}")
-    if review_path:
-        lines.append(f"**Review Path:** {review_path}")
-    if estimated_cost:
-        lines.append(f"**Cost Bracket:** {bracket}")
-
     # Sprint 66: Check if any station used neighborhood-specific data
     neighborhood_specific = any(
         s.get("neighborhood_specific") for s in station_velocity
     ) if station_velocity else False
 
+    # Confidence
     if using_station_sum:
+        confidence = "high" if primary_result["sample_size"] >= 100 else "medium"
+    elif aggregate_result:
+        sample_size = aggregate_result["sample_size"]
+        confidence = "high" if sample_size >= 100 and not widened else \
+                     "medium" if sample_size >= 10 else "low"
+    else:
+        confidence = "low"
+
+    # === Sprint 60C: Cost of Delay ===
+    cost_impact = None
+    if monthly_carrying_cost and monthly_carrying_cost > 0 and primary_result:
+        daily_cost = monthly_carrying_cost / 30.44
+        weekly_cost = monthly_carrying_cost / 4.33
+        p50_days = primary_result.get("p50_days")
+        p75_days = primary_result.get("p75_days")
+        p90_days = primary_result.get("p90_days")
+
+        if p50_days:
+            cost_impact = {
+                "monthly_carrying_cost": monthly_carrying_cost,
+                "daily_cost": round(daily_cost, 2),
+                "weekly_cost": round(weekly_cost, 2),
+                "scenarios": [],
+            }
+
+            for label, days_key, days_val in [
+                ("Typical (p50)", "p50_days", p50_days),
+                ("Conservative (p75)", "p75_days", p75_days),
+                ("Worst Case (p90)", "p90_days", p90_days),
+            ]:
+                if days_val:
+                    carry = round(days_val * daily_cost)
+                    cost_impact["scenarios"].append({
+                        "label": label,
+                        "days": round(days_val),
+                        "carrying_cost": carry,
+                    })
+
+            # Delay cost: difference between p75 and p50
+            if p50_days and p75_days:
+                delay_days = round(p75_days - p50_days)
+                delay_cost = round(delay_days * daily_cost)
+                cost_impact["delay_cost"] = delay_cost
+                cost_impact["delay_days"] = delay_days
+    # === END Sprint 60C ===
+
+    # Coverage gaps
+    sample_size = primary_result["sample_size"] if primary_result else 0
+    coverage_gaps: list[str] = []
+    if sample_size > 0 and sample_size < 20:
+        coverage_gaps.append(f"Limited data for this combination ({sample_size} records)")
+    if widened:
+        coverage_gaps.append("Query widened beyond specified filters for sufficient sample size")
+    if not db_available:
+        coverage_gaps.append("Historical permit database not available — using knowledge-based estimates")
+    if not v2_available:
+        coverage_gaps.append("Station velocity data not available — using aggregate permit statistics")
+    if fallback_note:
+        coverage_gaps.append(fallback_note)
+
+    return {
+        "permit_type": permit_type,
+        "neighborhood": neighborhood,
+        "review_path": review_path,
+        "estimated_cost": estimated_cost,
+        "monthly_carrying_cost": monthly_carrying_cost,
+        "bracket": bracket,
+        "primary_result": primary_result,
+        "using_station_sum": using_station_sum,
+        "aggregate_result": aggregate_result,
+        "station_velocity": station_velocity,
+        "baseline_map": baseline_map,
+        "completion": completion,
+        "trend": trend,
+        "delay_factors": delay_factors,
+        "cost_impact": cost_impact,
+        "dbi_metrics_md": dbi_metrics_md,
+        "widened": widened,
+        "db_available": db_available,
+        "v2_available": v2_available,
+        "neighborhood_specific": neighborhood_specific,
+        "fallback_note": fallback_note,
+        "sample_size": sample_size,
+        "confidence": confidence,
+        "coverage_gaps": coverage_gaps,
+    }
+
+
+def render_timeline(result: dict) -> str:
+    """Markdown for an estimate_timeline_result() dict."""
+    neighborhood = result["neighborhood"]
+    review_path = result["review_path"]
+    primary_result = result["primary_result"]
+    aggregate_result = result["aggregate_result"]
+    station_velocity = result["station_velocity"]
+    completion = result["completion"]
+    trend = result["trend"]
+    delay_factors = result["delay_factors"]
+    cost_impact = result["cost_impact"]
+
+    lines = ["# Timeline Estimate\n"]
+    lines.append(f"**Permit Type:** {result['permit_type']}")
+    if neighborhood:
+        lines.append(f"**Neighborhood:** {neighborhood}")
+    if review_path:
+        lines.append(f"**Review Path:** {review_path}")
+    if result["estimated_cost"]:
+        lines.append(f"**Cost Bracket:** {result['bracket']}")
+
+    if result["using_station_sum"]:
         # Primary model: station-sum output
-        if neighborhood_specific:
+        if result["neighborhood_specific"]:
             lines.append(f"\n## Plan Review Timeline (Station-Sum Model — Neighborhood-specific)\n")
             lines.append(f"*Neighborhood-specific velocity data for {neighborhood}. "
                          "Sum of sequential station review times.*\n")
@@ -1136,12 +1314,12 @@ async def estimate_timeline(
                      f"{primary_result['sample_size']:,} total routing records*")
 
         # Station breakdown table
-        lines.extend(_format_station_table(station_velocity, baseline_map))
+        lines.extend(_format_station_table(station_velocity, result["baseline_map"]))
 
     elif aggregate_result:
         lines.append(f"\n## Filing to Issuance\n")
-        if fallback_note:
-            lines.append(f"*{fallback_note}*\n")
+        if result["fallback_note"]:
+            lines.append(f"*{result['fallback_note']}*\n")
         lines.append(f"| Percentile | Days |")
         lines.append(f"|-----------|------|")
         lines.append(f"| 25th (optimistic) | {aggregate_result['p25_days']} |")
@@ -1149,12 +1327,12 @@ async def estimate_timeline(
         lines.append(f"| 75th (conservative) | {aggregate_result['p75_days']} |")
         lines.append(f"| 90th (worst case) | {aggregate_result['p90_days']} |")
         lines.append(f"\n*Sample size: {aggregate_result['sample_size']:,} permits*")
-        if widened:
+        if result["widened"]:
             lines.append("*Note: query widened beyond specified filters for sufficient sample size*")
     else:
         # Knowledge-based fallback ranges
         lines.append("\n## Estimated Timeline Ranges\n")
-        if not db_available:
+        if not result["db_available"]:
             lines.append("*Historical permit database not available — using knowledge-based estimates*\n")
         if review_path == "otc":
             lines.append("| Phase | Estimate |")
@@ -1185,114 +1363,63 @@ async def estimate_timeline(
         for d in delay_factors:
             lines.append(f"- **{d['trigger']}**: {d['impact']}")
 
-    # Confidence
-    if using_station_sum:
-        confidence = "high" if primary_result["sample_size"] >= 100 else "medium"
-    elif aggregate_result:
-        sample_size = aggregate_result["sample_size"]
-        confidence = "high" if sample_size >= 100 and not widened else \
-                     "medium" if sample_size >= 10 else "low"
-    else:
-        confidence = "low"
-
-    lines.append(f"\n**Confidence:** {confidence}")
+    lines.append(f"\n**Confidence:** {result['confidence']}")
 
-    if v2_available:
+    if result["v2_available"]:
         lines.append(
             "\n*Station velocity data: cleaned addenda records (post-2018), "
             "deduped per permit+station, excludes administrative pass-throughs. "
             "Initial review cycle shown (addenda #0). Trend arrows: ±15% vs 365-day baseline.*"
         )
 
-    # === Sprint 60C: Cost of Delay ===
-    cost_impact = None
-    if monthly_carrying_cost and monthly_carrying_cost > 0 and primary_result:
-        daily_cost = monthly_carrying_cost / 30.44
-        weekly_cost = monthly_carrying_cost / 4.33
+    # Sprint 60C: Cost of Delay
+    if cost_impact:
+        monthly_carrying_cost = result["monthly_carrying_cost"]
         p50_days = primary_result.get("p50_days")
-        p75_days = primary_result.get("p75_days")
-        p90_days = primary_result.get("p90_days")
-
-        if p50_days:
-            cost_impact = {
-                "monthly_carrying_cost": monthly_carrying_cost,
-                "daily_cost": round(daily_cost, 2),
-                "weekly_cost": round(weekly_cost, 2),
-                "scenarios": [],
-            }
-
-            for label, days_key, days_val in [
-                ("Typical (p50)", "p50_days", p50_days),
-                ("Conservative (p75)", "p75_days", p75_days),
-                ("Worst Case (p90)", "p90_days", p90_days),
-            ]:
-                if days_val:
-                    carry = round(days_val * daily_cost)
-                    cost_impact["scenarios"].append({
-                        "label": label,
-                        "days": round(days_val),
-                        "carrying_cost": carry,
-                    })
-
-            # Delay cost: difference between p75 and p50
-            if p50_days and p75_days:
-                delay_days = round(p75_days - p50_days)
-                delay_cost = round(delay_days * daily_cost)
-                cost_impact["delay_cost"] = delay_cost
-                cost_impact["delay_days"] = delay_days
+        lines.append(f"\n## Financial Impact of Delay\n")
+        lines.append(f"Monthly carrying cost: ${monthly_carrying_cost:,.0f} · Weekly: ${monthly_carrying_cost / 4.33:,.0f}\n")
+        lines.append("| Scenario | Days | Carrying Cost |")
+        lines.append("|----------|------|---------------|")
+        for s in cost_impact["scenarios"]:
+            lines.append(f"| {s['label']} | {s['days']} | ${s['carrying_cost']:,} |")
 
-            # Add to markdown output
-            lines.append(f"\n## Financial Impact of Delay\n")
-            lines.append(f"Monthly carrying cost: ${monthly_carrying_cost:,.0f} · Weekly: ${weekly_cost:,.0f}\n")
-            lines.append("| Scenario | Days | Carrying Cost |")
-            lines.append("|----------|------|---------------|")
-            for s in cost_impact["scenarios"]:
-                lines.append(f"| {s['label']} | {s['days']} | ${s['carrying_cost']:,} |")
-
-            if cost_impact.get("delay_cost"):
-                lines.append(f"\nIf review takes {cost_impact.get('delay_days', 0) + (p50_days or 0):.0f} days instead of {p50_days:.0f}, that's ${cost_impact['delay_cost']:,} more.")
-    # === END Sprint 60C ===
-
-    # Coverage gaps
-    sample_size = primary_result["sample_size"] if primary_result else 0
-    coverage_gaps: list[str] = []
-    if sample_size > 0 and sample_size < 20:
-        coverage_gaps.append(f"Limited data for this combination ({sample_size} records)")
-    if widened:
-        coverage_gaps.append("Query widened beyond specified filters for sufficient sample size")
-    if not db_available:
-        coverage_gaps.append("Historical permit database not available — using knowledge-based estimates")
-    if not v2_available:
-        coverage_gaps.append("Station velocity data not available — using aggregate permit statistics")
-    if fallback_note:
-        coverage_gaps.append(fallback_note)
+        if cost_impact.get("delay_cost"):
+            lines.append(f"\nIf review takes {cost_impact.get('delay_days', 0) + (p50_days or 0):.0f} days instead of {p50_days:.0f}, that's ${cost_impact['delay_cost']:,} more.")
 
-    if coverage_gaps:
+    if result["coverage_gaps"]:
         lines.append(f"\n## Data Coverage\n")
-        for gap in coverage_gaps:
+        for gap in result["coverage_gaps"]:
             lines.append(f"- {gap}")
 
     # DBI Processing Metrics (Sprint 65-B) — appended below station velocity
-    if dbi_metrics_md:
-        lines.append(dbi_metrics_md)
+    if result["dbi_metrics_md"]:
+        lines.append(result["dbi_metrics_md"])
 
     # Source citations
     sources = []
-    if db_available:
+    if result["db_available"]:
         sources.append("duckdb_permits")
-    if v2_available:
+    if result["v2_available"]:
         sources.append("station_velocity_v2")
     if delay_factors:
         sources.append("routing_matrix")
-    if not db_available:
+    if not result["db_available"]:
         sources.append("inhouse_review")
     lines.append(format_sources(sources))
 
-    md_output = "\n".join(lines)
+    return "\n".join(lines)
+
 
-    # Build methodology dict — common contract + tool-specific keys
-    # Sprint 58A: methodology dict added to all returns
+def _timeline_meta(result: dict) -> dict:
+    """Methodology dict (legacy structured return) for a result.
+
+    Common contract + tool-specific keys (Sprint 58A).
+    """
     today_iso = _date.today().isoformat()
+    primary_result = result["primary_result"]
+    station_velocity = result["station_velocity"]
+    baseline_map = result["baseline_map"]
+    using_station_sum = result["using_station_sum"]
 
     # Build station dicts for methodology
     stations_meta: list[dict] = []
@@ -1329,72 +1456,101 @@ async def estimate_timeline(
         formula_str = (
             f"Percentile query on timeline_stats "
             f"(1-year recency, excluding trade permits"
-            + (f", widened" if widened else "")
+            + (f", widened" if result["widened"] else "")
             + ")"
         )
         recency = "1-year window (issued >= CURRENT_DATE - INTERVAL '1 year')"
         data_source = "timeline_stats (1.1M+ historical permits)"
 
-    methodology: dict = {
-        "methodology": {
-            "model": model_name,
-            "formula": formula_str,
-            "data_source": data_source,
-            "recency": recency,
-            "sample_size": sample_size,
-            "data_freshness": today_iso,
-            "confidence": confidence,
-            "coverage_gaps": coverage_gaps,
-        },
-        # Tool-specific keys
+    methodology = {
+        "model": model_name,
+        "formula": formula_str,
+        "data_source": data_source,
+        "recency": recency,
+        "sample_size": result["sample_size"],
+        "data_freshness": today_iso,
+        "confidence": result["confidence"],
+        "coverage_gaps": result["coverage_gaps"],
+    }
+
+    formula_steps = []
+    if primary_result:
+        formula_steps.append(f"p25 (optimistic): {primary_result['p25_days']} days")
+        formula_steps.append(f"p50 (typical): {primary_result['p50_days']} days")
+        formula_steps.append(f"p75 (conservative): {primary_result['p75_days']} days")
+        formula_steps.append(f"p90 (worst case): {primary_result['p90_days']} days")
+    if using_station_sum:
+        formula_steps.insert(0, f"Model: station-sum across {primary_result['station_count']} station(s)")
+
+    data_sources = []
+    if result["v2_available"]:
+        data_sources.append("3.9M addenda routing records (station_velocity_v2)")
+    if result["db_available"]:
+        data_sources.append("1.1M+ historical permits (timeline_stats)")
+    if result["delay_factors"]:
+        data_sources.append("Agency routing knowledge base")
+    if not result["db_available"]:
+        data_sources.append("DBI knowledge base estimates")
+
+    headline = f"{primary_result['p50_days']} days typical" if primary_result else "See ranges"
+
+    # Legacy structured return format (for backward compat with web/app.py)
+    legacy_meta = {
+        "tool": "estimate_timeline",
+        "headline": headline,
+        "formula_steps": formula_steps,
+        "data_sources": data_sources,
+        "sample_size": result["sample_size"],
+        "data_freshness": today_iso,
+        "confidence": result["confidence"],
+        "coverage_gaps": result["coverage_gaps"],
+        # Sprint 58A: include full methodology dict in structured return
+        "methodology": methodology,
         "stations": stations_meta,
-        "fallback_note": fallback_note if fallback_note else "",
-        "neighborhood_specific": neighborhood_specific,
+        "fallback_note": result["fallback_note"],
     }
+    if result["cost_impact"]:
+        legacy_meta["cost_impact"] = result["cost_impact"]
+    legacy_meta["result"] = result
+    return legacy_meta
 
-    # Sprint 60C: cost impact in methodology
-    if cost_impact:
-        methodology["cost_impact"] = cost_impact
 
-    if return_structured:
-        # Legacy structured return format (for backward compat with web/app.py)
-        formula_steps = []
-        if primary_result:
-            formula_steps.append(f"p25 (optimistic): {primary_result['p25_days']} days")
-            formula_steps.append(f"p50 (typical): {primary_result['p50_days']} days")
-            formula_steps.append(f"p75 (conservative): {primary_result['p75_days']} days")
-            formula_steps.append(f"p90 (worst case): {primary_result['p90_days']} days")
-        if using_station_sum:
-            formula_steps.insert(0, f"Model: station-sum across {primary_result['station_count']} station(s)")
-
-        data_sources = []
-        if v2_available:
-            data_sources.append("3.9M addenda routing records (station_velocity_v2)")
-        if db_available:
-            data_sources.append("1.1M+ historical permits (timeline_stats)")
-        if delay_factors:
-            data_sources.append("Agency routing knowledge base")
-        if not db_available:
-            data_sources.append("DBI knowledge base estimates")
-
-        headline = f"{primary_result['p50_days']} days typical" if primary_result else "See ranges"
-
-        legacy_meta = {
-            "tool": "estimate_timeline",
-            "headline": headline,
-            "formula_steps": formula_steps,
-            "data_sources": data_sources,
-            "sample_size": sample_size,
-            "data_freshness": today_iso,
-            "confidence": confidence,
-            "coverage_gaps": coverage_gaps,
-            # Sprint 58A: include full methodology dict in structured return
-            "methodology": methodology["methodology"],
-            "stations": stations_meta,
-            "fallback_note": fallback_note,
-        }
-        if cost_impact:
-            legacy_meta["cost_impact"] = cost_impact
-        return md_output, legacy_meta
+@cached_tool
+async def estimate_timeline(
+    permit_type: str,
+    neighborhood: str | None = None,
+    review_path: str | None = None,
+    estimated_cost: float | None = None,
+    triggers: list[str] | None = None,
+    return_structured: bool = False,
+    monthly_carrying_cost: float | None = None,
+) -> str | tuple[str, dict]:
+    """Estimate permit processing timeline using historical data + station velocity.
+
+    Sprint 58A: Station-sum model is PRIMARY. Queries station_velocity_v2 for
+    all relevant stations in a single query, sums p50 values for sequential
+    review estimate, and computes trend arrows (±15% vs baseline = flagged).
+    Falls back to aggregate timeline_stats (1-year recency, excluding trade
+    permits) when no station data matches.
 
+    Args:
+        permit_type: Type of permit (e.g., 'alterations', 'new_construction', 'demolition', 'otc')
+        neighborhood: SF neighborhood name (e.g., 'Mission', 'Noe Valley')
+        review_path: 'otc' or 'in_house' — if not provided, will estimate both
+        estimated_cost: Construction cost for cost bracket matching
+        triggers: Additional delay factors to include (e.g., ['change_of_use', 'historic'])
+        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+        monthly_carrying_cost: Optional monthly carrying cost (rent, mortgage, storage)
+            to compute financial impact of permit delay
+
+    Returns:
+        Formatted timeline estimate with percentiles, station velocity, trend, and delay factors.
+        If return_structured=True, returns (str, dict) tuple.
+    """
+    result = await estimate_timeline_result(
+        permit_type, neighborhood, review_path, estimated_cost, triggers, monthly_carrying_cost,
+    )
+    md_output = render_timeline(result)
+    if return_structured:
+        return md_output, _timeline_meta(result)
     return md_output
@@ -3,7 +3,9 @@
 import logging
 from datetime import date, timedelta, datetime
 
+from src.address_key import address_key
 from src.db import get_connection, BACKEND, circuit_breaker
+from src.db_async import offload
 
 logger = logging.getLogger(__name__)
 
@@ -122,7 +124,10 @@ def _lookup_by_address(conn, street_number: str, street_name: str) -> list[dict]
 
     Uses a two-pass strategy:
       Pass 1 (fast): direct equality on street_name — uses idx_permits_street index.
-      Pass 2 (slow): UPPER() fallback for case-insensitive + space-variant matching.
+      Pass 2: equality on the canonical address_key (src.address_key), which
+        folds case, spacing and the street suffix — uses idx_permits_address_key.
+        Tables built before address_key existed fall back to UPPER()/REPLACE()
+        variant matching.
     """
     base_name, suffix = _strip_suffix(street_name)
 
@@ -139,7 +144,27 @@ def _lookup_by_address(conn, street_number: str, street_name: str) -> list[dict]
     if rows:
         return [_row_to_dict(r) for r in rows]
 
-    # --- Pass 2: Slower case-insensitive + variant matching ---
+    # --- Pass 2: Canonical address key ---
+    sql = f"""
+        SELECT * FROM permits
+        WHERE street_number = {_PH}
+          AND address_key = {_PH}
+        ORDER BY filed_date DESC
+        LIMIT 50
+    """
+    try:
+        rows = _exec(conn, sql, [street_number, address_key(street_number, street_name)])
+    except Exception:
+        logger.debug("address_key lookup failed — using variant matching", exc_info=True)
+        if BACKEND == "postgres":
+            conn.rollback()
+        rows = _lookup_by_address_variants(conn, street_number, street_name)
+    return [_row_to_dict(r) for r in rows]
+
+
+def _lookup_by_address_variants(conn, street_number: str, street_name: str) -> list[tuple]:
+    """Case-insensitive + space-variant matching for tables without address_key."""
+    base_name, _ = _strip_suffix(street_name)
     nospace_name = base_name.replace(' ', '')
     sql = f"""
         SELECT * FROM permits
@@ -153,8 +178,7 @@ def _lookup_by_address(conn, street_number: str, street_name: str) -> list[dict]
         ORDER BY filed_date DESC
         LIMIT 50
     """
-    rows = _exec(conn, sql, [street_number, base_name, street_name, street_name, nospace_name])
-    return [_row_to_dict(r) for r in rows]
+    return _exec(conn, sql, [street_number, base_name, street_name, street_name, nospace_name])
 
 
 def _suggest_street_names(conn, street_number: str, street_name: str) -> list[tuple[str, int]]:
@@ -1077,7 +1101,8 @@ def _format_permit_list(permits: list[dict], search_desc: str) -> str:
 # Main tool entry point
 # ---------------------------------------------------------------------------
 
-async def permit_lookup(
+@offload
+def permit_lookup(
     permit_number: str | None = None,
     street_number: str | None = None,
     street_name: str | None = None,
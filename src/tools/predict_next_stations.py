@@ -14,7 +14,9 @@ refresh module (cron utility). This module provides the MCP-facing async tool.
 import logging
 from datetime import date, timedelta
 
+from src import station_transition_model
 from src.db import get_connection, BACKEND
+from src.db_async import offload
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +54,7 @@ MIN_TRANSITION_SAMPLES = 5
 STALL_THRESHOLD_DAYS = 60
 
 # Data lookback window for building transition matrix (days)
-TRANSITION_LOOKBACK_DAYS = 3 * 365
+TRANSITION_LOOKBACK_DAYS = station_transition_model.LOOKBACK_DAYS
 
 
 def _ph() -> str:
@@ -216,7 +218,8 @@ def _build_transition_matrix(
 ) -> dict[str, dict[str, int]]:
     """Build station transition count matrix from historical similar permits.
 
-    Algorithm:
+    Reads the nightly station_transition_model (one indexed lookup); when the
+    model has not been built yet, computes the matrix live:
     1. Find similar permits (same type, optionally same neighborhood)
     2. For each permit, get ordered station sequence from addenda
     3. For each consecutive pair (A → B), increment transitions[A][B]
@@ -225,7 +228,10 @@ def _build_transition_matrix(
 
     Returns: {from_station: {to_station: count}}
     """
-    ph = _ph()
+    modeled = station_transition_model.load_transitions(conn, permit_type, neighborhood)
+    if modeled is not None:
+        return modeled
+
     cutoff = (date.today() - timedelta(days=TRANSITION_LOOKBACK_DAYS)).isoformat()
 
     # Step 1: Find similar permits
@@ -604,7 +610,8 @@ def _format_output(
 # ── Public async tool ───────────────────────────────────────────────
 
 
-async def predict_next_stations(permit_number: str) -> str:
+@offload
+def predict_next_stations(permit_number: str) -> str:
     """Predict the next review stations for an active SF permit.
 
     Uses the permit's current station (from addenda routing records) combined with
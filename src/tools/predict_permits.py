@@ -3,6 +3,8 @@
 import json
 import logging
 from src.tools.knowledge_base import get_knowledge_base, format_sources
+from src.db_async import run_sync
+from src.tool_cache import cached_tool
 
 logger = logging.getLogger(__name__)
 
@@ -466,123 +468,48 @@ def _determine_special_requirements(project_types: list[str], estimated_cost: fl
     return reqs
 
 
-async def predict_permits(
-    project_description: str,
-    address: str | None = None,
-    estimated_cost: float | None = None,
-    square_footage: float | None = None,
-    scope_keywords: list[str] | None = None,
-    return_structured: bool = False,
-) -> str | tuple[str, dict]:
-    """Predict required permits, forms, review path, and agency routing for a project.
-
-    Walks the SF permit decision tree based on project description to predict:
-    - Required permit types and forms
-    - OTC vs in-house review path
-    - Which city agencies must review
-    - Special requirements and triggers
-    - Confidence levels for each prediction
-
-    Args:
-        project_description: Natural language description of the project
-        address: Optional street address for property context
-        estimated_cost: Optional construction cost estimate
-        square_footage: Optional project area in square feet
-        scope_keywords: Optional explicit project type keywords to override auto-extraction
-        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+def _query_zoning(address: str) -> tuple:
+    """(zoning_info, block, lot) for an address from permits + tax_rolls.
 
-    Returns:
-        Formatted prediction with permits, routing, requirements, and confidence.
-        If return_structured=True, returns (str, dict) tuple.
+    zoning_info is the ref_zoning_routing row (zoning_code, zoning_category,
+    planning/fire/health review flags, historic_district) or None.
     """
-    kb = get_knowledge_base()
-
-    # Extract project types from description
-    project_types = _extract_project_types(project_description, scope_keywords)
-
-    # Also match semantic index concepts for richer context
-    concepts = kb.match_concepts(project_description)
-
-    # A1: Query ref_permit_forms from DB (fall back to hardcoded if empty/fails)
-    db_form = _query_ref_permit_forms(project_types)
-
-    # A2: Query ref_agency_triggers from DB (fall back to hardcoded if empty/fails)
-    db_triggers = _query_ref_agency_triggers(project_types)
-
-    # Walk decision tree (DB data supplements/overrides hardcoded when available)
-    form = _determine_form(project_types, kb, db_form=db_form)
-    review_path = _determine_review_path(project_types, estimated_cost, kb)
-    agency_routing = _determine_agency_routing(project_types, kb, db_triggers=db_triggers)
-    special_requirements = _determine_special_requirements(project_types, estimated_cost, kb)
-
-    # Database-backed zoning routing (supplements knowledge base)
     zoning_info = None
-    historic_district_flag = False
     pim_block = None
     pim_lot = None
-    if address:
+    try:
+        from src.db import get_connection, BACKEND
+        conn = get_connection()
         try:
-            from src.db import get_connection, BACKEND
-            conn = get_connection()
-            try:
-                _ph = "%s" if BACKEND == "postgres" else "?"
-                # Parse address into street number + name
-                addr_parts = address.strip().split()
-                street_num = addr_parts[0] if addr_parts else None
-                street_name_part = addr_parts[1] if len(addr_parts) > 1 else None
-
-                if street_num and street_name_part:
-                    if BACKEND == "postgres":
-                        with conn.cursor() as cur:
-                            cur.execute(
-                                f"SELECT block, lot FROM permits"
-                                f" WHERE street_number = {_ph}"
-                                f"   AND UPPER(street_name) LIKE UPPER({_ph})"
-                                f" LIMIT 1",
-                                [street_num, f"%{street_name_part}%"],
-                            )
-                            bl = cur.fetchone()
-                            if bl:
-                                pim_block, pim_lot = bl[0], bl[1]
-                                cur.execute(
-                                    f"SELECT zoning_code FROM tax_rolls"
-                                    f" WHERE block = {_ph} AND lot = {_ph}"
-                                    f" ORDER BY tax_year DESC LIMIT 1",
-                                    [bl[0], bl[1]],
-                                )
-                                zr = cur.fetchone()
-                                if zr:
-                                    # A3: include historic_district flag
-                                    cur.execute(
-                                        f"SELECT zoning_code, zoning_category,"
-                                        f"       planning_review_required,"
-                                        f"       fire_review_required,"
-                                        f"       health_review_required,"
-                                        f"       historic_district"
-                                        f" FROM ref_zoning_routing"
-                                        f" WHERE zoning_code = {_ph}",
-                                        [zr[0]],
-                                    )
-                                    zoning_info = cur.fetchone()
-                    else:
-                        bl = conn.execute(
+            _ph = "%s" if BACKEND == "postgres" else "?"
+            # Parse address into street number + name
+            addr_parts = address.strip().split()
+            street_num = addr_parts[0] if addr_parts else None
+            street_name_part = addr_parts[1] if len(addr_parts) > 1 else None
+
+            if street_num and street_name_part:
+                if BACKEND == "postgres":
+                    with conn.cursor() as cur:
+                        cur.execute(
                             f"SELECT block, lot FROM permits"
                             f" WHERE street_number = {_ph}"
                             f"   AND UPPER(street_name) LIKE UPPER({_ph})"
                             f" LIMIT 1",
                             [street_num, f"%{street_name_part}%"],
-                        ).fetchone()
+                        )
+                        bl = cur.fetchone()
                         if bl:
                             pim_block, pim_lot = bl[0], bl[1]
-                            zr = conn.execute(
+                            cur.execute(
                                 f"SELECT zoning_code FROM tax_rolls"
                                 f" WHERE block = {_ph} AND lot = {_ph}"
                                 f" ORDER BY tax_year DESC LIMIT 1",
                                 [bl[0], bl[1]],
-                            ).fetchone()
+                            )
+                            zr = cur.fetchone()
                             if zr:
                                 # A3: include historic_district flag
-                                zoning_info = conn.execute(
+                                cur.execute(
                                     f"SELECT zoning_code, zoning_category,"
                                     f"       planning_review_required,"
                                     f"       fire_review_required,"
@@ -591,13 +518,122 @@ async def predict_permits(
                                     f" FROM ref_zoning_routing"
                                     f" WHERE zoning_code = {_ph}",
                                     [zr[0]],
-                                ).fetchone()
-            finally:
-                conn.close()
-        except Exception:
-            pass  # Graceful fallback — zoning_info stays None
+                                )
+                                zoning_info = cur.fetchone()
+                else:
+                    bl = conn.execute(
+                        f"SELECT block, lot FROM permits"
+                        f" WHERE street_number = {_ph}"
+                        f"   AND UPPER(street_name) LIKE UPPER({_ph})"
+                        f" LIMIT 1",
+                        [street_num, f"%{street_name_part}%"],
+                    ).fetchone()
+                    if bl:
+                        pim_block, pim_lot = bl[0], bl[1]
+                        zr = conn.execute(
+                            f"SELECT zoning_code FROM tax_rolls"
+                            f" WHERE block = {_ph} AND lot = {_ph}"
+                            f" ORDER BY tax_year DESC LIMIT 1",
+                            [bl[0], bl[1]],
+                        ).fetchone()
+                        if zr:
+                            # A3: include historic_district flag
+                            zoning_info = conn.execute(
+                                f"SELECT zoning_code, zoning_category,"
+                                f"       planning_review_required,"
+                                f"       fire_review_required,"
+                                f"       health_review_required,"
+                                f"       historic_district"
+                                f" FROM ref_zoning_routing"
+                                f" WHERE zoning_code = {_ph}",
+                                [zr[0]],
+                            ).fetchone()
+        finally:
+            conn.close()
+    except Exception:
+        pass  # Graceful fallback — zoning_info stays None
+    return zoning_info, pim_block, pim_lot
+
+
+def _walk_decision_tree(
+    project_description: str,
+    address: str | None,
+    estimated_cost: float | None,
+    scope_keywords: list[str] | None,
+) -> dict:
+    """Synchronous part of predict_permits_result(): knowledge base + DB lookups."""
+    kb = get_knowledge_base()
+
+    # Extract project types from description
+    project_types = _extract_project_types(project_description, scope_keywords)
+
+    # A1: Query ref_permit_forms from DB (fall back to hardcoded if empty/fails)
+    db_form = _query_ref_permit_forms(project_types)
+
+    # A2: Query ref_agency_triggers from DB (fall back to hardcoded if empty/fails)
+    db_triggers = _query_ref_agency_triggers(project_types)
+
+    # Database-backed zoning routing (supplements knowledge base)
+    zoning_info, block, lot = _query_zoning(address) if address else (None, None, None)
+
+    # Walk decision tree (DB data supplements/overrides hardcoded when available)
+    return {
+        "project_types": project_types,
+        # Also match semantic index concepts for richer context
+        "concepts": kb.match_concepts(project_description),
+        "db_form": bool(db_form),
+        "db_triggers": bool(db_triggers),
+        "form": _determine_form(project_types, kb, db_form=db_form),
+        "review_path": _determine_review_path(project_types, estimated_cost, kb),
+        "agency_routing": _determine_agency_routing(project_types, kb, db_triggers=db_triggers),
+        "special_requirements": _determine_special_requirements(project_types, estimated_cost, kb),
+        "confidence_summary": {
+            "form_selection": kb.get_step_confidence(2),
+            "review_path": kb.get_step_confidence(3),
+            "agency_routing": kb.get_step_confidence(4),
+            "documents": kb.get_step_confidence(5),
+        },
+        "zoning_info": zoning_info,
+        "block": block,
+        "lot": lot,
+    }
+
+
+async def predict_permits_result(
+    project_description: str,
+    address: str | None = None,
+    estimated_cost: float | None = None,
+    square_footage: float | None = None,
+    scope_keywords: list[str] | None = None,
+) -> dict:
+    """Predict permits as a structured result.
+
+    This is the data behind predict_permits(); render_prediction() turns it
+    into the tool's markdown.  Callers that only need the decisions (form,
+    review path, agencies) use this directly.
+
+    Returns:
+        Dict with project_description, address, estimated_cost,
+        square_footage, detected_project_types, matched_concepts,
+        permits_needed (incl. the form dict), review_path ({path, reason,
+        confidence}), agency_routing, special_requirements,
+        confidence_summary, gaps, zoning_info, historic_district, pim (PIM
+        parcel fields or None), pim_coverage_gap, db_form_used,
+        db_triggers_used and coverage_gaps.
+    """
+    tree = await run_sync(
+        _walk_decision_tree, project_description, address, estimated_cost, scope_keywords,
+    )
+    project_types = tree["project_types"]
+    form = tree["form"]
+    review_path = tree["review_path"]
+    agency_routing = tree["agency_routing"]
+    zoning_info = tree["zoning_info"]
+    pim_block = tree["block"]
+    pim_lot = tree["lot"]
 
     # A3: Extract historic_district flag from zoning info if available
+    historic_district_flag = False
     if zoning_info and len(zoning_info) >= 6:
         historic_district_flag = bool(zoning_info[5])
 
@@ -636,11 +672,28 @@ async def predict_permits(
             pim_data = None
             pim_used = False
 
+    # Sprint 61A: PIM enrichment fields
+    pim_enrichment = None
+    if pim_used and pim_data:
+        pim_enrichment = {
+            "block": pim_block,
+            "lot": pim_lot,
+            "zoning_code": pim_zoning_code,
+            "zoning_category": pim_data.get("ZONING_CATEGORY"),
+            "historic_district": pim_historic_district,
+            "height_dist": pim_data.get("HEIGHT_DIST"),
+            "special_use_dist": pim_data.get("SPECIAL_USE_DIST"),
+            "landmark": pim_data.get("LANDMARK"),
+        }
+
     # Build result
     result = {
         "project_description": project_description,
+        "address": address,
+        "estimated_cost": estimated_cost,
+        "square_footage": square_footage,
         "detected_project_types": project_types,
-        "matched_concepts": concepts[:10],
+        "matched_concepts": tree["concepts"][:10],
         "permits_needed": {
             "building_permit": True,
             "form": form,
@@ -650,15 +703,18 @@ async def predict_permits(
         },
         "review_path": review_path,
         "agency_routing": agency_routing,
-        "special_requirements": special_requirements,
+        "special_requirements": tree["special_requirements"],
         "confidence_summary": {
             "overall": review_path.get("confidence", "medium"),
-            "form_selection": kb.get_step_confidence(2),
-            "review_path": kb.get_step_confidence(3),
-            "agency_routing": kb.get_step_confidence(4),
-            "documents": kb.get_step_confidence(5),
+            **tree["confidence_summary"],
         },
         "gaps": [],
+        "zoning_info": zoning_info,
+        "historic_district": historic_district_flag,
+        "pim": pim_enrichment,
+        "pim_coverage_gap": pim_coverage_gap,
+        "db_form_used": tree["db_form"],
+        "db_triggers_used": tree["db_triggers"],
     }
 
     # Note any gaps
@@ -669,18 +725,41 @@ async def predict_permits(
     if "general_alteration" in project_types:
         result["gaps"].append("Could not classify specific project type — predictions are generalized")
 
-    # Format output
+    # Coverage disclaimer
+    coverage_gaps = []
+    if not zoning_info and not pim_used:
+        coverage_gaps.append("Zoning-specific routing unavailable. General routing rules applied.")
+    if pim_coverage_gap:
+        coverage_gaps.append(pim_coverage_gap)
+    if not address:
+        coverage_gaps.append("No address provided — cannot verify zoning or historic status")
+    if "general_alteration" in project_types:
+        coverage_gaps.append("Project type could not be classified specifically")
+    result["coverage_gaps"] = coverage_gaps
+
+    return result
+
+
+def render_prediction(result: dict) -> str:
+    """Markdown for a predict_permits_result() dict."""
+    project_types = result["detected_project_types"]
+    concepts = result["matched_concepts"]
+    form = result["permits_needed"]["form"]
+    review_path = result["review_path"]
+    zoning_info = result["zoning_info"]
+    pim = result["pim"]
+
     lines = ["# Permit Prediction\n"]
-    lines.append(f"**Project:** {project_description}")
-    if address:
-        lines.append(f"**Address:** {address}")
-    if estimated_cost:
-        lines.append(f"**Estimated Cost:** ${estimated_cost:,.0f}")
-    if square_footage:
-        lines.append(f"**Square Footage:** {square_footage:,.0f}")
+    lines.append(f"**Project:** {result['project_description']}")
+    if result["address"]:
+        lines.append(f"**Address:** {result['address']}")
+    if result["estimated_cost"]:
+        lines.append(f"**Estimated Cost:** ${result['estimated_cost']:,.0f}")
+    if result["square_footage"]:
+        lines.append(f"**Square Footage:** {result['square_footage']:,.0f}")
     lines.append(f"\n**Detected Project Types:** {', '.join(project_types)}")
     if concepts:
-        lines.append(f"**Matched Concepts:** {', '.join(concepts[:10])}")
+        lines.append(f"**Matched Concepts:** {', '.join(concepts)}")
 
     lines.append(f"\n## Permit Form\n")
     lines.append(f"**Form:** {form['form']}")
@@ -693,36 +772,32 @@ async def predict_permits(
     lines.append(f"**Confidence:** {review_path['confidence']}")
 
     lines.append(f"\n## Agency Routing\n")
-    for a in agency_routing:
+    for a in result["agency_routing"]:
         status = "Required" if a.get("required") else "Conditional"
         lines.append(f"- **{a['agency']}** ({status}): {a['reason']}")
 
     # Zoning context — PIM is PRIMARY source; ref_zoning_routing is fallback
-    if pim_used and pim_data:
+    if pim:
         lines.append(f"\n## Zoning Context\n")
         lines.append(f"*Source: SF Planning GIS (PIM ArcGIS API) — authoritative parcel data.*\n")
-        if pim_zoning_code:
-            lines.append(f"- **Zoning Code:** {pim_zoning_code}")
-        zoning_cat = pim_data.get("ZONING_CATEGORY")
-        if zoning_cat:
-            lines.append(f"- **Category:** {zoning_cat}")
-        height_dist = pim_data.get("HEIGHT_DIST")
-        if height_dist:
-            lines.append(f"- **Height District:** {height_dist}")
-        special_use = pim_data.get("SPECIAL_USE_DIST")
-        if special_use:
-            lines.append(f"- **Special Use District:** {special_use}")
-        landmark = pim_data.get("LANDMARK")
-        if landmark:
-            lines.append(f"- **Landmark:** {landmark}")
-        if pim_historic_district:
+        if pim["zoning_code"]:
+            lines.append(f"- **Zoning Code:** {pim['zoning_code']}")
+        if pim["zoning_category"]:
+            lines.append(f"- **Category:** {pim['zoning_category']}")
+        if pim["height_dist"]:
+            lines.append(f"- **Height District:** {pim['height_dist']}")
+        if pim["special_use_dist"]:
+            lines.append(f"- **Special Use District:** {pim['special_use_dist']}")
+        if pim["landmark"]:
+            lines.append(f"- **Landmark:** {pim['landmark']}")
+        if pim["historic_district"]:
             lines.append(
-                f"- **Historic District:** {pim_historic_district}"
+                f"- **Historic District:** {pim['historic_district']}"
                 f" — all exterior work triggers Planning Preservation review (Article 10/11)"
             )
         # If PIM zoning code isn't in ref table, note the coverage gap
-        if pim_coverage_gap:
-            lines.append(f"- **Note:** {pim_coverage_gap}")
+        if result["pim_coverage_gap"]:
+            lines.append(f"- **Note:** {result['pim_coverage_gap']}")
         # Supplement with ref_zoning_routing routing flags when available
         if zoning_info:
             if len(zoning_info) >= 6:
@@ -757,9 +832,9 @@ async def predict_permits(
         if historic_dist:
             lines.append(f"- **Historic District:** Yes — all exterior work triggers Planning Preservation review (Article 10/11)")
 
-    if special_requirements:
+    if result["special_requirements"]:
         lines.append(f"\n## Special Requirements\n")
-        for r in special_requirements:
+        for r in result["special_requirements"]:
             lines.append(f"- **{r['requirement']}:** {r['details']}")
 
     lines.append(f"\n## Confidence Summary\n")
@@ -771,19 +846,9 @@ async def predict_permits(
         for g in result["gaps"]:
             lines.append(f"- {g}")
 
-    # Coverage disclaimer
-    coverage_gaps = []
-    if not zoning_info and not pim_used:
-        coverage_gaps.append("Zoning-specific routing unavailable. General routing rules applied.")
-    if pim_coverage_gap:
-        coverage_gaps.append(pim_coverage_gap)
-    if not address:
-        coverage_gaps.append("No address provided — cannot verify zoning or historic status")
-    if "general_alteration" in project_types:
-        coverage_gaps.append("Project type could not be classified specifically")
-    if coverage_gaps:
+    if result["coverage_gaps"]:
         lines.append(f"\n## Data Coverage\n")
-        for gap in coverage_gaps:
+        for gap in result["coverage_gaps"]:
             lines.append(f"- {gap}")
 
     # Build source citations based on which knowledge was used
@@ -794,7 +859,7 @@ async def predict_permits(
         sources.append("earthquake_brace_bolt")
     if any(pt in project_types for pt in ["restaurant", "commercial_ti", "change_of_use", "adaptive_reuse"]):
         sources.append("ada_accessibility")
-    if kb.plan_signatures:
+    if get_knowledge_base().plan_signatures:
         sources.append("plan_signatures")
     if not {"demolition"}.intersection(project_types):
         sources.append("title24")
@@ -802,27 +867,34 @@ async def predict_permits(
         sources.append("planning_code")
     lines.append(format_sources(sources))
 
-    md_output = "\n".join(lines)
+    return "\n".join(lines)
+
 
-    # === Sprint 58A: Full methodology dict on ALL returns ===
+def _prediction_meta(result: dict) -> dict:
+    """Sprint 58A methodology dict (legacy structured return) for a result."""
     from datetime import date as _date
     today_iso = _date.today().isoformat()
 
+    project_types = result["detected_project_types"]
+    form = result["permits_needed"]["form"]
+    review_path = result["review_path"]
+    agency_routing = result["agency_routing"]
+
     formula_steps = [
         f"Form: {form['form']} ({form['reason']})",
         f"Review Path: {review_path['path']} ({review_path['confidence']} confidence)",
         f"Agencies: {len(agency_routing)} routing",
-        f"Requirements: {len(special_requirements)} items",
+        f"Requirements: {len(result['special_requirements'])} items",
     ]
 
     data_sources_list = ["SF permit decision tree (86-concept semantic index)"]
-    if pim_used:
+    if result["pim"]:
         data_sources_list.append("SF Planning GIS (PIM ArcGIS API) — authoritative zoning/historic")
-    if zoning_info:
+    if result["zoning_info"]:
         data_sources_list.append("Local tax records + zoning routing table")
-    if db_form:
+    if result["db_form_used"]:
         data_sources_list.append("ref_permit_forms (DB-backed form selection)")
-    if db_triggers:
+    if result["db_triggers_used"]:
         data_sources_list.append("ref_agency_triggers (DB-backed agency routing)")
 
     # Triggers matched for methodology
@@ -831,59 +903,77 @@ async def predict_permits(
         for pt in project_types
     ]
 
-    # Sprint 61A: PIM enrichment fields for methodology
-    pim_enrichment = None
-    if pim_used and pim_data:
-        pim_enrichment = {
-            "block": pim_block,
-            "lot": pim_lot,
-            "zoning_code": pim_zoning_code,
-            "zoning_category": pim_data.get("ZONING_CATEGORY"),
-            "historic_district": pim_historic_district,
-            "height_dist": pim_data.get("HEIGHT_DIST"),
-            "special_use_dist": pim_data.get("SPECIAL_USE_DIST"),
-            "landmark": pim_data.get("LANDMARK"),
-        }
+    methodology = {
+        "model": "Decision-tree permit classification",
+        "formula": (
+            f"Project types {project_types} → "
+            f"{form['form']} / {review_path['path']} / "
+            f"{len(agency_routing)} agencies"
+        ),
+        "data_source": (
+            "SF Planning GIS (PIM ArcGIS API)"
+            if result["pim"]
+            else "SF DBI permit decision tree + 86-concept knowledge index"
+        ),
+        "recency": "Knowledge base: current as of ingestion date",
+        "sample_size": 0,
+        "data_freshness": today_iso,
+        "confidence": review_path.get("confidence", "medium"),
+        "coverage_gaps": result["coverage_gaps"],
+        "pim_data": result["pim"],
+    }
 
-    methodology_dict: dict = {
-        "methodology": {
-            "model": "Decision-tree permit classification",
-            "formula": (
-                f"Project types {project_types} → "
-                f"{form['form']} / {review_path['path']} / "
-                f"{len(agency_routing)} agencies"
-            ),
-            "data_source": (
-                "SF Planning GIS (PIM ArcGIS API)"
-                if pim_used
-                else "SF DBI permit decision tree + 86-concept knowledge index"
-            ),
-            "recency": "Knowledge base: current as of ingestion date",
-            "sample_size": 0,
-            "data_freshness": today_iso,
-            "confidence": review_path.get("confidence", "medium"),
-            "coverage_gaps": coverage_gaps,
-            "pim_data": pim_enrichment,
-        },
-        # Tool-specific keys
+    # Legacy structured return (backward compat with web/app.py Sprint 57D)
+    return {
+        "tool": "predict_permits",
+        "headline": f"{form['form']} — {review_path['path']}",
+        "formula_steps": formula_steps,
+        "data_sources": data_sources_list,
+        "sample_size": 0,
+        "data_freshness": today_iso,
+        "confidence": review_path.get("confidence", "medium"),
+        "coverage_gaps": result["coverage_gaps"],
+        # Sprint 58A: include full methodology + triggers_matched
+        "methodology": methodology,
         "triggers_matched": triggers_matched,
+        "result": result,
     }
 
-    if return_structured:
-        # Legacy structured return (backward compat with web/app.py Sprint 57D)
-        legacy_meta = {
-            "tool": "predict_permits",
-            "headline": f"{form['form']} — {review_path['path']}",
-            "formula_steps": formula_steps,
-            "data_sources": data_sources_list,
-            "sample_size": 0,
-            "data_freshness": today_iso,
-            "confidence": review_path.get("confidence", "medium"),
-            "coverage_gaps": coverage_gaps,
-            # Sprint 58A: include full methodology + triggers_matched
-            "methodology": methodology_dict["methodology"],
-            "triggers_matched": triggers_matched,
-        }
-        return md_output, legacy_meta
 
+@cached_tool
+async def predict_permits(
+    project_description: str,
+    address: str | None = None,
+    estimated_cost: float | None = None,
+    square_footage: float | None = None,
+    scope_keywords: list[str] | None = None,
+    return_structured: bool = False,
+) -> str | tuple[str, dict]:
+    """Predict required permits, forms, review path, and agency routing for a project.
+
+    Walks the SF permit decision tree based on project description to predict:
+    - Required permit types and forms
+    - OTC vs in-house review path
+    - Which city agencies must review
+    - Special requirements and triggers
+    - Confidence levels for each prediction
+
+    Args:
+        project_description: Natural language description of the project
+        address: Optional street address for property context
+        estimated_cost: Optional construction cost estimate
+        square_footage: Optional project area in square feet
+        scope_keywords: Optional explicit project type keywords to override auto-extraction
+        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+
+    Returns:
+        Formatted prediction with permits, routing, requirements, and confidence.
+        If return_structured=True, returns (str, dict) tuple.
+    """
+    result = await predict_permits_result(
+        project_description, address, estimated_cost, square_footage, scope_keywords,
+    )
+    md_output = render_prediction(result)
+    if return_structured:
+        return md_output, _prediction_meta(result)
     return md_output
@@ -24,6 +24,7 @@ from dataclasses import dataclass, field
 from datetime import date, timedelta
 
 from src.db import get_connection, BACKEND
+from src.db_async import offload
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +79,8 @@ class ScoredConsultant:
     contact_info: dict = field(default_factory=dict)
 
 
-async def recommend_consultants(
+@offload
+def recommend_consultants(
     address: str | None = None,
     block: str | None = None,
     lot: str | None = None,
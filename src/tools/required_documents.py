@@ -1,6 +1,7 @@
 """Tool: required_documents — Generate document checklist for permit submission."""
 
 from src.tools.knowledge_base import get_knowledge_base, format_sources
+from src.tool_cache import cached_tool
 
 # Base documents by form type
 BASE_DOCUMENTS = {
@@ -256,6 +257,7 @@ def _compliance_documents(all_triggers: list[str], project_type: str | None, kb)
     return docs
 
 
+@cached_tool
 async def required_documents(
     permit_forms: list[str],
     review_path: str,
@@ -2,7 +2,10 @@
 
 import logging
 
+from src import stats_cube
 from src.db import get_connection, BACKEND
+from src.db_async import offload
+from src.tool_cache import cached_tool
 from src.tools.knowledge_base import get_knowledge_base, format_sources
 
 logger = logging.getLogger(__name__)
@@ -97,7 +100,15 @@ def _get_correction_frequencies(project_type: str | None, kb) -> list[dict]:
 
 def _query_revision_stats(conn, permit_type: str | None, neighborhood: str | None,
                           review_path: str | None) -> dict | None:
-    """Query permits for revision indicators using revised_cost as proxy."""
+    """Query permits for revision indicators using revised_cost as proxy.
+
+    Answers from the nightly permit_stats_cube (src.stats_cube); scans
+    permits only when the cube hasn't been built.
+    """
+    cube = stats_cube.revision_stats(conn, permit_type, neighborhood, review_path)
+    if cube is not None:
+        return cube if cube["total_permits"] >= 20 else None
+
     ph = "%s" if BACKEND == "postgres" else "?"
     conditions = [
         "filed_date IS NOT NULL",
@@ -172,31 +183,25 @@ def _query_revision_stats(conn, permit_type: str | None, neighborhood: str | Non
     return None
 
 
-async def revision_risk(
+@offload
+def revision_risk_result(
     permit_type: str,
     neighborhood: str | None = None,
     project_type: str | None = None,
     review_path: str | None = None,
-    return_structured: bool = False,
-) -> str | tuple[str, dict]:
-    """Estimate revision probability and impact from permit data patterns.
-
-    Analyzes historical permit data to predict:
-    - Probability of revisions during review (using revised_cost as proxy)
-    - Timeline impact of revisions
-    - Common revision triggers by project type
-    - Mitigation strategies
+) -> dict:
+    """Compute the revision risk assessment as a structured result.
 
-    Args:
-        permit_type: Type of permit (e.g., 'alterations', 'new_construction')
-        neighborhood: Optional SF neighborhood name
-        project_type: Optional specific type (e.g., 'restaurant', 'adu', 'seismic')
-        review_path: Optional 'otc' or 'in_house'
-        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+    This is the data behind revision_risk(); render_revision_risk() turns it
+    into the tool's markdown.  Callers that only need the headline numbers
+    (risk_level, revision_rate, stats) use this directly.
 
     Returns:
-        Formatted revision risk assessment with data-backed probabilities.
-        If return_structured=True, returns (str, dict) tuple.
+        Dict with the inputs plus stats (historical revision stats or None when
+        the DB has too little data), widened, db_available, risk_level
+        ("HIGH"/"MODERATE"/"LOW", None without stats), revision_rate,
+        triggers, mitigations, correction_data, correction_steps,
+        da02_deficiencies, confidence and coverage_gaps.
     """
     # Try DuckDB for statistical data — gracefully degrade if unavailable
     stats = None
@@ -245,18 +250,10 @@ async def revision_risk(
         mitigations.append("Consider CASp (Certified Access Specialist) inspection — reduces ADA correction rate from ~38% to ~10%")
         mitigations.append("Submit DA-02 checklist with initial application (most common ADA correction is missing DA-02)")
 
-    # Format output
-    lines = ["# Revision Risk Assessment\n"]
-    lines.append(f"**Permit Type:** {permit_type}")
-    if neighborhood:
-        lines.append(f"**Neighborhood:** {neighborhood}")
-    if project_type:
-        lines.append(f"**Project Type:** {project_type}")
-    if review_path:
-        lines.append(f"**Review Path:** {review_path}")
-
+    # Classify risk level
+    rate = None
+    risk_level = None
     if stats:
-        # Classify risk level
         rate = stats["revision_proxy_rate"] or 0
         if rate > 0.20:
             risk_level = "HIGH"
@@ -265,11 +262,76 @@ async def revision_risk(
         else:
             risk_level = "LOW"
 
+    # Correction frequency data from compliance knowledge
+    kb = get_knowledge_base()
+    correction_data = _get_correction_frequencies(project_type, kb)
+
+    # EPR resubmittal guidance from correction workflow
+    correction_workflow = kb.epr_requirements.get("correction_response_workflow", {})
+    correction_steps = correction_workflow.get("steps", [])[:4] if correction_workflow else []
+
+    # DA-02 checklist deficiencies for commercial
+    da02_deficiencies = []
+    ada = kb.ada_accessibility
+    if ada and project_type in ("restaurant", "commercial_ti", "change_of_use", "adaptive_reuse"):
+        form_c = ada.get("da02_form_structure", {}).get("form_c", {})
+        da02_deficiencies = [
+            {"category": cat["category"], "deficiency": cat["common_deficiency"]}
+            for cat in form_c.get("checklist_categories", [])
+            if cat.get("common_deficiency", "")
+        ]
+
+    confidence = "high" if stats and stats["total_permits"] >= 100 and not widened else \
+                 "medium" if stats else "low"
+
+    # Coverage disclaimer
+    coverage_gaps = ["Based on cost revision proxy. Actual revision reasons vary by project type."]
+    if not db_available:
+        coverage_gaps.append("Historical permit database not available for statistical analysis")
+    if widened:
+        coverage_gaps.append("Query widened beyond specified filters for sufficient sample size")
+
+    return {
+        "permit_type": permit_type,
+        "neighborhood": neighborhood,
+        "project_type": project_type,
+        "review_path": review_path,
+        "stats": stats,
+        "widened": widened,
+        "db_available": db_available,
+        "risk_level": risk_level,
+        "revision_rate": rate,
+        "triggers": triggers,
+        "mitigations": mitigations,
+        "correction_data": correction_data,
+        "has_correction_workflow": bool(correction_workflow),
+        "correction_steps": correction_steps,
+        "da02_deficiencies": da02_deficiencies,
+        "confidence": confidence,
+        "coverage_gaps": coverage_gaps,
+    }
+
+
+def render_revision_risk(result: dict) -> str:
+    """Markdown for a revision_risk_result() dict."""
+    stats = result["stats"]
+    project_type = result["project_type"]
+
+    lines = ["# Revision Risk Assessment\n"]
+    lines.append(f"**Permit Type:** {result['permit_type']}")
+    if result["neighborhood"]:
+        lines.append(f"**Neighborhood:** {result['neighborhood']}")
+    if project_type:
+        lines.append(f"**Project Type:** {project_type}")
+    if result["review_path"]:
+        lines.append(f"**Review Path:** {result['review_path']}")
+
+    if stats:
         lines.append(f"\n## Revision Probability\n")
-        lines.append(f"**Risk Level:** {risk_level}")
-        lines.append(f"**Revision Rate:** {rate:.1%} of permits had cost increases during review")
+        lines.append(f"**Risk Level:** {result['risk_level']}")
+        lines.append(f"**Revision Rate:** {result['revision_rate']:.1%} of permits had cost increases during review")
         lines.append(f"**Sample Size:** {stats['total_permits']:,} permits analyzed")
-        if widened:
+        if result["widened"]:
             lines.append("*Note: query widened beyond specified filters for sufficient sample size*")
 
         if stats["avg_cost_increase_pct"]:
@@ -286,7 +348,7 @@ async def revision_risk(
         if stats["p90_days"]:
             lines.append(f"- 90th percentile (worst case): {stats['p90_days']} days")
     else:
-        if not db_available:
+        if not result["db_available"]:
             lines.append("\n*Historical permit database not available — using LUCK-based assessment*")
         lines.append("\n## Risk Assessment (LUCK-based)\n")
         lines.append("Based on SF DBI patterns, typical revision risk factors:")
@@ -295,44 +357,30 @@ async def revision_risk(
         lines.append("- **Most common cause:** Incomplete documentation at initial submittal")
 
     lines.append(f"\n## Common Revision Triggers\n")
-    for i, t in enumerate(triggers, 1):
+    for i, t in enumerate(result["triggers"], 1):
         lines.append(f"{i}. {t}")
 
-    # Correction frequency data from compliance knowledge
-    kb = get_knowledge_base()
-    correction_data = _get_correction_frequencies(project_type, kb)
-    if correction_data:
+    if result["correction_data"]:
         lines.append(f"\n## Top Correction Categories (citywide data)\n")
-        for cd in correction_data:
+        for cd in result["correction_data"]:
             lines.append(f"- **{cd['category']}** ({cd['rate']}): {cd['detail']}")
 
-    # EPR resubmittal guidance from correction workflow
-    epr = kb.epr_requirements
-    correction_workflow = epr.get("correction_response_workflow", {})
-    if correction_workflow:
+    if result["has_correction_workflow"]:
         lines.append(f"\n## EPR Resubmittal Process\n")
         lines.append("*When corrections are required during plan review:*\n")
-        for step in correction_workflow.get("steps", [])[:4]:  # Top 4 steps
+        for step in result["correction_steps"]:
             lines.append(f"- **{step.get('id', '')}:** {step.get('step', '')}")
             mistake = step.get("common_mistake", "")
             if mistake:
                 lines.append(f"  ⚠️ Common mistake: {mistake}")
 
-    # DA-02 checklist deficiencies for commercial
-    ada = kb.ada_accessibility
-    if ada and project_type in ("restaurant", "commercial_ti", "change_of_use", "adaptive_reuse"):
-        da02 = ada.get("da02_form_structure", {})
-        form_c = da02.get("form_c", {})
-        categories = form_c.get("checklist_categories", [])
-        if categories:
-            lines.append(f"\n## DA-02 Common Deficiency Areas\n")
-            for cat in categories:
-                deficiency = cat.get("common_deficiency", "")
-                if deficiency:
-                    lines.append(f"- **{cat['category']}:** {deficiency}")
+    if result["da02_deficiencies"]:
+        lines.append(f"\n## DA-02 Common Deficiency Areas\n")
+        for d in result["da02_deficiencies"]:
+            lines.append(f"- **{d['category']}:** {d['deficiency']}")
 
     lines.append(f"\n## Mitigation Strategies\n")
-    for m in mitigations:
+    for m in result["mitigations"]:
         lines.append(f"- {m}")
 
     lines.append(f"\n## Questions for Expert Review\n")
@@ -340,44 +388,38 @@ async def revision_risk(
     lines.append("- Are there specific reviewers known for particular requirements?")
     lines.append("- What pre-submission meetings (if any) could reduce revision rounds?")
 
-    confidence = "high" if stats and stats["total_permits"] >= 100 and not widened else \
-                 "medium" if stats else "low"
-    lines.append(f"\n**Confidence:** {confidence}")
+    lines.append(f"\n**Confidence:** {result['confidence']}")
 
-    # Coverage disclaimer
-    coverage_gaps = ["Based on cost revision proxy. Actual revision reasons vary by project type."]
-    if not db_available:
-        coverage_gaps.append("Historical permit database not available for statistical analysis")
-    if widened:
-        coverage_gaps.append("Query widened beyond specified filters for sufficient sample size")
     lines.append(f"\n## Data Coverage\n")
-    for gap in coverage_gaps:
+    for gap in result["coverage_gaps"]:
         lines.append(f"- {gap}")
 
     # Source citations
     sources = []
-    if db_available:
+    if result["db_available"]:
         sources.append("duckdb_permits")
-    if correction_data:
+    if result["correction_data"]:
         sources.append("title24")
     if project_type in ("restaurant", "commercial_ti", "change_of_use", "adaptive_reuse"):
         sources.append("ada_accessibility")
     if project_type == "restaurant":
         sources.extend(["dph_food", "restaurant_guide"])
-    if epr and correction_workflow:
+    if result["has_correction_workflow"]:
         sources.append("epr_requirements")
     lines.append(format_sources(sources))
 
-    md_output = "\n".join(lines)
+    return "\n".join(lines)
+
 
-    # === Sprint 58A: Full methodology dict on ALL returns ===
+def _revision_risk_meta(result: dict) -> dict:
+    """Sprint 58A methodology dict (legacy structured return) for a result."""
     from datetime import date as _date
     today_iso = _date.today().isoformat()
+    stats = result["stats"]
 
     formula_steps: list[str] = []
     if stats:
-        rate = stats["revision_proxy_rate"] or 0
-        formula_steps.append(f"Revision proxy rate: {rate:.1%} (permits with revised_cost > estimated_cost)")
+        formula_steps.append(f"Revision proxy rate: {result['revision_rate']:.1%} (permits with revised_cost > estimated_cost)")
         if stats["avg_cost_increase_pct"]:
             formula_steps.append(f"Avg cost increase when revised: {stats['avg_cost_increase_pct']:.1f}%")
         if stats["avg_days_with_change"] and stats["avg_days_no_change"]:
@@ -387,16 +429,14 @@ async def revision_risk(
         formula_steps.append("Knowledge-based assessment (DB unavailable)")
 
     data_sources_list: list[str] = []
-    if db_available:
+    if result["db_available"]:
         data_sources_list.append("1.1M+ historical permits (revised_cost as revision proxy)")
-    if correction_data:
+    if result["correction_data"]:
         data_sources_list.append("Title-24/ADA correction frequency data (citywide)")
-    if correction_workflow:
+    if result["has_correction_workflow"]:
         data_sources_list.append("EPR resubmittal workflow guide")
 
-    risk_level = "HIGH" if stats and (stats["revision_proxy_rate"] or 0) > 0.20 else \
-                 "MODERATE" if stats and (stats["revision_proxy_rate"] or 0) > 0.10 else "LOW"
-    headline = f"{risk_level} risk" if stats else "See assessment"
+    headline = f"{result['risk_level']} risk" if stats else "See assessment"
 
     # Correction categories for methodology
     correction_categories = [
@@ -405,43 +445,70 @@ async def revision_risk(
             "rate": c["rate"],
             "detail": c["detail"],
         }
-        for c in correction_data
+        for c in result["correction_data"]
     ]
 
-    methodology_dict: dict = {
-        "methodology": {
-            "model": "Revised-cost proxy analysis on historical permits",
-            "formula": (
-                f"COUNT(revised_cost > estimated_cost) / COUNT(*) "
-                + (f"= {stats['revision_proxy_rate']:.1%}" if stats and stats.get("revision_proxy_rate") else "= unavailable")
-                + f" ({stats['total_permits']:,} permits)" if stats else " (DB unavailable)"
-            ),
-            "data_source": "permits table (revised_cost vs estimated_cost columns)",
-            "recency": "All filed permits with issued_date (no recency filter — full historical)",
-            "sample_size": stats["total_permits"] if stats else 0,
-            "data_freshness": today_iso,
-            "confidence": confidence,
-            "coverage_gaps": coverage_gaps,
-        },
-        # Tool-specific keys
+    methodology = {
+        "model": "Revised-cost proxy analysis on historical permits",
+        "formula": (
+            f"COUNT(revised_cost > estimated_cost) / COUNT(*) "
+            + (f"= {stats['revision_proxy_rate']:.1%}" if stats and stats.get("revision_proxy_rate") else "= unavailable")
+            + f" ({stats['total_permits']:,} permits)" if stats else " (DB unavailable)"
+        ),
+        "data_source": "permits table (revised_cost vs estimated_cost columns)",
+        "recency": "All filed permits with issued_date (no recency filter — full historical)",
+        "sample_size": stats["total_permits"] if stats else 0,
+        "data_freshness": today_iso,
+        "confidence": result["confidence"],
+        "coverage_gaps": result["coverage_gaps"],
+    }
+
+    # Legacy structured return (backward compat with web/app.py Sprint 57D)
+    return {
+        "tool": "revision_risk",
+        "headline": headline,
+        "formula_steps": formula_steps,
+        "data_sources": data_sources_list,
+        "sample_size": stats["total_permits"] if stats else 0,
+        "data_freshness": today_iso,
+        "confidence": result["confidence"],
+        "coverage_gaps": result["coverage_gaps"],
+        # Sprint 58A: include full methodology + correction_categories
+        "methodology": methodology,
         "correction_categories": correction_categories,
+        "result": result,
     }
 
-    if return_structured:
-        # Legacy structured return (backward compat with web/app.py Sprint 57D)
-        legacy_meta = {
-            "tool": "revision_risk",
-            "headline": headline,
-            "formula_steps": formula_steps,
-            "data_sources": data_sources_list,
-            "sample_size": stats["total_permits"] if stats else 0,
-            "data_freshness": today_iso,
-            "confidence": confidence,
-            "coverage_gaps": coverage_gaps,
-            # Sprint 58A: include full methodology + correction_categories
-            "methodology": methodology_dict["methodology"],
-            "correction_categories": correction_categories,
-        }
-        return md_output, legacy_meta
 
+@cached_tool
+async def revision_risk(
+    permit_type: str,
+    neighborhood: str | None = None,
+    project_type: str | None = None,
+    review_path: str | None = None,
+    return_structured: bool = False,
+) -> str | tuple[str, dict]:
+    """Estimate revision probability and impact from permit data patterns.
+
+    Analyzes historical permit data to predict:
+    - Probability of revisions during review (using revised_cost as proxy)
+    - Timeline impact of revisions
+    - Common revision triggers by project type
+    - Mitigation strategies
+
+    Args:
+        permit_type: Type of permit (e.g., 'alterations', 'new_construction')
+        neighborhood: Optional SF neighborhood name
+        project_type: Optional specific type (e.g., 'restaurant', 'adu', 'seismic')
+        review_path: Optional 'otc' or 'in_house'
+        return_structured: If True, returns (markdown_str, methodology_dict) tuple
+
+    Returns:
+        Formatted revision risk assessment with data-backed probabilities.
+        If return_structured=True, returns (str, dict) tuple.
+    """
+    result = await revision_risk_result(permit_type, neighborhood, project_type, review_path)
+    md_output = render_revision_risk(result)
+    if return_structured:
+        return md_output, _revision_risk_meta(result)
     return md_output
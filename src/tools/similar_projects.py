@@ -9,6 +9,8 @@ import logging
 from datetime import date as _date
 
 from src.db import get_connection, BACKEND
+from src.db_async import offload
+from src.routing_summary import get_routing_batch
 
 logger = logging.getLogger(__name__)
 
@@ -86,28 +88,14 @@ def _query_permits(conn, where: str, params: list, limit: int) -> list[tuple]:
         return conn.execute(sql, params).fetchall()
 
 
-def _query_routing_path(conn, permit_number: str) -> list[str]:
-    """Get the list of stations visited for a permit from the addenda table."""
-    ph = "%s" if BACKEND == "postgres" else "?"
-    sql = f"""
-        SELECT DISTINCT station
-        FROM addenda
-        WHERE application_number = {ph}
-            AND station IS NOT NULL
-            AND station != ''
-        ORDER BY station
-    """
+def _query_routing_paths(conn, permit_numbers: list[str]) -> dict[str, list[str]]:
+    """Get the stations visited by each permit, in one batched routing lookup."""
     try:
-        if BACKEND == "postgres":
-            with conn.cursor() as cur:
-                cur.execute(sql, [permit_number])
-                rows = cur.fetchall()
-        else:
-            rows = conn.execute(sql, [permit_number]).fetchall()
-        return [r[0] for r in rows if r[0]]
+        summaries = get_routing_batch(permit_numbers, conn=conn)
     except Exception as e:
-        logger.debug("Routing path query failed for %s: %s", permit_number, e)
-        return []
+        logger.debug("Routing path query failed for %d permits: %s", len(permit_numbers), e)
+        return {}
+    return {pnum: s["stations_visited"] for pnum, s in summaries.items()}
 
 
 def _compute_days(date1_str: str | None, date2_str: str | None) -> int | None:
@@ -204,7 +192,8 @@ def _format_markdown(matches: list[dict], permit_type: str, neighborhood: str |
     return "\n".join(lines)
 
 
-async def similar_projects(
+@offload
+def similar_projects(
     permit_type: str,
     neighborhood: str | None = None,
     estimated_cost: float | None = None,
@@ -256,13 +245,10 @@ async def similar_projects(
             rows = _query_permits(conn, where, params, limit)
             total_searched += limit  # approximate
 
-            if rows:
-                for row in rows:
-                    routing = _query_routing_path(conn, row[0])
-                    matches.append(_build_project_dict(row, routing))
+            selected: list[tuple] = list(rows)
 
             # Step 2: Widen cost to 100% (if fewer than limit results)
-            if len(matches) < limit and estimated_cost:
+            if len(selected) < limit and estimated_cost:
                 widened_to = "100% cost bracket"
                 where2, params2 = _build_where(
                     permit_type=permit_type,
@@ -273,19 +259,18 @@ async def similar_projects(
                     use_district=False,
                 )
                 # Exclude already-found permit numbers
-                found_nums = {m["permit_number"] for m in matches}
+                found_nums = {r[0] for r in selected}
                 rows2 = _query_permits(conn, where2, params2, limit * 3)
                 total_searched += limit * 3
                 for row in rows2:
-                    if row[0] not in found_nums and len(matches) < limit:
-                        routing = _query_routing_path(conn, row[0])
-                        matches.append(_build_project_dict(row, routing))
+                    if row[0] not in found_nums and len(selected) < limit:
+                        selected.append(row)
                         found_nums.add(row[0])
 
             # Step 3: Widen to supervisor_district if still under limit
-            if len(matches) < limit and (supervisor_district or neighborhood):
+            if len(selected) < limit and (supervisor_district or neighborhood):
                 widened_to = "supervisor district"
-                found_nums = {m["permit_number"] for m in matches}
+                found_nums = {r[0] for r in selected}
                 # If we only have neighborhood, try without geo filter at all
                 where3, params3 = _build_where(
                     permit_type=permit_type,
@@ -298,11 +283,17 @@ async def similar_projects(
                 rows3 = _query_permits(conn, where3, params3, limit * 5)
                 total_searched += limit * 5
                 for row in rows3:
-                    if row[0] not in found_nums and len(matches) < limit:
-                        routing = _query_routing_path(conn, row[0])
-                        matches.append(_build_project_dict(row, routing))
+                    if row[0] not in found_nums and len(selected) < limit:
+                        selected.append(row)
                         found_nums.add(row[0])
 
+            # Routing paths for every selected permit in one lookup
+            routing_paths = _query_routing_paths(conn, [r[0] for r in selected])
+            matches = [
+                _build_project_dict(row, routing_paths.get(row[0], []))
+                for row in selected
+            ]
+
         finally:
             conn.close()
 
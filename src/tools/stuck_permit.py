@@ -21,7 +21,9 @@ from __future__ import annotations
 import logging
 from datetime import date, timedelta
 
+from src import station_transition_model
 from src.db import BACKEND, get_connection
+from src.db_async import offload
 from src.severity import PermitInput, score_permit, classify_description
 
 logger = logging.getLogger(__name__)
@@ -231,11 +233,22 @@ def _fetch_revision_count(conn, permit_number: str) -> int:
     return int(row[0]) if row and row[0] else 0
 
 
-def _fetch_velocity(conn, station: str, metric_type: str = "initial") -> dict | None:
+def _fetch_velocity(conn, station: str, metric_type: str = "initial",
+                    permit: dict | None = None) -> dict | None:
     """Fetch pre-computed station velocity baselines from station_velocity_v2.
 
-    Tries 'current' period first, falls back to 'baseline', then 'all'.
+    For initial review of a known permit, prefers the dwell distribution of
+    similar permits (same type, then same neighborhood) at this station from
+    station_transition_model.  Otherwise tries 'current' period first, falls
+    back to 'baseline', then 'all'.
     """
+    if permit and metric_type == "initial":
+        cohort = station_transition_model.station_dwell(
+            conn, permit.get("permit_type_definition"), permit.get("neighborhood"), station,
+        )
+        if cohort:
+            return cohort
+
     for period in ("current", "baseline", "all"):
         sql = f"""
             SELECT p50_days, p75_days, p90_days, sample_count
@@ -259,6 +272,16 @@ def _fetch_velocity(conn, station: str, metric_type: str = "initial") -> dict |
     return None
 
 
+def _fetch_next_stations(conn, permit: dict, station: str, top_n: int = 2) -> list[dict]:
+    """Most likely next stations after ``station`` for similar permits."""
+    permit_type = permit.get("permit_type_definition")
+    if not permit_type:
+        return []
+    return station_transition_model.next_stations(
+        conn, permit_type, permit.get("neighborhood"), station, min_count=5,
+    )[:top_n]
+
+
 # ---------------------------------------------------------------------------
 # Dwell time calculation
 # ---------------------------------------------------------------------------
@@ -476,6 +499,13 @@ def _format_playbook(
                     lines.append(f"- {flag}")
                 lines.append("")
 
+            if diag.get("next_stations"):
+                nxt = ", ".join(
+                    f"{n['station']} ({n['probability'] * 100:.0f}%)" for n in diag["next_stations"]
+                )
+                lines.append(f"**Likely next:** {nxt}")
+                lines.append("")
+
             if diag["review_results"]:
                 lines.append(f"**Review Result:** {diag['review_results']}")
                 lines.append("")
@@ -603,7 +633,8 @@ def _format_playbook(
 # Main async tool function
 # ---------------------------------------------------------------------------
 
-async def diagnose_stuck_permit(permit_number: str) -> str:
+@offload
+def diagnose_stuck_permit(permit_number: str) -> str:
     """Diagnose why a permit is stuck and return a ranked intervention playbook.
 
     Args:
@@ -653,9 +684,10 @@ async def diagnose_stuck_permit(permit_number: str) -> str:
             metric_type = "revision" if addenda_num >= 1 else "initial"
 
             # Fetch velocity baseline for this station
-            velocity = _fetch_velocity(conn, station, metric_type=metric_type)
+            velocity = _fetch_velocity(conn, station, metric_type=metric_type, permit=permit)
 
             diagnosis = _diagnose_station(station_entry, velocity, today)
+            diagnosis["next_stations"] = _fetch_next_stations(conn, permit, station)
             diagnoses.append(diagnosis)
 
         # 6. Format playbook
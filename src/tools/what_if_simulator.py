@@ -1,8 +1,13 @@
 """Tool: what_if_simulator — Compare how project variations change timeline, fees, and revision risk.
 
 Takes a base project description and a list of variations (e.g., "Add bathroom", "Use ADU path"),
-runs predict_permits / estimate_timeline / estimate_fees / revision_risk on each, and returns
-a side-by-side comparison table.
+runs the predict_permits / estimate_timeline / estimate_fees / revision_risk computations on each,
+and returns a side-by-side comparison table.
+
+Headline values come from the tools' structured results (predict_permits_result() etc.), not
+from their markdown.  All scenarios are evaluated concurrently, and sub-tool calls with the same
+inputs (revision risk for the same permit type, fees for the same cost, ...) run once per
+simulation and are shared by every scenario that needs them.
 
 Designed to help expeditors and homeowners quickly answer "what changes if I scope up / down?"
 before committing to a full permit application.
@@ -11,149 +16,92 @@ before committing to a full permit application.
 import asyncio
 import logging
 import re
-from typing import Any
 
 # Import sub-tools at module level so they can be patched in tests.
-from src.tools.predict_permits import predict_permits
-from src.tools.estimate_timeline import estimate_timeline
-from src.tools.estimate_fees import estimate_fees
-from src.tools.revision_risk import revision_risk
+from src.tools.predict_permits import predict_permits_result
+from src.tools.estimate_timeline import estimate_timeline_result
+from src.tools.estimate_fees import estimate_fees_result
+from src.tools.revision_risk import revision_risk_result
 
 logger = logging.getLogger(__name__)
 
-# ---------------------------------------------------------------------------
-# Helpers: parse headline values from tool markdown output
-# ---------------------------------------------------------------------------
-
-_CURRENCY_RE = re.compile(r"\$\s*([\d,]+(?:\.\d+)?)")
-_DAYS_RE = re.compile(r"(\d+)\s*(?:–|-)\s*(\d+)\s*(?:business\s+)?days?", re.IGNORECASE)
-_DAYS_SINGLE_RE = re.compile(r"(\d+)\s+(?:business\s+)?days?", re.IGNORECASE)
-_PCT_RE = re.compile(r"(\d+(?:\.\d+)?)%")
-_RISK_RE = re.compile(r"\*\*Risk Level:\*\*\s*(HIGH|MODERATE|LOW)", re.IGNORECASE)
-_REVIEW_PATH_RE = re.compile(
-    r"(?:Review Path|review_path)[:\s]+[*`]*(OTC|Over-the-Counter|In-house|In[_\s]House)[*`]*",
-    re.IGNORECASE,
-)
-_PERMIT_TYPE_RE = re.compile(
-    r"(?:Permit Type|permit_type)[:\s]+[*`]*([^\n*`]+)[*`]*",
-    re.IGNORECASE,
-)
-_P50_RE = re.compile(r"[Pp]50[^:\n]*:\s*(\d+)\s+days?", re.IGNORECASE)
-_TOTAL_FEE_RE = re.compile(
-    r"\|\s*\*\*Total DBI Fees\*\*\s*\|\s*\*\*\$([\d,]+(?:\.\d+)?)\*\*",
-    re.IGNORECASE,
-)
-_CONFIDENCE_RE = re.compile(r"\*\*Confidence:\*\*\s*(\w+)", re.IGNORECASE)
-
-
-def _extract_permits(md: str) -> str:
-    """Extract a short permit-type summary from predict_permits markdown."""
-    # Look for "Required Permits" section header then first bullet
-    match = re.search(r"## Required Permits?\n+(.*?)(?:\n\n|\n##|$)", md, re.DOTALL)
-    if match:
-        chunk = match.group(1).strip()
-        # Take first 2 lines as summary
-        lines = [l.lstrip("- *•").strip() for l in chunk.splitlines() if l.strip()]
-        return "; ".join(lines[:2]) or "N/A"
-
-    # Fall back: look for "**Permit Form:**" or "**Primary Permit:**"
-    for pattern in [
-        r"\*\*Permit Form:\*\*\s*([^\n]+)",
-        r"\*\*Primary Permit:\*\*\s*([^\n]+)",
-        r"\*\*Permit Type:\*\*\s*([^\n]+)",
-    ]:
-        m = re.search(pattern, md, re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
-
-    return "N/A"
-
-
-def _extract_review_path(md: str) -> str:
-    """Extract OTC or In-house review path from predict_permits markdown."""
-    m = _REVIEW_PATH_RE.search(md)
-    if m:
-        raw = m.group(1).strip()
-        if re.search(r"otc|over.the.counter", raw, re.IGNORECASE):
-            return "OTC"
-        return "In-house"
+_NEW_CONSTRUCTION_RE = re.compile(r"new.construction|ground.up", re.IGNORECASE)
 
-    # Also check for "**Review Path:**"
-    m2 = re.search(r"\*\*Review Path:\*\*\s*([^\n]+)", md, re.IGNORECASE)
-    if m2:
-        raw = m2.group(1).strip()
-        if re.search(r"otc|over.the.counter", raw, re.IGNORECASE):
-            return "OTC"
-        if re.search(r"in.house|in_house", raw, re.IGNORECASE):
-            return "In-house"
-        return raw[:30]
 
-    return "N/A"
+# ---------------------------------------------------------------------------
+# Helpers: headline values from structured tool results
+# ---------------------------------------------------------------------------
 
+def _parse_cost(description: str) -> float | None:
+    """Construction cost from a description ("$80K", "$80,000", "80k budget")."""
+    cost: float | None = None
+    cost_m = re.search(r"\$([\d,]+)(?:K|k)?", description)
+    if cost_m:
+        raw = cost_m.group(1).replace(",", "")
+        multiplier = 1000 if re.search(r"\$[\d,]+K", description, re.IGNORECASE) else 1
+        try:
+            cost = float(raw) * multiplier
+        except ValueError:
+            cost = None
 
-def _extract_p50(md: str) -> str:
-    """Extract p50 timeline from estimate_timeline markdown."""
-    m = _P50_RE.search(md)
-    if m:
-        return f"{m.group(1)} days"
+    # Also handle "80K" / "80k" without dollar sign
+    if cost is None:
+        cost_k = re.search(r"(\d+)\s*[Kk]\b", description)
+        if cost_k:
+            try:
+                cost = float(cost_k.group(1)) * 1000
+            except ValueError:
+                pass
+    return cost
 
-    # Fall back to a range pattern like "60–90 business days"
-    m2 = _DAYS_RE.search(md)
-    if m2:
-        return f"{m2.group(1)}–{m2.group(2)} days"
 
-    # Single day value near "median" or "typical"
-    for pattern in [
-        r"Median[^:\n]*:\s*(\d+)\s+days?",
-        r"Typical[^:\n]*:\s*(\d+)\s+days?",
-        r"(\d+)\s+business\s+days",
-    ]:
-        m3 = re.search(pattern, md, re.IGNORECASE)
-        if m3:
-            return f"{m3.group(1)} days"
+def _permits_summary(prediction: dict) -> str:
+    """Short permit summary: the building permit form plus any trade permits."""
+    needed = prediction["permits_needed"]
+    trades = [name for name, key in (("electrical", "electrical_permit"), ("plumbing", "plumbing_permit"))
+              if needed.get(key)]
+    form = needed["form"]["form"]
+    return f"{form} + {', '.join(trades)}" if trades else form
 
-    return "N/A"
 
+def _review_path_label(prediction: dict) -> str:
+    """'OTC' / 'In-house' for a predicted review path (e.g. 'likely_otc')."""
+    path = prediction["review_path"]["path"]
+    if path.endswith("otc"):
+        return "OTC"
+    if path.endswith("in_house"):
+        return "In-house"
+    return path.replace("_", " ").capitalize()
 
-def _extract_p75(md: str) -> str:
-    """Extract p75 timeline from estimate_timeline markdown."""
-    m = re.search(r"[Pp]75[^:\n]*:\s*(\d+)\s+days?", md, re.IGNORECASE)
-    if m:
-        return f"{m.group(1)} days"
-    return "N/A"
 
+def _days_label(days) -> str:
+    return f"{days:,.0f} days" if days else "N/A"
 
-def _extract_total_fee(md: str) -> str:
-    """Extract Total DBI Fee from estimate_fees markdown."""
-    # Try the bold table cell pattern first
-    m = _TOTAL_FEE_RE.search(md)
-    if m:
-        return f"${m.group(1)}"
 
-    # Fallback: scan for "Fee Estimate" section and look for the first large dollar amount
-    m2 = _CURRENCY_RE.search(md)
-    if m2:
-        return f"${m2.group(1)}"
+def _revision_risk_label(risk: dict) -> str:
+    if risk["stats"]:
+        return f"{risk['risk_level']} ({risk['revision_rate']:.1%})"
+    # LUCK-based assessment: ~15-20% of in-house permits need corrections
+    return "MODERATE (15–20% est.)"
 
-    return "N/A"
 
+class _SharedCalls:
+    """Runs each distinct sub-tool call once per simulation.
 
-def _extract_revision_risk(md: str) -> str:
-    """Extract revision risk level + rate from revision_risk markdown."""
-    risk_m = _RISK_RE.search(md)
-    rate_m = re.search(r"Revision Rate:\*\*\s*([\d.]+%)", md, re.IGNORECASE)
+    Scenarios that need the same call (same function and arguments) await
+    the same task, so e.g. revision risk for 'alterations' is computed once
+    however many alteration scenarios there are.
+    """
 
-    if risk_m and rate_m:
-        return f"{risk_m.group(1)} ({rate_m.group(1)})"
-    if risk_m:
-        return risk_m.group(1)
-    if rate_m:
-        return rate_m.group(1)
+    def __init__(self):
+        self._tasks: dict[tuple, asyncio.Future] = {}
 
-    # LUCK-based fallback text
-    if "15-20%" in md or "15–20%" in md:
-        return "MODERATE (15–20% est.)"
-    return "N/A"
+    def __call__(self, fn, *args) -> asyncio.Future:
+        key = (fn, args)
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args))
+        return task
 
 
 # ---------------------------------------------------------------------------
@@ -163,8 +111,12 @@ def _extract_revision_risk(md: str) -> str:
 async def _evaluate_scenario(
     label: str,
     description: str,
+    calls: _SharedCalls,
 ) -> dict[str, str]:
-    """Run all four sub-tools for one scenario and return extracted headline values.
+    """Run all four sub-tools for one scenario and return headline values.
+
+    predict_permits, estimate_fees and revision_risk run concurrently;
+    estimate_timeline follows once the predicted review path is known.
 
     Returns a dict with keys:
         label, description, permits, review_path, timeline_p50, timeline_p75,
@@ -181,119 +133,57 @@ async def _evaluate_scenario(
         "revision_risk": "N/A",
         "notes": "",
     }
+    errors: list[str] = []
 
-    # --- Parse cost from description ---
-    cost: float | None = None
-    cost_m = re.search(r"\$([\d,]+)(?:K|k)?", description)
-    if cost_m:
-        raw = cost_m.group(1).replace(",", "")
-        multiplier = 1000 if re.search(r"\$[\d,]+K", description, re.IGNORECASE) else 1
-        try:
-            cost = float(raw) * multiplier
-        except ValueError:
-            cost = None
+    cost = _parse_cost(description)
+    permit_type = "new_construction" if _NEW_CONSTRUCTION_RE.search(description) else "alterations"
 
-    # Also handle "80K" / "80k" without dollar sign
-    if cost is None:
-        cost_k = re.search(r"(\d+)\s*[Kk]\b", description)
-        if cost_k:
-            try:
-                cost = float(cost_k.group(1)) * 1000
-            except ValueError:
-                pass
+    prediction, fees, risk = await asyncio.gather(
+        calls(predict_permits_result, description, None, cost),
+        calls(estimate_fees_result, permit_type, cost if cost else 50000.0),
+        calls(revision_risk_result, permit_type),
+        return_exceptions=True,
+    )
 
     # --- 1. predict_permits ---
-    predict_md = ""
+    review_path = None
+    if isinstance(prediction, Exception):
+        logger.warning("predict_permits failed for scenario '%s': %s", label, prediction)
+        errors.append("predict_permits error")
+    else:
+        result["permits"] = _permits_summary(prediction)
+        result["review_path"] = _review_path_label(prediction)
+        review_path = {"OTC": "otc", "In-house": "in_house"}.get(result["review_path"])
+
+    # --- 2. estimate_timeline (needs the predicted review path) ---
+    timeline_type = permit_type
+    if permit_type == "alterations" and review_path == "otc":
+        timeline_type = "otc"
     try:
-        predict_result = await predict_permits(
-            project_description=description,
-            estimated_cost=cost,
-        )
-        if isinstance(predict_result, tuple):
-            predict_md = predict_result[0]
-        else:
-            predict_md = str(predict_result)
-        result["permits"] = _extract_permits(predict_md)
-        result["review_path"] = _extract_review_path(predict_md)
-    except Exception as e:
-        logger.warning("predict_permits failed for scenario '%s': %s", label, e)
-        result["notes"] += f"predict_permits error; "
-
-    # --- 2. estimate_timeline ---
-    timeline_md = ""
-    try:
-        # Infer permit_type from predict output or default to "alterations"
-        permit_type_for_timeline = "alterations"
-        if re.search(r"new.construction|ground.up", description, re.IGNORECASE):
-            permit_type_for_timeline = "new_construction"
-        elif re.search(r"otc|over.the.counter", predict_md, re.IGNORECASE):
-            permit_type_for_timeline = "otc"
-
-        review_path_for_timeline = None
-        rp = result["review_path"]
-        if rp == "OTC":
-            review_path_for_timeline = "otc"
-        elif rp == "In-house":
-            review_path_for_timeline = "in_house"
-
-        timeline_result = await estimate_timeline(
-            permit_type=permit_type_for_timeline,
-            review_path=review_path_for_timeline,
-            estimated_cost=cost,
-        )
-        if isinstance(timeline_result, tuple):
-            timeline_md = timeline_result[0]
-        else:
-            timeline_md = str(timeline_result)
-        result["timeline_p50"] = _extract_p50(timeline_md)
-        result["timeline_p75"] = _extract_p75(timeline_md)
+        timeline = await calls(estimate_timeline_result, timeline_type, None, review_path, cost)
+        primary = timeline["primary_result"]
+        if primary:
+            result["timeline_p50"] = _days_label(primary.get("p50_days"))
+            result["timeline_p75"] = _days_label(primary.get("p75_days"))
     except Exception as e:
         logger.warning("estimate_timeline failed for scenario '%s': %s", label, e)
-        result["notes"] += f"estimate_timeline error; "
+        errors.append("estimate_timeline error")
 
     # --- 3. estimate_fees ---
-    fees_md = ""
-    try:
-        # Infer fee category
-        fee_category = "alterations"
-        if re.search(r"new.construction|ground.up", description, re.IGNORECASE):
-            fee_category = "new_construction"
-
-        fee_cost = cost if cost else 50000.0
-
-        fees_result = await estimate_fees(
-            permit_type=fee_category,
-            estimated_construction_cost=fee_cost,
-        )
-        if isinstance(fees_result, tuple):
-            fees_md = fees_result[0]
-        else:
-            fees_md = str(fees_result)
-        result["fees"] = _extract_total_fee(fees_md)
-    except Exception as e:
-        logger.warning("estimate_fees failed for scenario '%s': %s", label, e)
-        result["notes"] += f"estimate_fees error; "
+    if isinstance(fees, Exception):
+        logger.warning("estimate_fees failed for scenario '%s': %s", label, fees)
+        errors.append("estimate_fees error")
+    elif fees["total_dbi"] > 0:
+        result["fees"] = f"${fees['total_dbi']:,.2f}"
 
     # --- 4. revision_risk ---
-    try:
-        # Infer permit_type for revision risk
-        rr_permit_type = "alterations"
-        if re.search(r"new.construction|ground.up", description, re.IGNORECASE):
-            rr_permit_type = "new_construction"
-
-        rr_result = await revision_risk(
-            permit_type=rr_permit_type,
-        )
-        if isinstance(rr_result, tuple):
-            rr_md = rr_result[0]
-        else:
-            rr_md = str(rr_result)
-        result["revision_risk"] = _extract_revision_risk(rr_md)
-    except Exception as e:
-        logger.warning("revision_risk failed for scenario '%s': %s", label, e)
-        result["notes"] += f"revision_risk error; "
+    if isinstance(risk, Exception):
+        logger.warning("revision_risk failed for scenario '%s': %s", label, risk)
+        errors.append("revision_risk error")
+    else:
+        result["revision_risk"] = _revision_risk_label(risk)
 
-    result["notes"] = result["notes"].rstrip("; ")
+    result["notes"] = "; ".join(errors)
     return result
 
 
@@ -309,8 +199,8 @@ async def simulate_what_if(
 
     Runs predict_permits, estimate_timeline, estimate_fees, and revision_risk for
     each scenario (base + each variation) and formats the results as a comparison
-    table. Each sub-tool call is awaited; errors in individual tools yield "N/A"
-    rather than propagating.
+    table. Scenarios are evaluated concurrently and share identical sub-tool calls;
+    errors in individual tools yield "N/A" rather than propagating.
 
     Args:
         base_description: Natural-language description of the base project,
@@ -335,8 +225,9 @@ async def simulate_what_if(
         scenarios.append({"label": label, "description": description})
 
     # Evaluate all scenarios in parallel
+    calls = _SharedCalls()
     tasks = [
-        _evaluate_scenario(s["label"], s["description"])
+        _evaluate_scenario(s["label"], s["description"], calls)
         for s in scenarios
     ]
     results: list[dict[str, str]] = await asyncio.gather(*tasks)
@@ -434,7 +325,7 @@ async def simulate_what_if(
     lines.append("---\n")
     lines.append("## About This Simulation\n")
     lines.append(
-        "Each scenario is independently evaluated using: "
+        "Each scenario is evaluated using: "
         "`predict_permits` (permit types + review path), "
         "`estimate_timeline` (historical p50/p75 processing times), "
         "`estimate_fees` (DBI Table 1A-A fee schedule), and "
@@ -442,8 +333,8 @@ async def simulate_what_if(
     )
     lines.append("")
     lines.append(
-        "**Limitations:** Headline values are extracted from markdown outputs and may not "
-        "capture all nuance. Use the individual tools for full breakdowns. "
+        "**Limitations:** Only headline values are compared and may not capture all nuance. "
+        "Use the individual tools for full breakdowns. "
         "Timeline and fee estimates depend on data availability in the local permit database."
     )
     lines.append("")
@@ -6,6 +6,9 @@ codebase does not import ``anthropic`` directly.
 Environment variables:
     ANTHROPIC_API_KEY: Required for vision calls.
     VISION_MODEL: Override model (default: claude-sonnet-4-20250514).
+    VISION_CACHE_ENABLED: "0" bypasses the result cache (see result_cache.py).
+    VISION_MAX_CONCURRENCY / VISION_JOB_CONCURRENCY / VISION_TOKENS_PER_MINUTE:
+        Admission limits for the shared call scheduler (see scheduler.py).
 """
 
 import logging
@@ -34,6 +37,8 @@ class VisionResult:
     input_tokens: int = 0
     output_tokens: int = 0
     duration_ms: int = 0
+    cached: bool = False  # Served from vision_result_cache (tokens = tokens saved)
+    queue_wait_ms: int = 0  # Time spent waiting for a scheduler slot
 
 
 @dataclass
@@ -46,6 +51,8 @@ class VisionCallRecord:
     input_tokens: int
     output_tokens: int
     success: bool
+    cached: bool = False
+    queue_wait_ms: int = 0
 
 
 @dataclass
@@ -59,12 +66,27 @@ class VisionUsageSummary:
     total_output_tokens: int = 0
     total_duration_ms: int = 0
     model: str = ""
+    cache_hits: int = 0
+    saved_input_tokens: int = 0
+    saved_output_tokens: int = 0
+    total_queue_wait_ms: int = 0
     calls: list[VisionCallRecord] = field(default_factory=list)
 
     @property
     def total_tokens(self) -> int:
         return self.total_input_tokens + self.total_output_tokens
 
+    @property
+    def saved_tokens(self) -> int:
+        return self.saved_input_tokens + self.saved_output_tokens
+
+    @property
+    def estimated_savings_usd(self) -> float:
+        """Estimate cost avoided by cache hits."""
+        input_cost = (self.saved_input_tokens / 1_000_000) * _INPUT_COST_PER_MTOK
+        output_cost = (self.saved_output_tokens / 1_000_000) * _OUTPUT_COST_PER_MTOK
+        return round(input_cost + output_cost, 6)
+
     @property
     def estimated_cost_usd(self) -> float:
         """Estimate cost based on Anthropic pricing."""
@@ -77,8 +99,15 @@ class VisionUsageSummary:
         self.calls.append(record)
         self.total_calls += 1
         self.total_duration_ms += record.duration_ms
-        self.total_input_tokens += record.input_tokens
-        self.total_output_tokens += record.output_tokens
+        self.total_queue_wait_ms += record.queue_wait_ms
+        if record.cached:
+            # Cache hits cost nothing — track their tokens as savings instead
+            self.cache_hits += 1
+            self.saved_input_tokens += record.input_tokens
+            self.saved_output_tokens += record.output_tokens
+        else:
+            self.total_input_tokens += record.input_tokens
+            self.total_output_tokens += record.output_tokens
         if record.success:
             self.successful_calls += 1
         else:
@@ -95,6 +124,12 @@ class VisionUsageSummary:
             "total_duration_ms": self.total_duration_ms,
             "total_tokens": self.total_tokens,
             "estimated_cost_usd": self.estimated_cost_usd,
+            "cache_hits": self.cache_hits,
+            "saved_input_tokens": self.saved_input_tokens,
+            "saved_output_tokens": self.saved_output_tokens,
+            "saved_tokens": self.saved_tokens,
+            "estimated_savings_usd": self.estimated_savings_usd,
+            "total_queue_wait_ms": self.total_queue_wait_ms,
             "model": self.model,
             "calls": [
                 {
@@ -104,6 +139,8 @@ class VisionUsageSummary:
                     "input_tokens": c.input_tokens,
                     "output_tokens": c.output_tokens,
                     "success": c.success,
+                    "cached": c.cached,
+                    "queue_wait_ms": c.queue_wait_ms,
                 }
                 for c in self.calls
             ],
@@ -122,9 +159,16 @@ async def analyze_image(
     model: str | None = None,
     max_tokens: int = DEFAULT_MAX_TOKENS,
     timeout: float | None = None,
+    dpi: int | None = None,
+    use_cache: bool = True,
 ) -> VisionResult:
     """Send a single image to Claude Vision for analysis.
 
+    Results are looked up in (and written to) the persistent vision result
+    cache first, keyed by image content, DPI, prompt and model. Cache misses
+    wait for a slot on the process-wide scheduler (see scheduler.py) and
+    reuse its shared client.
+
     Args:
         image_base64: Base64-encoded PNG (no ``data:`` prefix).
         prompt: User prompt describing what to extract.
@@ -132,9 +176,13 @@ async def analyze_image(
         model: Model name override.
         max_tokens: Max response tokens.
         timeout: API call timeout in seconds. Defaults to VISION_TIMEOUT_SECS.
+        dpi: Render DPI of the image, if known (part of the cache key).
+        use_cache: Set False to force a fresh API call.
 
     Returns:
         VisionResult with success status and text response.
+        ``cached=True`` when served from the result cache.
+        ``queue_wait_ms`` is the time spent queued for a scheduler slot.
         On timeout, returns VisionResult with success=False and
         error="Vision API timeout" for graceful degradation.
     """
@@ -147,11 +195,67 @@ async def analyze_image(
         )
 
     effective_timeout = timeout if timeout is not None else VISION_TIMEOUT_SECS
+    effective_model = model or os.environ.get("VISION_MODEL", DEFAULT_MODEL)
+
+    cache_key = None
+    if use_cache:
+        from src.vision import result_cache
+
+        if result_cache.is_cache_enabled():
+            page_hash = result_cache.hash_page_image(image_base64)
+            prompt_hash = result_cache.hash_prompt(prompt, system_prompt, max_tokens)
+            cache_key = result_cache.make_cache_key(page_hash, dpi, prompt_hash, effective_model)
+            cached = result_cache.get_cached_result(cache_key)
+            if cached is not None:
+                logger.info(
+                    "[vision] cache_hit call=%s model=%s saved_tok=%d",
+                    prompt[:40].replace("\n", " "),
+                    effective_model,
+                    cached.input_tokens + cached.output_tokens,
+                )
+                return cached
+
+    from src.vision.scheduler import estimate_input_tokens, get_scheduler
+
+    est_tokens = estimate_input_tokens(image_base64, prompt, system_prompt)
+    async with get_scheduler().slot(est_tokens) as slot:
+        result = await _call_api(
+            api_key, image_base64, prompt, system_prompt,
+            effective_model, max_tokens, effective_timeout,
+        )
+        slot.actual_tokens = result.input_tokens if result.success else 0
+    result.queue_wait_ms = slot.wait_ms
+
+    if result.success and cache_key is not None:
+        result_cache.store_result(
+            cache_key, result,
+            page_hash=page_hash, dpi=dpi,
+            prompt_hash=prompt_hash, model=effective_model,
+        )
+    return result
 
-    try:
-        import anthropic
 
-        client = anthropic.AsyncAnthropic(api_key=api_key)
+def _is_rate_limit_error(e: Exception) -> bool:
+    """True for Anthropic 429s (RateLimitError or a 429 status code)."""
+    if type(e).__name__ == "RateLimitError" or getattr(e, "status_code", None) == 429:
+        return True
+    return "rate_limit_error" in str(e).lower()
+
+
+async def _call_api(
+    api_key: str,
+    image_base64: str,
+    prompt: str,
+    system_prompt: str | None,
+    model: str,
+    max_tokens: int,
+    timeout: float,
+) -> VisionResult:
+    """Make one Messages API call on the shared client. Never raises."""
+    from src.vision.scheduler import get_client, get_scheduler
+
+    try:
+        client = get_client(api_key)
 
         messages = [
             {
@@ -174,7 +278,7 @@ async def analyze_image(
         ]
 
         kwargs: dict = {
-            "model": model or os.environ.get("VISION_MODEL", DEFAULT_MODEL),
+            "model": model,
             "max_tokens": max_tokens,
             "messages": messages,
         }
@@ -182,7 +286,7 @@ async def analyze_image(
             kwargs["system"] = system_prompt
 
         t0 = time.perf_counter()
-        response = await client.messages.create(timeout=effective_timeout, **kwargs)
+        response = await client.messages.create(timeout=timeout, **kwargs)
         duration_ms = int((time.perf_counter() - t0) * 1000)
         logger.info(
             "[vision] call=%s model=%s duration_ms=%d in_tok=%d out_tok=%d",
@@ -203,12 +307,14 @@ async def analyze_image(
         )
     except Exception as e:
         error_str = str(e)
+        if _is_rate_limit_error(e):
+            get_scheduler().rate_limited()
         # Detect timeout errors from httpx/anthropic
         is_timeout = any(kw in error_str.lower() for kw in ("timeout", "timed out", "deadline"))
         if is_timeout:
             logger.warning(
                 "Vision API timeout after %.0fs: %s",
-                effective_timeout,
+                timeout,
                 prompt[:40].replace("\n", " "),
             )
             return VisionResult(
@@ -238,7 +344,8 @@ async def analyze_images_batch(
         prompt: Prompt to apply to each image.
         system_prompt: Optional system context.
         model: Model override.
-        parallel: If True, run all calls concurrently via asyncio.gather.
+        parallel: If True, run all calls concurrently via asyncio.gather
+            (still bounded by the vision scheduler).
 
     Returns:
         List of ``(page_number, VisionResult)`` tuples.
@@ -28,6 +28,7 @@ from src.vision.client import (
     DEFAULT_MODEL,
 )
 from src.vision.pdf_to_images import pdf_page_to_base64
+from src.vision.scheduler import vision_job
 from src.vision.prompts import (
     SYSTEM_PROMPT_EPR,
     PROMPT_ANNOTATION_EXTRACTION,
@@ -120,6 +121,70 @@ def _select_compliance_pages(total_pages: int) -> list[int]:
     return sorted(set(pages))
 
 
+# DPI strategy: annotations need 150 for spatial precision, title-block-only pages
+# need only 100 DPI (~55% smaller payload → faster upload & model processing).
+DPI_COVER = 72          # Low DPI for cover checks
+DPI_TITLE_BLOCK = 100   # Good enough for text readability
+DPI_ANNOTATIONS = 150   # Needs spatial precision for coordinate extraction
+DPI_HATCHING = 100      # Pattern recognition, not fine detail
+
+
+def _plan_sample_pages(
+    total_pages: int,
+    analysis_mode: str = "sample",
+    analyze_all_pages: bool = False,
+) -> tuple[list[int], int | None]:
+    """Pick the pages to analyze and the compliance-mode preview page.
+
+    Returns:
+        (sample_pages, preview_annotation_page). The preview page is only
+        set in compliance mode, where annotations run on one interior page.
+    """
+    if analysis_mode == "full":
+        analyze_all_pages = True
+    is_compliance = (analysis_mode == "compliance")
+
+    if analyze_all_pages:
+        sample_pages = list(range(total_pages))
+    elif is_compliance:
+        # Compliance mode: fewer sample pages (cover + 2 interior) to minimize API calls
+        sample_pages = _select_compliance_pages(total_pages)
+    else:
+        sample_pages = _select_sample_pages(total_pages)
+
+    preview_annotation_page = None
+    if is_compliance:
+        interior_pages = [p for p in sample_pages if p != 0]
+        if interior_pages:
+            preview_annotation_page = interior_pages[0]
+    return sample_pages, preview_annotation_page
+
+
+def plan_vision_renders(
+    total_pages: int,
+    analysis_mode: str = "sample",
+    analyze_all_pages: bool = False,
+) -> dict[int, set[int]]:
+    """Page → DPIs that run_vision_epr_checks will request for this PDF.
+
+    Lets callers pre-render everything once (see page_raster.raster_session)
+    before the vision checks run.
+    """
+    if total_pages <= 0:
+        return {}
+    is_compliance = (analysis_mode == "compliance")
+    sample_pages, preview_page = _plan_sample_pages(total_pages, analysis_mode, analyze_all_pages)
+
+    plan: dict[int, set[int]] = {0: {DPI_COVER}}
+    for pn in sample_pages:
+        needs_annotations = (not is_compliance) or (pn == preview_page)
+        plan.setdefault(pn, set()).add(DPI_ANNOTATIONS if needs_annotations else DPI_TITLE_BLOCK)
+    if not is_compliance:
+        for pn in [p for p in sample_pages if p != 0][:2]:
+            plan.setdefault(pn, set()).add(DPI_HATCHING)
+    return plan
+
+
 # ---------------------------------------------------------------------------
 # Skip helpers
 # ---------------------------------------------------------------------------
@@ -163,10 +228,17 @@ async def _timed_analyze_image(
     system_prompt: str | None = None,
     max_tokens: int = 2048,
     page_number: int | None = None,
+    dpi: int | None = None,
 ) -> VisionResult:
-    """Wrapper around analyze_image() that records call timing and tokens."""
+    """Wrapper around analyze_image() that records call timing and tokens.
+
+    ``dpi`` is the render DPI of ``image_b64``; it is part of the result
+    cache key, so the same page rendered at two DPIs is cached separately.
+    Cache hits from the vision result cache are recorded with ``cached=True``
+    so the usage summary reports them as saved tokens, not spent ones.
+    """
     result = await analyze_image(
-        image_b64, prompt, system_prompt, max_tokens=max_tokens,
+        image_b64, prompt, system_prompt, max_tokens=max_tokens, dpi=dpi,
     )
     record = VisionCallRecord(
         call_type=call_type,
@@ -175,6 +247,8 @@ async def _timed_analyze_image(
         input_tokens=result.input_tokens,
         output_tokens=result.output_tokens,
         success=result.success,
+        cached=result.cached,
+        queue_wait_ms=result.queue_wait_ms,
     )
     usage.add_call(record)
     return result
@@ -190,7 +264,7 @@ async def _check_cover_page_count(
     """EPR-011: Page count on cover matches actual PDF page count."""
     result = await _timed_analyze_image(
         cover_b64, PROMPT_COVER_PAGE_COUNT, "cover_page_count", usage,
-        system_prompt=SYSTEM_PROMPT_EPR, page_number=0,
+        system_prompt=SYSTEM_PROMPT_EPR, page_number=0, dpi=DPI_COVER,
     )
     parsed = _parse_json_response(result)
 
@@ -257,7 +331,7 @@ async def _check_cover_blank_area(
     """EPR-012: 8.5x11 blank area on cover for DBI stamping."""
     result = await _timed_analyze_image(
         cover_b64, PROMPT_COVER_BLANK_AREA, "cover_blank_area", usage,
-        system_prompt=SYSTEM_PROMPT_EPR, page_number=0,
+        system_prompt=SYSTEM_PROMPT_EPR, page_number=0, dpi=DPI_COVER,
     )
     parsed = _parse_json_response(result)
 
@@ -832,10 +906,10 @@ async def _check_hatching(
 
     async def _check_one_page(pn: int) -> str | None:
         try:
-            b64 = pdf_page_to_base64(pdf_bytes, pn, dpi=100)  # Lower DPI for hatching
+            b64 = pdf_page_to_base64(pdf_bytes, pn, dpi=DPI_HATCHING)  # Lower DPI for hatching
             result = await _timed_analyze_image(
                 b64, PROMPT_DENSE_HATCHING, "hatching", usage,
-                system_prompt=SYSTEM_PROMPT_EPR, page_number=pn,
+                system_prompt=SYSTEM_PROMPT_EPR, page_number=pn, dpi=DPI_HATCHING,
             )
             parsed = _parse_json_response(result)
             if parsed and parsed.get("has_dense_hatching"):
@@ -894,6 +968,7 @@ async def extract_page_annotations(
     image_b64: str,
     page_number: int,
     usage: VisionUsageSummary | None = None,
+    dpi: int | None = None,
 ) -> list[dict]:
     """Extract spatial annotations from a plan page image.
 
@@ -904,6 +979,7 @@ async def extract_page_annotations(
         image_b64: Base64-encoded PNG image of the page.
         page_number: 1-indexed page number.
         usage: Optional usage summary to track API call metrics.
+        dpi: Render DPI of the image, if known (part of the cache key).
 
     Returns:
         List of annotation dicts with keys:
@@ -914,12 +990,12 @@ async def extract_page_annotations(
             result = await _timed_analyze_image(
                 image_b64, PROMPT_ANNOTATION_EXTRACTION, "annotation", usage,
                 system_prompt=SYSTEM_PROMPT_EPR, max_tokens=1500,
-                page_number=page_number,
+                page_number=page_number, dpi=dpi,
             )
         else:
             result = await analyze_image(
                 image_b64, PROMPT_ANNOTATION_EXTRACTION, SYSTEM_PROMPT_EPR,
-                max_tokens=1500,
+                max_tokens=1500, dpi=dpi,
             )
     except Exception as e:
         logger.warning("Annotation extraction failed for page %d: %s", page_number, e)
@@ -1093,13 +1169,29 @@ async def run_vision_epr_checks(
         page_annotations is a list of spatial annotation dicts for UI overlay,
         and usage is a VisionUsageSummary with token counts and timing.
     """
+    # Scope every call below to one scheduler job so a large analysis is
+    # capped by VISION_JOB_CONCURRENCY (an enclosing job, e.g. the plan
+    # worker's, is kept as-is).
+    with vision_job():
+        return await _run_vision_epr_checks(
+            pdf_bytes, total_pages, analyze_all_pages, analysis_mode, property_address,
+        )
+
+
+async def _run_vision_epr_checks(
+    pdf_bytes: bytes,
+    total_pages: int,
+    analyze_all_pages: bool = False,
+    analysis_mode: str = "sample",
+    property_address: str | None = None,
+) -> tuple[list[CheckResult], list[dict], list[dict], VisionUsageSummary]:
+    """Body of run_vision_epr_checks (runs inside a vision_job scope)."""
     # Resolve analyze_all_pages from analysis_mode (backward compat)
     if analysis_mode == "full":
         analyze_all_pages = True
     is_compliance = (analysis_mode == "compliance")
     skip_hatching = is_compliance
     # In compliance mode, we run annotations on 1 preview page to showcase markups
-    preview_annotation_page: int | None = None  # Set after sample pages are selected
     model = os.environ.get("VISION_MODEL", DEFAULT_MODEL)
 
     if not is_vision_available():
@@ -1120,7 +1212,7 @@ async def run_vision_epr_checks(
     # ── Stage 1: Render cover page ──
     render_t0 = time.perf_counter()
     try:
-        cover_b64 = pdf_page_to_base64(pdf_bytes, 0, dpi=72)  # Low DPI for cover checks
+        cover_b64 = pdf_page_to_base64(pdf_bytes, 0, dpi=DPI_COVER)
     except Exception as e:
         logger.error("Failed to render cover page: %s", e)
         return _skip_all(f"PDF rendering failed: {e}"), [], [], VisionUsageSummary(model=model)
@@ -1136,34 +1228,21 @@ async def run_vision_epr_checks(
     logger.info("[vision] stage=cover_checks duration_ms=%d", int((time.perf_counter() - cover_t0) * 1000))
 
     # ── Stage 3: Select and render sample pages ──
-    if analyze_all_pages:
-        sample_pages = list(range(total_pages))
-    elif is_compliance:
-        # Compliance mode: fewer sample pages (cover + 2 interior) to minimize API calls
-        sample_pages = _select_compliance_pages(total_pages)
-    else:
-        sample_pages = _select_sample_pages(total_pages)
-
-    # In compliance mode, pick the first interior page for annotation preview
-    if is_compliance:
-        interior_pages = [p for p in sample_pages if p != 0]
-        if interior_pages:
-            preview_annotation_page = interior_pages[0]
-            logger.info("[vision] compliance preview annotation on page %d", preview_annotation_page)
-
-    # DPI strategy: annotations need 150 for spatial precision, title-block-only pages
-    # need only 100 DPI (~55% smaller payload → faster upload & model processing).
-    DPI_TITLE_BLOCK = 100   # Good enough for text readability
-    DPI_ANNOTATIONS = 150   # Needs spatial precision for coordinate extraction
-    DPI_HATCHING = 100      # Pattern recognition, not fine detail
+    sample_pages, preview_annotation_page = _plan_sample_pages(
+        total_pages, analysis_mode, analyze_all_pages,
+    )
+    if preview_annotation_page is not None:
+        logger.info("[vision] compliance preview annotation on page %d", preview_annotation_page)
 
     render_t0 = time.perf_counter()
     page_images: dict[int, str] = {}
+    page_dpis: dict[int, int] = {}
     for page_num in sample_pages:
         # Pages that get annotations need higher DPI
         needs_annotations = (not is_compliance) or (page_num == preview_annotation_page)
         dpi = DPI_ANNOTATIONS if needs_annotations else DPI_TITLE_BLOCK
         page_images[page_num] = pdf_page_to_base64(pdf_bytes, page_num, dpi=dpi)
+        page_dpis[page_num] = dpi
     logger.info(
         "[vision] stage=render_samples pages=%d duration_ms=%d",
         len(sample_pages), int((time.perf_counter() - render_t0) * 1000),
@@ -1182,8 +1261,11 @@ async def run_vision_epr_checks(
                 tb_task = _timed_analyze_image(
                     b64, PROMPT_TITLE_BLOCK, "title_block", usage,
                     system_prompt=SYSTEM_PROMPT_EPR, page_number=page_num,
+                    dpi=page_dpis[page_num],
+                )
+                ann_task = extract_page_annotations(
+                    b64, page_num + 1, usage, dpi=page_dpis[page_num],
                 )
-                ann_task = extract_page_annotations(b64, page_num + 1, usage)
                 tb_result, page_anns = await asyncio.gather(tb_task, ann_task)
 
                 tb_parsed = _parse_json_response(tb_result)
@@ -1195,6 +1277,7 @@ async def run_vision_epr_checks(
                 tb_result = await _timed_analyze_image(
                     b64, PROMPT_TITLE_BLOCK, "title_block", usage,
                     system_prompt=SYSTEM_PROMPT_EPR, page_number=page_num,
+                    dpi=page_dpis[page_num],
                 )
                 tb_parsed = _parse_json_response(tb_result)
                 if tb_parsed:
@@ -1356,8 +1439,10 @@ async def run_vision_epr_checks(
 
     total_ms = int((time.perf_counter() - job_t0) * 1000)
     logger.info(
-        "[vision] COMPLETE: %d calls, %d+%d tokens, %dms api_time, %dms wall_time, ~$%.4f",
-        usage.total_calls, usage.total_input_tokens, usage.total_output_tokens,
+        "[vision] COMPLETE: %d calls (%d cached), %d+%d tokens, %d tokens saved, "
+        "%dms api_time, %dms wall_time, ~$%.4f",
+        usage.total_calls, usage.cache_hits,
+        usage.total_input_tokens, usage.total_output_tokens, usage.saved_tokens,
         usage.total_duration_ms, total_ms, usage.estimated_cost_usd,
     )
 
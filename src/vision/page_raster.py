@@ -0,0 +1,403 @@
+"""Render-once page rasterization shared across plan analysis stages.
+
+A single plan job used to rasterize the same PDF several times: the cover
+at 72 DPI and each sample page at 100/150 DPI for vision checks, then up
+to 50 pages again at ``GALLERY_DPI`` for the gallery — each call spawning
+a fresh poppler process over the full PDF bytes.
+
+``PageRaster`` takes a render plan (page → DPIs needed), renders every
+page exactly once at the highest DPI any stage needs, and derives the
+lower-DPI variants by downscaling the master image. Pages are rendered in
+contiguous chunks (one poppler invocation opens the document once per
+chunk) on a process pool sized to the machine's cores.
+
+While a raster is active (``with raster_session(pdf_bytes, plan)``),
+``pdf_page_to_base64`` calls for the same bytes object are served from it,
+so vision checks and the gallery share renders without signature changes.
+Requests outside the plan are rendered on demand and memoized.
+
+Environment variables:
+    RASTER_WORKERS: Process pool size (default: CPU count). 1 renders inline.
+    RASTER_CHUNK_PAGES: Max pages per poppler invocation (default 4).
+"""
+
+import base64
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+
+from src.vision.pdf_to_images import MAX_DIMENSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_PAGES = 4
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RasterStats:
+    """Per-job render-time breakdown."""
+
+    pages_rendered: int = 0
+    poppler_calls: int = 0
+    variants_derived: int = 0
+    served: int = 0
+    on_demand_renders: int = 0
+    render_ms: int = 0      # Summed poppler time across workers
+    derive_ms: int = 0      # Summed downscale + PNG encode time
+    wall_ms: int = 0        # Wall time of the planned pre-render
+    workers: int = 1
+    extra: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """Serialize to JSON-safe dict for DB storage."""
+        return {
+            "pages_rendered": self.pages_rendered,
+            "poppler_calls": self.poppler_calls,
+            "variants_derived": self.variants_derived,
+            "served": self.served,
+            "on_demand_renders": self.on_demand_renders,
+            "render_ms": self.render_ms,
+            "derive_ms": self.derive_ms,
+            "wall_ms": self.wall_ms,
+            "workers": self.workers,
+            **self.extra,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Worker-side rendering (must be top-level for pickling)
+# ---------------------------------------------------------------------------
+
+def _target_scale(raw_size: tuple[int, int], master_dpi: int, dpi: int, max_dimension: int) -> float:
+    """Scale factor from a raw master render to the (dpi, max_dimension) output.
+
+    Matches what a direct render at ``dpi`` followed by the max_dimension
+    downsample in ``pdf_page_to_base64`` would produce.
+    """
+    scale = dpi / master_dpi if master_dpi else 1.0
+    longest = max(raw_size) * scale
+    if longest > max_dimension:
+        scale *= max_dimension / longest
+    return min(scale, 1.0)
+
+
+def _encode(img, scale: float) -> str:
+    """Resize ``img`` by ``scale`` (if < 1) and encode as base64 PNG."""
+    from PIL import Image
+
+    if scale < 1.0:
+        w, h = img.size
+        img = img.resize((max(1, int(w * scale)), max(1, int(h * scale))), Image.LANCZOS)
+    buf = BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _render_chunk(
+    pdf_bytes: bytes,
+    first_page: int,
+    last_page: int,
+    master_dpi: int,
+    variants: dict[int, list[tuple[int, int]]],
+) -> tuple[dict[int, dict[tuple[int, int], str]], dict[int, tuple[int, int]], dict[str, int]]:
+    """Render pages [first_page, last_page] once and derive every variant.
+
+    Args:
+        pdf_bytes: Raw PDF bytes.
+        first_page: 0-indexed first page of the chunk.
+        last_page: 0-indexed last page of the chunk (inclusive).
+        master_dpi: DPI to render at (highest DPI any variant needs).
+        variants: page → list of (dpi, max_dimension) outputs to produce.
+
+    Returns:
+        (page → {(dpi, max_dimension): base64_png}, page → raw master size,
+        timing dict)
+    """
+    from pdf2image import convert_from_bytes
+
+    t0 = time.perf_counter()
+    images = convert_from_bytes(
+        pdf_bytes,
+        dpi=master_dpi,
+        first_page=first_page + 1,
+        last_page=last_page + 1,
+        fmt="png",
+    )
+    render_ms = int((time.perf_counter() - t0) * 1000)
+
+    out: dict[int, dict[tuple[int, int], str]] = {}
+    raw_sizes: dict[int, tuple[int, int]] = {}
+    derive_ms = 0
+    for offset, img in enumerate(images):
+        pn = first_page + offset
+        wanted = variants.get(pn)
+        if not wanted:
+            continue
+        raw_sizes[pn] = img.size
+        t1 = time.perf_counter()
+        out[pn] = {
+            (dpi, max_dim): _encode(img, _target_scale(img.size, master_dpi, dpi, max_dim))
+            for dpi, max_dim in wanted
+        }
+        derive_ms += int((time.perf_counter() - t1) * 1000)
+
+    return out, raw_sizes, {"render_ms": render_ms, "derive_ms": derive_ms, "pages": len(images)}
+
+
+# ---------------------------------------------------------------------------
+# Process pool (lazy singleton, sized to cores)
+# ---------------------------------------------------------------------------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _worker_count() -> int:
+    try:
+        return max(1, int(os.environ.get("RASTER_WORKERS", "") or (os.cpu_count() or 1)))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    """Get or create the render process pool. None means render inline."""
+    global _pool
+    workers = _worker_count()
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            # spawn, not fork: the web worker has live threads and DB sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("[raster] process pool created (workers=%d)", workers)
+        return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a broken pool so the next job creates a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# ---------------------------------------------------------------------------
+# PageRaster
+# ---------------------------------------------------------------------------
+
+class PageRaster:
+    """Memoized page images for one PDF, rendered once per page.
+
+    Args:
+        pdf_bytes: Raw PDF bytes.
+        plan: page (0-indexed) → iterable of DPIs needed by any stage.
+        max_dimension: Longest-edge cap applied to every variant.
+    """
+
+    def __init__(
+        self,
+        pdf_bytes: bytes,
+        plan: dict[int, set[int]] | None = None,
+        max_dimension: int = MAX_DIMENSION,
+    ):
+        self.pdf_bytes = pdf_bytes
+        self.max_dimension = max_dimension
+        self.plan: dict[int, set[int]] = {pn: set(dpis) for pn, dpis in (plan or {}).items() if dpis}
+        self.stats = RasterStats(workers=_worker_count())
+        self._images: dict[int, dict[tuple[int, int], str]] = {}
+        self._masters: dict[int, tuple[int, tuple[int, int]]] = {}  # page → (dpi, raw size)
+        self._lock = threading.Lock()
+
+    # ── Planned pre-render ──
+
+    def _chunks(self) -> list[tuple[int, int, int, dict[int, list[tuple[int, int]]]]]:
+        """Group planned pages into (first, last, master_dpi, variants) chunks.
+
+        Pages sharing a master DPI and forming a contiguous run go into one
+        poppler invocation, split at RASTER_CHUNK_PAGES to bound memory.
+        """
+        try:
+            chunk_pages = max(1, int(os.environ.get("RASTER_CHUNK_PAGES", DEFAULT_CHUNK_PAGES)))
+        except ValueError:
+            chunk_pages = DEFAULT_CHUNK_PAGES
+
+        chunks = []
+        run: list[int] = []
+        run_dpi = None
+
+        def _flush():
+            if run:
+                variants = {
+                    pn: [(dpi, self.max_dimension) for dpi in sorted(self.plan[pn])]
+                    for pn in run
+                }
+                chunks.append((run[0], run[-1], run_dpi, variants))
+
+        for pn in sorted(self.plan):
+            master = max(self.plan[pn])
+            contiguous = run and pn == run[-1] + 1 and master == run_dpi
+            if not contiguous or len(run) >= chunk_pages:
+                _flush()
+                run = []
+                run_dpi = master
+            run.append(pn)
+        _flush()
+        return chunks
+
+    def render(self) -> RasterStats:
+        """Render every planned page once, in parallel where possible."""
+        if not self.plan:
+            return self.stats
+
+        t0 = time.perf_counter()
+        chunks = self._chunks()
+        pool = _get_pool() if len(chunks) > 1 else None
+
+        results = []
+        retry_inline = chunks if pool is None else []
+        if pool is not None:
+            futures = [
+                (chunk, pool.submit(_render_chunk, self.pdf_bytes, *chunk))
+                for chunk in chunks
+            ]
+            for chunk, future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # BrokenProcessPool / poppler failure — retry this chunk inline
+                    logger.warning("[raster] chunk %d-%d failed in pool: %s", chunk[0], chunk[1], e)
+                    retry_inline.append(chunk)
+            if any(isinstance(f.exception(), BrokenProcessPool) for _, f in futures):
+                _reset_pool()
+        for chunk in retry_inline:
+            try:
+                results.append(_render_chunk(self.pdf_bytes, *chunk))
+            except Exception as e:
+                # Leave the pages unrendered — get() will retry them on demand
+                logger.warning("[raster] chunk %d-%d failed: %s", chunk[0], chunk[1], e)
+
+        with self._lock:
+            for images, raw_sizes, timing in results:
+                for pn, size in raw_sizes.items():
+                    self._masters[pn] = (max(self.plan[pn]), size)
+                for pn, variants in images.items():
+                    self._images.setdefault(pn, {}).update(variants)
+                    self.stats.variants_derived += len(variants)
+                self.stats.pages_rendered += timing["pages"]
+                self.stats.poppler_calls += 1
+                self.stats.render_ms += timing["render_ms"]
+                self.stats.derive_ms += timing["derive_ms"]
+        self.stats.wall_ms = int((time.perf_counter() - t0) * 1000)
+        self.stats.workers = _worker_count() if pool is not None else 1
+        logger.info(
+            "[raster] stage=prerender pages=%d poppler_calls=%d variants=%d "
+            "render_ms=%d derive_ms=%d wall_ms=%d workers=%d",
+            self.stats.pages_rendered, self.stats.poppler_calls, self.stats.variants_derived,
+            self.stats.render_ms, self.stats.derive_ms, self.stats.wall_ms, self.stats.workers,
+        )
+        return self.stats
+
+    # ── Lookup ──
+
+    def get(self, page_number: int, dpi: int, max_dimension: int | None = None) -> str:
+        """Return a base64 PNG for (page, dpi), rendering on demand if unplanned.
+
+        On-demand requests reuse the largest stored variant of the same page
+        when its master was rendered at or above ``dpi``; otherwise the page
+        is rendered directly.
+        """
+        max_dim = max_dimension or self.max_dimension
+        key = (dpi, max_dim)
+        with self._lock:
+            variants = self._images.get(page_number, {})
+            if key in variants:
+                self.stats.served += 1
+                return variants[key]
+            master = self._masters.get(page_number)
+            source = None
+            if master is not None and master[0] >= dpi and variants:
+                source = max(variants.items(), key=lambda kv: kv[0][0])[1]
+
+        t0 = time.perf_counter()
+        if source is not None:
+            from PIL import Image
+
+            master_dpi, raw_size = master
+            img = Image.open(BytesIO(base64.b64decode(source)))
+            img.load()
+            target_long = max(raw_size) * _target_scale(raw_size, master_dpi, dpi, max_dim)
+            b64 = _encode(img, target_long / max(img.size)) if target_long < max(img.size) else source
+            elapsed = int((time.perf_counter() - t0) * 1000)
+            with self._lock:
+                self.stats.derive_ms += elapsed
+                self.stats.variants_derived += 1
+        else:
+            from src.vision.pdf_to_images import render_page_base64
+
+            b64 = render_page_base64(self.pdf_bytes, page_number, dpi=dpi, max_dimension=max_dim)
+            elapsed = int((time.perf_counter() - t0) * 1000)
+            with self._lock:
+                self.stats.render_ms += elapsed
+                self.stats.on_demand_renders += 1
+                self.stats.poppler_calls += 1
+
+        with self._lock:
+            self._images.setdefault(page_number, {})[key] = b64
+            self.stats.served += 1
+        return b64
+
+
+# ---------------------------------------------------------------------------
+# Active-session registry
+# ---------------------------------------------------------------------------
+
+# id(pdf_bytes) → PageRaster. Identity (not content) lookup: the same bytes
+# object flows from the plan worker through analyze_plans into the vision
+# checks, and id() avoids hashing tens of MB on every page request.
+_active: dict[int, PageRaster] = {}
+_active_lock = threading.Lock()
+
+
+def active_raster_for(pdf_bytes: bytes) -> PageRaster | None:
+    """Return the active PageRaster for this exact bytes object, if any."""
+    raster = _active.get(id(pdf_bytes))
+    if raster is not None and raster.pdf_bytes is pdf_bytes:
+        return raster
+    return None
+
+
+@contextmanager
+def raster_session(pdf_bytes: bytes, plan: dict[int, set[int]] | None = None):
+    """Pre-render ``plan`` and serve page images for ``pdf_bytes`` from memory.
+
+    Usage::
+
+        with raster_session(pdf_bytes, plan) as raster:
+            ...  # pdf_page_to_base64(pdf_bytes, ...) hits the raster
+        raster.stats.to_dict()
+    """
+    raster = PageRaster(pdf_bytes, plan)
+    with _active_lock:
+        _active[id(pdf_bytes)] = raster
+    try:
+        raster.render()
+        yield raster
+    finally:
+        with _active_lock:
+            if _active.get(id(pdf_bytes)) is raster:
+                del _active[id(pdf_bytes)]
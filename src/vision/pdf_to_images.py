@@ -42,6 +42,35 @@ def pdf_page_to_base64(
 ) -> str:
     """Convert a single PDF page to a base64-encoded PNG string.
 
+    If a ``raster_session`` (see page_raster.py) is active for this exact
+    ``pdf_bytes`` object, the image is served from its render-once cache
+    instead of spawning a new poppler process.
+
+    Args:
+        pdf_bytes: Raw PDF bytes.
+        page_number: 0-indexed page number.
+        dpi: Rendering resolution.
+        max_dimension: Max px on longest side (downsample if larger).
+
+    Returns:
+        Base64-encoded PNG image string (no ``data:`` prefix).
+    """
+    from src.vision.page_raster import active_raster_for
+
+    raster = active_raster_for(pdf_bytes)
+    if raster is not None:
+        return raster.get(page_number, dpi, max_dimension)
+    return render_page_base64(pdf_bytes, page_number, dpi, max_dimension)
+
+
+def render_page_base64(
+    pdf_bytes: bytes,
+    page_number: int,
+    dpi: int = DEFAULT_DPI,
+    max_dimension: int = MAX_DIMENSION,
+) -> str:
+    """Render a single PDF page with poppler and return a base64 PNG.
+
     Args:
         pdf_bytes: Raw PDF bytes.
         page_number: 0-indexed page number.
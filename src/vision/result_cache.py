@@ -0,0 +1,212 @@
+"""Content-addressed cache of Claude Vision results.
+
+Re-uploading the same plan set (or a revision where most sheets did not
+change) used to re-send every sampled page to Claude Vision. Results are
+now cached in ``vision_result_cache`` keyed by:
+
+    (page content hash, DPI, prompt hash, model)
+
+The page content hash is a SHA-256 of the rendered page image, so an
+unchanged sheet inside a revised PDF still hits the cache even though the
+whole-file ``pdf_hash`` differs. The prompt hash covers the user prompt,
+system prompt and max_tokens, so editing a prompt naturally invalidates
+its old entries.
+
+Only successful results are cached. All cache reads/writes are
+best-effort — a database error never fails a vision call.
+
+Environment variables:
+    VISION_CACHE_ENABLED: "0" disables the cache (default: enabled).
+    VISION_CACHE_MAX_AGE_DAYS: Entries older than this are pruned (default 90).
+    VISION_CACHE_MAX_ENTRIES: Row cap enforced by prune_vision_cache (default 50000).
+"""
+
+import hashlib
+import logging
+import os
+
+from src.vision.client import VisionResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_DAYS = 90
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+def is_cache_enabled() -> bool:
+    """Check whether the vision result cache is enabled."""
+    return os.environ.get("VISION_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+
+
+def hash_page_image(image_base64: str) -> str:
+    """SHA-256 of a rendered page image (base64 PNG)."""
+    return hashlib.sha256(image_base64.encode("ascii", errors="ignore")).hexdigest()
+
+
+def hash_prompt(prompt: str, system_prompt: str | None, max_tokens: int) -> str:
+    """SHA-256 over everything in the request that shapes the response."""
+    h = hashlib.sha256()
+    h.update((system_prompt or "").encode("utf-8"))
+    h.update(b"\x00")
+    h.update(prompt.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(str(max_tokens).encode("ascii"))
+    return h.hexdigest()
+
+
+def make_cache_key(page_hash: str, dpi: int | None, prompt_hash: str, model: str) -> str:
+    """Combine the key components into a single primary key."""
+    raw = f"{page_hash}:{dpi or 0}:{prompt_hash}:{model}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_result(cache_key: str) -> VisionResult | None:
+    """Return the cached VisionResult for ``cache_key``, or None on a miss.
+
+    A hit bumps ``hit_count`` and ``last_hit_at`` so eviction can prefer
+    entries nobody reads. The returned result has ``cached=True`` and
+    carries the token counts of the original call (i.e. tokens saved).
+    """
+    from src.db import execute_write, query_one
+
+    try:
+        row = query_one(
+            "SELECT response_text, input_tokens, output_tokens "
+            "FROM vision_result_cache WHERE cache_key = %s",
+            (cache_key,),
+        )
+    except Exception:
+        logger.debug("Vision cache read failed", exc_info=True)
+        return None
+    if not row:
+        return None
+
+    try:
+        execute_write(
+            "UPDATE vision_result_cache "
+            "SET hit_count = hit_count + 1, last_hit_at = CURRENT_TIMESTAMP "
+            "WHERE cache_key = %s",
+            (cache_key,),
+        )
+    except Exception:
+        logger.debug("Vision cache hit-count update failed", exc_info=True)
+
+    return VisionResult(
+        success=True,
+        text=row[0] or "",
+        input_tokens=row[1] or 0,
+        output_tokens=row[2] or 0,
+        duration_ms=0,
+        cached=True,
+    )
+
+
+def store_result(
+    cache_key: str,
+    result: VisionResult,
+    *,
+    page_hash: str,
+    dpi: int | None,
+    prompt_hash: str,
+    model: str,
+) -> None:
+    """Persist a successful VisionResult. Failed results are never cached."""
+    if not result.success:
+        return
+    from src.db import execute_write
+
+    try:
+        execute_write(
+            "INSERT INTO vision_result_cache "
+            "(cache_key, page_hash, dpi, prompt_hash, model, response_text, "
+            "input_tokens, output_tokens, hit_count, created_at, last_hit_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 0, CURRENT_TIMESTAMP, NULL) "
+            "ON CONFLICT (cache_key) DO UPDATE SET "
+            "response_text = EXCLUDED.response_text, "
+            "input_tokens = EXCLUDED.input_tokens, "
+            "output_tokens = EXCLUDED.output_tokens, "
+            "created_at = EXCLUDED.created_at",
+            (
+                cache_key, page_hash, dpi or 0, prompt_hash, model, result.text,
+                result.input_tokens, result.output_tokens,
+            ),
+        )
+    except Exception:
+        logger.debug("Vision cache write failed", exc_info=True)
+
+
+def prune_vision_cache(
+    max_age_days: int | None = None,
+    max_entries: int | None = None,
+) -> dict:
+    """Evict old entries, then trim to ``max_entries`` rows.
+
+    Age eviction uses the most recent of created_at/last_hit_at, so pages
+    that keep getting re-analyzed stay warm. The size cap evicts the
+    least-hit, least-recently-used entries first.
+
+    Returns:
+        {"expired": int, "trimmed": int, "remaining": int}
+    """
+    from src.db import BACKEND, execute_write, query_one
+
+    if max_age_days is None:
+        max_age_days = int(os.environ.get("VISION_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+    if max_entries is None:
+        max_entries = int(os.environ.get("VISION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+    max_age_days = int(max_age_days)
+    if BACKEND == "postgres":
+        age_expr = f"NOW() - INTERVAL '{max_age_days} days'"
+    else:
+        age_expr = f"CURRENT_TIMESTAMP - INTERVAL '{max_age_days} days'"
+
+    before = query_one("SELECT COUNT(*) FROM vision_result_cache")
+    before_count = before[0] if before else 0
+
+    execute_write(
+        "DELETE FROM vision_result_cache "
+        f"WHERE COALESCE(last_hit_at, created_at) < {age_expr}"
+    )
+    after_age = query_one("SELECT COUNT(*) FROM vision_result_cache")
+    after_age_count = after_age[0] if after_age else 0
+
+    if after_age_count > max_entries:
+        execute_write(
+            "DELETE FROM vision_result_cache WHERE cache_key IN ("
+            "  SELECT cache_key FROM vision_result_cache "
+            "  ORDER BY hit_count ASC, COALESCE(last_hit_at, created_at) ASC "
+            "  LIMIT %s"
+            ")",
+            (after_age_count - max_entries,),
+        )
+
+    remaining = query_one("SELECT COUNT(*) FROM vision_result_cache")
+    remaining_count = remaining[0] if remaining else 0
+    stats = {
+        "expired": before_count - after_age_count,
+        "trimmed": after_age_count - remaining_count,
+        "remaining": remaining_count,
+    }
+    logger.info("[vision_cache] pruned %s", stats)
+    return stats
+
+
+def get_cache_stats() -> dict:
+    """Entry count, total hits and lifetime token savings for admin/health."""
+    from src.db import query_one
+
+    row = query_one(
+        "SELECT COUNT(*), COALESCE(SUM(hit_count), 0), "
+        "COALESCE(SUM(hit_count * input_tokens), 0), "
+        "COALESCE(SUM(hit_count * output_tokens), 0) "
+        "FROM vision_result_cache"
+    )
+    if not row:
+        return {"entries": 0, "hits": 0, "saved_input_tokens": 0, "saved_output_tokens": 0}
+    return {
+        "entries": int(row[0]),
+        "hits": int(row[1]),
+        "saved_input_tokens": int(row[2]),
+        "saved_output_tokens": int(row[3]),
+    }
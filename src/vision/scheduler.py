@@ -0,0 +1,406 @@
+"""Process-wide scheduler for Claude Vision API calls.
+
+``analyze_image`` used to build a fresh ``AsyncAnthropic`` client (and
+HTTP connection pool) for every page, and ``run_vision_epr_checks`` fans
+out with ``asyncio.gather`` across every sampled page with no cap — a
+200-page "full" analysis fired hundreds of requests at once and then sat
+in SDK 429 retries.
+
+Every vision call now passes through one ``VisionScheduler`` per process:
+
+- **Global concurrency**: at most VISION_MAX_CONCURRENCY calls in flight.
+- **Per-job concurrency**: at most VISION_JOB_CONCURRENCY calls in flight
+  for a single job, so one large analysis cannot starve the others.
+- **Token budget**: optional input-tokens-per-minute ceiling. Each call
+  reserves an estimate (from the PNG header) and is reconciled with the
+  actual usage when it completes.
+- **Priority**: interactive calls (MCP tools, web requests) are admitted
+  ahead of batch calls (the async plan worker) whenever both are queued.
+- **429 back-off**: a rate-limit error pauses admission for
+  VISION_RATE_LIMIT_COOLDOWN_SECS instead of letting every queued call
+  hit the same wall.
+
+The scheduler state is guarded by a threading lock and waiters are woken
+with ``call_soon_threadsafe``, so the limits hold across the plan worker
+threads, each of which runs its own event loop.
+
+Jobs are scoped with a context variable::
+
+    with vision_job(job_id, priority=PRIORITY_BATCH):
+        loop.run_until_complete(analyze_plans(...))
+
+Environment variables:
+    VISION_MAX_CONCURRENCY: Global in-flight cap (default 8).
+    VISION_JOB_CONCURRENCY: Per-job in-flight cap (default 4).
+    VISION_TOKENS_PER_MINUTE: Input token budget per minute (default 0 = off).
+    VISION_RATE_LIMIT_COOLDOWN_SECS: Pause after a 429 (default 10).
+"""
+
+import asyncio
+import base64
+import bisect
+import contextvars
+import itertools
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_JOB_CONCURRENCY = 4
+DEFAULT_COOLDOWN_SECS = 10.0
+
+# Claude bills ~(width * height) / 750 tokens per image; images are capped
+# at 1568px on the long edge, so ~1600 tokens is the worst case.
+DEFAULT_IMAGE_TOKENS = 1600
+_BUDGET_WINDOW_SECS = 60.0
+_POLL_SECS = 0.25
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Job scoping
+# ---------------------------------------------------------------------------
+
+_current_job: contextvars.ContextVar[tuple[str, int] | None] = contextvars.ContextVar(
+    "vision_job", default=None,
+)
+
+
+def current_job() -> tuple[str | None, int]:
+    """Return (job_id, priority) for the running context."""
+    job = _current_job.get()
+    if job is None:
+        return None, PRIORITY_INTERACTIVE
+    return job
+
+
+@contextmanager
+def vision_job(job_id: str | None = None, priority: int | None = None):
+    """Scope vision calls to a job for per-job limits and priority.
+
+    With no ``job_id``, an enclosing job is kept as-is; otherwise a new
+    anonymous job is started. Tasks created inside the block (including
+    ``asyncio.gather`` children) inherit the job.
+    """
+    outer = _current_job.get()
+    if job_id is None and outer is not None and priority in (None, outer[1]):
+        yield outer[0]
+        return
+    if priority is None:
+        priority = outer[1] if outer is not None else PRIORITY_INTERACTIVE
+    job_id = job_id or f"anon-{uuid.uuid4().hex[:12]}"
+    token = _current_job.set((job_id, priority))
+    try:
+        yield job_id
+    finally:
+        _current_job.reset(token)
+
+
+# ---------------------------------------------------------------------------
+# Token estimation
+# ---------------------------------------------------------------------------
+
+def estimate_input_tokens(image_base64: str, prompt: str = "", system_prompt: str | None = None) -> int:
+    """Estimate input tokens for a vision call without decoding the image.
+
+    Reads width/height from the PNG IHDR chunk (first 24 bytes).
+    """
+    image_tokens = DEFAULT_IMAGE_TOKENS
+    try:
+        head = base64.b64decode(image_base64[:32])
+        if head[:8] == b"\x89PNG\r\n\x1a\n":
+            width, height = struct.unpack(">II", head[16:24])
+            image_tokens = max(1, min(width * height // 750, DEFAULT_IMAGE_TOKENS))
+    except Exception:
+        pass
+    text_chars = len(prompt) + len(system_prompt or "")
+    return image_tokens + text_chars // 4
+
+
+# ---------------------------------------------------------------------------
+# Shared client (one per event loop)
+# ---------------------------------------------------------------------------
+
+# httpx async clients are bound to the loop they were first used on; the
+# plan worker runs one loop per job thread, so clients are cached per loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str):
+    """Return a reused ``AsyncAnthropic`` client for the running loop."""
+    import anthropic
+
+    loop = asyncio.get_running_loop()
+    factory = anthropic.AsyncAnthropic
+    with _clients_lock:
+        cached = _clients.get(loop)
+        if cached is not None and cached[0] == api_key and cached[1] is factory:
+            return cached[2]
+        client = factory(api_key=api_key)
+        _clients[loop] = (api_key, factory, client)
+        return client
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+@dataclass(order=True)
+class VisionSlot:
+    """A queued (then granted) vision call. Ordered by priority, then FIFO."""
+
+    priority: int
+    seq: int
+    job_id: str | None = field(compare=False)
+    est_tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False, repr=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False, repr=False)
+    granted: bool = field(default=False, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+    wait_ms: int = field(default=0, compare=False)
+    actual_tokens: int | None = field(default=None, compare=False)
+    _budget_entry: list | None = field(default=None, compare=False, repr=False)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class VisionScheduler:
+    """Bounded, prioritized admission for vision API calls."""
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        per_job_concurrency: int | None = None,
+        tokens_per_minute: int | None = None,
+        cooldown_secs: float | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency if max_concurrency is not None
+                                   else _env_int("VISION_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        self.per_job_concurrency = max(1, per_job_concurrency if per_job_concurrency is not None
+                                       else _env_int("VISION_JOB_CONCURRENCY", DEFAULT_JOB_CONCURRENCY))
+        self.tokens_per_minute = max(0, tokens_per_minute if tokens_per_minute is not None
+                                     else _env_int("VISION_TOKENS_PER_MINUTE", 0))
+        self.cooldown_secs = (cooldown_secs if cooldown_secs is not None
+                              else _env_float("VISION_RATE_LIMIT_COOLDOWN_SECS", DEFAULT_COOLDOWN_SECS))
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waiters: list[VisionSlot] = []  # sorted by (priority, seq)
+        self._in_flight = 0
+        self._job_in_flight: dict[str | None, int] = {}
+        self._window: deque[list] = deque()  # [monotonic_ts, tokens]
+        self._window_tokens = 0
+        self._cooldown_until = 0.0
+
+        self._granted = 0
+        self._max_queue_depth = 0
+        self._max_in_flight = 0
+        self._total_wait_ms = 0
+        self._max_wait_ms = 0
+        self._rate_limited = 0
+        self._by_priority: dict[int, dict[str, int]] = {}
+
+    # ── Admission ──
+
+    def _prune_window(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= _BUDGET_WINDOW_SECS:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _dispatch(self) -> None:
+        """Grant queued slots that fit every limit. Caller holds the lock."""
+        now = time.monotonic()
+        if now < self._cooldown_until:
+            return
+        self._prune_window(now)
+
+        i = 0
+        while i < len(self._waiters) and self._in_flight < self.max_concurrency:
+            slot = self._waiters[i]
+            if slot.cancelled:
+                self._waiters.pop(i)
+                continue
+            if self._job_in_flight.get(slot.job_id, 0) >= self.per_job_concurrency:
+                i += 1  # this job is saturated — let other jobs through
+                continue
+            if (self.tokens_per_minute and self._window_tokens > 0
+                    and self._window_tokens + slot.est_tokens > self.tokens_per_minute):
+                break  # over budget — hold everything behind the head in priority order
+
+            self._waiters.pop(i)
+            slot.granted = True
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+            self._job_in_flight[slot.job_id] = self._job_in_flight.get(slot.job_id, 0) + 1
+            slot._budget_entry = [now, slot.est_tokens]
+            self._window.append(slot._budget_entry)
+            self._window_tokens += slot.est_tokens
+            try:
+                slot.loop.call_soon_threadsafe(_resolve, slot.future)
+            except RuntimeError:
+                # Waiter's loop already closed — give the slot straight back
+                self._release_locked(slot)
+
+    def _release_locked(self, slot: VisionSlot) -> None:
+        self._in_flight -= 1
+        remaining = self._job_in_flight.get(slot.job_id, 1) - 1
+        if remaining > 0:
+            self._job_in_flight[slot.job_id] = remaining
+        else:
+            self._job_in_flight.pop(slot.job_id, None)
+        entry = slot._budget_entry
+        if entry is not None and slot.actual_tokens is not None:
+            self._window_tokens += slot.actual_tokens - entry[1]
+            entry[1] = slot.actual_tokens
+        slot._budget_entry = None
+
+    async def acquire(self, est_tokens: int = DEFAULT_IMAGE_TOKENS) -> VisionSlot:
+        """Wait until a call for the current job may start."""
+        job_id, priority = current_job()
+        loop = asyncio.get_running_loop()
+        slot = VisionSlot(
+            priority=priority, seq=next(self._seq), job_id=job_id,
+            est_tokens=est_tokens, future=loop.create_future(), loop=loop,
+        )
+        t0 = time.monotonic()
+        with self._lock:
+            bisect.insort(self._waiters, slot)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+            self._dispatch()
+
+        try:
+            while not slot.future.done():
+                try:
+                    # Budget and cooldown free up with time, not just on release
+                    await asyncio.wait_for(asyncio.shield(slot.future), timeout=_POLL_SECS)
+                except asyncio.TimeoutError:
+                    with self._lock:
+                        self._dispatch()
+        except BaseException:
+            with self._lock:
+                if slot.granted:
+                    self._release_locked(slot)
+                    self._dispatch()
+                else:
+                    slot.cancelled = True
+            raise
+
+        slot.wait_ms = int((time.monotonic() - t0) * 1000)
+        with self._lock:
+            self._granted += 1
+            self._total_wait_ms += slot.wait_ms
+            self._max_wait_ms = max(self._max_wait_ms, slot.wait_ms)
+            bucket = self._by_priority.setdefault(priority, {"granted": 0, "total_wait_ms": 0})
+            bucket["granted"] += 1
+            bucket["total_wait_ms"] += slot.wait_ms
+        return slot
+
+    def release(self, slot: VisionSlot) -> None:
+        """Return a granted slot and admit the next waiters."""
+        with self._lock:
+            self._release_locked(slot)
+            self._dispatch()
+
+    def rate_limited(self) -> None:
+        """Pause admission after a 429 from the API."""
+        with self._lock:
+            self._rate_limited += 1
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + self.cooldown_secs)
+        logger.warning("[vision] rate limited — pausing new calls for %.0fs", self.cooldown_secs)
+
+    @asynccontextmanager
+    async def slot(self, est_tokens: int = DEFAULT_IMAGE_TOKENS):
+        """``async with scheduler.slot(est) as slot:`` — acquire, then release.
+
+        Set ``slot.actual_tokens`` inside the block to reconcile the budget.
+        """
+        granted = await self.acquire(est_tokens)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    # ── Metrics ──
+
+    def get_stats(self) -> dict:
+        """Queue depth, wait time, and limit stats (for /health and logs)."""
+        with self._lock:
+            self._prune_window(time.monotonic())
+            pending = [s for s in self._waiters if not s.cancelled]
+            return {
+                "max_concurrency": self.max_concurrency,
+                "per_job_concurrency": self.per_job_concurrency,
+                "tokens_per_minute": self.tokens_per_minute,
+                "queue_depth": len(pending),
+                "queue_depth_by_priority": {
+                    name: sum(1 for s in pending if s.priority == p)
+                    for p, name in _PRIORITY_NAMES.items()
+                },
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+                "active_jobs": len(self._job_in_flight),
+                "granted": self._granted,
+                "avg_wait_ms": round(self._total_wait_ms / self._granted, 1) if self._granted else 0,
+                "max_wait_ms": self._max_wait_ms,
+                "wait_by_priority": {
+                    _PRIORITY_NAMES.get(p, str(p)): {
+                        "granted": b["granted"],
+                        "avg_wait_ms": round(b["total_wait_ms"] / b["granted"], 1) if b["granted"] else 0,
+                    }
+                    for p, b in self._by_priority.items()
+                },
+                "tokens_last_minute": self._window_tokens,
+                "rate_limited": self._rate_limited,
+                "cooling_down": time.monotonic() < self._cooldown_until,
+            }
+
+
+_scheduler: VisionScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> VisionScheduler:
+    """Return the process-wide scheduler (created on first use)."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = VisionScheduler()
+    return _scheduler
+
+
+def get_scheduler_stats() -> dict:
+    """Stats for the process-wide scheduler, or an idle marker."""
+    if _scheduler is None:
+        return {"status": "idle"}
+    return _scheduler.get_stats()
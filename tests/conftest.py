@@ -235,6 +235,19 @@ def _clear_rate_state():
         pass
 
 
+@pytest.fixture(autouse=True)
+def _clear_tool_cache():
+    """Clear the MCP tool result cache before each test.
+
+    Tests patch the DB and knowledge base per test; a result cached by an
+    earlier test would otherwise be served in place of the patched data.
+    """
+    from src import tool_cache
+    tool_cache.clear()
+    yield
+    tool_cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # Function-scoped DB-path guard
 # ---------------------------------------------------------------------------
@@ -316,3 +329,26 @@ def _clear_cron_worker():
     """
     yield
     os.environ.pop("CRON_WORKER", None)
+
+
+@pytest.fixture(autouse=True)
+def _disable_vision_cache(monkeypatch):
+    """Keep the persistent vision result cache out of unrelated tests.
+
+    analyze_image() consults vision_result_cache before calling the API.
+    Tests that reuse the same fake image/prompt would otherwise get a
+    cached success from an earlier test instead of their mocked response.
+    Tests that exercise the cache re-enable it with monkeypatch.setenv.
+    """
+    monkeypatch.setenv("VISION_CACHE_ENABLED", "0")
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _disable_embedding_cache(monkeypatch):
+    """Same isolation for embed_texts(): no persistent or LRU cache hits.
+
+    Tests that exercise the cache re-enable it with monkeypatch.setenv.
+    """
+    monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "0")
+    yield
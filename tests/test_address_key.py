@@ -0,0 +1,113 @@
+"""Tests for the canonical permits.address_key (src/address_key.py)."""
+
+import pytest
+
+import src.db as db_mod
+from src.address_key import address_key, address_key_sql
+
+
+@pytest.fixture
+def duck(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_address_key.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    conn = db_mod.get_connection()
+    db_mod.init_schema(conn)
+    yield conn
+    conn.close()
+
+
+def _insert(conn, pn, street_number, street_name, suffix=None, block="3512", lot="001"):
+    conn.execute(
+        "INSERT INTO permits (permit_number, status, filed_date, street_number, "
+        "street_name, street_suffix, block, lot) "
+        "VALUES (?, 'filed', '2025-01-01', ?, ?, ?, ?, ?)",
+        [pn, street_number, street_name, suffix, block, lot],
+    )
+
+
+VARIANTS = [
+    ("100", "Market St"),
+    ("100", "MARKET"),
+    ("75", "Robin Hood Dr"),
+    ("75", "Robinhood"),
+    ("1", "Van Ness Ave"),
+    ("1", "16th Ave."),
+    (" 9 ", "  mission street"),
+    ("2", "St Francis Wood Way"),
+    ("3", "Street"),
+]
+
+
+class TestAddressKey:
+
+    def test_examples(self):
+        assert address_key("100", "Market St") == "100 MARKET"
+        assert address_key("100", "market") == "100 MARKET"
+        assert address_key("75", "Robin Hood Dr") == "75 ROBINHOOD"
+        assert address_key("75", "ROBINHOOD") == "75 ROBINHOOD"
+        assert address_key("1", "16th Ave.") == "1 16TH"
+        assert address_key("2", "St Francis Wood Way") == "2 STFRANCISWOOD"
+        assert address_key(None, "Market") is None
+        assert address_key("100", None) is None
+
+    def test_sql_matches_python(self, duck):
+        expr = address_key_sql("n", "s")
+        for number, name in VARIANTS + [("5", None)]:
+            got = duck.execute(
+                f"SELECT {expr} FROM (SELECT ?::VARCHAR AS n, ?::VARCHAR AS s)",
+                [number, name],
+            ).fetchone()[0]
+            assert got == address_key(number, name), (number, name)
+
+    def test_generated_column_populated_on_insert(self, duck):
+        _insert(duck, "BP1", "75", "ROBIN HOOD", "DR")
+        duck.execute(
+            "INSERT INTO permits VALUES ('BP2', '1', 'otc', 'complete', NULL, "
+            "'kitchen', NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, "
+            "NULL, '100', 'Market St', NULL, NULL, NULL, NULL, '3512', '001', "
+            "NULL, NULL)"
+        )
+        keys = dict(duck.execute(
+            "SELECT permit_number, address_key FROM permits").fetchall())
+        assert keys == {"BP1": "75 ROBINHOOD", "BP2": "100 MARKET"}
+
+    def test_older_file_gains_the_column(self, tmp_path):
+        import duckdb
+
+        conn = duckdb.connect(str(tmp_path / "old.duckdb"))
+        conn.execute("CREATE TABLE permits (permit_number TEXT PRIMARY KEY, status TEXT, "
+                     "street_number TEXT, street_name TEXT, street_suffix TEXT)")
+        conn.execute("INSERT INTO permits VALUES ('BP1', 'filed', '100', 'Market St', NULL)")
+        db_mod.init_user_schema(conn)
+        assert conn.execute(
+            "SELECT permit_number, status FROM permits WHERE address_key = '100 MARKET'"
+        ).fetchall() == [("BP1", "filed")]
+        indexes = {r[0] for r in conn.execute(
+            "SELECT index_name FROM duckdb_indexes() WHERE table_name = 'permits'").fetchall()}
+        assert "idx_permits_address_key" in indexes
+        # The rebuilt table keeps its primary key
+        with pytest.raises(duckdb.ConstraintException):
+            conn.execute("INSERT INTO permits (permit_number) VALUES ('BP1')")
+        conn.close()
+
+
+class TestLookups:
+
+    def test_permit_lookup_matches_variants(self, duck):
+        from src.tools.permit_lookup import _lookup_by_address
+
+        _insert(duck, "BP1", "75", "ROBIN HOOD", "DR")
+        _insert(duck, "BP2", "75", "Robinhood Dr")
+        _insert(duck, "BP3", "75", "ROBIN", "DR")
+        found = {r["permit_number"] for r in _lookup_by_address(duck, "75", "robin hood dr")}
+        assert found == {"BP1", "BP2"}
+
+    def test_resolve_block_lot(self, duck):
+        from web.helpers import _resolve_block_lot
+
+        _insert(duck, "BP1", "100", "MARKET", "ST", block="3706", lot="093")
+        assert _resolve_block_lot("100", "Market Street") == ("3706", "093")
+        assert _resolve_block_lot("101", "Market Street") is None
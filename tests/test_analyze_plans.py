@@ -102,7 +102,7 @@ async def test_analyze_plans_with_vision():
     blank_area = {"has_blank_area": True, "estimated_size": "8.5x11", "location": "upper-right"}
     hatch = {"has_dense_hatching": False, "severity": "none"}
 
-    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048):
+    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048, dpi=None):
         if "page count" in prompt.lower() or "sheet count" in prompt.lower():
             data = cover_count
         elif "blank" in prompt.lower() and "8.5" in prompt:
@@ -340,7 +340,7 @@ async def test_analyze_plans_return_structured_true():
          "anchor": "top-right", "importance": "high"},
     ]}
 
-    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048):
+    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048, dpi=None):
         if "page count" in prompt.lower() or "sheet count" in prompt.lower():
             data = cover_count
         elif "blank" in prompt.lower() and "8.5" in prompt:
@@ -421,7 +421,7 @@ async def test_page_extractions_structure():
     blank_area = {"has_blank_area": False, "estimated_size": None, "location": None}
     hatch = {"has_dense_hatching": True, "severity": "moderate"}
 
-    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048):
+    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048, dpi=None):
         if "page count" in prompt.lower() or "sheet count" in prompt.lower():
             data = cover_count
         elif "blank" in prompt.lower() and "8.5" in prompt:
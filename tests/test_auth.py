@@ -858,3 +858,24 @@ def test_account_shows_cohort_selector(client, monkeypatch):
     assert "Beta Testers" in html
     assert "Land Use Consultants (professional)" in html
     assert "invite-message" in html
+
+
+def test_lazy_schema_init_runs_once_across_threads(monkeypatch):
+    """Parallel brief sections hit _ensure_schema at the same moment."""
+    import threading
+    import time
+    import web.auth as auth_mod
+
+    calls = []
+
+    def slow_init():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.05)
+
+    monkeypatch.setattr(auth_mod, "init_user_schema", slow_init)
+    threads = [threading.Thread(target=auth_mod._ensure_schema) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
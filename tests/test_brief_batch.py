@@ -0,0 +1,228 @@
+"""Tests for set-at-a-time morning brief generation (web/brief_batch.py).
+
+The batch path must produce the same per-user sections as calling
+get_morning_brief() one user at a time, with a query count that does not
+grow with the number of users.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+import src.db as db_mod
+
+TODAY = date.today()
+
+PER_USER_SECTIONS = [
+    "changes", "plan_reviews", "health", "inspections", "new_filings",
+    "team_activity", "expiring", "property_cards", "compliance_calendar",
+    "street_use_activity", "nearby_development", "summary",
+]
+
+
+@pytest.fixture(autouse=True)
+def _use_duckdb(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_brief_batch.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    import web.auth as auth_mod
+    monkeypatch.setattr(auth_mod, "_schema_initialized", False)
+    import web.brief as brief_mod
+    monkeypatch.setattr(brief_mod, "BACKEND", "duckdb")
+    db_mod.init_user_schema()
+    conn = db_mod.get_connection()
+    try:
+        db_mod.init_schema(conn)
+    finally:
+        conn.close()
+
+
+def _insert(conn, table, **row):
+    cols = ", ".join(row)
+    conn.execute(
+        f"INSERT INTO {table} ({cols}) VALUES ({', '.join(['?'] * len(row))})",
+        list(row.values()),
+    )
+
+
+def _make_user(n: int) -> int:
+    from web.auth import get_or_create_user
+    return get_or_create_user(f"batch{n}@example.com")["user_id"]
+
+
+def _seed_world():
+    """Three users with overlapping watches across every section."""
+    from web.auth import add_watch
+
+    conn = db_mod.get_connection()
+    try:
+        permits = [
+            ("BP1", "filed", TODAY - timedelta(days=40), None, "100", "MAIN", "3512", "001"),
+            ("BP2", "issued", TODAY - timedelta(days=500), TODAY - timedelta(days=350),
+             "100", "MAIN", "3512", "001"),
+            ("BP3", "filed", TODAY, None, "200", "OAK", "1200", "010"),
+            ("BP4", "issued", TODAY - timedelta(days=90), TODAY - timedelta(days=20),
+             "300", "PINE", "0400", "004"),
+        ]
+        for pn, status, filed, issued, snum, sname, block, lot in permits:
+            _insert(conn, "permits", permit_number=pn, status=status,
+                    status_date=str(TODAY), filed_date=str(filed),
+                    issued_date=str(issued) if issued else None,
+                    permit_type_definition="otc alterations permit",
+                    estimated_cost=40000.0, street_number=snum, street_name=sname,
+                    street_suffix="ST", neighborhood="Mission", block=block, lot=lot)
+        changes = [
+            (1, "BP1", TODAY, "filed", "plancheck", False, "100", "MAIN", "3512", "001"),
+            (2, "BP3", TODAY, None, "filed", True, "200", "OAK", "1200", "010"),
+            (3, "BP4", TODAY - timedelta(days=1), "filed", "issued", False,
+             "300", "PINE", "0400", "004"),
+            (4, "BPX", TODAY, None, "filed", True, "999", "ELM", "9000", "001"),
+        ]
+        for cid, pn, cdate, old, new, is_new, snum, sname, block, lot in changes:
+            _insert(conn, "permit_changes", change_id=cid, permit_number=pn,
+                    change_date=cdate, old_status=old, new_status=new,
+                    change_type="new_permit" if is_new else "status_change",
+                    is_new_permit=is_new, permit_type="otc alterations permit",
+                    street_number=snum, street_name=sname, neighborhood="Mission",
+                    block=block, lot=lot)
+        _insert(conn, "inspections", id=1, reference_number="BP4",
+                scheduled_date=str(TODAY), result="approved", inspector="Lee",
+                inspection_description="Final")
+        _insert(conn, "addenda_changes", change_id=1, application_number="BP1",
+                change_date=TODAY, station="BLDG", plan_checked_by="Kim",
+                new_review_results="Approved", change_type="review_completed",
+                finish_date=str(TODAY), street_number="100", street_name="MAIN",
+                block="3512", lot="001")
+        _insert(conn, "violations", id=1, block="3512", lot="001", status="open")
+        _insert(conn, "complaints", id=1, block="3512", lot="001", status="OPEN")
+        _insert(conn, "boiler_permits", permit_number="BOIL1", block="1200", lot="010",
+                boiler_type="Steam", expiration_date=str(TODAY + timedelta(days=20)))
+        _insert(conn, "street_use_permits", permit_number="SU1", status="APPROVED",
+                street_name="Main St", approved_date=str(TODAY), permit_purpose="Crane")
+        _insert(conn, "development_pipeline", record_id="DP1", block_lot="1200099",
+                current_status="Filed", name_address="210 Oak St",
+                approved_date_planning=str(TODAY))
+        _insert(conn, "entities", entity_id=7, canonical_name="Acme Builders")
+        _insert(conn, "contacts", id=1, permit_number="BP3", entity_id=7, role="contractor",
+                source="building_permits")
+    finally:
+        conn.close()
+
+    users = [_make_user(n) for n in range(3)]
+    a, b, c = users
+    add_watch(a, "permit", permit_number="BP1", label="Kitchen")
+    add_watch(a, "address", street_number="100", street_name="Main", label="Home")
+    add_watch(a, "parcel", block="1200", lot="010", label="Rental")
+    add_watch(b, "permit", permit_number="BP4", label="Garage")
+    add_watch(b, "neighborhood", neighborhood="Mission", label="Hood")
+    add_watch(b, "entity", entity_id=7, label="GC")
+    add_watch(c, "parcel", block="3512", lot="001", label="Shared")
+    return users
+
+
+def _strip(brief):
+    return {k: brief[k] for k in PER_USER_SECTIONS}
+
+
+class TestBatchParity:
+
+    def test_batch_matches_per_user_briefs(self):
+        from web.brief import get_morning_brief
+        from web.brief_batch import prefetch_briefs
+
+        users = _seed_world()
+        batch = prefetch_briefs(users, lookback_days=1)
+        assert batch.failed == [] or set(batch.failed) <= {"prep_summary"}
+
+        for uid in users:
+            solo = get_morning_brief(uid, 1)
+            batched = get_morning_brief(uid, 1, batch=batch)
+            assert _strip(batched) == _strip(solo), uid
+
+        # Sanity: the fixture actually exercises the sections
+        a, b, c = users
+        brief_a = get_morning_brief(a, 1, batch=batch)
+        assert {ch["permit_number"] for ch in brief_a["changes"]} >= {"BP1"}
+        assert [f["permit_number"] for f in brief_a["new_filings"]] == ["BP3"]
+        assert brief_a["plan_reviews"][0]["station"] == "BLDG"
+        assert brief_a["compliance_calendar"][0]["permit_number"] == "BOIL1"
+        assert brief_a["street_use_activity"][0]["permit_number"] == "SU1"
+        assert brief_a["nearby_development"][0]["record_id"] == "DP1"
+        brief_b = get_morning_brief(b, 1, batch=batch)
+        assert brief_b["inspections"][0]["permit_number"] == "BP4"
+        assert brief_b["team_activity"][0]["entity_name"] == "Acme Builders"
+        brief_c = get_morning_brief(c, 1, batch=batch)
+        assert brief_c["property_cards"][0]["enforcement_total"] == 2
+
+    def test_user_without_watches_gets_empty_sections(self):
+        from web.brief import get_morning_brief
+        from web.brief_batch import prefetch_briefs
+
+        users = _seed_world()
+        lonely = _make_user(99)
+        batch = prefetch_briefs(users + [lonely])
+        brief = get_morning_brief(lonely, 1, batch=batch)
+        assert brief["changes"] == [] and brief["property_cards"] == []
+        assert brief["summary"]["total_watches"] == 0
+
+    def test_lookback_mismatch_falls_back_to_per_user(self):
+        from web.brief import get_morning_brief
+        from web.brief_batch import prefetch_briefs
+
+        users = _seed_world()
+        batch = prefetch_briefs(users, lookback_days=1)
+        weekly = get_morning_brief(users[1], 7, batch=batch)
+        assert _strip(weekly) == _strip(get_morning_brief(users[1], 7))
+
+
+class TestBatchQueryCount:
+
+    def _count_queries(self, monkeypatch, user_ids):
+        import web.brief_batch as batch_mod
+
+        calls = []
+        real_query = batch_mod.query
+
+        def counting(sql, params=None):
+            calls.append(sql)
+            return real_query(sql, params)
+
+        monkeypatch.setattr(batch_mod, "query", counting)
+        batch_mod.prefetch_briefs(user_ids)
+        return len(calls)
+
+    def test_queries_do_not_scale_with_users(self, monkeypatch):
+        users = _seed_world()
+        more = users + [_make_user(n) for n in range(10, 40)]
+        assert self._count_queries(monkeypatch, users) == self._count_queries(monkeypatch, more)
+
+
+class TestBatchFallback:
+
+    def test_failed_step_falls_back_to_per_user_builder(self, monkeypatch):
+        import web.brief_batch as batch_mod
+        from web.brief import get_morning_brief
+
+        users = _seed_world()
+
+        def boom(batch):
+            raise RuntimeError("inspections unavailable")
+
+        steps = [(n, boom if n == "inspections" else fn) for n, fn in batch_mod._PREFETCH_STEPS]
+        monkeypatch.setattr(batch_mod, "_PREFETCH_STEPS", steps)
+        batch = batch_mod.prefetch_briefs(users)
+        assert "inspections" in batch.failed
+        found, _ = batch.lookup("inspections", users[1])
+        assert not found
+        brief = get_morning_brief(users[1], 1, batch=batch)
+        assert brief["inspections"][0]["permit_number"] == "BP4"
+
+    def test_get_morning_briefs_chunks(self):
+        from web.brief_batch import get_morning_briefs
+
+        users = _seed_world()
+        briefs = get_morning_briefs(users, batch_size=2)
+        assert sorted(briefs) == sorted(users)
+        assert briefs[users[0]]["summary"]["total_watches"] == 3
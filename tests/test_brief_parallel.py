@@ -0,0 +1,201 @@
+"""Tests for parallel section evaluation in get_morning_brief (web/brief.py)."""
+
+import threading
+import time
+
+import pytest
+
+import src.db as db_mod
+import web.brief as brief_mod
+
+
+@pytest.fixture(autouse=True)
+def _use_duckdb(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_brief_parallel.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    import web.auth as auth_mod
+    monkeypatch.setattr(auth_mod, "_schema_initialized", False)
+    monkeypatch.setattr(brief_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(brief_mod, "SECTION_DEADLINES_S", {})
+    monkeypatch.setattr(brief_mod, "_section_latency", {})
+    monkeypatch.setattr(brief_mod, "_section_stale_counts", {})
+    db_mod.init_user_schema()
+    conn = db_mod.get_connection()
+    try:
+        db_mod.init_schema(conn)
+    finally:
+        conn.close()
+
+
+def _sleeper(seconds, value):
+    def compute(*args):
+        time.sleep(seconds)
+        return value
+    return compute
+
+
+def _user():
+    from web.auth import get_or_create_user
+    return get_or_create_user("parallel@example.com")["user_id"]
+
+
+class TestEvaluateSections:
+
+    def test_sections_run_concurrently(self):
+        specs = [(f"s{i}", _sleeper(0.2, i), ()) for i in range(4)]
+        t0 = time.monotonic()
+        values, stale, timings = brief_mod._evaluate_sections(specs)
+        assert time.monotonic() - t0 < 0.6  # 0.8s sequentially
+        assert values == {"s0": 0, "s1": 1, "s2": 2, "s3": 3}
+        assert stale == []
+        assert all(ms >= 150 for ms in timings.values())
+
+    def test_missed_deadline_returns_default_and_flags_stale(self, monkeypatch):
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_DEADLINE_S", 0.15)
+        monkeypatch.setattr(brief_mod, "SECTION_DEADLINES_S", {"fast": 5.0})
+        specs = [
+            ("fast", _sleeper(0.01, ["ok"]), ()),
+            ("inspections", _sleeper(0.6, ["late"]), ()),
+            ("total_watches", _sleeper(0.6, 9), ()),
+        ]
+        t0 = time.monotonic()
+        values, stale, timings = brief_mod._evaluate_sections(specs)
+        assert time.monotonic() - t0 < 0.5
+        assert values == {"fast": ["ok"], "inspections": [], "total_watches": 0}
+        assert stale == ["inspections", "total_watches"]
+        assert timings["inspections"] >= 150
+
+    def test_batch_hits_are_not_recomputed(self):
+        calls = []
+
+        def compute():
+            calls.append(threading.current_thread().name)
+            return "computed"
+
+        def lookup(name):
+            return (True, "from-batch") if name == "a" else (False, None)
+
+        values, _, timings = brief_mod._evaluate_sections(
+            [("a", compute, ()), ("b", compute, ())], lookup,
+        )
+        assert values == {"a": "from-batch", "b": "computed"}
+        assert list(timings) == ["b"]
+        assert calls and calls[0].startswith("brief-section")
+
+    def test_builder_errors_propagate(self):
+        def boom():
+            raise ValueError("section broke")
+
+        with pytest.raises(ValueError, match="section broke"):
+            brief_mod._evaluate_sections([("a", _sleeper(0, 1), ()), ("b", boom, ())])
+
+    def test_sequential_when_pool_disabled(self, monkeypatch):
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_WORKERS", 0)
+        seen = []
+
+        def compute(n):
+            seen.append(threading.current_thread().name)
+            return n
+
+        values, stale, _ = brief_mod._evaluate_sections([("a", compute, (1,)), ("b", compute, (2,))])
+        assert values == {"a": 1, "b": 2} and stale == []
+        assert seen == [threading.current_thread().name] * 2
+
+    def test_inline_when_not_concurrent(self):
+        seen = []
+
+        def compute(n):
+            seen.append(threading.current_thread().name)
+            return n
+
+        values, stale, _ = brief_mod._evaluate_sections(
+            [("a", compute, (1,)), ("b", compute, (2,))], concurrent=False)
+        assert values == {"a": 1, "b": 2} and stale == []
+        assert seen == [threading.current_thread().name] * 2
+
+    def test_queue_wait_does_not_count_against_deadline(self, monkeypatch):
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_MAX_IN_FLIGHT", 1)
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_DEADLINE_S", 0.3)
+        specs = [(f"s{i}", _sleeper(0.15, i), ()) for i in range(3)]
+        values, stale, _ = brief_mod._evaluate_sections(specs)
+        assert values == {"s0": 0, "s1": 1, "s2": 2} and stale == []
+
+    def test_in_flight_sections_are_capped_per_request(self, monkeypatch):
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_MAX_IN_FLIGHT", 2)
+        lock = threading.Lock()
+        active = peak = 0
+
+        def compute(n):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return n
+
+        values, stale, _ = brief_mod._evaluate_sections(
+            [(f"s{i}", compute, (i,)) for i in range(6)])
+        assert values == {f"s{i}": i for i in range(6)} and stale == []
+        assert peak == 2
+
+    def test_timed_out_builder_holds_its_slot_until_queue_timeout(self, monkeypatch):
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_MAX_IN_FLIGHT", 1)
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_DEADLINE_S", 0.05)
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_QUEUE_TIMEOUT_S", 0.2)
+        started = []
+
+        def fast():
+            started.append("fast")
+            return ["ok"]
+
+        t0 = time.monotonic()
+        values, stale, _ = brief_mod._evaluate_sections([
+            ("inspections", _sleeper(0.6, ["late"]), ()),
+            ("new_filings", fast, ()),
+        ])
+        assert time.monotonic() - t0 < 0.5
+        assert values == {"inspections": [], "new_filings": []}
+        assert stale == ["inspections", "new_filings"] and started == []
+
+
+class TestLatencyStats:
+
+    def test_slowest_section_reported_first(self):
+        for _ in range(3):
+            brief_mod._evaluate_sections([
+                ("quick", _sleeper(0, 1), ()),
+                ("slow", _sleeper(0.05, 2), ()),
+            ])
+        stats = brief_mod.get_section_latency_stats()
+        assert [s["section"] for s in stats] == ["slow", "quick"]
+        assert stats[0]["count"] == 3
+        assert stats[0]["p95_ms"] >= 45
+        assert stats[0]["stale"] == 0
+
+
+class TestMorningBrief:
+
+    def test_slow_section_does_not_block_brief(self, monkeypatch):
+        monkeypatch.setattr(brief_mod, "BRIEF_SECTION_DEADLINE_S", 0.5)
+        monkeypatch.setattr(brief_mod, "_get_inspection_results", _sleeper(2.0, ["late"]))
+        uid = _user()
+
+        t0 = time.monotonic()
+        brief = brief_mod.get_morning_brief(uid, 1)
+        assert time.monotonic() - t0 < 1.8
+        assert brief["stale_sections"] == ["inspections"]
+        assert brief["inspections"] == []
+        assert brief["summary"]["inspections_count"] == 0
+        assert brief["summary"]["total_watches"] == 0
+        assert "changes" in brief["section_timings"]
+        assert brief["stuck_alerts"] == [] and brief["delay_alerts"] == []
+
+    def test_fresh_brief_has_no_stale_sections(self):
+        brief = brief_mod.get_morning_brief(_user(), 1)
+        assert brief["stale_sections"] == []
+        assert set(brief["section_timings"]) >= {"changes", "property_cards", "stuck_alerts"}
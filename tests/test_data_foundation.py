@@ -643,10 +643,10 @@ class TestIntegration:
         )
 
     def test_full_migration_count_updated(self):
-        """MIGRATIONS list now has 14 entries (12 + sprint61b_teams + sprint61d_notify_columns)."""
+        """MIGRATIONS list now has 15 entries (12 + sprint61b_teams + sprint61d_notify_columns + address_key)."""
         from scripts.run_prod_migrations import MIGRATIONS
-        assert len(MIGRATIONS) == 14, (
-            f"Expected 14 migrations, got {len(MIGRATIONS)}"
+        assert len(MIGRATIONS) == 15, (
+            f"Expected 15 migrations, got {len(MIGRATIONS)}"
         )
 
     def test_velocity_periods_flow_through_refresh(self, duck_velocity):
@@ -31,14 +31,8 @@ class TestOrphanedContacts:
     def test_green_when_below_5pct(self):
         from web.data_quality import _check_orphaned_contacts
 
-        # 2% orphaned (20 of 1000)
-        with _mock_timed([(20,)]) as mq:
-            with _mock_timed([(1000,)]):
-                # Need to handle two calls — first for orphans, second for total
-                pass
-
-        # Simpler: patch once, use side_effect
-        with patch("web.data_quality._timed_query", side_effect=[[(20,)], [(1000,)]]):
+        # 2% orphaned (20 of 1000) — one contacts scan: (total, unresolved)
+        with _mock_timed([(1000, 20)]):
             result = _check_orphaned_contacts()
         assert result["status"] == "green"
         assert result["name"] == "Unresolved Contacts"
@@ -47,7 +41,7 @@ class TestOrphanedContacts:
         from web.data_quality import _check_orphaned_contacts
 
         # 8% orphaned (80 of 1000)
-        with patch("web.data_quality._timed_query", side_effect=[[(80,)], [(1000,)]]):
+        with patch("web.data_quality._timed_query", return_value=[(1000, 80)]):
             result = _check_orphaned_contacts()
         assert result["status"] == "yellow"
 
@@ -55,7 +49,7 @@ class TestOrphanedContacts:
         from web.data_quality import _check_orphaned_contacts
 
         # 15% orphaned (150 of 1000)
-        with patch("web.data_quality._timed_query", side_effect=[[(150,)], [(1000,)]]):
+        with patch("web.data_quality._timed_query", return_value=[(1000, 150)]):
             result = _check_orphaned_contacts()
         assert result["status"] == "red"
 
@@ -234,3 +228,69 @@ class TestRunAllChecks:
         assert len(results) > 0
         error_results = [r for r in results if r["value"] == "Error"]
         assert len(error_results) > 0
+
+    def test_checks_share_one_scan_per_table(self):
+        from web.data_quality import run_all_checks
+
+        sqls = []
+
+        def fake(sql, params=None):
+            sqls.append(sql)
+            return [(100, 0, 0, 0)]
+
+        with patch("src.db.BACKEND", "duckdb"):
+            with patch("web.data_quality._timed_query", side_effect=fake):
+                results = run_all_checks()
+        # One scan per table however many checks read it: permits feeds 3
+        # checks, inspections 2, contacts 2 (unresolved contacts, plus the
+        # prod-only entity coverage check, which is skipped on DuckDB)
+        assert sum("FROM permits" in s for s in sqls) == 1
+        assert sum("FROM inspections" in s for s in sqls) == 1
+        assert sum("FROM contacts" in s for s in sqls) == 1
+        assert all(isinstance(r["duration_ms"], int) for r in results)
+
+    def test_checks_over_run_budget_time_out(self):
+        import threading
+        from web.data_quality import run_all_checks
+
+        release = threading.Event()
+
+        def slow_trade_counts(sql, params=None):
+            if "boiler_permits" in sql:
+                release.wait(5)
+            return [(1,)]
+
+        try:
+            with patch("src.db.BACKEND", "duckdb"), \
+                    patch("web.data_quality._DQ_RUN_BUDGET_S", 0.5), \
+                    patch("web.data_quality._timed_query", side_effect=slow_trade_counts):
+                results = run_all_checks()
+        finally:
+            release.set()
+        by_name = {r["name"]: r for r in results}
+        assert by_name["Trade Permit Counts"]["value"] == "Timeout"
+        assert by_name["Trade Permit Counts"]["status"] == "yellow"
+        assert by_name["Temporal Violations"]["value"] != "Timeout"
+
+
+class TestCostTrends:
+    """Per-check durations averaged over cached history."""
+
+    def test_averages_prior_runs(self):
+        import json
+        from web.data_quality import get_check_cost_trends
+
+        history = [
+            (json.dumps([{"name": "Data Freshness", "duration_ms": 100},
+                         {"name": "Trade Permits"}]),),
+            (json.dumps([{"name": "Data Freshness", "duration_ms": 300}]),),
+        ]
+        with _mock_raw(history):
+            trends = get_check_cost_trends()
+        assert trends == {"Data Freshness": {"avg_ms": 200, "runs": 2}}
+
+    def test_empty_when_cache_unavailable(self):
+        from web.data_quality import get_check_cost_trends
+
+        with patch("web.data_quality._raw_query", side_effect=Exception("no table")):
+            assert get_check_cost_trends() == {}
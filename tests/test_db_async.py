@@ -0,0 +1,82 @@
+"""Tests for the async DB facade (src/db_async.py)."""
+
+import asyncio
+import inspect
+import threading
+import time
+from unittest.mock import patch
+
+from src import db_async
+
+
+class TestOffload:
+
+    def test_wrapper_keeps_tool_shape(self):
+        def tool(permit_number: str, limit: int = 5) -> str:
+            """Tool docstring."""
+            return threading.current_thread().name
+
+        wrapped = db_async.offload(tool)
+        assert inspect.iscoroutinefunction(wrapped)
+        assert inspect.signature(wrapped) == inspect.signature(tool)
+        assert wrapped.__doc__ == "Tool docstring."
+        assert wrapped.__wrapped__ is tool
+        assert asyncio.run(wrapped("P1")).startswith("db-async")
+
+    def test_blocking_body_does_not_stall_loop(self):
+        @db_async.offload
+        def slow():
+            time.sleep(0.3)
+            return "done"
+
+        async def main():
+            ticks = 0
+
+            async def heartbeat():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            hb = asyncio.create_task(heartbeat())
+            results = await asyncio.gather(slow(), slow(), slow())
+            hb.cancel()
+            return results, ticks
+
+        t0 = time.monotonic()
+        results, ticks = asyncio.run(main())
+        assert results == ["done"] * 3
+        assert time.monotonic() - t0 < 0.8  # ran concurrently
+        assert ticks >= 10  # loop kept turning while the bodies slept
+
+    def test_tools_run_on_db_executor(self):
+        from src.tools.stuck_permit import diagnose_stuck_permit
+
+        seen = []
+
+        def fake_connection():
+            seen.append(threading.current_thread().name)
+            raise RuntimeError("no db")
+
+        with patch("src.tools.stuck_permit.get_connection", side_effect=fake_connection):
+            asyncio.run(diagnose_stuck_permit("202401010001"))
+        assert seen and all(name.startswith("db-async") for name in seen)
+
+
+class TestWorkerCount:
+
+    def test_defaults_fit_the_pool(self, monkeypatch):
+        import src.db as db_mod
+
+        monkeypatch.setattr(db_mod, "BACKEND", "postgres")
+        monkeypatch.delenv("DB_POOL_MAX", raising=False)
+        assert db_async._worker_count() == db_async.DB_ASYNC_WORKERS == 16
+
+    def test_capped_to_half_the_postgres_pool(self, monkeypatch):
+        import src.db as db_mod
+
+        monkeypatch.setattr(db_mod, "BACKEND", "postgres")
+        monkeypatch.setenv("DB_POOL_MAX", "20")
+        assert db_async._worker_count() == 10
+        monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+        assert db_async._worker_count() == 16
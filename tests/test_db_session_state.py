@@ -0,0 +1,149 @@
+"""Tests for Postgres checkout session state, prepared statements and pool metrics in src/db.py."""
+
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+import src.db as db
+
+
+class _FakeConn:
+    """Stands in for a psycopg2 connection; records executed SQL."""
+
+    def __init__(self, fail_on=()):
+        self.closed = 0
+        self.autocommit = False
+        self.executed = []
+        self.rollbacks = 0
+        self.fail_on = fail_on
+        self.status = 0
+
+    def cursor(self):
+        conn = self
+        cur = MagicMock()
+
+        def execute(sql, params=None):
+            if any(sql.startswith(f) for f in conn.fail_on):
+                raise psycopg2.ProgrammingError("could not determine data type of parameter $1")
+            conn.executed.append(sql)
+            if not conn.autocommit and sql.split()[0] not in ("PREPARE", "EXECUTE", "DEALLOCATE"):
+                conn.status = 2  # implicit BEGIN
+
+        cur.execute.side_effect = execute
+        cur.fetchall.return_value = [("row",)]
+        cm = MagicMock()
+        cm.__enter__.return_value = cur
+        cm.__exit__.return_value = False
+        return cm
+
+    def commit(self):
+        self.status = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+
+@pytest.fixture
+def pg(monkeypatch):
+    raw = _FakeConn()
+    pool = MagicMock()
+    pool.getconn.return_value = raw
+    monkeypatch.setattr(db, "BACKEND", "postgres")
+    monkeypatch.setattr(db, "_pool", pool)
+    monkeypatch.setattr(db, "DB_PREPARE_THRESHOLD", 2)
+    monkeypatch.delenv("CRON_WORKER", raising=False)
+    monkeypatch.delenv("DB_STATEMENT_TIMEOUT", raising=False)
+    monkeypatch.setattr(db, "_sessions", {})
+    monkeypatch.setattr(db, "_sql_counts", {})
+    monkeypatch.setattr(db, "_unpreparable", set())
+    db._pool_metrics.reset()
+    yield raw
+    db._pool_metrics.reset()
+
+
+def _sets(raw):
+    return [s for s in raw.executed if s.startswith("SET statement_timeout")]
+
+
+class TestCheckoutSessionState:
+
+    def test_timeout_set_once_per_connection(self, pg, monkeypatch):
+        for _ in range(3):
+            db.get_connection().close()
+        assert len(_sets(pg)) == 1
+        monkeypatch.setenv("DB_STATEMENT_TIMEOUT", "60s")
+        db.get_connection().close()
+        assert len(_sets(pg)) == 2
+
+    def test_autocommit_callers_force_reapply(self, pg):
+        conn = db.get_connection()
+        conn.autocommit = True
+        conn.close()
+        assert pg.autocommit is False
+        db.get_connection().close()
+        assert len(_sets(pg)) == 2
+
+    def test_idle_close_skips_rollback(self, pg):
+        db.get_connection().close()
+        assert pg.rollbacks == 0
+        conn = db.get_connection()
+        with conn.cursor() as cur:
+            cur.execute("UPDATE t SET x = 1")
+        conn.close()
+        assert pg.rollbacks == 1
+
+
+class TestQueryRoundTrips:
+
+    def test_query_is_one_round_trip_after_first_checkout(self, pg):
+        assert db.query("SELECT 1") == [("row",)]
+        db.query("SELECT 1")
+        stats = db._pool_metrics.snapshot()["round_trips"]
+        assert stats["calls"] == 2
+        assert stats["per_call_histogram"] == {"1": 1, "4": 1}
+        assert pg.autocommit is False and pg.rollbacks == 0
+
+    def test_hot_sql_is_prepared_per_connection(self, pg):
+        sql = "SELECT name FROM permits WHERE permit_number = %s AND name LIKE 'a%%'"
+        for pn in ("P1", "P2", "P3"):
+            db.query(sql, (pn,))
+        prepares = [s for s in pg.executed if s.startswith("PREPARE")]
+        assert len(prepares) == 1
+        assert prepares[0].endswith("WHERE permit_number = $1 AND name LIKE 'a%'")
+        assert sum(s.startswith("EXECUTE") for s in pg.executed) == 2
+        assert db._pool_metrics.snapshot()["prepared"] == {"prepares": 1, "executes": 2, "failures": 0}
+
+    def test_unpreparable_sql_falls_back(self, pg):
+        pg.fail_on = ("PREPARE",)
+        sql = "SELECT 1 WHERE %s IS NULL"
+        for _ in range(3):
+            assert db.query(sql, (None,)) == [("row",)]
+        assert db._pool_metrics.snapshot()["prepared"]["failures"] == 1
+        assert pg.executed.count(sql) == 3
+
+    def test_execute_errors_propagate_without_rerun(self, pg):
+        sql = "SELECT 1 FROM permits WHERE permit_number = %s"
+        db.query(sql, ("P1",))
+        pg.fail_on = ("EXECUTE",)
+        with pytest.raises(psycopg2.ProgrammingError):
+            db.query(sql, ("P2",))
+        assert pg.executed.count(sql) == 1  # only the first, cold run
+        assert db._pool_metrics.snapshot()["prepared"]["failures"] == 0
+
+    def test_in_list_tuples_are_not_prepared(self, pg):
+        for _ in range(3):
+            db.query("SELECT 1 FROM permits WHERE permit_number IN %s", (("P1", "P2"),))
+        assert not any(s.startswith("PREPARE") for s in pg.executed)
+
+    def test_pool_stats_export_metrics(self, pg):
+        db.query("SELECT 1")
+        stats = db.get_pool_stats()
+        assert stats["checkout"]["count"] == 1
+        assert sum(stats["checkout"]["wait_ms_histogram"].values()) == 1
+        assert stats["checkout"]["session_sets"] == 1
+        assert stats["round_trips"]["total"] == 4
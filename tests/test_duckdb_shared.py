@@ -0,0 +1,122 @@
+"""Tests for the shared process-wide DuckDB instance in src/db.py."""
+
+import threading
+import time
+
+import duckdb
+import pytest
+
+import src.db as db_mod
+
+
+@pytest.fixture
+def duck(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "shared.duckdb")
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    monkeypatch.setattr(db_mod, "DUCKDB_READ_ONLY", False)
+    db_mod.execute_write("CREATE TABLE t (id INTEGER, name TEXT)")
+    yield db_path
+
+
+def _build(path, names):
+    c = duckdb.connect(path)
+    c.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+    c.executemany("INSERT INTO t VALUES (?, ?)", list(enumerate(names)))
+    c.close()
+
+
+class TestSharedInstance:
+
+    def test_connections_share_one_database(self, duck):
+        inst = db_mod._shared_duckdb()
+        conn = db_mod.get_connection()
+        conn.execute("INSERT INTO t VALUES (1, 'a')")
+        conn.close()
+        db_mod.execute_write("INSERT INTO t VALUES (%s, %s)", (2, "b"))
+        assert db_mod.query("SELECT id FROM t ORDER BY id") == [(1,), (2,)]
+        assert db_mod.query_one("SELECT name FROM t WHERE id = %s", (2,)) == ("b",)
+        assert db_mod._shared_duckdb() is inst
+
+    def test_thread_cursors(self, duck):
+        inst = db_mod._shared_duckdb()
+        seen = []
+
+        def worker():
+            seen.append(inst.thread_cursor())
+            seen.append(inst.thread_cursor())
+            db_mod.query("SELECT COUNT(*) FROM t")
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert seen[0] is seen[1] and seen[2] is seen[3]
+        assert seen[0] is not seen[2]
+        assert inst.thread_cursor() not in seen
+
+    def test_path_change_reopens(self, duck, tmp_path, monkeypatch):
+        conn = db_mod.get_connection()
+        monkeypatch.setattr(db_mod, "_DUCKDB_PATH", str(tmp_path / "other.duckdb"))
+        assert db_mod.query("SELECT COUNT(*) FROM information_schema.tables "
+                            "WHERE table_name = 't'") == [(0,)]
+        # connections handed out before the switch keep working
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+        conn.close()
+
+    def test_replaced_instance_closed_after_last_connection(self, duck, tmp_path, monkeypatch):
+        old = db_mod._shared_duckdb()
+        conn = db_mod.get_connection()
+        monkeypatch.setattr(db_mod, "_DUCKDB_PATH", str(tmp_path / "other.duckdb"))
+        db_mod.query("SELECT 1")
+        assert not old.closed
+        conn.close()
+        del conn
+        assert old.closed
+
+    def test_idle_instance_releases_file_lock(self, duck, monkeypatch):
+        monkeypatch.setattr(db_mod, "DUCKDB_IDLE_RELEASE_SECS", 0.1)
+        db_mod.close_duckdb()
+        db_mod.execute_write("INSERT INTO t VALUES (1, 'a')")
+        held = db_mod.get_connection()
+        time.sleep(0.4)
+        assert not db_mod._shared_duckdb().closed  # a connection is still out
+        held.close()
+        del held
+
+        deadline = time.monotonic() + 5
+        while db_mod._duckdb_instance is not None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert db_mod._duckdb_instance is None
+        # Another writer (e.g. python -m src.ingest) can open the file now
+        other = duckdb.connect(duck)
+        other.execute("INSERT INTO t VALUES (2, 'b')")
+        other.close()
+        assert db_mod.query("SELECT COUNT(*) FROM t") == [(2,)]
+
+
+class TestReadOnlySwap:
+
+    def test_read_only_reader_picks_up_published_file(self, tmp_path, monkeypatch):
+        live = str(tmp_path / "live.duckdb")
+        _build(live, ["old"])
+        monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+        monkeypatch.setattr(db_mod, "_DUCKDB_PATH", live)
+        monkeypatch.setattr(db_mod, "DUCKDB_READ_ONLY", True)
+        monkeypatch.setattr(db_mod, "DUCKDB_SWAP_CHECK_SECS", 0)
+
+        assert db_mod.query("SELECT name FROM t") == [("old",)]
+        with pytest.raises(duckdb.Error):
+            db_mod.execute_write("INSERT INTO t VALUES (9, 'x')")
+        held = db_mod.get_connection()
+
+        staged = str(tmp_path / "staged.duckdb")
+        _build(staged, ["new", "newer"])
+        db_mod.publish_duckdb(staged)
+
+        assert db_mod.query("SELECT name FROM t ORDER BY id") == [("new",), ("newer",)]
+        # a connection opened before the swap still reads the old file
+        assert held.execute("SELECT name FROM t").fetchall() == [("old",)]
+        held.close()
+        db_mod.close_duckdb()
@@ -0,0 +1,243 @@
+"""Tests for pooled SMTP delivery (web/smtp_pool.py) and the send_briefs pipeline."""
+
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from unittest.mock import patch
+
+import pytest
+
+import web.email_brief as eb
+import web.smtp_pool as smtp_pool_mod
+from web.smtp_pool import RateLimiter, SMTPPool
+
+
+class _FakeSMTP:
+    """Records sessions and messages; optionally drops the first send."""
+
+    instances: list = []
+    drop_first_send = False
+    refuse = set()
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        self.tls = False
+        self.logged_in = None
+        _FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        self.tls = True
+
+    def login(self, user, password):
+        self.logged_in = user
+
+    def send_message(self, msg):
+        if _FakeSMTP.drop_first_send:
+            _FakeSMTP.drop_first_send = False
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if msg["To"] in _FakeSMTP.refuse:
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"no such user")})
+        time.sleep(0.005)
+        self.sent.append(msg["To"])
+
+    def noop(self):
+        return (250, b"OK")
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    _FakeSMTP.instances = []
+    _FakeSMTP.drop_first_send = False
+    _FakeSMTP.refuse = set()
+    monkeypatch.setattr(smtp_pool_mod.smtplib, "SMTP", _FakeSMTP)
+    return _FakeSMTP
+
+
+def _msg(to):
+    msg = EmailMessage()
+    msg["To"] = to
+    msg["From"] = "noreply@example.com"
+    msg["Subject"] = "hi"
+    msg.set_content("body")
+    return msg
+
+
+class TestSMTPPool:
+
+    def test_sessions_are_reused_across_threads(self, fake_smtp):
+        pool = SMTPPool("smtp.example.com", size=2, user="u", password="p")
+        threads = [
+            threading.Thread(target=lambda n=n: [pool.send(_msg(f"u{n}-{i}@x.com")) for i in range(5)])
+            for n in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        pool.close()
+
+        assert pool.stats()["sent"] == 20
+        assert pool.stats()["connections_opened"] <= 2
+        assert sum(len(s.sent) for s in fake_smtp.instances) == 20
+        assert all(s.tls and s.logged_in == "u" and s.closed for s in fake_smtp.instances)
+
+    def test_session_recycled_after_message_limit(self, fake_smtp):
+        pool = SMTPPool("smtp.example.com", size=1, max_messages_per_connection=3,
+                        starttls=False)
+        for i in range(10):
+            pool.send(_msg(f"{i}@x.com"))
+        assert pool.stats()["connections_opened"] == 4
+        assert [len(s.sent) for s in fake_smtp.instances] == [3, 3, 3, 1]
+        assert not any(s.tls for s in fake_smtp.instances)
+
+    def test_dropped_session_reconnects_once(self, fake_smtp):
+        pool = SMTPPool("smtp.example.com", size=1)
+        pool.send(_msg("a@x.com"))
+        fake_smtp.drop_first_send = True
+        pool.send(_msg("b@x.com"))
+        stats = pool.stats()
+        assert stats == {"sent": 2, "failed": 0, "connections_opened": 2, "reconnects": 1}
+        assert fake_smtp.instances[-1].sent == ["b@x.com"]
+
+    def test_refused_recipient_keeps_session(self, fake_smtp):
+        fake_smtp.refuse = {"bad@x.com"}
+        pool = SMTPPool("smtp.example.com", size=1)
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            pool.send(_msg("bad@x.com"))
+        pool.send(_msg("good@x.com"))
+        assert pool.stats()["failed"] == 1
+        assert pool.stats()["connections_opened"] == 1
+
+    def test_rate_limiter_paces_sends(self):
+        limiter = RateLimiter(50)
+        t0 = time.monotonic()
+        for _ in range(11):
+            limiter.acquire()
+        assert time.monotonic() - t0 >= 0.18
+        unlimited = RateLimiter(0)
+        t0 = time.monotonic()
+        for _ in range(1000):
+            unlimited.acquire()
+        assert time.monotonic() - t0 < 0.1
+
+
+class TestSendBriefsPipeline:
+
+    def _brief(self, uid):
+        empty = uid % 3 == 0
+        return {
+            "lookback_days": 1,
+            "summary": {"changes_count": 0 if empty else 1, "at_risk_count": 0,
+                        "inspections_count": 0, "new_filings_count": 0,
+                        "expiring_count": 0},
+            "changes": [], "health": [], "inspections": [], "new_filings": [],
+            "expiring": [], "pipeline_health": {"status": "ok"},
+        }
+
+    def _run(self, monkeypatch, n_users=30, fail_users=(),
+             smtp_host="smtp.example.com", prefetch=lambda ids, lookback: None):
+        from jinja2 import Template
+
+        users = [{"user_id": i, "email": f"user{i}@x.com", "display_name": f"U{i}"}
+                 for i in range(1, n_users + 1)]
+        marked = []
+
+        def fake_brief(uid, lookback, batch=None, concurrent_sections=True):
+            assert not concurrent_sections
+            if uid in fail_users:
+                raise RuntimeError("brief exploded")
+            return self._brief(uid)
+
+        monkeypatch.setattr(eb, "SMTP_HOST", smtp_host)
+        monkeypatch.setattr(eb, "BRIEF_SMTP_CONNECTIONS", 3)
+        monkeypatch.setattr(eb, "BRIEF_BATCH_SIZE", 12)
+        monkeypatch.setattr(eb, "get_users_for_brief", lambda freq: users)
+        monkeypatch.setattr(eb, "prefetch_briefs", prefetch)
+        monkeypatch.setattr(eb, "get_morning_brief", fake_brief)
+        monkeypatch.setattr(eb, "update_last_brief_sent_many", marked.extend)
+        with patch.object(eb, "_email_template",
+                          return_value=Template("<p>Hi {{ user_name }}</p>")) as tmpl:
+            result = eb.send_briefs("daily")
+        assert tmpl.call_count == 1
+        return result, marked
+
+    def test_sends_through_pooled_sessions(self, monkeypatch, fake_smtp):
+        result, marked = self._run(monkeypatch)
+
+        assert result["total"] == 30
+        assert result["skipped"] == 10
+        assert result["sent"] == 20 and result["failed"] == 0
+        assert sorted(marked) == [i for i in range(1, 31) if i % 3]
+        assert result["smtp"]["connections_opened"] <= 3
+        delivered = sorted(to for s in fake_smtp.instances for to in s.sent)
+        assert delivered == sorted(f"user{i}@x.com" for i in marked)
+        assert set(result["stages"]) == {"prefetch", "generate", "render", "send", "mark_sent"}
+        assert result["stages"]["prefetch"]["count"] == 3
+        assert result["stages"]["send"]["count"] == 20
+        assert result["stages"]["generate"]["per_sec"] > 0
+
+    def test_failures_are_counted_not_marked(self, monkeypatch, fake_smtp):
+        fake_smtp.refuse = {"user2@x.com"}
+        result, marked = self._run(monkeypatch, n_users=6, fail_users={4})
+
+        assert result["failed"] == 2
+        assert result["sent"] == 2
+        assert sorted(marked) == [1, 5]
+
+    def test_failed_prefetch_builds_per_user(self, monkeypatch, fake_smtp):
+        def prefetch(ids, lookback):
+            if 1 in ids:
+                raise RuntimeError("prefetch exploded")
+
+        result, marked = self._run(monkeypatch, n_users=30, prefetch=prefetch)
+        assert result["sent"] == 20 and result["failed"] == 0
+        assert result["stages"]["prefetch"]["count"] == 3
+
+    def test_smtp_sessions_closed_on_error(self, monkeypatch, fake_smtp):
+        closed = []
+        monkeypatch.setattr(smtp_pool_mod.SMTPPool, "close",
+                            lambda self: closed.append(True))
+        monkeypatch.setattr(eb, "_send_chunks", lambda *a: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            self._run(monkeypatch, n_users=3)
+        assert closed == [True]
+
+    def test_dev_mode_without_smtp(self, monkeypatch, fake_smtp):
+        result, marked = self._run(monkeypatch, n_users=4, smtp_host=None)
+        assert result["sent"] == 3
+        assert "smtp" not in result
+        assert fake_smtp.instances == []
+
+
+class TestLocalSMTPServer:
+
+    def test_pool_delivers_to_local_server(self):
+        pytest.importorskip("aiosmtpd")
+        from aiosmtpd.controller import Controller
+
+        received = []
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                received.append(envelope.rcpt_tos[0])
+                return "250 OK"
+
+        controller = Controller(Handler(), hostname="127.0.0.1", port=0)
+        controller.start()
+        try:
+            port = controller.server.sockets[0].getsockname()[1]
+            with SMTPPool("127.0.0.1", port, starttls=False, size=2) as pool:
+                for i in range(6):
+                    pool.send(_msg(f"r{i}@example.com"))
+            assert sorted(received) == sorted(f"r{i}@example.com" for i in range(6))
+            assert pool.stats()["connections_opened"] == 1
+        finally:
+            controller.stop()
@@ -78,3 +78,25 @@ async def test_estimate_fees_includes_notes():
         estimated_construction_cost=2500000,
     )
     assert "Ord. 126-25" in result or "9/1/2025" in result
+
+
+@pytest.mark.asyncio
+async def test_estimate_fees_result_backs_markdown():
+    """The structured result carries the numbers the markdown renders."""
+    from src.tools.estimate_fees import estimate_fees_result, render_fees
+    result = await estimate_fees_result(
+        permit_type="alterations",
+        estimated_construction_cost=250000,
+        project_type="restaurant",
+    )
+    assert result["total_dbi"] > 0
+    assert result["sffd_fees"]["total_sffd"] > 0
+    md, meta = await estimate_fees(
+        permit_type="alterations",
+        estimated_construction_cost=250000,
+        project_type="restaurant",
+        return_structured=True,
+    )
+    assert render_fees(result) == md
+    assert f"**${result['total_dbi']:,.2f}**" in md
+    assert meta["result"]["total_dbi"] == result["total_dbi"]
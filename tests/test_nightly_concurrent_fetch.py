@@ -0,0 +1,174 @@
+"""Tests for the concurrent fetch → detect stage of run_nightly."""
+
+import asyncio
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+
+import scripts.nightly_changes as nc
+
+FETCHERS = {
+    "permits": "fetch_recent_permits",
+    "inspections": "fetch_recent_inspections",
+    "addenda": "fetch_recent_addenda",
+    "planning": "fetch_recent_planning",
+    "boiler": "fetch_recent_boiler_permits",
+    "street_use": "fetch_recent_street_use",
+    "dev_pipeline": "fetch_recent_development_pipeline",
+}
+
+DETECTORS = {
+    "detect_changes": "detect_changes_set_based",
+    "upsert_inspections": "upsert_inspections",
+    "detect_addenda": "detect_addenda_changes_set_based",
+    "detect_planning": "detect_planning_changes_set_based",
+    "detect_boiler": "detect_boiler_changes_set_based",
+    "detect_street_use": "detect_street_use_changes_set_based",
+    "detect_dev_pipeline": "detect_development_pipeline_changes_set_based",
+}
+
+
+class _FakeSODA:
+    def __init__(self, max_concurrency=None):
+        self.max_concurrency = max_concurrency
+
+    async def close(self):
+        pass
+
+
+def _run(delays=None, failures=(), detect_delay=0.0, **env):
+    """Run run_nightly with fake fetchers/detectors; return (result, calls)."""
+    delays = delays or {}
+    calls = {}
+
+    def _fetcher(name):
+        async def fetch(client, since):
+            await asyncio.sleep(delays.get(name, 0.01))
+            if name in failures:
+                raise RuntimeError(f"{name} exploded")
+            return [{"id": f"{name}-1"}]
+        return fetch
+
+    def _detector(step):
+        def detect(records, **kwargs):
+            calls[step] = time.monotonic()
+            time.sleep(detect_delay)
+            return 0 if step == "detect_changes" else len(records)
+        return detect
+
+    async def _ingest(conn, client, days=30):
+        return 0
+
+    with ExitStack() as stack:
+        for key, value in env.items():
+            stack.enter_context(patch.dict("os.environ", {key: str(value)}))
+        stack.enter_context(patch.object(nc, "SODAClient", _FakeSODA))
+        stack.enter_context(patch.object(nc, "ensure_cron_log_table"))
+        stack.enter_context(patch.object(nc, "sweep_stuck_cron_jobs", return_value=0))
+        stack.enter_context(patch.object(nc, "query", return_value=[]))
+        stack.enter_context(patch.object(nc, "query_one", return_value=None))
+        stack.enter_context(patch.object(nc, "_compute_lookback", return_value=(1, False)))
+        stack.enter_context(patch.object(nc, "_log_cron_start", return_value=1))
+        stack.enter_context(patch.object(nc, "_log_cron_finish"))
+        stack.enter_context(patch("src.ingest.ingest_recent_permits", _ingest))
+        for name, fn in FETCHERS.items():
+            stack.enter_context(patch.object(nc, fn, _fetcher(name)))
+        for step, fn in DETECTORS.items():
+            stack.enter_context(patch.object(nc, fn, _detector(step)))
+        result = asyncio.run(nc.run_nightly(lookback_days=1))
+    return result, calls
+
+
+class TestConcurrentFetchStage:
+
+    def test_sources_fetch_concurrently(self):
+        delays = {name: 0.3 for name in FETCHERS}
+        result, _ = _run(delays, NIGHTLY_SODA_CONCURRENCY=8)
+
+        steps = result["step_results"]
+        # Seven 0.3s fetches sequentially would take 2.1s
+        assert result["stage_elapsed_s"] < 1.2
+        starts = [steps[name]["started_s"] for name in FETCHERS]
+        assert max(starts) - min(starts) < 0.2
+        assert result["soda_concurrency"] == 8
+        assert result["soda_addenda"] == 1
+        assert result["addenda_inserted"] == 1
+
+    def test_detection_starts_when_its_own_fetch_completes(self):
+        result, _ = _run({"permits": 0.01, "boiler": 0.6})
+        steps = result["step_results"]
+
+        assert steps["detect_changes"]["started_s"] < steps["boiler"]["finished_s"]
+        assert steps["detect_boiler"]["started_s"] >= steps["boiler"]["finished_s"]
+        for step in DETECTORS:
+            entry = steps[step]
+            assert entry["ok"] is True
+            assert entry["finished_s"] >= entry["started_s"]
+
+    def test_addenda_detection_waits_for_permit_detection(self):
+        result, _ = _run({"permits": 0.4, "addenda": 0.01})
+        steps = result["step_results"]
+
+        assert steps["addenda"]["finished_s"] < steps["permits"]["finished_s"]
+        assert steps["detect_addenda"]["started_s"] >= steps["detect_changes"]["finished_s"]
+
+    def test_failing_source_is_isolated_and_bounded(self, monkeypatch):
+        monkeypatch.setattr(nc, "STEP_TIMEOUT_S", 0.5)
+        result, calls = _run(failures={"planning"})
+        steps = result["step_results"]
+
+        assert steps["planning"]["ok"] is False
+        assert steps["planning"]["timed_out"] is True
+        assert steps["planning"]["finished_s"] < 2.0
+        # Everyone else finished (and detected) long before planning gave up
+        assert steps["detect_boiler"]["finished_s"] < steps["planning"]["finished_s"]
+        assert result["soda_planning"] == 0
+        assert result["boiler_changes_inserted"] == 1
+        assert any("planning" in w for w in result["staleness_warnings"])
+
+    def test_row_mode_uses_per_record_detectors(self, monkeypatch):
+        monkeypatch.setenv("NIGHTLY_DETECT_MODE", "row")
+        seen = []
+
+        def _row_detect(records, dry_run=False, source="nightly"):
+            seen.append(source)
+            return 0
+
+        monkeypatch.setattr(nc, "detect_changes", _row_detect)
+        result, calls = _run()
+        assert seen == ["nightly"]
+        assert "detect_changes" not in calls
+        assert result["detect_mode"] == "row"
+
+
+class TestSODAConcurrencyLimit:
+
+    @pytest.mark.asyncio
+    async def test_limit_caps_in_flight_requests(self):
+        from src.soda_client import SODAClient
+
+        client = SODAClient(max_concurrency=2)
+        state = {"now": 0, "peak": 0}
+
+        class _Resp:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return []
+
+        async def _get(url, params=None, headers=None):
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            await asyncio.sleep(0.02)
+            state["now"] -= 1
+            return _Resp()
+
+        client.client.get = _get
+        try:
+            await asyncio.gather(*(client.query("i98e-djp9") for _ in range(6)))
+        finally:
+            await client.close()
+        assert state["peak"] == 2
@@ -0,0 +1,263 @@
+"""Tests for set-based nightly change detection (scripts/nightly_changes.py).
+
+Each set-based detector is checked for parity with its per-record
+counterpart: same seeded DuckDB, same SODA delta, same resulting
+permit_changes / addenda_changes rows and local table state.
+"""
+
+import pytest
+
+import src.db as db_mod
+from src.db import init_schema, init_user_schema
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """Return a factory that points src.db at a new seeded DuckDB file."""
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr("scripts.nightly_changes.BACKEND", "duckdb")
+    counter = {"n": 0}
+
+    def _make():
+        counter["n"] += 1
+        path = str(tmp_path / f"nightly_{counter['n']}.duckdb")
+        monkeypatch.setattr(db_mod, "_DUCKDB_PATH", path)
+        conn = db_mod.get_connection()
+        try:
+            init_schema(conn)
+            init_user_schema(conn)
+            _seed(conn)
+        finally:
+            conn.close()
+        return path
+
+    return _make
+
+
+def _seed(conn):
+    conn.execute(
+        "INSERT INTO permits (permit_number, permit_type_definition, status, status_date, "
+        "street_number, street_name, neighborhood, block, lot) VALUES "
+        "('P1', 'otc alterations permit', 'filed', '2026-01-01', '100', 'MARKET', 'SoMa', '3701', '001'), "
+        "('P2', 'new construction', 'issued', '2026-02-01', '200', 'MISSION', 'Mission', '3601', '002'), "
+        "('P3', 'demolitions', NULL, NULL, '300', 'VALENCIA', 'Mission', '3602', '003')"
+    )
+    conn.execute(
+        "INSERT INTO addenda (id, primary_key, application_number, station, "
+        "review_results, finish_date) VALUES "
+        "(1, 'A1', 'P1', 'BLDG', NULL, NULL), "
+        "(2, 'A2', 'P1', 'SFFD', 'Approved', '2026-02-01'), "
+        "(3, 'A3', 'P2', 'CP-ZOC', 'Approved', '2026-02-02')"
+    )
+    conn.execute(
+        "INSERT INTO boiler_permits (permit_number, status) VALUES ('B1', 'active'), ('B2', 'expired')"
+    )
+
+
+PERMIT_DELTA = [
+    # changed status
+    {"permit_number": "P1", "status": "issued", "status_date": "2026-03-01"},
+    # unchanged
+    {"permit_number": "P2", "status": "issued", "status_date": "2026-02-01"},
+    # NULL -> value
+    {"permit_number": "P3", "status": "filed", "status_date": "2026-03-02"},
+    # new permit, avs_street_name preferred for the change row
+    {"permit_number": "P9", "status": "filed", "status_date": "2026-03-03",
+     "permit_type_definition": "sign - erect", "street_number": "9",
+     "street_name": "FOLSOM", "avs_street_name": "FOLSOM ST",
+     "analysis_neighborhood": "SoMa", "block": "3700", "lot": "009",
+     "estimated_cost": "12000.5", "proposed_units": "2"},
+    # no permit number
+    {"status": "filed"},
+]
+
+ADDENDA_DELTA = [
+    {"primary_key": "A1", "application_number": "P1", "station": "BLDG",
+     "review_results": "Approved", "finish_date": "2026-03-01"},            # review_completed
+    {"primary_key": "A2", "application_number": "P1", "station": "SFFD",
+     "review_results": "Issued Comments", "finish_date": "2026-02-01"},     # review_updated
+    {"primary_key": "A3", "application_number": "P2", "station": "CP-ZOC",
+     "review_results": "Approved", "finish_date": "2026-02-02"},            # unchanged
+    {"primary_key": "A4", "application_number": "P2", "station": "MECH",
+     "addenda_number": "0", "step": "3", "finish_date": "2026-03-04"},      # new_routing
+    {"primary_key": None, "application_number": "P2"},                       # skipped
+]
+
+BOILER_DELTA = [
+    {"permit_number": "B1", "status": "active", "issue_date": "2026-01-01"},
+    {"permit_number": "B2", "status": "active", "issue_date": "2026-01-02", "block": "1", "lot": "2"},
+    {"boiler_permit_number": "B3", "status": "active", "boiler_type": "Steam"},
+]
+
+
+def _changes(table="permit_changes"):
+    if table == "permit_changes":
+        return sorted(db_mod.query(
+            "SELECT permit_number, change_date, old_status, new_status, old_status_date, "
+            "new_status_date, change_type, is_new_permit, source, permit_type, "
+            "street_number, street_name, neighborhood, block, lot FROM permit_changes"
+        ), key=repr)
+    return sorted(db_mod.query(
+        "SELECT application_number, station, addenda_number, step, old_review_results, "
+        "new_review_results, finish_date, change_type, source, permit_type, street_name "
+        "FROM addenda_changes"
+    ), key=repr)
+
+
+def _run_both(fresh_db, row_fn, set_fn, records, snapshot):
+    fresh_db()
+    row_count = row_fn(records, source="nightly")
+    row_state = snapshot()
+    fresh_db()
+    set_count = set_fn(records, source="nightly")
+    set_state = snapshot()
+    return row_count, row_state, set_count, set_state
+
+
+class TestPermitParity:
+
+    def test_same_changes_and_permits_state(self, fresh_db):
+        from scripts.nightly_changes import detect_changes, detect_changes_set_based
+
+        def snapshot():
+            return _changes(), db_mod.query(
+                "SELECT permit_number, status, status_date, street_name, "
+                "estimated_cost, proposed_units FROM permits ORDER BY permit_number"
+            )
+
+        row_count, row_state, set_count, set_state = _run_both(
+            fresh_db, detect_changes, detect_changes_set_based, PERMIT_DELTA, snapshot,
+        )
+        assert row_count == set_count == 3
+        assert set_state == row_state
+        changes, permits = set_state
+        assert {c[0]: c[6] for c in changes} == {
+            "P1": "status_change", "P3": "status_change", "P9": "new_permit",
+        }
+        assert ("P9", "filed", "2026-03-03", "FOLSOM", 12000.5, 2) in permits
+
+    def test_change_ids_continue_from_existing_max(self, fresh_db):
+        from scripts.nightly_changes import detect_changes_set_based
+
+        fresh_db()
+        db_mod.execute_write(
+            "INSERT INTO permit_changes (change_id, permit_number, change_date, new_status, "
+            "change_type) VALUES (41, 'OLD', CURRENT_DATE, 'x', 'status_change')"
+        )
+        detect_changes_set_based(PERMIT_DELTA)
+        ids = [r[0] for r in db_mod.query("SELECT change_id FROM permit_changes ORDER BY 1")]
+        assert ids == [41, 42, 43, 44]
+
+    def test_second_run_is_a_no_op(self, fresh_db):
+        from scripts.nightly_changes import detect_changes_set_based
+
+        fresh_db()
+        assert detect_changes_set_based(PERMIT_DELTA) == 3
+        assert detect_changes_set_based(PERMIT_DELTA) == 0
+
+    def test_duplicate_keys_keep_newest_first_record(self, fresh_db):
+        from scripts.nightly_changes import detect_changes_set_based
+
+        fresh_db()
+        delta = [
+            {"permit_number": "P1", "status": "complete", "status_date": "2026-03-05"},
+            {"permit_number": "P1", "status": "issued", "status_date": "2026-03-01"},
+        ]
+        assert detect_changes_set_based(delta) == 1
+        assert db_mod.query("SELECT status FROM permits WHERE permit_number = 'P1'") == [("complete",)]
+
+    def test_dry_run_writes_nothing(self, fresh_db):
+        from scripts.nightly_changes import detect_changes_set_based
+
+        fresh_db()
+        assert detect_changes_set_based(PERMIT_DELTA, dry_run=True) == 3
+        assert db_mod.query("SELECT COUNT(*) FROM permit_changes") == [(0,)]
+        assert db_mod.query("SELECT status FROM permits WHERE permit_number = 'P1'") == [("filed",)]
+
+    def test_empty_delta(self, fresh_db):
+        from scripts.nightly_changes import detect_changes_set_based
+
+        fresh_db()
+        assert detect_changes_set_based([]) == 0
+
+
+class TestAddendaParity:
+
+    def test_same_changes_and_addenda_state(self, fresh_db):
+        from scripts.nightly_changes import (
+            detect_addenda_changes,
+            detect_addenda_changes_set_based,
+        )
+
+        def snapshot():
+            return _changes("addenda_changes"), db_mod.query(
+                "SELECT primary_key, application_number, station, addenda_number, step, "
+                "review_results, finish_date FROM addenda ORDER BY primary_key"
+            )
+
+        row_count, row_state, set_count, set_state = _run_both(
+            fresh_db, detect_addenda_changes, detect_addenda_changes_set_based,
+            ADDENDA_DELTA, snapshot,
+        )
+        assert row_count == set_count == 3
+        assert set_state == row_state
+        assert sorted(c[7] for c in set_state[0]) == [
+            "new_routing", "review_completed", "review_updated",
+        ]
+
+
+class TestStatusOnlySources:
+
+    def test_boiler_parity(self, fresh_db):
+        from scripts.nightly_changes import detect_boiler_changes, detect_boiler_changes_set_based
+
+        row_count, row_state, set_count, set_state = _run_both(
+            fresh_db, detect_boiler_changes, detect_boiler_changes_set_based,
+            BOILER_DELTA, _changes,
+        )
+        assert row_count == set_count == 2
+        assert set_state == row_state
+
+    def test_street_use_new_permits(self, fresh_db):
+        from scripts.nightly_changes import (
+            detect_street_use_changes,
+            detect_street_use_changes_set_based,
+        )
+
+        delta = [{"permit_number": "SU1", "status": "APPROVED", "approved_date": "2026-03-01",
+                  "street_name": "Market St", "permit_purpose": "Sidewalk"}]
+        row_count, row_state, set_count, set_state = _run_both(
+            fresh_db, detect_street_use_changes, detect_street_use_changes_set_based,
+            delta, _changes,
+        )
+        assert row_count == set_count == 1
+        assert set_state == row_state
+
+    def test_dev_pipeline_block_lot_split(self, fresh_db):
+        from scripts.nightly_changes import (
+            detect_development_pipeline_changes,
+            detect_development_pipeline_changes_set_based,
+        )
+
+        delta = [{"record_id": "DP1", "current_status": "Approved",
+                  "approved_date_planning": "2026-03-01", "block_lot": "3512/004",
+                  "description_planning": "8-unit building"}]
+        row_count, row_state, set_count, set_state = _run_both(
+            fresh_db, detect_development_pipeline_changes,
+            detect_development_pipeline_changes_set_based, delta, _changes,
+        )
+        assert row_count == set_count == 1
+        assert set_state == row_state
+        assert set_state[0][13:15] == ("3512", "004")
+
+
+class TestModeSelection:
+
+    def test_default_is_set_based(self, monkeypatch):
+        from scripts.nightly_changes import use_set_based_detection
+
+        monkeypatch.delenv("NIGHTLY_DETECT_MODE", raising=False)
+        assert use_set_based_detection()
+        monkeypatch.setenv("NIGHTLY_DETECT_MODE", "row")
+        assert not use_set_based_detection()
@@ -0,0 +1,160 @@
+"""Tests for vision/page_raster.py — render-once page rasterization.
+
+Mocks pdf2image so no poppler dependency is required. Rendering runs
+inline (RASTER_WORKERS=1) so the mock is visible to the render path.
+"""
+
+import base64
+import sys
+import pytest
+from io import BytesIO
+from unittest.mock import patch, MagicMock
+
+from PIL import Image
+
+from src.vision.page_raster import (
+    PageRaster,
+    active_raster_for,
+    raster_session,
+)
+from src.vision.pdf_to_images import pdf_page_to_base64, MAX_DIMENSION
+from src.vision.epr_checks import (
+    plan_vision_renders,
+    DPI_ANNOTATIONS,
+    DPI_COVER,
+    DPI_HATCHING,
+    DPI_TITLE_BLOCK,
+)
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+class _FakeConvert:
+    """Fake convert_from_bytes: a 10"x5" page at the requested DPI."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, pdf_bytes, dpi=150, first_page=1, last_page=1, fmt="png"):
+        self.calls.append((dpi, first_page, last_page))
+        return [
+            Image.new("RGB", (10 * dpi, 5 * dpi), color="white")
+            for _ in range(first_page, last_page + 1)
+        ]
+
+
+def _size(b64: str) -> tuple[int, int]:
+    return Image.open(BytesIO(base64.b64decode(b64))).size
+
+
+@pytest.fixture
+def fake_pdf2image(monkeypatch):
+    monkeypatch.setenv("RASTER_WORKERS", "1")
+    fake = _FakeConvert()
+    mock_mod = MagicMock()
+    mock_mod.convert_from_bytes = fake
+    with patch.dict(sys.modules, {"pdf2image": mock_mod}):
+        yield fake
+
+
+# ── Render plan ──────────────────────────────────────────────────────────────
+
+
+def test_each_page_rendered_once_at_highest_dpi(fake_pdf2image):
+    pdf = b"%PDF-fake"
+    raster = PageRaster(pdf, {0: {72, 150}, 1: {72, 150}, 2: {72}})
+    stats = raster.render()
+
+    # Pages 0-1 share master DPI 150 (one call), page 2 renders at 72
+    assert sorted(fake_pdf2image.calls) == [(72, 3, 3), (150, 1, 2)]
+    assert stats.pages_rendered == 3
+    assert stats.variants_derived == 5
+
+
+def test_derived_variant_matches_direct_render_size(fake_pdf2image):
+    pdf = b"%PDF-fake"
+    raster = PageRaster(pdf, {0: {72, 100}}, max_dimension=5000)
+    raster.render()
+
+    assert _size(raster.get(0, 100)) == (1000, 500)
+    assert _size(raster.get(0, 72)) == (720, 360)
+    # Served from memory — no extra renders
+    assert len(fake_pdf2image.calls) == 1
+
+
+def test_max_dimension_cap_applied(fake_pdf2image):
+    raster = PageRaster(b"%PDF-fake", {0: {300}})
+    raster.render()
+    assert MAX_DIMENSION - 1 <= max(_size(raster.get(0, 300))) <= MAX_DIMENSION
+
+
+def test_unplanned_lower_dpi_derived_from_master(fake_pdf2image):
+    raster = PageRaster(b"%PDF-fake", {0: {150}}, max_dimension=5000)
+    raster.render()
+    assert _size(raster.get(0, 75)) == (750, 375)
+    assert len(fake_pdf2image.calls) == 1
+    assert raster.stats.on_demand_renders == 0
+
+
+def test_unplanned_page_rendered_on_demand(fake_pdf2image):
+    raster = PageRaster(b"%PDF-fake", {0: {72}})
+    raster.render()
+    raster.get(3, 72)
+    raster.get(3, 72)
+    assert raster.stats.on_demand_renders == 1
+    assert len(fake_pdf2image.calls) == 2
+
+
+def test_chunks_respect_chunk_size(fake_pdf2image, monkeypatch):
+    monkeypatch.setenv("RASTER_CHUNK_PAGES", "2")
+    raster = PageRaster(b"%PDF-fake", {pn: {72} for pn in range(5)})
+    raster.render()
+    assert sorted(fake_pdf2image.calls) == [(72, 1, 2), (72, 3, 4), (72, 5, 5)]
+
+
+# ── Session registry ─────────────────────────────────────────────────────────
+
+
+def test_session_serves_pdf_page_to_base64(fake_pdf2image):
+    pdf = b"%PDF-session"
+    with raster_session(pdf, {0: {72, 150}}) as raster:
+        assert active_raster_for(pdf) is raster
+        pdf_page_to_base64(pdf, 0, dpi=150)
+        pdf_page_to_base64(pdf, 0, dpi=72)
+        assert len(fake_pdf2image.calls) == 1
+    assert active_raster_for(pdf) is None
+    assert raster.stats.served == 2
+
+
+def test_session_is_keyed_by_identity(fake_pdf2image):
+    pdf = b"%PDF-a"
+    other = bytes(bytearray(b"%PDF-a"))  # equal content, different object
+    with raster_session(pdf, {0: {72}}):
+        assert active_raster_for(other) is None
+
+
+# ── plan_vision_renders ──────────────────────────────────────────────────────
+
+
+def test_plan_vision_renders_sample_mode():
+    plan = plan_vision_renders(10, "sample")
+    assert plan[0] == {DPI_COVER, DPI_ANNOTATIONS}
+    interior = sorted(pn for pn in plan if pn)
+    assert interior
+    assert all(DPI_ANNOTATIONS in plan[pn] for pn in interior)
+    # Hatching runs on the first two interior sample pages only
+    assert [pn for pn in interior if DPI_HATCHING in plan[pn]] == interior[:2]
+
+
+def test_plan_vision_renders_compliance_mode():
+    plan = plan_vision_renders(10, "compliance")
+    interior = sorted(pn for pn in plan if pn)
+    # Only the preview page gets annotation DPI; others need title blocks only
+    assert DPI_ANNOTATIONS in plan[interior[0]]
+    assert all(plan[pn] == {DPI_TITLE_BLOCK} for pn in interior[1:])
+    assert plan[0] == {DPI_COVER, DPI_TITLE_BLOCK}
+
+
+def test_plan_vision_renders_empty_pdf():
+    assert plan_vision_renders(0) == {}
@@ -0,0 +1,146 @@
+"""Tests for the set-based parcel summary refresh (src/parcel_summary.py)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import src.db as db_mod
+from src import parcel_summary as ps
+
+
+@pytest.fixture
+def duck(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_parcel_summary.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    monkeypatch.setattr(ps, "BACKEND", "duckdb")
+    conn = db_mod.get_connection()
+    db_mod.init_schema(conn)
+    db_mod.init_user_schema(conn)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS property_health ("
+        "block_lot VARCHAR PRIMARY KEY, tier VARCHAR NOT NULL)"
+    )
+    _seed(conn)
+    yield conn
+    conn.close()
+
+
+def _permit(conn, pn, block, lot, status, filed, number=None, street=None, hood="Mission"):
+    conn.execute(
+        "INSERT INTO permits (permit_number, block, lot, status, filed_date, "
+        "street_number, street_name, neighborhood) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [pn, block, lot, status, filed, number, street, hood],
+    )
+
+
+def _seed(conn):
+    # 0001/001: three permits, two neighborhoods, two inspections, at-risk
+    _permit(conn, "A1", "0001", "001", "issued", "2023-01-05", "10", "Main St")
+    _permit(conn, "A2", "0001", "001", "complete", "2024-06-01", "12", "Main St")
+    _permit(conn, "A3", "0001", "001", "filed", "2024-09-01", hood="Noe Valley")
+    for i, (block, lot) in enumerate([("0001", "001"), ("0001", "001"), ("0002", "002")]):
+        conn.execute(
+            "INSERT INTO inspections (id, reference_number, reference_number_type, block, lot) "
+            "VALUES (?, 'A1', 'permit', ?, ?)", [i, block, lot])
+    conn.execute("INSERT INTO property_health VALUES ('0001/001', 'at_risk')")
+    # 0002/002: one expired permit without an address
+    _permit(conn, "B1", "0002", "002", "expired", "2020-02-02")
+    # No block/lot: ignored
+    _permit(conn, "C1", None, None, "issued", "2024-01-01")
+
+
+def _rows(conn):
+    cols = ", ".join(ps._COLUMNS[:-1])
+    return {
+        (r[0], r[1]): dict(zip(ps._COLUMNS, r))
+        for r in conn.execute(f"SELECT {cols} FROM parcel_summary").fetchall()
+    }
+
+
+def _change(conn, change_id, pn, block, lot, detected_at):
+    conn.execute(
+        "INSERT INTO permit_changes (change_id, permit_number, change_date, new_status, "
+        "change_type, block, lot, detected_at) "
+        "VALUES (?, ?, CURRENT_DATE, 'issued', 'status_change', ?, ?, ?)",
+        [change_id, pn, block, lot, detected_at],
+    )
+
+
+class TestFullRefresh:
+
+    def test_aggregates_per_parcel(self, duck):
+        assert ps.refresh_parcel_summary(duck) == {"mode": "full", "parcels": 2}
+        rows = _rows(duck)
+        a = rows[("0001", "001")]
+        assert a["permit_count"] == 3
+        assert a["open_permit_count"] == 2
+        assert a["neighborhood"] == "Mission"
+        assert a["canonical_address"] == "12 MAIN ST"
+        assert a["inspection_count"] == 2
+        assert a["complaint_count"] == 0
+        assert a["health_tier"] == "at_risk"
+        assert str(a["last_permit_date"]).startswith("2024-09-01")
+        b = rows[("0002", "002")]
+        assert (b["permit_count"], b["open_permit_count"], b["inspection_count"]) == (1, 0, 1)
+        assert b["canonical_address"] is None and b["health_tier"] is None
+
+    def test_rebuild_swaps_in_a_fresh_table(self, duck):
+        ps.refresh_parcel_summary(duck)
+        duck.execute("DELETE FROM permits WHERE block = '0002'")
+        ps.refresh_parcel_summary(duck)
+        assert set(_rows(duck)) == {("0001", "001")}
+        tables = {r[0] for r in duck.execute(
+            "SELECT table_name FROM information_schema.tables").fetchall()}
+        assert ps.SHADOW not in tables and "parcel_summary_old" not in tables
+        # The swapped-in table keeps its primary key
+        duck.execute("INSERT OR REPLACE INTO parcel_summary (block, lot) VALUES ('0001', '001')")
+        assert duck.execute("SELECT COUNT(*) FROM parcel_summary").fetchone()[0] == 1
+
+
+class TestIncrementalRefresh:
+
+    def test_recomputes_only_the_delta(self, duck):
+        ps.refresh_parcel_summary(duck)
+        since = datetime.now() + timedelta(seconds=1)
+        duck.execute("UPDATE permits SET status = 'issued' WHERE permit_number = 'B1'")
+        _permit(duck, "D1", "0003", "003", "filed", "2025-01-01", "5", "Oak St")
+        _change(duck, 1, "B1", "0002", "002", since)
+        _change(duck, 2, "D1", "0003", "003", since)
+        # Changed but detected before the cutoff: not recomputed
+        duck.execute("UPDATE permits SET status = 'expired' WHERE permit_number = 'A3'")
+        _change(duck, 3, "A3", "0001", "001", since - timedelta(days=1))
+        duck.execute("UPDATE property_health SET tier = 'high_risk'")
+
+        stats = ps.refresh_parcel_summary(duck, incremental=True, since=since)
+        assert stats["mode"] == "incremental" and stats["parcels"] == 2
+        rows = _rows(duck)
+        assert rows[("0002", "002")]["open_permit_count"] == 1
+        assert rows[("0003", "003")]["canonical_address"] == "5 OAK ST"
+        assert rows[("0001", "001")]["open_permit_count"] == 2
+        # Health tiers re-sync for every parcel
+        assert rows[("0001", "001")]["health_tier"] == "high_risk"
+
+    def test_defaults_to_changes_since_last_refresh(self, duck):
+        ps.refresh_parcel_summary(duck)
+        _permit(duck, "D1", "0003", "003", "filed", "2025-01-01")
+        _change(duck, 1, "D1", "0003", "003", datetime.now() + timedelta(seconds=1))
+        assert ps.refresh_parcel_summary(duck, incremental=True)["parcels"] == 1
+        assert ("0003", "003") in _rows(duck)
+
+    def test_empty_table_falls_back_to_full(self, duck):
+        assert ps.refresh_parcel_summary(duck, incremental=True) == {"mode": "full", "parcels": 2}
+
+    def test_periodic_full_refresh_picks_up_other_counts(self, duck):
+        ps.refresh_parcel_summary(duck)
+        # A new inspection on a parcel without permit changes
+        duck.execute("INSERT INTO inspections (id, reference_number, reference_number_type, "
+                     "block, lot) VALUES (9, 'B1', 'permit', '0002', '002')")
+        assert ps.refresh_parcel_summary(duck, incremental=True)["mode"] == "incremental"
+        assert _rows(duck)[("0002", "002")]["inspection_count"] == 1
+
+        duck.execute("UPDATE parcel_summary SET refreshed_at = refreshed_at - INTERVAL 8 DAY")
+        assert ps.refresh_parcel_summary(duck, incremental=True) == {"mode": "full", "parcels": 2}
+        assert _rows(duck)[("0002", "002")]["inspection_count"] == 2
@@ -131,3 +131,20 @@ def test_concept_ranking_multiword_bonus():
     top_names = [name for name, _score in scored[:3]]
     assert "earthquake_brace_bolt" in top_names or "seismic" in top_names
     assert kb.get_step_confidence(6) == "medium"  # Timeline is the gap
+
+
+@pytest.mark.asyncio
+async def test_predict_permits_result_backs_markdown():
+    """The structured result carries the decisions the markdown renders."""
+    from src.tools.predict_permits import predict_permits_result, render_prediction
+    description = "Convert retail space to restaurant with grease trap and hood"
+    result = await predict_permits_result(project_description=description, estimated_cost=250000)
+    assert "restaurant" in result["detected_project_types"]
+    assert result["review_path"]["path"] == "in_house"
+    assert "DPH (Public Health)" in [a["agency"] for a in result["agency_routing"]]
+    md, meta = await predict_permits(
+        project_description=description, estimated_cost=250000, return_structured=True,
+    )
+    assert render_prediction(result) == md
+    assert f"**Form:** {result['permits_needed']['form']['form']}" in md
+    assert meta["result"]["review_path"] == result["review_path"]
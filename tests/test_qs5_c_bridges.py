@@ -27,8 +27,9 @@ class TestCheckOrphanInspections:
         """Green status when orphan rate < 5%."""
         from web.data_quality import _check_orphan_inspections
         with patch("web.data_quality._timed_query") as mock_q:
+            # inspections scan: (total, null_description, permit_type, orphans)
             # 2 orphans out of 100 permit-type inspections = 2%
-            mock_q.side_effect = [[(2,)], [(100,)]]
+            mock_q.return_value = [(500, 0, 100, 2)]
             result = _check_orphan_inspections()
             assert result["status"] == "green"
             assert "2.0%" in result["value"] or "2.00%" in result["value"]
@@ -38,7 +39,7 @@ class TestCheckOrphanInspections:
         from web.data_quality import _check_orphan_inspections
         with patch("web.data_quality._timed_query") as mock_q:
             # 10 orphans out of 100 = 10%
-            mock_q.side_effect = [[(10,)], [(100,)]]
+            mock_q.return_value = [(500, 0, 100, 10)]
             result = _check_orphan_inspections()
             assert result["status"] == "yellow"
 
@@ -47,7 +48,7 @@ class TestCheckOrphanInspections:
         from web.data_quality import _check_orphan_inspections
         with patch("web.data_quality._timed_query") as mock_q:
             # 20 orphans out of 100 = 20%
-            mock_q.side_effect = [[(20,)], [(100,)]]
+            mock_q.return_value = [(500, 0, 100, 20)]
             result = _check_orphan_inspections()
             assert result["status"] == "red"
 
@@ -56,7 +57,7 @@ class TestCheckOrphanInspections:
         from web.data_quality import _check_orphan_inspections
         with patch("web.data_quality._timed_query") as mock_q:
             # 15 orphans out of 100 = 15%
-            mock_q.side_effect = [[(15,)], [(100,)]]
+            mock_q.return_value = [(500, 0, 100, 15)]
             result = _check_orphan_inspections()
             assert result["status"] == "yellow"
 
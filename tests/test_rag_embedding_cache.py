@@ -0,0 +1,129 @@
+"""Tests for the persistent embedding cache and pluggable embedder."""
+
+import math
+
+import pytest
+
+from src.rag import embeddings
+from src.rag.embeddings import (
+    HashEmbedder,
+    embed_query,
+    embed_texts,
+    embedding_cache_key,
+    normalize_text,
+    set_embedder,
+)
+
+
+class CountingEmbedder(HashEmbedder):
+    """HashEmbedder that records every text it is asked to embed."""
+
+    def __init__(self, dimensions=16, batch_size=100):
+        super().__init__(dimensions)
+        self.batch_size = batch_size
+        self.calls: list[list[str]] = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+    @property
+    def embedded(self):
+        return [t for call in self.calls for t in call]
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "1")
+    from src.db import execute_write
+    execute_write("DELETE FROM embedding_cache")
+    emb = CountingEmbedder()
+    set_embedder(emb)
+    yield emb
+    set_embedder(None)
+
+
+def _cos(a, b):
+    return sum(x * y for x, y in zip(a, b)) / (
+        math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    )
+
+
+class TestHashEmbedder:
+
+    def test_deterministic_and_normalized(self):
+        emb = HashEmbedder(dimensions=64)
+        a1, a2 = emb.embed(["kitchen remodel permit", "kitchen remodel permit"])
+        assert a1 == a2
+        assert len(a1) == 64
+        assert pytest.approx(sum(v * v for v in a1)) == 1.0
+
+    def test_similar_texts_score_higher(self):
+        emb = HashEmbedder(dimensions=256)
+        base, near, far = emb.embed([
+            "kitchen remodel permit over the counter",
+            "over the counter kitchen remodel",
+            "seismic retrofit soft story ordinance",
+        ])
+        assert _cos(base, near) > _cos(base, far)
+
+
+class TestCacheKeys:
+
+    def test_whitespace_and_case_share_a_key(self):
+        assert normalize_text("  What is  OTC?\n") == "what is otc?"
+        assert embedding_cache_key("m", "What is OTC?") == embedding_cache_key("m", "what  is otc? ")
+
+    def test_model_is_part_of_the_key(self):
+        assert embedding_cache_key("a", "text") != embedding_cache_key("b", "text")
+
+
+class TestEmbedTexts:
+
+    def test_repeated_query_is_served_from_cache(self, embedder):
+        first = embed_query("What permits do I need for a deck?")
+        second = embed_query("what permits do I need for a  deck?")
+        assert first == pytest.approx(second)
+        assert len(embedder.calls) == 1
+
+    def test_unchanged_chunks_not_reembedded(self, embedder):
+        texts = [f"chunk number {i}" for i in range(30)]
+        stats = {}
+        first = embed_texts(texts, stats=stats)
+        assert stats == {"cached": 0, "embedded": 30}
+
+        # Drop the in-process LRU so the second pass has to go to the table
+        embeddings._lru.clear()
+        embedder.calls.clear()
+        stats = {}
+        second = embed_texts(texts + ["a brand new chunk"], stats=stats)
+        assert embedder.embedded == ["a brand new chunk"]
+        assert stats == {"cached": 30, "embedded": 1}
+        for a, b in zip(second[:30], first):
+            assert a == pytest.approx(b, abs=1e-6)
+
+    def test_duplicates_embedded_once_in_order(self, embedder):
+        result = embed_texts(["kitchen remodel", "seismic retrofit", "Kitchen  Remodel"])
+        assert embedder.embedded == ["kitchen remodel", "seismic retrofit"]
+        assert result[0] == result[2]
+        assert result[0] != result[1]
+
+    def test_batches_by_embedder_batch_size(self, embedder, monkeypatch):
+        monkeypatch.setenv("EMBED_CONCURRENCY", "3")
+        embedder.batch_size = 4
+        texts = [f"text {i}" for i in range(10)]
+        result = embed_texts(texts)
+        assert sorted(len(c) for c in embedder.calls) == [2, 4, 4]
+        assert result == HashEmbedder(16).embed(texts)
+
+    def test_disabled_cache_always_embeds(self, embedder, monkeypatch):
+        monkeypatch.setenv("EMBEDDING_CACHE_ENABLED", "0")
+        embed_query("same question")
+        embed_query("same question")
+        assert len(embedder.calls) == 2
+
+    def test_prune_keeps_recent_entries(self, embedder):
+        from src.rag.embeddings import prune_embedding_cache
+
+        embed_texts(["keep me"])
+        assert prune_embedding_cache(max_age_days=30) == 0
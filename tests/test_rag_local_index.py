@@ -0,0 +1,156 @@
+"""Tests for src/rag/local_index.py — local NumPy vector index backend."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.rag.local_index import (  # noqa: E402
+    LocalIndexWriter,
+    LocalVectorIndex,
+    get_local_index,
+    local_index_available,
+)
+
+
+def _records_and_vectors(n=40, dims=8, seed=3):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dims)).astype(np.float32)
+    records = [
+        {
+            "content": f"chunk {i}",
+            "source_file": f"file-{i % 4}.json",
+            "source_section": f"s{i}",
+            "source_tier": "amy" if i % 5 == 0 else "official",
+            "trust_weight": 0.9 if i % 5 == 0 else 1.0,
+            "metadata": {"tier": "tier1"},
+        }
+        for i in range(n)
+    ]
+    return records, vecs
+
+
+def _brute_force(vecs, q, rows=None):
+    unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    sims = unit @ (q / np.linalg.norm(q))
+    order = [int(i) for i in np.argsort(-sims)]
+    if rows is not None:
+        order = [i for i in order if i in rows]
+    return order
+
+
+class TestLocalVectorIndex:
+
+    def test_exact_search_matches_brute_force(self):
+        records, vecs = _records_and_vectors()
+        index = LocalVectorIndex.build(records, vecs)
+        q = vecs[7] + 0.05
+
+        results = index.search(q.tolist(), top_k=5)
+        expected = _brute_force(vecs, q)[:5]
+        assert [r["content"] for r in results] == [f"chunk {i}" for i in expected]
+        assert results[0]["similarity"] >= results[-1]["similarity"]
+        # Same dict shape as store.search
+        assert set(results[0]) == {
+            "content", "source_file", "source_section", "source_tier",
+            "trust_weight", "similarity", "metadata",
+        }
+
+    def test_tier_filter(self):
+        records, vecs = _records_and_vectors()
+        index = LocalVectorIndex.build(records, vecs)
+        results = index.search(vecs[3].tolist(), top_k=50, source_tier="amy")
+        assert len(results) == 8
+        assert all(r["source_tier"] == "amy" for r in results)
+        assert index.search(vecs[3].tolist(), source_tier="learned") == []
+
+    def test_save_load_roundtrip_memory_maps(self, tmp_path):
+        records, vecs = _records_and_vectors()
+        path = tmp_path / "idx"
+        LocalVectorIndex.build(records, vecs).save(path)
+
+        loaded = LocalVectorIndex.load(path)
+        assert isinstance(loaded.vectors, np.memmap)
+        assert len(loaded) == 40
+        assert loaded.dims == 8
+        hits = loaded.search(vecs[11].tolist(), top_k=1)
+        assert hits[0]["content"] == "chunk 11"
+        assert pytest.approx(hits[0]["similarity"], abs=1e-5) == 1.0
+
+    def test_dims_mismatch_raises(self):
+        records, vecs = _records_and_vectors()
+        index = LocalVectorIndex.build(records, vecs)
+        with pytest.raises(ValueError, match="dims"):
+            index.search([0.1] * 3)
+
+    def test_hnsw_search(self):
+        pytest.importorskip("hnswlib")
+        records, vecs = _records_and_vectors(n=200, dims=16)
+        index = LocalVectorIndex.build(records, vecs, with_hnsw=True)
+        assert index.has_hnsw
+        q = vecs[42]
+        results = index.search(q.tolist(), top_k=10)
+        exact = {f"chunk {i}" for i in _brute_force(vecs, q)[:10]}
+        assert results[0]["content"] == "chunk 42"
+        assert len({r["content"] for r in results} & exact) >= 8
+
+    def test_writer_builds_index_from_chunker_output(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RAG_LOCAL_INDEX_DIR", str(tmp_path / "idx"))
+        writer = LocalIndexWriter()
+        chunks = [
+            {"content": "OTC permits", "source_file": "otc.json", "source_section": "a", "metadata": {}},
+            {"content": "Fee tables", "source_file": "fees.json", "source_section": "b", "metadata": {}},
+        ]
+        writer.insert_chunks(chunks, [[1.0, 0.0], [0.0, 1.0]], source_tier="official", trust_weight=1.0)
+        writer.save()
+
+        assert local_index_available()
+        index = get_local_index()
+        hits = index.search([0.9, 0.1], top_k=1)
+        assert hits[0]["source_file"] == "otc.json"
+        assert index.get_stats()["total_chunks"] == 2
+
+
+class TestStoreBackendSelection:
+
+    def test_store_search_uses_local_backend(self, monkeypatch):
+        from src.rag import store
+
+        monkeypatch.setenv("RAG_VECTOR_BACKEND", "local")
+        fake = MagicMock()
+        fake.search.return_value = [{"content": "x", "similarity": 0.9}]
+        with patch("src.rag.local_index.get_local_index", return_value=fake), \
+                patch("src.rag.store._get_conn") as mock_conn:
+            results = store.search([0.1] * 8, top_k=3, source_tier="official")
+
+        assert results == [{"content": "x", "similarity": 0.9}]
+        fake.search.assert_called_once_with([0.1] * 8, top_k=3, source_tier="official")
+        mock_conn.assert_not_called()
+
+    def test_auto_prefers_pgvector_with_database_url(self, monkeypatch):
+        from src.rag.store import get_vector_backend
+
+        monkeypatch.setenv("RAG_VECTOR_BACKEND", "auto")
+        monkeypatch.setenv("DATABASE_URL", "postgresql://example/db")
+        assert get_vector_backend() == "pgvector"
+
+    def test_auto_uses_local_index_when_built(self, monkeypatch, tmp_path):
+        from src.rag.store import get_vector_backend
+
+        monkeypatch.setenv("RAG_VECTOR_BACKEND", "auto")
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        monkeypatch.setenv("RAG_LOCAL_INDEX_DIR", str(tmp_path / "missing"))
+        assert get_vector_backend() == "pgvector"
+
+        records, vecs = _records_and_vectors(n=4, dims=4)
+        LocalVectorIndex.build(records, vecs).save(tmp_path / "built")
+        monkeypatch.setenv("RAG_LOCAL_INDEX_DIR", str(tmp_path / "built"))
+        assert get_vector_backend() == "local"
+
+    def test_local_backend_without_index_returns_empty(self, monkeypatch, tmp_path):
+        from src.rag import store
+
+        monkeypatch.setenv("RAG_VECTOR_BACKEND", "local")
+        monkeypatch.setenv("RAG_LOCAL_INDEX_DIR", str(tmp_path / "missing"))
+        assert store.search([0.1] * 8) == []
@@ -254,3 +254,16 @@ async def test_revision_risk_correction_categories():
     )
     # Should include correction categories from the knowledge base
     assert "Title-24" in result or "Energy" in result or "Correction" in result
+
+
+@pytest.mark.asyncio
+async def test_revision_risk_result_backs_markdown():
+    """The structured result carries the risk level and rate the markdown renders."""
+    from src.tools.revision_risk import revision_risk, revision_risk_result, render_revision_risk
+    result = await revision_risk_result(permit_type="alterations")
+    assert result["stats"] is not None
+    assert result["risk_level"] in ("HIGH", "MODERATE", "LOW")
+    md = await revision_risk(permit_type="alterations")
+    assert render_revision_risk(result) == md
+    assert f"**Risk Level:** {result['risk_level']}" in md
+    assert f"{result['revision_rate']:.1%}" in md
@@ -0,0 +1,179 @@
+"""Tests for the per-permit routing summary (src/routing_summary.py)."""
+
+import pytest
+
+import src.db as db_mod
+from src import routing_summary as rs
+
+
+@pytest.fixture
+def duck(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_routing_summary.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    conn = db_mod.get_connection()
+    db_mod.init_schema(conn)
+    _seed(conn)
+    yield conn
+    conn.close()
+
+
+_NEXT_ID = [0]
+
+
+def _addenda(conn, pn, rev, step, station, arrive, finish=None, result=None, hold=None):
+    _NEXT_ID[0] += 1
+    conn.execute(
+        "INSERT INTO addenda (id, application_number, addenda_number, step, station, "
+        "department, plan_checked_by, arrive, finish_date, review_results, hold_description) "
+        "VALUES (?, ?, ?, ?, ?, 'DBI', 'REVIEWER', ?, ?, ?, ?)",
+        [_NEXT_ID[0], pn, rev, step, station, arrive, finish, result, hold],
+    )
+
+
+def _seed(conn):
+    # P1: revision 0 done, revision 1 in flight
+    _addenda(conn, "P1", 0, 1, "INTAKE", "2025-01-02", "2025-01-03", "Approved")
+    _addenda(conn, "P1", 0, 2, "BLDG", "2025-01-03", "2025-02-01", "Issued Comments")
+    _addenda(conn, "P1", 1, 1, "BLDG", "2025-03-01", "2025-03-10", "Approved")
+    _addenda(conn, "P1", 1, 2, "SFFD", "2025-03-10", None, None, "waiting on fire flow")
+    _addenda(conn, "P1", 1, 3, "CP-ZOC", "2025-03-10")
+    # P2: fully routed
+    _addenda(conn, "P2", 0, 1, "BLDG", "2025-01-01", "2025-01-20", "Approved")
+    _addenda(conn, "P2", 0, 2, "PERMIT-CTR", "2025-01-20", "2025-01-21", "Administrative")
+    # P3: routing rows without a revision number
+    _addenda(conn, "P3", None, 1, "BLDG", "2025-01-01")
+
+
+def _check_p1(summary):
+    assert summary["latest_addenda"] == 1
+    assert [s[0] for s in summary["steps"]] == ["BLDG", "SFFD", "CP-ZOC"]
+    assert summary["total_stations"] == 3
+    assert summary["completed_stations"] == 1
+    assert summary["approved_stations"] == 1
+    assert summary["pending_stations"] == 2
+    assert summary["current_station"] == "SFFD"
+    assert summary["latest_finish"] == "2025-03-10"
+    assert summary["stations_visited"] == ["BLDG", "CP-ZOC", "INTAKE", "SFFD"]
+
+
+class TestRoutingBatch:
+
+    def test_unbuilt_summary_reads_addenda(self, duck):
+        batch = rs.get_routing_batch(["P1", "P2", "P3", "NOPE"], conn=duck)
+        assert set(batch) == {"P1", "P2"}
+        _check_p1(batch["P1"])
+        assert batch["P2"]["current_station"] is None
+
+    def test_summary_table_matches_addenda(self, duck):
+        live = rs.get_routing_batch(["P1", "P2"], conn=duck)
+        assert rs.refresh_routing_summary(duck) == {"summarized": 2}
+        assert rs.is_ready(duck)
+        assert rs.get_routing_batch(["P1", "P2", "P3"], conn=duck) == live
+
+    def test_rebuild_spans_scan_pages_and_write_batches(self, duck, monkeypatch):
+        for i in range(5):
+            _addenda(duck, f"Q{i}", 0, 1, "BLDG", "2025-01-01")
+            _addenda(duck, f"Q{i}", 0, 2, "SFFD", "2025-01-02", "2025-01-05", "Approved")
+        live = rs.get_routing_batch(["P1", "P2"] + [f"Q{i}" for i in range(5)], conn=duck)
+        # P1's five rows straddle fetches; writes flush every two permits
+        monkeypatch.setattr(rs, "SCAN_ROWS", 3)
+        monkeypatch.setattr(rs, "PERMIT_CHUNK", 2)
+        assert rs.refresh_routing_summary(duck) == {"summarized": 7}
+        assert rs.get_routing_batch(list(live) + ["P3"], conn=duck) == live
+        _check_p1(live["P1"])
+
+    def test_delta_refresh(self, duck):
+        rs.refresh_routing_summary(duck)
+        duck.execute(
+            "UPDATE addenda SET finish_date = '2025-04-01', review_results = 'Approved' "
+            "WHERE application_number = 'P1' AND station = 'SFFD'"
+        )
+        _addenda(duck, "P4", 0, 1, "BLDG", "2025-04-01")
+        stale = rs.get_routing_batch(["P1"], conn=duck)["P1"]
+        assert stale["current_station"] == "SFFD"
+        assert rs.refresh_routing_summary(duck, ["P1", "P4"]) == {"permits": 2, "summarized": 2}
+        batch = rs.get_routing_batch(["P1", "P4"], conn=duck)
+        assert batch["P1"]["current_station"] == "CP-ZOC"
+        assert batch["P1"]["completed_stations"] == 2
+        assert batch["P4"]["pending_stations"] == 1
+
+    def test_delta_on_empty_table_rebuilds(self, duck):
+        assert rs.refresh_routing_summary(duck, ["P1"]) == {"summarized": 2}
+        assert set(rs.get_routing_batch(["P1", "P2"], conn=duck)) == {"P1", "P2"}
+
+
+class TestCallers:
+
+    def test_routing_progress_batch(self, duck):
+        from web.routing import get_routing_progress, get_routing_progress_batch
+
+        rs.refresh_routing_summary(duck)
+        progress = get_routing_progress_batch(["P1", "P2", "P3"])
+        assert set(progress) == {"P1", "P2"}
+        p1 = progress["P1"]
+        assert p1.addenda_number == 1
+        assert p1.completion_pct == 33
+        assert p1.pending_station_names == ["SFFD", "CP-ZOC"]
+        assert [s.station for s in p1.held_stations] == ["SFFD"]
+        assert p1.latest_activity.station == "BLDG"
+        assert progress["P2"].is_all_clear
+        assert get_routing_progress("P2").latest_activity.finish_date == "2025-01-21"
+        assert get_routing_progress("P3") is None
+
+    def test_similar_projects_routing_paths(self, duck):
+        from src.tools.similar_projects import _query_routing_paths
+
+        paths = _query_routing_paths(duck, ["P1", "P2", "P9"])
+        assert paths == {
+            "P1": ["BLDG", "CP-ZOC", "INTAKE", "SFFD"],
+            "P2": ["BLDG", "PERMIT-CTR"],
+        }
+
+    def test_gather_intel_routing(self, duck):
+        from web.routes_search import _gather_intel
+
+        duck.execute(
+            "INSERT INTO permits (permit_number, status, permit_type, description, "
+            "block, lot, filed_date) VALUES "
+            "('P1', 'filed', '8', 'kitchen remodel', '3512', '001', '2025-01-01'), "
+            "('P2', 'issued', '8', 'bath', '3512', '001', '2024-12-01')"
+        )
+        routing = {r["permit_number"]: r for r in _gather_intel("3512", "001")["routing"]}
+        assert routing["P1"]["stations_cleared"] == 1
+        assert routing["P1"]["stations_total"] == 3
+        assert routing["P1"]["current_station"] == "SFFD"
+        assert routing["P2"]["current_station"] == "Complete"
+
+    def test_ingest_continues_when_rebuild_fails(self, duck, monkeypatch):
+        import asyncio
+
+        import src.ingest as ingest_mod
+        import src.tool_cache as tool_cache
+
+        ran = []
+
+        def _ingest(name):
+            async def run(conn, client, *args, **kwargs):
+                ran.append(name)
+                return 0
+            return run
+
+        class _Client:
+            async def close(self):
+                pass
+
+        def _boom(conn=None, permit_numbers=None):
+            raise RuntimeError("summary rebuild failed")
+
+        for name in dir(ingest_mod):
+            if name.startswith("ingest_"):
+                monkeypatch.setattr(ingest_mod, name, _ingest(name))
+        monkeypatch.setattr(ingest_mod, "SODAClient", _Client)
+        monkeypatch.setattr(rs, "refresh_routing_summary", _boom)
+        monkeypatch.setattr(tool_cache, "bump_data_version", lambda: None)
+        results = asyncio.run(ingest_mod.run_ingestion())
+        assert "ingest_addenda" in ran and "ingest_permits" in ran
+        assert results["permits"] == 0
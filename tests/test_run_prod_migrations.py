@@ -30,8 +30,8 @@ from scripts.run_prod_migrations import (
 
 class TestMigrationRegistry:
     def test_migration_count(self):
-        """Fourteen migrations in the registry (Sprint 56D + Sprint 57.0 + Sprint 61B + Sprint 61D)."""
-        assert len(MIGRATIONS) == 14
+        """Fifteen migrations in the registry (Sprint 56D + Sprint 57.0 + Sprint 61B + Sprint 61D + address_key)."""
+        assert len(MIGRATIONS) == 15
 
     def test_all_have_names(self):
         """Every migration has a non-empty name."""
@@ -76,6 +76,7 @@ class TestMigrationRegistry:
             "neighborhood_backfill",
             "sprint61b_teams",
             "sprint61d_notify_columns",
+            "address_key",
         }
         actual = {m.name for m in MIGRATIONS}
         assert expected == actual
@@ -101,10 +102,11 @@ class TestMigrationRegistry:
         backfill_idx = names.index("neighborhood_backfill")
         assert share_idx < backfill_idx
 
-    def test_sprint61d_notify_is_last(self):
-        """'sprint61d_notify_columns' migration is last in registry."""
+    def test_address_key_is_last(self):
+        """'address_key' migration is last in registry, after sprint61d_notify_columns."""
         names = [m.name for m in MIGRATIONS]
-        assert names[-1] == "sprint61d_notify_columns"
+        assert names[-1] == "address_key"
+        assert names[-2] == "sprint61d_notify_columns"
 
     def test_schema_is_first(self):
         """'schema' migration runs first."""
@@ -0,0 +1,108 @@
+"""Tests for the chunked, resumable severity cache refresh (src/severity_cache.py)."""
+
+import json
+
+import pytest
+
+import src.db as db_mod
+from src import severity_cache as sc
+
+
+@pytest.fixture
+def duck(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_severity_cache.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    monkeypatch.setattr(sc, "BACKEND", "duckdb")
+    conn = db_mod.get_connection()
+    db_mod.init_schema(conn)
+    db_mod.init_user_schema(conn)
+    # 620 active permits (more than the old 500-row cap) and 30 completed ones
+    conn.execute("""
+        INSERT INTO permits (permit_number, status, permit_type_definition, description,
+                             filed_date, issued_date, estimated_cost)
+        SELECT printf('P%04d', i),
+               CASE WHEN i % 3 = 0 THEN 'issued' WHEN i % 3 = 1 THEN 'filed' ELSE 'APPROVED' END,
+               'additions alterations or repairs', 'kitchen remodel',
+               '2023-01-15', CASE WHEN i % 3 = 0 THEN '2023-06-01' END, 25000 + i
+        FROM range(620) r(i)
+    """)
+    conn.execute("""
+        INSERT INTO permits (permit_number, status, filed_date)
+        SELECT printf('X%04d', i), 'complete', '2020-01-01' FROM range(30) r(i)
+    """)
+    conn.execute("""
+        INSERT INTO inspections (id, reference_number, reference_number_type)
+        SELECT i, 'P0000', 'permit' FROM range(4) r(i)
+    """)
+    yield conn
+    conn.close()
+
+
+def _cache(conn):
+    return {r[0]: r[1:] for r in conn.execute(
+        "SELECT permit_number, score, tier, drivers FROM severity_cache").fetchall()}
+
+
+def test_scores_every_active_permit(duck):
+    stats = sc.refresh_severity_cache(duck, chunk_size=100, workers=1)
+    assert stats["done"] and stats["checkpoint"] is None
+    assert (stats["permits_scored"], stats["errors"], stats["chunks"]) == (620, 0, 7)
+    cache = _cache(duck)
+    assert len(cache) == 620 and not any(p.startswith("X") for p in cache)
+    score, tier, drivers = cache["P0000"]
+    assert 0 <= score <= 100 and tier in ("CRITICAL", "HIGH", "MEDIUM", "LOW", "GREEN")
+    assert set(json.loads(drivers)) >= {"inspection_activity", "cost_tier"}
+    # Checkpoint cleared once the pass completes
+    assert duck.execute(f"SELECT COUNT(*) FROM {sc.STATE_TABLE}").fetchone()[0] == 0
+
+
+def test_matches_scoring_one_permit_at_a_time(duck):
+    from src.severity import PermitInput, score_permit
+
+    sc.refresh_severity_cache(duck, chunk_size=250, workers=1)
+    row = duck.execute(
+        "SELECT permit_number, status, permit_type_definition, description, filed_date, "
+        "issued_date, completed_date, status_date, estimated_cost, revised_cost "
+        "FROM permits WHERE permit_number = 'P0000'").fetchone()
+    keys = ("permit_number", "status", "permit_type_definition", "description", "filed_date",
+            "issued_date", "completed_date", "status_date", "estimated_cost", "revised_cost")
+    expected = score_permit(PermitInput.from_dict(dict(zip(keys, row)), inspection_count=4))
+    assert _cache(duck)["P0000"][:2] == (expected.score, expected.tier)
+
+
+def test_resumes_from_checkpoint_under_a_budget(duck):
+    stats = sc.refresh_severity_cache(duck, chunk_size=100, workers=1, time_budget_s=0)
+    assert not stats["done"] and stats["checkpoint"] == "P0099"
+    assert stats["permits_scored"] == 100 and len(_cache(duck)) == 100
+
+    calls = 1
+    while not stats["done"]:
+        stats = sc.refresh_severity_cache(duck, chunk_size=100, workers=1, time_budget_s=0)
+        calls += 1
+    assert calls == 7 and stats["run_permits_scored"] == 620
+    assert len(_cache(duck)) == 620
+
+
+def test_merge_updates_existing_rows_and_prunes_inactive(duck):
+    duck.execute("INSERT INTO severity_cache (permit_number, score, tier, drivers, computed_at) "
+                 "VALUES ('P0001', -1, 'STALE', '{}', TIMESTAMP '2020-01-01'), "
+                 "('X0001', 50, 'MEDIUM', '{}', TIMESTAMP '2020-01-01')")
+    stats = sc.refresh_severity_cache(duck, chunk_size=1000, workers=1)
+    cache = _cache(duck)
+    assert cache["P0001"][1] != "STALE" and cache["P0001"][0] >= 0
+    assert "X0001" not in cache and stats["pruned"] == 1
+
+
+def test_restart_discards_checkpoint(duck):
+    sc.refresh_severity_cache(duck, chunk_size=100, workers=1, time_budget_s=0)
+    stats = sc.refresh_severity_cache(duck, chunk_size=1000, workers=1, restart=True)
+    assert stats["done"] and stats["permits_scored"] == 620
+
+
+def test_process_pool_scoring(duck):
+    stats = sc.refresh_severity_cache(duck, chunk_size=200, workers=2)
+    assert stats["done"] and stats["permits_scored"] == 620
+    assert len(_cache(duck)) == 620
@@ -37,6 +37,8 @@ class _NightlyMocks:
     def __enter__(self):
         targets = {
             "run_async": ("web.routes_cron.run_async", MagicMock(return_value={"status": "ok", "changes_inserted": 2})),
+            # Before execute_write: importing web.watch_index binds it
+            "watch_index": ("web.watch_index.rebuild_watch_index", MagicMock(return_value=3)),
             "execute_write": ("src.db.execute_write", MagicMock()),
             "run_triage": ("scripts.feedback_triage.run_triage", MagicMock(return_value={})),
             "admin_users": ("web.activity.get_admin_users", MagicMock(return_value=[])),
@@ -49,6 +51,7 @@ class _NightlyMocks:
             "dq_cache": ("web.data_quality.refresh_dq_cache", MagicMock(return_value={"checks": 12})),
             "signal_pipeline": ("src.signals.pipeline.run_signal_pipeline", MagicMock(return_value={"signals": 10})),
             "velocity_v2": ("src.station_velocity_v2.refresh_velocity_v2", MagicMock(return_value={"stations": 42})),
+            "parcel_summary": ("src.parcel_summary.refresh_parcel_summary", MagicMock(return_value={"mode": "incremental", "parcels": 4})),
             "transitions": ("src.tools.station_predictor.refresh_station_transitions", MagicMock(return_value={"transitions": 5})),
             "get_connection": ("src.db.get_connection", MagicMock(return_value=MagicMock())),
         }
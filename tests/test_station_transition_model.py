@@ -0,0 +1,184 @@
+"""Tests for the precomputed station transition model (src/station_transition_model.py).
+
+Builds the model over synthetic DuckDB permits + addenda and checks it
+reproduces predict_next_stations' live transition matrix, and that the
+same model feeds estimate_sequence_timeline and diagnose_stuck_permit.
+"""
+
+import random
+import shutil
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+
+from src import station_transition_model as stm
+from src.db import init_schema
+
+TODAY = date.today()
+
+TYPE = "additions alterations or repairs"
+# Routing templates: (station, days spent there before the next hop)
+ROUTES = [
+    [("INTAKE", 2), ("BLDG", 20), ("SFFD", 10), ("PERMIT-CTR", 1)],
+    [("INTAKE", 1), ("BLDG", 30), ("CP-ZOC", 15), ("PERMIT-CTR", 2)],
+    [("INTAKE", 3), ("CP-ZOC", 12), ("BLDG", 25), ("PERMIT-CTR", 1)],
+]
+
+
+@pytest.fixture(scope="module")
+def template(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("transition_model") / "template.duckdb")
+    rng = random.Random(3)
+    c = duckdb.connect(path)
+    init_schema(c)
+    permits, addenda = [], []
+    row_id = 0
+    for i in range(240):
+        pn = f"TM{i:05d}"
+        ptype = TYPE if i % 6 else "otc alterations permit"
+        nbhd = ["Mission", "SoMa", None][i % 3]
+        filed = TODAY - timedelta(days=rng.randint(60, 700) if i % 40 else 1500)
+        permits.append((pn, ptype, "filed", str(filed), nbhd))
+        arrive = filed + timedelta(days=5)
+        route = ROUTES[rng.randrange(2) if nbhd == "Mission" else rng.randrange(3)]
+        for step, (station, days) in enumerate(route):
+            days += rng.randint(0, 6)
+            finish = arrive + timedelta(days=days)
+            if finish > TODAY:
+                finish = None
+            result = "Administrative" if station == "INTAKE" and i % 5 == 0 else None
+            row_id += 1
+            addenda.append((row_id, pn, 0, step, station, str(arrive),
+                            str(finish) if finish else None, result))
+            if station == "BLDG" and i % 4 == 0:
+                # reassignment dupe at the same station
+                row_id += 1
+                addenda.append((row_id, pn, 0, step, station, str(arrive + timedelta(days=1)),
+                                None, None))
+            arrive = arrive + timedelta(days=days)
+    c.executemany(
+        "INSERT INTO permits (permit_number, permit_type_definition, status, filed_date, "
+        "neighborhood) VALUES (?, ?, ?, ?, ?)",
+        permits,
+    )
+    c.executemany(
+        "INSERT INTO addenda (id, application_number, addenda_number, step, station, "
+        "arrive, finish_date, review_results) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        addenda,
+    )
+    c.close()
+    return path
+
+
+@pytest.fixture
+def conn(template, tmp_path):
+    path = str(tmp_path / "model.duckdb")
+    shutil.copyfile(template, path)
+    c = duckdb.connect(path)
+    yield c
+    c.close()
+
+
+def _live(monkeypatch, conn, permit_type, neighborhood):
+    """_build_transition_matrix with the model switched off (live query path)."""
+    from src.tools.predict_next_stations import _build_transition_matrix
+
+    with monkeypatch.context() as m:
+        m.setattr(stm, "load_transitions", lambda *a, **k: None)
+        return _build_transition_matrix(conn, permit_type, neighborhood)
+
+
+class TestRefresh:
+
+    def test_refresh_builds_edges(self, conn):
+        assert not stm.is_ready(conn)
+        assert stm.load_transitions(conn, TYPE) is None
+        stats = stm.refresh_transition_model(conn)
+        assert stats["edges"] == conn.execute(
+            "SELECT COUNT(*) FROM station_transition_model").fetchone()[0]
+        assert stm.is_ready(conn)
+        # idempotent
+        assert stm.refresh_transition_model(conn) == stats
+
+    def test_rollup_and_unknown_cohort(self, conn):
+        stm.refresh_transition_model(conn)
+        assert stm.load_transitions(conn, "no such type") == {}
+        rollup = stm.load_transitions(conn, TYPE)
+        by_nbhd = [stm.load_transitions(conn, TYPE, n) for n in ("Mission", "SoMa")]
+        # rollup also counts permits without a neighborhood
+        assert rollup["BLDG"]["SFFD"] > sum(m["BLDG"].get("SFFD", 0) for m in by_nbhd)
+
+
+class TestParity:
+
+    @pytest.mark.parametrize("permit_type,neighborhood", [
+        (TYPE, None), (TYPE, "Mission"), (TYPE, "SoMa"), ("otc alterations permit", None),
+    ])
+    def test_matches_live_matrix(self, conn, monkeypatch, permit_type, neighborhood):
+        from src.tools.predict_next_stations import _build_transition_matrix
+
+        live = _live(monkeypatch, conn, permit_type, neighborhood)
+        stm.refresh_transition_model(conn)
+        assert live
+        assert _build_transition_matrix(conn, permit_type, neighborhood) == live
+
+    def test_dwell_percentiles_match_raw(self, conn):
+        stm.refresh_transition_model(conn)
+        (p50, n), = conn.execute(
+            "SELECT dwell_p50, dwell_n FROM station_transition_model "
+            "WHERE permit_type_definition = ? AND neighborhood = '*' "
+            "AND from_station = 'BLDG' AND to_station = 'SFFD'", [TYPE],
+        ).fetchall()
+        assert n >= 10
+        assert 20 <= p50 <= 26
+        dwell = stm.station_dwell(conn, TYPE, None, "BLDG")
+        assert dwell["period"] == "cohort"
+        assert dwell["sample_count"] >= n
+        assert dwell["p25_days"] <= dwell["p50_days"] <= dwell["p75_days"] <= dwell["p90_days"]
+
+
+class TestConsumers:
+
+    def test_next_stations_and_path(self, conn):
+        stm.refresh_transition_model(conn)
+        nxt = stm.next_stations(conn, TYPE, "Mission", "BLDG")
+        assert {n["station"] for n in nxt} == {"SFFD", "CP-ZOC"}
+        assert sum(n["probability"] for n in nxt) == pytest.approx(1.0)
+        assert nxt[0]["scope"] == "Mission"
+        path = stm.likely_path(conn, TYPE, "Mission", "INTAKE")
+        assert [p["station"] for p in path][0] == "BLDG"
+        assert path[-1]["station"] == "PERMIT-CTR"
+
+    def test_sequence_timeline_predicts_remaining(self, conn):
+        from src.tools.estimate_timeline import estimate_sequence_timeline
+
+        conn.execute(
+            "INSERT INTO permits (permit_number, permit_type_definition, status, "
+            "filed_date, neighborhood) VALUES ('LIVE1', ?, 'filed', ?, 'SoMa')",
+            [TYPE, str(TODAY - timedelta(days=30))],
+        )
+        conn.execute(
+            "INSERT INTO addenda (id, application_number, addenda_number, station, arrive) "
+            "VALUES (999999, 'LIVE1', 0, 'INTAKE', ?)", [str(TODAY - timedelta(days=3))],
+        )
+        assert "predicted_stations" not in estimate_sequence_timeline("LIVE1", conn)
+        stm.refresh_transition_model(conn)
+        result = estimate_sequence_timeline("LIVE1", conn)
+        predicted = result["predicted_stations"]
+        assert predicted[0]["status"] == "predicted"
+        assert "INTAKE" not in {p["station"] for p in predicted}
+        assert result["predicted_remaining_days"] > 0
+
+    def test_stuck_permit_uses_cohort_baseline(self, conn):
+        from src.tools.stuck_permit import _fetch_next_stations, _fetch_velocity
+
+        permit = {"permit_type_definition": TYPE, "neighborhood": "Mission"}
+        assert _fetch_velocity(conn, "BLDG", permit=permit) is None
+        stm.refresh_transition_model(conn)
+        velocity = _fetch_velocity(conn, "BLDG", permit=permit)
+        assert velocity["period"] == "cohort"
+        assert velocity["p90_days"] >= velocity["p50_days"]
+        # revision cycles keep the station-wide baselines
+        assert _fetch_velocity(conn, "BLDG", "revision", permit=permit) is None
+        assert [n["station"] for n in _fetch_next_stations(conn, permit, "CP-ZOC")] == ["PERMIT-CTR"]
@@ -0,0 +1,211 @@
+"""Tests for the permit statistics cube (src/stats_cube.py).
+
+Builds the cube over a synthetic DuckDB permits table and checks that the
+estimate tools' stat queries answer the same from the cube as from the raw
+scan they fall back to.
+"""
+
+import json
+import random
+import shutil
+from datetime import date, timedelta
+
+import duckdb
+import pytest
+
+from src import stats_cube
+from src.db import init_schema
+
+TODAY = date.today()
+
+TYPES = [
+    "additions alterations or repairs",
+    "otc alterations permit",
+    "new construction wood frame",
+    "Electrical Permit",
+]
+NEIGHBORHOODS = ["Mission", "SoMa", "Sunset/Parkside"]
+
+
+@pytest.fixture(scope="module")
+def template(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("stats_cube") / "template.duckdb")
+    rng = random.Random(11)
+    c = duckdb.connect(path)
+    init_schema(c)
+    rows = []
+    for i in range(1500):
+        ptype = TYPES[i % len(TYPES)]
+        cost = round(rng.lognormvariate(11, 1.4), 2)
+        filed = TODAY - timedelta(days=rng.randint(30, 900))
+        days = rng.randint(1, 400) if i % 7 else rng.randint(1200, 1500)
+        issued = filed + timedelta(days=days)
+        completed = issued + timedelta(days=rng.randint(10, 500))
+        revised = cost * rng.choice([1.0, 1.0, 1.2, 1.5]) if i % 3 else None
+        rows.append((
+            f"SC{i:05d}", ptype, "complete", str(filed),
+            str(issued) if issued <= TODAY else None, str(completed) if completed <= TODAY else None,
+            cost, revised, NEIGHBORHOODS[i % len(NEIGHBORHOODS)],
+        ))
+    c.executemany(
+        "INSERT INTO permits (permit_number, permit_type_definition, status, filed_date, "
+        "issued_date, completed_date, estimated_cost, revised_cost, neighborhood) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    c.close()
+    return path
+
+
+@pytest.fixture
+def conn(template, tmp_path):
+    path = str(tmp_path / "cube.duckdb")
+    shutil.copyfile(template, path)
+    c = duckdb.connect(path)
+    yield c
+    c.close()
+
+
+def _raw(monkeypatch, fn, *args):
+    """Call a tool query with the cube switched off (raw-scan path)."""
+    with monkeypatch.context() as m:
+        m.setattr(stats_cube, "_cells", lambda *a, **k: None)
+        return fn(*args)
+
+
+class TestRefresh:
+
+    def test_refresh_builds_cells(self, conn):
+        assert not stats_cube.is_ready(conn)
+        stats = stats_cube.refresh_stats_cube(conn)
+        assert stats["permits"] == 1500
+        assert stats["cells"] == conn.execute(
+            "SELECT COUNT(*) FROM permit_stats_cube").fetchone()[0]
+        assert stats_cube.is_ready(conn)
+        sketches = conn.execute(
+            "SELECT n_filed, cost_sketch FROM permit_stats_cube").fetchall()
+        for n, sketch in sketches:
+            expected = n if n <= stats_cube.RAW_MAX else len(stats_cube.SKETCH_LEVELS)
+            assert len(json.loads(sketch)) == expected
+        # idempotent: a second refresh replaces the cells
+        assert stats_cube.refresh_stats_cube(conn)["cells"] == stats["cells"]
+
+    def test_unbuilt_cube_returns_none(self, conn):
+        assert stats_cube.fee_stats(conn, "otc", None, 0, 1e6) is None
+        stats_cube.ensure_stats_cube_table(conn)
+        assert stats_cube.revision_stats(conn, None, None, None) is None
+
+
+class TestSketches:
+
+    def test_grid_cell_is_exact_on_grid(self):
+        grid = [float(v) for v in range(0, 210, 10)]
+        assert stats_cube.merge_quantiles([(500, grid)], (0.25, 0.5, 0.9)) == \
+            pytest.approx([50, 100, 180], abs=1e-6)
+
+    def test_raw_cells_match_percentile_cont(self):
+        a, b = [1.0, 4.0, 9.0], [2.0, 3.0, 10.0, 30.0]
+        assert stats_cube.merge_quantiles([(3, a), (4, b)], (0.5, 0.9)) == \
+            pytest.approx([4.0, 18.0])
+        assert stats_cube.merge_quantiles([(3, a), (4, b)], (0.5,), lo=2, hi=9) == \
+            pytest.approx([3.5])
+
+    def test_merge_and_clip(self):
+        a = [float(v) for v in range(0, 21)]
+        b = [float(v) for v in range(100, 121)]
+        (p50,) = stats_cube.merge_quantiles([(100, a), (300, b)], (0.5,))
+        assert 100 < p50 < 120
+        (clipped,) = stats_cube.merge_quantiles([(100, a), (300, b)], (0.5,), lo=0, hi=20)
+        assert clipped == pytest.approx(10, abs=1e-6)
+
+
+class TestToolParity:
+
+    @pytest.mark.parametrize("permit_type,neighborhood,review_path", [
+        ("alterations", "Mission", None),
+        ("alterations", None, "otc"),
+        (None, None, "in_house"),
+        (None, None, None),
+    ])
+    def test_revision_stats(self, conn, monkeypatch, permit_type, neighborhood, review_path):
+        from src.tools.revision_risk import _query_revision_stats
+
+        raw = _raw(monkeypatch, _query_revision_stats, conn, permit_type, neighborhood, review_path)
+        stats_cube.refresh_stats_cube(conn)
+        cube = _query_revision_stats(conn, permit_type, neighborhood, review_path)
+        assert raw is not None and cube is not None
+        for key in ("total_permits", "permits_with_cost_increase", "revision_proxy_rate",
+                    "avg_cost_increase_pct", "avg_days_no_change", "avg_days_with_change"):
+            assert cube[key] == pytest.approx(raw[key], abs=1), key
+        assert cube["p90_days"] == raw["p90_days"]
+
+    @pytest.mark.parametrize("permit_type,neighborhood,cost", [
+        ("alterations", None, 80_000),
+        ("new construction", "SoMa", 200_000),
+        (None, None, 30_000),
+    ])
+    def test_fee_stats(self, conn, monkeypatch, permit_type, neighborhood, cost):
+        from src.tools.estimate_fees import _query_fee_stats
+
+        args = (conn, permit_type, neighborhood, cost * 0.5, cost * 2.0)
+        raw = _raw(monkeypatch, _query_fee_stats, *args)
+        stats_cube.refresh_stats_cube(conn)
+        cube = _query_fee_stats(*args)
+        assert raw is not None and cube is not None
+        assert cube["sample_size"] == raw["sample_size"]
+        for key in ("p25_cost", "p50_cost", "p75_cost", "avg_cost"):
+            assert cube[key] == pytest.approx(raw[key], abs=0.02), key
+
+    @pytest.mark.parametrize("review_path,neighborhood,bracket,permit_type", [
+        ("in_house", None, None, None),
+        (None, "Mission", "under_50k", None),
+        (None, None, "50k_150k", "alterations"),
+    ])
+    def test_timeline_stats(self, conn, monkeypatch, review_path, neighborhood, bracket, permit_type):
+        from src.tools.estimate_timeline import _ensure_timeline_stats, _query_timeline
+
+        _ensure_timeline_stats(conn)
+        args = (conn, review_path, neighborhood, bracket, permit_type)
+        raw = _raw(monkeypatch, _query_timeline, *args)
+        stats_cube.refresh_stats_cube(conn)
+        cube = _query_timeline(*args)
+        assert raw is not None and cube is not None
+        assert cube["sample_size"] == raw["sample_size"]
+        for key in ("p25_days", "p50_days", "p75_days", "p90_days"):
+            assert cube[key] == raw[key], key
+
+    def test_completion_and_trend(self, conn, monkeypatch):
+        from src.tools.estimate_timeline import (
+            _ensure_timeline_stats, _query_completion, _query_trend,
+        )
+
+        _ensure_timeline_stats(conn)
+        raw_comp = _raw(monkeypatch, _query_completion, conn, "in_house")
+        raw_trend = _raw(monkeypatch, _query_trend, conn, None, None)
+        stats_cube.refresh_stats_cube(conn)
+        comp = _query_completion(conn, "in_house")
+        trend = _query_trend(conn, None, None)
+        assert comp["sample"] == raw_comp["sample"]
+        assert comp["p50_days"] == pytest.approx(raw_comp["p50_days"], rel=0.1)
+        assert trend == raw_trend
+
+    def test_large_cells_use_quantile_grid(self, conn, monkeypatch):
+        from src.tools.revision_risk import _query_revision_stats
+
+        rng = random.Random(5)
+        conn.executemany(
+            "INSERT INTO permits (permit_number, permit_type_definition, filed_date, "
+            "issued_date, estimated_cost, neighborhood) VALUES (?, ?, ?, ?, ?, 'Bayview')",
+            [(f"BIG{i:04d}", "additions alterations or repairs",
+              str(TODAY - timedelta(days=400)),
+              str(TODAY - timedelta(days=400 - rng.randint(1, 300))),
+              rng.uniform(60_000, 90_000)) for i in range(400)],
+        )
+        raw = _raw(monkeypatch, _query_revision_stats, conn, "alterations", "Bayview", None)
+        stats_cube.refresh_stats_cube(conn)
+        assert conn.execute(
+            "SELECT MAX(n_issued) FROM permit_stats_cube WHERE neighborhood = 'Bayview'"
+        ).fetchone()[0] > stats_cube.RAW_MAX
+        cube = _query_revision_stats(conn, "alterations", "Bayview", None)
+        assert cube["total_permits"] == raw["total_permits"] == 400
+        assert cube["p90_days"] == pytest.approx(raw["p90_days"], rel=0.02)
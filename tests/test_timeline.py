@@ -279,3 +279,18 @@ async def test_timeline_insufficient_data():
     )
     # Should either widen or report insufficient data
     assert "Timeline Estimate" in result
+
+
+@pytest.mark.asyncio
+async def test_timeline_result_backs_markdown():
+    """The structured result carries the percentiles the markdown renders."""
+    from src.tools.estimate_timeline import estimate_timeline, estimate_timeline_result, render_timeline
+    result = await estimate_timeline_result(permit_type="alterations", neighborhood="Mission")
+    primary = result["primary_result"]
+    assert primary["p25_days"] <= primary["p50_days"] <= primary["p75_days"]
+    md, meta = await estimate_timeline(
+        permit_type="alterations", neighborhood="Mission", return_structured=True,
+    )
+    assert render_timeline(result) == md
+    assert f"| 50th (typical) | {primary['p50_days']} |" in md
+    assert meta["headline"] == f"{primary['p50_days']} days typical"
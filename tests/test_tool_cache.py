@@ -0,0 +1,137 @@
+"""Tests for the MCP tool result cache (src/tool_cache.py)."""
+
+import asyncio
+import inspect
+from unittest.mock import MagicMock
+
+import pytest
+
+from src import tool_cache
+
+
+@pytest.fixture
+def counted_tool():
+    calls = []
+
+    @tool_cache.cached_tool
+    async def fake_tool(permit_type: str, cost: float, neighborhood: str | None = None,
+                        return_structured: bool = False):
+        """Fake tool."""
+        calls.append((permit_type, cost, neighborhood))
+        text = f"{permit_type}/{cost}/{neighborhood}"
+        return (text, {"n": len(calls)}) if return_structured else text
+
+    return fake_tool, calls
+
+
+class TestCachedTool:
+
+    def test_wrapper_keeps_tool_shape(self, counted_tool):
+        tool, _ = counted_tool
+        assert inspect.iscoroutinefunction(tool)
+        assert list(inspect.signature(tool).parameters) == [
+            "permit_type", "cost", "neighborhood", "return_structured"]
+        assert tool.__doc__ == "Fake tool."
+
+    def test_equivalent_calls_share_an_entry(self, counted_tool):
+        tool, calls = counted_tool
+        first = asyncio.run(tool("alterations", 50000))
+        again = asyncio.run(tool(permit_type="  alterations ", cost=50000, neighborhood=None))
+        assert first == again
+        assert len(calls) == 1
+        asyncio.run(tool("alterations", 50000, "Mission"))
+        assert len(calls) == 2
+        stats = tool_cache.cache_stats()["tools"]["fake_tool"]
+        assert stats == {"hits": 1, "misses": 2, "hit_rate": 0.333}
+
+    def test_structured_results_are_copies(self, counted_tool):
+        tool, calls = counted_tool
+        _, methodology = asyncio.run(tool("alterations", 1, return_structured=True))
+        methodology["n"] = 99
+        text, cached = asyncio.run(tool("alterations", 1, return_structured=True))
+        assert cached == {"n": 1} and len(calls) == 1
+        assert text == "alterations/1/None"
+
+    def test_bump_invalidates(self, counted_tool):
+        tool, calls = counted_tool
+        asyncio.run(tool("alterations", 1))
+        before = tool_cache.data_version()
+        assert tool_cache.bump_data_version() != before
+        asyncio.run(tool("alterations", 1))
+        assert len(calls) == 2
+
+    def test_lru_is_bounded(self, counted_tool, monkeypatch):
+        tool, calls = counted_tool
+        monkeypatch.setattr(tool_cache, "TOOL_CACHE_SIZE", 2)
+        for cost in (1, 2, 3):
+            asyncio.run(tool("alterations", cost))
+        assert tool_cache.cache_stats()["entries"] == 2
+        asyncio.run(tool("alterations", 1))  # evicted
+        assert len(calls) == 4
+
+    def test_exceptions_are_not_cached(self):
+        calls = []
+
+        @tool_cache.cached_tool
+        async def flaky(x: int):
+            calls.append(x)
+            if len(calls) == 1:
+                raise RuntimeError("db down")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(flaky(1))
+        assert asyncio.run(flaky(1)) == "ok"
+        assert asyncio.run(flaky(1)) == "ok"
+        assert len(calls) == 2
+
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    store = {}
+    client = MagicMock()
+    client.get.side_effect = store.get
+    client.set.side_effect = lambda k, v, ex=None, nx=False: (
+        None if nx and k in store else store.__setitem__(k, v.encode() if isinstance(v, str) else v))
+    monkeypatch.setattr(tool_cache, "_redis_client", client)
+    monkeypatch.setattr(tool_cache, "_redis_checked", True)
+    monkeypatch.setitem(tool_cache._version, "checked_at", 0.0)
+    return store
+
+
+class TestRedisSharing:
+
+    def test_results_and_version_shared_through_redis(self, counted_tool, redis_store):
+        store = redis_store
+        tool, calls = counted_tool
+        asyncio.run(tool("alterations", 1, return_structured=True))
+        tool_cache.clear()  # another worker: empty local LRU, same Redis
+        assert asyncio.run(tool("alterations", 1, return_structured=True)) == (
+            "alterations/1/None", {"n": 1})
+        assert len(calls) == 1
+
+        token = tool_cache.bump_data_version()
+        assert store[tool_cache._REDIS_VERSION_KEY] == token.encode()
+        asyncio.run(tool("alterations", 1))
+        assert len(calls) == 2
+
+    def test_redis_hits_are_copies(self, counted_tool, redis_store):
+        tool, calls = counted_tool
+        asyncio.run(tool("alterations", 1, return_structured=True))
+        tool_cache.clear()
+        _, methodology = asyncio.run(tool("alterations", 1, return_structured=True))
+        methodology["n"] = 99  # must not reach the local entry the hit filled
+        assert asyncio.run(tool("alterations", 1, return_structured=True))[1] == {"n": 1}
+        assert len(calls) == 1
+
+    def test_non_json_results_stay_local(self, redis_store):
+        from datetime import date
+
+        @tool_cache.cached_tool
+        async def dated(x: int):
+            return ("text", {"as_of": date(2025, 1, 2), "pair": (1, 2)})
+
+        first = asyncio.run(dated(1))
+        assert not any(k.startswith(tool_cache._REDIS_KEY_PREFIX + "dated:") for k in redis_store)
+        assert asyncio.run(dated(1)) == first
+        assert isinstance(asyncio.run(dated(1))[1]["as_of"], date)
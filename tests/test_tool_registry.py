@@ -0,0 +1,101 @@
+"""Tests for lazy MCP tool registration (src/tool_registry.py)."""
+
+import asyncio
+import inspect
+import subprocess
+import sys
+import typing
+
+import pytest
+
+from src import tool_registry
+
+
+class _FakeMCP:
+    def __init__(self):
+        self.tools = {}
+
+    def tool(self):
+        def register(fn):
+            self.tools[fn.__name__] = fn
+            return fn
+        return register
+
+
+class TestManifest:
+
+    def test_manifest_is_current(self):
+        assert tool_registry.load_manifest() == tool_registry.build_manifest(), (
+            "src/tool_manifest.json is stale — run: python -m src.tool_registry")
+
+    @pytest.mark.parametrize("entry", tool_registry.load_manifest(), ids=lambda e: e["name"])
+    def test_stub_matches_real_tool(self, entry):
+        real = inspect.unwrap(tool_registry._resolve(entry))
+        stub = tool_registry.lazy_tool(entry)
+        hints = typing.get_type_hints(real)
+        real_params = inspect.signature(real).parameters
+        stub_params = inspect.signature(stub).parameters
+        assert list(stub_params) == list(real_params)
+        for name, param in real_params.items():
+            assert stub_params[name].default == param.default
+            assert stub_params[name].kind == param.kind
+            assert stub_params[name].annotation == hints.get(name, inspect.Parameter.empty)
+        assert stub.__doc__ == real.__doc__
+        assert stub.__name__ == entry["name"]
+        assert inspect.iscoroutinefunction(stub)
+
+
+class TestRegistration:
+
+    def test_public_only_excludes_internal_tools(self):
+        all_names = tool_registry.register_tools(_FakeMCP())
+        public = tool_registry.register_tools(_FakeMCP(), public_only=True)
+        assert len(all_names) == 34 and len(public) == 28
+        assert set(all_names) - set(public) == {
+            "run_query", "read_source", "search_source", "schema_info", "list_tests",
+            "list_feedback",
+        }
+
+    def test_registration_imports_no_tool_modules(self):
+        code = (
+            "import sys\n"
+            "from src.tool_registry import register_tools\n"
+            "class M:\n"
+            "    def tool(self):\n"
+            "        return lambda fn: fn\n"
+            "register_tools(M())\n"
+            "heavy = ('src.tools', 'src.db', 'pypdf', 'PIL', 'anthropic', 'httpx', 'duckdb')\n"
+            "print(sorted(m for m in sys.modules if m.startswith(heavy)))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             cwd=str(tool_registry.PROJECT_ROOT), check=True)
+        assert out.stdout.strip() == "[]"
+
+    def test_first_call_loads_real_tool(self):
+        entry = next(e for e in tool_registry.load_manifest() if e["name"] == "required_documents")
+        stub = tool_registry.lazy_tool(entry)
+        assert not hasattr(stub, "__wrapped__")
+        result = asyncio.run(stub(permit_forms=["Form 3/8"], review_path="otc"))
+        assert isinstance(result, str) and result
+        assert stub.__wrapped__.__name__ == "required_documents"
+
+    def test_eager_mode(self, monkeypatch):
+        monkeypatch.setenv("MCP_LAZY_TOOLS", "0")
+        mcp = _FakeMCP()
+        tool_registry.register_tools(mcp, public_only=True)
+        from src.tools.estimate_fees import estimate_fees
+        assert mcp.tools["estimate_fees"] is estimate_fees
+
+
+class TestWarmUp:
+
+    def test_warm_up_loads_knowledge_base(self, monkeypatch):
+        from src.tools.knowledge_base import get_knowledge_base
+        get_knowledge_base.cache_clear()
+        monkeypatch.delenv("MCP_WARM_UP", raising=False)
+        tool_registry.start_warm_up().join(timeout=30)
+        assert get_knowledge_base.cache_info().currsize == 1
+
+    def test_warm_up_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("MCP_WARM_UP", "0")
+        assert tool_registry.start_warm_up() is None
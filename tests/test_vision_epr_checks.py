@@ -13,6 +13,9 @@ from pypdf import PdfWriter
 
 from src.vision.client import VisionResult, VisionUsageSummary
 from src.vision.epr_checks import (
+    DPI_ANNOTATIONS,
+    DPI_COVER,
+    DPI_HATCHING,
     run_vision_epr_checks,
     _parse_json_response,
     _select_sample_pages,
@@ -445,21 +448,23 @@ async def test_run_vision_full_pipeline():
     }
 
     call_count = 0
+    dpis: dict[str, set] = {}
 
-    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048):
+    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048, dpi=None):
         nonlocal call_count
         call_count += 1
         # Return appropriate data based on prompt content
         if "sheet count" in prompt.lower() or "page count" in prompt.lower():
-            data = cover_data
+            kind, data = "cover", cover_data
         elif "blank" in prompt.lower() and "8.5" in prompt:
-            data = blank_data
+            kind, data = "cover", blank_data
         elif "hatching" in prompt.lower():
-            data = hatch_data
+            kind, data = "hatching", hatch_data
         elif "annotate" in prompt.lower():
-            data = annotation_data
+            kind, data = "annotation", annotation_data
         else:
-            data = title_data
+            kind, data = "title_block", title_data
+        dpis.setdefault(kind, set()).add(dpi)
         return VisionResult(
             success=True,
             text=json.dumps(data),
@@ -472,6 +477,11 @@ async def test_run_vision_full_pipeline():
             with patch("src.vision.epr_checks.analyze_image", side_effect=mock_analyze):
                 results, extractions, annotations, usage = await run_vision_epr_checks(_make_pdf(5), 5)
 
+    # Each call carries the DPI its image was rendered at (result cache key)
+    assert dpis["cover"] == {DPI_COVER}
+    assert dpis["hatching"] == {DPI_HATCHING}
+    assert dpis["annotation"] == {DPI_ANNOTATIONS}
+
     assert len(results) == 11
     epr_ids = {r.epr_id for r in results}
     expected_ids = {
@@ -509,7 +519,7 @@ async def test_run_vision_analyze_all_pages():
     blank_data = {"has_blank_area": True, "estimated_size": "8.5x11", "location": "upper-right"}
     hatch_data = {"has_dense_hatching": False, "severity": "none"}
 
-    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048):
+    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048, dpi=None):
         if "sheet count" in prompt.lower() or "page count" in prompt.lower():
             data = cover_data
         elif "blank" in prompt.lower() and "8.5" in prompt:
@@ -549,7 +559,7 @@ async def test_run_vision_sample_pages_default():
     blank_data = {"has_blank_area": True, "estimated_size": "8.5x11", "location": "upper-right"}
     hatch_data = {"has_dense_hatching": False, "severity": "none"}
 
-    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048):
+    async def mock_analyze(b64, prompt, system_prompt=None, model=None, max_tokens=2048, dpi=None):
         if "sheet count" in prompt.lower() or "page count" in prompt.lower():
             data = cover_data
         elif "blank" in prompt.lower() and "8.5" in prompt:
@@ -0,0 +1,184 @@
+"""Tests for vision/result_cache.py — content-addressed Claude Vision cache.
+
+Uses a stubbed anthropic module and the session temp DuckDB from conftest.
+No real API calls are made.
+"""
+
+import sys
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.vision.client import (
+    analyze_image,
+    VisionCallRecord,
+    VisionUsageSummary,
+)
+from src.vision import result_cache
+
+
+# ── Fixtures ─────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def vision_cache(monkeypatch):
+    """Enable the cache and start each test with an empty table."""
+    from src.db import execute_write, init_user_schema
+
+    monkeypatch.setenv("VISION_CACHE_ENABLED", "1")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    init_user_schema()
+    execute_write("DELETE FROM vision_result_cache")
+    yield
+    execute_write("DELETE FROM vision_result_cache")
+
+
+@pytest.fixture
+def stub_client():
+    """Stubbed anthropic client that counts API calls."""
+    mock_mod = MagicMock()
+    mock_client = MagicMock()
+    mock_mod.AsyncAnthropic.return_value = mock_client
+
+    mock_response = MagicMock()
+    mock_response.content = [MagicMock(text='{"sheet_number": "A1.0"}')]
+    mock_response.usage = MagicMock(input_tokens=1200, output_tokens=80)
+    mock_client.messages.create = AsyncMock(return_value=mock_response)
+
+    with patch.dict(sys.modules, {"anthropic": mock_mod}):
+        yield mock_client
+
+
+# ── Key construction ─────────────────────────────────────────────────────────
+
+
+def test_cache_key_changes_with_each_component():
+    """Page content, DPI, prompt and model all participate in the key."""
+    page = result_cache.hash_page_image("page-a")
+    prompt = result_cache.hash_prompt("prompt", "system", 2048)
+    base = result_cache.make_cache_key(page, 150, prompt, "model-x")
+
+    assert base == result_cache.make_cache_key(page, 150, prompt, "model-x")
+    assert base != result_cache.make_cache_key(
+        result_cache.hash_page_image("page-b"), 150, prompt, "model-x")
+    assert base != result_cache.make_cache_key(page, 100, prompt, "model-x")
+    assert base != result_cache.make_cache_key(
+        page, 150, result_cache.hash_prompt("prompt", "system", 1500), "model-x")
+    assert base != result_cache.make_cache_key(page, 150, prompt, "model-y")
+
+
+def test_cache_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("VISION_CACHE_ENABLED", "0")
+    assert result_cache.is_cache_enabled() is False
+    monkeypatch.setenv("VISION_CACHE_ENABLED", "1")
+    assert result_cache.is_cache_enabled() is True
+
+
+# ── analyze_image integration ────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_second_call_served_from_cache(vision_cache, stub_client):
+    """Identical page + prompt only reaches the API once."""
+    first = await analyze_image("page-bytes", "extract title block", "sys")
+    second = await analyze_image("page-bytes", "extract title block", "sys")
+
+    assert stub_client.messages.create.await_count == 1
+    assert first.cached is False
+    assert second.cached is True
+    assert second.text == first.text
+    assert second.input_tokens == 1200
+    assert second.output_tokens == 80
+
+
+@pytest.mark.asyncio
+async def test_different_page_misses_cache(vision_cache, stub_client):
+    await analyze_image("page-one", "extract title block", "sys")
+    await analyze_image("page-two", "extract title block", "sys")
+    assert stub_client.messages.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_use_cache_false_forces_api_call(vision_cache, stub_client):
+    await analyze_image("page-bytes", "prompt")
+    result = await analyze_image("page-bytes", "prompt", use_cache=False)
+    assert stub_client.messages.create.await_count == 2
+    assert result.cached is False
+
+
+@pytest.mark.asyncio
+async def test_failed_results_not_cached(vision_cache, stub_client):
+    stub_client.messages.create = AsyncMock(side_effect=Exception("overloaded"))
+    failed = await analyze_image("page-bytes", "prompt")
+    assert failed.success is False
+
+    ok_response = MagicMock()
+    ok_response.content = [MagicMock(text="ok")]
+    ok_response.usage = MagicMock(input_tokens=10, output_tokens=5)
+    stub_client.messages.create = AsyncMock(return_value=ok_response)
+    result = await analyze_image("page-bytes", "prompt")
+    assert result.success is True
+    assert result.cached is False
+
+
+@pytest.mark.asyncio
+async def test_hit_count_tracked(vision_cache, stub_client):
+    for _ in range(3):
+        await analyze_image("page-bytes", "prompt")
+    stats = result_cache.get_cache_stats()
+    assert stats["entries"] == 1
+    assert stats["hits"] == 2
+    assert stats["saved_input_tokens"] == 2400
+
+
+# ── Eviction ─────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_prune_trims_to_max_entries(vision_cache, stub_client):
+    for i in range(5):
+        await analyze_image(f"page-{i}", "prompt")
+    # Make page-0 hot so it survives the size cap
+    await analyze_image("page-0", "prompt")
+
+    stats = result_cache.prune_vision_cache(max_age_days=90, max_entries=2)
+    assert stats["trimmed"] == 3
+    assert stats["remaining"] == 2
+
+    calls_before = stub_client.messages.create.await_count
+    await analyze_image("page-0", "prompt")
+    assert stub_client.messages.create.await_count == calls_before
+
+
+@pytest.mark.asyncio
+async def test_prune_expires_old_entries(vision_cache, stub_client):
+    from src.db import execute_write
+
+    await analyze_image("page-old", "prompt")
+    execute_write(
+        "UPDATE vision_result_cache "
+        "SET created_at = CURRENT_TIMESTAMP - INTERVAL '200 days'"
+    )
+    stats = result_cache.prune_vision_cache(max_age_days=90, max_entries=1000)
+    assert stats["expired"] == 1
+    assert stats["remaining"] == 0
+
+
+# ── Usage summary ────────────────────────────────────────────────────────────
+
+
+def test_usage_summary_counts_hits_as_savings():
+    usage = VisionUsageSummary()
+    usage.add_call(VisionCallRecord("title_block", 1, 900, 1000, 100, True))
+    usage.add_call(VisionCallRecord("title_block", 2, 0, 1000, 100, True, cached=True))
+
+    assert usage.total_calls == 2
+    assert usage.cache_hits == 1
+    assert usage.total_input_tokens == 1000
+    assert usage.saved_input_tokens == 1000
+    assert usage.saved_tokens == 1100
+    assert usage.estimated_savings_usd > 0
+
+    d = usage.to_dict()
+    assert d["cache_hits"] == 1
+    assert d["saved_tokens"] == 1100
+    assert d["calls"][1]["cached"] is True
@@ -0,0 +1,177 @@
+"""Tests for vision/scheduler.py — bounded, prioritized vision call admission.
+
+Scheduler tests use short sleeps in place of API calls. The client-reuse
+test stubs the anthropic module; no real API calls are made.
+"""
+
+import asyncio
+import base64
+import os
+import struct
+import sys
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.vision.client import analyze_image
+from src.vision.scheduler import (
+    DEFAULT_IMAGE_TOKENS,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    VisionScheduler,
+    current_job,
+    estimate_input_tokens,
+    vision_job,
+)
+
+
+async def _run_calls(scheduler, n, tracker, job_id=None, priority=None, hold=0.02):
+    """Run ``n`` fake calls under one job, recording peak concurrency."""
+
+    async def _one():
+        async with scheduler.slot(100):
+            tracker["now"] += 1
+            tracker["peak"] = max(tracker["peak"], tracker["now"])
+            if job_id is not None:
+                per_job = tracker.setdefault(job_id, {"now": 0, "peak": 0})
+                per_job["now"] += 1
+                per_job["peak"] = max(per_job["peak"], per_job["now"])
+            await asyncio.sleep(hold)
+            tracker["now"] -= 1
+            if job_id is not None:
+                tracker[job_id]["now"] -= 1
+
+    with vision_job(job_id, priority=priority):
+        await asyncio.gather(*[_one() for _ in range(n)])
+
+
+# ── Concurrency limits ───────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_cap():
+    scheduler = VisionScheduler(max_concurrency=2, per_job_concurrency=10)
+    tracker = {"now": 0, "peak": 0}
+    await _run_calls(scheduler, 8, tracker)
+    assert tracker["peak"] == 2
+    stats = scheduler.get_stats()
+    assert stats["granted"] == 8
+    assert stats["in_flight"] == 0
+    assert stats["max_queue_depth"] >= 6
+
+
+@pytest.mark.asyncio
+async def test_per_job_cap_lets_other_jobs_through():
+    scheduler = VisionScheduler(max_concurrency=4, per_job_concurrency=2)
+    tracker = {"now": 0, "peak": 0}
+    await asyncio.gather(
+        _run_calls(scheduler, 6, tracker, job_id="job-a"),
+        _run_calls(scheduler, 6, tracker, job_id="job-b"),
+    )
+    assert tracker["job-a"]["peak"] == 2
+    assert tracker["job-b"]["peak"] == 2
+    assert tracker["peak"] == 4
+
+
+@pytest.mark.asyncio
+async def test_interactive_admitted_before_batch():
+    scheduler = VisionScheduler(max_concurrency=1, per_job_concurrency=10)
+    order = []
+
+    async def _call(label, job_id, priority):
+        with vision_job(job_id, priority=priority):
+            async with scheduler.slot(100):
+                order.append(label)
+
+    blocker = await scheduler.acquire(100)
+    batch = [asyncio.create_task(_call(f"batch-{i}", "batch-job", PRIORITY_BATCH)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    interactive = asyncio.create_task(_call("interactive", "web", PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0.01)
+
+    stats = scheduler.get_stats()
+    assert stats["queue_depth_by_priority"] == {"interactive": 1, "batch": 3}
+
+    scheduler.release(blocker)
+    await asyncio.gather(*batch, interactive)
+    assert order[0] == "interactive"
+    assert "batch" in scheduler.get_stats()["wait_by_priority"]
+
+
+# ── Token budget and 429 back-off ────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_token_budget_holds_calls_over_budget():
+    scheduler = VisionScheduler(max_concurrency=10, per_job_concurrency=10, tokens_per_minute=1000)
+    first = await scheduler.acquire(600)
+    second = asyncio.create_task(scheduler.acquire(600))
+    await asyncio.sleep(0.05)
+    assert not second.done()
+    assert scheduler.get_stats()["queue_depth"] == 1
+
+    second.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await second
+    scheduler.release(first)
+    assert scheduler.get_stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_budget_reconciled_with_actual_tokens():
+    scheduler = VisionScheduler(max_concurrency=10, per_job_concurrency=10, tokens_per_minute=1000)
+    async with scheduler.slot(900) as slot:
+        slot.actual_tokens = 200
+    assert scheduler.get_stats()["tokens_last_minute"] == 200
+    # 200 + 600 fits the budget once the estimate has been corrected
+    granted = await asyncio.wait_for(scheduler.acquire(600), timeout=1)
+    scheduler.release(granted)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_admission():
+    scheduler = VisionScheduler(max_concurrency=4, per_job_concurrency=4, cooldown_secs=0.3)
+    scheduler.rate_limited()
+    slot = await scheduler.acquire(100)
+    scheduler.release(slot)
+    assert slot.wait_ms >= 250
+    assert scheduler.get_stats()["rate_limited"] == 1
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+
+def test_estimate_tokens_from_png_header():
+    header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 750, 400)
+    b64 = base64.b64encode(header + b"\x00" * 16).decode("ascii")
+    assert estimate_input_tokens(b64) == 400
+    assert estimate_input_tokens(b64, "x" * 40) == 410
+    assert estimate_input_tokens("not-a-png") == DEFAULT_IMAGE_TOKENS
+
+
+def test_vision_job_nesting():
+    assert current_job() == (None, PRIORITY_INTERACTIVE)
+    with vision_job("job-1", priority=PRIORITY_BATCH) as outer:
+        with vision_job() as inner:
+            assert inner == outer
+            assert current_job() == ("job-1", PRIORITY_BATCH)
+    with vision_job() as anon:
+        assert anon.startswith("anon-")
+    assert current_job() == (None, PRIORITY_INTERACTIVE)
+
+
+@pytest.mark.asyncio
+async def test_client_reused_across_calls():
+    mock_mod = MagicMock()
+    mock_client = MagicMock()
+    mock_mod.AsyncAnthropic.return_value = mock_client
+    response = MagicMock()
+    response.content = [MagicMock(text="ok")]
+    response.usage = MagicMock(input_tokens=10, output_tokens=5)
+    mock_client.messages.create = AsyncMock(return_value=response)
+
+    with patch.dict(sys.modules, {"anthropic": mock_mod}), \
+            patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
+        await asyncio.gather(*[analyze_image(f"page-{i}", "prompt") for i in range(5)])
+
+    assert mock_mod.AsyncAnthropic.call_count == 1
+    assert mock_client.messages.create.await_count == 5
@@ -0,0 +1,195 @@
+"""Tests for the materialized watch → permit index (web/watch_index.py)."""
+
+from datetime import date, timedelta
+
+import pytest
+
+import src.db as db_mod
+
+TODAY = date.today()
+
+
+@pytest.fixture(autouse=True)
+def _use_duckdb(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test_watch_index.duckdb")
+    monkeypatch.setenv("SF_PERMITS_DB", db_path)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(db_mod, "BACKEND", "duckdb")
+    monkeypatch.setattr(db_mod, "_DUCKDB_PATH", db_path)
+    import web.auth as auth_mod
+    monkeypatch.setattr(auth_mod, "_schema_initialized", False)
+    import web.brief as brief_mod
+    monkeypatch.setattr(brief_mod, "BACKEND", "duckdb")
+    db_mod.init_user_schema()
+    conn = db_mod.get_connection()
+    try:
+        db_mod.init_schema(conn)
+    finally:
+        conn.close()
+
+
+def _permit(pn, street_number="100", street_name="MAIN", block="3512", lot="001",
+            status="filed"):
+    conn = db_mod.get_connection()
+    try:
+        conn.execute(
+            "INSERT INTO permits (permit_number, status, status_date, filed_date, "
+            "street_number, street_name, street_suffix, block, lot, neighborhood, "
+            "permit_type_definition, estimated_cost) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'ST', ?, ?, 'Mission', 'otc alterations permit', 1000)",
+            [pn, status, str(TODAY), str(TODAY - timedelta(days=30)),
+             street_number, street_name, block, lot],
+        )
+    finally:
+        conn.close()
+
+
+def _contact(pn, entity_id):
+    conn = db_mod.get_connection()
+    try:
+        conn.execute(
+            "INSERT INTO contacts (id, permit_number, entity_id, role, source) "
+            "VALUES (?, ?, ?, 'contractor', 'building_permits')",
+            [abs(hash((pn, entity_id))) % 100000, pn, entity_id],
+        )
+    finally:
+        conn.close()
+
+
+def _user(n=0):
+    from web.auth import get_or_create_user
+    return get_or_create_user(f"wpi{n}@example.com")["user_id"]
+
+
+def _indexed(user_id, watch_type=None):
+    sql = "SELECT permit_number FROM watch_permit_index WHERE user_id = ?"
+    params = [user_id]
+    if watch_type:
+        sql += " AND watch_type = ?"
+        params.append(watch_type)
+    return sorted(r[0] for r in db_mod.query(sql, params))
+
+
+class TestIndexMaintenance:
+
+    def test_add_watch_indexes_each_type(self):
+        from web.auth import add_watch
+
+        _permit("BP1")
+        _permit("BP2", street_name="Main")
+        _permit("BP3", street_number="9", street_name="OAK", block="1200", lot="010")
+        _permit("BP4", street_number="1", street_name="PINE", block="0400", lot="004")
+        _contact("BP4", 7)
+        uid = _user()
+
+        add_watch(uid, "permit", permit_number="BP3")
+        add_watch(uid, "address", street_number="100", street_name="main")
+        add_watch(uid, "parcel", block="1200", lot="010")
+        add_watch(uid, "entity", entity_id=7)
+        add_watch(uid, "neighborhood", neighborhood="Mission")
+
+        assert _indexed(uid, "permit") == ["BP3"]
+        assert _indexed(uid, "address") == ["BP1", "BP2"]
+        assert _indexed(uid, "parcel") == ["BP3"]
+        assert _indexed(uid, "entity") == ["BP4"]
+        assert _indexed(uid, "neighborhood") == []
+
+    def test_remove_watch_drops_rows(self):
+        from web.auth import add_watch, remove_watch
+
+        _permit("BP1")
+        uid = _user()
+        watch = add_watch(uid, "address", street_number="100", street_name="MAIN")
+        assert _indexed(uid) == ["BP1"]
+        assert remove_watch(watch["watch_id"], uid)
+        assert _indexed(uid) == []
+
+    def test_index_permits_picks_up_new_filings(self):
+        from web.auth import add_watch
+        from web.watch_index import index_permits
+
+        uid = _user()
+        add_watch(uid, "parcel", block="3512", lot="001")
+        assert _indexed(uid) == []
+
+        _permit("BP9")
+        _permit("BP10", block="9999")
+        index_permits(["BP9", "BP10", None])
+        index_permits(["BP9"])  # idempotent
+        assert _indexed(uid) == ["BP9"]
+
+    def test_index_permits_drops_moved_permits(self):
+        from web.auth import add_watch
+        from web.watch_index import index_permits
+
+        _permit("BP1")
+        uid = _user()
+        add_watch(uid, "parcel", block="3512", lot="001")
+        add_watch(uid, "permit", permit_number="BP1")
+        db_mod.execute_write("UPDATE permits SET block = '9999' WHERE permit_number = 'BP1'")
+        index_permits(["BP1"])
+        assert _indexed(uid, "parcel") == []
+        assert _indexed(uid, "permit") == ["BP1"]
+
+    def test_rebuild_and_ensure(self):
+        from web.auth import add_watch
+        from web.watch_index import count_indexed, ensure_watch_index, rebuild_watch_index
+
+        a, b = _user(1), _user(2)
+        _permit("BP1")
+        add_watch(a, "permit", permit_number="BP1")
+        add_watch(b, "address", street_number="100", street_name="MAIN")
+
+        db_mod.execute_write("DELETE FROM watch_permit_index")
+        assert ensure_watch_index() == 2
+        assert ensure_watch_index() is None
+        assert rebuild_watch_index(a) == 1
+        assert count_indexed() == 2
+
+
+class TestConsumers:
+
+    def test_portfolio_reads_index(self):
+        from web.auth import add_watch
+        from web.portfolio import get_portfolio
+
+        _permit("BP1")
+        _permit("BP2", street_number="5", street_name="ELM", block="1", lot="1")
+        _contact("BP2", 3)
+        uid = _user()
+        add_watch(uid, "address", street_number="100", street_name="MAIN")
+        add_watch(uid, "entity", entity_id=3)
+
+        numbers = {
+            p["permit_number"] for prop in get_portfolio(uid)["properties"]
+            for p in prop["permits"]
+        }
+        assert numbers == {"BP1", "BP2"}
+
+    def test_property_snapshot_reads_index(self):
+        from web.auth import add_watch
+        from web.brief import _get_property_snapshot
+
+        _permit("BP1")
+        _permit("BP2", street_number="7", street_name="ELM", block="1", lot="1")
+        uid = _user()
+        add_watch(uid, "parcel", block="3512", lot="001")
+
+        cards = _get_property_snapshot(uid)
+        assert [(c["address"], c["total_permits"]) for c in cards] == [("100 Main St", 1)]
+
+    def test_action_items_expand_to_parcel(self, monkeypatch):
+        import web.intelligence as intel
+        from web.auth import add_watch
+
+        _permit("BP1")
+        _permit("BP2", street_number="102")  # same parcel, not directly watched
+        _permit("BP3", block="7777", status="complete")
+        uid = _user()
+        add_watch(uid, "permit", permit_number="BP1")
+
+        seen = []
+        monkeypatch.setattr(intel, "_rule_bundle_inspections",
+                            lambda permits, today: seen.extend(permits) or [])
+        intel.get_action_items(uid)
+        assert sorted(p["permit_number"] for p in seen) == ["BP1", "BP2"]
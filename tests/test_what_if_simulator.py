@@ -1,8 +1,8 @@
 """Tests for what_if_simulator tool.
 
-All underlying tool functions (predict_permits, estimate_timeline, estimate_fees,
-revision_risk) are mocked — these tests verify the orchestration logic, extraction
-helpers, and formatted output of simulate_what_if.
+All underlying tool computations (predict_permits_result, estimate_timeline_result,
+estimate_fees_result, revision_risk_result) are mocked — these tests verify the
+orchestration logic, headline formatting, and output of simulate_what_if.
 """
 
 import asyncio
@@ -11,12 +11,10 @@ from unittest.mock import AsyncMock, patch
 import pytest
 
 from src.tools.what_if_simulator import (
-    _extract_p50,
-    _extract_p75,
-    _extract_permits,
-    _extract_review_path,
-    _extract_revision_risk,
-    _extract_total_fee,
+    _parse_cost,
+    _permits_summary,
+    _review_path_label,
+    _revision_risk_label,
     simulate_what_if,
 )
 
@@ -29,206 +27,88 @@ def _run(coro):
     return asyncio.run(coro)
 
 
-# ---------------------------------------------------------------------------
-# Unit tests for extraction helpers
-# ---------------------------------------------------------------------------
-
-class TestExtractPermits:
-    def test_extracts_from_required_permits_section(self):
-        md = (
-            "# Permit Prediction\n\n"
-            "## Required Permits\n\n"
-            "- Alteration Permit (3 Application)\n"
-            "- Electrical permit required\n\n"
-            "## Review Path\n\nIn-house"
-        )
-        result = _extract_permits(md)
-        assert "Alteration" in result or "Electrical" in result
-
-    def test_falls_back_to_permit_type_header(self):
-        md = "**Permit Type:** Building Alteration\n\nSome other content."
-        result = _extract_permits(md)
-        assert result == "Building Alteration"
-
-    def test_returns_na_when_no_permits_found(self):
-        result = _extract_permits("No permit information here.")
-        assert result == "N/A"
-
-
-class TestExtractReviewPath:
-    def test_detects_otc(self):
-        md = "**Review Path:** OTC\n\nDetails follow."
-        assert _extract_review_path(md) == "OTC"
-
-    def test_detects_over_the_counter(self):
-        md = "**Review Path:** Over-the-Counter\n\nDetails."
-        assert _extract_review_path(md) == "OTC"
-
-    def test_detects_in_house(self):
-        md = "**Review Path:** In-house\n\nDetails."
-        assert _extract_review_path(md) == "In-house"
-
-    def test_returns_na_when_not_found(self):
-        assert _extract_review_path("Nothing relevant here.") == "N/A"
-
+def _prediction(path="likely_otc", form="Form 3/8", electrical=False, plumbing=False):
+    return {
+        "detected_project_types": ["general_alteration"],
+        "permits_needed": {
+            "building_permit": True,
+            "form": {"form": form, "reason": "", "notes": ""},
+            "electrical_permit": electrical,
+            "plumbing_permit": plumbing,
+        },
+        "review_path": {"path": path, "reason": "", "confidence": "high"},
+        "agency_routing": [],
+    }
 
-class TestExtractP50:
-    def test_extracts_p50_pattern(self):
-        md = "P50 timeline: 60 days based on historical data."
-        assert _extract_p50(md) == "60 days"
 
-    def test_extracts_range_pattern(self):
-        md = "Typical review: 30–60 business days."
-        result = _extract_p50(md)
-        assert "days" in result
-
-    def test_returns_na_when_not_found(self):
-        assert _extract_p50("No timeline data here.") == "N/A"
-
-
-class TestExtractP75:
-    def test_extracts_p75_pattern(self):
-        md = "P75: 90 days for 75th percentile projects."
-        assert _extract_p75(md) == "90 days"
-
-    def test_returns_na_when_not_found(self):
-        assert _extract_p75("No data here.") == "N/A"
-
-
-class TestExtractTotalFee:
-    def test_extracts_dbi_total_row(self):
-        md = (
-            "| Fee Component | Amount |\n"
-            "|---|---|\n"
-            "| Plan Review Fee | $1,200.00 |\n"
-            "| **Total DBI Fees** | **$3,450.00** |\n"
-        )
-        assert _extract_total_fee(md) == "$3,450.00"
-
-    def test_falls_back_to_first_currency(self):
-        md = "The estimated fee is $2,500 for your project."
-        result = _extract_total_fee(md)
-        assert result.startswith("$")
-
-    def test_returns_na_when_not_found(self):
-        assert _extract_total_fee("No fee information.") == "N/A"
-
-
-class TestExtractRevisionRisk:
-    def test_extracts_risk_level_and_rate(self):
-        md = (
-            "## Revision Probability\n\n"
-            "**Risk Level:** HIGH\n"
-            "**Revision Rate:** 24.5% of permits had cost increases during review\n"
-        )
-        result = _extract_revision_risk(md)
-        assert "HIGH" in result
-        assert "24.5%" in result
+MOCK_PREDICT_OTC = _prediction("likely_otc")
+MOCK_PREDICT_INHOUSE = _prediction("in_house", electrical=True)
+MOCK_TIMELINE = {"primary_result": {"p25_days": 20, "p50_days": 45, "p75_days": 75, "p90_days": 120}}
+MOCK_FEES_80K = {"total_dbi": 3013.6}
+MOCK_REVISION_RISK = {
+    "stats": {"total_permits": 12345, "revision_proxy_rate": 0.185},
+    "risk_level": "MODERATE",
+    "revision_rate": 0.185,
+}
 
-    def test_extracts_risk_level_only(self):
-        md = "**Risk Level:** MODERATE\nSome other text."
-        result = _extract_revision_risk(md)
-        assert "MODERATE" in result
 
-    def test_detects_luck_based_fallback(self):
-        md = "Based on SF DBI patterns, typical revision risk: 15-20% of permits."
-        result = _extract_revision_risk(md)
-        assert "MODERATE" in result or "15" in result
+# ---------------------------------------------------------------------------
+# Unit tests for headline helpers
+# ---------------------------------------------------------------------------
 
-    def test_returns_na_when_not_found(self):
-        assert _extract_revision_risk("No risk information.") == "N/A"
+class TestHeadlineHelpers:
+    def test_permits_summary_lists_trade_permits(self):
+        assert _permits_summary(_prediction()) == "Form 3/8"
+        assert _permits_summary(_prediction(form="Form 1/2", electrical=True, plumbing=True)) == (
+            "Form 1/2 + electrical, plumbing")
+
+    @pytest.mark.parametrize("path,label", [
+        ("otc", "OTC"), ("likely_otc", "OTC"), ("in_house", "In-house"),
+        ("likely_in_house", "In-house"), ("depends", "Depends"),
+    ])
+    def test_review_path_label(self, path, label):
+        assert _review_path_label(_prediction(path)) == label
+
+    def test_revision_risk_label(self):
+        assert _revision_risk_label(MOCK_REVISION_RISK) == "MODERATE (18.5%)"
+        assert _revision_risk_label({"stats": None}) == "MODERATE (15–20% est.)"
+
+    @pytest.mark.parametrize("description,cost", [
+        ("Kitchen remodel, $80K", 80000.0),
+        ("Kitchen remodel in the Mission, $80,000", 80000.0),
+        ("Kitchen remodel, 80K budget", 80000.0),
+        ("Kitchen remodel in the Mission", None),
+    ])
+    def test_parse_cost(self, description, cost):
+        assert _parse_cost(description) == cost
 
 
 # ---------------------------------------------------------------------------
 # Integration tests: simulate_what_if with mocked sub-tools
 # ---------------------------------------------------------------------------
 
-MOCK_PREDICT_OTC = (
-    "# Permit Prediction\n\n"
-    "**Permit Type:** Alterations\n\n"
-    "## Required Permits\n\n"
-    "- Building Alteration Permit (3 Application)\n\n"
-    "## Review Path\n\n"
-    "**Review Path:** OTC\n\n"
-    "**Confidence:** high"
-)
-
-MOCK_PREDICT_INHOUSE = (
-    "# Permit Prediction\n\n"
-    "**Permit Type:** Alterations\n\n"
-    "## Required Permits\n\n"
-    "- Building Alteration Permit (3 Application)\n"
-    "- Electrical permit\n\n"
-    "## Review Path\n\n"
-    "**Review Path:** In-house\n\n"
-    "**Confidence:** high"
-)
-
-MOCK_TIMELINE = (
-    "# Timeline Estimate\n\n"
-    "P50 timeline: 45 days based on historical data.\n"
-    "P75: 75 days for complex projects.\n\n"
-    "**Confidence:** medium"
-)
-
-MOCK_FEES_80K = (
-    "# Fee Estimate\n\n"
-    "**Construction Valuation:** $80,000\n\n"
-    "## DBI Building Permit Fees (Table 1A-A)\n\n"
-    "| Fee Component | Amount |\n"
-    "|---|---|\n"
-    "| Plan Review Fee | $1,200.00 |\n"
-    "| Permit Issuance Fee | $1,800.00 |\n"
-    "| CBSC Fee | $3.20 |\n"
-    "| SMIP Fee | $10.40 |\n"
-    "| **Total DBI Fees** | **$3,013.60** |\n"
-)
-
-MOCK_FEES_120K = (
-    "# Fee Estimate\n\n"
-    "**Construction Valuation:** $120,000\n\n"
-    "## DBI Building Permit Fees (Table 1A-A)\n\n"
-    "| Fee Component | Amount |\n"
-    "|---|---|\n"
-    "| Plan Review Fee | $1,800.00 |\n"
-    "| Permit Issuance Fee | $2,700.00 |\n"
-    "| CBSC Fee | $4.80 |\n"
-    "| SMIP Fee | $15.60 |\n"
-    "| **Total DBI Fees** | **$4,520.40** |\n"
-)
-
-MOCK_REVISION_RISK = (
-    "# Revision Risk Assessment\n\n"
-    "**Permit Type:** alterations\n\n"
-    "## Revision Probability\n\n"
-    "**Risk Level:** MODERATE\n"
-    "**Revision Rate:** 18.5% of permits had cost increases during review\n"
-    "**Sample Size:** 12,345 permits analyzed\n\n"
-    "**Confidence:** high"
-)
-
 
 @pytest.fixture
 def mock_sub_tools():
-    """Patch all four sub-tools used by simulate_what_if."""
+    """Patch all four sub-tool computations used by simulate_what_if."""
     with (
         patch(
-            "src.tools.what_if_simulator.predict_permits",
+            "src.tools.what_if_simulator.predict_permits_result",
             new_callable=AsyncMock,
             return_value=MOCK_PREDICT_OTC,
         ) as mock_predict,
         patch(
-            "src.tools.what_if_simulator.estimate_timeline",
+            "src.tools.what_if_simulator.estimate_timeline_result",
             new_callable=AsyncMock,
             return_value=MOCK_TIMELINE,
         ) as mock_timeline,
         patch(
-            "src.tools.what_if_simulator.estimate_fees",
+            "src.tools.what_if_simulator.estimate_fees_result",
             new_callable=AsyncMock,
             return_value=MOCK_FEES_80K,
         ) as mock_fees,
         patch(
-            "src.tools.what_if_simulator.revision_risk",
+            "src.tools.what_if_simulator.revision_risk_result",
             new_callable=AsyncMock,
             return_value=MOCK_REVISION_RISK,
         ) as mock_risk,
@@ -284,8 +164,8 @@ class TestSimulateWhatIfBasic:
         assert "Est. DBI Fees" in result
         assert "Revision Risk" in result
 
-    def test_extracted_values_appear_in_table(self, mock_sub_tools):
-        """Extracted values from mocked sub-tools should appear in the table."""
+    def test_headline_values_appear_in_table(self, mock_sub_tools):
+        """Headline values from the mocked structured results should appear in the table."""
         result = _run(
             simulate_what_if(
                 base_description="Kitchen remodel, $80K",
@@ -296,10 +176,11 @@ class TestSimulateWhatIfBasic:
         assert "OTC" in result
         # 45 days from mock timeline
         assert "45 days" in result
+        assert "75 days" in result
         # Fee from mock fees
-        assert "$3,013.60" in result or "3,013" in result
-        # MODERATE from mock risk
-        assert "MODERATE" in result
+        assert "$3,013.60" in result
+        # Risk level + rate from mock risk
+        assert "MODERATE (18.5%)" in result
 
     def test_delta_section_present_with_variations(self, mock_sub_tools):
         """Delta vs. Base section should appear when there are variations."""
@@ -384,22 +265,49 @@ class TestSimulateWhatIfEdgeCases:
         assert len(cell_content) <= 63, f"Description cell too long: {len(cell_content)} chars"
         assert "..." in cell_content, "Expected truncation ellipsis"
 
-    def test_sub_tools_called_once_per_scenario(self, mock_sub_tools):
-        """Each sub-tool should be called once per scenario."""
+    def test_identical_sub_tool_calls_are_shared(self, mock_sub_tools):
+        """Each distinct sub-tool call runs once, however many scenarios need it."""
         _run(
             simulate_what_if(
                 base_description="Kitchen remodel, $80K",
                 variations=[
                     {"label": "Add bathroom", "description": "Kitchen + bath, $120K"},
                     {"label": "Full ADU", "description": "ADU, $200K"},
+                    {"label": "Same as base", "description": "Kitchen remodel, $80K"},
                 ],
             )
         )
-        # 3 scenarios total → each tool called 3 times
+        # 3 distinct descriptions/costs → 3 predictions, fees and timelines
         assert mock_sub_tools["predict"].call_count == 3
         assert mock_sub_tools["timeline"].call_count == 3
         assert mock_sub_tools["fees"].call_count == 3
-        assert mock_sub_tools["risk"].call_count == 3
+        # All four scenarios are alterations → one revision risk lookup
+        mock_sub_tools["risk"].assert_called_once_with("alterations")
+
+    def test_scenarios_evaluated_concurrently(self, mock_sub_tools):
+        """Every scenario's prediction is in flight before any of them finishes."""
+        started = []
+        all_started = asyncio.Event()
+
+        async def predict(description, *args):
+            started.append(description)
+            if len(started) == 3:
+                all_started.set()
+            await asyncio.wait_for(all_started.wait(), timeout=5)
+            return MOCK_PREDICT_OTC
+
+        mock_sub_tools["predict"].side_effect = predict
+        result = _run(
+            simulate_what_if(
+                base_description="Kitchen remodel, $80K",
+                variations=[
+                    {"label": "Add bathroom", "description": "Kitchen + bath, $120K"},
+                    {"label": "Full ADU", "description": "ADU, $200K"},
+                ],
+            )
+        )
+        assert len(started) == 3
+        assert "predict_permits error" not in result
 
     def test_footer_present(self, mock_sub_tools):
         """Footer with limitations note should always be present."""
@@ -423,19 +331,19 @@ class TestSimulateWhatIfEdgeCases:
             return val
 
         with (
-            patch("src.tools.what_if_simulator.predict_permits", new=side_effect),
+            patch("src.tools.what_if_simulator.predict_permits_result", new=side_effect),
             patch(
-                "src.tools.what_if_simulator.estimate_timeline",
+                "src.tools.what_if_simulator.estimate_timeline_result",
                 new_callable=AsyncMock,
                 return_value=MOCK_TIMELINE,
             ),
             patch(
-                "src.tools.what_if_simulator.estimate_fees",
+                "src.tools.what_if_simulator.estimate_fees_result",
                 new_callable=AsyncMock,
                 return_value=MOCK_FEES_80K,
             ),
             patch(
-                "src.tools.what_if_simulator.revision_risk",
+                "src.tools.what_if_simulator.revision_risk_result",
                 new_callable=AsyncMock,
                 return_value=MOCK_REVISION_RISK,
             ),
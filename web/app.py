@@ -187,6 +187,9 @@ EXPECTED_TABLES = [
     "severity_cache",
     "request_metrics",
     "page_cache",
+    "vision_result_cache",
+    "embedding_cache",
+    "watch_permit_index",
 ]
 
 
@@ -291,6 +294,16 @@ def _run_startup_migrations():
                 tags        TEXT DEFAULT ''
             )
         """)
+        # Materialized watch → permit resolution (web.watch_index)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS watch_permit_index (
+                user_id     INTEGER NOT NULL,
+                watch_id    INTEGER NOT NULL,
+                watch_type  TEXT NOT NULL,
+                permit_number TEXT NOT NULL,
+                PRIMARY KEY (watch_id, permit_number)
+            )
+        """)
         cur.execute("""
             CREATE TABLE IF NOT EXISTS permit_changes (
                 change_id   SERIAL PRIMARY KEY,
@@ -335,6 +348,8 @@ def _run_startup_migrations():
         cur.execute("CREATE INDEX IF NOT EXISTS idx_auth_token ON auth_tokens (token)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_watch_user ON watch_items (user_id)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_watch_permit ON watch_items (permit_number)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_wpi_user ON watch_permit_index (user_id, watch_type)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_wpi_permit ON watch_permit_index (permit_number)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_pc_date ON permit_changes (change_date)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_pc_permit ON permit_changes (permit_number)")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_regwatch_status ON regulatory_watch (status)")
@@ -519,6 +534,7 @@ def _run_startup_migrations():
         cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS progress_detail TEXT")
         cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS vision_usage_json TEXT")
         cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS gallery_duration_ms INTEGER")
+        cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS render_stats_json TEXT")
         cur.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_tier TEXT DEFAULT 'free'")
         cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS analysis_mode TEXT DEFAULT 'sample'")
         cur.execute("ALTER TABLE plan_analysis_jobs ADD COLUMN IF NOT EXISTS pages_analyzed INTEGER")
@@ -737,6 +753,39 @@ def _run_startup_migrations():
             ON page_cache (cache_key) WHERE invalidated_at IS NOT NULL
         """)
 
+        # ── Vision result cache (content-addressed Claude Vision responses) ──
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS vision_result_cache (
+                cache_key TEXT PRIMARY KEY,
+                page_hash TEXT NOT NULL,
+                dpi INTEGER DEFAULT 0,
+                prompt_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response_text TEXT NOT NULL,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                last_hit_at TIMESTAMPTZ
+            )
+        """)
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_vision_cache_page ON vision_result_cache (page_hash)"
+        )
+
+        # ── Embedding cache (RAG vectors keyed by model + normalized text) ──
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                embedding BYTEA NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                last_used_at TIMESTAMPTZ
+            )
+        """)
+
         # ── Bulk table indexes ──────────────────────────────────
         _bulk_indexes = [
             ("idx_contacts_permit", "contacts", "permit_number"),
@@ -799,6 +848,13 @@ def _run_startup_migrations():
                     "Auto-seeded admin user: %s", admin_email
                 )
 
+        # ── Watch → permit index bootstrap (no-op once populated) ──
+        try:
+            from web.watch_index import ensure_watch_index
+            ensure_watch_index()
+        except Exception as e:
+            logger.warning("watch_permit_index bootstrap failed (non-fatal): %s", e)
+
         cur.execute("SELECT pg_advisory_unlock(20260226)")
 
         cur.execute("""
@@ -1480,6 +1536,18 @@ def health():
                 info["pool_stats"] = {"error": "unavailable"}
             # === END QS4-B ===
 
+            try:
+                from src.tool_cache import cache_stats
+                info["tool_cache"] = cache_stats()
+            except Exception:
+                info["tool_cache"] = {"error": "unavailable"}
+
+            try:
+                from src.vision.scheduler import get_scheduler_stats
+                info["vision_scheduler"] = get_scheduler_stats()
+            except Exception:
+                info["vision_scheduler"] = {"error": "unavailable"}
+
             # === QS8-T1-D: CACHE STATS ===
             try:
                 cache_stats: dict = {"backend": BACKEND}
@@ -1631,6 +1699,7 @@ _EXPECTED_SCHEMA = {
     "activity_log": ["log_id", "user_id", "action", "created_at"],
     "watch_items": ["watch_id", "user_id", "watch_type"],
     "permit_changes": ["change_id", "permit_number", "change_type"],
+    "permits": ["permit_number", "address_key"],
 }
 
 
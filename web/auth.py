@@ -9,6 +9,7 @@ from __future__ import annotations
 import logging
 import os
 import smtplib
+import threading
 import uuid
 from datetime import datetime, timedelta, timezone
 from email.message import EmailMessage
@@ -50,16 +51,24 @@ def validate_invite_code(code: str) -> bool:
     return code.strip() in INVITE_CODES
 
 _schema_initialized = False
+_schema_lock = threading.Lock()
 
 
 def _ensure_schema():
-    """Lazily initialize user tables for DuckDB dev mode."""
+    """Lazily initialize user tables for DuckDB dev mode.
+
+    Brief sections call this from pool threads at the same time; the lock
+    keeps their init_user_schema() migrations from racing each other.
+    """
     global _schema_initialized
     if _schema_initialized:
         return
-    if BACKEND == "duckdb":
-        init_user_schema()
-    _schema_initialized = True
+    with _schema_lock:
+        if _schema_initialized:
+            return
+        if BACKEND == "duckdb":
+            init_user_schema()
+        _schema_initialized = True
 
 
 # ── User CRUD ─────────────────────────────────────────────────────
@@ -411,6 +420,12 @@ def add_watch(user_id: int, watch_type: str, **kwargs) -> dict:
         finally:
             conn.close()
 
+    try:
+        from web.watch_index import index_watch
+        index_watch(watch_id, watch_type)
+    except Exception:
+        logger.warning("watch_permit_index update failed for watch %s", watch_id, exc_info=True)
+
     return {"watch_id": watch_id, "watch_type": watch_type, "label": label,
             "permit_number": permit_number, "street_number": street_number,
             "street_name": street_name, "block": block, "lot": lot,
@@ -436,6 +451,11 @@ def remove_watch(watch_id: int, user_id: int) -> bool:
             )
         finally:
             conn.close()
+    try:
+        from web.watch_index import unindex_watch
+        unindex_watch(watch_id, user_id)
+    except Exception:
+        logger.warning("watch_permit_index update failed for watch %s", watch_id, exc_info=True)
     return True
 
 
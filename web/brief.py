@@ -12,8 +12,14 @@ Provides six sections:
 from __future__ import annotations
 
 import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 
+from src.address_key import address_key
 from src.db import BACKEND, query, query_one, get_connection
 
 logger = logging.getLogger(__name__)
@@ -67,7 +73,8 @@ def _parse_date(text) -> date | None:
 # ── Main entry point ──────────────────────────────────────────────
 
 def get_morning_brief(user_id: int, lookback_days: int = 1,
-                      primary_address: dict | None = None) -> dict:
+                      primary_address: dict | None = None,
+                      batch=None, concurrent_sections: bool = True) -> dict:
     """Build the complete morning brief data structure.
 
     Args:
@@ -76,22 +83,86 @@ def get_morning_brief(user_id: int, lookback_days: int = 1,
         primary_address: Optional dict with ``street_number`` and ``street_name``
             for the user's primary (home) address.  When provided, a property
             synopsis section is included in the brief.
+        batch: Optional :class:`web.brief_batch.BriefBatch` prefetched for a
+            set of users (same lookback).  Sections it holds are split out of
+            the batch instead of queried; anything missing is computed here.
+        concurrent_sections: Run sections on the shared section pool with
+            deadlines.  Bulk senders that already build briefs in parallel
+            pass False to compute every section inline, without deadlines.
+
+    Independent sections run concurrently on a bounded pool (see
+    ``_evaluate_sections``); any that miss their deadline come back empty and
+    are listed in ``stale_sections``.
 
     Returns:
         Dict with keys: changes, health, inspections, new_filings,
-        team_activity, expiring, property_synopsis, summary, lookback_days.
+        team_activity, expiring, property_synopsis, summary, lookback_days,
+        stale_sections, section_timings (ms per computed section).
     """
     since = date.today() - timedelta(days=lookback_days)
-
-    changes = _get_watched_changes(user_id, since)
-    plan_reviews = _get_plan_review_activity(user_id, since)
-    health = _get_predictability(user_id)
-    inspections = _get_inspection_results(user_id, since)
-    new_filings = _get_new_filings(user_id, since)
-    team_activity = _get_team_activity(user_id, since)
-    expiring = _get_expiring_permits(user_id)
-    regulatory_alerts = _get_regulatory_alerts()
-    property_cards = _get_property_snapshot(user_id, lookback_days)
+    if batch is not None and batch.lookback_days != lookback_days:
+        batch = None
+
+    def lookup(name):
+        if batch is not None:
+            return batch.lookup(name, user_id)
+        return False, None
+
+    found, watch_rows = lookup("watched_permit_rows")
+    sections, stale_sections, section_timings = _evaluate_sections([
+        ("changes", _get_watched_changes, (user_id, since)),
+        ("plan_reviews", _get_plan_review_activity, (user_id, since)),
+        ("health", _get_predictability, (user_id,)),
+        ("inspections", _get_inspection_results, (user_id, since)),
+        ("new_filings", _get_new_filings, (user_id, since)),
+        ("team_activity", _get_team_activity, (user_id, since)),
+        ("expiring", _get_expiring_permits, (user_id,)),
+        ("regulatory_alerts", _get_regulatory_alerts, ()),
+        ("property_cards", _get_property_snapshot, (user_id, lookback_days)),
+        ("total_watches", _count_watches, (user_id,)),
+        # Data freshness from cron_log
+        ("last_refresh", _get_last_refresh, ()),
+        # Sprint 53 Session C: pipeline health section
+        ("pipeline_health", get_pipeline_health_for_brief, ()),
+        # Sprint 55 Session D: planning context, compliance calendar, data quality
+        ("planning_context", _get_planning_context, (user_id,)),
+        ("compliance_calendar", _get_compliance_calendar, (user_id,)),
+        ("data_quality", _get_data_quality, ()),
+        # Sprint 56 Session C: street use activity + nearby development
+        ("street_use_activity", get_street_use_activity_for_user, (user_id,)),
+        ("nearby_development", get_nearby_development_for_user, (user_id,)),
+        # Sprint 64: change velocity breakdown
+        ("change_velocity", _get_change_velocity, (since,)),
+        # QS3-A: Permit Prep summary
+        ("prep_summary", _get_prep_summary, (user_id,)),
+        # QS8-T1-B: Pipeline stats (last 5 nightly durations + 24h success/fail)
+        ("pipeline_stats", _get_pipeline_stats, ()),
+        # QS14: stuck diagnosis + delay cost alerts
+        ("stuck_alerts", _get_stuck_and_delay_alerts,
+         (user_id, watch_rows if found else None)),
+    ], lookup, concurrent=concurrent_sections)
+
+    changes = sections["changes"]
+    plan_reviews = sections["plan_reviews"]
+    health = sections["health"]
+    inspections = sections["inspections"]
+    new_filings = sections["new_filings"]
+    team_activity = sections["team_activity"]
+    expiring = sections["expiring"]
+    regulatory_alerts = sections["regulatory_alerts"]
+    property_cards = sections["property_cards"]
+    total_watches = sections["total_watches"]
+    last_refresh = sections["last_refresh"]
+    pipeline_health = sections["pipeline_health"]
+    planning_context = sections["planning_context"]
+    compliance_calendar = sections["compliance_calendar"]
+    data_quality = sections["data_quality"]
+    street_use_activity = sections["street_use_activity"]
+    nearby_development = sections["nearby_development"]
+    change_velocity = sections["change_velocity"]
+    prep_summary = sections["prep_summary"]
+    pipeline_stats = sections["pipeline_stats"]
+    stuck_alerts, delay_alerts = sections["stuck_alerts"]
 
     # Property synopsis for primary address
     property_synopsis = None
@@ -101,13 +172,6 @@ def get_morning_brief(user_id: int, lookback_days: int = 1,
             primary_address["street_name"],
         )
 
-    # Count watches
-    watch_count_row = query(
-        f"SELECT COUNT(*) FROM watch_items WHERE user_id = {_ph()} AND is_active = TRUE",
-        (user_id,),
-    )
-    total_watches = watch_count_row[0][0] if watch_count_row else 0
-
     at_risk = sum(1 for h in health if h.get("status") in ("behind", "at_risk"))
     enforcement_count = sum(
         1 for p in property_cards
@@ -136,7 +200,9 @@ def get_morning_brief(user_id: int, lookback_days: int = 1,
         changes_addresses.add(addr_key)
         # Look up which specific permits changed at this property to show
         # a meaningful description instead of just "activity Xd ago".
-        activity_permits = _get_recent_permit_activity(p, since)
+        activity_permits = batch.recent_permit_activity(p) if batch is not None else None
+        if activity_permits is None:
+            activity_permits = _get_recent_permit_activity(p, since)
         if activity_permits:
             # Add one change card per permit that had a status change
             for ap in activity_permits:
@@ -169,38 +235,291 @@ def get_morning_brief(user_id: int, lookback_days: int = 1,
         and p["days_since_activity"] <= lookback_days
     )
 
-    # Data freshness from cron_log
-    last_refresh = _get_last_refresh()
-    # Sprint 53 Session C: pipeline health section
-    pipeline_health = get_pipeline_health_for_brief()
+    return {
+        "changes": changes,
+        "plan_reviews": plan_reviews,
+        "health": health,
+        "inspections": inspections,
+        "new_filings": new_filings,
+        "team_activity": team_activity,
+        "expiring": expiring,
+        "regulatory_alerts": regulatory_alerts,
+        "property_cards": property_cards,
+        "property_synopsis": property_synopsis,
+        "last_refresh": last_refresh,
+        "planning_context": planning_context,
+        "compliance_calendar": compliance_calendar,
+        "data_quality": data_quality,
+        "street_use_activity": street_use_activity,
+        "nearby_development": nearby_development,
+        "change_velocity": change_velocity,
+        "prep_summary": prep_summary,
+        "pipeline_stats": pipeline_stats,
+        "summary": {
+            "total_watches": total_watches,
+            "total_properties": len(property_cards),
+            "changes_count": changed_count,
+            "plan_reviews_count": len(plan_reviews),
+            "at_risk_count": at_risk,
+            "enforcement_count": enforcement_count,
+            "inspections_count": len(inspections),
+            "new_filings_count": len(new_filings),
+            "team_count": len(team_activity),
+            "expiring_count": len(expiring),
+            "regulatory_count": len(regulatory_alerts),
+            "planning_context_count": len(planning_context),
+            "compliance_calendar_count": len(compliance_calendar),
+            "street_use_count": len(street_use_activity),
+            "nearby_development_count": len(nearby_development),
+        },
+        "lookback_days": lookback_days,
+        "pipeline_health": pipeline_health,
+        "stuck_alerts": stuck_alerts,
+        "delay_alerts": delay_alerts,
+        "stale_sections": stale_sections,
+        "section_timings": section_timings,
+    }
+
+
+def _count_watches(user_id: int) -> int:
+    row = query(
+        f"SELECT COUNT(*) FROM watch_items WHERE user_id = {_ph()} AND is_active = TRUE",
+        (user_id,),
+    )
+    return row[0][0] if row else 0
+
+
+# ── Parallel section evaluation ───────────────────────────────────
+#
+# Sections are independent reads, so they run concurrently on one shared,
+# bounded pool (which also caps how many pooled DB connections a burst of
+# /brief requests can hold).  One request keeps at most
+# BRIEF_SECTION_MAX_IN_FLIGHT sections on the pool, so concurrent briefs share
+# it instead of queueing behind each other.  Each section's deadline starts
+# when a worker picks it up — time spent queued does not count against it;
+# a section that misses it is replaced by its empty default and reported in
+# ``stale_sections`` instead of holding the whole brief hostage.  A timed-out
+# builder cannot be interrupted: it finishes in the background and keeps
+# counting against its request's in-flight cap until it does.  Sections that
+# have not started within BRIEF_SECTION_QUEUE_TIMEOUT_S are given up as well.
+
+BRIEF_SECTION_WORKERS = int(os.environ.get("BRIEF_SECTION_WORKERS", "8"))
+BRIEF_SECTION_MAX_IN_FLIGHT = int(os.environ.get("BRIEF_SECTION_MAX_IN_FLIGHT", "4"))
+BRIEF_SECTION_DEADLINE_S = float(os.environ.get("BRIEF_SECTION_DEADLINE_S", "8"))
+BRIEF_SECTION_QUEUE_TIMEOUT_S = float(os.environ.get("BRIEF_SECTION_QUEUE_TIMEOUT_S", "30"))
+# Per-section overrides of BRIEF_SECTION_DEADLINE_S (seconds)
+SECTION_DEADLINES_S: dict[str, float] = {
+    # Up to 10 stuck diagnoses per brief
+    "stuck_alerts": 12.0,
+}
+
+# Empty values substituted for a section that missed its deadline
+_SECTION_DEFAULTS = {
+    "total_watches": lambda: 0,
+    "last_refresh": lambda: None,
+    "pipeline_health": lambda: {"status": "unknown", "issues": [], "checks": []},
+    "data_quality": dict,
+    "change_velocity": dict,
+    "pipeline_stats": dict,
+    "stuck_alerts": lambda: ([], []),
+}
+
+_section_pool: ThreadPoolExecutor | None = None
+_section_pool_lock = threading.Lock()
+
+# Rolling per-section latency samples (ms) for p95 reporting
+SECTION_LATENCY_SAMPLES = 500
+_section_latency: dict[str, deque] = {}
+_section_stale_counts: dict[str, int] = {}
+_section_latency_lock = threading.Lock()
+
+
+def _get_section_pool() -> ThreadPoolExecutor:
+    global _section_pool
+    with _section_pool_lock:
+        if _section_pool is None:
+            _section_pool = ThreadPoolExecutor(
+                max_workers=BRIEF_SECTION_WORKERS, thread_name_prefix="brief-section",
+            )
+        return _section_pool
+
+
+def _timed_call(compute, args) -> tuple:
+    t0 = time.perf_counter()
+    value = compute(*args)
+    return value, (time.perf_counter() - t0) * 1000
+
+
+class _SectionRun:
+    """A section submitted to the pool; ``started`` is set once a worker runs it.
+
+    ``progress`` is set when the section starts, so the waiting request can
+    switch it from the queue timeout to its own deadline.
+    """
+
+    __slots__ = ("name", "started", "progress")
+
+    def __init__(self, name: str, progress: threading.Event):
+        self.name = name
+        self.started: float | None = None
+        self.progress = progress
+
+    def __call__(self, compute, args) -> tuple:
+        self.started = time.monotonic()
+        self.progress.set()
+        return _timed_call(compute, args)
+
+    def deadline(self, queue_deadline: float) -> float:
+        if self.started is None:
+            return queue_deadline
+        return self.started + SECTION_DEADLINES_S.get(self.name, BRIEF_SECTION_DEADLINE_S)
 
-    # Sprint 55 Session D: planning context, compliance calendar, data quality
-    planning_context = _get_planning_context(user_id)
-    compliance_calendar = _get_compliance_calendar(user_id)
-    data_quality = _get_data_quality()
 
-    # Sprint 56 Session C: street use activity + nearby development
-    street_use_activity = get_street_use_activity_for_user(user_id)
-    nearby_development = get_nearby_development_for_user(user_id)
+def _record_section_latency(name: str, elapsed_ms: float, stale: bool = False) -> None:
+    with _section_latency_lock:
+        samples = _section_latency.get(name)
+        if samples is None:
+            samples = _section_latency[name] = deque(maxlen=SECTION_LATENCY_SAMPLES)
+        samples.append(elapsed_ms)
+        if stale:
+            _section_stale_counts[name] = _section_stale_counts.get(name, 0) + 1
 
-    # Sprint 64: change velocity breakdown
-    change_velocity = _get_change_velocity(since)
 
-    # QS3-A: Permit Prep summary
-    prep_summary = _get_prep_summary(user_id)
+def _evaluate_sections(specs: list[tuple], lookup=None,
+                       concurrent: bool = True) -> tuple[dict, list[str], dict]:
+    """Evaluate brief sections, concurrently when a section pool is configured.
+
+    Args:
+        specs: ``(name, compute, args)`` tuples.
+        lookup: Optional ``lookup(name) -> (found, value)`` consulted first
+            (the prefetched :class:`~web.brief_batch.BriefBatch`); found
+            sections are not recomputed.
+        concurrent: False computes every section inline on the calling
+            thread (no deadlines, so nothing comes back stale).
+
+    Returns:
+        ``(values, stale_sections, section_timings)`` — values by section
+        name, the names that missed their deadline or never got a worker
+        (filled with empty defaults), and per-section compute time in
+        milliseconds.  Exceptions
+        raised by a builder propagate as they would when called inline.
+    """
+    values: dict = {}
+    stale: list[str] = []
+    timings: dict[str, float] = {}
+    pending = []
+    for name, compute, args in specs:
+        if lookup is not None:
+            found, value = lookup(name)
+            if found:
+                values[name] = value
+                continue
+        pending.append((name, compute, args))
+
+    if not concurrent or BRIEF_SECTION_WORKERS <= 0:
+        for name, compute, args in pending:
+            values[name], elapsed_ms = _timed_call(compute, args)
+            timings[name] = round(elapsed_ms, 1)
+            _record_section_latency(name, elapsed_ms)
+        return values, stale, timings
+
+    pool = _get_section_pool()
+    began = time.monotonic()
+    queue_deadline = began + BRIEF_SECTION_QUEUE_TIMEOUT_S
+    max_in_flight = max(1, BRIEF_SECTION_MAX_IN_FLIGHT)
+    waiting = deque(pending)
+    running: dict = {}       # future -> _SectionRun
+    abandoned: set = set()   # timed-out builders still holding a worker
+    progress = threading.Event()  # set when a section starts or finishes
+
+    def _give_up(name: str, started: float | None) -> None:
+        elapsed_ms = (time.monotonic() - (started or began)) * 1000
+        values[name] = _SECTION_DEFAULTS.get(name, list)()
+        stale.append(name)
+        _record_section_latency(name, elapsed_ms, stale=True)
+        timings[name] = round(elapsed_ms, 1)
+        if started is None:
+            logger.warning("Brief section %s never started after %.0fms", name, elapsed_ms)
+        else:
+            logger.warning("Brief section %s missed its deadline after %.0fms", name, elapsed_ms)
+
+    while waiting or running:
+        progress.clear()
+        now = time.monotonic()
+        for future, run in list(running.items()):
+            if future.done():
+                del running[future]
+                values[run.name], elapsed_ms = future.result()
+                timings[run.name] = round(elapsed_ms, 1)
+                _record_section_latency(run.name, elapsed_ms)
+            elif now >= run.deadline(queue_deadline):
+                del running[future]
+                if not future.cancel():
+                    abandoned.add(future)
+                _give_up(run.name, run.started)
+        if waiting and now >= queue_deadline:
+            while waiting:
+                _give_up(waiting.popleft()[0], None)
+
+        abandoned = {f for f in abandoned if not f.done()}
+        while waiting and len(running) + len(abandoned) < max_in_flight:
+            name, compute, args = waiting.popleft()
+            run = _SectionRun(name, progress)
+            future = pool.submit(run, compute, args)
+            future.add_done_callback(lambda _f: progress.set())
+            running[future] = run
+
+        if waiting or running:
+            wake = min([run.deadline(queue_deadline) for run in running.values()]
+                       + ([queue_deadline] if waiting else []))
+            progress.wait(max(0.0, wake - time.monotonic()))
+
+    order = {name: i for i, (name, _, _) in enumerate(pending)}
+    stale.sort(key=order.get)
+
+    if timings:
+        slowest = max(timings, key=timings.get)
+        logger.debug("Brief sections: slowest=%s (%.0fms) stale=%s",
+                     slowest, timings[slowest], stale)
+    return values, stale, timings
+
+
+def get_section_latency_stats() -> list[dict]:
+    """Per-section latency percentiles from this process, slowest p95 first."""
+    with _section_latency_lock:
+        snapshot = {name: sorted(samples) for name, samples in _section_latency.items()}
+        stale_counts = dict(_section_stale_counts)
+
+    def _pct(values: list[float], pct: float) -> float:
+        idx = min(len(values) - 1, int(round(pct * (len(values) - 1))))
+        return round(values[idx], 1)
+
+    stats = [
+        {
+            "section": name,
+            "count": len(values),
+            "p50_ms": _pct(values, 0.50),
+            "p95_ms": _pct(values, 0.95),
+            "max_ms": round(values[-1], 1),
+            "stale": stale_counts.get(name, 0),
+        }
+        for name, values in snapshot.items() if values
+    ]
+    return sorted(stats, key=lambda s: s["p95_ms"], reverse=True)
 
-    # QS8-T1-B: Pipeline stats (last 5 nightly durations + 24h success/fail)
-    pipeline_stats = _get_pipeline_stats()
 
-    # === QS14: Stuck diagnosis alerts ===
+def _get_stuck_and_delay_alerts(user_id: int,
+                                watch_rows: list[tuple] | None = None) -> tuple[list, list]:
+    """QS14: stuck diagnosis alerts for watched permits, plus delay cost for the top 3."""
     stuck_alerts = []
     try:
         from web.intelligence_helpers import get_stuck_diagnosis_sync
         # Check each watched permit for stuck status
-        watch_rows = query(
-            f"SELECT permit_number FROM watch_items WHERE user_id = {_ph()} AND is_active = TRUE",
-            (user_id,),
-        )
+        if watch_rows is None:
+            watch_rows = query(
+                f"SELECT permit_number FROM watch_items WHERE user_id = {_ph()} AND is_active = TRUE",
+                (user_id,),
+            )
         for row in (watch_rows or [])[:10]:  # max 10 to limit latency
             pn = row[0]
             if not pn:
@@ -216,9 +535,7 @@ def get_morning_brief(user_id: int, lookback_days: int = 1,
                 })
     except Exception as e:
         logger.warning("Stuck alerts failed: %s", e)
-    # === END QS14 stuck ===
 
-    # === QS14: Delay cost alerts ===
     delay_alerts = []
     try:
         from web.intelligence_helpers import get_delay_cost_sync
@@ -240,50 +557,7 @@ def get_morning_brief(user_id: int, lookback_days: int = 1,
                 })
     except Exception as e:
         logger.warning("Delay alerts failed: %s", e)
-    # === END QS14 delay ===
-
-    return {
-        "changes": changes,
-        "plan_reviews": plan_reviews,
-        "health": health,
-        "inspections": inspections,
-        "new_filings": new_filings,
-        "team_activity": team_activity,
-        "expiring": expiring,
-        "regulatory_alerts": regulatory_alerts,
-        "property_cards": property_cards,
-        "property_synopsis": property_synopsis,
-        "last_refresh": last_refresh,
-        "planning_context": planning_context,
-        "compliance_calendar": compliance_calendar,
-        "data_quality": data_quality,
-        "street_use_activity": street_use_activity,
-        "nearby_development": nearby_development,
-        "change_velocity": change_velocity,
-        "prep_summary": prep_summary,
-        "pipeline_stats": pipeline_stats,
-        "summary": {
-            "total_watches": total_watches,
-            "total_properties": len(property_cards),
-            "changes_count": changed_count,
-            "plan_reviews_count": len(plan_reviews),
-            "at_risk_count": at_risk,
-            "enforcement_count": enforcement_count,
-            "inspections_count": len(inspections),
-            "new_filings_count": len(new_filings),
-            "team_count": len(team_activity),
-            "expiring_count": len(expiring),
-            "regulatory_count": len(regulatory_alerts),
-            "planning_context_count": len(planning_context),
-            "compliance_calendar_count": len(compliance_calendar),
-            "street_use_count": len(street_use_activity),
-            "nearby_development_count": len(nearby_development),
-        },
-        "lookback_days": lookback_days,
-        "pipeline_health": pipeline_health,
-        "stuck_alerts": stuck_alerts,
-        "delay_alerts": delay_alerts,
-    }
+    return stuck_alerts, delay_alerts
 
 
 # ── Section 1: What Changed ──────────────────────────────────────
@@ -355,7 +629,11 @@ def _get_watched_changes(user_id: int, since: date) -> list[dict]:
     )
     results.extend(_rows_to_changes(rows, "neighborhood"))
 
-    # Deduplicate (a permit could match multiple watches)
+    return _dedupe_changes(results)
+
+
+def _dedupe_changes(results: list[dict]) -> list[dict]:
+    """Deduplicate (a permit could match multiple watches), keeping first."""
     seen = set()
     unique = []
     for r in results:
@@ -409,8 +687,8 @@ def _get_recent_permit_activity(prop: dict, since: date) -> list[dict]:
     elif addr:
         parts = addr.split(None, 1)
         if len(parts) >= 2:
-            conditions.append(f"(p.street_number = {ph} AND UPPER(p.street_name) LIKE UPPER({ph}))")
-            params.extend([parts[0], f"%{parts[1]}%"])
+            conditions.append(f"(p.street_number = {ph} AND p.address_key = {ph})")
+            params.extend([parts[0], address_key(parts[0], parts[1])])
 
     if not conditions:
         return []
@@ -434,10 +712,14 @@ def _get_recent_permit_activity(prop: dict, since: date) -> list[dict]:
     if not rows:
         return []
 
+    return _activity_rows_to_changes(rows, prop)
+
+
+def _activity_rows_to_changes(rows: list[tuple], prop: dict) -> list[dict]:
     label = prop.get("label", "") or prop.get("address", "")
     results = []
     for r in rows:
-        pn, status, status_date, ptype, snum, sname, neighborhood = r
+        pn, status, status_date, ptype, snum, sname, neighborhood = r[:7]
         results.append({
             "permit_number": pn,
             "change_date": status_date,
@@ -480,6 +762,15 @@ def _get_predictability(user_id: int) -> list[dict]:
         logger.debug("Permit health query failed (permits table may not exist)", exc_info=True)
         return []
 
+    return _health_from_rows(rows)
+
+
+def _health_from_rows(rows: list[tuple], benchmark_cache: dict | None = None) -> list[dict]:
+    """Score watched-permit rows against timeline benchmarks.
+
+    ``benchmark_cache`` lets a caller scoring many users' permits share
+    benchmark lookups keyed by (review_path, neighborhood, bracket, type).
+    """
     results = []
     conn = get_connection()
     try:
@@ -501,14 +792,20 @@ def _get_predictability(user_id: int) -> list[dict]:
                 from src.tools.estimate_timeline import _query_timeline, _cost_bracket
                 review_path = "otc" if permit_type and "otc" in permit_type.lower() else "in_house"
                 bracket = _cost_bracket(estimated_cost)
-                benchmarks = _query_timeline(conn, review_path, neighborhood, bracket, permit_type)
-
-                if not benchmarks and neighborhood:
-                    benchmarks = _query_timeline(conn, review_path, None, bracket, permit_type)
-                if not benchmarks and bracket:
-                    benchmarks = _query_timeline(conn, review_path, None, None, permit_type)
-                if not benchmarks:
-                    benchmarks = _query_timeline(conn, review_path, None, None, None)
+                cache_key = (review_path, neighborhood, bracket, permit_type)
+                if benchmark_cache is not None and cache_key in benchmark_cache:
+                    benchmarks = benchmark_cache[cache_key]
+                else:
+                    benchmarks = _query_timeline(conn, review_path, neighborhood, bracket, permit_type)
+
+                    if not benchmarks and neighborhood:
+                        benchmarks = _query_timeline(conn, review_path, None, bracket, permit_type)
+                    if not benchmarks and bracket:
+                        benchmarks = _query_timeline(conn, review_path, None, None, permit_type)
+                    if not benchmarks:
+                        benchmarks = _query_timeline(conn, review_path, None, None, None)
+                    if benchmark_cache is not None:
+                        benchmark_cache[cache_key] = benchmarks
             except Exception:
                 # timeline_stats table may not exist in all environments
                 benchmarks = None
@@ -578,6 +875,10 @@ def _get_inspection_results(user_id: int, since: date) -> list[dict]:
         logger.debug("Inspection results query failed (inspections table may not exist)", exc_info=True)
         return []
 
+    return _rows_to_inspections(rows)
+
+
+def _rows_to_inspections(rows: list[tuple]) -> list[dict]:
     return [
         {
             "permit_number": r[0],
@@ -693,6 +994,10 @@ def _get_team_activity(user_id: int, since: date) -> list[dict]:
         logger.debug("Team activity query failed (permits/entities tables may not exist)", exc_info=True)
         return []
 
+    return _rows_to_team_activity(rows)
+
+
+def _rows_to_team_activity(rows: list[tuple]) -> list[dict]:
     return [
         {
             "permit_number": r[0],
@@ -784,7 +1089,17 @@ def _get_plan_review_activity(user_id: int, since: date) -> list[dict]:
     except Exception:
         pass
 
-    # Deduplicate by (permit_number, station, change_date)
+    unique = _dedupe_plan_reviews(results)
+
+    # Enrich with routing progress and station velocity context
+    if unique:
+        _enrich_plan_reviews_with_routing(unique)
+
+    return unique
+
+
+def _dedupe_plan_reviews(results: list[dict]) -> list[dict]:
+    """Deduplicate by (permit_number, station, change_date), keeping first."""
     seen = set()
     unique = []
     for r in results:
@@ -792,11 +1107,6 @@ def _get_plan_review_activity(user_id: int, since: date) -> list[dict]:
         if key not in seen:
             seen.add(key)
             unique.append(r)
-
-    # Enrich with routing progress and station velocity context
-    if unique:
-        _enrich_plan_reviews_with_routing(unique)
-
     return unique
 
 
@@ -911,6 +1221,10 @@ def _get_expiring_permits(user_id: int) -> list[dict]:
         logger.debug("Expiring permits query failed (permits table may not exist)", exc_info=True)
         return []
 
+    return _expiring_from_rows(rows)
+
+
+def _expiring_from_rows(rows: list[tuple]) -> list[dict]:
     results = []
     for row in rows:
         (permit_number, issued_date, status, permit_type,
@@ -964,29 +1278,18 @@ def _get_property_synopsis(street_number: str, street_name: str) -> dict | None:
     """
     ph = _ph()
 
-    # Match the same way permit_lookup does — base name + full name+suffix
-    # Includes fuzzy space matching: "robin hood" matches "ROBINHOOD"
+    # Match on the canonical address key, as permit_lookup does — folds
+    # case, spacing ("robin hood" = "ROBINHOOD") and the street suffix.
     # NOTE: The `permits` table only exists in DuckDB (local), not in PostgreSQL (prod).
     try:
-        from src.tools.permit_lookup import _strip_suffix
-        base_name, _suffix = _strip_suffix(street_name)
-        base_pattern = f"%{base_name}%"
-        full_pattern = f"%{street_name}%"
-        nospace_pattern = f"%{base_name.replace(' ', '')}%"
         rows = query(
             f"SELECT permit_number, permit_type_definition, status, "
             f"filed_date, issued_date, completed_date, estimated_cost, "
             f"description, neighborhood, block, lot, street_suffix "
             f"FROM permits "
-            f"WHERE street_number = {ph} "
-            f"  AND ("
-            f"    UPPER(street_name) LIKE UPPER({ph})"
-            f"    OR UPPER(street_name) LIKE UPPER({ph})"
-            f"    OR UPPER(COALESCE(street_name, '') || ' ' || COALESCE(street_suffix, '')) LIKE UPPER({ph})"
-            f"    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') LIKE UPPER({ph})"
-            f"  ) "
+            f"WHERE street_number = {ph} AND address_key = {ph} "
             f"ORDER BY filed_date DESC",
-            (street_number, base_pattern, full_pattern, full_pattern, nospace_pattern),
+            (street_number, address_key(street_number, street_name)),
         )
     except Exception:
         logger.debug("Property synopsis query failed (permits table may not exist)", exc_info=True)
@@ -1088,51 +1391,13 @@ def _get_property_snapshot(user_id: int, lookback_days: int = 30) -> list[dict]:
     """
     from web.auth import get_watches
 
-    ph = _ph()
     watches = get_watches(user_id)
     if not watches:
         return []
 
-    # Collect watch targets by type (same pattern as portfolio.py lines 46-59)
-    watch_permits: set[str] = set()
-    watch_addresses: set[tuple[str, str]] = set()
-    watch_parcels: set[tuple[str, str]] = set()
-
-    for w in watches:
-        wt = w["watch_type"]
-        if wt == "permit" and w.get("permit_number"):
-            watch_permits.add(w["permit_number"])
-        elif wt == "address" and w.get("street_number") and w.get("street_name"):
-            watch_addresses.add((w["street_number"], w["street_name"].upper()))
-        elif wt == "parcel" and w.get("block") and w.get("lot"):
-            watch_parcels.add((w["block"], w["lot"]))
-        # Skip neighborhood and entity watches (too broad for property cards)
-
-    # Build SQL conditions (same pattern as portfolio.py lines 74-106)
-    conditions: list[str] = []
-    params: list = []
-
-    if watch_permits:
-        placeholders = ",".join([ph] * len(watch_permits))
-        conditions.append(f"p.permit_number IN ({placeholders})")
-        params.extend(watch_permits)
-    if watch_addresses:
-        addr_conds = []
-        for sn, st in watch_addresses:
-            addr_conds.append(f"(p.street_number = {ph} AND UPPER(p.street_name) = {ph})")
-            params.extend([sn, st])
-        conditions.append("(" + " OR ".join(addr_conds) + ")")
-    if watch_parcels:
-        parcel_conds = []
-        for b, l in watch_parcels:
-            parcel_conds.append(f"(p.block = {ph} AND p.lot = {ph})")
-            params.extend([b, l])
-        conditions.append("(" + " OR ".join(parcel_conds) + ")")
-
-    if not conditions:
-        return []
-
-    where = " OR ".join(conditions)
+    # Permit, address and parcel watches resolved through watch_permit_index
+    # (neighborhood and entity watches are too broad for property cards)
+    from web.watch_index import watched_permits_sql
 
     try:
         rows = query(
@@ -1140,9 +1405,9 @@ def _get_property_snapshot(user_id: int, lookback_days: int = 30) -> list[dict]:
             f"p.street_number, p.street_name, p.block, p.lot, p.neighborhood, "
             f"p.permit_type_definition, p.street_suffix, p.status_date, "
             f"p.revised_cost, p.estimated_cost "
-            f"FROM permits p WHERE {where} "
+            f"FROM permits p WHERE p.permit_number IN ({watched_permits_sql()}) "
             f"ORDER BY p.status_date DESC",
-            params,
+            (user_id,),
         )
     except Exception:
         logger.debug("_get_property_snapshot permits query failed", exc_info=True)
@@ -1151,14 +1416,14 @@ def _get_property_snapshot(user_id: int, lookback_days: int = 30) -> list[dict]:
     if not rows:
         return []
 
-    # Group by address (normalized) so multiple lots at the same address
-    # become one card. Track all block/lot pairs for enforcement queries.
-    today = date.today()
-    property_map: dict[str, dict] = {}
-    health_order = {"on_track": 0, "slower": 1, "behind": 2, "at_risk": 3, "high_risk": 4}
+    return _build_property_cards(watches, rows, lookback_days, _load_property_health())
+
 
-    # v2 signal-based health: try to load pre-computed property_health table.
-    # Falls back to v1 per-permit scoring if table doesn't exist or is empty.
+def _load_property_health() -> dict[str, dict]:
+    """Load the pre-computed v2 property_health table keyed by block/lot.
+
+    Returns an empty dict (v1 per-permit scoring) if the table doesn't exist.
+    """
     v2_health: dict[str, dict] = {}
     try:
         v2_rows = query(
@@ -1174,6 +1439,56 @@ def _get_property_snapshot(user_id: int, lookback_days: int = 30) -> list[dict]:
     except Exception:
         # Table doesn't exist or query failed — v1 fallback
         logger.debug("property_health table not available, using v1 scoring", exc_info=True)
+    return v2_health
+
+
+def _count_open_enforcement(parcels) -> tuple[int, int]:
+    """Open (violations, complaints) across a property's block/lot pairs."""
+    ph = _ph()
+    total_v = 0
+    total_c = 0
+    for b, l in parcels:
+        v_rows = query(
+            f"SELECT COUNT(*) FROM violations "
+            f"WHERE block = {ph} AND lot = {ph} AND LOWER(status) = 'open'",
+            (b, l),
+        )
+        c_rows = query(
+            f"SELECT COUNT(*) FROM complaints "
+            f"WHERE block = {ph} AND lot = {ph} AND LOWER(status) = 'open'",
+            (b, l),
+        )
+        total_v += v_rows[0][0] if v_rows else 0
+        total_c += c_rows[0][0] if c_rows else 0
+    return total_v, total_c
+
+
+def _build_property_cards(watches: list[dict], rows: list[tuple], lookback_days: int,
+                          v2_health: dict[str, dict], *, enforcement=None,
+                          routing_map: dict | None = None,
+                          velocity_cache: dict | None = None) -> list[dict]:
+    """Turn a user's watched-property permit rows into property cards.
+
+    Args:
+        watches: The user's active watches (``get_watches`` shape), for labels.
+        rows: Permit rows from the ``_get_property_snapshot`` query, newest
+            status_date first.
+        v2_health: ``_load_property_health()`` result.
+        enforcement: Callable mapping a set of (block, lot) to open
+            (violations, complaints); defaults to per-parcel queries.
+        routing_map: Prefetched ``get_routing_progress_batch`` results; when
+            None, routing is fetched for this user's plan-check permits.
+        velocity_cache: Station -> typical-duration label cache to share
+            across calls.
+    """
+    if enforcement is None:
+        enforcement = _count_open_enforcement
+
+    # Group by address (normalized) so multiple lots at the same address
+    # become one card. Track all block/lot pairs for enforcement queries.
+    today = date.today()
+    property_map: dict[str, dict] = {}
+    health_order = {"on_track": 0, "slower": 1, "behind": 2, "at_risk": 3, "high_risk": 4}
 
     for row in rows:
         pn, status = row[0], (row[1] or "").lower()
@@ -1336,21 +1651,7 @@ def _get_property_snapshot(user_id: int, lookback_days: int = 30) -> list[dict]:
         if not parcels:
             continue
         try:
-            total_v = 0
-            total_c = 0
-            for b, l in parcels:
-                v_rows = query(
-                    f"SELECT COUNT(*) FROM violations "
-                    f"WHERE block = {ph} AND lot = {ph} AND LOWER(status) = 'open'",
-                    (b, l),
-                )
-                c_rows = query(
-                    f"SELECT COUNT(*) FROM complaints "
-                    f"WHERE block = {ph} AND lot = {ph} AND LOWER(status) = 'open'",
-                    (b, l),
-                )
-                total_v += v_rows[0][0] if v_rows else 0
-                total_c += c_rows[0][0] if c_rows else 0
+            total_v, total_c = enforcement(parcels)
             prop["open_violations"] = total_v
             prop["open_complaints"] = total_c
             prop["enforcement_total"] = total_v + total_c
@@ -1363,16 +1664,18 @@ def _get_property_snapshot(user_id: int, lookback_days: int = 30) -> list[dict]:
     for prop in property_map.values():
         all_plancheck.extend(prop["plancheck_permits"])
 
-    routing_map: dict = {}
-    if all_plancheck:
-        try:
-            from web.routing import get_routing_progress_batch
-            routing_map = get_routing_progress_batch(all_plancheck)
-        except Exception:
-            logger.debug("Property snapshot routing batch failed", exc_info=True)
+    if routing_map is None:
+        routing_map = {}
+        if all_plancheck:
+            try:
+                from web.routing import get_routing_progress_batch
+                routing_map = get_routing_progress_batch(all_plancheck)
+            except Exception:
+                logger.debug("Property snapshot routing batch failed", exc_info=True)
 
     # Station velocity cache
-    velocity_cache: dict = {}
+    if velocity_cache is None:
+        velocity_cache = {}
 
     def _get_velocity(station_name: str) -> str | None:
         if station_name in velocity_cache:
@@ -1753,31 +2056,38 @@ def _get_planning_context(user_id: int) -> list[dict]:
                 exc_info=True,
             )
 
-        # Only include parcels that have active planning records or zoning info
-        if not planning_rows and not zoning_code:
-            continue
+        entry = _planning_context_entry(block, lot, label, planning_rows, zoning_code)
+        if entry:
+            results.append(entry)
 
-        planning_records = [
-            {
-                "record_id": r[0],
-                "record_type": r[1],
-                "description": (r[2] or "")[:120],
-                "open_date": r[3],
-                "status": r[4],
-            }
-            for r in planning_rows
-        ]
+    return results
 
-        results.append({
-            "block_lot": block_lot_key,
-            "block": block,
-            "lot": lot,
-            "label": label,
-            "zoning_code": zoning_code,
-            "planning_records": planning_records,
-        })
 
-    return results
+def _planning_context_entry(block: str, lot: str, label, planning_rows: list[tuple],
+                            zoning_code) -> dict | None:
+    # Only include parcels that have active planning records or zoning info
+    if not planning_rows and not zoning_code:
+        return None
+
+    planning_records = [
+        {
+            "record_id": r[0],
+            "record_type": r[1],
+            "description": (r[2] or "")[:120],
+            "open_date": r[3],
+            "status": r[4],
+        }
+        for r in planning_rows
+    ]
+
+    return {
+        "block_lot": f"{block}-{lot}",
+        "block": block,
+        "lot": lot,
+        "label": label,
+        "zoning_code": zoning_code,
+        "planning_records": planning_records,
+    }
 
 
 # ── Section 12: Compliance Calendar ──────────────────────────────
@@ -1810,8 +2120,6 @@ def _get_compliance_calendar(user_id: int) -> list[dict]:
     if not watch_rows:
         return []
 
-    today = date.today()
-    cutoff = today + timedelta(days=COMPLIANCE_WARNING_DAYS)
     results = []
 
     for row in watch_rows:
@@ -1834,30 +2142,39 @@ def _get_compliance_calendar(user_id: int) -> list[dict]:
             )
             continue
 
-        for brow in boiler_rows:
-            permit_number, boiler_type, expiration_date = brow[0], brow[1], brow[2]
-            exp = _parse_date(expiration_date)
-            if not exp:
-                continue
-            if exp > cutoff:
-                continue  # Not expiring soon enough
-
-            days_until = (exp - today).days
-            results.append({
-                "permit_number": permit_number,
-                "boiler_type": boiler_type,
-                "expiration_date": expiration_date,
-                "days_until": days_until,
-                "block": block,
-                "lot": lot,
-                "is_expired": days_until < 0,
-            })
+        results.extend(_compliance_entries(block, lot, boiler_rows))
 
     # Sort: expired first, then soonest to expire
     results.sort(key=lambda x: x["days_until"])
     return results
 
 
+def _compliance_entries(block: str, lot: str, boiler_rows: list[tuple]) -> list[dict]:
+    """Boiler permits at one parcel expiring within COMPLIANCE_WARNING_DAYS."""
+    today = date.today()
+    cutoff = today + timedelta(days=COMPLIANCE_WARNING_DAYS)
+    entries = []
+    for brow in boiler_rows:
+        permit_number, boiler_type, expiration_date = brow[0], brow[1], brow[2]
+        exp = _parse_date(expiration_date)
+        if not exp:
+            continue
+        if exp > cutoff:
+            continue  # Not expiring soon enough
+
+        days_until = (exp - today).days
+        entries.append({
+            "permit_number": permit_number,
+            "boiler_type": boiler_type,
+            "expiration_date": expiration_date,
+            "days_until": days_until,
+            "block": block,
+            "lot": lot,
+            "is_expired": days_until < 0,
+        })
+    return entries
+
+
 # ── Section 13: Data Quality Footer ──────────────────────────────
 
 DATA_QUALITY_WARN_THRESHOLD = 5.0  # Warn if match rate below this percent
@@ -2015,26 +2332,36 @@ def _get_street_use_activity(conn, watched_addresses: list[tuple[str, str]]) ->
                 f"LIMIT 10",
                 (f"%{street_name.strip()}%",),
             )
-            for r in rows:
-                results.append({
-                    "permit_number": r[0],
-                    "permit_type": r[1],
-                    "permit_purpose": r[2],
-                    "status": r[3],
-                    "agent": r[4],
-                    "street_name": r[5],
-                    "cross_street_1": r[6],
-                    "cross_street_2": r[7],
-                    "approved_date": r[8],
-                    "expiration_date": r[9],
-                    "neighborhood": r[10],
-                    "watched_address": f"{street_number} {street_name}",
-                })
+            results.extend(_rows_to_street_use(rows, street_number, street_name))
     except Exception:
         logger.debug("Street use activity query failed (non-fatal)", exc_info=True)
         return []
 
-    # Deduplicate by permit_number
+    return _dedupe_street_use(results)
+
+
+def _rows_to_street_use(rows: list[tuple], street_number: str, street_name: str) -> list[dict]:
+    return [
+        {
+            "permit_number": r[0],
+            "permit_type": r[1],
+            "permit_purpose": r[2],
+            "status": r[3],
+            "agent": r[4],
+            "street_name": r[5],
+            "cross_street_1": r[6],
+            "cross_street_2": r[7],
+            "approved_date": r[8],
+            "expiration_date": r[9],
+            "neighborhood": r[10],
+            "watched_address": f"{street_number} {street_name}",
+        }
+        for r in rows
+    ]
+
+
+def _dedupe_street_use(results: list[dict]) -> list[dict]:
+    """Deduplicate by permit_number, keeping first."""
     seen: set[str] = set()
     unique = []
     for item in results:
@@ -2042,7 +2369,6 @@ def _get_street_use_activity(conn, watched_addresses: list[tuple[str, str]]) ->
         if key not in seen:
             seen.add(key)
             unique.append(item)
-
     return unique
 
 
@@ -2119,25 +2445,7 @@ def _get_nearby_development(conn, watched_parcels: list[tuple[str, str]]) -> lis
                 f"LIMIT 10",
                 (f"{block}%",),
             )
-            for r in rows:
-                rec_id = r[0] or ""
-                if rec_id in seen_records:
-                    continue
-                seen_records.add(rec_id)
-                description = (r[8] or r[9] or "")[:150]
-                results.append({
-                    "record_id": rec_id,
-                    "name_address": r[1],
-                    "current_status": r[2],
-                    "proposed_units": r[3],
-                    "net_pipeline_units": r[4],
-                    "affordable_units": r[5],
-                    "neighborhood": r[6],
-                    "block_lot": r[7],
-                    "description": description,
-                    "approved_date_planning": r[10],
-                    "watched_parcel": f"{block}/{lot}",
-                })
+            results.extend(_rows_to_nearby_development(rows, block, lot, seen_records))
     except Exception:
         logger.debug("Nearby development query failed (non-fatal)", exc_info=True)
         return []
@@ -2145,6 +2453,32 @@ def _get_nearby_development(conn, watched_parcels: list[tuple[str, str]]) -> lis
     return results
 
 
+def _rows_to_nearby_development(rows: list[tuple], block: str, lot: str,
+                                seen_records: set[str]) -> list[dict]:
+    """Development rows near one watched parcel, skipping records in *seen_records*."""
+    results = []
+    for r in rows:
+        rec_id = r[0] or ""
+        if rec_id in seen_records:
+            continue
+        seen_records.add(rec_id)
+        description = (r[8] or r[9] or "")[:150]
+        results.append({
+            "record_id": rec_id,
+            "name_address": r[1],
+            "current_status": r[2],
+            "proposed_units": r[3],
+            "net_pipeline_units": r[4],
+            "affordable_units": r[5],
+            "neighborhood": r[6],
+            "block_lot": r[7],
+            "description": description,
+            "approved_date_planning": r[10],
+            "watched_parcel": f"{block}/{lot}",
+        })
+    return results
+
+
 def get_nearby_development_for_user(user_id: int) -> list[dict]:
     """Get development pipeline projects near parcels watched by a user.
 
@@ -2211,22 +2545,27 @@ def _get_prep_summary(user_id: int) -> list[dict]:
         except Exception:
             item_rows = []
 
-        total = 0
-        completed = 0
-        missing = 0
-        for ir in (item_rows or []):
-            count = ir[1]
-            total += count
-            if ir[0] in ("submitted", "verified", "waived", "n_a"):
-                completed += count
-            if ir[0] == "required":
-                missing += count
-
-        result.append({
-            "permit_number": r[1],
-            "total_items": total,
-            "completed_items": completed,
-            "missing_required": missing,
-        })
+        result.append(_prep_summary_entry(r[1], item_rows))
 
     return result
+
+
+def _prep_summary_entry(permit_number: str, item_rows: list[tuple]) -> dict:
+    """Progress counts for one checklist from (status, count) rows."""
+    total = 0
+    completed = 0
+    missing = 0
+    for ir in (item_rows or []):
+        count = ir[1]
+        total += count
+        if ir[0] in ("submitted", "verified", "waived", "n_a"):
+            completed += count
+        if ir[0] == "required":
+            missing += count
+
+    return {
+        "permit_number": permit_number,
+        "total_items": total,
+        "completed_items": completed,
+        "missing_required": missing,
+    }
@@ -0,0 +1,719 @@
+"""Set-at-a-time morning brief generation.
+
+``get_morning_brief`` answers one user at a time: ~15 section builders, most
+of them joining ``watch_items`` against a data table for that one user, plus
+a handful of user-independent sections recomputed on every call.  Warming
+briefs for every user that way costs hundreds of thousands of queries.
+
+This module prefetches the same sections for a whole set of users in one
+query per section (keyed by ``user_id``), computes the shared sections once,
+and hands the per-user slices back to ``get_morning_brief`` through a
+:class:`BriefBatch`::
+
+    batch = prefetch_briefs(user_ids, lookback_days=1)
+    for uid in user_ids:
+        brief = get_morning_brief(uid, 1, batch=batch)
+
+Each prefetch step is independent and non-fatal: if one fails (missing
+table, unexpected rows), that section is left out of the batch and
+``get_morning_brief`` falls back to its per-user builder for it.
+
+Stuck/delay alerts and the primary-address synopsis stay per-user — they
+call into the diagnostic tools permit by permit.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date, timedelta
+
+from src.address_key import address_key
+from src.db import query
+from web import brief as _brief
+
+logger = logging.getLogger(__name__)
+
+# Users prefetched per batch.  Bounds the IN (...) list and the working set.
+BRIEF_BATCH_SIZE = 500
+
+# Column list shared by the permit_changes / addenda_changes section queries.
+_CHANGE_COLS = (
+    "pc.permit_number, pc.change_date, pc.old_status, pc.new_status, "
+    "pc.change_type, pc.permit_type, pc.street_number, pc.street_name, "
+    "pc.neighborhood, w.label, pc.is_new_permit"
+)
+_REVIEW_COLS = (
+    "ac.application_number, ac.change_date, ac.station, "
+    "ac.plan_checked_by, ac.new_review_results, ac.hold_description, "
+    "ac.change_type, ac.department, ac.finish_date, "
+    "ac.permit_type, ac.street_number, ac.street_name, "
+    "ac.neighborhood, w.label"
+)
+
+
+class BriefBatch:
+    """Prefetched morning-brief sections for a set of users.
+
+    Per-user sections are stored as ``{section: {user_id: value}}``; shared
+    (user-independent) sections as ``{section: value}``.  ``lookup`` is what
+    ``get_morning_brief`` consults before running its own builder.
+    """
+
+    def __init__(self, user_ids: list[int], lookback_days: int = 1):
+        self.user_ids = list(dict.fromkeys(user_ids))
+        self._members = set(self.user_ids)
+        self.lookback_days = lookback_days
+        self.since = date.today() - timedelta(days=lookback_days)
+        self.watches: dict[int, list[dict]] = {}
+        self.primary_addresses: dict[int, dict] = {}
+        self.timings: dict[str, float] = {}
+        self.failed: list[str] = []
+        self._per_user: dict[str, dict[int, object]] = {}
+        self._defaults: dict[str, object] = {}
+        self._shared: dict[str, object] = {}
+        self._activity_by_parcel: dict[tuple[str, str], list[tuple]] | None = None
+        self._activity_by_key: dict[str, list[tuple]] | None = None
+
+    # ── Population ────────────────────────────────────────────────
+
+    def put(self, section: str, values: dict[int, object], default=None) -> None:
+        """Store a per-user section; users absent from *values* get *default*."""
+        self._per_user[section] = values
+        self._defaults[section] = [] if default is None else default
+
+    def put_shared(self, section: str, value) -> None:
+        """Store a section that is the same for every user."""
+        self._shared[section] = value
+
+    @property
+    def sections(self) -> list[str]:
+        return sorted([*self._per_user, *self._shared])
+
+    # ── Lookup ────────────────────────────────────────────────────
+
+    def lookup(self, section: str, user_id: int) -> tuple[bool, object]:
+        """Return ``(found, value)`` for one user's slice of a section."""
+        if section in self._shared:
+            return True, self._shared[section]
+        per_user = self._per_user.get(section)
+        if per_user is None or user_id not in self._members:
+            return False, None
+        value = per_user.get(user_id, self._defaults[section])
+        # get_morning_brief extends some lists in place — hand out copies
+        return True, list(value) if isinstance(value, list) else value
+
+    def recent_permit_activity(self, prop: dict) -> list[dict] | None:
+        """Batch equivalent of ``web.brief._get_recent_permit_activity``.
+
+        Returns None when recent permit activity wasn't prefetched.
+        """
+        if self._activity_by_parcel is None:
+            return None
+        block = prop.get("block", "")
+        lot = prop.get("lot", "")
+        addr = prop.get("address", "")
+        if block and lot:
+            rows = self._activity_by_parcel.get((block, lot), [])
+        elif addr and len(addr.split(None, 1)) >= 2:
+            number, name = addr.split(None, 1)
+            rows = self._activity_by_key.get(address_key(number, name), [])
+        else:
+            return []
+        return _brief._activity_rows_to_changes(rows[:10], prop)
+
+
+# ── Helpers ───────────────────────────────────────────────────────
+
+def _in_list(ids) -> tuple[str, list]:
+    ph = _brief._ph()
+    ids = list(ids)
+    return ",".join([ph] * len(ids)), ids
+
+
+def _watch_cte(user_ids: list[int]) -> tuple[str, list]:
+    """``WITH w AS (...)`` over the batch's active watches."""
+    placeholders, params = _in_list(user_ids)
+    return (
+        f"WITH w AS ("
+        f"SELECT user_id, watch_type, permit_number, street_number, "
+        f"UPPER(street_name) AS street_name_u, block, lot, entity_id, "
+        f"neighborhood, label FROM watch_items "
+        f"WHERE is_active = TRUE AND user_id IN ({placeholders})) ",
+        params,
+    )
+
+
+def _group(rows, key_len: int = 1) -> dict:
+    """Group rows by their leading column(s); values keep the rest in order."""
+    out: dict = {}
+    for r in rows:
+        key = r[0] if key_len == 1 else tuple(r[:key_len])
+        out.setdefault(key, []).append(tuple(r[key_len:]))
+    return out
+
+
+# ── Section prefetchers (one query per section for the whole batch) ─
+
+def _prefetch_watches(batch: BriefBatch) -> None:
+    placeholders, params = _in_list(batch.user_ids)
+    rows = query(
+        f"SELECT user_id, watch_id, watch_type, permit_number, street_number, "
+        f"street_name, block, lot, entity_id, neighborhood, label, created_at, "
+        f"COALESCE(tags, '') "
+        f"FROM watch_items WHERE is_active = TRUE AND user_id IN ({placeholders}) "
+        f"ORDER BY user_id, created_at DESC",
+        params,
+    )
+    for r in rows:
+        batch.watches.setdefault(r[0], []).append({
+            "watch_id": r[1], "watch_type": r[2], "permit_number": r[3],
+            "street_number": r[4], "street_name": r[5], "block": r[6],
+            "lot": r[7], "entity_id": r[8], "neighborhood": r[9],
+            "label": r[10], "created_at": r[11], "tags": r[12],
+        })
+    batch.put("total_watches", {u: len(ws) for u, ws in batch.watches.items()}, default=0)
+    batch.put("watched_permit_rows", {
+        u: [(w["permit_number"],) for w in ws] for u, ws in batch.watches.items()
+    })
+
+
+def _prefetch_changes(batch: BriefBatch) -> None:
+    """Status changes and new filings: one permit_changes join for all users."""
+    ph = _brief._ph()
+    cte, params = _watch_cte(batch.user_ids)
+    joins = [
+        (0, "w.watch_type = 'permit' AND w.permit_number = pc.permit_number"),
+        (1, "w.watch_type = 'address' AND w.street_number = pc.street_number "
+            "AND w.street_name_u = UPPER(pc.street_name)"),
+        (2, "w.watch_type = 'parcel' AND w.block = pc.block AND w.lot = pc.lot"),
+        (3, "w.watch_type = 'neighborhood' AND w.neighborhood = pc.neighborhood"),
+    ]
+    union = " UNION ALL ".join(
+        f"SELECT w.user_id, {kind} AS kind, {_CHANGE_COLS} "
+        f"FROM permit_changes pc JOIN w ON {cond} WHERE pc.change_date >= {ph}"
+        for kind, cond in joins
+    )
+    rows = query(
+        f"{cte}, m AS ({union}) "
+        f"SELECT * FROM ("
+        f"  SELECT m.*, ROW_NUMBER() OVER ("
+        f"    PARTITION BY user_id, kind, is_new_permit ORDER BY change_date DESC"
+        f"  ) AS rn FROM m"
+        f") x WHERE kind < 3 OR rn <= 20 "
+        f"ORDER BY user_id, kind, change_date DESC",
+        params + [batch.since] * len(joins),
+    )
+    watch_types = {0: "permit", 1: "address", 2: "parcel", 3: "neighborhood"}
+    changes: dict[int, list[dict]] = {}
+    filings: dict[int, list[dict]] = {}
+    for r in rows:
+        user_id, kind, cols, is_new = r[0], r[1], tuple(r[2:12]), r[12]
+        if is_new:
+            if kind > 0:
+                filings.setdefault(user_id, []).extend(_brief._rows_to_filings([
+                    (cols[0], cols[1], cols[3], *cols[5:])
+                ]))
+        else:
+            changes.setdefault(user_id, []).extend(
+                _brief._rows_to_changes([cols], watch_types[kind])
+            )
+    batch.put("changes", {u: _brief._dedupe_changes(c) for u, c in changes.items()})
+    batch.put("new_filings", filings)
+
+
+def _prefetch_plan_reviews(batch: BriefBatch) -> None:
+    ph = _brief._ph()
+    cte, params = _watch_cte(batch.user_ids)
+    joins = [
+        (0, 50, "w.watch_type = 'permit' AND w.permit_number = ac.application_number"),
+        (1, 30, "w.watch_type = 'address' AND w.street_number = ac.street_number "
+                "AND w.street_name_u = UPPER(ac.street_name)"),
+        (2, 30, "w.watch_type = 'parcel' AND w.block = ac.block AND w.lot = ac.lot"),
+    ]
+    union = " UNION ALL ".join(
+        f"SELECT w.user_id, {kind} AS kind, {limit} AS cap, {_REVIEW_COLS} "
+        f"FROM addenda_changes ac JOIN w ON {cond} WHERE ac.change_date >= {ph}"
+        for kind, limit, cond in joins
+    )
+    rows = query(
+        f"{cte}, m AS ({union}) "
+        f"SELECT * FROM ("
+        f"  SELECT m.*, ROW_NUMBER() OVER ("
+        f"    PARTITION BY user_id, kind ORDER BY change_date DESC, finish_date DESC"
+        f"  ) AS rn FROM m"
+        f") x WHERE rn <= cap "
+        f"ORDER BY user_id, kind, change_date DESC, finish_date DESC",
+        params + [batch.since] * len(joins),
+    )
+    reviews = {
+        user_id: _brief._dedupe_plan_reviews(
+            _brief._rows_to_plan_reviews([r[2:16] for r in user_rows])
+        )
+        for user_id, user_rows in _group(rows).items()
+    }
+    # One routing/velocity enrichment pass across every user's reviews
+    everything = [r for rs in reviews.values() for r in rs]
+    if everything:
+        _brief._enrich_plan_reviews_with_routing(everything)
+    batch.put("plan_reviews", reviews)
+
+
+def _prefetch_health(batch: BriefBatch) -> None:
+    cte, params = _watch_cte(batch.user_ids)
+    rows = query(
+        f"{cte}"
+        f"SELECT w.user_id, p.permit_number, p.status, p.filed_date, p.issued_date, "
+        f"p.permit_type_definition, p.neighborhood, p.estimated_cost, "
+        f"p.street_number, p.street_name, w.label "
+        f"FROM w JOIN permits p ON w.permit_number = p.permit_number "
+        f"WHERE w.watch_type = 'permit' "
+        f"  AND p.status IN ('filed', 'approved', 'issued', 'reinstated') "
+        f"ORDER BY w.user_id",
+        params,
+    )
+    benchmarks: dict = {}
+    batch.put("health", {
+        user_id: _brief._health_from_rows(user_rows, benchmarks)
+        for user_id, user_rows in _group(rows).items()
+    })
+
+
+def _prefetch_inspections(batch: BriefBatch) -> None:
+    ph = _brief._ph()
+    cte, params = _watch_cte(batch.user_ids)
+    rows = query(
+        f"{cte}"
+        f"SELECT user_id, reference_number, scheduled_date, result, "
+        f"inspection_description, inspector, label FROM ("
+        f"  SELECT w.user_id, i.reference_number, i.scheduled_date, i.result, "
+        f"  i.inspection_description, i.inspector, w.label, "
+        f"  ROW_NUMBER() OVER (PARTITION BY w.user_id ORDER BY i.scheduled_date DESC) AS rn "
+        f"  FROM inspections i "
+        f"  JOIN w ON w.permit_number = i.reference_number AND w.watch_type = 'permit' "
+        f"  WHERE i.scheduled_date >= {ph}"
+        f") x WHERE rn <= 50 "
+        f"ORDER BY user_id, scheduled_date DESC",
+        params + [str(batch.since)],
+    )
+    batch.put("inspections", {
+        user_id: _brief._rows_to_inspections(user_rows)
+        for user_id, user_rows in _group(rows).items()
+    })
+
+
+def _prefetch_team_activity(batch: BriefBatch) -> None:
+    ph = _brief._ph()
+    cte, params = _watch_cte(batch.user_ids)
+    rows = query(
+        f"{cte}"
+        f"SELECT user_id, permit_number, permit_type_definition, status, filed_date, "
+        f"street_number, street_name, neighborhood, role, canonical_name, label FROM ("
+        f"  SELECT w.user_id, p.permit_number, p.permit_type_definition, p.status, "
+        f"  p.filed_date, p.street_number, p.street_name, p.neighborhood, "
+        f"  c.role, e.canonical_name, w.label, "
+        f"  ROW_NUMBER() OVER (PARTITION BY w.user_id ORDER BY p.filed_date DESC) AS rn "
+        f"  FROM w "
+        f"  JOIN entities e ON w.entity_id = e.entity_id "
+        f"  JOIN contacts c ON e.entity_id = c.entity_id "
+        f"  JOIN permits p ON c.permit_number = p.permit_number "
+        f"  WHERE w.watch_type = 'entity' AND p.filed_date >= {ph}"
+        f") x WHERE rn <= 30 "
+        f"ORDER BY user_id, filed_date DESC",
+        params + [str(batch.since)],
+    )
+    batch.put("team_activity", {
+        user_id: _brief._rows_to_team_activity(user_rows)
+        for user_id, user_rows in _group(rows).items()
+    })
+
+
+def _prefetch_expiring(batch: BriefBatch) -> None:
+    cte, params = _watch_cte(batch.user_ids)
+    rows = query(
+        f"{cte}"
+        f"SELECT w.user_id, p.permit_number, p.issued_date, p.status, "
+        f"p.permit_type_definition, p.street_number, p.street_name, "
+        f"p.neighborhood, w.label, p.revised_cost, p.estimated_cost "
+        f"FROM w JOIN permits p ON w.permit_number = p.permit_number "
+        f"WHERE w.watch_type = 'permit' "
+        f"  AND p.issued_date IS NOT NULL "
+        f"  AND p.completed_date IS NULL "
+        f"  AND p.status NOT IN ('completed', 'expired', 'cancelled', 'withdrawn') "
+        f"ORDER BY w.user_id",
+        params,
+    )
+    batch.put("expiring", {
+        user_id: _brief._expiring_from_rows(user_rows)
+        for user_id, user_rows in _group(rows).items()
+    })
+
+
+def _open_counts(table: str) -> dict[tuple[str, str], int]:
+    rows = query(
+        f"SELECT block, lot, COUNT(*) FROM {table} "
+        f"WHERE LOWER(status) = 'open' GROUP BY block, lot"
+    )
+    return {(r[0], r[1]): r[2] for r in rows}
+
+
+def _prefetch_property_cards(batch: BriefBatch) -> None:
+    """Watch expansion to permits for every user, then one card build each."""
+    placeholders = ", ".join([_brief._ph()] * len(batch.user_ids))
+    cols = (
+        "p.permit_number, p.status, p.filed_date, p.issued_date, "
+        "p.street_number, p.street_name, p.block, p.lot, p.neighborhood, "
+        "p.permit_type_definition, p.street_suffix, p.status_date, "
+        "p.revised_cost, p.estimated_cost"
+    )
+    rows = query(
+        f"SELECT DISTINCT wpi.user_id, {cols} FROM watch_permit_index wpi "
+        f"JOIN permits p ON p.permit_number = wpi.permit_number "
+        f"WHERE wpi.user_id IN ({placeholders}) "
+        f"  AND wpi.watch_type IN ('permit', 'address', 'parcel') "
+        f"ORDER BY wpi.user_id, p.status_date DESC",
+        list(batch.user_ids),
+    )
+    by_user = _group(rows)
+
+    v2_health = _brief._load_property_health()
+
+    try:
+        violations = _open_counts("violations")
+        complaints = _open_counts("complaints")
+
+        def enforcement(parcels):
+            return (sum(violations.get(p, 0) for p in parcels),
+                    sum(complaints.get(p, 0) for p in parcels))
+    except Exception:
+        logger.debug("Batch enforcement counts failed", exc_info=True)
+
+        def enforcement(parcels):
+            raise LookupError("enforcement counts unavailable")
+
+    plancheck = sorted({
+        r[0] for user_rows in by_user.values() for r in user_rows
+        if (r[1] or "").lower() == "filed"
+    })
+    routing_map: dict = {}
+    if plancheck:
+        try:
+            from web.routing import get_routing_progress_batch
+            routing_map = get_routing_progress_batch(plancheck)
+        except Exception:
+            logger.debug("Batch property routing failed", exc_info=True)
+
+    velocity_cache: dict = {}
+    cards = {}
+    for user_id, user_rows in by_user.items():
+        cards[user_id] = _brief._build_property_cards(
+            batch.watches.get(user_id, []), user_rows, batch.lookback_days,
+            v2_health, enforcement=enforcement, routing_map=routing_map,
+            velocity_cache=velocity_cache,
+        )
+    batch.put("property_cards", cards)
+
+
+def _prefetch_recent_activity(batch: BriefBatch) -> None:
+    """Permits whose status_date moved inside the window, indexed for cards."""
+    ph = _brief._ph()
+    rows = query(
+        f"SELECT p.permit_number, p.status, p.status_date, "
+        f"p.permit_type_definition, p.street_number, p.street_name, "
+        f"p.neighborhood, p.block, p.lot, p.address_key "
+        f"FROM permits p WHERE p.status_date >= {ph} "
+        f"ORDER BY p.status_date DESC",
+        (str(batch.since),),
+    )
+    by_parcel: dict[tuple[str, str], list[tuple]] = {}
+    by_key: dict[str, list[tuple]] = {}
+    for r in rows:
+        by_parcel.setdefault((r[7], r[8]), []).append(r)
+        by_key.setdefault(r[9], []).append(r)
+    batch._activity_by_parcel = by_parcel
+    batch._activity_by_key = by_key
+
+
+def _parcel_watches(batch: BriefBatch, user_id: int) -> list[dict]:
+    return [w for w in batch.watches.get(user_id, []) if w["watch_type"] == "parcel"]
+
+
+def _prefetch_planning_context(batch: BriefBatch) -> None:
+    cte, params = _watch_cte(batch.user_ids)
+    parcels = (
+        "wp AS (SELECT DISTINCT block, lot FROM w "
+        "WHERE watch_type = 'parcel' AND block IS NOT NULL AND lot IS NOT NULL) "
+    )
+    try:
+        records = _group(query(
+            f"{cte}, {parcels}"
+            f"SELECT block, lot, record_id, record_type, description, open_date, status FROM ("
+            f"  SELECT pr.block, pr.lot, pr.record_id, pr.record_type, pr.description, "
+            f"  pr.open_date, pr.status, ROW_NUMBER() OVER ("
+            f"    PARTITION BY pr.block, pr.lot ORDER BY pr.open_date DESC) AS rn "
+            f"  FROM planning_records pr JOIN wp ON pr.block = wp.block AND pr.lot = wp.lot "
+            f"  WHERE COALESCE(pr.status, '') NOT IN ('withdrawn', 'closed')"
+            f") x WHERE rn <= 10 ORDER BY block, lot, open_date DESC",
+            params,
+        ), key_len=2)
+    except Exception:
+        logger.debug("Batch planning_records query failed", exc_info=True)
+        records = {}
+    try:
+        zoning = {
+            (r[0], r[1]): r[2] for r in query(
+                f"{cte}, {parcels}"
+                f"SELECT block, lot, zoning_code FROM ("
+                f"  SELECT tr.block, tr.lot, tr.zoning_code, ROW_NUMBER() OVER ("
+                f"    PARTITION BY tr.block, tr.lot ORDER BY tr.tax_year DESC) AS rn "
+                f"  FROM tax_rolls tr JOIN wp ON tr.block = wp.block AND tr.lot = wp.lot"
+                f") x WHERE rn = 1",
+                params,
+            )
+        }
+    except Exception:
+        logger.debug("Batch tax_rolls zoning query failed", exc_info=True)
+        zoning = {}
+
+    context = {}
+    for user_id in batch.watches:
+        entries = []
+        for w in _parcel_watches(batch, user_id):
+            if not w["block"] or not w["lot"]:
+                continue
+            key = (w["block"], w["lot"])
+            entry = _brief._planning_context_entry(
+                w["block"], w["lot"], w["label"], records.get(key, []), zoning.get(key),
+            )
+            if entry:
+                entries.append(entry)
+        context[user_id] = entries
+    batch.put("planning_context", context)
+
+
+def _prefetch_compliance_calendar(batch: BriefBatch) -> None:
+    cte, params = _watch_cte(batch.user_ids)
+    boilers = _group(query(
+        f"{cte}"
+        f"SELECT bp.block, bp.lot, bp.permit_number, bp.boiler_type, bp.expiration_date "
+        f"FROM boiler_permits bp "
+        f"JOIN (SELECT DISTINCT block, lot FROM w WHERE watch_type = 'parcel') wp "
+        f"  ON bp.block = wp.block AND bp.lot = wp.lot "
+        f"WHERE bp.expiration_date IS NOT NULL",
+        params,
+    ), key_len=2)
+    calendar = {}
+    for user_id in batch.watches:
+        entries = []
+        for w in _parcel_watches(batch, user_id):
+            if not w["block"] or not w["lot"]:
+                continue
+            entries.extend(_brief._compliance_entries(
+                w["block"], w["lot"], boilers.get((w["block"], w["lot"]), []),
+            ))
+        entries.sort(key=lambda x: x["days_until"])
+        calendar[user_id] = entries
+    batch.put("compliance_calendar", calendar)
+
+
+def _prefetch_street_use(batch: BriefBatch) -> None:
+    ph = _brief._ph()
+    cte, params = _watch_cte(batch.user_ids)
+    rows = query(
+        f"{cte}, ws AS ("
+        f"  SELECT DISTINCT TRIM(street_name_u) AS name FROM w "
+        f"  WHERE watch_type = 'address' AND street_name_u IS NOT NULL "
+        f"    AND TRIM(street_name_u) <> '') "
+        f"SELECT name, permit_number, permit_type, permit_purpose, status, agent, "
+        f"street_name, cross_street_1, cross_street_2, approved_date, "
+        f"expiration_date, neighborhood FROM ("
+        f"  SELECT ws.name, s.permit_number, s.permit_type, s.permit_purpose, s.status, "
+        f"  s.agent, s.street_name, s.cross_street_1, s.cross_street_2, "
+        f"  s.approved_date, s.expiration_date, s.neighborhood, "
+        f"  ROW_NUMBER() OVER (PARTITION BY ws.name ORDER BY s.approved_date DESC) AS rn "
+        f"  FROM street_use_permits s "
+        f"  JOIN ws ON UPPER(s.street_name) LIKE {ph} || ws.name || {ph} "
+        f"  WHERE COALESCE(s.status, '') NOT IN ('expired', 'cancelled')"
+        f") x WHERE rn <= 10 ORDER BY name, approved_date DESC",
+        params + ["%", "%"],
+    )
+    by_street = _group(rows)
+    activity = {}
+    for user_id, watches in batch.watches.items():
+        results = []
+        for w in watches:
+            if w["watch_type"] != "address" or not w["street_name"]:
+                continue
+            street_number = w["street_number"] or ""
+            street_name = w["street_name"]
+            results.extend(_brief._rows_to_street_use(
+                by_street.get(street_name.strip().upper(), []), street_number, street_name,
+            ))
+        activity[user_id] = _brief._dedupe_street_use(results)
+    batch.put("street_use_activity", activity)
+
+
+def _prefetch_nearby_development(batch: BriefBatch) -> None:
+    ph = _brief._ph()
+    cte, params = _watch_cte(batch.user_ids)
+    rows = query(
+        f"{cte}, wb AS ("
+        f"  SELECT DISTINCT block FROM w WHERE watch_type = 'parcel' "
+        f"    AND block IS NOT NULL AND block <> '' AND lot IS NOT NULL) "
+        f"SELECT block, record_id, name_address, current_status, proposed_units, "
+        f"net_pipeline_units, affordable_units, neighborhood, block_lot, "
+        f"description_planning, description_dbi, approved_date_planning FROM ("
+        f"  SELECT wb.block, d.record_id, d.name_address, d.current_status, "
+        f"  d.proposed_units, d.net_pipeline_units, d.affordable_units, d.neighborhood, "
+        f"  d.block_lot, d.description_planning, d.description_dbi, "
+        f"  d.approved_date_planning, ROW_NUMBER() OVER ("
+        f"    PARTITION BY wb.block ORDER BY d.approved_date_planning DESC) AS rn "
+        f"  FROM development_pipeline d JOIN wb ON d.block_lot LIKE wb.block || {ph} "
+        f"  WHERE COALESCE(d.current_status, '') NOT IN ('withdrawn', 'cancelled')"
+        f") x WHERE rn <= 10 ORDER BY block, approved_date_planning DESC",
+        params + ["%"],
+    )
+    by_block = _group(rows)
+    nearby = {}
+    for user_id in batch.watches:
+        results: list[dict] = []
+        seen: set[str] = set()
+        for w in _parcel_watches(batch, user_id):
+            if not w["block"] or w["lot"] is None:
+                continue
+            results.extend(_brief._rows_to_nearby_development(
+                by_block.get(w["block"], []), w["block"], w["lot"], seen,
+            ))
+        nearby[user_id] = results
+    batch.put("nearby_development", nearby)
+
+
+def _prefetch_prep_summary(batch: BriefBatch) -> None:
+    placeholders, params = _in_list(batch.user_ids)
+    checklists = query(
+        f"SELECT user_id, checklist_id, permit_number FROM ("
+        f"  SELECT user_id, checklist_id, permit_number, updated_at, ROW_NUMBER() OVER ("
+        f"    PARTITION BY user_id ORDER BY updated_at DESC) AS rn "
+        f"  FROM prep_checklists WHERE user_id IN ({placeholders})"
+        f") x WHERE rn <= 10 ORDER BY user_id, updated_at DESC",
+        params,
+    )
+    counts: dict = {}
+    if checklists:
+        ids_placeholders, ids = _in_list(sorted({r[1] for r in checklists}))
+        counts = _group(query(
+            f"SELECT checklist_id, status, COUNT(*) FROM prep_items "
+            f"WHERE checklist_id IN ({ids_placeholders}) GROUP BY checklist_id, status",
+            ids,
+        ))
+    summary: dict[int, list[dict]] = {}
+    for user_id, checklist_id, permit_number in checklists:
+        summary.setdefault(user_id, []).append(
+            _brief._prep_summary_entry(permit_number, counts.get(checklist_id, []))
+        )
+    batch.put("prep_summary", summary)
+
+
+def _prefetch_primary_addresses(batch: BriefBatch) -> None:
+    placeholders, params = _in_list(batch.user_ids)
+    rows = query(
+        f"SELECT user_id, primary_street_number, primary_street_name "
+        f"FROM users WHERE user_id IN ({placeholders})",
+        params,
+    )
+    batch.primary_addresses = {
+        r[0]: {"street_number": r[1], "street_name": r[2]}
+        for r in rows if r[1] and r[2]
+    }
+
+
+def _prefetch_shared(batch: BriefBatch) -> None:
+    """User-independent sections: computed once per batch."""
+    batch.put_shared("regulatory_alerts", _brief._get_regulatory_alerts())
+    batch.put_shared("last_refresh", _brief._get_last_refresh())
+    batch.put_shared("pipeline_health", _brief.get_pipeline_health_for_brief())
+    batch.put_shared("data_quality", _brief._get_data_quality())
+    batch.put_shared("change_velocity", _brief._get_change_velocity(batch.since))
+    batch.put_shared("pipeline_stats", _brief._get_pipeline_stats())
+
+
+# Order matters: later steps read batch.watches.
+_PREFETCH_STEPS = [
+    ("watches", _prefetch_watches),
+    ("shared", _prefetch_shared),
+    ("changes", _prefetch_changes),
+    ("plan_reviews", _prefetch_plan_reviews),
+    ("health", _prefetch_health),
+    ("inspections", _prefetch_inspections),
+    ("team_activity", _prefetch_team_activity),
+    ("expiring", _prefetch_expiring),
+    ("property_cards", _prefetch_property_cards),
+    ("recent_activity", _prefetch_recent_activity),
+    ("planning_context", _prefetch_planning_context),
+    ("compliance_calendar", _prefetch_compliance_calendar),
+    ("street_use_activity", _prefetch_street_use),
+    ("nearby_development", _prefetch_nearby_development),
+    ("prep_summary", _prefetch_prep_summary),
+    ("primary_addresses", _prefetch_primary_addresses),
+]
+
+
+# ── Public API ────────────────────────────────────────────────────
+
+def prefetch_briefs(user_ids: list[int], lookback_days: int = 1) -> BriefBatch:
+    """Prefetch every batchable brief section for *user_ids*.
+
+    Never raises: a failing step is logged, recorded in ``batch.failed``,
+    and left for ``get_morning_brief`` to compute per user.
+    """
+    batch = BriefBatch(user_ids, lookback_days)
+    if not batch.user_ids:
+        return batch
+    for name, step in _PREFETCH_STEPS:
+        if name != "watches" and "watches" in batch.failed:
+            break  # every per-user step depends on the watch list
+        t0 = time.monotonic()
+        try:
+            step(batch)
+        except Exception:
+            logger.debug("Brief batch step %s failed — per-user fallback", name, exc_info=True)
+            batch.failed.append(name)
+        batch.timings[name] = round(time.monotonic() - t0, 3)
+    logger.info(
+        "Brief batch: %d users, %d sections in %.2fs (failed: %s)",
+        len(batch.user_ids), len(batch.sections), sum(batch.timings.values()),
+        ", ".join(batch.failed) or "none",
+    )
+    return batch
+
+
+def iter_brief_batches(user_ids: list[int], lookback_days: int = 1,
+                       batch_size: int | None = None):
+    """Yield ``(chunk_user_ids, BriefBatch)`` over *user_ids* in chunks."""
+    size = batch_size or BRIEF_BATCH_SIZE
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), size):
+        chunk = user_ids[start:start + size]
+        yield chunk, prefetch_briefs(chunk, lookback_days)
+
+
+def get_morning_briefs(user_ids: list[int], lookback_days: int = 1,
+                       include_synopsis: bool = False,
+                       batch_size: int | None = None) -> dict[int, dict]:
+    """Build morning briefs for many users with set-based section queries.
+
+    Returns ``{user_id: brief}``.  A user whose brief fails to build is
+    logged and left out of the result.
+    """
+    briefs: dict[int, dict] = {}
+    for chunk, batch in iter_brief_batches(user_ids, lookback_days, batch_size):
+        for user_id in chunk:
+            try:
+                briefs[user_id] = _brief.get_morning_brief(
+                    user_id, lookback_days,
+                    primary_address=batch.primary_addresses.get(user_id) if include_synopsis else None,
+                    batch=batch,
+                )
+            except Exception:
+                logger.warning("Batch brief failed for user %s", user_id, exc_info=True)
+    return briefs
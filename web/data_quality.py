@@ -1,7 +1,9 @@
 """Data quality checks for the Admin Ops hub.
 
-Runs 10 checks against the database and returns traffic-light results
-(green/yellow/red) for display in the Data Quality tab.
+Runs the checks concurrently against the database under a wall-clock
+budget and returns traffic-light results (green/yellow/red) for display in
+the Data Quality tab.  Checks that read the same big table (permits,
+contacts, inspections) share one aggregate pass over it per run.
 
 Results are pre-computed by the nightly cron and cached in the
 ``dq_cache`` table.  The DQ tab reads cached results for instant
@@ -9,10 +11,13 @@ loading.  Admins can trigger a manual refresh via the UI.
 """
 from __future__ import annotations
 
+import contextvars
 import json
 import logging
 import sys
+import threading
 import time as _time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import date, datetime, timedelta, timezone
 
 from src.db import query as _raw_query
@@ -25,6 +30,16 @@ if not logger.handlers and not logging.getLogger().handlers:
 # Per-query timeout (seconds) for individual DQ checks.
 _DQ_QUERY_TIMEOUT_S = 15
 
+# Wall-clock budget (seconds) for a whole run_all_checks() pass.  Checks
+# still running when it expires are reported as timeouts.
+_DQ_RUN_BUDGET_S = 45
+
+# Checks run concurrently, each query on its own pooled connection.
+_DQ_WORKERS = 6
+
+# dq_cache rows kept so the DQ tab can show per-check cost trends.
+_DQ_HISTORY_ROWS = 30
+
 
 def _ph():
     """Return the correct placeholder for the current DB engine."""
@@ -102,13 +117,17 @@ def refresh_dq_cache() -> dict:
         conn = get_connection()
         try:
             with conn.cursor() as cur:
-                # Keep only the latest result — delete old entries first
-                cur.execute("DELETE FROM dq_cache")
                 cur.execute(
                     "INSERT INTO dq_cache (results_json, refreshed_at, duration_secs) "
                     "VALUES (%s, NOW(), %s)",
                     (json.dumps(results), round(duration, 1)),
                 )
+                # Keep recent runs for the per-check cost trends
+                cur.execute(
+                    "DELETE FROM dq_cache WHERE id NOT IN "
+                    "(SELECT id FROM dq_cache ORDER BY refreshed_at DESC LIMIT %s)",
+                    (_DQ_HISTORY_ROWS,),
+                )
                 conn.commit()
         except Exception as exc:
             logger.error("dq_cache write failed: %s", exc)
@@ -119,6 +138,39 @@ def refresh_dq_cache() -> dict:
     return {"checks": len(results), "duration_secs": round(duration, 1)}
 
 
+def get_check_cost_trends(runs: int = 7) -> dict[str, dict]:
+    """Average per-check duration over the cached runs before the latest.
+
+    Returns {check name: {"avg_ms": int, "runs": int}} so the DQ tab can
+    show whether a check is getting more expensive.  Empty if there is
+    no history (or no duration_ms in it yet).
+    """
+    ph = _ph()
+    try:
+        rows = _raw_query(
+            "SELECT results_json FROM dq_cache "
+            f"ORDER BY refreshed_at DESC LIMIT {ph} OFFSET 1",
+            (runs,),
+        )
+    except Exception as exc:
+        logger.warning("dq_cache history read failed: %s", exc)
+        return {}
+
+    durations: dict[str, list[int]] = {}
+    for (results_json,) in rows or []:
+        try:
+            results = json.loads(results_json)
+        except (TypeError, ValueError):
+            continue
+        for r in results:
+            if r.get("duration_ms") is not None:
+                durations.setdefault(r["name"], []).append(r["duration_ms"])
+    return {
+        name: {"avg_ms": round(sum(ms) / len(ms)), "runs": len(ms)}
+        for name, ms in durations.items()
+    }
+
+
 def check_bulk_indexes() -> list[dict]:
     """Diagnostic: verify which bulk-table indexes exist on PostgreSQL.
 
@@ -157,8 +209,11 @@ def run_all_checks() -> list[dict]:
     """Run all data quality checks and return results.
 
     Each result dict has:
-        name, category, value, unit, status (green|yellow|red), detail
+        name, category, value, unit, status (green|yellow|red), detail,
+        duration_ms
 
+    Checks run concurrently on _DQ_WORKERS threads; any still running after
+    _DQ_RUN_BUDGET_S come back as yellow timeouts.
     Results are sorted: red first, then yellow, then green.
     Checks that require prod-only tables (cron_log, permit_changes, etc.)
     are skipped gracefully on DuckDB.
@@ -192,25 +247,29 @@ def run_all_checks() -> list[dict]:
     else:
         checks = universal_checks
 
+    pool = ThreadPoolExecutor(max_workers=_DQ_WORKERS, thread_name_prefix="dq-check")
+    token = _run_scans.set(_SharedScans())
+    try:
+        # Each check gets a copy of this context, so they all see this
+        # run's shared scans
+        futures = [pool.submit(contextvars.copy_context().run, _run_check, fn)
+                   for fn in checks]
+    finally:
+        _run_scans.reset(token)
+    done, _ = wait(futures, timeout=_DQ_RUN_BUDGET_S)
+    # Don't wait for stragglers; their statement_timeout still bounds them
+    pool.shutdown(wait=False, cancel_futures=True)
+
     results = []
-    for check_fn in checks:
-        try:
-            result = check_fn()
-            if result:
-                results.append(result)
-        except Exception as exc:
-            exc_str = str(exc).lower()
-            is_timeout = "cancel" in exc_str or "timeout" in exc_str
-            logger.warning("DQ check %s failed%s: %s", check_fn.__name__,
-                           " (timeout)" if is_timeout else "", exc)
-            results.append({
-                "name": check_fn.__name__.replace("_check_", "").replace("_", " ").title(),
-                "category": "system",
-                "value": "Timeout" if is_timeout else "Error",
-                "unit": f">{_DQ_QUERY_TIMEOUT_S}s" if is_timeout else "",
-                "status": "yellow" if is_timeout else "red",
-                "detail": f"Query exceeded {_DQ_QUERY_TIMEOUT_S}s limit" if is_timeout else "Check failed — see logs",
-            })
+    for check_fn, future in zip(checks, futures):
+        if future in done:
+            result = future.result()
+        else:
+            logger.warning("DQ check %s still running after the %ds run budget",
+                           check_fn.__name__, _DQ_RUN_BUDGET_S)
+            result = _failed_check(check_fn, over_budget=True)
+        if result:
+            results.append(result)
 
     # Sort: red first, then yellow, then green
     status_order = {"red": 0, "yellow": 1, "green": 2}
@@ -218,6 +277,123 @@ def run_all_checks() -> list[dict]:
     return results
 
 
+def _run_check(check_fn) -> dict | None:
+    """Run one check, recording its duration; failures become result entries."""
+    t0 = _time.monotonic()
+    try:
+        result = check_fn()
+    except Exception as exc:
+        exc_str = str(exc).lower()
+        is_timeout = "cancel" in exc_str or "timeout" in exc_str
+        logger.warning("DQ check %s failed%s: %s", check_fn.__name__,
+                       " (timeout)" if is_timeout else "", exc)
+        result = _failed_check(check_fn, is_timeout=is_timeout)
+    if result:
+        result["duration_ms"] = round((_time.monotonic() - t0) * 1000)
+    return result
+
+
+def _failed_check(check_fn, is_timeout: bool = False, over_budget: bool = False) -> dict:
+    """Result entry for a check that raised or outlived the run budget."""
+    name = check_fn.__name__.replace("_check_", "").replace("_", " ").title()
+    if over_budget:
+        return {
+            "name": name,
+            "category": "system",
+            "value": "Timeout",
+            "unit": f">{_DQ_RUN_BUDGET_S}s",
+            "status": "yellow",
+            "detail": f"Still running when the {_DQ_RUN_BUDGET_S}s DQ run budget ran out",
+            "duration_ms": _DQ_RUN_BUDGET_S * 1000,
+        }
+    return {
+        "name": name,
+        "category": "system",
+        "value": "Timeout" if is_timeout else "Error",
+        "unit": f">{_DQ_QUERY_TIMEOUT_S}s" if is_timeout else "",
+        "status": "yellow" if is_timeout else "red",
+        "detail": f"Query exceeded {_DQ_QUERY_TIMEOUT_S}s limit" if is_timeout else "Check failed — see logs",
+    }
+
+
+# ── Shared table scans ────────────────────────────────────────────
+
+# One aggregate pass per big table, shared by every check that reads it.
+# table -> (FROM clause, [(column, aggregate), ...]).  Both joins are on
+# primary keys, so they never multiply rows.
+_SCANS: dict[str, tuple[str, list[tuple[str, str]]]] = {
+    "permits": ("permits", [
+        ("total", "COUNT(*)"),
+        ("temporal_violations",
+         "COUNT(*) FILTER (WHERE filed_date IS NOT NULL AND issued_date IS NOT NULL "
+         "AND filed_date > issued_date)"),
+        ("cost_outliers",
+         "COUNT(*) FILTER (WHERE (revised_cost > 500000000 OR estimated_cost > 500000000) "
+         "AND permit_type_definition NOT ILIKE '%%new construction%%')"),
+        ("max_status_date", "MAX(status_date)"),
+    ]),
+    "contacts": ("contacts c LEFT JOIN entities e ON e.entity_id = c.entity_id", [
+        ("total", "COUNT(*)"),
+        ("unresolved", "COUNT(*) FILTER (WHERE e.entity_id IS NULL)"),
+    ]),
+    "inspections": (
+        "inspections i LEFT JOIN permits p "
+        "ON i.reference_number_type = 'permit' AND p.permit_number = i.reference_number", [
+            ("total", "COUNT(*)"),
+            ("null_description",
+             "COUNT(*) FILTER (WHERE i.inspection_description IS NULL "
+             "OR i.inspection_description = '')"),
+            ("permit_type", "COUNT(*) FILTER (WHERE i.reference_number_type = 'permit')"),
+            ("orphans",
+             "COUNT(*) FILTER (WHERE i.reference_number_type = 'permit' "
+             "AND i.reference_number IS NOT NULL AND p.permit_number IS NULL)"),
+        ]),
+}
+
+
+def _run_scan(table: str) -> dict:
+    source, columns = _SCANS[table]
+    rows = _timed_query(
+        f"SELECT {', '.join(agg for _, agg in columns)} FROM {source}", ())
+    return dict(zip((name for name, _ in columns), rows[0] if rows else ()))
+
+
+class _SharedScans:
+    """Scan results for one run_all_checks() pass.
+
+    The first check to ask for a table runs its scan; checks that need the
+    same table meanwhile wait for that result (or its exception) instead of
+    scanning again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future] = {}
+
+    def get(self, table: str) -> dict:
+        with self._lock:
+            future = self._futures.get(table)
+            owner = future is None
+            if owner:
+                future = self._futures[table] = Future()
+        if owner:
+            try:
+                future.set_result(_run_scan(table))
+            except Exception as exc:
+                future.set_exception(exc)
+        return future.result()
+
+
+_run_scans: contextvars.ContextVar[_SharedScans | None] = contextvars.ContextVar(
+    "dq_run_scans", default=None)
+
+
+def _scan(table: str) -> dict:
+    """Aggregates for *table*: shared within a run, a fresh scan otherwise."""
+    shared = _run_scans.get()
+    return shared.get(table) if shared is not None else _run_scan(table)
+
+
 # ── Prod-only checks (small tables, use _raw_query) ──────────────
 
 
@@ -378,9 +554,8 @@ def _check_rag_chunk_count() -> dict:
 
 def _check_entity_coverage() -> dict:
     """Check entity resolution coverage (entities vs contacts)."""
-    contact_rows = _timed_query("SELECT COUNT(*) FROM contacts", ())
+    contacts = _scan("contacts").get("total") or 0
     entity_rows = _timed_query("SELECT COUNT(*) FROM entities", ())
-    contacts = contact_rows[0][0] if contact_rows else 0
     entities = entity_rows[0][0] if entity_rows else 0
     if contacts == 0:
         ratio = 0
@@ -397,20 +572,14 @@ def _check_entity_coverage() -> dict:
     }
 
 
-# ── Universal checks (big tables, use _timed_query) ──────────────
+# ── Universal checks (big tables, use _scan / _timed_query) ──────
 
 
 def _check_temporal_violations() -> dict:
     """Count permits where filed_date > issued_date (temporal anomaly)."""
-    rows = _timed_query(
-        "SELECT COUNT(*) FROM permits "
-        "WHERE filed_date IS NOT NULL AND issued_date IS NOT NULL "
-        "AND filed_date > issued_date",
-        (),
-    )
-    count = rows[0][0] if rows else 0
-    total_rows = _timed_query("SELECT COUNT(*) FROM permits", ())
-    total = total_rows[0][0] if total_rows else 1
+    permits = _scan("permits")
+    count = permits.get("temporal_violations") or 0
+    total = permits.get("total") or 0
     pct = round(count / max(total, 1) * 100, 2)
     status = "green" if pct < 0.5 else ("yellow" if pct < 1 else "red")
     return {
@@ -425,13 +594,7 @@ def _check_temporal_violations() -> dict:
 
 def _check_cost_outliers() -> dict:
     """Count permits with estimated cost > $500M (likely data errors)."""
-    rows = _timed_query(
-        "SELECT COUNT(*) FROM permits "
-        "WHERE (revised_cost > 500000000 OR estimated_cost > 500000000) "
-        "AND permit_type_definition NOT ILIKE '%%new construction%%'",
-        (),
-    )
-    count = rows[0][0] if rows else 0
+    count = _scan("permits").get("cost_outliers") or 0
     status = "green" if count == 0 else ("yellow" if count < 5 else "red")
     return {
         "name": "Cost Outliers (>$500M)",
@@ -450,14 +613,9 @@ def _check_orphaned_contacts() -> dict:
     does not appear in the entities table.  Green < 5%, yellow 5-10%,
     red > 10%.
     """
-    rows = _timed_query(
-        "SELECT COUNT(*) FROM contacts c "
-        "WHERE NOT EXISTS (SELECT 1 FROM entities e WHERE e.entity_id = c.entity_id)",
-        (),
-    )
-    count = rows[0][0] if rows else 0
-    total_contacts = _timed_query("SELECT COUNT(*) FROM contacts", ())
-    total = total_contacts[0][0] if total_contacts else 1
+    contacts = _scan("contacts")
+    count = contacts.get("unresolved") or 0
+    total = contacts.get("total") or 0
     pct = round(count / max(total, 1) * 100, 1)
     status = "green" if pct < 5 else ("yellow" if pct <= 10 else "red")
     return {
@@ -472,13 +630,9 @@ def _check_orphaned_contacts() -> dict:
 
 def _check_inspection_null_rate() -> dict:
     """Check what percentage of inspections have null results."""
-    rows = _timed_query(
-        "SELECT COUNT(*) FROM inspections WHERE inspection_description IS NULL OR inspection_description = ''",
-        (),
-    )
-    null_count = rows[0][0] if rows else 0
-    total_rows = _timed_query("SELECT COUNT(*) FROM inspections", ())
-    total = total_rows[0][0] if total_rows else 1
+    inspections = _scan("inspections")
+    null_count = inspections.get("null_description") or 0
+    total = inspections.get("total") or 0
     pct = round(null_count / max(total, 1) * 100, 1)
     status = "green" if pct < 5 else ("yellow" if pct < 20 else "red")
     return {
@@ -554,11 +708,8 @@ def _check_velocity_trends() -> dict | None:
 
 def _check_data_freshness() -> dict:
     """Check age of most recent permit status_date."""
-    rows = _timed_query(
-        "SELECT MAX(status_date) FROM permits WHERE status_date IS NOT NULL",
-        (),
-    )
-    if not rows or not rows[0][0]:
+    max_date = _scan("permits").get("max_status_date")
+    if not max_date:
         return {
             "name": "Data Freshness",
             "category": "pipeline",
@@ -567,9 +718,10 @@ def _check_data_freshness() -> dict:
             "status": "red",
             "detail": "No status_date values found in permits table",
         }
-    max_date = rows[0][0]
     if isinstance(max_date, str):
         max_date = date.fromisoformat(max_date[:10])
+    elif isinstance(max_date, datetime):
+        max_date = max_date.date()
     days_old = (date.today() - max_date).days
     status = "green" if days_old <= 2 else ("yellow" if days_old <= 7 else "red")
     return {
@@ -689,16 +841,7 @@ def _check_orphan_inspections() -> dict:
     Thresholds: green < 5%, yellow 5-15%, red > 15%.
     """
     try:
-        orphan_rows = _timed_query(
-            "SELECT COUNT(*) FROM inspections "
-            "WHERE reference_number_type = 'permit' "
-            "AND reference_number NOT IN (SELECT permit_number FROM permits)",
-            (),
-        )
-        total_rows = _timed_query(
-            "SELECT COUNT(*) FROM inspections WHERE reference_number_type = 'permit'",
-            (),
-        )
+        inspections = _scan("inspections")
     except Exception:
         return {
             "name": "Orphan Inspections",
@@ -709,8 +852,8 @@ def _check_orphan_inspections() -> dict:
             "detail": "Query failed — inspections or permits table may be unavailable",
         }
 
-    orphans = orphan_rows[0][0] if orphan_rows else 0
-    total = total_rows[0][0] if total_rows else 1
+    orphans = inspections.get("orphans") or 0
+    total = inspections.get("permit_type") or 0
     pct = round(orphans / max(total, 1) * 100, 2)
     status = "green" if pct < 5 else ("yellow" if pct <= 15 else "red")
     return {
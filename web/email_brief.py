@@ -17,13 +17,17 @@ import hmac
 import logging
 import os
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timezone
 from email.message import EmailMessage
 
-from flask import render_template
+from flask import current_app, render_template
 
 from src.db import BACKEND, execute_write, query
 from web.brief import get_morning_brief
+from web.brief_batch import BRIEF_BATCH_SIZE, prefetch_briefs
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +38,16 @@ SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
 SMTP_FROM = os.environ.get("SMTP_FROM", "noreply@sfpermits.ai")
 SMTP_USER = os.environ.get("SMTP_USER")
 SMTP_PASS = os.environ.get("SMTP_PASS")
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "true").lower() != "false"
 BASE_URL = os.environ.get("BASE_URL", "http://localhost:5001")
 UNSUBSCRIBE_SECRET = os.environ.get("UNSUBSCRIBE_SECRET", "dev-unsub-secret")
 
+# Bulk delivery (send_briefs)
+BRIEF_SEND_WORKERS = int(os.environ.get("BRIEF_SEND_WORKERS", "8"))        # brief build + render threads
+BRIEF_SMTP_CONNECTIONS = int(os.environ.get("BRIEF_SMTP_CONNECTIONS", "4"))  # persistent SMTP sessions
+BRIEF_SEND_RATE = float(os.environ.get("BRIEF_SEND_RATE", "0"))             # max messages/sec, 0 = unthrottled
+BRIEF_SMTP_MESSAGES_PER_CONNECTION = int(os.environ.get("BRIEF_SMTP_MESSAGES_PER_CONNECTION", "100"))
+
 
 def _ph() -> str:
     return "%s" if BACKEND == "postgres" else "?"
@@ -106,12 +117,26 @@ def update_last_brief_sent(user_id: int) -> None:
             conn.close()
 
 
+def update_last_brief_sent_many(user_ids: list[int]) -> None:
+    """Mark last brief send time for many users in one statement."""
+    if not user_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    now = "NOW()" if BACKEND == "postgres" else "CURRENT_TIMESTAMP"
+    execute_write(
+        f"UPDATE users SET last_brief_sent_at = {now} WHERE user_id IN ({placeholders})",
+        tuple(user_ids),
+    )
+
+
 # ── Email rendering ───────────────────────────────────────────────
 
-def render_brief_email(user: dict, brief_data: dict) -> str:
+def render_brief_email(user: dict, brief_data: dict, template=None) -> str:
     """Render the morning brief as an HTML email string.
 
-    Must be called within a Flask app context (for render_template).
+    Must be called within a Flask app context (for render_template), unless
+    ``template`` — a compiled Jinja template from :func:`_email_template` —
+    is passed, in which case it renders directly and is safe on any thread.
     """
     unsubscribe_token = generate_unsubscribe_token(
         user["user_id"], user["email"]
@@ -130,8 +155,7 @@ def render_brief_email(user: dict, brief_data: dict) -> str:
         except Exception:
             pipeline_health = {"status": "unknown", "issues": [], "checks": []}
 
-    return render_template(
-        "brief_email.html",
+    context = dict(
         base_url=BASE_URL,
         user_name=user.get("display_name") or "",
         lookback_days=brief_data["lookback_days"],
@@ -148,6 +172,19 @@ def render_brief_email(user: dict, brief_data: dict) -> str:
         unsubscribe_url=unsubscribe_url,
         pipeline_health=pipeline_health,
     )
+    if template is not None:
+        return template.render(**context)
+    return render_template("brief_email.html", **context)
+
+
+def _email_template(name: str = "brief_email.html"):
+    """Load (and compile) an email layout once for a whole send run.
+
+    Requires an app context.  The brief email uses only the variables
+    passed to it, so the compiled template can be rendered from worker
+    threads without Flask's per-call context processors.
+    """
+    return current_app.jinja_env.get_template(name)
 
 
 # ── SMTP send ─────────────────────────────────────────────────────
@@ -179,26 +216,32 @@ def send_brief_email(to_email: str, html_body: str, subject: str | None = None,
     return True  # Optimistically return True — email delivery is fire-and-forget
 
 
+def _build_brief_message(to_email: str, html_body: str, subject: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = SMTP_FROM
+    msg["To"] = to_email
+    msg["List-Unsubscribe"] = f"<{BASE_URL}/email/unsubscribe?email={to_email}>"
+
+    # Set plain text fallback
+    msg.set_content(
+        f"Your sfpermits.ai morning brief is ready.\n\n"
+        f"View it online: {BASE_URL}/brief\n\n"
+        f"Manage preferences: {BASE_URL}/account"
+    )
+    # Add HTML version
+    msg.add_alternative(html_body, subtype="html")
+    return msg
+
+
 def _send_brief_sync(to_email: str, html_body: str, subject: str) -> bool:
     """Send a brief email synchronously via SMTP."""
     try:
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = SMTP_FROM
-        msg["To"] = to_email
-        msg["List-Unsubscribe"] = f"<{BASE_URL}/email/unsubscribe?email={to_email}>"
-
-        # Set plain text fallback
-        msg.set_content(
-            f"Your sfpermits.ai morning brief is ready.\n\n"
-            f"View it online: {BASE_URL}/brief\n\n"
-            f"Manage preferences: {BASE_URL}/account"
-        )
-        # Add HTML version
-        msg.add_alternative(html_body, subtype="html")
+        msg = _build_brief_message(to_email, html_body, subject)
 
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
+            if SMTP_STARTTLS:
+                server.starttls()
             if SMTP_USER:
                 server.login(SMTP_USER, SMTP_PASS or "")
             server.send_message(msg)
@@ -211,14 +254,124 @@ def _send_brief_sync(to_email: str, html_body: str, subject: str) -> bool:
 
 # ── Batch send ────────────────────────────────────────────────────
 
+class _StageStats:
+    """Thread-safe per-stage counters for the send pipeline.
+
+    ``per_sec`` is items over the stage's active wall-clock window (first
+    start to last finish), so concurrent stages report real throughput.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: dict[str, dict] = {}
+
+    def record(self, stage: str, started: float) -> None:
+        finished = time.monotonic()
+        with self._lock:
+            entry = self._stages.setdefault(
+                stage, {"count": 0, "busy_s": 0.0, "first": started, "last": finished},
+            )
+            entry["count"] += 1
+            entry["busy_s"] += finished - started
+            entry["first"] = min(entry["first"], started)
+            entry["last"] = max(entry["last"], finished)
+
+    def summary(self) -> dict:
+        with self._lock:
+            out = {}
+            for stage, e in self._stages.items():
+                window = e["last"] - e["first"]
+                out[stage] = {
+                    "count": e["count"],
+                    "busy_s": round(e["busy_s"], 3),
+                    "wall_s": round(window, 3),
+                    "per_sec": round(e["count"] / window, 1) if window > 0 else None,
+                }
+            return out
+
+
+def _open_smtp_pool():
+    """Persistent SMTP sessions for a bulk send, or None in dev mode."""
+    if not SMTP_HOST:
+        return None
+    from web.smtp_pool import SMTPPool
+    return SMTPPool(
+        SMTP_HOST, SMTP_PORT, user=SMTP_USER, password=SMTP_PASS,
+        starttls=SMTP_STARTTLS, size=BRIEF_SMTP_CONNECTIONS,
+        max_messages_per_connection=BRIEF_SMTP_MESSAGES_PER_CONNECTION,
+        rate_per_sec=BRIEF_SEND_RATE or None,
+    )
+
+
+def _has_content(brief_data: dict) -> bool:
+    # Skip if nothing to report (no changes, no health issues, no properties)
+    summary = brief_data["summary"]
+    return (
+        summary["changes_count"] > 0
+        or summary.get("plan_reviews_count", 0) > 0
+        or summary["at_risk_count"] > 0
+        or summary["inspections_count"] > 0
+        or summary["new_filings_count"] > 0
+        or summary["expiring_count"] > 0
+        or len(brief_data.get("property_cards", [])) > 0
+    )
+
+
+def _prepare_brief(user: dict, lookback_days: int, batch, template,
+                   stages: _StageStats) -> str | None:
+    """Build and render one user's brief; None when there is nothing to send.
+
+    Sections are computed inline on this build thread, without deadlines —
+    the build pool is the concurrency here, and queueing every brief's
+    sections on the shared section pool would only add contention.  Every
+    section is therefore complete; a failing one fails the whole brief.
+    """
+    t0 = time.monotonic()
+    brief_data = get_morning_brief(user["user_id"], lookback_days, batch=batch,
+                                   concurrent_sections=False)
+    stages.record("generate", t0)
+    if not _has_content(brief_data):
+        return None
+    t0 = time.monotonic()
+    html_body = render_brief_email(user, brief_data, template=template)
+    stages.record("render", t0)
+    return html_body
+
+
+def _deliver_brief(user: dict, html_body: str, subject: str, smtp_pool,
+                   stages: _StageStats) -> bool:
+    t0 = time.monotonic()
+    if smtp_pool is None:
+        sent = send_brief_email(user["email"], html_body, subject)
+    else:
+        try:
+            smtp_pool.send(_build_brief_message(user["email"], html_body, subject))
+            sent = True
+        except Exception:
+            logger.exception("Failed to send brief to %s", user["email"])
+            sent = False
+    stages.record("send", t0)
+    return sent
+
+
 def send_briefs(frequency: str = "daily") -> dict:
     """Send morning briefs to all users subscribed at the given frequency.
 
+    Runs as a pipeline per chunk of BRIEF_BATCH_SIZE users: sections are
+    prefetched set-at-a-time (see web.brief_batch), briefs are built and
+    rendered on BRIEF_SEND_WORKERS threads against a template compiled once,
+    and each rendered brief is handed straight to a sender thread that
+    delivers it over one of BRIEF_SMTP_CONNECTIONS persistent SMTP sessions
+    (throttled to BRIEF_SEND_RATE messages/sec when set).  last_brief_sent_at
+    is updated once per chunk.
+
     Args:
         frequency: 'daily' or 'weekly'
 
     Returns:
-        Dict with counts: total, sent, skipped, failed.
+        Dict with counts: total, sent, skipped, failed; plus elapsed_s,
+        per-stage throughput under ``stages`` and SMTP session counters
+        under ``smtp`` (when SMTP is configured).
     """
     lookback_days = 7 if frequency == "weekly" else 1
     users = get_users_for_brief(frequency)
@@ -226,41 +379,80 @@ def send_briefs(frequency: str = "daily") -> dict:
     stats = {"total": len(users), "sent": 0, "skipped": 0, "failed": 0}
     logger.info("Sending %s briefs to %d users", frequency, len(users))
 
-    for user in users:
-        try:
-            brief_data = get_morning_brief(user["user_id"], lookback_days)
-
-            # Skip if nothing to report (no changes, no health issues, no properties)
-            summary = brief_data["summary"]
-            has_content = (
-                summary["changes_count"] > 0
-                or summary.get("plan_reviews_count", 0) > 0
-                or summary["at_risk_count"] > 0
-                or summary["inspections_count"] > 0
-                or summary["new_filings_count"] > 0
-                or summary["expiring_count"] > 0
-                or len(brief_data.get("property_cards", [])) > 0
-            )
-            if not has_content:
-                stats["skipped"] += 1
-                logger.debug("Skipping brief for user %d — nothing to report", user["user_id"])
-                continue
-
-            html_body = render_brief_email(user, brief_data)
-            sent = send_brief_email(user["email"], html_body)
+    started = time.monotonic()
+    stages = _StageStats()
+    subject = f"Morning Brief — {date.today().strftime('%b %d')} — sfpermits.ai"
+    template = _email_template() if users else None
+    smtp_pool = _open_smtp_pool() if users else None
+    senders = max(1, BRIEF_SMTP_CONNECTIONS if smtp_pool else 1)
 
-            if sent:
-                update_last_brief_sent(user["user_id"])
-                stats["sent"] += 1
-            else:
-                stats["failed"] += 1
-
-        except Exception:
-            logger.exception("Error generating brief for user %d", user["user_id"])
-            stats["failed"] += 1
+    try:
+        _send_chunks(users, lookback_days, subject, template, smtp_pool, senders,
+                     stats, stages)
+    finally:
+        if smtp_pool is not None:
+            smtp_pool.close()
+            stats["smtp"] = smtp_pool.stats()
+    stats["elapsed_s"] = round(time.monotonic() - started, 3)
+    stats["stages"] = stages.summary()
 
     logger.info(
-        "Brief send complete: %d sent, %d skipped, %d failed of %d total",
-        stats["sent"], stats["skipped"], stats["failed"], stats["total"],
+        "Brief send complete: %d sent, %d skipped, %d failed of %d total in %.1fs",
+        stats["sent"], stats["skipped"], stats["failed"], stats["total"], stats["elapsed_s"],
     )
     return stats
+
+
+def _send_chunks(users: list[dict], lookback_days: int, subject: str, template,
+                 smtp_pool, senders: int, stats: dict, stages: _StageStats) -> None:
+    """The per-chunk prefetch → build/render → deliver → mark pipeline."""
+    with ThreadPoolExecutor(max_workers=max(1, BRIEF_SEND_WORKERS),
+                            thread_name_prefix="brief-build") as build_pool, \
+            ThreadPoolExecutor(max_workers=senders,
+                               thread_name_prefix="brief-send") as send_pool:
+        for start in range(0, len(users), BRIEF_BATCH_SIZE):
+            chunk = users[start:start + BRIEF_BATCH_SIZE]
+            t0 = time.monotonic()
+            try:
+                batch = prefetch_briefs([u["user_id"] for u in chunk], lookback_days)
+            except Exception:
+                # Build this chunk's briefs per user instead
+                logger.exception("Brief prefetch failed for %d users", len(chunk))
+                batch = None
+            stages.record("prefetch", t0)
+
+            builds = {
+                build_pool.submit(_prepare_brief, user, lookback_days, batch, template, stages): user
+                for user in chunk
+            }
+            deliveries = {}
+            for future in as_completed(builds):
+                user = builds[future]
+                try:
+                    html_body = future.result()
+                except Exception:
+                    logger.exception("Error generating brief for user %d", user["user_id"])
+                    stats["failed"] += 1
+                    continue
+                if html_body is None:
+                    stats["skipped"] += 1
+                    logger.debug("Skipping brief for user %d — nothing to report", user["user_id"])
+                    continue
+                deliveries[send_pool.submit(
+                    _deliver_brief, user, html_body, subject, smtp_pool, stages,
+                )] = user
+
+            sent_ids = []
+            for future in as_completed(deliveries):
+                if future.result():
+                    sent_ids.append(deliveries[future]["user_id"])
+                else:
+                    stats["failed"] += 1
+
+            t0 = time.monotonic()
+            try:
+                update_last_brief_sent_many(sent_ids)
+            except Exception:
+                logger.exception("Failed to record last_brief_sent_at for %d users", len(sent_ids))
+            stages.record("mark_sent", t0)
+            stats["sent"] += len(sent_ids)
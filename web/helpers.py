@@ -298,22 +298,14 @@ def md_to_html(text: str) -> str:
 
 def _resolve_block_lot(street_number: str, street_name: str) -> tuple[str, str] | None:
     """Lightweight lookup: resolve a street address to (block, lot) from permits table."""
+    from src.address_key import address_key
     from src.db import query
-    from src.tools.permit_lookup import _strip_suffix
-    base_name, _suffix = _strip_suffix(street_name)
-    nospace_name = base_name.replace(' ', '')
     rows = query(
         "SELECT block, lot FROM permits "
-        "WHERE street_number = %s "
-        "  AND ("
-        "    UPPER(street_name) = UPPER(%s)"
-        "    OR UPPER(street_name) = UPPER(%s)"
-        "    OR UPPER(COALESCE(street_name, '') || ' ' || COALESCE(street_suffix, '')) = UPPER(%s)"
-        "    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER(%s)"
-        "  ) "
+        "WHERE street_number = %s AND address_key = %s "
         "  AND block IS NOT NULL AND lot IS NOT NULL "
         "LIMIT 1",
-        (street_number, base_name, street_name, street_name, nospace_name),
+        (street_number, address_key(street_number, street_name)),
     )
     if rows:
         return (rows[0][0], rows[0][1])
@@ -11,6 +11,7 @@ from datetime import date, timedelta
 
 from src.db import BACKEND, query
 from web.auth import get_watches
+from web.watch_index import watched_permits_sql
 
 logger = logging.getLogger(__name__)
 
@@ -41,68 +42,37 @@ def get_action_items(user_id: int) -> list[dict]:
     if not watches:
         return []
 
-    # Gather all watched permit numbers and parcels
-    permit_numbers = set()
-    parcels = set()  # (block, lot) tuples
-
-    for w in watches:
-        if w["watch_type"] == "permit" and w.get("permit_number"):
-            permit_numbers.add(w["permit_number"])
-        if w.get("block") and w.get("lot"):
-            parcels.add((w["block"], w["lot"]))
-
-    # Also find permits at watched addresses
-    for w in watches:
-        if w["watch_type"] == "address" and w.get("street_number") and w.get("street_name"):
-            try:
-                rows = query(
-                    f"SELECT permit_number, block, lot FROM permits "
-                    f"WHERE street_number = {_ph()} AND UPPER(street_name) = {_ph()} "
-                    f"AND status IN ('filed', 'issued', 'triage')",
-                    (w["street_number"], w["street_name"].upper()),
-                )
-            except Exception as e:
-                logger.warning("permits table query failed (address): %s", e)
-                return []
-            for r in rows:
-                permit_numbers.add(r[0])
-                if r[1] and r[2]:
-                    parcels.add((r[1], r[2]))
-
-    if not permit_numbers and not parcels:
-        return []
-
-    # Get active permits data
+    # Active permits the user watches (via watch_permit_index), plus every
+    # active permit on the parcels those watched permits sit on.
+    cols = (
+        "p.permit_number, p.permit_type, p.permit_type_definition, p.status, "
+        "p.status_date, p.filed_date, p.issued_date, p.estimated_cost, p.revised_cost, "
+        "p.description, p.street_number, p.street_name, p.block, p.lot"
+    )
+    active = "p.status IN ('filed', 'issued', 'triage')"
     try:
-        if permit_numbers:
-            placeholders = ",".join([_ph()] * len(permit_numbers))
-            permits = query(
-                f"SELECT permit_number, permit_type, permit_type_definition, status, "
-                f"status_date, filed_date, issued_date, estimated_cost, revised_cost, "
-                f"description, street_number, street_name, block, lot "
-                f"FROM permits WHERE permit_number IN ({placeholders}) "
-                f"AND status IN ('filed', 'issued', 'triage')",
-                list(permit_numbers),
-            )
-        else:
-            permits = []
-
-        # Also get permits at watched parcels not already found
-        for block, lot in parcels:
-            extra = query(
-                f"SELECT permit_number, permit_type, permit_type_definition, status, "
-                f"status_date, filed_date, issued_date, estimated_cost, revised_cost, "
-                f"description, street_number, street_name, block, lot "
-                f"FROM permits WHERE block = {_ph()} AND lot = {_ph()} "
-                f"AND status IN ('filed', 'issued', 'triage')",
-                (block, lot),
-            )
-            seen = {p[0] for p in permits}
-            permits.extend(r for r in extra if r[0] not in seen)
+        permits = query(
+            f"WITH watched AS ({watched_permits_sql(('permit', 'address', 'parcel'))}), "
+            f"parcels AS ("
+            f"  SELECT DISTINCT wp.block, wp.lot FROM permits wp "
+            f"  JOIN watched w ON wp.permit_number = w.permit_number "
+            f"  WHERE wp.block IS NOT NULL AND wp.lot IS NOT NULL"
+            f") "
+            f"SELECT {cols} FROM permits p "
+            f"JOIN watched w ON p.permit_number = w.permit_number WHERE {active} "
+            f"UNION "
+            f"SELECT {cols} FROM permits p "
+            f"JOIN parcels x ON p.block = x.block AND p.lot = x.lot WHERE {active} "
+            f"ORDER BY permit_number",
+            (user_id,),
+        )
     except Exception as e:
         logger.warning("permits table query failed: %s", e)
         return []
 
+    if not permits:
+        return []
+
     # Parse into dicts
     permit_dicts = []
     for row in permits:
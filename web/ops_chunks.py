@@ -79,9 +79,11 @@ def ingest_ops_chunks(dry_run: bool = False) -> int:
 
         texts = [c["content"] for c in chunks]
         start = time.time()
-        embeddings = embed_texts(texts)
+        stats: dict = {}
+        embeddings = embed_texts(texts, stats=stats)
         elapsed = time.time() - start
-        logger.info("Embedded %d ops chunks in %.1fs", len(texts), elapsed)
+        logger.info("Embedded %d ops chunks in %.1fs (%d cached, %d new)",
+                    len(texts), elapsed, stats.get("cached", 0), stats.get("embedded", 0))
 
         insert_chunks(chunks, embeddings,
                       source_tier=OPS_SOURCE_TIER,
@@ -155,7 +155,8 @@ def get_job(job_id: str) -> dict | None:
         "vision_usage_json, gallery_duration_ms, "
         "analysis_mode, pages_analyzed, "
         "submission_stage, "
-        "structural_fingerprint, version_group, version_number, parent_job_id "
+        "structural_fingerprint, version_group, version_number, parent_job_id, "
+        "render_stats_json "
         "FROM plan_analysis_jobs WHERE job_id = %s",
         (job_id,),
     )
@@ -195,6 +196,7 @@ def get_job(job_id: str) -> dict | None:
         "version_group": row[29] if len(row) > 29 else None,
         "version_number": row[30] if len(row) > 30 else None,
         "parent_job_id": row[31] if len(row) > 31 else None,
+        "render_stats_json": row[32] if len(row) > 32 else None,
     }
 
 
@@ -7,7 +7,8 @@ to avoid overwhelming the Railway single-dyno deployment.
 The background thread:
   1. Reads PDF bytes from plan_analysis_jobs
   2. Runs vision analysis via analyze_plans()
-  3. Renders page images at 72 DPI (gallery quality)
+  3. Renders page images at 72 DPI (gallery quality), sharing one
+     render-once raster with the vision stage (src/vision/page_raster.py)
   4. Creates a plan_analysis_session for the image gallery
   5. Auto-extracts address/permit from vision results
   6. Updates job status and sends email notification
@@ -44,16 +45,20 @@ def submit_job(job_id: str) -> None:
 def _process_job(job_id: str) -> None:
     """Process a plan analysis job in a background thread.
 
-    Requires its own Flask app context and asyncio event loop.
+    Requires its own Flask app context and asyncio event loop. Vision
+    calls are tagged as batch priority on the shared vision scheduler.
     """
     # Import here to avoid circular imports at module level
+    from src.vision.scheduler import PRIORITY_BATCH, vision_job
     from web.app import app
 
     with app.app_context():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         try:
-            _do_analysis(job_id, loop)
+            # Background jobs queue behind interactive vision calls
+            with vision_job(job_id, priority=PRIORITY_BATCH):
+                _do_analysis(job_id, loop)
         except Exception as e:
             logger.exception(f"[plan-worker] Job {job_id} failed: {e}")
             try:
@@ -81,6 +86,9 @@ def _do_analysis(job_id: str, loop: asyncio.AbstractEventLoop) -> None:
 
     from src.tools.analyze_plans import analyze_plans
     from src.tools.validate_plans import validate_plans
+    from src.vision.client import is_vision_available
+    from src.vision.epr_checks import plan_vision_renders
+    from src.vision.page_raster import raster_session
     from src.vision.pdf_to_images import pdf_page_to_base64
     from web.plan_images import create_session
     from web.plan_jobs import (
@@ -114,95 +122,115 @@ def _do_analysis(job_id: str, loop: asyncio.AbstractEventLoop) -> None:
         f"mode={job.get('analysis_mode', 'sample')} quick={job['quick_check']}"
     )
 
-    # ── Run analysis ──
-    update_job_status(
-        job_id, "processing",
-        progress_stage="analyzing",
-        progress_detail="Running AI vision analysis...",
-    )
-
     analysis_mode = job.get("analysis_mode", "sample")
     analyze_all_pages = (analysis_mode == "full")
 
-    analysis_t0 = time.time()
-    vision_usage = None
-    if job["quick_check"]:
-        result_md = loop.run_until_complete(
-            validate_plans(
-                pdf_bytes=pdf_bytes,
-                filename=filename,
-                is_site_permit_addendum=job["is_addendum"],
-                enable_vision=False,
-            )
-        )
-        page_extractions = []
-        page_annotations = []
-    else:
-        result_md, page_extractions, page_annotations, vision_usage = loop.run_until_complete(
-            analyze_plans(
-                pdf_bytes=pdf_bytes,
-                filename=filename,
-                project_description=job["project_description"],
-                permit_type=job["permit_type"],
-                return_structured=True,
-                analyze_all_pages=analyze_all_pages,
-                analysis_mode=analysis_mode,
-                property_address=job.get("property_address"),
-                submission_stage=job.get("submission_stage"),
-            )
-        )
-    analysis_ms = int((time.time() - analysis_t0) * 1000)
-    logger.info(f"[plan-worker] stage=analysis duration_ms={analysis_ms} job={job_id}")
-
     # ── Get page count ──
     reader = PdfReader(BytesIO(pdf_bytes))
     page_count = len(reader.pages)
 
-    # ── Render gallery images at lower DPI (parallel) ──
     # Compliance mode: only render analyzed pages (3 max) for speed
     if analysis_mode == "compliance":
         total_render = min(page_count, 3)
     else:
         total_render = min(page_count, 50)
+
+    # ── Render every page once, at the highest DPI any stage needs ──
+    # Vision checks and the gallery both pull from this raster via
+    # pdf_page_to_base64, so no page is rasterized twice.
+    render_plan: dict[int, set[int]] = {pn: {GALLERY_DPI} for pn in range(total_render)}
+    if not job["quick_check"] and is_vision_available():
+        for pn, dpis in plan_vision_renders(page_count, analysis_mode, analyze_all_pages).items():
+            render_plan.setdefault(pn, set()).update(dpis)
+
     update_job_status(
         job_id, "processing",
         progress_stage="rendering",
-        progress_detail=f"Rendering page gallery (0/{total_render})...",
+        progress_detail=f"Rendering {len(render_plan)} pages...",
     )
 
-    gallery_t0 = time.time()
+    with raster_session(pdf_bytes, render_plan) as raster:
+        # ── Run analysis ──
+        update_job_status(
+            job_id, "processing",
+            progress_stage="analyzing",
+            progress_detail="Running AI vision analysis...",
+        )
 
-    def _render_page(pn: int) -> tuple[int, str] | None:
-        try:
-            b64 = pdf_page_to_base64(pdf_bytes, pn, dpi=GALLERY_DPI)
-            return (pn, b64)
-        except Exception as e:
-            logger.warning(f"[plan-worker] Skipped page {pn} for {filename}: {e}")
-            return None
-
-    # Parallel rendering with 4 threads (PDF rendering is I/O-bound on disk)
-    from concurrent.futures import ThreadPoolExecutor as GalleryPool
-
-    page_images = []
-    with GalleryPool(max_workers=4, thread_name_prefix="gallery") as gallery_exec:
-        futures = {gallery_exec.submit(_render_page, pn): pn for pn in range(total_render)}
-        done_count = 0
-        for future in futures:
-            result = future.result()
-            if result:
-                page_images.append(result)
-            done_count += 1
-            if done_count % 5 == 0 or done_count == total_render:
-                update_job_status(
-                    job_id, "processing",
-                    progress_stage="rendering",
-                    progress_detail=f"Rendering page gallery ({done_count}/{total_render})...",
+        analysis_t0 = time.time()
+        vision_usage = None
+        if job["quick_check"]:
+            result_md = loop.run_until_complete(
+                validate_plans(
+                    pdf_bytes=pdf_bytes,
+                    filename=filename,
+                    is_site_permit_addendum=job["is_addendum"],
+                    enable_vision=False,
                 )
+            )
+            page_extractions = []
+            page_annotations = []
+        else:
+            result_md, page_extractions, page_annotations, vision_usage = loop.run_until_complete(
+                analyze_plans(
+                    pdf_bytes=pdf_bytes,
+                    filename=filename,
+                    project_description=job["project_description"],
+                    permit_type=job["permit_type"],
+                    return_structured=True,
+                    analyze_all_pages=analyze_all_pages,
+                    analysis_mode=analysis_mode,
+                    property_address=job.get("property_address"),
+                    submission_stage=job.get("submission_stage"),
+                )
+            )
+        analysis_ms = int((time.time() - analysis_t0) * 1000)
+        logger.info(f"[plan-worker] stage=analysis duration_ms={analysis_ms} job={job_id}")
+
+        # ── Gallery images at lower DPI (served from the raster) ──
+        update_job_status(
+            job_id, "processing",
+            progress_stage="rendering",
+            progress_detail=f"Rendering page gallery (0/{total_render})...",
+        )
 
-    # Sort by page number to maintain order
-    page_images.sort(key=lambda x: x[0])
-    gallery_duration_ms = int((time.time() - gallery_t0) * 1000)
-    logger.info(f"[plan-worker] stage=gallery pages={total_render} duration_ms={gallery_duration_ms} job={job_id}")
+        gallery_t0 = time.time()
+
+        def _render_page(pn: int) -> tuple[int, str] | None:
+            try:
+                b64 = pdf_page_to_base64(pdf_bytes, pn, dpi=GALLERY_DPI)
+                return (pn, b64)
+            except Exception as e:
+                logger.warning(f"[plan-worker] Skipped page {pn} for {filename}: {e}")
+                return None
+
+        # Pre-rendered pages return immediately; the threads only matter for
+        # pages the raster had to render on demand (e.g. a failed chunk).
+        from concurrent.futures import ThreadPoolExecutor as GalleryPool
+
+        page_images = []
+        with GalleryPool(max_workers=4, thread_name_prefix="gallery") as gallery_exec:
+            futures = {gallery_exec.submit(_render_page, pn): pn for pn in range(total_render)}
+            done_count = 0
+            for future in futures:
+                result = future.result()
+                if result:
+                    page_images.append(result)
+                done_count += 1
+                if done_count % 5 == 0 or done_count == total_render:
+                    update_job_status(
+                        job_id, "processing",
+                        progress_stage="rendering",
+                        progress_detail=f"Rendering page gallery ({done_count}/{total_render})...",
+                    )
+
+        # Sort by page number to maintain order
+        page_images.sort(key=lambda x: x[0])
+        gallery_duration_ms = int((time.time() - gallery_t0) * 1000)
+        logger.info(f"[plan-worker] stage=gallery pages={total_render} duration_ms={gallery_duration_ms} job={job_id}")
+
+    render_stats = raster.stats.to_dict()
+    logger.info(f"[plan-worker] stage=raster stats={render_stats} job={job_id}")
 
     # ── Finalize ──
     update_job_status(
@@ -256,6 +284,7 @@ def _do_analysis(job_id: str, loop: asyncio.AbstractEventLoop) -> None:
     if vision_usage and vision_usage.total_calls > 0:
         usage_fields["vision_usage_json"] = json.dumps(vision_usage.to_dict())
     usage_fields["gallery_duration_ms"] = gallery_duration_ms
+    usage_fields["render_stats_json"] = json.dumps(render_stats)
     usage_fields["pages_analyzed"] = len(page_extractions)
 
     fingerprint_fields = {}
@@ -336,6 +365,13 @@ def _do_analysis(job_id: str, loop: asyncio.AbstractEventLoop) -> None:
             f"{vision_usage.total_tokens:,} tokens/"
             f"~${vision_usage.estimated_cost_usd:.4f}"
         )
+        if vision_usage.cache_hits:
+            usage_log += (
+                f", vision_cache={vision_usage.cache_hits} hits/"
+                f"{vision_usage.saved_tokens:,} tokens saved"
+            )
+        if vision_usage.total_queue_wait_ms:
+            usage_log += f", vision_queue_wait={vision_usage.total_queue_wait_ms}ms"
     total_wall_ms = int((time.time() - job_t0) * 1000)
     logger.info(
         f"[plan-worker] Completed {filename}: {page_count} pages, "
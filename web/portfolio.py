@@ -11,6 +11,7 @@ from datetime import date, timedelta
 
 from src.db import BACKEND, query, query_one
 from web.auth import get_watches
+from web.watch_index import watched_permits_sql
 
 logger = logging.getLogger(__name__)
 
@@ -42,68 +43,21 @@ def get_portfolio(user_id: int) -> dict:
     if not watches:
         return {"properties": [], "summary": _empty_summary()}
 
-    # Collect all permit numbers and address/parcel pairs from watches
-    watch_permits = set()
-    watch_addresses = set()
-    watch_parcels = set()
-
-    for w in watches:
-        if w["watch_type"] == "permit" and w.get("permit_number"):
-            watch_permits.add(w["permit_number"])
-        elif w["watch_type"] == "address" and w.get("street_number") and w.get("street_name"):
-            watch_addresses.add((w["street_number"], w["street_name"].upper()))
-        elif w["watch_type"] == "parcel" and w.get("block") and w.get("lot"):
-            watch_parcels.add((w["block"], w["lot"]))
-        elif w["watch_type"] == "neighborhood" and w.get("neighborhood"):
-            # Neighborhoods could produce too many results; skip for portfolio
-            pass
-        elif w["watch_type"] == "entity" and w.get("entity_id"):
-            # Entity watches — find their permits
-            eid = w["entity_id"]
-            rows = query(
-                f"SELECT DISTINCT permit_number FROM contacts WHERE entity_id = {_ph()}",
-                (eid,),
-            )
-            for r in rows:
-                watch_permits.add(r[0])
-
-    # Build SQL to get all matching permits
-    conditions = []
-    params = []
-
-    if watch_permits:
-        placeholders = ",".join([_ph()] * len(watch_permits))
-        conditions.append(f"p.permit_number IN ({placeholders})")
-        params.extend(watch_permits)
-
-    if watch_addresses:
-        addr_conds = []
-        for sn, st in watch_addresses:
-            addr_conds.append(f"(p.street_number = {_ph()} AND UPPER(p.street_name) = {_ph()})")
-            params.extend([sn, st])
-        conditions.append("(" + " OR ".join(addr_conds) + ")")
-
-    if watch_parcels:
-        parcel_conds = []
-        for b, l in watch_parcels:
-            parcel_conds.append(f"(p.block = {_ph()} AND p.lot = {_ph()})")
-            params.extend([b, l])
-        conditions.append("(" + " OR ".join(parcel_conds) + ")")
-
-    if not conditions:
-        return {"properties": [], "summary": _empty_summary()}
-
-    where = " OR ".join(conditions)
-
+    # Watched permits (permit, address, parcel and entity watches) come from
+    # the materialized watch_permit_index; neighborhood watches are too broad
+    # for the portfolio and are not indexed.
     rows = query(
         f"SELECT p.permit_number, p.permit_type, p.permit_type_definition, "
         f"p.status, p.status_date, p.filed_date, p.issued_date, "
         f"p.estimated_cost, p.revised_cost, p.description, "
         f"p.street_number, p.street_name, p.block, p.lot, p.neighborhood "
-        f"FROM permits p WHERE {where} "
+        f"FROM permits p WHERE p.permit_number IN ("
+        f"{watched_permits_sql(('permit', 'address', 'parcel', 'entity'))}) "
         f"ORDER BY p.status_date DESC",
-        params,
+        (user_id,),
     )
+    if not rows:
+        return {"properties": [], "summary": _empty_summary()}
 
     # Group by address (block/lot)
     property_map: dict[str, dict] = {}
@@ -543,18 +543,20 @@ def admin_ops_fragment(tab):
 def admin_ops_refresh_dq():
     """Manually trigger a DQ cache refresh (admin only).
 
-    Runs all checks synchronously (may take 30-60s on big tables),
+    Runs all checks (concurrently, within the DQ run budget),
     stores results in dq_cache, then returns the updated DQ fragment.
     """
     if not g.user.get("is_admin"):
         abort(403)
-    from web.data_quality import refresh_dq_cache, get_cached_checks, check_bulk_indexes
+    from web.data_quality import (
+        refresh_dq_cache, get_cached_checks, check_bulk_indexes, get_check_cost_trends,
+    )
     refresh_dq_cache()
     checks, refreshed_at = get_cached_checks()
     indexes = check_bulk_indexes()
     return render_template("fragments/admin_quality.html",
                            checks=checks, refreshed_at=refreshed_at,
-                           indexes=indexes)
+                           indexes=indexes, cost_trends=get_check_cost_trends())
 
 
 def _render_ops_tab(tab: str):
@@ -567,12 +569,12 @@ def _render_ops_tab(tab: str):
                                active_page="admin", fragment=True)
 
     elif tab == "quality":
-        from web.data_quality import get_cached_checks, check_bulk_indexes
+        from web.data_quality import get_cached_checks, check_bulk_indexes, get_check_cost_trends
         checks, refreshed_at = get_cached_checks()
         indexes = check_bulk_indexes()
         return render_template("fragments/admin_quality.html",
                                checks=checks, refreshed_at=refreshed_at,
-                               indexes=indexes)
+                               indexes=indexes, cost_trends=get_check_cost_trends())
 
     elif tab == "activity":
         # === SESSION B: offset pagination ===
@@ -1590,6 +1592,10 @@ def admin_perf():
     finally:
         conn.close()
 
+    # Morning brief section latency (in-process samples, this worker only)
+    from web.brief import get_section_latency_stats
+    brief_sections = get_section_latency_stats()
+
     return render_template(
         "admin_perf.html",
         user=g.user,
@@ -1597,6 +1603,7 @@ def admin_perf():
         top_slowest=top_slowest,
         volume_rows=volume_rows,
         overall_percentiles=overall_percentiles,
+        brief_sections=brief_sections,
     )
 
 
@@ -484,11 +484,16 @@ def cron_nightly():
             def _run_cleanup():
                 from web.plan_images import cleanup_expired
                 from web.plan_jobs import cleanup_old_jobs
+                from src.vision.result_cache import prune_vision_cache
+                from src.rag.embeddings import prune_embedding_cache
                 sessions_deleted = cleanup_expired(hours=24)
                 jobs_deleted = cleanup_old_jobs(days=30)
+                vision_cache = prune_vision_cache()
                 return {
                     "plan_sessions_deleted": sessions_deleted,
                     "plan_jobs_deleted": jobs_deleted,
+                    "vision_cache_evicted": vision_cache["expired"] + vision_cache["trimmed"],
+                    "embedding_cache_evicted": prune_embedding_cache(),
                 }
             cleanup_result = _timed_step("cleanup", _run_cleanup)
 
@@ -548,6 +553,26 @@ def cron_nightly():
                     _sig_conn.close()
             signals_result = _timed_step("signals", _run_signals)
 
+        # Recompute parcel_summary rows for parcels in tonight's delta and
+        # re-sync health tiers from the signals pipeline; a full refresh
+        # every PARCEL_SUMMARY_FULL_REFRESH_DAYS picks up the other count
+        # sources (non-fatal)
+        parcel_summary_result = {}
+        if not dry_run:
+            def _run_parcel_summary():
+                from src.parcel_summary import refresh_parcel_summary
+                return refresh_parcel_summary(incremental=True)
+            parcel_summary_result = _timed_step("parcel_summary", _run_parcel_summary)
+
+        # Rebuild watch → permit resolution so entity, address and parcel
+        # watches follow re-resolved contacts and re-addressed permits (non-fatal)
+        watch_index_result = {}
+        if not dry_run:
+            def _run_watch_index():
+                from web.watch_index import rebuild_watch_index
+                return {"rows": rebuild_watch_index()}
+            watch_index_result = _timed_step("watch_index", _run_watch_index)
+
         # === Sprint 64: Station velocity v2 refresh (non-fatal) ===
         velocity_v2_result = {}
         if not dry_run:
@@ -567,9 +592,25 @@ def cron_nightly():
                 except Exception as tr_e:
                     logging.warning("Station transitions refresh failed: %s", tr_e)
                     v2_res["transitions_error"] = str(tr_e)
+                # Per-cohort transition model behind predict_next_stations
+                try:
+                    from src.station_transition_model import refresh_transition_model
+                    v2_res["transition_model"] = refresh_transition_model()
+                except Exception as tm_e:
+                    logging.warning("Transition model refresh failed: %s", tm_e)
+                    v2_res["transition_model_error"] = str(tm_e)
                 return v2_res
             velocity_v2_result = _timed_step("velocity_v2", _run_velocity_v2)
 
+        # Rebuild the permit stats cube behind estimate_fees / revision_risk /
+        # estimate_timeline (non-fatal — the tools fall back to raw scans)
+        stats_cube_result = {}
+        if not dry_run:
+            def _run_stats_cube():
+                from src.stats_cube import refresh_stats_cube
+                return refresh_stats_cube()
+            stats_cube_result = _timed_step("stats_cube", _run_stats_cube)
+
         # Send staleness alert email to admins if warnings detected
         staleness_alert_result = {}
         warnings = result.get("staleness_warnings", [])
@@ -611,7 +652,10 @@ def cron_nightly():
                 "ops_chunks": ops_chunks_result,
                 "dq_cache": dq_cache_result,
                 "signals": signals_result,
+                "parcel_summary": parcel_summary_result,
+                "watch_index": watch_index_result,
                 "velocity_v2": velocity_v2_result,
+                "stats_cube": stats_cube_result,
                 "staleness_alert": staleness_alert_result,
                 "mcp_access_report": mcp_access_result,
                 "cache_invalidation": cache_invalidation_result,
@@ -1145,6 +1189,12 @@ def cron_velocity_refresh():
         except Exception as e:
             logging.getLogger(__name__).warning("transitions refresh failed: %s", e)
             stats["transitions_error"] = str(e)
+        try:
+            from src.station_transition_model import refresh_transition_model
+            stats["transition_model"] = refresh_transition_model()
+        except Exception as e:
+            logging.getLogger(__name__).warning("transition model refresh failed: %s", e)
+            stats["transition_model_error"] = str(e)
         # === END SESSION B ===
 
         # === SESSION D: Station congestion refresh ===
@@ -1807,269 +1857,38 @@ def cron_refresh_parcel_summary():
     """Materialize one-row-per-parcel summary from permits, tax_rolls,
     complaints, violations, boiler_permits, inspections, and property_health.
 
+    Query params:
+        mode: "full" (default) rebuilds into a shadow table and swaps it in;
+              "incremental" recomputes only parcels in permit_changes since
+              the last refresh (or since ``since``), and runs full instead
+              once the last full refresh is PARCEL_SUMMARY_FULL_REFRESH_DAYS old.
+        since: ISO date/timestamp overriding the incremental cutoff.
+
     CRON_SECRET auth required.
     """
     _check_api_auth()
-    from src.db import get_connection, BACKEND
+    from src.db import query
+    from src.parcel_summary import refresh_parcel_summary
+
+    incremental = request.args.get("mode", "full") == "incremental"
+    since = request.args.get("since") or None
 
     start = time.time()
-    conn = get_connection()
     try:
-        if BACKEND == "postgres":
-            conn.autocommit = True
-            cur = conn.cursor()
-        else:
-            cur = conn
-
-        # Placeholder style
-        ph = "%s" if BACKEND == "postgres" else "?"
-
-        # Build the canonical_address from the most recent filed permit
-        # per parcel (UPPER-cased, street_number || ' ' || street_name).
-        # Uses DISTINCT ON for Postgres, ROW_NUMBER for DuckDB.
-        if BACKEND == "postgres":
-            _refresh_parcel_summary_pg(cur)
-        else:
-            _refresh_parcel_summary_duckdb(cur)
-
-        # Count results
-        if BACKEND == "postgres":
-            cur.execute("SELECT COUNT(*) FROM parcel_summary")
-            count = cur.fetchone()[0]
-            cur.close()
-        else:
-            result = conn.execute("SELECT COUNT(*) FROM parcel_summary").fetchone()
-            count = result[0]
-        conn.close()
-
-        elapsed = time.time() - start
-        return jsonify({
-            "ok": True,
-            "parcels_refreshed": count,
-            "elapsed_s": round(elapsed, 1),
-        })
+        stats = refresh_parcel_summary(incremental=incremental, since=since)
+        count = query("SELECT COUNT(*) FROM parcel_summary")[0][0]
     except Exception as e:
         logging.exception("cron_refresh_parcel_summary failed")
-        conn.close()
         return jsonify({"ok": False, "error": str(e)}), 500
 
-
-def _refresh_parcel_summary_pg(cur):
-    """Postgres-specific parcel summary refresh using DELETE + INSERT.
-
-    Uses DELETE + INSERT (not UPSERT) because the GROUP BY can produce
-    duplicate (block, lot) rows when permits at the same parcel have
-    different neighborhood/supervisor_district values across filings.
-    DISTINCT ON deduplicates, keeping the row with the highest permit count.
-    """
-    cur.execute("DELETE FROM parcel_summary")
-    cur.execute("""
-        INSERT INTO parcel_summary (
-            block, lot, canonical_address, neighborhood, supervisor_district,
-            permit_count, open_permit_count, complaint_count, violation_count,
-            boiler_permit_count, inspection_count,
-            tax_value, zoning_code, use_definition, number_of_units,
-            health_tier, last_permit_date, refreshed_at
-        )
-        SELECT DISTINCT ON (block, lot)
-            block, lot, canonical_address, neighborhood, supervisor_district,
-            permit_count, open_permit_count, complaint_count, violation_count,
-            boiler_permit_count, inspection_count,
-            tax_value, zoning_code, use_definition, number_of_units,
-            health_tier, last_permit_date, refreshed_at
-        FROM (
-            SELECT
-                p.block, p.lot,
-                UPPER(
-                    COALESCE(
-                        (SELECT pa.street_number || ' ' || pa.street_name
-                         FROM permits pa
-                         WHERE pa.block = p.block AND pa.lot = p.lot
-                           AND pa.street_number IS NOT NULL AND pa.street_name IS NOT NULL
-                         ORDER BY pa.filed_date DESC NULLS LAST
-                         LIMIT 1),
-                        tr.property_location
-                    )
-                ) AS canonical_address,
-                p.neighborhood,
-                p.supervisor_district,
-                COUNT(*) AS permit_count,
-                COUNT(*) FILTER (WHERE p.status IN ('filed', 'issued', 'approved', 'reinstated')) AS open_permit_count,
-                COALESCE((SELECT COUNT(*) FROM complaints c WHERE c.block = p.block AND c.lot = p.lot), 0) AS complaint_count,
-                COALESCE((SELECT COUNT(*) FROM violations v WHERE v.block = p.block AND v.lot = p.lot), 0) AS violation_count,
-                COALESCE((SELECT COUNT(*) FROM boiler_permits bp WHERE bp.block = p.block AND bp.lot = p.lot), 0) AS boiler_permit_count,
-                COALESCE((SELECT COUNT(*) FROM inspections i WHERE i.block = p.block AND i.lot = p.lot), 0) AS inspection_count,
-                tr.tax_value,
-                tr.zoning_code,
-                tr.use_definition,
-                tr.number_of_units,
-                ph.tier AS health_tier,
-                MAX(p.filed_date) AS last_permit_date,
-                NOW() AS refreshed_at
-            FROM permits p
-            LEFT JOIN LATERAL (
-                SELECT
-                    t.zoning_code, t.use_definition, t.number_of_units,
-                    t.property_location,
-                    COALESCE(t.assessed_land_value, 0) + COALESCE(t.assessed_improvement_value, 0) AS tax_value
-                FROM tax_rolls t
-                WHERE t.block = p.block AND t.lot = p.lot
-                ORDER BY t.tax_year DESC
-                LIMIT 1
-            ) tr ON TRUE
-            LEFT JOIN property_health ph ON ph.block_lot = p.block || '/' || p.lot
-            WHERE p.block IS NOT NULL AND p.lot IS NOT NULL
-            GROUP BY p.block, p.lot, p.neighborhood, p.supervisor_district,
-                     tr.tax_value, tr.zoning_code, tr.use_definition, tr.number_of_units,
-                     tr.property_location, ph.tier
-        ) sub
-        ORDER BY block, lot, permit_count DESC
-    """)
-
-
-def _refresh_parcel_summary_duckdb(conn):
-    """DuckDB-specific parcel summary refresh using DELETE + INSERT.
-
-    Handles missing tables gracefully (complaints, violations,
-    boiler_permits, inspections, tax_rolls, property_health may not
-    exist in test or fresh DuckDB environments).
-    """
-    conn.execute("DELETE FROM parcel_summary")
-
-    # Check which optional tables exist
-    existing = {
-        r[0] for r in conn.execute(
-            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
-        ).fetchall()
-    }
-    has_tax = "tax_rolls" in existing
-    has_complaints = "complaints" in existing
-    has_violations = "violations" in existing
-    has_boiler = "boiler_permits" in existing
-    has_inspections = "inspections" in existing
-    has_health = "property_health" in existing
-
-    # Build complaint/violation/boiler/inspection count expressions
-    complaint_expr = (
-        "COALESCE((SELECT COUNT(*) FROM complaints c WHERE c.block = p.block AND c.lot = p.lot), 0)"
-        if has_complaints else "0"
-    )
-    violation_expr = (
-        "COALESCE((SELECT COUNT(*) FROM violations v WHERE v.block = p.block AND v.lot = p.lot), 0)"
-        if has_violations else "0"
-    )
-    boiler_expr = (
-        "COALESCE((SELECT COUNT(*) FROM boiler_permits bp WHERE bp.block = p.block AND bp.lot = p.lot), 0)"
-        if has_boiler else "0"
-    )
-    inspection_expr = (
-        "COALESCE((SELECT COUNT(*) FROM inspections i WHERE i.block = p.block AND i.lot = p.lot), 0)"
-        if has_inspections else "0"
-    )
-
-    # Tax rolls JOIN
-    if has_tax:
-        tax_join = """
-        LEFT JOIN (
-            SELECT t.block, t.lot,
-                   t.zoning_code, t.use_definition, t.number_of_units,
-                   t.property_location,
-                   COALESCE(t.assessed_land_value, 0) + COALESCE(t.assessed_improvement_value, 0) AS tax_value,
-                   ROW_NUMBER() OVER (PARTITION BY t.block, t.lot ORDER BY t.tax_year DESC) AS rn
-            FROM tax_rolls t
-        ) tr ON tr.block = p.block AND tr.lot = p.lot AND tr.rn = 1
-        """
-        tax_value_col = "tr.tax_value"
-        zoning_col = "tr.zoning_code"
-        use_col = "tr.use_definition"
-        units_col = "tr.number_of_units"
-        tax_group = ", tr.tax_value, tr.zoning_code, tr.use_definition, tr.number_of_units, tr.property_location"
-    else:
-        tax_join = ""
-        tax_value_col = "NULL"
-        zoning_col = "NULL"
-        use_col = "NULL"
-        units_col = "NULL"
-        tax_group = ""
-
-    # Health JOIN
-    if has_health:
-        health_join = "LEFT JOIN property_health ph ON ph.block_lot = p.block || '/' || p.lot"
-        health_col = "ph.tier"
-        health_group = ", ph.tier"
-    else:
-        health_join = ""
-        health_col = "NULL"
-        health_group = ""
-
-    # Check if permits table has supervisor_district column
-    permit_cols = {
-        r[0] for r in conn.execute(
-            "SELECT column_name FROM information_schema.columns "
-            "WHERE table_name = 'permits'"
-        ).fetchall()
-    }
-    has_supervisor = "supervisor_district" in permit_cols
-    supervisor_select = "p.supervisor_district" if has_supervisor else "NULL"
-    supervisor_group = ", p.supervisor_district" if has_supervisor else ""
-
-    # Canonical address expression
-    if has_tax:
-        addr_expr = """UPPER(
-            COALESCE(
-                (SELECT pa.street_number || ' ' || pa.street_name
-                 FROM permits pa
-                 WHERE pa.block = p.block AND pa.lot = p.lot
-                   AND pa.street_number IS NOT NULL AND pa.street_name IS NOT NULL
-                 ORDER BY pa.filed_date DESC NULLS LAST
-                 LIMIT 1),
-                tr.property_location
-            )
-        )"""
-    else:
-        addr_expr = """UPPER(
-            (SELECT pa.street_number || ' ' || pa.street_name
-             FROM permits pa
-             WHERE pa.block = p.block AND pa.lot = p.lot
-               AND pa.street_number IS NOT NULL AND pa.street_name IS NOT NULL
-             ORDER BY pa.filed_date DESC NULLS LAST
-             LIMIT 1)
-        )"""
-
-    sql = f"""
-        INSERT OR REPLACE INTO parcel_summary (
-            block, lot, canonical_address, neighborhood, supervisor_district,
-            permit_count, open_permit_count, complaint_count, violation_count,
-            boiler_permit_count, inspection_count,
-            tax_value, zoning_code, use_definition, number_of_units,
-            health_tier, last_permit_date, refreshed_at
-        )
-        SELECT
-            p.block, p.lot,
-            {addr_expr},
-            p.neighborhood,
-            {supervisor_select},
-            COUNT(*),
-            COUNT(*) FILTER (WHERE p.status IN ('filed', 'issued', 'approved', 'reinstated')),
-            {complaint_expr},
-            {violation_expr},
-            {boiler_expr},
-            {inspection_expr},
-            {tax_value_col},
-            {zoning_col},
-            {use_col},
-            {units_col},
-            {health_col},
-            MAX(p.filed_date),
-            CURRENT_TIMESTAMP
-        FROM permits p
-        {tax_join}
-        {health_join}
-        WHERE p.block IS NOT NULL AND p.lot IS NOT NULL
-        GROUP BY p.block, p.lot, p.neighborhood{supervisor_group}
-                 {tax_group}{health_group}
-    """
-    conn.execute(sql)
+    elapsed = time.time() - start
+    return jsonify({
+        "ok": True,
+        "mode": stats["mode"],
+        "parcels_recomputed": stats["parcels"],
+        "parcels_refreshed": count,
+        "elapsed_s": round(elapsed, 1),
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -2147,134 +1966,27 @@ def cron_ingest_recent_permits():
 
 @bp.route("/cron/refresh-severity-cache", methods=["POST"])
 def cron_refresh_severity_cache():
-    """Bulk-score active permits and upsert into severity_cache.
+    """Score all active permits into severity_cache (src/severity_cache.py).
 
-    Protected by CRON_SECRET bearer token. Scores permits with status in
-    filed/issued/approved in batches of 500 to avoid timeouts.
+    Protected by CRON_SECRET bearer token. Streams filed/issued/approved
+    permits in chunks, scores them on a process pool and bulk-upserts each
+    chunk. Stops reading after ?budget= seconds (default 240) with
+    done=false and a checkpoint — call again to resume; ?restart=1 starts
+    a new pass.
     """
     _check_api_auth()
-    import json as _json
-    from src.db import get_connection, BACKEND
-    from src.severity import PermitInput, score_permit
+    from src.severity_cache import refresh_severity_cache, DEFAULT_TIME_BUDGET_S
 
     start = time.time()
-    BATCH_LIMIT = 500
-
     try:
-        conn = get_connection()
-        try:
-            if BACKEND == "postgres":
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT permit_number, status, permit_type_definition, description, "
-                        "filed_date, issued_date, completed_date, status_date, "
-                        "estimated_cost, revised_cost "
-                        "FROM permits "
-                        "WHERE LOWER(status) IN ('filed', 'issued', 'approved') "
-                        "ORDER BY filed_date DESC NULLS LAST "
-                        "LIMIT %s",
-                        (BATCH_LIMIT,),
-                    )
-                    rows = cur.fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT permit_number, status, permit_type_definition, description, "
-                    "filed_date, issued_date, completed_date, status_date, "
-                    "estimated_cost, revised_cost "
-                    "FROM permits "
-                    "WHERE LOWER(status) IN ('filed', 'issued', 'approved') "
-                    "ORDER BY filed_date DESC "
-                    "LIMIT ?",
-                    [BATCH_LIMIT],
-                ).fetchall()
-
-            # Get inspection counts in one query
-            permit_numbers = [r[0] for r in rows if r[0]]
-            insp_counts = {}
-            if permit_numbers:
-                if BACKEND == "postgres":
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            "SELECT reference_number, COUNT(*) FROM inspections "
-                            "WHERE reference_number = ANY(%s) "
-                            "GROUP BY reference_number",
-                            (permit_numbers,),
-                        )
-                        for pnum, cnt in cur.fetchall():
-                            insp_counts[pnum] = cnt
-                else:
-                    placeholders = ", ".join(["?" for _ in permit_numbers])
-                    ic_rows = conn.execute(
-                        f"SELECT reference_number, COUNT(*) FROM inspections "
-                        f"WHERE reference_number IN ({placeholders}) "
-                        f"GROUP BY reference_number",
-                        permit_numbers,
-                    ).fetchall()
-                    for pnum, cnt in ic_rows:
-                        insp_counts[pnum] = cnt
-
-            # Score each permit and upsert to cache
-            scored = 0
-            errors = 0
-            for row in rows:
-                try:
-                    pnum = row[0]
-                    if not pnum:
-                        continue
-                    permit_input = PermitInput.from_dict(
-                        {
-                            "permit_number": pnum,
-                            "status": row[1] or "",
-                            "permit_type_definition": row[2] or "",
-                            "description": row[3] or "",
-                            "filed_date": row[4],
-                            "issued_date": row[5],
-                            "completed_date": row[6],
-                            "status_date": row[7],
-                            "estimated_cost": row[8],
-                            "revised_cost": row[9],
-                        },
-                        inspection_count=insp_counts.get(pnum, 0),
-                    )
-                    result = score_permit(permit_input)
-                    drivers_json = _json.dumps({
-                        dim: vals["score"] for dim, vals in result.dimensions.items()
-                    })
-                    if BACKEND == "postgres":
-                        with conn.cursor() as cur:
-                            cur.execute(
-                                "INSERT INTO severity_cache (permit_number, score, tier, drivers) "
-                                "VALUES (%s, %s, %s, %s) "
-                                "ON CONFLICT (permit_number) DO UPDATE "
-                                "SET score=EXCLUDED.score, tier=EXCLUDED.tier, "
-                                "    drivers=EXCLUDED.drivers, computed_at=NOW()",
-                                (pnum, result.score, result.tier, drivers_json),
-                            )
-                    else:
-                        conn.execute(
-                            "INSERT OR REPLACE INTO severity_cache "
-                            "(permit_number, score, tier, drivers) VALUES (?, ?, ?, ?)",
-                            [pnum, result.score, result.tier, drivers_json],
-                        )
-                    scored += 1
-                except Exception as row_err:
-                    logging.debug("severity score failed for %s: %s", row[0], row_err)
-                    errors += 1
-
-            if BACKEND == "postgres":
-                conn.commit()
-
-        finally:
-            conn.close()
-
-        elapsed = time.time() - start
-        return jsonify({
-            "ok": True,
-            "permits_scored": scored,
-            "errors": errors,
-            "elapsed_s": round(elapsed, 1),
-        })
+        budget = float(request.args.get("budget", DEFAULT_TIME_BUDGET_S))
+    except ValueError:
+        return jsonify({"ok": False, "error": "budget must be a number of seconds"}), 400
+    restart = request.args.get("restart", "").lower() in ("1", "true", "yes")
 
+    try:
+        stats = refresh_severity_cache(restart=restart, time_budget_s=budget)
+        return jsonify({"ok": True, **stats, "elapsed_s": round(time.time() - start, 1)})
     except Exception as e:
         logging.exception("cron_refresh_severity_cache failed")
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -2324,8 +2036,13 @@ def cron_compute_caches():
     so that when a user opens their brief, the data is already cached and
     the page loads instantly instead of waiting for a live DB query.
 
+    Users are processed in chunks of BRIEF_BATCH_SIZE; the first cache miss
+    in a chunk prefetches every brief section for the whole chunk with
+    set-based queries (web.brief_batch), so a cold run costs a few queries
+    per chunk rather than a few dozen per user.
+
     Returns JSON:
-      { "computed": N, "errors": M, "total_users": T }
+      { "computed": N, "errors": M, "total_users": T, "batches": B, "stale": S }
     """
     _check_api_auth()
 
@@ -2336,7 +2053,7 @@ def cron_compute_caches():
     # get_cached_or_compute and invalidate_cache are provided by web.helpers
     # (built by Agent 1A in a parallel worktree — merged by orchestrator).
     try:
-        from web.helpers import get_cached_or_compute
+        from web.helpers import get_cached_or_compute, invalidate_cache
     except ImportError:
         # Agent 1A's functions not yet merged — skip caching but still log.
         logging.warning("compute-caches: get_cached_or_compute not available yet — skipping run")
@@ -2355,25 +2072,59 @@ def cron_compute_caches():
         logging.error("compute-caches: failed to fetch users: %s", e)
         return jsonify({"computed": 0, "errors": 0, "total_users": 0, "error": str(e)}), 500
 
+    from web.brief_batch import BRIEF_BATCH_SIZE, prefetch_briefs
+
     computed = 0
     errors = 0
-    for row in rows:
-        user_id = row[0]
-        try:
-            primary_addr = get_primary_address(user_id)
-            cache_key = f"brief:{user_id}:1"  # Default lookback=1
-            get_cached_or_compute(
-                cache_key,
-                lambda uid=user_id, pa=primary_addr: get_morning_brief(uid, 1, primary_address=pa),
-                ttl_minutes=30,
-            )
-            computed += 1
-        except Exception as e:
-            logging.warning("Brief pre-compute failed for user %s: %s", user_id, e)
-            errors += 1
+    batches = 0
+    stale = 0
+    user_ids = [row[0] for row in rows]
+    for start in range(0, len(user_ids), BRIEF_BATCH_SIZE):
+        chunk = user_ids[start:start + BRIEF_BATCH_SIZE]
+        # Prefetch the chunk's sections set-at-a-time, but only once some
+        # user in it actually misses the cache.
+        prefetched: dict = {}
+
+        def _batch(chunk=chunk, prefetched=prefetched):
+            if "batch" not in prefetched:
+                prefetched["batch"] = prefetch_briefs(chunk, 1)
+            return prefetched["batch"]
+
+        def _compute(uid):
+            batch = _batch()
+            primary_addr = batch.primary_addresses.get(uid)
+            if "primary_addresses" in batch.failed:
+                primary_addr = get_primary_address(uid)
+            return get_morning_brief(uid, 1, primary_address=primary_addr, batch=batch)
+
+        for user_id in chunk:
+            try:
+                cache_key = f"brief:{user_id}:1"  # Default lookback=1
+                brief = get_cached_or_compute(
+                    cache_key,
+                    lambda uid=user_id: _compute(uid),
+                    ttl_minutes=30,
+                )
+                if brief.get("stale_sections"):
+                    # Leave it for the page to rebuild live rather than
+                    # cache sections that missed their deadline
+                    invalidate_cache(cache_key)
+                    stale += 1
+                computed += 1
+            except Exception as e:
+                logging.warning("Brief pre-compute failed for user %s: %s", user_id, e)
+                errors += 1
+        if prefetched:
+            batches += 1
 
     logging.info(
-        "compute-caches: computed=%d errors=%d total=%d",
-        computed, errors, len(rows),
+        "compute-caches: computed=%d errors=%d total=%d batches=%d stale=%d",
+        computed, errors, len(rows), batches, stale,
     )
-    return jsonify({"computed": computed, "errors": errors, "total_users": len(rows)})
+    return jsonify({
+        "computed": computed,
+        "errors": errors,
+        "total_users": len(rows),
+        "batches": batches,
+        "stale": stale,
+    })
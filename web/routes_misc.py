@@ -28,7 +28,7 @@ def brief():
     """Morning brief dashboard — what changed, permit health, inspections."""
     from web.brief import get_morning_brief
     from web.auth import get_primary_address
-    from web.helpers import get_cached_or_compute
+    from web.helpers import get_cached_or_compute, invalidate_cache
     lookback = request.args.get("lookback", "1")
     try:
         lookback_days = max(1, min(int(lookback), 90))
@@ -44,6 +44,9 @@ def brief():
         lambda: get_morning_brief(g.user["user_id"], lookback_days, primary_address=primary_addr),
         ttl_minutes=30
     )
+    # Don't serve sections that missed their deadline from cache for 30 min
+    if brief_data.get("stale_sections"):
+        invalidate_cache(cache_key)
     # Add cache metadata for template
     brief_data['cached_at'] = brief_data.get('_cached_at')
     brief_data['can_refresh'] = True
@@ -373,34 +373,22 @@ def analyze():
         results["predict"] = f'<div class="error">Prediction error: {e}</div>'
         pred_result = ""
 
-    # Parse prediction output for downstream tool inputs
+    # Downstream tool inputs from the structured prediction
     permit_type = "alterations"  # default
     review_path = "in_house"
     agency_routing = []
     project_types = []
     permit_forms = ["Form 3/8"]
 
-    if pred_result:
-        text = pred_result.lower()
-        if "new construction" in text or "form 1" in text:
+    prediction = pred_meta.get("result") if pred_result else None
+    if prediction:
+        project_types = list(prediction["detected_project_types"])
+        permit_forms = [prediction["permits_needed"]["form"]["form"]]
+        if "new_construction" in project_types:
             permit_type = "new_construction"
-            permit_forms = ["Form 1/2"]
-        if "otc" in text:
+        if prediction["review_path"]["path"].endswith("otc"):
             review_path = "otc"
-
-        # Extract agencies
-        for agency in ["Planning", "SFFD (Fire)", "DPH (Public Health)",
-                       "DPW (Public Works)", "DBI (Building)",
-                       "DBI Mechanical/Electrical"]:
-            if agency.lower() in text:
-                agency_routing.append(agency)
-
-        # Extract project types
-        for ptype in ["restaurant", "adu", "commercial_ti", "historic",
-                      "seismic", "solar", "demolition", "change_of_use",
-                      "new_construction"]:
-            if ptype.replace("_", " ") in text or ptype in text:
-                project_types.append(ptype)
+        agency_routing = [a["agency"] for a in prediction["agency_routing"]]
 
     project_type = project_types[0] if project_types else "general_alteration"
 
@@ -13,6 +13,7 @@ from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeou
 
 from flask import Blueprint, g, redirect, render_template, request
 
+from src.address_key import address_key
 from src.tools.intent_router import classify as classify_intent
 from src.tools.knowledge_base import get_knowledge_base
 from src.tools.permit_lookup import permit_lookup
@@ -81,38 +82,20 @@ def _gather_intel(block: str, lot: str) -> dict:
             else:
                 active_permits = conn.execute(active_sql, [block, lot]).fetchall()
 
+            # One batched routing lookup for every active permit
+            from src.routing_summary import get_routing_batch
+            routing_map = get_routing_batch([ap[0] for ap in active_permits], conn=conn)
             for ap in active_permits:
-                pnum = ap[0]
-                if time.monotonic() - start > deadline:
-                    intel["timeout"] = True
-                    break
-
-                # Count routing stations for this permit
-                routing_sql = f"""
-                    SELECT station, review_results
-                    FROM addenda
-                    WHERE application_number = {_ph}
-                    ORDER BY step
-                """
-                if BACKEND == "postgres":
-                    with conn.cursor() as cur:
-                        cur.execute(routing_sql, [pnum])
-                        stations = cur.fetchall()
-                else:
-                    stations = conn.execute(routing_sql, [pnum]).fetchall()
-
-                if stations:
-                    cleared = sum(1 for s in stations if s[1] and s[1].strip().lower() not in ('', 'pending', 'in review'))
-                    total = len(stations)
-                    current = next((s[0] for s in stations if not s[1] or s[1].strip().lower() in ('', 'pending', 'in review')), None)
+                summary = routing_map.get(ap[0])
+                if summary:
                     intel["routing"].append({
-                        "permit_number": pnum,
+                        "permit_number": ap[0],
                         "status": ap[1],
                         "permit_type": ap[2],
                         "description": (ap[3] or "")[:100],
-                        "stations_cleared": cleared,
-                        "stations_total": total,
-                        "current_station": current or "Complete",
+                        "stations_cleared": summary["completed_stations"],
+                        "stations_total": summary["total_stations"],
+                        "current_station": summary["current_station"] or "Complete",
                     })
 
             # 2. Top entities (architect, contractor, owner) from contacts
@@ -665,19 +648,13 @@ def _get_primary_permit_context(street_number: str, street_name: str) -> dict |
     """Get the most recent permit at an address for Analyze button pre-fill."""
     try:
         from src.db import query
-        ctx_base = street_name.split()[0] if street_name else ""
-        ctx_nospace = ctx_base.replace(' ', '')
         rows = query(
             "SELECT description, permit_type_definition, estimated_cost, "
             "       revised_cost, proposed_use, adu, neighborhood "
             "FROM permits "
-            "WHERE street_number = %s "
-            "  AND ("
-            "    UPPER(street_name) = UPPER(%s)"
-            "    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER(%s)"
-            "  ) "
+            "WHERE street_number = %s AND address_key = %s "
             "ORDER BY filed_date DESC LIMIT 1",
-            (street_number, ctx_base, ctx_nospace),
+            (street_number, address_key(street_number, street_name)),
         )
         if not rows:
             return None
@@ -795,6 +772,7 @@ def _get_address_intel(
         "routing_latest_date": None,
         "routing_latest_result": None,
     }
+    addr_key = address_key(street_number, street_name)
 
     # -- Section 1: Violations (needs block + lot) --
     open_v = 0
@@ -859,20 +837,14 @@ def _get_address_intel(
     # -- Section 4: Permit stats (works with address OR block+lot) --
     try:
         if street_number and street_name:
-            # Exact match on street name (no substring matching)
-            base_name = street_name.split()[0] if street_name else ""
-            nospace_name = base_name.replace(' ', '')
+            # Exact match on the canonical address key (no substring matching)
             count_rows = db_query(
                 "SELECT COUNT(*), "
                 "       COUNT(*) FILTER (WHERE UPPER(status) IN "
                 "           ('ISSUED', 'FILED', 'PLANCHECK', 'REINSTATED')) "
                 "FROM permits "
-                "WHERE street_number = %s "
-                "  AND ("
-                "    UPPER(street_name) = UPPER(%s)"
-                "    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER(%s)"
-                "  )",
-                (street_number, base_name, nospace_name),
+                "WHERE street_number = %s AND address_key = %s",
+                (street_number, addr_key),
             )
         elif block and lot:
             count_rows = db_query(
@@ -894,17 +866,11 @@ def _get_address_intel(
 
     try:
         if street_number and street_name:
-            base_name2 = street_name.split()[0] if street_name else ""
-            nospace_name2 = base_name2.replace(' ', '')
             latest_rows = db_query(
                 "SELECT permit_type_definition FROM permits "
-                "WHERE street_number = %s "
-                "  AND ("
-                "    UPPER(street_name) = UPPER(%s)"
-                "    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER(%s)"
-                "  ) "
+                "WHERE street_number = %s AND address_key = %s "
                 "ORDER BY filed_date DESC LIMIT 1",
-                (street_number, base_name2, nospace_name2),
+                (street_number, addr_key),
             )
         elif block and lot:
             latest_rows = db_query(
@@ -929,18 +895,12 @@ def _get_address_intel(
         # Find the most recently filed active permit at this address
         primary_pnum = None
         if street_number and street_name:
-            rp_base = street_name.split()[0] if street_name else ""
-            rp_nospace = rp_base.replace(' ', '')
             pn_rows = db_query(
                 "SELECT permit_number FROM permits "
-                "WHERE street_number = %s "
-                "  AND ("
-                "    UPPER(street_name) = UPPER(%s)"
-                "    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER(%s)"
-                "  ) "
+                "WHERE street_number = %s AND address_key = %s "
                 "  AND UPPER(status) IN ('FILED', 'PLANCHECK') "
                 "ORDER BY filed_date DESC LIMIT 1",
-                (street_number, rp_base, rp_nospace),
+                (street_number, addr_key),
             )
         elif block and lot:
             pn_rows = db_query(
@@ -1022,29 +982,7 @@ def _ask_address_search(query: str, entities: dict) -> str:
     # Resolve block/lot for property report link
     report_url = None
     try:
-        from src.db import query as db_query
-        from src.tools.permit_lookup import _strip_suffix
         bl = _resolve_block_lot(street_number, street_name)
-        # Fallback: if _resolve_block_lot failed but permits exist, try a
-        # broader query (just street_number + block/lot NOT NULL)
-        if not bl:
-            base_name, _sfx = _strip_suffix(street_name)
-            fb_nospace = base_name.replace(' ', '')
-            rows = db_query(
-                "SELECT block, lot FROM permits "
-                "WHERE street_number = %s "
-                "  AND ("
-                "    UPPER(street_name) = UPPER(%s)"
-                "    OR REPLACE(UPPER(COALESCE(street_name, '')), ' ', '') = UPPER(%s)"
-                "  ) "
-                "  AND block IS NOT NULL AND lot IS NOT NULL "
-                "LIMIT 1",
-                (street_number, base_name, fb_nospace),
-            )
-            if rows:
-                bl = (rows[0][0], rows[0][1])
-                logging.info("_resolve_block_lot fallback matched: %s %s -> %s/%s",
-                             street_number, street_name, bl[0], bl[1])
         if bl:
             report_url = f"/report/{bl[0]}/{bl[1]}"
     except Exception as e:
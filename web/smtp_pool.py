@@ -0,0 +1,177 @@
+"""Pooled, persistent SMTP connections for bulk email (morning briefs).
+
+Opening an SMTP session (TCP + EHLO + STARTTLS + AUTH) per message costs
+several round trips and is what providers rate-limit first.  SMTPPool keeps
+up to ``size`` authenticated sessions open and hands them to sender threads,
+reconnecting transparently when the server drops an idle session, recycling
+each one after ``max_messages_per_connection`` sends, and optionally
+throttling the aggregate send rate to ``rate_per_sec``.
+
+Usage:
+    with SMTPPool(host, port, user=..., password=..., size=4) as pool:
+        pool.send(msg)          # thread-safe
+    pool.stats()                # {"sent": ..., "connections_opened": ...}
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread-safe pacing to at most ``rate_per_sec`` acquisitions per second.
+
+    ``rate_per_sec`` of 0 or None disables throttling.
+    """
+
+    def __init__(self, rate_per_sec: float | None):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class SMTPPool:
+    """A bounded pool of persistent SMTP sessions."""
+
+    def __init__(self, host: str, port: int = 587, *, user: str | None = None,
+                 password: str | None = None, starttls: bool = True, size: int = 4,
+                 max_messages_per_connection: int = 100,
+                 rate_per_sec: float | None = None, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.size = max(1, size)
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+        self._limiter = RateLimiter(rate_per_sec)
+        # Idle sessions as [smtp, messages_sent]; None marks a free slot
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        for _ in range(self.size):
+            self._idle.put(None)
+        self._lock = threading.Lock()
+        self._stats = {"sent": 0, "failed": 0, "connections_opened": 0, "reconnects": 0}
+
+    # ── Connections ───────────────────────────────────────────────
+
+    def _connect(self) -> list:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password or "")
+        except Exception:
+            _quit(server)
+            raise
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return [server, 0]
+
+    def _checkout(self) -> list:
+        slot = self._idle.get()
+        if slot is None:
+            try:
+                slot = self._connect()
+            except Exception:
+                self._idle.put(None)
+                raise
+        return slot
+
+    def _checkin(self, slot: list | None) -> None:
+        if slot is not None and slot[1] >= self.max_messages_per_connection:
+            _quit(slot[0])
+            slot = None
+        self._idle.put(slot)
+
+    # ── Sending ───────────────────────────────────────────────────
+
+    def send(self, msg: EmailMessage) -> None:
+        """Send one message on a pooled session; raises on failure.
+
+        A session the server has dropped is reopened once and the message
+        retried on the fresh session.
+        """
+        self._limiter.acquire()
+        slot = self._checkout()
+        try:
+            try:
+                slot[0].send_message(msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError) as exc:
+                logger.debug("SMTP session dropped (%s) — reconnecting", exc)
+                _quit(slot[0])
+                slot = None
+                with self._lock:
+                    self._stats["reconnects"] += 1
+                slot = self._connect()
+                slot[0].send_message(msg)
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            if slot is not None and not _is_alive(slot[0]):
+                _quit(slot[0])
+                slot = None
+            self._checkin(slot)
+            raise
+        slot[1] += 1
+        with self._lock:
+            self._stats["sent"] += 1
+        self._checkin(slot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """QUIT every idle session.  Sessions checked out keep running."""
+        drained = []
+        while True:
+            try:
+                drained.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for slot in drained:
+            if slot is not None:
+                _quit(slot[0])
+            self._idle.put(None)
+
+    def __enter__(self) -> "SMTPPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _is_alive(server: smtplib.SMTP) -> bool:
+    try:
+        return server.noop()[0] == 250
+    except Exception:
+        return False
+
+
+def _quit(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
@@ -0,0 +1,193 @@
+"""Materialized watch → permit resolution (watch_permit_index).
+
+A user's watch list names permits indirectly — by permit number, street
+address, parcel, or contractor entity.  Portfolio, intelligence and the
+morning brief all need the resulting permit set; expanding it per request
+meant one query per entity watch, one per parcel, and OR-chains of
+``UPPER(street_name) = ...`` that can't use an index.
+
+watch_permit_index holds one row per (watch, permit) instead, so consumers
+resolve a user's watched permits with one indexed join:
+
+    SELECT ... FROM watch_permit_index wpi
+    JOIN permits p ON p.permit_number = wpi.permit_number
+    WHERE wpi.user_id = ? AND wpi.watch_type IN ('permit', 'address', 'parcel')
+
+Maintenance:
+  - index_watch / unindex_watch when a watch is added or removed (web.auth)
+  - index_permits after nightly ingest adds or moves permits
+  - rebuild_watch_index for a full rebuild — after entity resolution
+    (src.entities reassigns every contact's entity_id), after full contacts /
+    permits ingests (src.ingest), and as a nightly cron step so the index
+    can't drift from contacts and permits for longer than a day;
+    ensure_watch_index bootstraps an empty index on startup.
+
+Neighborhood watches are not indexed — they match too many permits and
+every consumer handles them separately.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from src.address_key import address_key_sql
+from src.db import execute_write, query
+
+logger = logging.getLogger(__name__)
+
+INDEXED_WATCH_TYPES = ("permit", "address", "parcel", "entity")
+
+# Permit sets each watch type resolves to (wi = watch_items).  Each SELECT
+# yields (user_id, watch_id, watch_type, permit_number); {watch_filter} and
+# {permit_filter} narrow the rebuild to some watches or some permits.
+_RESOLVERS = {
+    "permit": (
+        "SELECT wi.user_id, wi.watch_id, wi.watch_type, wi.permit_number "
+        "FROM watch_items wi "
+        "WHERE wi.is_active = TRUE AND wi.watch_type = 'permit' "
+        "AND wi.permit_number IS NOT NULL {watch_filter} "
+        "{permit_filter_wi}"
+    ),
+    "address": (
+        "SELECT DISTINCT wi.user_id, wi.watch_id, wi.watch_type, p.permit_number "
+        "FROM watch_items wi "
+        "JOIN permits p ON p.street_number = wi.street_number "
+        f"AND p.address_key = {address_key_sql('wi.street_number', 'wi.street_name')} "
+        "WHERE wi.is_active = TRUE AND wi.watch_type = 'address' {watch_filter} "
+        "{permit_filter_p}"
+    ),
+    "parcel": (
+        "SELECT DISTINCT wi.user_id, wi.watch_id, wi.watch_type, p.permit_number "
+        "FROM watch_items wi "
+        "JOIN permits p ON p.block = wi.block AND p.lot = wi.lot "
+        "WHERE wi.is_active = TRUE AND wi.watch_type = 'parcel' {watch_filter} "
+        "{permit_filter_p}"
+    ),
+    "entity": (
+        "SELECT DISTINCT wi.user_id, wi.watch_id, wi.watch_type, c.permit_number "
+        "FROM watch_items wi "
+        "JOIN contacts c ON c.entity_id = wi.entity_id "
+        "WHERE wi.is_active = TRUE AND wi.watch_type = 'entity' "
+        "AND c.permit_number IS NOT NULL {watch_filter} "
+        "{permit_filter_c}"
+    ),
+}
+
+# IN-list size when indexing a batch of permits
+PERMIT_CHUNK = 1000
+
+
+def _insert_resolved(watch_type: str, watch_filter: str = "", permit_filter: str = "",
+                     params: list | None = None) -> None:
+    """INSERT one resolver's rows, skipping ones already indexed.
+
+    Failures are logged and swallowed: the bulk tables (permits, contacts)
+    may be missing on a fresh database, and the index is a cache.
+    """
+    select = _RESOLVERS[watch_type].format(
+        watch_filter=watch_filter,
+        permit_filter_wi=permit_filter.format(col="wi.permit_number"),
+        permit_filter_p=permit_filter.format(col="p.permit_number"),
+        permit_filter_c=permit_filter.format(col="c.permit_number"),
+    )
+    try:
+        execute_write(
+            "INSERT INTO watch_permit_index (user_id, watch_id, watch_type, permit_number) "
+            f"{select} "
+            "ON CONFLICT (watch_id, permit_number) DO NOTHING",
+            params or None,
+        )
+    except Exception:
+        logger.debug("watch_permit_index: %s resolver failed", watch_type, exc_info=True)
+
+
+def index_watch(watch_id: int, watch_type: str | None = None) -> None:
+    """(Re)index one watch — call after it is created or its target changes."""
+    execute_write("DELETE FROM watch_permit_index WHERE watch_id = %s", (watch_id,))
+    types = [watch_type] if watch_type in _RESOLVERS else list(INDEXED_WATCH_TYPES)
+    for wt in types:
+        _insert_resolved(wt, watch_filter="AND wi.watch_id = %s", params=[watch_id])
+
+
+def unindex_watch(watch_id: int, user_id: int | None = None) -> None:
+    """Drop a removed watch's rows (only the owner's, when user_id is given)."""
+    if user_id is None:
+        execute_write("DELETE FROM watch_permit_index WHERE watch_id = %s", (watch_id,))
+    else:
+        execute_write(
+            "DELETE FROM watch_permit_index WHERE watch_id = %s AND user_id = %s",
+            (watch_id, user_id),
+        )
+
+
+def index_permits(permit_numbers) -> None:
+    """Re-resolve newly ingested (or re-addressed) permits.
+
+    A permit's existing rows are dropped first, so one that moved away from
+    a watched address or parcel stops matching that watch.
+    """
+    permits = sorted({pn for pn in permit_numbers if pn})
+    for start in range(0, len(permits), PERMIT_CHUNK):
+        chunk = permits[start:start + PERMIT_CHUNK]
+        in_list = ", ".join(["%s"] * len(chunk))
+        execute_write(f"DELETE FROM watch_permit_index WHERE permit_number IN ({in_list})",
+                      list(chunk))
+        permit_filter = "AND {col} IN (" + in_list + ")"
+        for wt in INDEXED_WATCH_TYPES:
+            _insert_resolved(wt, permit_filter=permit_filter, params=list(chunk))
+
+
+def rebuild_watch_index(user_id: int | None = None) -> int:
+    """Rebuild the index for one user (or everyone).  Returns rows indexed."""
+    if user_id is None:
+        execute_write("DELETE FROM watch_permit_index")
+        watch_filter, params = "", []
+    else:
+        execute_write("DELETE FROM watch_permit_index WHERE user_id = %s", (user_id,))
+        watch_filter, params = "AND wi.user_id = %s", [user_id]
+    for wt in INDEXED_WATCH_TYPES:
+        _insert_resolved(wt, watch_filter=watch_filter, params=params)
+    return count_indexed(user_id)
+
+
+def count_indexed(user_id: int | None = None) -> int:
+    if user_id is None:
+        rows = query("SELECT COUNT(*) FROM watch_permit_index")
+    else:
+        rows = query("SELECT COUNT(*) FROM watch_permit_index WHERE user_id = %s", (user_id,))
+    return rows[0][0] if rows else 0
+
+
+def ensure_watch_index() -> int | None:
+    """Build the index if it is empty but active watches exist.
+
+    Returns the number of rows built, or None when nothing needed doing.
+    """
+    try:
+        if count_indexed():
+            return None
+        active = query(
+            "SELECT COUNT(*) FROM watch_items WHERE is_active = TRUE "
+            "AND watch_type IN ('permit', 'address', 'parcel', 'entity')"
+        )
+        if not active or not active[0][0]:
+            return None
+    except Exception:
+        logger.debug("ensure_watch_index: index unavailable", exc_info=True)
+        return None
+    built = rebuild_watch_index()
+    logger.info("watch_permit_index bootstrapped with %d rows", built)
+    return built
+
+
+def watched_permits_sql(watch_types=("permit", "address", "parcel")) -> str:
+    """Subquery selecting a user's watched permit numbers (one placeholder: user_id).
+
+    Usage: ``f"... WHERE p.permit_number IN ({watched_permits_sql()})"``.
+    The placeholder is ``%s``, which src.db.query converts for DuckDB.
+    """
+    types = ", ".join(f"'{t}'" for t in watch_types)
+    return (
+        f"SELECT permit_number FROM watch_permit_index "
+        f"WHERE user_id = %s AND watch_type IN ({types})"
+    )